@@ -231,6 +231,39 @@ def gen_recursion_delegate_switch(cw):
         cw.write('break;')
         cw.dedent()
     
+def gen_profile_hooks(cw):
+    for nparams in range(MAX_ARGS):
+        cw.enter_block("internal class PythonFunctionProfile%d" % (nparams, ))
+        cw.write("private readonly Func<%s> _target;" % (make_calltarget_type_args(nparams), ))
+        cw.write('')
+        cw.enter_block('public PythonFunctionProfile%d(Func<%s> target)' % (nparams, make_calltarget_type_args(nparams)))
+        cw.write('_target = target;')
+        cw.exit_block()
+        cw.write('')
+
+        cw.enter_block('public object CallTarget(%s)' % (make_params(nparams, "PythonFunction/*!*/ function"), ))
+        cw.write('PythonContext context = function.Context.LanguageContext;')
+        cw.write('ProfileHook hook = context.ProfileHook;')
+        cw.write('if (hook == null) return _target(%s);' % (gen_args_call(nparams, 'function'), ))
+        cw.write('')
+        cw.write('hook.OnCall(function);')
+        cw.write('object result = null;')
+        cw.enter_block('try')
+        cw.write('return result = _target(%s);' % (gen_args_call(nparams, 'function'), ))
+        cw.finally_block()
+        cw.write('context.ProfileHook?.OnReturn(function, result);')
+        cw.exit_block()
+        cw.exit_block()
+        cw.exit_block()
+        cw.write('')
+
+def gen_profile_delegate_switch(cw):
+    for nparams in range(MAX_ARGS):
+        cw.case_label('case %d:' % nparams)
+        cw.write('finalTarget = new Func<%s>(new PythonFunctionProfile%d((Func<%s>)finalTarget).CallTarget);' % (make_calltarget_type_args(nparams), nparams, make_calltarget_type_args(nparams)))
+        cw.write('break;')
+        cw.dedent()
+
 def get_call_type(postfix):
     if postfix == "": return "CallType.None"
     else: return "CallType.ImplicitInstance"
@@ -564,6 +597,8 @@ def main():
         ("Python Fast Type Callers", gen_fast_type_callers),
         ("Python Recursion Enforcement", gen_recursion_checks),
         ("Python Recursion Delegate Switch", gen_recursion_delegate_switch),
+        ("Python Profile Hooks", gen_profile_hooks),
+        ("Python Profile Delegate Switch", gen_profile_delegate_switch),
         ("Python Lazy Call Targets", gen_lazy_call_targets),
         ("Python Zero Arg Function Callers", function_callers_0),
         ("Python Function Callers", function_callers),
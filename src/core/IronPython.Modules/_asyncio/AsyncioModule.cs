@@ -0,0 +1,270 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#nullable enable
+
+using System;
+using System.Collections.Generic;
+using System.Runtime.CompilerServices;
+using System.Threading;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Exceptions;
+using IronPython.Runtime.Operations;
+using IronPython.Runtime.Types;
+
+using Microsoft.Scripting.Runtime;
+
+using SpecialName = System.Runtime.CompilerServices.SpecialNameAttribute;
+
+[assembly: PythonModule("_asyncio", typeof(IronPython.Modules.Asyncio.AsyncioModule))]
+namespace IronPython.Modules.Asyncio {
+    /// <summary>
+    /// Native asyncio support: Future and Task implemented in C# and an event loop running on .NET
+    /// timers, wait handles and asynchronous socket operations.
+    ///
+    /// The module is used directly through new_event_loop() and run().  The asyncio package does
+    /// not select this loop: EventLoop is not an asyncio.AbstractEventLoop, the default event
+    /// loop policy still creates its own loops, and asyncio's Future and Task stay the pure
+    /// Python ones.
+    /// </summary>
+    public static partial class AsyncioModule {
+        public const string __doc__ = "Accelerator module for asyncio";
+
+        [ThreadStatic] private static object? _runningLoop;
+
+        // the task whose coroutine is executing in the current logical flow; flows across awaits of natively driven coroutines
+        private static readonly AsyncLocal<Task?> _currentTask = new AsyncLocal<Task?>();
+
+        // the tasks of loops other than EventLoop, which keeps its own
+        private static readonly ConditionalWeakTable<object, LoopTasks> _loopTasks = new ConditionalWeakTable<object, LoopTasks>();
+
+        [SpecialName]
+        public static void PerformModuleReload(PythonContext context, PythonDictionary dict) {
+            InvalidStateError = context.EnsureModuleException("_asyncio.InvalidStateError", PythonExceptions.Exception, dict, "InvalidStateError", "_asyncio");
+        }
+
+        public static PythonType InvalidStateError = null!;
+
+        public static PythonType CancelledError => PythonExceptions.CancelledError;
+
+        internal static Exception MakeInvalidStateError(string message) => PythonOps.CreateThrowable(InvalidStateError, message);
+
+        #region Running loop
+
+        [Documentation(@"Return the running event loop.  Raise a RuntimeError if there is none.
+
+This function is thread-specific.")]
+        public static object get_running_loop()
+            => _runningLoop ?? throw PythonOps.RuntimeError("no running event loop");
+
+        [Documentation(@"Return the running event loop or None.
+
+This is a low-level function intended to be used by event loops.
+This function is thread-specific.")]
+        public static object? _get_running_loop() => _runningLoop;
+
+        [Documentation(@"Set the running event loop.
+
+This is a low-level function intended to be used by event loops.
+This function is thread-specific.")]
+        public static void _set_running_loop(object? loop) {
+            _runningLoop = loop;
+        }
+
+        [Documentation(@"Return an asyncio event loop.
+
+When called from a coroutine or a callback (e.g. scheduled with call_soon
+or similar API), this function will always return the running event loop.
+
+If there is no running event loop set, the function will return
+the result of `get_event_loop_policy().get_event_loop()` call.")]
+        public static object get_event_loop(CodeContext/*!*/ context) {
+            if (_runningLoop is not null) return _runningLoop;
+
+            object events = Importer.ImportModule(context, new PythonDictionary(), "asyncio.events", true, 0);
+            object policy = PythonOps.Invoke(context, events, "get_event_loop_policy")!;
+            return PythonOps.Invoke(context, policy, "get_event_loop")!;
+        }
+
+        [Documentation("Create a new event loop running on .NET timers and asynchronous I/O.")]
+        public static EventLoop new_event_loop(CodeContext/*!*/ context) => new EventLoop(context);
+
+        [Documentation(@"Execute the coroutine and return the result.
+
+This function runs the passed coroutine on a new event loop, closing the loop
+at the end.  It cannot be called when another event loop is running in the
+same thread.")]
+        public static object? run(CodeContext/*!*/ context, object? main, bool debug = false) {
+            if (_runningLoop is not null) {
+                throw PythonOps.RuntimeError("asyncio.run() cannot be called from a running event loop");
+            }
+            if (!Task.IsCoroutine(main)) {
+                throw PythonOps.ValueError("a coroutine was expected, got {0}", PythonOps.Repr(context, main));
+            }
+
+            var loop = new EventLoop(context);
+            try {
+                loop.set_debug(debug);
+                return loop.run_until_complete(main);
+            } finally {
+                try {
+                    CancelAllTasks(loop);
+                } finally {
+                    loop.close();
+                }
+            }
+        }
+
+        private static void CancelAllTasks(EventLoop loop) {
+            var pending = new List<Task>();
+            foreach (object task in all_tasks(loop.Context, loop)) {
+                if (task is Task t) {
+                    t.cancel();
+                    pending.Add(t);
+                }
+            }
+            if (pending.Count == 0) return;
+
+            int remaining = pending.Count;
+            var gathered = loop.create_future();
+            Action<object?> done = _ => {
+                if (--remaining == 0 && !gathered.done()) gathered.set_result(null);
+            };
+            foreach (Task t in pending) {
+                t.add_done_callback(done);
+            }
+            loop.run_until_complete(gathered);
+
+            foreach (Task t in pending) {
+                if (!t.cancelled() && t.exception() is object exc) {
+                    loop.call_exception_handler(new PythonDictionary {
+                        ["message"] = "unhandled exception during asyncio.run() shutdown",
+                        ["exception"] = exc,
+                        ["task"] = t,
+                    });
+                }
+            }
+        }
+
+        #endregion
+
+        #region Task registry
+
+        [Documentation("Register a new task in asyncio as executed by loop.")]
+        public static void _register_task(CodeContext/*!*/ context, object task) {
+            GetLoopTasks(GetTaskLoop(context, task)).Add(task);
+        }
+
+        [Documentation("Unregister a task.")]
+        public static void _unregister_task(CodeContext/*!*/ context, object task) {
+            GetLoopTasks(GetTaskLoop(context, task)).Remove(task);
+        }
+
+        [Documentation(@"Enter into task execution or resume suspended task.
+
+Task belongs to loop.
+
+Returns None.")]
+        public static void _enter_task(object loop, object task) {
+            LoopTasks tasks = GetLoopTasks(loop);
+            if (Interlocked.CompareExchange(ref tasks.Current, task, null) is object current) {
+                throw PythonOps.RuntimeError("Cannot enter into task {0} while another task {1} is being executed.",
+                    PythonOps.Repr(DefaultContext.Default, task), PythonOps.Repr(DefaultContext.Default, current));
+            }
+        }
+
+        [Documentation(@"Leave task execution or suspend a task.
+
+Task belongs to loop.
+
+Returns None.")]
+        public static void _leave_task(object loop, object task) {
+            LoopTasks tasks = GetLoopTasks(loop);
+            object? current = Interlocked.CompareExchange(ref tasks.Current, null, task);
+            if (current != task) {
+                throw PythonOps.RuntimeError("Leaving task {0} does not match the current task {1}.",
+                    PythonOps.Repr(DefaultContext.Default, task), PythonOps.Repr(DefaultContext.Default, current));
+            }
+        }
+
+        [Documentation(@"Return a currently executed task.
+
+If loop is None, the running loop is used.")]
+        public static object? current_task(CodeContext/*!*/ context, object? loop = null) {
+            loop ??= get_running_loop();
+
+            Task? running = _currentTask.Value;
+            if (running is not null && running._loop == loop && !running.done()) return running;
+
+            return Volatile.Read(ref GetLoopTasks(loop).Current);
+        }
+
+        [Documentation(@"Return a set of all tasks for the loop.
+
+If loop is None, the running loop is used.")]
+        public static SetCollection all_tasks(CodeContext/*!*/ context, object? loop = null) {
+            loop ??= get_running_loop();
+
+            var res = new SetCollection();
+            foreach (object task in GetLoopTasks(loop).GetAll()) {
+                if (task is Future f) {
+                    if (!f.done()) res.add(task);
+                } else if (!PythonOps.IsTrue(PythonOps.Invoke(context, task, "done"))) {
+                    res.add(task);
+                }
+            }
+            return res;
+        }
+
+        internal static LoopTasks GetLoopTasks(object loop)
+            => loop is EventLoop eventLoop ? eventLoop.Tasks : _loopTasks.GetValue(loop, _ => new LoopTasks());
+
+        private static object GetTaskLoop(CodeContext/*!*/ context, object task)
+            => task is Future f ? f._loop : PythonOps.Invoke(context, task, "get_loop")!;
+
+        internal static Task? CurrentTask {
+            get => _currentTask.Value;
+            set => _currentTask.Value = value;
+        }
+
+        /// <summary>
+        /// The tasks of one event loop and the task it is executing.  Tasks are held weakly so the
+        /// ones nobody references any more can be collected before they finish.
+        /// </summary>
+        internal sealed class LoopTasks {
+            private readonly List<WeakReference> _all = new List<WeakReference>();
+            private int _pruneAt = 64;
+            public object? Current;
+
+            public void Add(object task) {
+                lock (_all) {
+                    if (_all.Count >= _pruneAt) {
+                        _all.RemoveAll(w => !w.IsAlive);
+                        _pruneAt = Math.Max(64, _all.Count * 2);
+                    }
+                    _all.Add(new WeakReference(task));
+                }
+            }
+
+            public void Remove(object task) {
+                lock (_all) {
+                    _all.RemoveAll(w => !w.IsAlive || ReferenceEquals(w.Target, task));
+                }
+            }
+
+            public List<object> GetAll() {
+                var res = new List<object>();
+                lock (_all) {
+                    foreach (WeakReference w in _all) {
+                        if (w.Target is object task) res.Add(task);
+                    }
+                }
+                return res;
+            }
+        }
+
+        #endregion
+    }
+}
@@ -0,0 +1,186 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#if FEATURE_FULL_NET
+
+#nullable enable
+
+using System;
+using System.Net.Sockets;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Exceptions;
+using IronPython.Runtime.Operations;
+using IronPython.Runtime.Types;
+
+using Microsoft.Scripting.Runtime;
+
+namespace IronPython.Modules.Asyncio {
+    public static partial class AsyncioModule {
+        public partial class EventLoop {
+            // returned by a completion callback when the operation has to be restarted
+            private static readonly object _continueOperation = new object();
+
+            [Documentation(@"Receive data from the socket.
+
+The return value is a bytes object representing the data received.
+The maximum amount of data to be received at once is specified by
+nbytes.")]
+            public Future sock_recv(PythonSocket.socket sock, int nbytes) {
+                if (nbytes < 0) throw PythonOps.ValueError("negative buffersize in recv");
+
+                var buffer = new byte[nbytes];
+                var args = new SocketAsyncEventArgs();
+                args.SetBuffer(buffer, 0, nbytes);
+                return StartSocketOperation(sock, args, (s, e) => s.ReceiveAsync(e),
+                    e => Bytes.Make(e.BytesTransferred == buffer.Length ? buffer : buffer.AsSpan(0, e.BytesTransferred).ToArray()));
+            }
+
+            [Documentation(@"Receive data from the socket.
+
+The received data is written into *buf* (a writable buffer).
+The return value is the number of bytes written.")]
+            public Future sock_recv_into(PythonSocket.socket sock, [NotNone] IBufferProtocol buf) {
+                IPythonBuffer buffer = buf.GetBuffer(BufferFlags.Writable);
+                // receive straight into the exporter's memory when it is backed by a managed array
+                bool direct = buffer.TryGetArraySegment(writable: true, out ArraySegment<byte> segment);
+                if (!direct) segment = new ArraySegment<byte>(new byte[buffer.NumBytes()]);
+
+                var args = new SocketAsyncEventArgs();
+                args.SetBuffer(segment.Array, segment.Offset, segment.Count);
+                return StartSocketOperation(sock, args, (s, e) => s.ReceiveAsync(e), e => {
+                    if (!direct) segment.AsSpan(0, e.BytesTransferred).CopyTo(buffer.AsSpan());
+                    return e.BytesTransferred;
+                }, buffer);
+            }
+
+            [Documentation(@"Send data to the socket.
+
+The socket must be connected to a remote socket. This method continues
+to send data from data until either all data has been sent or an
+error occurs. None is returned on success. On error, an exception is
+raised, and there is no way to determine how much data, if any, was
+successfully processed by the receiving end of the connection.")]
+            public Future sock_sendall(PythonSocket.socket sock, [NotNone] IBufferProtocol data) {
+                IPythonBuffer? buffer = data.GetBuffer();
+                if (!buffer.TryGetArraySegment(writable: false, out ArraySegment<byte> segment)) {
+                    segment = new ArraySegment<byte>(buffer.AsReadOnlySpan().ToArray());
+                    buffer.Dispose();
+                    buffer = null;
+                }
+
+                int offset = segment.Offset;
+                int end = segment.Offset + segment.Count;
+                var args = new SocketAsyncEventArgs();
+                args.SetBuffer(segment.Array, offset, segment.Count);
+                return StartSocketOperation(sock, args, (s, e) => s.SendAsync(e), e => {
+                    offset += e.BytesTransferred;
+                    if (offset >= end) return null;
+                    e.SetBuffer(offset, end - offset);
+                    return _continueOperation;
+                }, buffer);
+            }
+
+            [Documentation("Connect to a remote socket at address.")]
+            public Future sock_connect(PythonSocket.socket sock, [NotNone] PythonTuple address) {
+                var args = new SocketAsyncEventArgs { RemoteEndPoint = sock.ToEndPoint(address) };
+                return StartSocketOperation(sock, args, (s, e) => s.ConnectAsync(e), e => null);
+            }
+
+            [Documentation(@"Accept a connection.
+
+The socket must be bound to an address and listening for connections.
+The return value is a pair (conn, address) where conn is a new socket
+object usable to send and receive data on the connection, and address
+is the address bound to the socket on the other end of the connection.")]
+            public Future sock_accept(PythonSocket.socket sock) {
+                var args = new SocketAsyncEventArgs();
+                return StartSocketOperation(sock, args, (s, e) => s.AcceptAsync(e), e => {
+                    Socket accepted = e.AcceptSocket!;
+                    var wrapped = PythonSocket.socket.FromSocket(sock._context, accepted);
+                    // hand the connection to the class of the listening socket, like socket.accept() does
+                    object? conn = PythonCalls.CallWithKeywordArgs(_context, DynamicHelpers.GetPythonType(sock),
+                        new object?[] { wrapped.family, wrapped.type, wrapped.proto, wrapped }, new[] { "fileno" });
+                    return PythonTuple.MakeTuple(conn, PythonSocket.socket.ToAddress(accepted.RemoteEndPoint!));
+                });
+            }
+
+            [Documentation("Resolve host and port on the thread pool; returns a future for the socket.getaddrinfo() result.")]
+            public Future getaddrinfo(object? host, object? port, int family = 0, int type = 0, int proto = 0, int flags = 0) {
+                string? hostName = host switch {
+                    null => null,
+                    Bytes b => b.MakeString(),
+                    _ => PythonOps.ToString(_context, host),
+                };
+                return RunOnThreadPool(() => PythonSocket.getaddrinfo(_context, hostName, port, family, type, proto, flags));
+            }
+
+            /// <summary>
+            /// Starts an asynchronous socket operation and completes the returned future on the loop thread.
+            /// </summary>
+            /// <param name="start">Starts the operation; returns false if it completed synchronously.</param>
+            /// <param name="complete">Produces the result of a successful operation, or <see cref="_continueOperation"/> to issue it again.</param>
+            /// <param name="resource">Released once the operation is over, e.g. the buffer it works on.</param>
+            private Future StartSocketOperation(PythonSocket.socket sock, SocketAsyncEventArgs args,
+                Func<Socket, SocketAsyncEventArgs, bool> start, Func<SocketAsyncEventArgs, object?> complete, IDisposable? resource = null) {
+                CheckClosed();
+
+                var future = create_future();
+                Socket socket = sock._socket;
+                args.Completed += (_, e) => CallSoonThreadsafe(() => OnCompleted(e));
+                Start();
+                return future;
+
+                void Start() {
+                    bool pending;
+                    try {
+                        pending = start(socket, args);
+                    } catch (Exception e) {
+                        Fail(PythonSocket.MakeException(sock._context, e));
+                        return;
+                    }
+                    if (!pending) OnCompleted(args);
+                }
+
+                void OnCompleted(SocketAsyncEventArgs e) {
+                    if (future.done()) {
+                        // cancelled while the operation was in flight
+                        Release();
+                        return;
+                    }
+                    if (e.SocketError != SocketError.Success) {
+                        Fail(PythonSocket.MakeException(sock._context, new SocketException((int)e.SocketError)));
+                        return;
+                    }
+
+                    object? result;
+                    try {
+                        result = complete(e);
+                    } catch (Exception ex) {
+                        Fail(ex);
+                        return;
+                    }
+                    if (result == _continueOperation) {
+                        Start();
+                    } else {
+                        Release();
+                        future.set_result(result);
+                    }
+                }
+
+                void Fail(Exception e) {
+                    Release();
+                    if (!future.done()) future.set_exception(PythonExceptions.ToPython(e));
+                }
+
+                void Release() {
+                    args.Dispose();
+                    resource?.Dispose();
+                }
+            }
+        }
+    }
+}
+
+#endif
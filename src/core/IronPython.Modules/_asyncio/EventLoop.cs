@@ -0,0 +1,672 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#nullable enable
+
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using System.Text;
+using System.Threading;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Exceptions;
+using IronPython.Runtime.Operations;
+using IronPython.Runtime.Types;
+
+using Microsoft.Scripting.Runtime;
+
+namespace IronPython.Modules.Asyncio {
+    public static partial class AsyncioModule {
+        /// <summary>
+        /// Event loop waiting on timers and on completions posted by .NET asynchronous operations
+        /// instead of polling file descriptors with select.
+        /// </summary>
+        [PythonType]
+        public partial class EventLoop : ICodeFormattable {
+            public const string __doc__ = "Event loop driven by .NET timers, wait handles and asynchronous socket operations.";
+
+            private static readonly double _clockResolution = 1.0 / Stopwatch.Frequency;
+
+            private readonly CodeContext _context;
+            private readonly Queue<Handle> _ready = new Queue<Handle>();
+            // callbacks posted from other threads, moved to _ready by the loop thread
+            private readonly ConcurrentQueue<Handle> _threadsafe = new ConcurrentQueue<Handle>();
+            private readonly AutoResetEvent _wakeup = new AutoResetEvent(false);
+            private readonly SortedSet<TimerHandle> _scheduled = new SortedSet<TimerHandle>(TimerHandle.Comparer);
+            private long _timerSequence;
+            private Thread? _thread;
+            private volatile bool _stopping;
+            private bool _closed;
+            private bool _debug;
+            private object? _exceptionHandler;
+
+            public EventLoop(CodeContext/*!*/ context) {
+                _context = context;
+            }
+
+            internal CodeContext Context => _context;
+
+            internal LoopTasks Tasks { get; } = new LoopTasks();
+
+            #region Running and stopping
+
+            [Documentation("Run until stop() is called.")]
+            public void run_forever() {
+                CheckClosed();
+                if (is_running()) throw PythonOps.RuntimeError("This event loop is already running");
+                if (_get_running_loop() is not null) {
+                    throw PythonOps.RuntimeError("Cannot run the event loop while another loop is running");
+                }
+
+                SynchronizationContext? previousContext = SynchronizationContext.Current;
+                _thread = Thread.CurrentThread;
+                _set_running_loop(this);
+                SynchronizationContext.SetSynchronizationContext(new LoopSynchronizationContext(_context, this));
+                try {
+                    while (true) {
+                        RunOnce();
+                        if (_stopping) break;
+                    }
+                } finally {
+                    _stopping = false;
+                    _thread = null;
+                    _set_running_loop(null);
+                    SynchronizationContext.SetSynchronizationContext(previousContext);
+                }
+            }
+
+            [Documentation(@"Run until the Future is done.
+
+If the argument is a coroutine, it is wrapped in a Task.
+
+Return the Future's result, or raise its exception.")]
+            public object? run_until_complete(object? future) {
+                CheckClosed();
+                if (is_running()) throw PythonOps.RuntimeError("This event loop is already running");
+
+                bool newTask = future is not Future && !IsForeignFuture(future);
+                object fut = EnsureFuture(future);
+
+                Action<object?> onDone = f => {
+                    // SystemExit and KeyboardInterrupt propagate out of run_forever by themselves
+                    if (f is Future nf && !nf.cancelled() && nf._exception is PythonExceptions.BaseException exc
+                        && (exc.GetClrException() is KeyboardInterruptException || exc.GetClrException() is SystemExitException)) {
+                        return;
+                    }
+                    stop();
+                };
+                FutureCall(fut, "add_done_callback", onDone);
+                try {
+                    run_forever();
+                } catch {
+                    if (newTask && IsTrue(FutureCall(fut, "done")) && !IsTrue(FutureCall(fut, "cancelled"))) {
+                        // the exception is propagated to the caller, don't log it again
+                        FutureCall(fut, "exception");
+                    }
+                    throw;
+                } finally {
+                    FutureCall(fut, "remove_done_callback", onDone);
+                }
+
+                if (!IsTrue(FutureCall(fut, "done"))) {
+                    throw PythonOps.RuntimeError("Event loop stopped before Future completed.");
+                }
+                return FutureCall(fut, "result");
+            }
+
+            [Documentation(@"Stop running the event loop.
+
+Every callback already scheduled will still run.  This simply informs
+run_forever to stop looping after a complete iteration.")]
+            public void stop() {
+                _stopping = true;
+                _wakeup.Set();
+            }
+
+            [Documentation("Returns True if the event loop is running.")]
+            public bool is_running() => _thread is not null;
+
+            [Documentation("Returns True if the event loop was closed.")]
+            public bool is_closed() => _closed;
+
+            [Documentation(@"Close the event loop.
+
+This clears the queues; pending callbacks are discarded.
+
+The event loop must not be running.")]
+            public void close() {
+                if (is_running()) throw PythonOps.RuntimeError("Cannot close a running event loop");
+                if (_closed) return;
+
+                _closed = true;
+                _ready.Clear();
+                _scheduled.Clear();
+                while (_threadsafe.TryDequeue(out _)) { }
+            }
+
+            [Documentation("Shutdown all active asynchronous generators.")]
+            public Future shutdown_asyncgens() => CompletedFuture();
+
+            [Documentation("Schedule the shutdown of the default executor.")]
+            public Future shutdown_default_executor() => CompletedFuture();
+
+            private void RunOnce() {
+                DrainThreadsafe();
+
+                int timeout;
+                if (_ready.Count > 0 || _stopping) {
+                    timeout = 0;
+                } else if (_scheduled.Count > 0) {
+                    double wait = Math.Ceiling((_scheduled.Min!.When - time()) * 1000);
+                    timeout = wait <= 0 ? 0 : (int)Math.Min(wait, int.MaxValue);
+                } else {
+                    timeout = Timeout.Infinite;
+                }
+
+                if (timeout != 0) {
+                    _wakeup.WaitOne(timeout);
+                    DrainThreadsafe();
+                }
+
+                double endTime = time() + _clockResolution;
+                while (_scheduled.Count > 0) {
+                    TimerHandle timer = _scheduled.Min!;
+                    if (timer.When >= endTime) break;
+                    _scheduled.Remove(timer);
+                    timer.Scheduled = false;
+                    _ready.Enqueue(timer);
+                }
+
+                // callbacks scheduled by the callbacks below run on the next iteration
+                for (int ntodo = _ready.Count; ntodo > 0; ntodo--) {
+                    Handle handle = _ready.Dequeue();
+                    if (!handle.cancelled()) handle.Run();
+                }
+            }
+
+            private void DrainThreadsafe() {
+                while (_threadsafe.TryDequeue(out Handle? handle)) {
+                    _ready.Enqueue(handle);
+                }
+            }
+
+            private void CheckClosed() {
+                if (_closed) throw PythonOps.RuntimeError("Event loop is closed");
+            }
+
+            #endregion
+
+            #region Scheduling callbacks
+
+            [Documentation("Return the time according to the event loop's clock.")]
+            public double time() => Stopwatch.GetTimestamp() / (double)Stopwatch.Frequency;
+
+            [Documentation(@"Arrange for a callback to be called as soon as possible.
+
+This operates as a FIFO queue: callbacks are called in the
+order in which they are registered.  Each callback will be
+called exactly once.
+
+Any positional arguments after the callback will be passed to
+the callback when it is called.")]
+            public Handle call_soon(object? callback, [NotNone] params object?[] args) {
+                CheckClosed();
+                CheckCallable(callback, nameof(call_soon));
+                return CallSoon(callback, args);
+            }
+
+            [Documentation("Like call_soon(), but thread-safe.")]
+            public Handle call_soon_threadsafe(object? callback, [NotNone] params object?[] args) {
+                CheckClosed();
+                CheckCallable(callback, nameof(call_soon_threadsafe));
+                var handle = new Handle(this, callback, args);
+                Post(handle);
+                return handle;
+            }
+
+            [Documentation(@"Arrange for a callback to be called at a given time.
+
+Return a Handle: an opaque object with a cancel() method that
+can be used to cancel the call.
+
+The delay can be an int or float, expressed in seconds.  It is
+always relative to the current time.
+
+Each callback will be called exactly once.  If two callbacks
+are scheduled for exactly the same time, it is undefined which
+will be called first.
+
+Any positional arguments after the callback will be passed to
+the callback when it is called.")]
+            public TimerHandle call_later(double delay, object? callback, [NotNone] params object?[] args)
+                => call_at(time() + delay, callback, args);
+
+            [Documentation("Like call_later(), but uses an absolute time.\n\nAbsolute time corresponds to the event loop's time() method.")]
+            public TimerHandle call_at(double when, object? callback, [NotNone] params object?[] args) {
+                CheckClosed();
+                CheckCallable(callback, nameof(call_at));
+
+                var timer = new TimerHandle(this, when, ++_timerSequence, callback, args);
+                _scheduled.Add(timer);
+                timer.Scheduled = true;
+                if (!IsLoopThread) _wakeup.Set();
+                return timer;
+            }
+
+            internal Handle CallSoon(object? callback, params object?[] args) {
+                var handle = new Handle(this, callback, args);
+                _ready.Enqueue(handle);
+                return handle;
+            }
+
+            internal void CallSoon(Action action) => _ready.Enqueue(new Handle(this, action, Array.Empty<object?>()));
+
+            /// <summary>
+            /// Schedules <paramref name="action"/> from any thread. Completions of .NET operations come through here.
+            /// </summary>
+            internal void CallSoonThreadsafe(Action action) => Post(new Handle(this, action, Array.Empty<object?>()));
+
+            private void Post(Handle handle) {
+                _threadsafe.Enqueue(handle);
+                _wakeup.Set();
+            }
+
+            internal void TimerCancelled(TimerHandle timer) {
+                if (timer.Scheduled) {
+                    _scheduled.Remove(timer);
+                    timer.Scheduled = false;
+                }
+            }
+
+            private bool IsLoopThread => _thread == Thread.CurrentThread;
+
+            private void CheckCallable(object? callback, string method) {
+                if (!PythonOps.IsCallable(_context, callback)) {
+                    throw PythonOps.TypeError("a callable object was expected by {0}(), got {1}", method, PythonOps.Repr(_context, callback));
+                }
+            }
+
+            #endregion
+
+            #region Futures and tasks
+
+            [Documentation("Create a Future object attached to the loop.")]
+            public Future create_future() => new Future(_context, this);
+
+            [Documentation("Schedule a coroutine object.\n\nReturn a task object.")]
+            public Task create_task(object? coro, object? name = null) {
+                CheckClosed();
+                return new Task(_context, coro, this, name);
+            }
+
+            [Documentation(@"Arrange for func to be called in the specified executor.
+
+If executor is None, the function runs on the .NET thread pool.")]
+            public object run_in_executor(object? executor, object? func, [NotNone] params object?[] args) {
+                CheckClosed();
+                CheckCallable(func, nameof(run_in_executor));
+
+                if (executor is null) {
+                    return RunOnThreadPool(() => PythonCalls.Call(_context, func, args));
+                }
+
+                var submitArgs = new object?[args.Length + 1];
+                submitArgs[0] = func;
+                args.CopyTo(submitArgs, 1);
+                object concurrentFuture = PythonOps.Invoke(_context, executor, "submit", submitArgs)!;
+                return WrapConcurrentFuture(concurrentFuture);
+            }
+
+            /// <summary>
+            /// Runs <paramref name="func"/> on the thread pool and completes the returned future on the loop thread.
+            /// </summary>
+            internal Future RunOnThreadPool(Func<object?> func) {
+                var future = create_future();
+                ThreadPool.QueueUserWorkItem(_ => {
+                    object? result = null;
+                    Exception? error = null;
+                    try {
+                        result = func();
+                    } catch (Exception e) {
+                        error = e;
+                    }
+                    CallSoonThreadsafe(() => {
+                        if (future.done()) return;
+                        if (error is null) {
+                            future.set_result(result);
+                        } else {
+                            future.set_exception(PythonExceptions.ToPython(error));
+                        }
+                    });
+                });
+                return future;
+            }
+
+            private Future WrapConcurrentFuture(object concurrentFuture) {
+                var future = create_future();
+                future.add_done_callback(new Action<object?>(_ => {
+                    if (future.cancelled()) PythonOps.Invoke(_context, concurrentFuture, "cancel");
+                }));
+                PythonOps.Invoke(_context, concurrentFuture, "add_done_callback", new Action<object?>(_ => CallSoonThreadsafe(() => {
+                    if (future.done()) return;
+                    if (IsTrue(PythonOps.Invoke(_context, concurrentFuture, "cancelled"))) {
+                        future.cancel();
+                    } else if (PythonOps.Invoke(_context, concurrentFuture, "exception") is object exc) {
+                        future.set_exception(exc);
+                    } else {
+                        future.set_result(PythonOps.Invoke(_context, concurrentFuture, "result"));
+                    }
+                })));
+                return future;
+            }
+
+            private Future WrapNetTask(System.Threading.Tasks.Task task) {
+                var future = create_future();
+                task.ContinueWith(t => CallSoonThreadsafe(() => {
+                    if (future.done()) return;
+                    if (t.IsCanceled) {
+                        future.cancel();
+                    } else if (t.IsFaulted) {
+                        future.set_exception(PythonExceptions.ToPython(t.Exception!.InnerException ?? t.Exception));
+                    } else {
+                        future.set_result(GetTaskResult(t));
+                    }
+                }), System.Threading.Tasks.TaskContinuationOptions.ExecuteSynchronously);
+                return future;
+
+                static object? GetTaskResult(System.Threading.Tasks.Task t) {
+                    Type type = t.GetType();
+                    if (!type.IsGenericType) return null;
+                    // Task.Run(Action) and friends produce Task<VoidTaskResult>, whose result is meaningless
+                    if (!type.GetGenericArguments()[0].IsVisible) return null;
+                    return type.GetProperty("Result")!.GetValue(t);
+                }
+            }
+
+            /// <summary>
+            /// Returns a future for a future, coroutine, awaitable or .NET task, scheduling coroutines as tasks.
+            /// </summary>
+            internal object EnsureFuture(object? obj) {
+                if (obj is Future future) {
+                    if (future._loop != this) {
+                        throw PythonOps.ValueError("The future belongs to a different loop than the one specified as the loop argument");
+                    }
+                    return future;
+                }
+                if (IsForeignFuture(obj)) return obj!;
+                if (Task.IsCoroutine(obj)) return create_task(obj);
+                if (obj is System.Threading.Tasks.Task task) return WrapNetTask(task);
+                if (PythonOps.TryGetBoundAttr(_context, obj, "__await__", out object? await)) {
+                    object? iterator = PythonCalls.Call(_context, await);
+                    if (Task.IsCoroutine(iterator)) return create_task(iterator);
+                }
+                throw PythonOps.TypeError("An asyncio.Future, a coroutine or an awaitable is required");
+            }
+
+            private bool IsForeignFuture(object? obj)
+                => obj is not Future && PythonOps.TryGetBoundAttr(_context, obj, nameof(Future._asyncio_future_blocking), out object? blocking) && blocking is not null;
+
+            private object? FutureCall(object future, string method, object? arg = null) {
+                if (future is Future f) {
+                    switch (method) {
+                        case "done": return f.done();
+                        case "cancelled": return f.cancelled();
+                        case "result": return f.result();
+                        case "exception": return f.exception();
+                        case "add_done_callback": f.add_done_callback(arg); return null;
+                        case "remove_done_callback": return f.remove_done_callback(arg);
+                    }
+                }
+                return arg is null ? PythonOps.Invoke(_context, future, method) : PythonOps.Invoke(_context, future, method, arg);
+            }
+
+            private static bool IsTrue(object? value) => PythonOps.IsTrue(value);
+
+            private Future CompletedFuture() {
+                var future = create_future();
+                future.set_result(null);
+                return future;
+            }
+
+            #endregion
+
+            #region Error handling
+
+            [Documentation(@"Set handler as the new event loop exception handler.
+
+If handler is None, the default exception handler will
+be set.
+
+If handler is a callable object, it should have a
+signature matching '(loop, context)', where 'loop'
+will be a reference to the active event loop, 'context'
+will be a dict object (see `call_exception_handler()`
+documentation for details about context).")]
+            public void set_exception_handler(object? handler) {
+                if (handler is not null && !PythonOps.IsCallable(_context, handler)) {
+                    throw PythonOps.TypeError("A callable object or None is expected, got {0}", PythonOps.Repr(_context, handler));
+                }
+                _exceptionHandler = handler;
+            }
+
+            [Documentation("Return an exception handler, or None if the default one is in use.")]
+            public object? get_exception_handler() => _exceptionHandler;
+
+            [Documentation(@"Default exception handler.
+
+This is called when an exception occurs and no exception
+handler is set, and can be called by a custom exception
+handler that wants to defer to the default behavior.
+
+The context parameter has the same meaning as in
+`call_exception_handler()`.")]
+            public void default_exception_handler([NotNone] PythonDictionary context) {
+                string message = context.TryGetValue("message", out object? msg) && PythonOps.IsTrue(msg)
+                    ? PythonOps.ToString(_context, msg)
+                    : "Unhandled exception in event loop";
+
+                var text = new StringBuilder(message);
+                foreach (string key in context.Keys.OfType<string>().Where(k => k != "message" && k != "exception").OrderBy(k => k, StringComparer.Ordinal)) {
+                    text.Append('\n').Append(key).Append(": ").Append(PythonOps.Repr(_context, context[key]));
+                }
+                if (context.TryGetValue("exception", out object? exc) && exc is PythonExceptions.BaseException pyExc) {
+                    text.Append('\n').Append(_context.LanguageContext.FormatException(pyExc.GetClrException()));
+                }
+
+                PythonOps.PrintWithDest(_context, _context.LanguageContext.SystemStandardError, text.ToString());
+            }
+
+            [Documentation(@"Call the current event loop's exception handler.
+
+The context argument is a dict containing the following keys:
+
+- 'message': Error message;
+- 'exception' (optional): Exception object;
+- 'future' (optional): Future instance;
+- 'task' (optional): Task instance;
+- 'handle' (optional): Handle instance;
+
+New keys maybe introduced in the future.
+
+Note: do not overload this method in an event loop subclass.
+For custom exception handling, use the
+`set_exception_handler()` method.")]
+            public void call_exception_handler([NotNone] PythonDictionary context) {
+                if (_exceptionHandler is null) {
+                    try {
+                        default_exception_handler(context);
+                    } catch (Exception e) when (!IsFatal(e)) {
+                        // there is nowhere left to report to
+                    }
+                    return;
+                }
+
+                try {
+                    PythonCalls.Call(_context, _exceptionHandler, this, context);
+                } catch (Exception e) when (!IsFatal(e)) {
+                    try {
+                        default_exception_handler(new PythonDictionary {
+                            ["message"] = "Unhandled error in exception handler",
+                            ["exception"] = PythonExceptions.ToPython(e),
+                            ["context"] = context,
+                        });
+                    } catch (Exception inner) when (!IsFatal(inner)) {
+                        // the default handler failed as well
+                    }
+                }
+            }
+
+            internal static bool IsFatal(Exception e) => e is KeyboardInterruptException || e is SystemExitException;
+
+            #endregion
+
+            #region Debug flag
+
+            public bool get_debug() => _debug;
+
+            public void set_debug(bool enabled) {
+                _debug = enabled;
+            }
+
+            #endregion
+
+            public string __repr__(CodeContext/*!*/ context)
+                => $"<{PythonOps.GetPythonTypeName(this)} running={(is_running() ? "True" : "False")} closed={(_closed ? "True" : "False")} debug={(_debug ? "True" : "False")}>";
+        }
+
+        [PythonType]
+        public class Handle : ICodeFormattable {
+            public const string __doc__ = "Object returned by callback registration methods.";
+
+            private protected readonly EventLoop _loop;
+            private object? _callback;
+            private object?[] _args;
+            private bool _cancelled;
+
+            internal Handle(EventLoop loop, object? callback, object?[] args) {
+                _loop = loop;
+                _callback = callback;
+                _args = args;
+            }
+
+            public virtual void cancel() {
+                if (_cancelled) return;
+                _cancelled = true;
+                _callback = null;
+                _args = Array.Empty<object?>();
+            }
+
+            public bool cancelled() => _cancelled;
+
+            internal void Run() {
+                try {
+                    switch (_callback) {
+                        case Action action when _args.Length == 0:
+                            action();
+                            break;
+                        case Action<object?> action when _args.Length == 1:
+                            action(_args[0]);
+                            break;
+                        default:
+                            PythonCalls.Call(_loop.Context, _callback, _args);
+                            break;
+                    }
+                } catch (Exception e) when (!EventLoop.IsFatal(e)) {
+                    _loop.call_exception_handler(new PythonDictionary {
+                        ["message"] = $"Exception in callback {DescribeCallback()}",
+                        ["exception"] = PythonExceptions.ToPython(e),
+                        ["handle"] = this,
+                    });
+                }
+            }
+
+            private string DescribeCallback() {
+                CodeContext context = _loop.Context;
+                string args = string.Join(", ", _args.Select(arg => PythonOps.Repr(context, arg)));
+                return _callback is Delegate ? $"<internal>({args})" : $"{PythonOps.Repr(context, _callback)}({args})";
+            }
+
+            public virtual string __repr__(CodeContext/*!*/ context)
+                => _cancelled ? $"<{PythonOps.GetPythonTypeName(this)} cancelled>" : $"<{PythonOps.GetPythonTypeName(this)} {DescribeCallback()}>";
+        }
+
+        [PythonType]
+        public sealed class TimerHandle : Handle {
+            public new const string __doc__ = "Object returned by timed callback registration methods.";
+
+            internal static readonly IComparer<TimerHandle> Comparer = Comparer<TimerHandle>.Create((x, y) => {
+                int res = x.When.CompareTo(y.When);
+                return res != 0 ? res : x._sequence.CompareTo(y._sequence);
+            });
+
+            private readonly long _sequence;
+
+            internal TimerHandle(EventLoop loop, double when, long sequence, object? callback, object?[] args) : base(loop, callback, args) {
+                When = when;
+                _sequence = sequence;
+            }
+
+            internal double When { get; }
+
+            internal bool Scheduled { get; set; }
+
+            [Documentation("Return a scheduled callback time.\n\nThe time is an absolute timestamp, using the same time\nreference as loop.time().")]
+            public double when() => When;
+
+            public override void cancel() {
+                if (!cancelled()) _loop.TimerCancelled(this);
+                base.cancel();
+            }
+
+            public override string __repr__(CodeContext/*!*/ context) {
+                string res = base.__repr__(context);
+                return cancelled() ? res : res.Insert(res.IndexOf(' '), $" when={When.ToString(System.Globalization.CultureInfo.InvariantCulture)}");
+            }
+        }
+
+        /// <summary>
+        /// Resumes awaits of .NET async code on the loop thread by posting continuations to the loop.
+        /// </summary>
+        internal sealed class LoopSynchronizationContext : SynchronizationContext {
+            private readonly CodeContext _context;
+
+            public LoopSynchronizationContext(CodeContext context, object loop) {
+                _context = context;
+                Loop = loop;
+            }
+
+            internal object Loop { get; }
+
+            public override void Post(SendOrPostCallback d, object? state) {
+                Action action = () => d(state);
+                if (Loop is EventLoop loop) {
+                    loop.CallSoonThreadsafe(action);
+                } else {
+                    PythonOps.Invoke(_context, Loop, "call_soon_threadsafe", action);
+                }
+            }
+
+            public override void Send(SendOrPostCallback d, object? state) {
+                if (Current == this) {
+                    d(state);
+                    return;
+                }
+                using var done = new ManualResetEventSlim();
+                Post(s => {
+                    try {
+                        d(s);
+                    } finally {
+                        done.Set();
+                    }
+                }, state);
+                done.Wait();
+            }
+
+            public override SynchronizationContext CreateCopy() => this;
+        }
+    }
+}
@@ -0,0 +1,314 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#nullable enable
+
+using System;
+using System.Collections.Generic;
+using System.Threading.Tasks;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Exceptions;
+using IronPython.Runtime.Operations;
+using IronPython.Runtime.Types;
+
+using Microsoft.Scripting.Runtime;
+
+namespace IronPython.Modules.Asyncio {
+    public static partial class AsyncioModule {
+        [PythonType]
+        public class Future : ICodeFormattable {
+            public const string __doc__ =
+@"This class is *almost* compatible with concurrent.futures.Future.
+
+    Differences:
+
+    - result() and exception() do not take a timeout argument and
+      raise an exception when the future isn't done yet.
+
+    - Callbacks registered with add_done_callback() are always called
+      via the event loop's call_soon_threadsafe().
+
+    - This class is not compatible with the wait() and as_completed()
+      methods in the concurrent.futures package.";
+
+            internal const string PENDING = "PENDING";
+            internal const string CANCELLED = "CANCELLED";
+            internal const string FINISHED = "FINISHED";
+
+            private protected readonly CodeContext _context;
+            private readonly object _eventLoop;
+            private string _status = PENDING;
+            private object? _value;
+            private PythonExceptions.BaseException? _error;
+            private object? _cancelMessage;
+            private List<object?>? _callbacks;
+            // completed together with the future, lets .NET code (and awaiting coroutines) wait without a Python callback
+            private TaskCompletionSource<object?>? _completion;
+
+            public Future(CodeContext/*!*/ context, object? loop = null) {
+                _context = context;
+                _eventLoop = loop ?? get_event_loop(context);
+            }
+
+            #region Public API
+
+            public object _loop => _eventLoop;
+
+            public string _state => _status;
+
+            public object? _result => _value;
+
+            public object? _exception => _error;
+
+            public object? _source_traceback => null;
+
+            public bool _log_traceback { get; set; }
+
+            public bool _asyncio_future_blocking { get; set; }
+
+            [Documentation(@"Return the result this future represents.
+
+If the future has been cancelled, raises CancelledError.  If the
+future's result isn't yet available, raises InvalidStateError.  If
+the future is done and has an exception set, this exception is raised.")]
+            public object? result() {
+                if (_status == CANCELLED) throw MakeCancelledError();
+                if (_status != FINISHED) throw MakeInvalidStateError("Result is not ready.");
+
+                _log_traceback = false;
+                if (_error is not null) throw _error.GetClrException();
+                return _value;
+            }
+
+            [Documentation(@"Return the exception that was set on this future.
+
+The exception (or None if no exception was set) is returned only if
+the future is done.  If the future has been cancelled, raises
+CancelledError.  If the future isn't done yet, raises
+InvalidStateError.")]
+            public object? exception() {
+                if (_status == CANCELLED) throw MakeCancelledError();
+                if (_status != FINISHED) throw MakeInvalidStateError("Exception is not set.");
+
+                _log_traceback = false;
+                return _error;
+            }
+
+            [Documentation(@"Mark the future done and set its result.
+
+If the future is already done when this method is called, raises
+InvalidStateError.")]
+            public void set_result(object? result) {
+                if (_status != PENDING) throw MakeInvalidStateError("invalid state");
+
+                _value = result;
+                _status = FINISHED;
+                ScheduleCallbacks();
+            }
+
+            [Documentation(@"Mark the future done and set an exception.
+
+If the future is already done when this method is called, raises
+InvalidStateError.")]
+            public void set_exception(object? exception) {
+                if (_status != PENDING) throw MakeInvalidStateError("invalid state");
+
+                if (exception is PythonType type) {
+                    exception = PythonCalls.Call(_context, type);
+                }
+                if (exception is not PythonExceptions.BaseException exc) {
+                    throw PythonOps.TypeError("invalid exception object");
+                }
+                if (exc is PythonExceptions._StopIteration) {
+                    throw PythonOps.TypeError("StopIteration interacts badly with generators and cannot be raised into a Future");
+                }
+
+                _error = exc;
+                _status = FINISHED;
+                _log_traceback = true;
+                ScheduleCallbacks();
+            }
+
+            [Documentation(@"Cancel the future and schedule callbacks.
+
+If the future is already done or cancelled, return False.  Otherwise,
+change the future's state to cancelled, schedule the callbacks and
+return True.")]
+            public virtual bool cancel(object? msg = null) => CancelFuture(msg);
+
+            [Documentation("Return True if the future was cancelled.")]
+            public bool cancelled() => _status == CANCELLED;
+
+            [Documentation(@"Return True if the future is done.
+
+Done means either that a result / exception are available, or that the
+future was cancelled.")]
+            public bool done() => _status != PENDING;
+
+            [Documentation("Return the event loop the Future is bound to.")]
+            public object get_loop() => _eventLoop;
+
+            [Documentation(@"Add a callback to be run when the future becomes done.
+
+The callback is called with a single argument - the future object. If
+the future is already done when this is called, the callback is
+scheduled with call_soon.")]
+            public void add_done_callback(object? fn, object? context = null) {
+                if (_status != PENDING) {
+                    ScheduleCallback(fn);
+                } else {
+                    (_callbacks ??= new List<object?>()).Add(fn);
+                }
+            }
+
+            [Documentation(@"Remove all instances of a callback from the ""call when done"" list.
+
+Returns the number of callbacks removed.")]
+            public int remove_done_callback(object? fn) {
+                if (_callbacks is null) return 0;
+                return _callbacks.RemoveAll(cb => ReferenceEquals(cb, fn) || PythonOps.EqualRetBool(_context, cb, fn));
+            }
+
+            public virtual PythonList _repr_info() {
+                var info = new PythonList();
+                info.append(_status.ToLowerInvariant());
+                if (_status == FINISHED) {
+                    if (_error is not null) {
+                        info.append("exception=" + PythonOps.Repr(_context, _error));
+                    } else {
+                        info.append("result=" + PythonOps.Repr(_context, _value));
+                    }
+                }
+                if (_callbacks is { Count: > 0 }) {
+                    info.append($"cb=[{string.Join(", ", _callbacks.ConvertAll(cb => PythonOps.Repr(_context, cb)))}]");
+                }
+                return info;
+            }
+
+            public virtual string __repr__(CodeContext/*!*/ context) {
+                var info = PythonOps.Invoke(context, this, nameof(_repr_info));
+                return $"<{PythonOps.GetPythonTypeName(this)} {PythonOps.Invoke(context, " ", "join", info)}>";
+            }
+
+            public FutureIter __await__() => new FutureIter(this);
+
+            public FutureIter __iter__() => new FutureIter(this);
+
+            #endregion
+
+            #region Internal implementation
+
+            private Exception MakeCancelledError() => MakeCancelledError(_cancelMessage);
+
+            private protected static Exception MakeCancelledError(object? msg)
+                => msg is null ? PythonOps.CreateThrowable(CancelledError) : PythonOps.CreateThrowable(CancelledError, msg);
+
+            private protected bool CancelFuture(object? msg) {
+                _log_traceback = false;
+                if (_status != PENDING) return false;
+
+                _status = CANCELLED;
+                _cancelMessage = msg;
+                ScheduleCallbacks();
+                return true;
+            }
+
+            private void ScheduleCallbacks() {
+                _completion?.TrySetResult(null);
+
+                var callbacks = _callbacks;
+                if (callbacks is null) return;
+                _callbacks = null;
+                foreach (object? cb in callbacks) {
+                    ScheduleCallback(cb);
+                }
+            }
+
+            private void ScheduleCallback(object? callback) {
+                if (_eventLoop is EventLoop loop) {
+                    loop.CallSoon(callback, this);
+                } else {
+                    PythonOps.Invoke(_context, _eventLoop, "call_soon", callback, this);
+                }
+            }
+
+            private protected void CallSoon(Action action) {
+                if (_eventLoop is EventLoop loop) {
+                    loop.CallSoon(action);
+                } else {
+                    PythonOps.Invoke(_context, _eventLoop, "call_soon", action);
+                }
+            }
+
+            private protected void CallSoonThreadsafe(Action action) {
+                if (_eventLoop is EventLoop loop) {
+                    loop.CallSoonThreadsafe(action);
+                } else {
+                    PythonOps.Invoke(_context, _eventLoop, "call_soon_threadsafe", action);
+                }
+            }
+
+            /// <summary>
+            /// Returns a .NET task that completes (without a result) once this future is done.
+            /// </summary>
+            internal Task<object?> AsNetTask() {
+                if (_completion is null) {
+                    _completion = new TaskCompletionSource<object?>(TaskCreationOptions.RunContinuationsAsynchronously);
+                    if (_status != PENDING) _completion.TrySetResult(null);
+                }
+                return _completion.Task;
+            }
+
+            #endregion
+        }
+
+        [PythonType]
+        public sealed class FutureIter {
+            private Future? _future;
+
+            internal FutureIter(Future future) {
+                _future = future;
+            }
+
+            public FutureIter __iter__() => this;
+
+            [LightThrowing]
+            public object? __next__() => send(null);
+
+            [LightThrowing]
+            public object? send(object? value) {
+                Future? future = _future;
+                if (future is null) {
+                    return LightExceptions.Throw(new PythonExceptions._StopIteration().InitAndGetClrException());
+                }
+
+                if (!future.done()) {
+                    future._asyncio_future_blocking = true;
+                    if (CurrentTask is Task task) task.FutureWaiter = future;
+#if FEATURE_NET_ASYNC
+                    // Coroutines compiled to .NET tasks await whatever is yielded here; yielding the
+                    // future itself would send them straight back into this iterator.
+                    return future.AsNetTask();
+#else
+                    return future;
+#endif
+                }
+
+                _future = null;
+                object? res = future.result();
+                return LightExceptions.Throw(new PythonExceptions._StopIteration().InitAndGetClrException(res!));
+            }
+
+            public object? @throw(CodeContext/*!*/ context, object? type, object? value = null, object? traceback = null) {
+                _future = null;
+                throw PythonOps.MakeExceptionForGenerator(context, type, value, traceback, cause: null);
+            }
+
+            public void close() {
+                _future = null;
+            }
+        }
+    }
+}
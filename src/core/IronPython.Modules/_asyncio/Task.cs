@@ -0,0 +1,335 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#nullable enable
+
+using System;
+using System.Runtime.ExceptionServices;
+using System.Threading;
+using System.Threading.Tasks;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Exceptions;
+using IronPython.Runtime.Operations;
+using IronPython.Runtime.Types;
+
+using Microsoft.Scripting.Runtime;
+
+namespace IronPython.Modules.Asyncio {
+    public static partial class AsyncioModule {
+        [PythonType]
+        public class Task : Future {
+            public new const string __doc__ = "A coroutine wrapped in a Future.";
+
+            private static int _taskCounter;
+
+            private readonly object _coroutine;
+            private string _name;
+            private bool _mustCancel;
+            private object? _cancelRequestMessage;
+#if FEATURE_NET_ASYNC
+            // set once the body of a natively driven coroutine has been started
+            private bool _started;
+#endif
+
+            public Task(CodeContext/*!*/ context, object? coro, object? loop = null, object? name = null) : base(context, loop) {
+                if (!IsCoroutine(coro)) {
+                    throw PythonOps.TypeError("a coroutine was expected, got {0}", PythonOps.Repr(context, coro));
+                }
+
+                _coroutine = coro!;
+                _name = name is null ? $"Task-{Interlocked.Increment(ref _taskCounter)}" : PythonOps.ToString(context, name);
+                CallSoon(Step);
+                GetLoopTasks(_loop).Add(this);
+            }
+
+            #region Public API
+
+            public object _coro => _coroutine;
+
+            public object? _fut_waiter => FutureWaiter;
+
+            public bool _must_cancel => _mustCancel;
+
+            public bool _log_destroy_pending { get; set; } = true;
+
+            [Documentation("Return the coroutine object wrapped by the Task.")]
+            public object get_coro() => _coroutine;
+
+            [Documentation("Return the name of the Task.")]
+            public string get_name() => _name;
+
+            [Documentation("Set the name of the Task.")]
+            public void set_name(CodeContext/*!*/ context, object? value) {
+                _name = PythonOps.ToString(context, value);
+            }
+
+            [Documentation(@"Return the list of stack frames for this task's coroutine.
+
+Coroutines compiled to .NET tasks do not expose their frames, so the
+list is empty for them.")]
+            public PythonList get_stack(object? limit = null) {
+                var frames = new PythonList();
+                if (!done() && (PythonOps.TryGetBoundAttr(_context, _coroutine, "cr_frame", out object? frame)
+                    || PythonOps.TryGetBoundAttr(_context, _coroutine, "gi_frame", out frame)) && frame is not null) {
+                    frames.append(frame);
+                }
+                return frames;
+            }
+
+            [Documentation(@"Request that this task cancel itself.
+
+This arranges for a CancelledError to be thrown into the
+wrapped coroutine on the next cycle through the event loop.
+The coroutine then has a chance to clean up or even deny
+the request using try/except/finally.
+
+Unlike Future.cancel, this does not guarantee that the
+task will be cancelled: the exception might be caught and
+acted upon, delaying cancellation of the task or preventing
+cancellation completely.  The task may also return a value or
+raise a different exception.
+
+Immediately after this method is called, Task.cancelled() will
+not return True (unless the task was already cancelled).  A
+task will be marked as cancelled when the wrapped coroutine
+terminates with a CancelledError exception (even if cancel()
+was not called).")]
+            public override bool cancel(object? msg = null) {
+                _log_traceback = false;
+                if (done()) return false;
+
+                object? waiter = FutureWaiter;
+                if (waiter is Future f ? f.cancel(msg) : waiter is not null && PythonOps.IsTrue(PythonOps.Invoke(_context, waiter, "cancel", msg))) {
+                    // the wakeup throws CancelledError into the coroutine
+                    return true;
+                }
+
+                _mustCancel = true;
+                _cancelRequestMessage = msg;
+#if FEATURE_NET_ASYNC
+                if (_started && _coroutine is PythonCoroutine coro && coro.Cancel(MakeCancelledError(msg))) {
+                    _mustCancel = false;
+                }
+#endif
+                return true;
+            }
+
+            public override PythonList _repr_info() {
+                PythonList info = base._repr_info();
+                if (_mustCancel) info[0] = "cancelling";
+                info.insert(1, "name=" + PythonOps.Repr(_context, _name));
+                info.insert(2, $"coro=<{PythonOps.Repr(_context, _coroutine).TrimStart('<').TrimEnd('>')}>");
+                if (FutureWaiter is object waiter) info.insert(3, "wait_for=" + PythonOps.Repr(_context, waiter));
+                return info;
+            }
+
+            #endregion
+
+            #region Stepping
+
+            /// <summary>
+            /// The future the coroutine is currently blocked on, if any.
+            /// </summary>
+            internal object? FutureWaiter { get; set; }
+
+            internal static bool IsCoroutine(object? obj)
+                => obj is PythonCoroutine || obj is PythonGenerator
+                    || PythonOps.TryGetBoundAttr(obj, "send", out _) && PythonOps.TryGetBoundAttr(obj, "throw", out _);
+
+            private void Step() => Step(null);
+
+            private void Step(PythonExceptions.BaseException? exc) {
+                if (done()) {
+                    throw MakeInvalidStateError($"_step(): already done: {PythonOps.Repr(_context, this)}, {PythonOps.Repr(_context, exc)}");
+                }
+                if (_mustCancel) {
+                    if (exc is null || !PythonOps.IsInstance(_context, exc, CancelledError)) {
+                        exc = PythonExceptions.ToPython(MakeCancelledError(_cancelRequestMessage));
+                    }
+                    _mustCancel = false;
+                }
+                FutureWaiter = null;
+
+#if FEATURE_NET_ASYNC
+                if (_coroutine is PythonCoroutine coro) {
+                    StepNative(coro, exc);
+                    return;
+                }
+#endif
+
+                object? result;
+                _enter_task(_loop, this);
+                Task? previous = CurrentTask;
+                CurrentTask = this;
+                try {
+                    result = exc is null ? Send() : Throw(exc);
+                    if (LightExceptions.IsLightException(result)) throw LightExceptions.GetLightException(result!);
+                } catch (StopIterationException e) {
+                    if (_mustCancel) {
+                        _mustCancel = false;
+                        CancelFuture(_cancelRequestMessage);
+                    } else {
+                        set_result(((IPythonAwareException)e).PythonException is PythonExceptions._StopIteration si ? si.value : null);
+                    }
+                    return;
+                } catch (Exception e) {
+                    if (!Finish(e)) throw;
+                    return;
+                } finally {
+                    CurrentTask = previous;
+                    _leave_task(_loop, this);
+                }
+
+                HandleYield(result);
+            }
+
+            private object? Send() => _coroutine switch {
+                PythonGenerator gen => gen.send(null),
+#if !FEATURE_NET_ASYNC
+                PythonCoroutine coro => coro.send(null),
+#endif
+                _ => PythonOps.Invoke(_context, _coroutine, "send", null),
+            };
+
+            private object? Throw(PythonExceptions.BaseException exc) => _coroutine switch {
+                PythonGenerator gen => gen.@throw(exc),
+#if !FEATURE_NET_ASYNC
+                PythonCoroutine coro => coro.@throw(exc),
+#endif
+                _ => PythonOps.Invoke(_context, _coroutine, "throw", exc),
+            };
+
+            /// <summary>
+            /// Completes the task with an exception raised out of its coroutine.
+            /// Returns false if the exception must propagate out of the event loop.
+            /// </summary>
+            private bool Finish(Exception e) {
+                if (e is OperationCanceledException) {
+                    CancelFuture(_cancelRequestMessage);
+                    return true;
+                }
+                set_exception(PythonExceptions.ToPython(e));
+                return !(e is KeyboardInterruptException || e is SystemExitException);
+            }
+
+            private void HandleYield(object? result) {
+                if (result is null) {
+                    // bare yield relinquishes control for one event loop iteration
+                    CallSoon(Step);
+                } else if (result is System.Threading.Tasks.Task awaited) {
+                    // a .NET task yielded by a task awaitable or by a future under .NET async
+                    awaited.ContinueWith(_ => CallSoonThreadsafe(Step), TaskContinuationOptions.ExecuteSynchronously);
+                } else if (result is Future || PythonOps.TryGetBoundAttr(_context, result, nameof(_asyncio_future_blocking), out object? blocking) && blocking is not null) {
+                    WaitFor(result);
+                } else if (result is PythonGenerator) {
+                    CallSoon(() => Step(MakeRuntimeError($"yield was used instead of yield from for generator in task {PythonOps.Repr(_context, this)} with {PythonOps.Repr(_context, result)}")));
+                } else {
+                    CallSoon(() => Step(MakeRuntimeError($"Task got bad yield: {PythonOps.Repr(_context, result)}")));
+                }
+            }
+
+            private void WaitFor(object future) {
+                Future? native = future as Future;
+                bool blocking = native?._asyncio_future_blocking ?? PythonOps.IsTrue(PythonOps.GetBoundAttr(_context, future, nameof(_asyncio_future_blocking)));
+                if (!blocking) {
+                    CallSoon(() => Step(MakeRuntimeError($"yield was used instead of yield from in task {PythonOps.Repr(_context, this)} with {PythonOps.Repr(_context, future)}")));
+                    return;
+                }
+
+                object futureLoop = native?.get_loop() ?? PythonOps.Invoke(_context, future, "get_loop")!;
+                if (futureLoop != _loop) {
+                    CallSoon(() => Step(MakeRuntimeError($"Task {PythonOps.Repr(_context, this)} got Future {PythonOps.Repr(_context, future)} attached to a different loop")));
+                } else if (future == this) {
+                    CallSoon(() => Step(MakeRuntimeError($"Task cannot await on itself: {PythonOps.Repr(_context, this)}")));
+                } else {
+                    Action<object?> wakeup = Wakeup;
+                    if (native is not null) {
+                        native._asyncio_future_blocking = false;
+                        native.add_done_callback(wakeup);
+                    } else {
+                        PythonOps.SetAttr(_context, future, nameof(_asyncio_future_blocking), false);
+                        PythonOps.Invoke(_context, future, "add_done_callback", wakeup);
+                    }
+                    FutureWaiter = future;
+                    if (_mustCancel && (native?.cancel(_cancelRequestMessage) ?? PythonOps.IsTrue(PythonOps.Invoke(_context, future, "cancel", _cancelRequestMessage)))) {
+                        _mustCancel = false;
+                    }
+                }
+            }
+
+            private void Wakeup(object? future) {
+                try {
+                    if (future is Future f) {
+                        f.result();
+                    } else {
+                        PythonOps.Invoke(_context, future, "result");
+                    }
+                } catch (Exception e) {
+                    Step(PythonExceptions.ToPython(e));
+                    return;
+                }
+                Step(null);
+            }
+
+            private PythonExceptions.BaseException MakeRuntimeError(string message)
+                => PythonExceptions.ToPython(PythonOps.RuntimeError("{0}", message));
+
+#if FEATURE_NET_ASYNC
+            /// <summary>
+            /// Starts a coroutine compiled to a .NET task. Its awaits resume on the loop thread through the
+            /// synchronization context of the loop, so the body never runs concurrently with loop callbacks.
+            /// </summary>
+            private void StepNative(PythonCoroutine coro, PythonExceptions.BaseException? exc) {
+                if (exc is not null) {
+                    // cancelled before the body ever ran; like throwing into a fresh coroutine, the body is skipped
+                    Finish(exc.GetClrException());
+                    return;
+                }
+
+                _started = true;
+                Task<object?> body;
+                SynchronizationContext? previousContext = SynchronizationContext.Current;
+                bool installContext = previousContext is not LoopSynchronizationContext loopContext || loopContext.Loop != _loop;
+                if (installContext) SynchronizationContext.SetSynchronizationContext(new LoopSynchronizationContext(_context, _loop));
+
+                _enter_task(_loop, this);
+                Task? previous = CurrentTask;
+                CurrentTask = this;
+                try {
+                    body = coro.AsTask();
+                } finally {
+                    CurrentTask = previous;
+                    _leave_task(_loop, this);
+                    if (installContext) SynchronizationContext.SetSynchronizationContext(previousContext);
+                }
+
+                if (body.IsCompleted) {
+                    Complete(body);
+                } else {
+                    body.ContinueWith(t => CallSoonThreadsafe(() => Complete(t)), TaskContinuationOptions.ExecuteSynchronously);
+                }
+            }
+
+            private void Complete(Task<object?> body) {
+                if (done()) return;
+
+                if (body.IsCanceled) {
+                    CancelFuture(_cancelRequestMessage);
+                } else if (body.IsFaulted) {
+                    Exception e = body.Exception!.InnerException ?? body.Exception;
+                    if (!Finish(e)) ExceptionDispatchInfo.Capture(e).Throw();
+                } else if (_mustCancel) {
+                    _mustCancel = false;
+                    CancelFuture(_cancelRequestMessage);
+                } else {
+                    set_result(body.Result);
+                }
+            }
+#endif
+
+            #endregion
+        }
+    }
+}
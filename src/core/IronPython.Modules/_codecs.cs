@@ -480,37 +480,12 @@ namespace IronPython.Modules {
 
         public static PythonTuple utf_8_decode(CodeContext context, [NotNone] IBufferProtocol input, string? errors = null, bool final = false) {
             using IPythonBuffer buffer = input.GetBuffer();
-            return DoDecode(context, "utf-8", Utf8Encoding, buffer, errors, NumEligibleUtf8Bytes(buffer.AsReadOnlySpan(), final)).ToPythonTuple();
+            return DoDecode(context, "utf-8", Utf8Encoding, buffer, errors, StringOps.NumEligibleUtf8Bytes(buffer.AsReadOnlySpan(), final)).ToPythonTuple();
         }
 
         public static PythonTuple utf_8_encode(CodeContext context, [NotNone] string input, string? errors = null)
             => DoEncode(context, "utf-8", Encoding.UTF8, input, errors).ToPythonTuple();
 
-        private static int NumEligibleUtf8Bytes(ReadOnlySpan<byte> input, bool final) {
-            int numBytes = input.Length;
-            if (!final) {
-                // scan for incomplete but valid sequence at the end
-                for (int i = 1; i < 4; i++) { // 4 is the max length of a valid sequence
-                    int pos = numBytes - i;
-                    if (pos < 0) break;
-
-                    byte b = input[pos];
-                    if ((b & 0b10000000) == 0) return numBytes; // ASCII
-                    if ((b & 0b11000000) == 0b11000000) { // start byte
-                        if ((b | 0b00011111) == 0b11011111 && i < 2) return pos; // 2-byte seq start
-                        if ((b | 0b00001111) == 0b11101111 && i < 3) return pos; // 3-byte seq start
-                        if ((b | 0b00000111) == 0b11110111) { // 4-byte seq start
-                            if (b < 0b11110100) return pos; // chars up to U+FFFFF
-                            if ((b == 0b11110100) && (i == 1 || input[numBytes - i + 1] < 0x90)) return pos; // U+100000 to U+10FFFF
-                        }
-                        return numBytes; // invalid sequence or valid but complete
-                    }
-                    // else continuation byte (0b10xxxxxx) hence continue scanning
-                }
-            }
-            return numBytes;
-        }
-
         #endregion
 
         #region Utf-32 Functions
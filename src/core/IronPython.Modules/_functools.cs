@@ -6,7 +6,9 @@
 
 using System;
 using System.Collections;
+using System.Collections.Concurrent;
 using System.Collections.Generic;
+using System.Numerics;
 using System.Runtime.CompilerServices;
 using System.Text;
 using System.Threading;
@@ -351,5 +353,258 @@ namespace IronPython.Modules {
 
             #endregion
         }
+
+        /// <summary>
+        /// Native implementation of the wrapper created by functools.lru_cache.
+        ///
+        /// Results are kept in a concurrent dictionary so looking them up never takes a lock.  For
+        /// bounded caches the recency order is tracked in a doubly linked list, the lock guarding it
+        /// is only held for the constant time list updates and never while hashing or comparing
+        /// keys or calling the wrapped function.
+        /// </summary>
+        [PythonType]
+        public class _lru_cache_wrapper : PythonTypeSlot, IWeakReferenceable {
+            private static readonly object _kwdMark = new object();                                // separates positional from keyword arguments in keys
+
+            private readonly object? _func;                                                         // the wrapped function
+            private readonly int _maxSize;                                                          // the maximum cache size, -1 if unbounded
+            private readonly bool _typed;                                                           // arguments of different types are cached separately
+            private readonly object? _cacheInfoType;                                                // the type returned by cache_info
+            private readonly ConcurrentDictionary<object, Node> _cache;                             // the cached results
+            private readonly Node _root = new Node(null, null);                                     // sentinel of the recency list, the oldest entry is _root.Next
+            private readonly object _lock = new object();                                           // guards the recency list
+            private int _count;                                                                     // number of entries in the recency list
+            private long _hits, _misses;
+            private WeakRefTracker? _tracker;                                                       // tracker so users can use Python weak references
+
+            public _lru_cache_wrapper(CodeContext/*!*/ context, object? user_function, object? maxsize, object? typed, object? cache_info_type) {
+                if (!PythonOps.IsCallable(context, user_function)) {
+                    throw PythonOps.TypeError("the first argument must be callable");
+                }
+
+                if (maxsize is null) {
+                    _maxSize = -1;
+                } else if (PythonOps.TryToIndex(maxsize, out BigInteger size)) {
+                    // a cache can't hold more than int.MaxValue entries, larger sizes are never reached
+                    _maxSize = size < 0 ? 0 : size > int.MaxValue ? int.MaxValue : (int)size;
+                } else {
+                    throw PythonOps.TypeError("maxsize should be integer or None");
+                }
+
+                _func = user_function;
+                _typed = PythonOps.IsTrue(typed);
+                _cacheInfoType = cache_info_type;
+                _cache = new ConcurrentDictionary<object, Node>(context.LanguageContext.EqualityComparer);
+                _root.Prev = _root.Next = _root;
+            }
+
+            #region Public Python API
+
+            public PythonDictionary __dict__ { get; } = new PythonDictionary();
+
+            public object cache_info(CodeContext/*!*/ context) {
+                return PythonCalls.Call(context, _cacheInfoType,
+                    Interlocked.Read(ref _hits),
+                    Interlocked.Read(ref _misses),
+                    _maxSize < 0 ? null : (object)_maxSize,
+                    _cache.Count);
+            }
+
+            public void cache_clear() {
+                lock (_lock) {
+                    _cache.Clear();
+                    // a concurrent hit may still hold one of the nodes, unlink them all so it sees
+                    // them as evicted instead of relinking their stale neighbours
+                    for (Node node = _root.Next!; node != _root;) {
+                        Node next = node.Next!;
+                        node.Prev = node.Next = null;
+                        node = next;
+                    }
+                    _root.Prev = _root.Next = _root;
+                    _count = 0;
+                    Interlocked.Exchange(ref _hits, 0);
+                    Interlocked.Exchange(ref _misses, 0);
+                }
+            }
+
+            public object __reduce__(CodeContext/*!*/ context) {
+                return PythonOps.GetBoundAttr(context, this, "__qualname__");
+            }
+
+            public object __copy__() => this;
+
+            public object __deepcopy__(object? memo) => this;
+
+            #endregion
+
+            #region Operator methods
+
+            [SpecialName]
+            public object? Call(CodeContext/*!*/ context, [NotNone] params object?[] args)
+                => CallWorker(context, args, null);
+
+            [SpecialName]
+            public object? Call(CodeContext/*!*/ context, [ParamDictionary] IDictionary<object, object?> dict, [NotNone] params object?[] args)
+                => CallWorker(context, args, dict);
+
+            [SpecialName]
+            public object GetCustomMember([NotNone] string name) {
+                return __dict__.get(name, OperationFailed.Value);
+            }
+
+            [SpecialName]
+            public void SetMember([NotNone] string name, object? value) {
+                __dict__[name] = value;
+            }
+
+            [SpecialName]
+            public void DeleteMember([NotNone] string name) {
+                __dict__.__delitem__(name);
+            }
+
+            #endregion
+
+            #region Internal implementation details
+
+            internal override bool TryGetValue(CodeContext context, object instance, PythonType owner, out object value) {
+                // bind like a function so methods can be cached
+                value = instance == null ? this : new Method(this, instance);
+                return true;
+            }
+
+            internal override bool GetAlwaysSucceeds => true;
+
+            private object? CallWorker(CodeContext/*!*/ context, object?[] args, IDictionary<object, object?>? dict) {
+                if (_maxSize == 0) {
+                    Interlocked.Increment(ref _misses);
+                    return Invoke(context, args, dict);
+                }
+
+                object key = MakeKey(args, dict);
+                if (_cache.TryGetValue(key, out Node? node)) {
+                    Interlocked.Increment(ref _hits);
+                    if (_maxSize > 0) {
+                        lock (_lock) {
+                            // the entry may have been evicted since we found it
+                            if (node.Next != null) {
+                                Unlink(node);
+                                Append(node);
+                            }
+                        }
+                    }
+                    return node.Result;
+                }
+
+                Interlocked.Increment(ref _misses);
+                object? result = Invoke(context, args, dict);
+
+                node = new Node(key, result);
+                if (!_cache.TryAdd(key, node)) {
+                    // another thread cached the same call while we were computing it
+                    return result;
+                }
+
+                if (_maxSize > 0) {
+                    Node? evicted = null;
+                    lock (_lock) {
+                        Append(node);
+                        if (++_count > _maxSize) {
+                            evicted = _root.Next!;
+                            Unlink(evicted);
+                            _count--;
+                        }
+                    }
+                    if (evicted != null) {
+                        // only remove the evicted node, the key may have been cached again since it was unlinked
+                        ((ICollection<KeyValuePair<object, Node>>)_cache).Remove(new KeyValuePair<object, Node>(evicted.Key!, evicted));
+                    }
+                }
+                return result;
+            }
+
+            private object? Invoke(CodeContext/*!*/ context, object?[] args, IDictionary<object, object?>? dict) {
+                if (dict == null || dict.Count == 0) {
+                    return context.LanguageContext.CallSplat(_func, args);
+                }
+                return context.LanguageContext.CallWithKeywords(_func, args, dict);
+            }
+
+            /// <summary>
+            /// Builds the cache key for a call the same way functools._make_key does.
+            /// </summary>
+            private object MakeKey(object?[] args, IDictionary<object, object?>? dict) {
+                bool hasKeywords = dict != null && dict.Count > 0;
+                if (!hasKeywords && !_typed) {
+                    // a single int or str argument is its own key
+                    if (args.Length == 1 && (args[0] is int || args[0] is BigInteger || args[0] is string)) {
+                        return args[0]!;
+                    }
+                    return PythonTuple.MakeTuple(args);
+                }
+
+                var key = new List<object?>(args);
+                if (hasKeywords) {
+                    key.Add(_kwdMark);
+                    foreach (KeyValuePair<object, object?> kvp in dict!) {
+                        key.Add(kvp.Key);
+                        key.Add(kvp.Value);
+                    }
+                }
+                if (_typed) {
+                    foreach (object? arg in args) {
+                        key.Add(DynamicHelpers.GetPythonType(arg));
+                    }
+                    if (hasKeywords) {
+                        foreach (object? value in dict!.Values) {
+                            key.Add(DynamicHelpers.GetPythonType(value));
+                        }
+                    }
+                }
+                return PythonTuple.MakeTuple(key.ToArray());
+            }
+
+            private void Append(Node node) {
+                Node last = _root.Prev!;
+                node.Prev = last;
+                node.Next = _root;
+                last.Next = node;
+                _root.Prev = node;
+            }
+
+            private static void Unlink(Node node) {
+                node.Prev!.Next = node.Next;
+                node.Next!.Prev = node.Prev;
+                node.Prev = node.Next = null;
+            }
+
+            private sealed class Node {
+                public readonly object? Key;
+                public readonly object? Result;
+                public Node? Prev, Next;
+
+                public Node(object? key, object? result) {
+                    Key = key;
+                    Result = result;
+                }
+            }
+
+            #endregion
+
+            #region IWeakReferenceable Members
+
+            WeakRefTracker? IWeakReferenceable.GetWeakRef() {
+                return _tracker;
+            }
+
+            bool IWeakReferenceable.SetWeakRef(WeakRefTracker value) {
+                return Interlocked.CompareExchange(ref _tracker, value, null) == null;
+            }
+
+            void IWeakReferenceable.SetFinalizer(WeakRefTracker value) {
+                _tracker = value;
+            }
+
+            #endregion
+        }
     }
 }
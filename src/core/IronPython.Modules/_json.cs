@@ -0,0 +1,722 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#nullable enable
+
+using System;
+using System.Collections;
+using System.Collections.Generic;
+using System.Globalization;
+using System.Numerics;
+using System.Text;
+
+using Microsoft.Scripting.Runtime;
+using Microsoft.Scripting.Utils;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Exceptions;
+using IronPython.Runtime.Operations;
+using IronPython.Runtime.Types;
+
+[assembly: PythonModule("_json", typeof(IronPython.Modules.PythonJson))]
+namespace IronPython.Modules {
+    public static class PythonJson {
+        public const string __doc__ = "json speedups\n";
+
+        #region Strings
+
+        [Documentation("scanstring(string, end, strict=True) -> (string, end)\n\n"
+            + "Scan the string s for a JSON string. End is the index of the\n"
+            + "character in s after the quote that started the JSON string.\n"
+            + "Unescapes all valid JSON string escape sequences and raises ValueError\n"
+            + "on attempt to decode an invalid string. If strict is False then literal\n"
+            + "control characters are allowed in the string.\n\n"
+            + "Returns a tuple of the decoded string and the index of the character in s\n"
+            + "after the end quote."
+            )]
+        public static PythonTuple scanstring([NotNone] string @string, int end, bool strict = true) {
+            string res = ScanString(@string, end, strict, out int next);
+            return PythonTuple.MakeTuple(res, next);
+        }
+
+        [Documentation("encode_basestring_ascii(string) -> string\n\nReturn an ASCII-only JSON representation of a Python string")]
+        public static string encode_basestring_ascii(object? s) {
+            return EncodeString(new StringBuilder(), GetString(s), asciiOnly: true).ToString();
+        }
+
+        [Documentation("encode_basestring(string) -> string\n\nReturn a JSON representation of a Python string")]
+        public static string encode_basestring(object? s) {
+            return EncodeString(new StringBuilder(), GetString(s), asciiOnly: false).ToString();
+        }
+
+        private static string GetString(object? s) {
+            if (s is string str) return str;
+            if (s is Extensible<string> es) return es.Value;
+            throw PythonOps.TypeError("first argument must be a string, not {0}", PythonOps.GetPythonTypeName(s));
+        }
+
+        private static StringBuilder EncodeString(StringBuilder sb, string s, bool asciiOnly) {
+            sb.Append('"');
+            int start = 0;
+            for (int i = 0; i < s.Length; i++) {
+                char c = s[i];
+                if (c >= ' ' && c != '"' && c != '\\' && (c < 0x7f || !asciiOnly)) continue;
+
+                // copy the run of characters that don't need escaping in one go
+                sb.Append(s, start, i - start);
+                start = i + 1;
+                switch (c) {
+                    case '"': sb.Append("\\\""); break;
+                    case '\\': sb.Append("\\\\"); break;
+                    case '\n': sb.Append("\\n"); break;
+                    case '\r': sb.Append("\\r"); break;
+                    case '\t': sb.Append("\\t"); break;
+                    case '\b': sb.Append("\\b"); break;
+                    case '\f': sb.Append("\\f"); break;
+                    default:
+                        // surrogate pairs are escaped as two code units, like CPython does
+                        sb.Append("\\u").Append(((int)c).ToString("x4", CultureInfo.InvariantCulture));
+                        break;
+                }
+            }
+            sb.Append(s, start, s.Length - start);
+            return sb.Append('"');
+        }
+
+        private static string ScanString(string s, int end, bool strict, out int next) {
+            int begin = end - 1;
+            if (end < 0 || end > s.Length) {
+                throw PythonOps.ValueError("end is out of bounds");
+            }
+
+            StringBuilder? sb = null;
+            int chunkStart = end;
+            while (true) {
+                // find the end of the run of plain characters
+                int i = end;
+                for (; i < s.Length; i++) {
+                    char c = s[i];
+                    if (c == '"' || c == '\\') break;
+                    if (c < ' ' && strict) {
+                        throw JsonError("Invalid control character at", s, i);
+                    }
+                }
+                if (i >= s.Length) {
+                    throw JsonError("Unterminated string starting at", s, begin);
+                }
+
+                if (s[i] == '"') {
+                    next = i + 1;
+                    if (sb == null) {
+                        return s.Substring(chunkStart, i - chunkStart);
+                    }
+                    return sb.Append(s, chunkStart, i - chunkStart).ToString();
+                }
+
+                // backslash
+                sb ??= new StringBuilder();
+                sb.Append(s, chunkStart, i - chunkStart);
+                i++;
+                if (i >= s.Length) {
+                    throw JsonError("Unterminated string starting at", s, begin);
+                }
+
+                char esc = s[i];
+                if (esc == 'u') {
+                    i++;
+                    if (i + 4 > s.Length) {
+                        throw JsonError("Invalid \\uXXXX escape", s, i - 1);
+                    }
+                    int value = 0;
+                    for (int j = i; j < i + 4; j++) {
+                        int digit = HexValue(s[j]);
+                        if (digit < 0) {
+                            throw JsonError("Invalid \\uXXXX escape", s, i - 1);
+                        }
+                        value = (value << 4) | digit;
+                    }
+                    // strings are UTF-16, so escaped surrogate pairs combine on their own
+                    sb.Append((char)value);
+                    end = i + 4;
+                } else {
+                    switch (esc) {
+                        case '"': sb.Append('"'); break;
+                        case '\\': sb.Append('\\'); break;
+                        case '/': sb.Append('/'); break;
+                        case 'b': sb.Append('\b'); break;
+                        case 'f': sb.Append('\f'); break;
+                        case 'n': sb.Append('\n'); break;
+                        case 'r': sb.Append('\r'); break;
+                        case 't': sb.Append('\t'); break;
+                        default:
+                            throw JsonError("Invalid \\escape", s, i - 1);
+                    }
+                    end = i + 1;
+                }
+                chunkStart = end;
+            }
+        }
+
+        private static int HexValue(char c) {
+            if (c >= '0' && c <= '9') return c - '0';
+            if (c >= 'a' && c <= 'f') return c - 'a' + 10;
+            if (c >= 'A' && c <= 'F') return c - 'A' + 10;
+            return -1;
+        }
+
+        #endregion
+
+        #region Scanner
+
+        [Documentation("JSON scanner object")]
+        [PythonType]
+        public class make_scanner {
+            private readonly bool _strict;
+            private readonly object? _objectHook;
+            private readonly object? _objectPairsHook;
+            private readonly object? _parseFloat;
+            private readonly object? _parseInt;
+            private readonly object? _parseConstant;
+
+            public make_scanner(CodeContext/*!*/ context, object? ctx) {
+                _strict = PythonOps.IsTrue(PythonOps.GetBoundAttr(context, ctx, "strict"));
+                _objectHook = PythonOps.GetBoundAttr(context, ctx, "object_hook");
+                _objectPairsHook = PythonOps.GetBoundAttr(context, ctx, "object_pairs_hook");
+                _parseFloat = PythonOps.GetBoundAttr(context, ctx, "parse_float");
+                _parseInt = PythonOps.GetBoundAttr(context, ctx, "parse_int");
+                _parseConstant = PythonOps.GetBoundAttr(context, ctx, "parse_constant");
+            }
+
+            public bool strict => _strict;
+
+            public object? object_hook => _objectHook;
+
+            public object? object_pairs_hook => _objectPairsHook;
+
+            public object? parse_float => _parseFloat;
+
+            public object? parse_int => _parseInt;
+
+            public object? parse_constant => _parseConstant;
+
+            public PythonTuple __call__(CodeContext/*!*/ context, [NotNone] string @string, int idx) {
+                if (idx < 0) {
+                    throw PythonOps.ValueError("idx cannot be negative");
+                }
+
+                // shares the key strings of repeated objects within one document
+                var memo = new Dictionary<string, string>(StringComparer.Ordinal);
+                object? res = ScanOnce(context, @string, idx, out int next, memo);
+                if (res == NoValue) {
+                    throw new PythonExceptions._StopIteration().InitAndGetClrException(idx);
+                }
+                return PythonTuple.MakeTuple(res, next);
+            }
+
+            /// <summary>
+            /// Returned when there is no JSON value at the given index.
+            /// </summary>
+            private static readonly object NoValue = new object();
+
+            private object? ScanOnce(CodeContext/*!*/ context, string s, int idx, out int next, Dictionary<string, string> memo) {
+                next = idx;
+                if (idx >= s.Length) return NoValue;
+
+                switch (s[idx]) {
+                    case '"':
+                        return ScanString(s, idx + 1, _strict, out next);
+                    case '{':
+                        return ParseContainer(context, s, idx + 1, out next, memo, isObject: true);
+                    case '[':
+                        return ParseContainer(context, s, idx + 1, out next, memo, isObject: false);
+                    case 'n':
+                        if (Matches(s, idx, "null")) {
+                            next = idx + 4;
+                            return null;
+                        }
+                        break;
+                    case 't':
+                        if (Matches(s, idx, "true")) {
+                            next = idx + 4;
+                            return ScriptingRuntimeHelpers.True;
+                        }
+                        break;
+                    case 'f':
+                        if (Matches(s, idx, "false")) {
+                            next = idx + 5;
+                            return ScriptingRuntimeHelpers.False;
+                        }
+                        break;
+                    case 'N':
+                        if (Matches(s, idx, "NaN")) {
+                            next = idx + 3;
+                            return PythonCalls.Call(context, _parseConstant, "NaN");
+                        }
+                        break;
+                    case 'I':
+                        if (Matches(s, idx, "Infinity")) {
+                            next = idx + 8;
+                            return PythonCalls.Call(context, _parseConstant, "Infinity");
+                        }
+                        break;
+                    case '-':
+                        if (Matches(s, idx, "-Infinity")) {
+                            next = idx + 9;
+                            return PythonCalls.Call(context, _parseConstant, "-Infinity");
+                        }
+                        break;
+                }
+                return MatchNumber(context, s, idx, out next);
+            }
+
+            private static bool Matches(string s, int idx, string literal)
+                => idx + literal.Length <= s.Length && string.CompareOrdinal(s, idx, literal, 0, literal.Length) == 0;
+
+            private object? ParseContainer(CodeContext/*!*/ context, string s, int idx, out int next, Dictionary<string, string> memo, bool isObject) {
+                PythonOps.FunctionPushFrame(context.LanguageContext);
+                try {
+                    return isObject ? ParseObject(context, s, idx, out next, memo) : ParseArray(context, s, idx, out next, memo);
+                } finally {
+                    PythonOps.FunctionPopFrame();
+                }
+            }
+
+            private object? ParseObject(CodeContext/*!*/ context, string s, int idx, out int next, Dictionary<string, string> memo) {
+                PythonDictionary? dict = null;
+                PythonList? pairs = null;
+                if (_objectPairsHook != null) {
+                    pairs = new PythonList();
+                } else {
+                    dict = new PythonDictionary();
+                }
+
+                idx = SkipWhitespace(s, idx);
+                if (idx >= s.Length || s[idx] != '}') {
+                    while (true) {
+                        if (idx >= s.Length || s[idx] != '"') {
+                            throw JsonError("Expecting property name enclosed in double quotes", s, idx);
+                        }
+                        string key = ScanString(s, idx + 1, _strict, out idx);
+                        if (memo.TryGetValue(key, out string? memoized)) {
+                            key = memoized;
+                        } else {
+                            memo[key] = key;
+                        }
+
+                        idx = SkipWhitespace(s, idx);
+                        if (idx >= s.Length || s[idx] != ':') {
+                            throw JsonError("Expecting ':' delimiter", s, idx);
+                        }
+                        idx = SkipWhitespace(s, idx + 1);
+
+                        object? value = ScanOnce(context, s, idx, out idx, memo);
+                        if (value == NoValue) {
+                            throw JsonError("Expecting value", s, idx);
+                        }
+                        if (pairs != null) {
+                            pairs.AddNoLock(PythonTuple.MakeTuple(key, value));
+                        } else {
+                            dict![key] = value;
+                        }
+
+                        idx = SkipWhitespace(s, idx);
+                        if (idx < s.Length && s[idx] == '}') break;
+                        if (idx >= s.Length || s[idx] != ',') {
+                            throw JsonError("Expecting ',' delimiter", s, idx);
+                        }
+                        idx = SkipWhitespace(s, idx + 1);
+                    }
+                }
+                next = idx + 1;
+
+                if (pairs != null) {
+                    return PythonCalls.Call(context, _objectPairsHook, pairs);
+                }
+                if (_objectHook != null) {
+                    return PythonCalls.Call(context, _objectHook, dict);
+                }
+                return dict;
+            }
+
+            private PythonList ParseArray(CodeContext/*!*/ context, string s, int idx, out int next, Dictionary<string, string> memo) {
+                var list = new PythonList();
+
+                idx = SkipWhitespace(s, idx);
+                if (idx >= s.Length || s[idx] != ']') {
+                    while (true) {
+                        object? value = ScanOnce(context, s, idx, out idx, memo);
+                        if (value == NoValue) {
+                            throw JsonError("Expecting value", s, idx);
+                        }
+                        list.AddNoLock(value);
+
+                        idx = SkipWhitespace(s, idx);
+                        if (idx < s.Length && s[idx] == ']') break;
+                        if (idx >= s.Length || s[idx] != ',') {
+                            throw JsonError("Expecting ',' delimiter", s, idx);
+                        }
+                        idx = SkipWhitespace(s, idx + 1);
+                    }
+                }
+                next = idx + 1;
+                return list;
+            }
+
+            private object? MatchNumber(CodeContext/*!*/ context, string s, int start, out int next) {
+                int idx = start;
+                next = start;
+                if (idx < s.Length && s[idx] == '-') {
+                    idx++;
+                }
+
+                // integer part: 0 | [1-9][0-9]*
+                if (idx < s.Length && s[idx] >= '1' && s[idx] <= '9') {
+                    idx++;
+                    while (idx < s.Length && IsDigit(s[idx])) idx++;
+                } else if (idx < s.Length && s[idx] == '0') {
+                    idx++;
+                } else {
+                    return NoValue;
+                }
+                int intEnd = idx;
+
+                bool isFloat = false;
+                if (idx + 1 < s.Length && s[idx] == '.' && IsDigit(s[idx + 1])) {
+                    isFloat = true;
+                    idx += 2;
+                    while (idx < s.Length && IsDigit(s[idx])) idx++;
+                }
+
+                if (idx < s.Length && (s[idx] == 'e' || s[idx] == 'E')) {
+                    // only consume the exponent when it has digits
+                    int expStart = idx++;
+                    if (idx < s.Length && (s[idx] == '-' || s[idx] == '+')) idx++;
+                    if (idx < s.Length && IsDigit(s[idx])) {
+                        isFloat = true;
+                        while (idx < s.Length && IsDigit(s[idx])) idx++;
+                    } else {
+                        idx = expStart;
+                    }
+                }
+
+                next = idx;
+                string numstr = s.Substring(start, idx - start);
+                if (isFloat) {
+                    if (_parseFloat == TypeCache.Double) {
+                        return LiteralParser.ParseFloat(numstr);
+                    }
+                    return PythonCalls.Call(context, _parseFloat, numstr);
+                }
+
+                if (_parseInt == TypeCache.BigInteger) {
+                    return ParseInt(s, start, intEnd);
+                }
+                return PythonCalls.Call(context, _parseInt, numstr);
+            }
+
+            private static object ParseInt(string s, int start, int end) {
+                bool negative = s[start] == '-';
+                int digitStart = negative ? start + 1 : start;
+                if (end - digitStart <= 18) {
+                    long value = 0;
+                    for (int i = digitStart; i < end; i++) {
+                        value = value * 10 + (s[i] - '0');
+                    }
+                    if (negative) value = -value;
+                    if (value >= int.MinValue && value <= int.MaxValue) {
+                        return (int)value;
+                    }
+                    return (BigInteger)value;
+                }
+                return BigInteger.Parse(s.Substring(start, end - start), NumberStyles.AllowLeadingSign, CultureInfo.InvariantCulture);
+            }
+
+            private static bool IsDigit(char c) => c >= '0' && c <= '9';
+
+            private static int SkipWhitespace(string s, int idx) {
+                while (idx < s.Length) {
+                    char c = s[idx];
+                    if (c != ' ' && c != '\t' && c != '\n' && c != '\r') break;
+                    idx++;
+                }
+                return idx;
+            }
+        }
+
+        #endregion
+
+        #region Encoder
+
+        [Documentation("_iterencode(obj, _current_indent_level) -> iterable")]
+        [PythonType]
+        public class make_encoder {
+            private readonly object? _markers;
+            private readonly object? _default;
+            private readonly object? _encoder;
+            private readonly object? _indent;
+            private readonly string _keySeparator;
+            private readonly string _itemSeparator;
+            private readonly bool _sortKeys;
+            private readonly bool _skipKeys;
+            private readonly bool _allowNan;
+            private readonly FastEncode _fastEncode;
+
+            private enum FastEncode {
+                None,
+                Ascii,
+                Unicode,
+            }
+
+            public make_encoder(CodeContext/*!*/ context, object? markers, object? @default, object? encoder, object? indent,
+                [NotNone] string key_separator, [NotNone] string item_separator, object? sort_keys, object? skipkeys, object? allow_nan) {
+                if (markers != null && markers is not PythonDictionary) {
+                    throw PythonOps.TypeError("make_encoder() argument 1 must be dict or None, not {0}", PythonOps.GetPythonTypeName(markers));
+                }
+
+                _markers = markers;
+                _default = @default;
+                _encoder = encoder;
+                _indent = indent;
+                _keySeparator = key_separator;
+                _itemSeparator = item_separator;
+                _sortKeys = PythonOps.IsTrue(sort_keys);
+                _skipKeys = PythonOps.IsTrue(skipkeys);
+                _allowNan = PythonOps.IsTrue(allow_nan);
+
+                if (encoder is BuiltinFunction bf && bf.DeclaringType == typeof(PythonJson)) {
+                    if (bf.__name__ == nameof(encode_basestring_ascii)) {
+                        _fastEncode = FastEncode.Ascii;
+                    } else if (bf.__name__ == nameof(encode_basestring)) {
+                        _fastEncode = FastEncode.Unicode;
+                    }
+                }
+            }
+
+            public object? markers => _markers;
+
+            public object? @default => _default;
+
+            public object? encoder => _encoder;
+
+            public object? indent => _indent;
+
+            public string key_separator => _keySeparator;
+
+            public string item_separator => _itemSeparator;
+
+            public bool sort_keys => _sortKeys;
+
+            public bool skipkeys => _skipKeys;
+
+            public PythonList __call__(CodeContext/*!*/ context, object? obj, int _current_indent_level) {
+                // the whole document is built in one buffer and returned as a single chunk
+                var sb = new StringBuilder();
+                var markers = _markers != null ? new HashSet<object>(ReferenceEqualityComparer<object>.Instance) : null;
+                EncodeObject(context, sb, obj, markers);
+                return PythonList.FromArrayNoCopy(sb.ToString());
+            }
+
+            private void EncodeObject(CodeContext/*!*/ context, StringBuilder sb, object? obj, HashSet<object>? markers) {
+                switch (obj) {
+                    case null:
+                        sb.Append("null");
+                        return;
+                    case bool b:
+                        sb.Append(b ? "true" : "false");
+                        return;
+                    case string s:
+                        EncodeString(context, sb, s, s);
+                        return;
+                    case Extensible<string> es:
+                        EncodeString(context, sb, es, es.Value);
+                        return;
+                    case int i:
+                        sb.Append(i.ToString(CultureInfo.InvariantCulture));
+                        return;
+                    case BigInteger bi:
+                        sb.Append(bi.ToString(CultureInfo.InvariantCulture));
+                        return;
+                    case Extensible<BigInteger> ebi:
+                        // int subclasses such as IntEnum are written as plain ints
+                        sb.Append(ebi.Value.ToString(CultureInfo.InvariantCulture));
+                        return;
+                    case double d:
+                        EncodeFloat(context, sb, d);
+                        return;
+                    case Extensible<double> ed:
+                        EncodeFloat(context, sb, ed.Value);
+                        return;
+                    case PythonList:
+                    case PythonTuple:
+                        EncodeContainer(context, sb, obj, markers, isDict: false);
+                        return;
+                    case PythonDictionary:
+                        EncodeContainer(context, sb, obj, markers, isDict: true);
+                        return;
+                }
+
+                Enter(markers, obj);
+                PythonOps.FunctionPushFrame(context.LanguageContext);
+                try {
+                    EncodeObject(context, sb, PythonCalls.Call(context, _default, obj), markers);
+                } finally {
+                    PythonOps.FunctionPopFrame();
+                }
+                markers?.Remove(obj);
+            }
+
+            private void EncodeContainer(CodeContext/*!*/ context, StringBuilder sb, object obj, HashSet<object>? markers, bool isDict) {
+                Enter(markers, obj);
+                PythonOps.FunctionPushFrame(context.LanguageContext);
+                try {
+                    if (isDict) {
+                        EncodeDict(context, sb, (PythonDictionary)obj, markers);
+                    } else {
+                        EncodeList(context, sb, obj, markers);
+                    }
+                } finally {
+                    PythonOps.FunctionPopFrame();
+                }
+                markers?.Remove(obj);
+            }
+
+            private static void Enter(HashSet<object>? markers, object obj) {
+                if (markers != null && !markers.Add(obj)) {
+                    throw PythonOps.ValueError("Circular reference detected");
+                }
+            }
+
+            private void EncodeList(CodeContext/*!*/ context, StringBuilder sb, object seq, HashSet<object>? markers) {
+                sb.Append('[');
+                if (seq is PythonTuple tuple) {
+                    for (int i = 0; i < tuple.Count; i++) {
+                        if (i > 0) sb.Append(_itemSeparator);
+                        EncodeObject(context, sb, tuple[i], markers);
+                    }
+                } else {
+                    var list = (PythonList)seq;
+                    for (int i = 0; i < list.Count; i++) {
+                        if (i > 0) sb.Append(_itemSeparator);
+                        EncodeObject(context, sb, list[i], markers);
+                    }
+                }
+                sb.Append(']');
+            }
+
+            private void EncodeDict(CodeContext/*!*/ context, StringBuilder sb, PythonDictionary dict, HashSet<object>? markers) {
+                if (dict.Count == 0) {
+                    sb.Append("{}");
+                    return;
+                }
+
+                IList<KeyValuePair<object?, object?>> items;
+                if (_sortKeys) {
+                    var keys = new PythonList(context, dict.keys());
+                    keys.Sort(context);
+                    var sorted = new List<KeyValuePair<object?, object?>>(keys.Count);
+                    foreach (object? key in keys) {
+                        sorted.Add(new KeyValuePair<object?, object?>(key, PythonOps.GetIndex(context, dict, key)));
+                    }
+                    items = sorted;
+                } else if (dict.GetType() == typeof(PythonDictionary)) {
+                    items = dict._storage.GetItems();
+                } else {
+                    // dict subclasses may override items()
+                    var subclassItems = new List<KeyValuePair<object?, object?>>();
+                    IEnumerator e = PythonOps.GetEnumerator(context, PythonOps.Invoke(context, dict, "items"));
+                    while (e.MoveNext()) {
+                        var pair = (PythonTuple)e.Current!;
+                        subclassItems.Add(new KeyValuePair<object?, object?>(pair[0], pair[1]));
+                    }
+                    items = subclassItems;
+                }
+
+                sb.Append('{');
+                bool first = true;
+                foreach (KeyValuePair<object?, object?> item in items) {
+                    string? key = KeyToString(context, item.Key);
+                    if (key == null) continue;
+
+                    if (!first) sb.Append(_itemSeparator);
+                    first = false;
+                    EncodeString(context, sb, key, key);
+                    sb.Append(_keySeparator);
+                    EncodeObject(context, sb, item.Value, markers);
+                }
+                sb.Append('}');
+            }
+
+            /// <summary>
+            /// Converts a dictionary key to its JSON string, returns null if the key is skipped.
+            /// </summary>
+            private string? KeyToString(CodeContext/*!*/ context, object? key) {
+                switch (key) {
+                    case string s: return s;
+                    case Extensible<string> es: return es.Value;
+                    case double d: return FloatToString(context, d);
+                    case Extensible<double> ed: return FloatToString(context, ed.Value);
+                    case bool b: return b ? "true" : "false";
+                    case null: return "null";
+                    case int i: return i.ToString(CultureInfo.InvariantCulture);
+                    case BigInteger bi: return bi.ToString(CultureInfo.InvariantCulture);
+                    case Extensible<BigInteger> ebi: return ebi.Value.ToString(CultureInfo.InvariantCulture);
+                }
+
+                if (_skipKeys) return null;
+                throw PythonOps.TypeError("key {0} is not a string", PythonOps.Repr(context, key));
+            }
+
+            private void EncodeString(CodeContext/*!*/ context, StringBuilder sb, object obj, string value) {
+                switch (_fastEncode) {
+                    case FastEncode.Ascii:
+                        PythonJson.EncodeString(sb, value, asciiOnly: true);
+                        break;
+                    case FastEncode.Unicode:
+                        PythonJson.EncodeString(sb, value, asciiOnly: false);
+                        break;
+                    default:
+                        object? encoded = PythonCalls.Call(context, _encoder, obj);
+                        if (encoded is not string s) {
+                            throw PythonOps.TypeError("encoder() must return a string, not {0}", PythonOps.GetPythonTypeName(encoded));
+                        }
+                        sb.Append(s);
+                        break;
+                }
+            }
+
+            private void EncodeFloat(CodeContext/*!*/ context, StringBuilder sb, double value) {
+                sb.Append(FloatToString(context, value));
+            }
+
+            private string FloatToString(CodeContext/*!*/ context, double value) {
+                if (double.IsNaN(value) || double.IsInfinity(value)) {
+                    if (!_allowNan) {
+                        throw PythonOps.ValueError("Out of range float values are not JSON compliant");
+                    }
+                    if (double.IsNaN(value)) return "NaN";
+                    return value > 0 ? "Infinity" : "-Infinity";
+                }
+                return DoubleOps.__repr__(context, value);
+            }
+        }
+
+        #endregion
+
+        /// <summary>
+        /// Creates the ValueError raised for malformed documents, formatted like json.decoder.errmsg.
+        /// </summary>
+        private static Exception JsonError(string msg, string doc, int pos) {
+            int lineno = 1;
+            int lastNewline = -1;
+            for (int i = 0; i < pos && i < doc.Length; i++) {
+                if (doc[i] == '\n') {
+                    lineno++;
+                    lastNewline = i;
+                }
+            }
+            int colno = lineno == 1 ? pos + 1 : pos - lastNewline;
+            return PythonOps.ValueError("{0}: line {1} column {2} (char {3})", msg, lineno, colno, pos);
+        }
+    }
+}
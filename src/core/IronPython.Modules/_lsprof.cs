@@ -0,0 +1,343 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#nullable enable
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Operations;
+using IronPython.Runtime.Types;
+
+using Microsoft.Scripting.Runtime;
+
+[assembly: PythonModule("_lsprof", typeof(IronPython.Modules.PythonLsprof))]
+namespace IronPython.Modules {
+    /// <summary>
+    /// The profiler behind cProfile. Calls are recorded from the profile hook of the thread that enabled
+    /// the profiler, so no frames are created while profiling.
+    /// </summary>
+    public static class PythonLsprof {
+        public const string __doc__ = "Fast profiler";
+
+        // the resolution used for timers which return floats, as in CPython
+        private const double DoubleTimerPrecision = 4294967296.0;
+
+        [PythonType]
+        public class Profiler {
+            public const string __doc__ = @"Profiler(timer=None, timeunit=None, subcalls=True, builtins=True)
+
+    Builds a profiler object using the specified timer function.
+    The default timer is a fast built-in one based on real time.
+    For custom timer functions returning integers, timeunit can
+    be a float specifying a scale (i.e. how long each integer unit
+    is, in seconds).";
+
+            private readonly CodeContext _context;
+            private readonly object? _timer;
+            private readonly double _factor;
+            private readonly bool _floatTimer;
+            private bool _subcalls, _builtins;
+            private Hook? _hook;
+
+            private readonly Dictionary<FunctionCode, Entry> _codeEntries = new Dictionary<FunctionCode, Entry>();
+            private readonly Dictionary<(Type, string), Entry> _builtinEntries = new Dictionary<(Type, string), Entry>();
+            private readonly List<Entry> _entries = new List<Entry>();
+            private readonly List<Context> _contexts = new List<Context>();
+            private int _depth;
+            private bool _inTimer;
+
+            public Profiler(CodeContext/*!*/ context, object? timer = null, double timeunit = 0.0, bool subcalls = true, bool builtins = true) {
+                _context = context;
+                _subcalls = subcalls;
+                _builtins = builtins;
+
+                if (timer == null) {
+                    _factor = 1.0 / Stopwatch.Frequency;
+                } else {
+                    _timer = timer;
+                    _floatTimer = timeunit == 0.0;
+                    _factor = _floatTimer ? 1.0 / DoubleTimerPrecision : timeunit;
+                }
+            }
+
+            public void enable(bool subcalls = true, bool builtins = true) {
+                _subcalls = subcalls;
+                _builtins = builtins;
+
+                _hook ??= new Hook(this);
+                _context.LanguageContext.SetProfileHook(_hook);
+            }
+
+            public void disable() {
+                PythonContext pc = _context.LanguageContext;
+                if (_hook != null && pc.ProfileHook == _hook) {
+                    pc.SetProfileHook(null);
+                }
+
+                // calls which are still running (at least disable itself) are stopped now
+                FlushUnmatched();
+            }
+
+            public void clear() {
+                _codeEntries.Clear();
+                _builtinEntries.Clear();
+                _entries.Clear();
+                _depth = 0;
+            }
+
+            public PythonList getstats() {
+                var res = new PythonList(_entries.Count);
+                foreach (Entry entry in _entries) {
+                    PythonList? calls = null;
+                    if (entry.Calls != null) {
+                        calls = new PythonList(entry.Calls.Count);
+                        foreach (SubEntry sub in entry.Calls.Values) {
+                            calls.AddNoLock(new profiler_subentry(sub.Callee.Code, sub.CallCount, sub.RecursiveCallCount, sub.TotalTime * _factor, sub.InlineTime * _factor));
+                        }
+                    }
+                    res.AddNoLock(new profiler_entry(entry.Code, entry.CallCount, entry.RecursiveCallCount, entry.TotalTime * _factor, entry.InlineTime * _factor, calls));
+                }
+                return res;
+            }
+
+            #region Recording
+
+            private long GetTime() {
+                if (_timer == null) {
+                    return Stopwatch.GetTimestamp();
+                }
+
+                // the calls made by the timer are not recorded
+                object time;
+                _inTimer = true;
+                try {
+                    time = PythonCalls.Call(_context, _timer);
+                } finally {
+                    _inTimer = false;
+                }
+                if (_floatTimer) {
+                    return (long)(Converter.ConvertToDouble(time) * DoubleTimerPrecision);
+                }
+                return Converter.ConvertToInt64(time);
+            }
+
+            private Entry GetEntry(FunctionCode code) {
+                if (!_codeEntries.TryGetValue(code, out Entry? entry)) {
+                    _codeEntries[code] = entry = NewEntry(code);
+                }
+                return entry;
+            }
+
+            private Entry GetEntry(BuiltinFunction function) {
+                var key = (function.DeclaringType, function.__name__);
+                if (!_builtinEntries.TryGetValue(key, out Entry? entry)) {
+                    _builtinEntries[key] = entry = NewEntry(GetLabel(function));
+                }
+                return entry;
+            }
+
+            private Entry NewEntry(object code) {
+                var entry = new Entry(code);
+                _entries.Add(entry);
+                return entry;
+            }
+
+            /// <summary>
+            /// The label cProfile reports for a builtin function, matching the ones used by CPython.
+            /// </summary>
+            private static string GetLabel(BuiltinFunction function) {
+                FunctionType type = function.FunctionType;
+                if ((type & FunctionType.ModuleMethod) != 0 || (type & FunctionType.Method) == 0) {
+                    return $"<built-in method {function.__name__}>";
+                }
+                return $"<method '{function.__name__}' of '{DynamicHelpers.GetPythonTypeFromType(function.DeclaringType).Name}' objects>";
+            }
+
+            private void EnterCall(Entry entry) {
+                Context? caller = _depth > 0 ? _contexts[_depth - 1] : null;
+                if (_depth == _contexts.Count) {
+                    _contexts.Add(new Context());
+                }
+                Context ctx = _contexts[_depth++];
+                ctx.Entry = entry;
+                ctx.SubTime = 0;
+
+                entry.RecursionLevel++;
+                if (_subcalls && caller != null) {
+                    caller.Entry.GetSubEntry(entry).RecursionLevel++;
+                }
+
+                ctx.StartTime = GetTime();
+            }
+
+            private void LeaveCall(Entry entry) {
+                // returns from calls made before the profiler was enabled are ignored
+                if (_depth == 0 || _contexts[_depth - 1].Entry != entry) return;
+
+                Stop(GetTime());
+            }
+
+            private void Stop(long now) {
+                Context ctx = _contexts[--_depth];
+                Entry entry = ctx.Entry;
+                Context? caller = _depth > 0 ? _contexts[_depth - 1] : null;
+                long tt = now - ctx.StartTime;
+                long it = tt - ctx.SubTime;
+                if (caller != null) {
+                    caller.SubTime += tt;
+                }
+
+                if (--entry.RecursionLevel == 0) {
+                    entry.TotalTime += tt;
+                } else {
+                    entry.RecursiveCallCount++;
+                }
+                entry.InlineTime += it;
+                entry.CallCount++;
+
+                if (_subcalls && caller != null) {
+                    SubEntry sub = caller.Entry.GetSubEntry(entry);
+                    if (--sub.RecursionLevel == 0) {
+                        sub.TotalTime += tt;
+                    } else {
+                        sub.RecursiveCallCount++;
+                    }
+                    sub.InlineTime += it;
+                    sub.CallCount++;
+                }
+                ctx.Entry = null!;
+            }
+
+            private void FlushUnmatched() {
+                if (_depth == 0) return;
+
+                long now = GetTime();
+                while (_depth > 0) {
+                    Stop(now);
+                }
+            }
+
+            private sealed class Hook : ProfileHook {
+                private readonly Profiler _profiler;
+
+                public Hook(Profiler profiler) {
+                    _profiler = profiler;
+                }
+
+                public override void OnCall(PythonFunction function) {
+                    if (!_profiler._inTimer) {
+                        _profiler.EnterCall(_profiler.GetEntry(function.__code__));
+                    }
+                }
+
+                public override void OnReturn(PythonFunction function, object? result) {
+                    if (!_profiler._inTimer) {
+                        _profiler.LeaveCall(_profiler.GetEntry(function.__code__));
+                    }
+                }
+
+                public override void OnBuiltinCall(BuiltinFunction function) {
+                    if (_profiler._builtins && !_profiler._inTimer) {
+                        _profiler.EnterCall(_profiler.GetEntry(function));
+                    }
+                }
+
+                public override void OnBuiltinReturn(BuiltinFunction function, bool exception) {
+                    if (_profiler._builtins && !_profiler._inTimer) {
+                        _profiler.LeaveCall(_profiler.GetEntry(function));
+                    }
+                }
+            }
+
+            #endregion
+        }
+
+        private sealed class Entry {
+            public readonly object Code;
+            public long TotalTime, InlineTime;
+            public int CallCount, RecursiveCallCount, RecursionLevel;
+            public Dictionary<Entry, SubEntry>? Calls;
+
+            public Entry(object code) {
+                Code = code;
+            }
+
+            public SubEntry GetSubEntry(Entry callee) {
+                Calls ??= new Dictionary<Entry, SubEntry>();
+                if (!Calls.TryGetValue(callee, out SubEntry? sub)) {
+                    Calls[callee] = sub = new SubEntry(callee);
+                }
+                return sub;
+            }
+        }
+
+        private sealed class SubEntry {
+            public readonly Entry Callee;
+            public long TotalTime, InlineTime;
+            public int CallCount, RecursiveCallCount, RecursionLevel;
+
+            public SubEntry(Entry callee) {
+                Callee = callee;
+            }
+        }
+
+        /// <summary>
+        /// A running call: the contexts of a thread form a stack which is reused between calls.
+        /// </summary>
+        private sealed class Context {
+            public Entry Entry = null!;
+            public long StartTime, SubTime;
+        }
+
+        [PythonType]
+        public class profiler_entry : PythonTuple {
+            internal profiler_entry(object code, int callcount, int reccallcount, double totaltime, double inlinetime, PythonList? calls)
+                : base(new object?[] { code, callcount, reccallcount, totaltime, inlinetime, calls }) {
+            }
+
+            public object? code => _data[0];
+            public object? callcount => _data[1];
+            public object? reccallcount => _data[2];
+            public object? totaltime => _data[3];
+            public object? inlinetime => _data[4];
+            public object? calls => _data[5];
+
+            public int n_fields => _data.Length;
+            public int n_sequence_fields => _data.Length;
+            public int n_unnamed_fields => 0;
+
+            public override string __repr__(CodeContext/*!*/ context) {
+                return string.Format("_lsprof.profiler_entry(code={0}, callcount={1}, reccallcount={2}, totaltime={3}, inlinetime={4}, calls={5})",
+                    PythonOps.Repr(context, code), PythonOps.Repr(context, callcount), PythonOps.Repr(context, reccallcount),
+                    PythonOps.Repr(context, totaltime), PythonOps.Repr(context, inlinetime), PythonOps.Repr(context, calls));
+            }
+        }
+
+        [PythonType]
+        public class profiler_subentry : PythonTuple {
+            internal profiler_subentry(object code, int callcount, int reccallcount, double totaltime, double inlinetime)
+                : base(new object?[] { code, callcount, reccallcount, totaltime, inlinetime }) {
+            }
+
+            public object? code => _data[0];
+            public object? callcount => _data[1];
+            public object? reccallcount => _data[2];
+            public object? totaltime => _data[3];
+            public object? inlinetime => _data[4];
+
+            public int n_fields => _data.Length;
+            public int n_sequence_fields => _data.Length;
+            public int n_unnamed_fields => 0;
+
+            public override string __repr__(CodeContext/*!*/ context) {
+                return string.Format("_lsprof.profiler_subentry(code={0}, callcount={1}, reccallcount={2}, totaltime={3}, inlinetime={4})",
+                    PythonOps.Repr(context, code), PythonOps.Repr(context, callcount), PythonOps.Repr(context, reccallcount),
+                    PythonOps.Repr(context, totaltime), PythonOps.Repr(context, inlinetime));
+            }
+        }
+    }
+}
@@ -2,13 +2,15 @@
 // The .NET Foundation licenses this file to you under the Apache 2.0 License.
 // See the LICENSE file in the project root for more information.
 
-#if FALSE // TODO: update native pickling
+#nullable enable
 
 using System;
+using System.Buffers.Binary;
 using System.Collections;
 using System.Collections.Generic;
-using System.Diagnostics;
+using System.Globalization;
 using System.Numerics;
+using System.Runtime.CompilerServices;
 using System.Text;
 
 using Microsoft.Scripting.Runtime;
@@ -22,2296 +24,2206 @@ using IronPython.Runtime.Types;
 [assembly: PythonModule("_pickle", typeof(IronPython.Modules.PythonPickle))]
 namespace IronPython.Modules {
     public static class PythonPickle {
-        public const string __doc__ = "Fast object serialization/deserialization.\n\n"
-            + "Differences from CPython:\n"
-            + " - does not implement the undocumented fast mode\n";
-        [System.Runtime.CompilerServices.SpecialName]
-        public static void PerformModuleReload(PythonContext/*!*/ context, PythonDictionary/*!*/ dict) {
-            context.EnsureModuleException("PickleError", dict, "PickleError", "_pickle");
-            context.EnsureModuleException("PicklingError", dict, "PicklingError", "_pickle");
-            context.EnsureModuleException("UnpicklingError", dict, "UnpicklingError", "_pickle");
-            context.EnsureModuleException("UnpickleableError", dict, "UnpickleableError", "_pickle");
-            context.EnsureModuleException("BadPickleGet", dict, "BadPickleGet", "_pickle");
-            dict["__builtins__"] = context.BuiltinModuleInstance;
-            dict["compatible_formats"] = PythonOps.MakeList("1.0", "1.1", "1.2", "1.3", "2.0");
-        }
+        public const string __doc__ = "Optimized implementation of the Python pickle module.";
+
+        private const int DefaultProtocol = 3;
+        private const int HighestProtocol = 5;
+        private const int BatchSize = 1000;
+
+        private const string PickleErrorKey = "pickle.PickleError";
+        private const string PicklingErrorKey = "pickle.PicklingError";
+        private const string UnpicklingErrorKey = "pickle.UnpicklingError";
 
-        private static readonly PythonStruct.Struct _float64 = PythonStruct.Struct.Create(">d");
-        
-        private const int highestProtocol = 2;
-        
-        public const string __version__ = "1.71";
-        public const string format_version = "2.0";
-        
-        public static int HIGHEST_PROTOCOL {
-            get { return highestProtocol; }
+        private static readonly Encoding StrictUtf8 = new UTF8Encoding(encoderShouldEmitUTF8Identifier: false, throwOnInvalidBytes: true);
+
+        [SpecialName]
+        public static void PerformModuleReload(PythonContext/*!*/ context, PythonDictionary/*!*/ dict) {
+            PythonType pickleError = context.EnsureModuleException(PickleErrorKey, PythonExceptions.Exception, dict, "PickleError", "_pickle");
+            context.EnsureModuleException(PicklingErrorKey, pickleError, dict, "PicklingError", "_pickle");
+            context.EnsureModuleException(UnpicklingErrorKey, pickleError, dict, "UnpicklingError", "_pickle");
         }
-        
-        private const string Newline = "\n";
 
         #region Public module-level functions
 
-        [Documentation("dump(obj, file, protocol=0) -> None\n\n"
-            + "Pickle obj and write the result to file.\n"
-            + "\n"
-            + "See documentation for Pickler() for a description the file, protocol, and\n"
-            + "(deprecated) bin parameters."
+        [Documentation("dump(obj, file, protocol=None, fix_imports=True, buffer_callback=None) -> None\n\n"
+            + "Write a pickled representation of obj to the open file object file.\n\n"
+            + "This is equivalent to ``Pickler(file, protocol).dump(obj)``, but may\n"
+            + "be more efficient."
             )]
-        public static void dump(CodeContext/*!*/ context, object obj, object file, object protocol=null, object bin=null) {
-            PicklerObject/*!*/ pickler = new PicklerObject(context, file, protocol, bin);
+        public static void dump(CodeContext/*!*/ context, object? obj, object? file, object? protocol = null, bool fix_imports = true, object? buffer_callback = null) {
+            var pickler = new Pickler(context);
+            pickler.__init__(context, file, protocol, fix_imports, buffer_callback);
             pickler.dump(context, obj);
         }
 
-        [Documentation("dumps(obj, protocol=0) -> pickle string\n\n"
-            + "Pickle obj and return the result as a string.\n"
-            + "\n"
-            + "See the documentation for Pickler() for a description of the protocol and\n"
-            + "(deprecated) bin parameters."
+        [Documentation("dumps(obj, protocol=None, fix_imports=True, buffer_callback=None) -> bytes\n\n"
+            + "Return the pickled representation of the object as a bytes object."
             )]
-        public static string dumps(CodeContext/*!*/ context, object obj, object protocol=null, object bin=null) {
-            //??? possible perf enhancement: use a C# TextWriter-backed IFileOutput and
-            // thus avoid Python call overhead. Also do similar thing for LoadFromString.
-            var stringIO = new StringBuilderOutput();
-            PicklerObject/*!*/ pickler = new PicklerObject(context, stringIO, protocol, bin);
+        public static Bytes dumps(CodeContext/*!*/ context, object? obj, object? protocol = null, bool fix_imports = true, object? buffer_callback = null) {
+            var pickler = new Pickler(context);
+            pickler.Initialize(context, null, protocol, fix_imports, buffer_callback);
             pickler.dump(context, obj);
-            return stringIO.GetString();
+            return pickler.GetValue();
         }
 
-        [Documentation("load(file) -> unpickled object\n\n"
-            + "Read pickle data from the open file object and return the corresponding\n"
-            + "unpickled object. Data after the first pickle found is ignored, but the file\n"
-            + "cursor is not reset, so if a file objects contains multiple pickles, then\n"
-            + "load() may be called multiple times to unpickle them.\n"
-            + "\n"
-            + "file: an object (such as an open file or a StringIO) with read(num_chars) and\n"
-            + "    readline() methods that return strings\n"
-            + "\n"
-            + "load() automatically determines if the pickle data was written in binary or\n"
-            + "text mode."
+        [Documentation("load(file, fix_imports=True, encoding='ASCII', errors='strict', buffers=None) -> object\n\n"
+            + "Read and return an object from the pickle data stored in a file.\n\n"
+            + "This is equivalent to ``Unpickler(file).load()``, but may be more\n"
+            + "efficient."
             )]
-        public static object load(CodeContext/*!*/ context, object file) {
-            return new UnpicklerObject(context, file).load(context);
+        public static object? load(CodeContext/*!*/ context, object? file, bool fix_imports = true, [NotNone] string encoding = "ASCII", [NotNone] string errors = "strict", object? buffers = null) {
+            var unpickler = new Unpickler(context);
+            unpickler.__init__(context, file, fix_imports, encoding, errors, buffers);
+            return unpickler.load(context);
         }
 
-        [Documentation("loads(string) -> unpickled object\n\n"
-            + "Read a pickle object from a string, unpickle it, and return the resulting\n"
-            + "reconstructed object. Characters in the string beyond the end of the first\n"
-            + "pickle are ignored."
+        [Documentation("loads(data, fix_imports=True, encoding='ASCII', errors='strict', buffers=None) -> object\n\n"
+            + "Read and return an object from the given pickle data."
             )]
-        public static object loads(CodeContext/*!*/ context, [BytesLike]IList<byte> @string) {
-            return new UnpicklerObject(context, new PythonStringInput(PythonOps.MakeString(@string))).load(context);
+        public static object? loads(CodeContext/*!*/ context, [NotNone] IBufferProtocol data, bool fix_imports = true, [NotNone] string encoding = "ASCII", [NotNone] string errors = "strict", object? buffers = null) {
+            byte[] input;
+            if (data is Bytes bytes) {
+                input = bytes.UnsafeByteArray;
+            } else {
+                using IPythonBuffer buffer = data.GetBuffer();
+                input = buffer.ToArray();
+            }
+
+            var unpickler = new Unpickler(context);
+            unpickler.Initialize(context, null, fix_imports, encoding, errors, buffers);
+            unpickler.SetInput(input);
+            return unpickler.load(context);
         }
 
         #endregion
 
-        #region File I/O wrappers
+        #region Opcodes
 
-        /// <summary>
-        /// Interface for "file-like objects" that implement the protocol needed by load() and friends.
-        /// This enables the creation of thin wrappers that make fast .NET types and slow Python types look the same.
-        /// </summary>
-        internal abstract class FileInput {
-            public abstract string Read(CodeContext/*!*/ context, int size);
-            public abstract string ReadLine(CodeContext/*!*/ context);
-            public virtual string ReadLineNoNewLine(CodeContext/*!*/ context) {
-                var raw = ReadLine(context);
-                return raw.Substring(0, raw.Length - 1);
-            }
+        internal static class Opcode {
+            // protocol 0 and 1
+            public const byte Mark = (byte)'(';
+            public const byte Stop = (byte)'.';
+            public const byte Pop = (byte)'0';
+            public const byte PopMark = (byte)'1';
+            public const byte Dup = (byte)'2';
+            public const byte Float = (byte)'F';
+            public const byte Int = (byte)'I';
+            public const byte BinInt = (byte)'J';
+            public const byte BinInt1 = (byte)'K';
+            public const byte Long = (byte)'L';
+            public const byte BinInt2 = (byte)'M';
+            public const byte None = (byte)'N';
+            public const byte PersId = (byte)'P';
+            public const byte BinPersId = (byte)'Q';
+            public const byte Reduce = (byte)'R';
+            public const byte String = (byte)'S';
+            public const byte BinString = (byte)'T';
+            public const byte ShortBinString = (byte)'U';
+            public const byte Unicode = (byte)'V';
+            public const byte BinUnicode = (byte)'X';
+            public const byte Append = (byte)'a';
+            public const byte Build = (byte)'b';
+            public const byte Global = (byte)'c';
+            public const byte Dict = (byte)'d';
+            public const byte EmptyDict = (byte)'}';
+            public const byte Appends = (byte)'e';
+            public const byte Get = (byte)'g';
+            public const byte BinGet = (byte)'h';
+            public const byte Inst = (byte)'i';
+            public const byte LongBinGet = (byte)'j';
+            public const byte List = (byte)'l';
+            public const byte EmptyList = (byte)']';
+            public const byte Obj = (byte)'o';
+            public const byte Put = (byte)'p';
+            public const byte BinPut = (byte)'q';
+            public const byte LongBinPut = (byte)'r';
+            public const byte SetItem = (byte)'s';
+            public const byte Tuple = (byte)'t';
+            public const byte EmptyTuple = (byte)')';
+            public const byte SetItems = (byte)'u';
+            public const byte BinFloat = (byte)'G';
+
+            // protocol 2
+            public const byte Proto = 0x80;
+            public const byte NewObj = 0x81;
+            public const byte Ext1 = 0x82;
+            public const byte Ext2 = 0x83;
+            public const byte Ext4 = 0x84;
+            public const byte Tuple1 = 0x85;
+            public const byte Tuple2 = 0x86;
+            public const byte Tuple3 = 0x87;
+            public const byte NewTrue = 0x88;
+            public const byte NewFalse = 0x89;
+            public const byte Long1 = 0x8a;
+            public const byte Long4 = 0x8b;
+
+            // protocol 3
+            public const byte BinBytes = (byte)'B';
+            public const byte ShortBinBytes = (byte)'C';
+
+            // protocol 4
+            public const byte ShortBinUnicode = 0x8c;
+            public const byte BinUnicode8 = 0x8d;
+            public const byte BinBytes8 = 0x8e;
+            public const byte EmptySet = 0x8f;
+            public const byte AddItems = 0x90;
+            public const byte FrozenSet = 0x91;
+            public const byte NewObjEx = 0x92;
+            public const byte StackGlobal = 0x93;
+            public const byte Memoize = 0x94;
+            public const byte Frame = 0x95;
+
+            // protocol 5
+            public const byte ByteArray8 = 0x96;
+            public const byte NextBuffer = 0x97;
+            public const byte ReadOnlyBuffer = 0x98;
+        }
 
-            public virtual char ReadChar(CodeContext context) {
-                string res = Read(context, 1);
-                if (res.Length < 1) {
-                    throw PythonOps.EofError("unexpected EOF while unpickling");
-                }
-                return res[0];
-            }
+        #endregion
 
-            public virtual int ReadInt(CodeContext context) {
-                return (int)ReadChar(context) |
-                       ((int)ReadChar(context)) << 8 |
-                       ((int)ReadChar(context)) << 16 |
-                       ((int)ReadChar(context)) << 24;
-            }
-        }
+        #region Output buffer
 
         /// <summary>
-        /// Interface for "file-like objects" that implement the protocol needed by dump() and friends.
-        /// This enables the creation of thin wrappers that make fast .NET types and slow Python types look the same.
+        /// Byte-oriented output buffer of the pickler. Protocol 4 frames are built in place: the
+        /// frame header is reserved when the first opcode of a frame is written and filled in when
+        /// the frame is committed. Frames are flushed to the file as soon as they reach the target
+        /// size, and large payloads bypass the buffer and are handed to the file directly.
         /// </summary>
-        internal abstract class FileOutput {
-            private readonly char[] int32chars = new char[4];
+        private sealed class PickleWriter {
+            public const int FrameSizeTarget = 64 * 1024;
+            private const int FrameSizeMin = 4;
+            private const int FrameHeaderSize = 9;
+            private const int InitialCapacity = 4096;
 
-            public abstract void Write(CodeContext/*!*/ context, string data);
+            private readonly CodeContext _context;
+            private readonly object? _write;
+            private byte[] _data = new byte[InitialCapacity];
+            private int _length;
+            private int _frameStart = -1;
 
-            public virtual void Write(CodeContext context, int data) {
-                int32chars[0] = (char)(int)((data & 0xff));
-                int32chars[1] = (char)(int)((data >> 8) & 0xff);
-                int32chars[2] = (char)(int)((data >> 16) & 0xff);
-                int32chars[3] = (char)(int)((data >> 24) & 0xff);
-                Write(context, new string(int32chars));
+            public PickleWriter(CodeContext/*!*/ context, object? write) {
+                _context = context;
+                _write = write;
             }
 
-            public virtual void Write(CodeContext context, char data) {
-                Write(context, ScriptingRuntimeHelpers.CharToString(data));
-            }
-        }
+            public bool Framing { get; set; }
 
-        private class PythonFileInput : FileInput {
-            private object _readMethod;
-            private object _readLineMethod;
+            public byte[] Data => _data;
 
-            public PythonFileInput(CodeContext/*!*/ context, object file) {
-                if (!PythonOps.TryGetBoundAttr(context, file, "read", out _readMethod) ||
-                    !PythonOps.IsCallable(context, _readMethod) ||
-                    !PythonOps.TryGetBoundAttr(context, file, "readline", out _readLineMethod) ||
-                    !PythonOps.IsCallable(context, _readLineMethod)
-                ) {
-                    throw PythonOps.TypeError("argument must have callable 'read' and 'readline' attributes");
+            /// <summary>
+            /// Reserves room for count bytes and returns the offset in <see cref="Data"/> to write them to.
+            /// </summary>
+            public int Reserve(int count) {
+                bool newFrame = Framing && _frameStart == -1;
+                int needed = _length + count + (newFrame ? FrameHeaderSize : 0);
+                if (needed > _data.Length) {
+                    int newSize = _data.Length > int.MaxValue / 2 ? needed : Math.Max(needed, _data.Length * 2);
+                    Array.Resize(ref _data, newSize);
                 }
+                if (newFrame) {
+                    _frameStart = _length;
+                    _length += FrameHeaderSize;
+                }
+                int offset = _length;
+                _length += count;
+                return offset;
             }
 
-            public override string Read(CodeContext/*!*/ context, int size) {
-                return Converter.ConvertToString(PythonCalls.Call(context, _readMethod, size));
-            }
-
-            public override string ReadLine(CodeContext/*!*/ context) {
-                return Converter.ConvertToString(PythonCalls.Call(context, _readLineMethod));
+            public void Write(byte opcode) {
+                _data[Reserve(1)] = opcode;
             }
-        }
 
-        internal class PythonStringInput : FileInput {
-            private readonly string _data;
-            int _offset;
-
-            public PythonStringInput(string data) {
-                _data = data;
+            public void Write(byte opcode, byte arg) {
+                int offset = Reserve(2);
+                _data[offset] = opcode;
+                _data[offset + 1] = arg;
             }
 
-            public override string Read(CodeContext context, int size) {
-                var res = _data.Substring(_offset, size);
-                _offset += size;
-                return res;
+            public void Write(ReadOnlySpan<byte> data) {
+                data.CopyTo(_data.AsSpan(Reserve(data.Length)));
             }
 
-            public override string ReadLine(CodeContext context) {
-                return ReadLineWorker(true);
+            public void WriteUInt16(byte opcode, int value) {
+                int offset = Reserve(3);
+                _data[offset] = opcode;
+                BinaryPrimitives.WriteUInt16LittleEndian(_data.AsSpan(offset + 1), (ushort)value);
             }
 
-            public override string ReadLineNoNewLine(CodeContext context) {
-                return ReadLineWorker(false);
+            public void WriteInt32(byte opcode, int value) {
+                int offset = Reserve(5);
+                _data[offset] = opcode;
+                BinaryPrimitives.WriteInt32LittleEndian(_data.AsSpan(offset + 1), value);
             }
 
-            public override char ReadChar(CodeContext context) {
-                if (_offset < _data.Length) {
-                    return _data[_offset++];
+            public void WriteAscii(byte opcode, string value, bool newline = true) {
+                int offset = Reserve(1 + value.Length + (newline ? 1 : 0));
+                _data[offset++] = opcode;
+                for (int i = 0; i < value.Length; i++) {
+                    _data[offset++] = (byte)value[i];
                 }
-                throw PythonOps.EofError("unexpected EOF while unpickling");
+                if (newline) _data[offset] = (byte)'\n';
             }
 
-            public override int ReadInt(CodeContext context) {
-                if (_offset + 4 <= _data.Length) {
-                    int res = _data[_offset]|
-                       ((int)_data[_offset  + 1]) << 8 |
-                       ((int)_data[_offset + 2]) << 16 |
-                       ((int)_data[_offset + 3]) << 24;
-
-                    _offset += 4;
-                    return res;
+            /// <summary>
+            /// Writes an opcode header followed by its payload. Payloads of at least the frame size
+            /// target are not framed and, when writing to a file, are passed to the file's write
+            /// method without being copied into the buffer.
+            /// </summary>
+            public void WriteBytes(ReadOnlySpan<byte> header, ReadOnlySpan<byte> data, object? payload) {
+                bool bypassBuffer = data.Length >= FrameSizeTarget;
+                bool framing = Framing;
+                if (bypassBuffer) {
+                    CommitFrame();
+                    Framing = false;
+                }
+
+                Write(header);
+                if (bypassBuffer && _write != null) {
+                    Flush();
+                    PythonCalls.Call(_context, _write, payload ?? Bytes.Make(data.ToArray()));
+                } else {
+                    Write(data);
                 }
 
-                throw PythonOps.EofError("unexpected EOF while unpickling");
+                Framing = framing;
             }
 
-            private string ReadLineWorker(bool includeNewLine) {
-                string res;
-                for (int i = _offset; i < _data.Length; i++) {
-                    if (_data[i] == '\n') {
-                        res = _data.Substring(_offset, i - _offset + (includeNewLine ? 1 : 0));
-                        _offset = i + 1;
-                        return res;
-                    }
+            /// <summary>
+            /// Called before each opcode is saved, commits and flushes the current frame once it is large enough.
+            /// </summary>
+            public void OpcodeBoundary() {
+                if (!Framing || _frameStart == -1) return;
+
+                if (_length - _frameStart - FrameHeaderSize >= FrameSizeTarget) {
+                    CommitFrame();
+                    Flush();
                 }
-                res = _data.Substring(_offset);
-                _offset = _data.Length;
-                return res;
             }
-        }
 
-        private class PythonFileLikeOutput : FileOutput {
-            private object _writeMethod;
+            public void CommitFrame() {
+                if (!Framing || _frameStart == -1) return;
 
-            public PythonFileLikeOutput(CodeContext/*!*/ context, object file) {
-                if (!PythonOps.TryGetBoundAttr(context, file, "write", out _writeMethod) ||
-                    !PythonOps.IsCallable(context, this._writeMethod)
-                ) {
-                    throw PythonOps.TypeError("argument must have callable 'write' attribute");
+                int frameLength = _length - _frameStart - FrameHeaderSize;
+                if (frameLength >= FrameSizeMin) {
+                    _data[_frameStart] = Opcode.Frame;
+                    BinaryPrimitives.WriteUInt64LittleEndian(_data.AsSpan(_frameStart + 1), (ulong)frameLength);
+                } else {
+                    // not worth a frame, drop the reserved header
+                    Buffer.BlockCopy(_data, _frameStart + FrameHeaderSize, _data, _frameStart, frameLength);
+                    _length -= FrameHeaderSize;
                 }
+                _frameStart = -1;
             }
 
-            public override void Write(CodeContext/*!*/ context, string data) {
-                PythonCalls.Call(context, _writeMethod, data);
-            }
-        }
-
-        private class PythonFileOutput : FileOutput {
-            private readonly PythonFile _file;
+            public void Flush() {
+                if (_write == null || _length == 0) return;
 
-            public PythonFileOutput(PythonFile file) {
-                _file = file;
+                var output = new byte[_length];
+                Buffer.BlockCopy(_data, 0, output, 0, _length);
+                _length = 0;
+                PythonCalls.Call(_context, _write, Bytes.Make(output));
             }
 
-            public override void Write(CodeContext/*!*/ context, string data) {
-                _file.write(data);
+            public Bytes GetValue() {
+                var output = new byte[_length];
+                Buffer.BlockCopy(_data, 0, output, 0, _length);
+                return Bytes.Make(output);
             }
         }
 
-        private class StringBuilderOutput : FileOutput {
-            private readonly StringBuilder _builder = new StringBuilder(4096);
-
-            public string GetString() {
-                return _builder.ToString();
-            }
+        #endregion
 
-            public override void Write(CodeContext context, char data) {
-                _builder.Append(data);
-            }
+        #region Pickler
+
+        [Documentation("Pickler(file, protocol=None, fix_imports=True, buffer_callback=None)\n\n"
+            + "This takes a binary file for writing a pickle data stream.\n\n"
+            + "The optional *protocol* argument tells the pickler to use the given\n"
+            + "protocol; supported protocols are 0 to 5. The default protocol is 3.\n"
+            + "Specifying a negative protocol version selects the highest protocol\n"
+            + "version supported.\n\n"
+            + "The *file* argument must have a write() method that accepts a single\n"
+            + "bytes argument.\n\n"
+            + "If *fix_imports* is True and protocol is less than 3, pickle will try\n"
+            + "to map the new Python 3 names to the old module names used in Python 2.\n\n"
+            + "If *buffer_callback* is None (the default), buffer views are serialized\n"
+            + "into *file* as part of the pickle stream. It is an error if\n"
+            + "*buffer_callback* is not None and *protocol* is None or smaller than 5."
+            )]
+        [PythonType]
+        public class Pickler {
+            private readonly CodeContext _context;
+            private PickleWriter? _writer;
+            private int _proto;
+            private bool _bin;
+            private bool _fixImports;
+            private object? _bufferCallback;
+            private object? _persistentId;
+            private object? _dispatchTable;
+            private object? _reducerOverride;
+            private Dictionary<object, int> _memo = new Dictionary<object, int>(ReferenceEqualityComparer<object>.Instance);
 
-            public override void Write(CodeContext context, int data) {
-                _builder.Append((char)(int)((data) & 0xff));
-                _builder.Append((char)(int)((data >> 8) & 0xff));
-                _builder.Append((char)(int)((data >> 16) & 0xff));
-                _builder.Append((char)(int)((data >> 24) & 0xff));
+            internal Pickler(CodeContext/*!*/ context) {
+                _context = context;
             }
 
-            public override void Write(CodeContext context, string data) {
-                _builder.Append(data);
+            public Pickler(CodeContext/*!*/ context, [ParamDictionary] IDictionary<object, object> kwArgs, [NotNone] params object[] args)
+                : this(context) {
             }
-        }
 
-        private class PythonReadableFileOutput : PythonFileLikeOutput {
-            private object _getValueMethod;
-
-            public PythonReadableFileOutput(CodeContext/*!*/ context, object file)
-                : base(context, file) {
-                if (!PythonOps.TryGetBoundAttr(context, file, "getvalue", out _getValueMethod) ||
-                    !PythonOps.IsCallable(context, _getValueMethod)
-                ) {
-                    throw PythonOps.TypeError("argument must have callable 'getvalue' attribute");
+            public void __init__(CodeContext/*!*/ context, object? file, object? protocol = null, bool fix_imports = true, object? buffer_callback = null) {
+                if (!PythonOps.TryGetBoundAttr(context, file, "write", out object? write)) {
+                    throw PythonOps.TypeError("file must have a 'write' attribute");
                 }
+                Initialize(context, write, protocol, fix_imports, buffer_callback);
             }
 
-            public object GetValue(CodeContext/*!*/ context) {
-                return PythonCalls.Call(context, _getValueMethod);
-            }
-        }
+            internal void Initialize(CodeContext/*!*/ context, object? write, object? protocol, bool fixImports, object? bufferCallback) {
+                int proto = protocol == null ? DefaultProtocol : context.LanguageContext.ConvertToInt32(protocol);
+                if (proto < 0) {
+                    proto = HighestProtocol;
+                } else if (proto > HighestProtocol) {
+                    throw PythonOps.ValueError("pickle protocol must be <= {0}", HighestProtocol);
+                }
+                if (bufferCallback != null && proto < 5) {
+                    throw PythonOps.ValueError("buffer_callback needs protocol >= 5");
+                }
 
-        #endregion
+                _writer = new PickleWriter(context, write);
+                _proto = proto;
+                _bin = proto >= 1;
+                _fixImports = fixImports && proto < 3;
+                _bufferCallback = bufferCallback;
+                _memo.Clear();
 
-        #region Opcode constants
+                // methods and attributes overridden by subclasses
+                if (GetType() != typeof(Pickler)) {
+                    PythonOps.TryGetBoundAttr(context, this, "persistent_id", out _persistentId);
+                    PythonOps.TryGetBoundAttr(context, this, "dispatch_table", out _dispatchTable);
+                    PythonOps.TryGetBoundAttr(context, this, "reducer_override", out _reducerOverride);
+                }
+            }
 
-        internal static class Opcode {
-            public const char Append = 'a';
-            public const char Appends = 'e';
-            public const char BinFloat = 'G';
-            public const char BinGet = 'h';
-            public const char BinInt = 'J';
-            public const char BinInt1 = 'K';
-            public const char BinInt2 = 'M';
-            public const char BinPersid = 'Q';
-            public const char BinPut = 'q';
-            public const char BinString = 'T';
-            public const char BinUnicode = 'X';
-            public const char Build = 'b';
-            public const char Dict = 'd';
-            public const char Dup = '2';
-            public const char EmptyDict = '}';
-            public const char EmptyList = ']';
-            public const char EmptyTuple = ')';
-            public const char Ext1 = '\x82';
-            public const char Ext2 = '\x83';
-            public const char Ext4 = '\x84';
-            public const char Float = 'F';
-            public const char Get = 'g';
-            public const char Global = 'c';
-            public const char Inst = 'i';
-            public const char Int = 'I';
-            public const char List = 'l';
-            public const char Long = 'L';
-            public const char Long1 = '\x8a';
-            public const char Long4 = '\x8b';
-            public const char LongBinGet = 'j';
-            public const char LongBinPut = 'r';
-            public const char Mark = '(';
-            public const char NewFalse = '\x89';
-            public const char NewObj = '\x81';
-            public const char NewTrue = '\x88';
-            public const char NoneValue = 'N';
-            public const char Obj = 'o';
-            public const char PersId = 'P';
-            public const char Pop = '0';
-            public const char PopMark = '1';
-            public const char Proto = '\x80';
-            public const char Put = 'p';
-            public const char Reduce = 'R';
-            public const char SetItem = 's';
-            public const char SetItems = 'u';
-            public const char ShortBinstring = 'U';
-            public const char Stop = '.';
-            public const char String = 'S';
-            public const char Tuple = 't';
-            public const char Tuple1 = '\x85';
-            public const char Tuple2 = '\x86';
-            public const char Tuple3 = '\x87';
-            public const char Unicode = 'V';
-        }
+            #region Public API
 
-        #endregion
+            [Documentation("dump(obj) -> None\n\nWrite a pickled representation of the given object to the open file.")]
+            public void dump(CodeContext/*!*/ context, object? obj) {
+                if (_writer == null) {
+                    throw PicklingError(context, $"Pickler.__init__() was not called by {PythonOps.GetPythonTypeName(this)}.__init__()");
+                }
 
-        #region Pickler object
+                if (_proto >= 2) {
+                    _writer.Write(Opcode.Proto, (byte)_proto);
+                    if (_proto >= 4) {
+                        _writer.Framing = true;
+                    }
+                }
 
-        public static PicklerObject/*!*/ Pickler(CodeContext/*!*/ context, object file=null, object protocol=null, object bin=null) {
-            return new PicklerObject(context, file, protocol, bin);
-        }
+                try {
+                    Save(obj);
+                    _writer.Write(Opcode.Stop);
+                    _writer.CommitFrame();
+                } finally {
+                    _writer.Framing = false;
+                }
+                _writer.Flush();
+            }
 
-        [Documentation("Pickler(file, protocol=0) -> Pickler object\n\n"
-            + "A Pickler object serializes Python objects to a pickle bytecode stream, which\n"
-            + "can then be converted back into equivalent objects using an Unpickler.\n"
-            + "\n"
-            + "file: an object (such as an open file) that has a write(string) method.\n"
-            + "protocol: if omitted, protocol 0 is used. If HIGHEST_PROTOCOL or a negative\n"
-            + "    number, the highest available protocol is used.\n"
-            + "bin: (deprecated; use protocol instead) for backwards compability, a 'bin'\n"
-            + "    keyword parameter is supported. When protocol is specified it is ignored.\n"
-            + "    If protocol is not specified, then protocol 0 is used if bin is false, and\n"
-            + "    protocol 1 is used if bin is true."
-            )]
-        [PythonType("Pickler"), PythonHidden]
-        public class PicklerObject {
-
-            private const char LowestPrintableChar = (char)32;
-            private const char HighestPrintableChar = (char)126;
-            // max elements that can be set/appended at a time using SETITEMS/APPENDS
-
-            private delegate void PickleFunction(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object value);
-            private static readonly Dictionary<Type, PickleFunction> _dispatchTable;
-
-            private int _batchSize = 1000;
-            private FileOutput _file;
-            private int _protocol;
-            private PythonDictionary _memo;               // memo if the user accesses the memo property
-            private Dictionary<object, int> _privMemo;    // internal fast memo which we can use if the user doesn't access memo
-            private object _persist_id;
-
-            static PicklerObject() {
-                _dispatchTable = new Dictionary<Type, PickleFunction>();
-                _dispatchTable[typeof(PythonDictionary)] = SaveDict;
-                _dispatchTable[typeof(PythonTuple)] = SaveTuple;
-                _dispatchTable[typeof(PythonList)] = SaveList;
-                _dispatchTable[typeof(PythonFunction)] = SaveGlobal;
-                _dispatchTable[typeof(BuiltinFunction)] = SaveGlobal;
-                _dispatchTable[typeof(PythonType)] = SaveGlobal;
+            [Documentation("clear_memo() -> None\n\n"
+                + "Clears the pickler's \"memo\".\n\n"
+                + "The memo is the data structure that remembers which objects the\n"
+                + "pickler has already seen, so that shared or recursive objects are\n"
+                + "pickled by reference and not by value."
+                )]
+            public void clear_memo() {
+                _memo.Clear();
             }
-            #region Public API
 
-            [System.Diagnostics.CodeAnalysis.SuppressMessage("Microsoft.Usage", "CA2227:CollectionPropertiesShouldBeReadOnly")]
+            /// <summary>
+            /// A copy of the memo as a dictionary mapping id(obj) to (index, obj).
+            /// </summary>
             public PythonDictionary memo {
                 get {
-                    if (_memo == null) {
-                        // create publicly viewable memo
-                        PythonDictionary resMemo = new PythonDictionary();
-                        foreach (var v in _privMemo) {
-                            resMemo._storage.AddNoLock(
-                                ref resMemo._storage,
-                                Builtin.id(v.Key),
-                                PythonTuple.MakeTuple(v.Value, v.Key)
-                            );
-                        }
-                        _memo = resMemo;
+                    var res = new PythonDictionary(_memo.Count);
+                    foreach (KeyValuePair<object, int> entry in _memo) {
+                        res[PythonOps.Id(entry.Key)] = PythonTuple.MakeTuple(entry.Value, entry.Key);
                     }
-                    return _memo;
+                    return res;
                 }
                 set {
-                    _memo = value;
-                    _privMemo = null;
+                    var memo = new Dictionary<object, int>(ReferenceEqualityComparer<object>.Instance);
+                    foreach (object? entry in value.Values) {
+                        if (entry is not PythonTuple t || t.Count != 2 || t[1] is null) {
+                            throw PythonOps.TypeError("'memo' values must be 2-item tuples");
+                        }
+                        memo[t[1]!] = _context.LanguageContext.ConvertToInt32(t[0]!);
+                    }
+                    _memo = memo;
                 }
             }
 
-            public int proto {
-                get { return _protocol; }
-                set { _protocol = value; }
+            public object? persistent_id {
+                get => _persistentId;
+                set => _persistentId = value;
             }
 
-            public int _BATCHSIZE {
-                get { return _batchSize; }
-                set { _batchSize = value; }
+            public object? dispatch_table {
+                get => _dispatchTable;
+                set => _dispatchTable = value;
             }
 
-            public object persistent_id {
-                get {
-                    return _persist_id;
+            public bool bin {
+                get => _bin;
+                set => _bin = value;
+            }
+
+            public bool fast { get; set; }
+
+            #endregion
+
+            internal Bytes GetValue() => _writer!.GetValue();
+
+            #region Save
+
+            private void Save(object? obj, bool savePersistentId = true) {
+                PickleWriter writer = _writer!;
+                writer.OpcodeBoundary();
+
+                if (savePersistentId && _persistentId != null && SavePersistentId(obj)) {
+                    return;
                 }
-                set {
-                    _persist_id = value;
-                }
-            }
-
-            public int binary {
-                get { return _protocol == 0 ? 1 : 0; }
-                set { _protocol = value; }
-            }
-
-            public int fast {
-                // We don't implement fast, but we silently ignore it when it's set so that test_cpickle works.
-                // For a description of fast, see http://mail.python.org/pipermail/python-bugs-list/2001-October/007695.html
-                get { return 0; }
-                set { /* ignore */ }
-            }
-
-            public PicklerObject(CodeContext/*!*/ context, object file, object protocol, object bin) {
-                int intProtocol;
-                if (file == null) {
-                    _file = new PythonReadableFileOutput(context, new PythonIOModule.StringIO(context, "", "\n"));
-                } else if (Converter.TryConvertToInt32(file, out intProtocol)) {
-                    // For undocumented (yet tested in official CPython tests) list-based pickler, the
-                    // user could do something like Pickler(1), which would create a protocol-1 pickler
-                    // with an internal string output buffer (retrievable using getvalue()). For a little
-                    // more info, see
-                    // https://sourceforge.net/tracker/?func=detail&atid=105470&aid=939395&group_id=5470
-                    _file = new PythonReadableFileOutput(context, new PythonIOModule.StringIO(context, "", "\n"));
-                    protocol = file;
-                } else if (file is PythonFile) {
-                    _file = new PythonFileOutput((PythonFile)file);
-                } else if (file is FileOutput) {
-                    _file = (FileOutput)file;
-                } else {
-                    _file = new PythonFileLikeOutput(context, file);
+
+                // atoms, never memoized
+                if (obj == null) {
+                    writer.Write(Opcode.None);
+                    return;
+                } else if (obj is bool b) {
+                    SaveBool(b);
+                    return;
+                } else if (obj is int i) {
+                    SaveInt(i);
+                    return;
+                } else if (obj is BigInteger bi) {
+                    SaveLong(bi);
+                    return;
+                } else if (obj is double d) {
+                    SaveFloat(d);
+                    return;
                 }
 
-                _privMemo = new Dictionary<object, int>(256, ReferenceEqualityComparer.Instance);
+                if (_memo.TryGetValue(obj, out int index)) {
+                    WriteGet(index);
+                    return;
+                }
 
-                if (protocol == null) protocol = PythonOps.IsTrue(bin) ? 1 : 0;
+                // exact types only, subclasses are pickled through the reduce protocol
+                Type type = obj.GetType();
+                if (type == typeof(string)) {
+                    SaveUnicode((string)obj);
+                    return;
+                } else if (type == typeof(Bytes)) {
+                    SaveBytes((Bytes)obj);
+                    return;
+                } else if (type == typeof(PythonDictionary)) {
+                    SaveDict((PythonDictionary)obj);
+                    return;
+                } else if (type == typeof(SetCollection)) {
+                    SaveSet((SetCollection)obj);
+                    return;
+                } else if (type == typeof(FrozenSetCollection)) {
+                    SaveFrozenSet((FrozenSetCollection)obj);
+                    return;
+                } else if (type == typeof(PythonList)) {
+                    SaveList((PythonList)obj);
+                    return;
+                } else if (type == typeof(PythonTuple)) {
+                    SaveTuple((PythonTuple)obj);
+                    return;
+                } else if (type == typeof(ByteArray) && _proto >= 5) {
+                    SaveByteArray((ByteArray)obj);
+                    return;
+                } else if (type == typeof(PickleBuffer)) {
+                    SavePickleBuffer((PickleBuffer)obj);
+                    return;
+                }
 
-                intProtocol = context.LanguageContext.ConvertToInt32(protocol);
-                if (intProtocol > highestProtocol) {
-                    throw PythonOps.ValueError("pickle protocol {0} asked for; the highest available protocol is {1}", intProtocol, highestProtocol);
-                } else if (intProtocol < 0) {
-                    this._protocol = highestProtocol;
-                } else {
-                    this._protocol = intProtocol;
-                }
-            }
-
-            [Documentation("dump(obj) -> None\n\n"
-                + "Pickle obj and write the result to the file object that was passed to the\n"
-                + "constructor\n."
-                + "\n"
-                + "Note that you may call dump() multiple times to pickle multiple objects. To\n"
-                + "unpickle the stream, you will need to call Unpickler's load() method a\n"
-                + "corresponding number of times.\n"
-                + "\n"
-                + "The first time a particular object is encountered, it will be pickled normally.\n"
-                + "If the object is encountered again (in the same or a later dump() call), a\n"
-                + "reference to the previously generated value will be pickled. Unpickling will\n"
-                + "then create multiple references to a single object."
-                )]
-            public void dump(CodeContext/*!*/ context, object obj) {
-                if (_protocol >= 2) WriteProto(context);
-                Save(context, obj);
-                Write(context, Opcode.Stop);
-            }
+                object? reduceValue;
+                if (_reducerOverride != null
+                    && (reduceValue = PythonCalls.Call(_context, _reducerOverride, obj)) != PythonOps.NotImplemented) {
+                    SaveReduceValue(obj, reduceValue);
+                    return;
+                }
 
-            [Documentation("clear_memo() -> None\n\n"
-                + "Clear the memo, which is used internally by the pickler to keep track of which\n"
-                + "objects have already been pickled (so that shared or recursive objects are\n"
-                + "pickled only once)."
-                )]
-            public void clear_memo() {
-                if (_memo != null) {
-                    _memo.Clear();
-                } else {
-                    _privMemo.Clear();
+                if (type == typeof(PythonType)) {
+                    SaveType((PythonType)obj);
+                    return;
+                } else if (type == typeof(PythonFunction)) {
+                    SaveGlobal(obj, null);
+                    return;
                 }
-            }
 
-            private void Memoize(object obj) {
-                if (_memo != null) {
-                    if (!MemoContains(PythonOps.Id(obj))) {
-                        _memo[PythonOps.Id(obj)] = PythonTuple.MakeTuple(_memo.Count, obj);
-                    }
+                object dispatchTable = _dispatchTable ?? PythonOps.GetBoundAttr(_context, _context.LanguageContext.GetCopyRegModule(), "dispatch_table");
+                PythonType pythonType = DynamicHelpers.GetPythonType(obj);
+                object? reducer;
+                if (dispatchTable is PythonDictionary dt) {
+                    dt.TryGetValue(pythonType, out reducer);
                 } else {
-                    if(!_privMemo.ContainsKey(obj)) {
-                        _privMemo[obj] = _privMemo.Count;
-                    }
+                    reducer = PythonOps.Invoke(_context, dispatchTable, "get", pythonType);
                 }
-            }
 
-            private int MemoizeNew(object obj) {
-                
-                int res;
-                if (_memo != null) {
-                    Debug.Assert(!_memo.ContainsKey(obj));
-                    _memo[PythonOps.Id(obj)] = PythonTuple.MakeTuple(res = _memo.Count, obj);
+                if (reducer != null) {
+                    reduceValue = PythonCalls.Call(_context, reducer, obj);
+                } else if (obj is PythonType) {
+                    // instance of a metaclass
+                    SaveGlobal(obj, null);
+                    return;
+                } else if (PythonOps.TryGetBoundAttr(_context, obj, "__reduce_ex__", out object? reduceEx)) {
+                    reduceValue = PythonCalls.Call(_context, reduceEx, _proto);
+                } else if (PythonOps.TryGetBoundAttr(_context, obj, "__reduce__", out object? reduce)) {
+                    reduceValue = PythonCalls.Call(_context, reduce);
                 } else {
-                    Debug.Assert(!_privMemo.ContainsKey(obj));
-                    _privMemo[obj] = res = _privMemo.Count;
+                    throw PicklingError(_context, $"Can't pickle {PythonOps.Repr(_context, pythonType.Name)} object: {PythonOps.Repr(_context, obj)}");
                 }
-                return res;
+
+                SaveReduceValue(obj, reduceValue);
             }
 
-            private bool MemoContains(object obj) {                
-                if (_memo != null) {
-                    return _memo.Contains(PythonOps.Id(obj));
+            private void SaveReduceValue(object obj, object? reduceValue) {
+                if (reduceValue is string name) {
+                    SaveGlobal(obj, name);
+                    return;
+                }
+
+                if (reduceValue is not PythonTuple rv) {
+                    throw PicklingError(_context, "__reduce__ must return a string or tuple");
+                }
+                if (rv.Count < 2 || rv.Count > 6) {
+                    throw PicklingError(_context, "tuple returned by __reduce__ must contain 2 through 6 elements");
                 }
 
-                return _privMemo.ContainsKey(obj);
+                SaveReduce(rv[0], rv[1],
+                    rv.Count > 2 ? rv[2] : null,
+                    rv.Count > 3 ? rv[3] : null,
+                    rv.Count > 4 ? rv[4] : null,
+                    rv.Count > 5 ? rv[5] : null,
+                    obj);
             }
 
-            private bool TryWriteFastGet(CodeContext context, object obj) {
-                int value;
-                if (_memo != null) {
-                    return TryWriteSlowGet(context, obj);
-                } else if (_privMemo.TryGetValue(obj, out value)) {
-                    WriteGetOrPut(context, true, value);
-                    return true;
+            private bool SavePersistentId(object? obj) {
+                object? pid = PythonCalls.Call(_context, _persistentId, obj);
+                if (pid == null) return false;
+
+                if (_bin) {
+                    Save(pid, savePersistentId: false);
+                    _writer!.Write(Opcode.BinPersId);
+                } else {
+                    string str = PythonOps.ToString(_context, pid);
+                    if (!IsAscii(str)) {
+                        throw PicklingError(_context, "persistent IDs in protocol 0 must be ASCII strings");
+                    }
+                    _writer!.WriteAscii(Opcode.PersId, str);
                 }
-                return false;
+                return true;
             }
 
-            private bool TryWriteSlowGet(CodeContext context, object obj) {
-                object value;
-                if (_memo.TryGetValue(obj, out value)) {
-                    WriteGetOrPut(context, true, (PythonTuple)value);
-                    return true;
+            private void SaveBool(bool value) {
+                if (_proto >= 2) {
+                    _writer!.Write(value ? Opcode.NewTrue : Opcode.NewFalse);
+                } else {
+                    _writer!.WriteAscii(Opcode.Int, value ? "01" : "00");
                 }
-                return false;
             }
 
-            [Documentation("getvalue() -> string\n\n"
-                + "Return the value of the internal string. Raises PicklingError if a file object\n"
-                + "was passed to this pickler's constructor."
-                )]
-            public object getvalue(CodeContext/*!*/ context) {
-                if (_file is PythonReadableFileOutput) {
-                    return ((PythonReadableFileOutput)_file).GetValue(context);
+            private void SaveInt(int value) {
+                if (_bin) {
+                    if (value >= 0 && value <= 0xff) {
+                        _writer!.Write(Opcode.BinInt1, (byte)value);
+                    } else if (value >= 0 && value <= 0xffff) {
+                        _writer!.WriteUInt16(Opcode.BinInt2, value);
+                    } else {
+                        _writer!.WriteInt32(Opcode.BinInt, value);
+                    }
+                    return;
                 }
-                throw PythonExceptions.CreateThrowable(PicklingError(context), "Attempt to getvalue() a non-list-based pickler");
+                _writer!.WriteAscii(Opcode.Long, value.ToString(CultureInfo.InvariantCulture) + "L");
             }
 
-            #endregion
+            private void SaveLong(BigInteger value) {
+                if (_bin && value >= int.MinValue && value <= int.MaxValue) {
+                    SaveInt((int)value);
+                    return;
+                }
 
-            #region Save functions
-
-            private void Save(CodeContext/*!*/ context, object obj) {
-                if (_persist_id == null || !TrySavePersistId(context, obj)) {
-                    PickleFunction pickleFunction;
-                    // several typees are never memoized, check for these first.
-                    if (obj == null) {
-                        SaveNone(this, context, obj);
-                    } else if (obj is int) {
-                        SaveInteger(this, context, obj);
-                    } else if(obj is BigInteger) {
-                        SaveLong(this, context, obj);
-                    } else if (obj is bool) {
-                        SaveBoolean(this, context, obj);
-                    } else if (obj is double) {
-                        SaveFloat(this, context, obj);
-                    } else if(!TryWriteFastGet(context, obj)) {
-                        if (obj is string) {
-                            // strings are common, specialize them.
-                            SaveUnicode(this, context, obj);
-                        } else {
-                            if (!_dispatchTable.TryGetValue(obj.GetType(), out pickleFunction)) {
-                                if (obj is PythonType) {
-                                    // treat classes with metaclasses like regular classes
-                                    pickleFunction = SaveGlobal;
-                                } else {
-                                    pickleFunction = SaveObject;
-                                }
-                            }
-                            pickleFunction(this, context, obj);
-                        }      
+                if (_proto >= 2) {
+                    byte[] encoded = value.IsZero ? Array.Empty<byte>() : value.ToByteArray();
+                    if (encoded.Length < 256) {
+                        _writer!.Write(Opcode.Long1, (byte)encoded.Length);
+                    } else {
+                        _writer!.WriteInt32(Opcode.Long4, encoded.Length);
                     }
+                    _writer.Write(encoded);
+                    return;
                 }
+                _writer!.WriteAscii(Opcode.Long, value.ToString(CultureInfo.InvariantCulture) + "L");
             }
 
-            private bool TrySavePersistId(CodeContext context, object obj) {
-                Debug.Assert(_persist_id != null);
-                string res = Converter.ConvertToString(context.LanguageContext.CallSplat(_persist_id, obj));
-                if (res != null) {
-                    SavePersId(context, res);
-                    return true;
+            private void SaveFloat(double value) {
+                if (_bin) {
+                    int offset = _writer!.Reserve(9);
+                    _writer.Data[offset] = Opcode.BinFloat;
+                    BinaryPrimitives.WriteInt64BigEndian(_writer.Data.AsSpan(offset + 1), BitConverter.DoubleToInt64Bits(value));
+                    return;
                 }
-                
-                return false;
+                _writer!.WriteAscii(Opcode.Float, DoubleOps.__repr__(_context, value));
             }
 
-            private void SavePersId(CodeContext/*!*/ context, string res) {
-                if (this.binary != 0) {
-                    Save(context, res);
-                    Write(context, Opcode.BinPersid);
-                } else {
-                    Write(context, Opcode.PersId);
-                    Write(context, res);
-                    Write(context, "\n");
+            private void SaveUnicode(string value) {
+                PickleWriter writer = _writer!;
+                if (!_bin) {
+                    string escaped = value.Replace("\\", "\\u005c").Replace("\n", "\\u000a");
+                    Bytes encoded = StringOps.DoEncode(_context, escaped, "strict", "raw-unicode-escape", StringOps.CodecsInfo.RawUnicodeEscapeEncoding, includePreamble: false);
+                    writer.Write(Opcode.Unicode);
+                    writer.Write(encoded.AsSpan());
+                    writer.Write((byte)'\n');
+                    Memoize(value);
+                    return;
                 }
-            }
 
-            private static void SaveBoolean(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object obj) {
-                Debug.Assert(DynamicHelpers.GetPythonType(obj).Equals(TypeCache.Boolean), "arg must be bool");
-                if (pickler._protocol < 2) {
-                    pickler.Write(context, Opcode.Int);
-                    pickler.Write(context, String.Format("0{0}", ((bool)obj) ? 1 : 0));
-                    pickler.Write(context, Newline);
+                byte[]? data = null;
+                int length;
+                try {
+                    length = StrictUtf8.GetByteCount(value);
+                } catch (EncoderFallbackException) {
+                    // lone surrogates
+                    data = StringOps.DoEncode(_context, value, "surrogatepass", "utf-8", Encoding.UTF8, includePreamble: false).UnsafeByteArray;
+                    length = data.Length;
+                }
+
+                if (length >= PickleWriter.FrameSizeTarget) {
+                    data ??= StrictUtf8.GetBytes(value);
+                    Span<byte> header = stackalloc byte[5];
+                    header[0] = Opcode.BinUnicode;
+                    BinaryPrimitives.WriteInt32LittleEndian(header.Slice(1), length);
+                    writer.WriteBytes(header, data, Bytes.Make(data));
                 } else {
-                    if ((bool)obj) {
-                        pickler.Write(context, Opcode.NewTrue);
+                    int headerSize = length <= 0xff && _proto >= 4 ? 2 : 5;
+                    int offset = writer.Reserve(headerSize + length);
+                    byte[] buffer = writer.Data;
+                    if (headerSize == 2) {
+                        buffer[offset] = Opcode.ShortBinUnicode;
+                        buffer[offset + 1] = (byte)length;
+                    } else {
+                        buffer[offset] = Opcode.BinUnicode;
+                        BinaryPrimitives.WriteInt32LittleEndian(buffer.AsSpan(offset + 1), length);
+                    }
+                    if (data != null) {
+                        Buffer.BlockCopy(data, 0, buffer, offset + headerSize, length);
                     } else {
-                        pickler.Write(context, Opcode.NewFalse);
+                        StrictUtf8.GetBytes(value, 0, value.Length, buffer, offset + headerSize);
                     }
                 }
+                Memoize(value);
             }
 
-            private static void SaveDict(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object obj) {
-                Debug.Assert(DynamicHelpers.GetPythonType(obj).Equals(TypeCache.Dict), "arg must be dict");
-                Debug.Assert(!pickler.MemoContains(obj));
+            private void SaveBytes(Bytes value) {
+                if (_proto < 3) {
+                    if (value.Count == 0) {
+                        SaveReduce(TypeCache.Bytes, PythonTuple.EMPTY, null, null, null, null, value);
+                    } else {
+                        object encode = PythonOps.GetBoundAttr(_context, Importer.ImportModule(_context, new PythonDictionary(), "codecs", false, 0), "encode");
+                        string latin1 = StringOps.Latin1Encoding.GetString(value.UnsafeByteArray, 0, value.Count);
+                        SaveReduce(encode, PythonTuple.MakeTuple(latin1, "latin1"), null, null, null, null, value);
+                    }
+                    return;
+                }
 
-                int index = pickler.MemoizeNew(obj);
+                SaveBytesData(value, value.AsSpan(), value);
+            }
 
-                if (pickler._protocol < 1) {
-                    pickler.Write(context, Opcode.Mark);
-                    pickler.Write(context, Opcode.Dict);
+            private void SaveBytesData(object obj, ReadOnlySpan<byte> data, object? payload) {
+                PickleWriter writer = _writer!;
+                if (data.Length <= 0xff) {
+                    writer.Write(Opcode.ShortBinBytes, (byte)data.Length);
+                    writer.Write(data);
                 } else {
-                    pickler.Write(context, Opcode.EmptyDict);
+                    Span<byte> header = stackalloc byte[5];
+                    header[0] = Opcode.BinBytes;
+                    BinaryPrimitives.WriteInt32LittleEndian(header.Slice(1), data.Length);
+                    writer.WriteBytes(header, data, payload);
                 }
+                Memoize(obj);
+            }
 
-                pickler.WritePut(context, index);
-
-                pickler.BatchSetItems(context, (PythonDictionary)obj);
+            private void SaveByteArray(ByteArray value) {
+                using IPythonBuffer buffer = value.GetBuffer();
+                SaveByteArrayData(value, buffer.AsReadOnlySpan(), value);
             }
 
-            private static void SaveFloat(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object obj) {
-                Debug.Assert(DynamicHelpers.GetPythonType(obj).Equals(TypeCache.Double), "arg must be float");
+            private void SaveByteArrayData(object obj, ReadOnlySpan<byte> data, object? payload) {
+                Span<byte> header = stackalloc byte[9];
+                header[0] = Opcode.ByteArray8;
+                BinaryPrimitives.WriteUInt64LittleEndian(header.Slice(1), (ulong)data.Length);
+                _writer!.WriteBytes(header, data, payload);
+                Memoize(obj);
+            }
 
-                if (pickler._protocol < 1) {
-                    pickler.Write(context, Opcode.Float);
-                    pickler.WriteFloatAsString(context, obj);
-                } else {
-                    pickler.Write(context, Opcode.BinFloat);
-                    pickler.WriteFloat64(context, obj);
+            private void SavePickleBuffer(PickleBuffer value) {
+                if (_proto < 5) {
+                    throw PicklingError(_context, "PickleBuffer can only pickled with protocol >= 5");
                 }
-            }
 
-            private static void SaveGlobal(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object obj) {
-                Debug.Assert(
-                    DynamicHelpers.GetPythonType(obj).Equals(TypeCache.Function) ||
-                    DynamicHelpers.GetPythonType(obj).Equals(TypeCache.BuiltinFunction) ||
-                    DynamicHelpers.GetPythonType(obj).Equals(TypeCache.PythonType) ||
-                    DynamicHelpers.GetPythonType(obj).IsSubclassOf(TypeCache.PythonType),
-                    "arg must be classic class, function, built-in function or method, or new-style type"
-                );
+                IPythonBuffer view = value.GetView();
+                if (!view.IsCContiguous()) {
+                    throw PicklingError(_context, "PickleBuffer can not be pickled when pointing to a non-contiguous buffer");
+                }
 
-                PythonType pt = obj as PythonType;
-                if (pt != null) {
-                    pickler.SaveGlobalByName(context, obj, pt.Name);
-                } else {
-                    object name;
-                    if (PythonOps.TryGetBoundAttr(context, obj, "__name__", out name)) {
-                        pickler.SaveGlobalByName(context, obj, name);
+                bool inBand = _bufferCallback == null || PythonOps.IsTrue(PythonCalls.Call(_context, _bufferCallback, value));
+                if (inBand) {
+                    // written straight from the exported memory, large views are passed to the file as they are
+                    if (view.IsReadOnly) {
+                        SaveBytesData(value, view.AsReadOnlySpan(), value.raw());
                     } else {
-                        throw pickler.CannotPickle(context, obj, "could not determine its __name__");
+                        SaveByteArrayData(value, view.AsReadOnlySpan(), value.raw());
+                    }
+                } else {
+                    _writer!.Write(Opcode.NextBuffer);
+                    if (view.IsReadOnly) {
+                        _writer.Write(Opcode.ReadOnlyBuffer);
                     }
                 }
             }
 
-            private void SaveGlobalByName(CodeContext/*!*/ context, object obj, object name) {
-                Debug.Assert(!MemoContains(obj));
-
-                object moduleName = FindModuleForGlobal(context, obj, name);
+            private void SaveTuple(PythonTuple value) {
+                PickleWriter writer = _writer!;
+                int count = value.Count;
+                if (count == 0) {
+                    if (_bin) {
+                        writer.Write(Opcode.EmptyTuple);
+                    } else {
+                        writer.Write(Opcode.Mark);
+                        writer.Write(Opcode.Tuple);
+                    }
+                    return;
+                }
 
-                if (_protocol >= 2) {
-                    object code;
-                    if (PythonCopyReg.GetExtensionRegistry(context).TryGetValue(PythonTuple.MakeTuple(moduleName, name), out code)) {
-                        if (IsUInt8(context, code)) {
-                            Write(context, Opcode.Ext1);
-                            WriteUInt8(context, code);
-                        } else if (IsUInt16(context, code)) {
-                            Write(context, Opcode.Ext2);
-                            WriteUInt16(context, code);
-                        } else if (IsInt32(context, code)) {
-                            Write(context, Opcode.Ext4);
-                            WriteInt32(context, code);
-                        } else {
-                            throw PythonOps.RuntimeError("unrecognized integer format");
+                object?[] items = value._data;
+                if (count <= 3 && _proto >= 2) {
+                    foreach (object? item in items) {
+                        Save(item);
+                    }
+                    // a recursive tuple was memoized while saving its items
+                    if (_memo.TryGetValue(value, out int index)) {
+                        for (int i = 0; i < count; i++) {
+                            writer.Write(Opcode.Pop);
                         }
-                        return;
+                        WriteGet(index);
+                    } else {
+                        writer.Write((byte)(Opcode.Tuple1 + count - 1));
+                        Memoize(value);
                     }
+                    return;
                 }
 
-                MemoizeNew(obj);
-
-                Write(context, Opcode.Global);
-                WriteStringPair(context, moduleName, name);
-                WritePut(context, obj);
-            }            
+                writer.Write(Opcode.Mark);
+                foreach (object? item in items) {
+                    Save(item);
+                }
 
-            private static void SaveInteger(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object obj) {
-                Debug.Assert(DynamicHelpers.GetPythonType(obj).Equals(TypeCache.Int32), "arg must be int");
-                if (pickler._protocol < 1) {
-                    pickler.Write(context, Opcode.Int);
-                    pickler.WriteIntAsString(context, obj);
-                } else {
-                    if (IsUInt8(context, obj)) {
-                        pickler.Write(context, Opcode.BinInt1);
-                        pickler.WriteUInt8(context, obj);
-                    } else if (IsUInt16(context, obj)) {
-                        pickler.Write(context, Opcode.BinInt2);
-                        pickler.WriteUInt16(context, obj);
-                    } else if (IsInt32(context, obj)) {
-                        pickler.Write(context, Opcode.BinInt);
-                        pickler.WriteInt32(context, obj);
+                if (_memo.TryGetValue(value, out int memoIndex)) {
+                    if (_bin) {
+                        writer.Write(Opcode.PopMark);
                     } else {
-                        throw PythonOps.RuntimeError("unrecognized integer format");
+                        // protocol 0 has no POP_MARK
+                        for (int i = 0; i <= count; i++) {
+                            writer.Write(Opcode.Pop);
+                        }
                     }
+                    WriteGet(memoIndex);
+                    return;
                 }
-            }
 
-            private static void SaveList(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object obj) {
-                Debug.Assert(DynamicHelpers.GetPythonType(obj).Equals(TypeCache.PythonList), "arg must be list");
-                Debug.Assert(!pickler.MemoContains(obj));
+                writer.Write(Opcode.Tuple);
+                Memoize(value);
+            }
 
-                int index = pickler.MemoizeNew(obj);
-                if (pickler._protocol < 1) {
-                    pickler.Write(context, Opcode.Mark);
-                    pickler.Write(context, Opcode.List);
+            private void SaveList(PythonList value) {
+                if (_bin) {
+                    _writer!.Write(Opcode.EmptyList);
                 } else {
-                    pickler.Write(context, Opcode.EmptyList);
-                }
-
-                pickler.WritePut(context, index);
-                pickler.BatchAppends(context, ((IEnumerable)obj).GetEnumerator());
-            }
-
-            private static readonly BigInteger MaxInt = new BigInteger(Int32.MaxValue);
-            private static readonly BigInteger MinInt = new BigInteger(Int32.MinValue);
-
-            private static void SaveLong(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object obj) {
-                Debug.Assert(DynamicHelpers.GetPythonType(obj).Equals(TypeCache.BigInteger), "arg must be long");
-
-                BigInteger bi = (BigInteger)obj;
-                if (pickler._protocol < 2) {
-                    pickler.Write(context, Opcode.Long);
-                    pickler.WriteLongAsString(context, obj);
-                } else if (bi.IsZero()) {
-                    pickler.Write(context, Opcode.Long1);
-                    pickler.WriteUInt8(context, 0);
-                } else if (bi <= MaxInt && bi >= MinInt) {
-                    pickler.Write(context, Opcode.Long1);
-                    int value = (int)bi;
-                    if (IsInt8(value)) {
-                        pickler.WriteUInt8(context, 1);
-                        pickler._file.Write(context, (char)(byte)value);
-                    } else if (IsInt16(value)) {
-                        pickler.WriteUInt8(context, 2);
-                        pickler.WriteUInt8(context, value & 0xff);
-                        pickler.WriteUInt8(context, (value >> 8) & 0xff);
-                    } else {
-                        pickler.WriteUInt8(context, 4);
-                        pickler.WriteInt32(context, value);
+                    _writer!.Write(Opcode.Mark);
+                    _writer.Write(Opcode.List);
+                }
+                Memoize(value);
+                BatchAppends(PythonOps.GetEnumerator(_context, value));
+            }
+
+            private void BatchAppends(IEnumerator items) {
+                PickleWriter writer = _writer!;
+                if (!_bin) {
+                    while (items.MoveNext()) {
+                        Save(items.Current);
+                        writer.Write(Opcode.Append);
                     }
-                } else {
-                    byte[] dataBytes = bi.ToByteArray();
-                    if (dataBytes.Length < 256) {
-                        pickler.Write(context, Opcode.Long1);
-                        pickler.WriteUInt8(context, dataBytes.Length);
-                    } else {
-                        pickler.Write(context, Opcode.Long4);
-                        pickler.WriteInt32(context, dataBytes.Length);
+                    return;
+                }
+
+                var batch = new List<object?>();
+                while (true) {
+                    batch.Clear();
+                    while (batch.Count < BatchSize && items.MoveNext()) {
+                        batch.Add(items.Current);
                     }
 
-                    foreach (byte b in dataBytes) {
-                        pickler.WriteUInt8(context, b);
+                    if (batch.Count > 1) {
+                        writer.Write(Opcode.Mark);
+                        foreach (object? item in batch) {
+                            Save(item);
+                        }
+                        writer.Write(Opcode.Appends);
+                    } else if (batch.Count == 1) {
+                        Save(batch[0]);
+                        writer.Write(Opcode.Append);
                     }
+
+                    if (batch.Count < BatchSize) return;
                 }
             }
 
-            private static void SaveNone(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object obj) {
-                Debug.Assert(DynamicHelpers.GetPythonType(obj).Equals(TypeCache.Null), "arg must be None");
-                pickler.Write(context, Opcode.NoneValue);
+            private void SaveDict(PythonDictionary value) {
+                if (_bin) {
+                    _writer!.Write(Opcode.EmptyDict);
+                } else {
+                    _writer!.Write(Opcode.Mark);
+                    _writer.Write(Opcode.Dict);
+                }
+                Memoize(value);
+                BatchSetItems(value._storage.GetItems().GetEnumerator());
             }
 
-            /// <summary>
-            /// Call the appropriate reduce method for obj and pickle the object using
-            /// the resulting data. Use the first available of
-            /// copyreg.dispatch_table[type(obj)], obj.__reduce_ex__, and obj.__reduce__.
-            /// </summary>
-            private void SaveObject(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object obj) {
-                Debug.Assert(!MemoContains(obj));
-                MemoizeNew(obj);
-
-                object reduceCallable, result;
-                PythonType objType = DynamicHelpers.GetPythonType(obj);
-
-                if (((IDictionary<object, object>)PythonCopyReg.GetDispatchTable(context)).TryGetValue(objType, out reduceCallable)) {
-                    result = PythonCalls.Call(context, reduceCallable, obj);
-                } else if (PythonOps.TryGetBoundAttr(context, obj, "__reduce_ex__", out reduceCallable)) {
-                    if (obj is PythonType) {
-                        result = context.LanguageContext.Call(context, reduceCallable, obj, _protocol);
-                    } else {
-                        result = context.LanguageContext.Call(context, reduceCallable, _protocol);
-                    }
-                } else if (PythonOps.TryGetBoundAttr(context, obj, "__reduce__", out reduceCallable)) {
-                    if (obj is PythonType) {
-                        result = context.LanguageContext.Call(context, reduceCallable, obj);
-                    } else {
-                        result = context.LanguageContext.Call(context, reduceCallable);
+            private void BatchSetItems(IEnumerator<KeyValuePair<object?, object?>> items) {
+                PickleWriter writer = _writer!;
+                if (!_bin) {
+                    while (items.MoveNext()) {
+                        Save(items.Current.Key);
+                        Save(items.Current.Value);
+                        writer.Write(Opcode.SetItem);
                     }
-                } else {
-                    throw PythonOps.AttributeError("no reduce function found for {0}", obj);
+                    return;
                 }
 
-                if (objType.Equals(TypeCache.String)) {
-                    if (!TryWriteFastGet(context, obj)) {
-                        SaveGlobalByName(context, obj, result);
+                var batch = new List<KeyValuePair<object?, object?>>();
+                while (true) {
+                    batch.Clear();
+                    while (batch.Count < BatchSize && items.MoveNext()) {
+                        batch.Add(items.Current);
                     }
-                } else if (result is PythonTuple) {
-                    PythonTuple rt = (PythonTuple)result;
-                    switch (rt.__len__()) {
-                        case 2:
-                            SaveReduce(context, obj, reduceCallable, rt[0], rt[1], null, null, null);
-                            break;
-                        case 3:
-                            SaveReduce(context, obj, reduceCallable, rt[0], rt[1], rt[2], null, null);
-                            break;
-                        case 4:
-                            SaveReduce(context, obj, reduceCallable, rt[0], rt[1], rt[2], rt[3], null);
-                            break;
-                        case 5:
-                            SaveReduce(context, obj, reduceCallable, rt[0], rt[1], rt[2], rt[3], rt[4]);
-                            break;
-                        default:
-                            throw CannotPickle(context, obj, "tuple returned by {0} must have to to five elements", reduceCallable);
+
+                    if (batch.Count > 1) {
+                        writer.Write(Opcode.Mark);
+                        foreach (KeyValuePair<object?, object?> item in batch) {
+                            Save(item.Key);
+                            Save(item.Value);
+                        }
+                        writer.Write(Opcode.SetItems);
+                    } else if (batch.Count == 1) {
+                        Save(batch[0].Key);
+                        Save(batch[0].Value);
+                        writer.Write(Opcode.SetItem);
                     }
-                } else {
-                    throw CannotPickle(context, obj, "{0} must return string or tuple", reduceCallable);
+
+                    if (batch.Count < BatchSize) return;
                 }
             }
 
-            /// <summary>
-            /// Pickle the result of a reduce function.
-            /// 
-            /// Only context, obj, func, and reduceCallable are required; all other arguments may be null.
-            /// </summary>
-            private void SaveReduce(CodeContext/*!*/ context, object obj, object reduceCallable, object func, object args, object state, object listItems, object dictItems) {
-                if (!PythonOps.IsCallable(context, func)) {
-                    throw CannotPickle(context, obj, "func from reduce() should be callable");
-                } else if (!(args is PythonTuple) && args != null) {
-                    throw CannotPickle(context, obj, "args from reduce() should be a tuple");
-                } else if (listItems != null && !(listItems is IEnumerator)) {
-                    throw CannotPickle(context, obj, "listitems from reduce() should be a list iterator");
-                } else if (dictItems != null && !(dictItems is IEnumerator)) {
-                    throw CannotPickle(context, obj, "dictitems from reduce() should be a dict iterator");
-                }
-
-                object funcName;
-                string funcNameString;
-                if (func is PythonType) {
-                    funcNameString = ((PythonType)func).Name;
-                } else {
-                    if (!PythonOps.TryGetBoundAttr(context, func, "__name__", out funcName)) {
-                        throw CannotPickle(context, obj, "func from reduce() ({0}) should have a __name__ attribute");
-                    } else if (!Converter.TryConvertToString(funcName, out funcNameString) || funcNameString == null) {
-                        throw CannotPickle(context, obj, "__name__ of func from reduce() must be string");
+            private static IEnumerator<KeyValuePair<object?, object?>> EnumerateDictItems(IEnumerator items) {
+                while (items.MoveNext()) {
+                    if (items.Current is not PythonTuple item || item.Count != 2) {
+                        throw PythonOps.TypeError("dict items iterator must return 2-tuples");
                     }
+                    yield return new KeyValuePair<object?, object?>(item[0], item[1]);
+                }
+            }
+
+            private void SaveSet(SetCollection value) {
+                if (_proto < 4) {
+                    SaveReduce(TypeCache.Set, PythonTuple.MakeTuple(new PythonList(_context, value)), null, null, null, null, value);
+                    return;
                 }
 
-                if (_protocol >= 2 && "__newobj__" == funcNameString) {
-                    if (args == null) {
-                        throw CannotPickle(context, obj, "__newobj__ arglist is None");
+                PickleWriter writer = _writer!;
+                writer.Write(Opcode.EmptySet);
+                Memoize(value);
+
+                IEnumerator items = PythonOps.GetEnumerator(_context, value);
+                var batch = new List<object?>();
+                while (true) {
+                    batch.Clear();
+                    while (batch.Count < BatchSize && items.MoveNext()) {
+                        batch.Add(items.Current);
                     }
-                    PythonTuple argsTuple = (PythonTuple)args;
-                    if (argsTuple.__len__() == 0) {
-                        throw CannotPickle(context, obj, "__newobj__ arglist is empty");
-                    } else if (!DynamicHelpers.GetPythonType(obj).Equals(argsTuple[0])) {
-                        throw CannotPickle(context, obj, "args[0] from __newobj__ args has the wrong class");
+
+                    if (batch.Count > 0) {
+                        writer.Write(Opcode.Mark);
+                        foreach (object? item in batch) {
+                            Save(item);
+                        }
+                        writer.Write(Opcode.AddItems);
                     }
-                    Save(context, argsTuple[0]);
-                    Save(context, argsTuple[new Slice(1, null)]);
-                    Write(context, Opcode.NewObj);
-                } else {
-                    Save(context, func);
-                    Save(context, args);
-                    Write(context, Opcode.Reduce);
+
+                    if (batch.Count < BatchSize) return;
                 }
+            }
 
-                WritePut(context, obj);
+            private void SaveFrozenSet(FrozenSetCollection value) {
+                if (_proto < 4) {
+                    SaveReduce(TypeCache.FrozenSet, PythonTuple.MakeTuple(new PythonList(_context, value)), null, null, null, null, value);
+                    return;
+                }
 
-                if (state != null) {
-                    Save(context, state);
-                    Write(context, Opcode.Build);
+                PickleWriter writer = _writer!;
+                writer.Write(Opcode.Mark);
+                foreach (object? item in value) {
+                    Save(item);
                 }
 
-                if (listItems != null) {
-                    BatchAppends(context, (IEnumerator)listItems);
+                if (_memo.TryGetValue(value, out int index)) {
+                    // recursive, throw away the items and fetch the set from the memo
+                    writer.Write(Opcode.PopMark);
+                    WriteGet(index);
+                    return;
                 }
 
-                if (dictItems != null) {
-                    BatchSetItems(context, (IEnumerator)dictItems);
-                }
-            }
-
-            private static void SaveTuple(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object obj) {
-                Debug.Assert(DynamicHelpers.GetPythonType(obj).Equals(TypeCache.PythonTuple), "arg must be tuple");
-                Debug.Assert(!pickler.MemoContains(obj));
-                PythonTuple t = (PythonTuple)obj;
-                char opcode;
-                bool needMark = false;
-                int len = t._data.Length;
-                if (pickler._protocol > 0 && len == 0) {
-                    opcode = Opcode.EmptyTuple;
-                } else if (pickler._protocol >= 2 && len == 1) {
-                    opcode = Opcode.Tuple1;
-                } else if (pickler._protocol >= 2 && len == 2) {
-                    opcode = Opcode.Tuple2;
-                } else if (pickler._protocol >= 2 && len == 3) {
-                    opcode = Opcode.Tuple3;
+                writer.Write(Opcode.FrozenSet);
+                Memoize(value);
+            }
+
+            private void SaveType(PythonType value) {
+                if (value == TypeCache.Null) {
+                    SaveReduce(TypeCache.PythonType, PythonTuple.MakeTuple(new object?[] { null }), null, null, null, null, value);
+                } else if (value == DynamicHelpers.GetPythonType(PythonOps.NotImplemented)) {
+                    SaveReduce(TypeCache.PythonType, PythonTuple.MakeTuple(PythonOps.NotImplemented), null, null, null, null, value);
+                } else if (value == DynamicHelpers.GetPythonType(PythonOps.Ellipsis)) {
+                    SaveReduce(TypeCache.PythonType, PythonTuple.MakeTuple(PythonOps.Ellipsis), null, null, null, null, value);
                 } else {
-                    opcode = Opcode.Tuple;
-                    needMark = true;
+                    SaveGlobal(value, null);
+                }
+            }
+
+            private void SaveGlobal(object obj, string? name) {
+                CodeContext context = _context;
+                if (name == null) {
+                    if ((!PythonOps.TryGetBoundAttr(context, obj, "__qualname__", out object? qualName) || qualName is not string)
+                        && !PythonOps.TryGetBoundAttr(context, obj, "__name__", out qualName)) {
+                        throw PicklingError(context, $"Can't pickle {PythonOps.Repr(context, obj)}: it has no __name__");
+                    }
+                    name = PythonOps.ToString(context, qualName);
                 }
 
-                if (needMark) pickler.Write(context, Opcode.Mark);
-                var data = t._data;
-                for (int i = 0; i < data.Length; i++) {
-                    pickler.Save(context, data[i]);
+                string moduleName = WhichModule(context, obj, name);
+                object module;
+                object found, parent;
+                try {
+                    module = ImportModule(context, moduleName);
+                    (found, parent) = GetAttribute(context, module, name);
+                } catch (Exception e) when (e is ImportException || e is MissingMemberException) {
+                    throw PicklingError(context, $"Can't pickle {PythonOps.Repr(context, obj)}: it's not found as {moduleName}.{name}");
+                }
+
+                if (found != obj) {
+                    throw PicklingError(context, $"Can't pickle {PythonOps.Repr(context, obj)}: it's not the same object as {moduleName}.{name}");
                 }
 
-                if (len > 0) {
-                    if (pickler.MemoContains(obj)) {
-                        // recursive tuple
-                        if (pickler._protocol == 1) {
-                            pickler.Write(context, Opcode.PopMark);
+                PickleWriter writer = _writer!;
+                if (_proto >= 2) {
+                    var registry = (PythonDictionary)PythonOps.GetBoundAttr(context, context.LanguageContext.GetCopyRegModule(), "_extension_registry");
+                    if (registry.TryGetValue(PythonTuple.MakeTuple(moduleName, name), out object? codeObj)) {
+                        int code = context.LanguageContext.ConvertToInt32(codeObj!);
+                        if (code <= 0) {
+                            throw PicklingError(context, $"Can't pickle {PythonOps.Repr(context, obj)}: extension code {code} is out of range");
+                        }
+                        if (code <= 0xff) {
+                            writer.Write(Opcode.Ext1, (byte)code);
+                        } else if (code <= 0xffff) {
+                            writer.WriteUInt16(Opcode.Ext2, code);
                         } else {
-                            if (pickler._protocol == 0) {
-                                pickler.Write(context, Opcode.Pop);
-                            }
-                            for (int i = 0; i < len; i++) {
-                                pickler.Write(context, Opcode.Pop);
-                            }
+                            writer.WriteInt32(Opcode.Ext4, code);
                         }
-                        pickler.WriteGet(context, obj);
                         return;
                     }
+                }
 
-                    pickler.Write(context, opcode);
-
-                    pickler.Memoize(t);
-                    pickler.WritePut(context, t);
+                string lastName = name.Substring(name.LastIndexOf('.') + 1);
+                if (parent == module) {
+                    name = lastName;
+                }
+
+                if (_proto >= 4) {
+                    Save(moduleName);
+                    Save(name);
+                    writer.Write(Opcode.StackGlobal);
+                } else if (parent != module) {
+                    object getattr = PythonOps.GetBoundAttr(context, context.LanguageContext.BuiltinModuleInstance, "getattr");
+                    SaveReduce(getattr, PythonTuple.MakeTuple(parent, lastName), null, null, null, null, null);
+                } else if (_proto >= 3) {
+                    writer.Write(Opcode.Global);
+                    writer.Write(StringOps.DoEncodeUtf8(context, moduleName).AsSpan());
+                    writer.Write((byte)'\n');
+                    writer.Write(StringOps.DoEncodeUtf8(context, name).AsSpan());
+                    writer.Write((byte)'\n');
                 } else {
-                    pickler.Write(context, opcode);
+                    if (_fixImports) {
+                        object compatPickle = ImportModule(context, "_compat_pickle");
+                        var nameMapping = (PythonDictionary)PythonOps.GetBoundAttr(context, compatPickle, "REVERSE_NAME_MAPPING");
+                        var importMapping = (PythonDictionary)PythonOps.GetBoundAttr(context, compatPickle, "REVERSE_IMPORT_MAPPING");
+                        if (nameMapping.TryGetValue(PythonTuple.MakeTuple(moduleName, name), out object? mapped)
+                            && mapped is PythonTuple mappedName && mappedName.Count == 2) {
+                            moduleName = (string)mappedName[0]!;
+                            name = (string)mappedName[1]!;
+                        } else if (importMapping.TryGetValue(moduleName, out object? mappedModule)) {
+                            moduleName = (string)mappedModule!;
+                        }
+                    }
+
+                    if (!IsAscii(moduleName) || !IsAscii(name)) {
+                        throw PicklingError(context, $"can't pickle global identifier '{moduleName}.{name}' using pickle protocol {_proto}");
+                    }
+                    writer.WriteAscii(Opcode.Global, moduleName);
+                    writer.Write(Encoding.ASCII.GetBytes(name));
+                    writer.Write((byte)'\n');
                 }
+
+                Memoize(obj);
             }
 
-            private static void SaveUnicode(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object obj) {
-                Debug.Assert(DynamicHelpers.GetPythonType(obj).Equals(TypeCache.String), "arg must be unicode");
-                Debug.Assert(!pickler.MemoContains(obj));
+            private void SaveReduce(object? func, object? args, object? state, object? listItems, object? dictItems, object? stateSetter, object? obj) {
+                CodeContext context = _context;
+                PickleWriter writer = _writer!;
 
-                if (pickler._memo != null) {
-                    pickler.MemoizeNew(obj);
-                    if (pickler._protocol < 1) {
-                        pickler.Write(context, Opcode.Unicode);
-                        pickler.WriteUnicodeStringRaw(context, obj);
-                    } else {
-                        pickler.Write(context, Opcode.BinUnicode);
-                        pickler.WriteUnicodeStringUtf8(context, obj);
-                    }
+                if (args is not PythonTuple argTuple) {
+                    throw PicklingError(context, "second item of the tuple returned by __reduce__ must be a tuple");
+                }
+                if (!PythonOps.IsCallable(context, func)) {
+                    throw PicklingError(context, "first item of the tuple returned by __reduce__ must be callable");
+                }
 
-                    pickler.WritePut(context, obj);
-                } else {
-                    var memo = pickler._privMemo[obj] = pickler._privMemo.Count;
+                string? funcName = null;
+                if (_proto >= 2 && PythonOps.TryGetBoundAttr(context, func, "__name__", out object? funcNameObj)) {
+                    funcName = funcNameObj as string;
+                }
 
-                    if (pickler._protocol < 1) {
-                        pickler.Write(context, Opcode.Unicode);
-                        pickler.WriteUnicodeStringRaw(context, obj);
-                    } else {
-                        pickler.Write(context, Opcode.BinUnicode);
-                        pickler.WriteUnicodeStringUtf8(context, obj);
+                if (funcName == "__newobj_ex__") {
+                    if (argTuple.Count != 3) {
+                        throw PicklingError(context, $"length of the NEWOBJ_EX argument tuple must be exactly 3, not {argTuple.Count}");
+                    }
+                    object? cls = argTuple[0];
+                    CheckNewObjClass(cls, obj, "__newobj_ex__");
+                    if (argTuple[1] is not PythonTuple newArgs) {
+                        throw PicklingError(context, $"second item from NEWOBJ_EX argument tuple must be a tuple, not {PythonOps.GetPythonTypeName(argTuple[1])}");
+                    }
+                    if (argTuple[2] is not PythonDictionary kwargs) {
+                        throw PicklingError(context, $"third item from NEWOBJ_EX argument tuple must be a dict, not {PythonOps.GetPythonTypeName(argTuple[2])}");
                     }
 
-                    pickler.WriteGetOrPut(context, false, memo);
+                    if (_proto >= 4) {
+                        Save(cls);
+                        Save(newArgs);
+                        Save(kwargs);
+                        writer.Write(Opcode.NewObjEx);
+                    } else {
+                        // partial(cls.__new__, cls, *args, **kwargs)
+                        object partial = PythonOps.GetBoundAttr(context, ImportModule(context, "functools"), "partial");
+                        var partialArgs = new object?[newArgs.Count + 2];
+                        partialArgs[0] = PythonOps.GetBoundAttr(context, cls, "__new__");
+                        partialArgs[1] = cls;
+                        newArgs._data.CopyTo(partialArgs, 2);
+                        Save(PythonCalls.CallWithKeywordArgs(context, partial, partialArgs, kwargs));
+                        Save(PythonTuple.EMPTY);
+                        writer.Write(Opcode.Reduce);
+                    }
+                } else if (funcName == "__newobj__") {
+                    if (argTuple.Count == 0) {
+                        throw PicklingError(context, "__newobj__ arglist is empty");
+                    }
+                    object? cls = argTuple[0];
+                    CheckNewObjClass(cls, obj, "__newobj__");
+
+                    var newArgs = new object?[argTuple.Count - 1];
+                    Array.Copy(argTuple._data, 1, newArgs, 0, newArgs.Length);
+                    Save(cls);
+                    Save(PythonTuple.MakeTuple(newArgs));
+                    writer.Write(Opcode.NewObj);
+                } else {
+                    Save(func);
+                    Save(argTuple);
+                    writer.Write(Opcode.Reduce);
                 }
 
-            }
+                if (obj != null) {
+                    // a recursive object was memoized while saving its arguments
+                    if (_memo.TryGetValue(obj, out int index)) {
+                        writer.Write(Opcode.Pop);
+                        WriteGet(index);
+                    } else {
+                        Memoize(obj);
+                    }
+                }
 
-            #endregion
+                if (listItems != null) {
+                    BatchAppends(PythonOps.GetEnumerator(context, listItems));
+                }
 
-            #region Output encoding
+                if (dictItems != null) {
+                    BatchSetItems(EnumerateDictItems(PythonOps.GetEnumerator(context, dictItems)));
+                }
 
-            /// <summary>
-            /// Write value in pickle decimalnl_short format.
-            /// </summary>
-            private void WriteFloatAsString(CodeContext/*!*/ context, object value) {                
-                Debug.Assert(DynamicHelpers.GetPythonType(value).Equals(TypeCache.Double));
-                Write(context, DoubleOps.__repr__(context, (double)value));
-                Write(context, Newline);
+                if (state != null) {
+                    if (stateSetter == null) {
+                        Save(state);
+                        writer.Write(Opcode.Build);
+                    } else {
+                        if (!PythonOps.IsCallable(context, stateSetter)) {
+                            throw PicklingError(context, $"sixth element of the tuple returned by __reduce__ must be a function, not {PythonOps.GetPythonTypeName(stateSetter)}");
+                        }
+                        // state_setter(obj, state) is called and its result discarded
+                        Save(stateSetter);
+                        Save(obj);
+                        Save(state);
+                        writer.Write(Opcode.Tuple2);
+                        writer.Write(Opcode.Reduce);
+                        writer.Write(Opcode.Pop);
+                    }
+                }
             }
 
-            /// <summary>
-            /// Write value in pickle float8 format.
-            /// </summary>
-            private void WriteFloat64(CodeContext/*!*/ context, object value) {
-                Debug.Assert(DynamicHelpers.GetPythonType(value).Equals(TypeCache.Double));
-                Write(context, _float64.pack(context, value));
+            private void CheckNewObjClass(object? cls, object? obj, string name) {
+                if (cls is not PythonType) {
+                    throw PicklingError(_context, $"args[0] from {name} args is not a type");
+                }
+                if (obj != null && PythonOps.GetBoundAttr(_context, obj, "__class__") != cls) {
+                    throw PicklingError(_context, $"args[0] from {name} args has the wrong class");
+                }
             }
 
-            /// <summary>
-            /// Write value in pickle uint1 format.
-            /// </summary>
-            private void WriteUInt8(CodeContext/*!*/ context, object value) {
-                Debug.Assert(IsUInt8(context, value));
-
-                if (value is int) {
-                    Write(context, ScriptingRuntimeHelpers.CharToString((char)(int)(value)));
-                } else if (value is BigInteger) {
-                    Write(context, ScriptingRuntimeHelpers.CharToString((char)(int)(BigInteger)(value)));
-                } else if (value is byte) {
-                    // TODO: Shouldn't be here
-                    Write(context, ScriptingRuntimeHelpers.CharToString((char)(byte)(value)));
+            private void Memoize(object obj) {
+                if (fast) return;
+
+                int index = _memo.Count;
+                PickleWriter writer = _writer!;
+                if (_proto >= 4) {
+                    writer.Write(Opcode.Memoize);
+                } else if (_bin) {
+                    if (index < 256) {
+                        writer.Write(Opcode.BinPut, (byte)index);
+                    } else {
+                        writer.WriteInt32(Opcode.LongBinPut, index);
+                    }
                 } else {
-                    throw Assert.Unreachable;
+                    writer.WriteAscii(Opcode.Put, index.ToString(CultureInfo.InvariantCulture));
                 }
+                _memo[obj] = index;
             }
 
-            private void WriteUInt8(CodeContext/*!*/ context, int value) {
-                _file.Write(context, (char)value);
-            }
-
-            /// <summary>
-            /// Write value in pickle uint2 format.
-            /// </summary>
-            private void WriteUInt16(CodeContext/*!*/ context, object value) {
-                Debug.Assert(IsUInt16(context, value));
-                int iVal = (int)value;
-                WriteUInt8(context, iVal & 0xff);
-                WriteUInt8(context, (iVal >> 8) & 0xff);
-            }
-
-            /// <summary>
-            /// Write value in pickle int4 format.
-            /// </summary>
-            private void WriteInt32(CodeContext/*!*/ context, object value) {
-                Debug.Assert(IsInt32(context, value));
-
-                int val = (int)value;
-                WriteInt32(context, val);
-            }
-
-            private void WriteInt32(CodeContext context, int val) {
-                _file.Write(context, val);
-            }
-
-            /// <summary>
-            /// Write value in pickle decimalnl_short format.
-            /// </summary>
-            private void WriteIntAsString(CodeContext/*!*/ context, object value) {
-                Debug.Assert(IsInt32(context, value));
-                Write(context, PythonOps.Repr(context, value));
-                Write(context, Newline);
-            }
-
-            /// <summary>
-            /// Write value in pickle decimalnl_short format.
-            /// </summary>
-            private void WriteIntAsString(CodeContext/*!*/ context, int value) {
-                Write(context, value.ToString());
-                Write(context, Newline);
-            }
-
-            /// <summary>
-            /// Write value in pickle decimalnl_long format.
-            /// </summary>
-            private void WriteLongAsString(CodeContext/*!*/ context, object value) {
-                Debug.Assert(DynamicHelpers.GetPythonType(value).Equals(TypeCache.BigInteger));
-                Write(context, PythonOps.Repr(context, value));
-                Write(context, Newline);
+            private void WriteGet(int index) {
+                PickleWriter writer = _writer!;
+                if (_bin) {
+                    if (index < 256) {
+                        writer.Write(Opcode.BinGet, (byte)index);
+                    } else {
+                        writer.WriteInt32(Opcode.LongBinGet, index);
+                    }
+                } else {
+                    writer.WriteAscii(Opcode.Get, index.ToString(CultureInfo.InvariantCulture));
+                }
             }
 
-            /// <summary>
-            /// Write value in pickle unicodestringnl format.
-            /// </summary>
-            private void WriteUnicodeStringRaw(CodeContext/*!*/ context, object value) {
-                Debug.Assert(DynamicHelpers.GetPythonType(value).Equals(TypeCache.String));
-                // manually escape backslash and newline
-                Write(context, StringOps.RawUnicodeEscapeEncode(((string)value).Replace("\\", "\\u005c").Replace("\n", "\\u000a")));
-                Write(context, Newline);
-            }
+            private static string WhichModule(CodeContext/*!*/ context, object obj, string name) {
+                if (PythonOps.TryGetBoundAttr(context, obj, "__module__", out object? moduleName) && moduleName != null) {
+                    return PythonOps.ToString(context, moduleName);
+                }
 
-            /// <summary>
-            /// Write value in pickle unicodestring4 format.
-            /// </summary>
-            private void WriteUnicodeStringUtf8(CodeContext/*!*/ context, object value) {
-                Debug.Assert(DynamicHelpers.GetPythonType(value).Equals(TypeCache.String));
-                string strVal = (string)value;
-
-                // if the string contains non-ASCII elements it needs to be re-encoded as UTF8.
-                for (int i = 0; i < strVal.Length; i++) {                    
-                    if (strVal[i] >= 128) {
-                        string encodedString = System.Text.Encoding.UTF8.GetBytes((string)value).MakeString();
-                        WriteInt32(context, encodedString.Length);
-                        Write(context, encodedString);
-                        return;
+                // no obj.__module__, look for obj in the loaded modules
+                var modules = new List<KeyValuePair<object, object>>(context.LanguageContext.SystemStateModules);
+                foreach (KeyValuePair<object, object> module in modules) {
+                    if (module.Key is not string candidate || candidate == "__main__" || module.Value == null) continue;
+                    try {
+                        if (GetAttribute(context, module.Value, name).obj == obj) {
+                            return candidate;
+                        }
+                    } catch (MissingMemberException) {
                     }
                 }
-
-                WriteInt32(context, strVal.Length);
-                Write(context, strVal);
-            }
-
-            /// <summary>
-            /// Write value in pickle stringnl_noescape_pair format.
-            /// </summary>
-            private void WriteStringPair(CodeContext/*!*/ context, object value1, object value2) {
-                Debug.Assert(DynamicHelpers.GetPythonType(value1).Equals(TypeCache.String));
-                Debug.Assert(DynamicHelpers.GetPythonType(value2).Equals(TypeCache.String));
-#if DEBUG
-                Debug.Assert(IsPrintableAscii(value1));
-                Debug.Assert(IsPrintableAscii(value2));
-#endif
-                Write(context, (string)value1);
-                Write(context, Newline);
-                Write(context, (string)value2);
-                Write(context, Newline);
+                return "__main__";
             }
 
             #endregion
+        }
 
-            #region Type checking
+        #endregion
 
-            /// <summary>
-            /// Return true if value is appropriate for formatting in pickle uint1 format.
-            /// </summary>
-            private static bool IsUInt8(CodeContext/*!*/ context, object value) {
-                if (value is int) {
-                    return IsUInt8((int)value);
+        #region Unpickler
+
+        [Documentation("Unpickler(file, fix_imports=True, encoding='ASCII', errors='strict', buffers=None)\n\n"
+            + "This takes a binary file for reading a pickle data stream.\n\n"
+            + "The protocol version of the pickle is detected automatically, so no\n"
+            + "protocol argument is needed. Bytes past the pickled object's\n"
+            + "representation are ignored.\n\n"
+            + "The argument *file* must have two methods, a read() method that takes\n"
+            + "an integer argument, and a readline() method that requires no\n"
+            + "arguments. Both methods should return bytes.\n\n"
+            + "Optional keyword arguments are *fix_imports*, *encoding* and *errors*,\n"
+            + "which are used to control compatibility support for pickle stream\n"
+            + "generated by Python 2. If *buffers* is not None, it should be an\n"
+            + "iterable of buffer-enabled objects that is consumed each time the\n"
+            + "pickle stream references an out-of-band buffer view."
+            )]
+        [PythonType]
+        public class Unpickler {
+            private static readonly object _missing = new object();
+
+            private readonly CodeContext _context;
+            private bool _initialized;
+            private object? _read;
+            private object? _readline;
+            private object? _readinto;
+            private byte[] _input = Array.Empty<byte>();
+            private int _inputPos;
+            private int _inputEnd;
+            private bool _fixImports;
+            private string _encoding = "ASCII";
+            private string _errors = "strict";
+            private IEnumerator? _buffers;
+            private object? _persistentLoad;
+            private bool _overridesFindClass;
+            private int _proto;
+
+            private readonly List<object?> _stack = new List<object?>();
+            private readonly List<int> _marks = new List<int>();
+            private object?[] _memo = new object?[32];
+            private int _memoCount;
+
+            internal Unpickler(CodeContext/*!*/ context) {
+                _context = context;
+            }
+
+            public Unpickler(CodeContext/*!*/ context, [ParamDictionary] IDictionary<object, object> kwArgs, [NotNone] params object[] args)
+                : this(context) {
+            }
+
+            public void __init__(CodeContext/*!*/ context, object? file, bool fix_imports = true, [NotNone] string encoding = "ASCII", [NotNone] string errors = "strict", object? buffers = null) {
+                Initialize(context, file, fix_imports, encoding, errors, buffers);
+            }
+
+            internal void Initialize(CodeContext/*!*/ context, object? file, bool fixImports, string encoding, string errors, object? buffers) {
+                if (file != null) {
+                    if (!PythonOps.TryGetBoundAttr(context, file, "read", out _read)
+                        || !PythonOps.TryGetBoundAttr(context, file, "readline", out _readline)) {
+                        throw PythonOps.TypeError("file must have 'read' and 'readline' attributes");
+                    }
+                    PythonOps.TryGetBoundAttr(context, file, "readinto", out _readinto);
                 }
-                PythonContext pc = context.LanguageContext;
 
-                return pc.LessThanOrEqual(0, value) && pc.LessThan(value, 1 << 8);
-            }
-
-            private static bool IsUInt8(int value) {
-                return (value >= 0 && value < 1 << 8);
-            }
+                _fixImports = fixImports;
+                _encoding = encoding;
+                _errors = errors;
+                _buffers = buffers == null ? null : PythonOps.GetEnumerator(context, buffers);
+                Array.Clear(_memo, 0, _memo.Length);
+                _memoCount = 0;
 
-            private static bool IsInt8(int value) {
-                return (value >= SByte.MinValue && value <= SByte.MaxValue);
-            }
-
-            /// <summary>
-            /// Return true if value is appropriate for formatting in pickle uint2 format.
-            /// </summary>
-            private static bool IsUInt16(CodeContext/*!*/ context, object value) {
-                if (value is int) {
-                    return IsUInt16((int)value);
+                if (GetType() != typeof(Unpickler)) {
+                    PythonOps.TryGetBoundAttr(context, this, "persistent_load", out _persistentLoad);
+                    _overridesFindClass = true;
                 }
-                PythonContext pc = context.LanguageContext;
-
-                return pc.LessThanOrEqual(1 << 8, value) && pc.LessThan(value, 1 << 16);
-            }
-
-            private static bool IsUInt16(int value) {
-                return (value >= 0 && value < 1 << 16);
+                _initialized = true;
             }
 
-            private static bool IsInt16(int value) {
-                return (value >= short.MinValue && value <= short.MaxValue);
+            internal void SetInput(byte[] input) {
+                _input = input;
+                _inputPos = 0;
+                _inputEnd = input.Length;
             }
 
-            /// <summary>
-            /// Return true if value is appropriate for formatting in pickle int4 format.
-            /// </summary>
-            private static bool IsInt32(CodeContext/*!*/ context, object value) {
-                PythonContext pc = context.LanguageContext;
-
-                return pc.LessThanOrEqual(Int32.MinValue, value) && pc.LessThanOrEqual(value, Int32.MaxValue);
-            }
+            #region Public API
 
-#if DEBUG
-            /// <summary>
-            /// Return true if value is a string where each value is in the range of printable ASCII characters.
-            /// </summary>
-            private bool IsPrintableAscii(object value) {
-                Debug.Assert(DynamicHelpers.GetPythonType(value).Equals(TypeCache.String));
-                string strValue = (string)value;
-                foreach (char c in strValue) {
-                    if (!(LowestPrintableChar <= c && c <= HighestPrintableChar)) return false;
+            [Documentation("load() -> object\n\n"
+                + "Read a pickled object representation from the open file object given\n"
+                + "in the constructor, and return the reconstituted object hierarchy\n"
+                + "specified therein."
+                )]
+            public object? load(CodeContext/*!*/ context) {
+                if (!_initialized) {
+                    throw UnpicklingError(context, $"Unpickler.__init__() was not called by {PythonOps.GetPythonTypeName(this)}.__init__()");
                 }
-                return true;
-            }
-#endif
-
-            #endregion
-
-            #region Output generation helpers
-
-            private void Write(CodeContext/*!*/ context, string data) {
-                _file.Write(context, data);
-            }
-
-            private void Write(CodeContext/*!*/ context, char data) {
-                _file.Write(context, data);
-            }
 
-            private void WriteGet(CodeContext/*!*/ context, object obj) {
-                Debug.Assert(MemoContains(obj));
+                _stack.Clear();
+                _marks.Clear();
+                _proto = 0;
 
-                WriteGetOrPut(context, obj, true);
-            }
-
-            private void WriteGetOrPut(CodeContext context, object obj, bool isGet) {
-                Debug.Assert(MemoContains(obj));
-                
-                if (_memo == null) {
-                    WriteGetOrPut(context, isGet, _privMemo[obj]);
-                } else {
-                    WriteGetOrPut(context, isGet, (PythonTuple)_memo[PythonOps.Id(obj)]);
-                }
-            }
-
-            private void WriteGetOrPut(CodeContext context, bool isGet, PythonTuple tup) {
-                object index = tup[0];
-                Debug.Assert(context.LanguageContext.GreaterThanOrEqual(index, 0));
-                if (_protocol < 1) {
-                    Write(context, isGet ? Opcode.Get : Opcode.Put);
-                    WriteIntAsString(context, index);
-                } else {
-                    if (IsUInt8(context, index)) {
-                        Write(context, isGet ? Opcode.BinGet : Opcode.BinPut);
-                        WriteUInt8(context, index);
-                    } else {
-                        Write(context, isGet ? Opcode.LongBinGet : Opcode.LongBinPut);
-                        WriteInt32(context, index);
+                while (true) {
+                    byte opcode = ReadOpcode();
+                    if (opcode == Opcode.Stop) {
+                        return Pop();
                     }
+                    Dispatch(opcode);
                 }
             }
 
-            private void WriteGetOrPut(CodeContext context, bool isGet, int index) {
-                if (_protocol < 1) {
-                    Write(context, isGet ? Opcode.Get : Opcode.Put);
-                    WriteIntAsString(context, index);
-                } else if(index >= 0 && index <= 1 << 8) {
-                    Write(context, isGet ? Opcode.BinGet : Opcode.BinPut);
-                    WriteUInt8(context, index);
-                } else {
-                    Write(context, isGet ? Opcode.LongBinGet : Opcode.LongBinPut);
-                    WriteInt32(context, index);
-                }
-            }
-
-            private void WriteInitArgs(CodeContext/*!*/ context, object obj) {
-                object getInitArgsCallable;
-                if (PythonOps.TryGetBoundAttr(context, obj, "__getinitargs__", out getInitArgsCallable)) {
-                    object initArgs = PythonCalls.Call(context, getInitArgsCallable);
-                    if (!(initArgs is PythonTuple)) {
-                        throw CannotPickle(context, obj, "__getinitargs__() must return tuple");
-                    }
-                    foreach (object arg in (PythonTuple)initArgs) {
-                        Save(context, arg);
+            [Documentation("find_class(module_name, global_name) -> object\n\n"
+                + "Return an object from a specified module.\n\n"
+                + "If necessary, the module will be imported. Subclasses may override\n"
+                + "this method (e.g. to restrict unpickling of arbitrary classes and\n"
+                + "functions)."
+                )]
+            public object find_class(CodeContext/*!*/ context, [NotNone] string module_name, [NotNone] string global_name) {
+                if (_proto < 3 && _fixImports) {
+                    object compatPickle = ImportModule(context, "_compat_pickle");
+                    var nameMapping = (PythonDictionary)PythonOps.GetBoundAttr(context, compatPickle, "NAME_MAPPING");
+                    var importMapping = (PythonDictionary)PythonOps.GetBoundAttr(context, compatPickle, "IMPORT_MAPPING");
+                    if (nameMapping.TryGetValue(PythonTuple.MakeTuple(module_name, global_name), out object? mapped)
+                        && mapped is PythonTuple mappedName && mappedName.Count == 2) {
+                        module_name = (string)mappedName[0]!;
+                        global_name = (string)mappedName[1]!;
+                    } else if (importMapping.TryGetValue(module_name, out object? mappedModule)) {
+                        module_name = (string)mappedModule!;
                     }
                 }
-            }
-
-            private void WritePut(CodeContext/*!*/ context, object obj) {
-                WriteGetOrPut(context, obj, false);
-            }
 
-            private void WritePut(CodeContext/*!*/ context, int index) {
-                WriteGetOrPut(context, false, index);
-            }
-
-            private void WriteProto(CodeContext/*!*/ context) {
-                Write(context, Opcode.Proto);
-                WriteUInt8(context, _protocol);
+                object module = ImportModule(context, module_name);
+                if (_proto >= 4) {
+                    return GetAttribute(context, module, global_name).obj;
+                }
+                return PythonOps.GetBoundAttr(context, module, global_name);
             }
 
             /// <summary>
-            /// Emit a series of opcodes that will set append all items indexed by iter
-            /// to the object at the top of the stack. Use APPENDS if possible, but
-            /// append no more than BatchSize items at a time.
+            /// A copy of the memo as a dictionary mapping memo indices to objects.
             /// </summary>
-            private void BatchAppends(CodeContext/*!*/ context, IEnumerator enumerator) {
-                if (_protocol < 1) {
-                    while (enumerator.MoveNext()) {
-                        Save(context, enumerator.Current);
-                        Write(context, Opcode.Append);
-                    }
-                } else {
-                    object next;
-                    if (enumerator.MoveNext()) {
-                        next = enumerator.Current;
-                    } else {
-                        return;
-                    }
-
-                    int batchCompleted = 0;
-                    object current;
-
-                    // We do a one-item lookahead to avoid emitting an APPENDS for a
-                    // single remaining item.
-                    while (enumerator.MoveNext()) {
-                        current = next;
-                        next = enumerator.Current;
-
-                        if (batchCompleted == _BATCHSIZE) {
-                            Write(context, Opcode.Appends);
-                            batchCompleted = 0;
-                        }
-
-                        if (batchCompleted == 0) {
-                            Write(context, Opcode.Mark);
+            public PythonDictionary memo {
+                get {
+                    var res = new PythonDictionary();
+                    for (int i = 0; i < _memo.Length; i++) {
+                        if (_memo[i] != null) {
+                            res[i] = _memo[i] == _missing ? null : _memo[i];
                         }
-
-                        Save(context, current);
-                        batchCompleted++;
-                    }
-
-                    if (batchCompleted == _BATCHSIZE) {
-                        Write(context, Opcode.Appends);
-                        batchCompleted = 0;
                     }
-                    Save(context, next);
-                    batchCompleted++;
-
-                    if (batchCompleted > 1) {
-                        Write(context, Opcode.Appends);
-                    } else {
-                        Write(context, Opcode.Append);
+                    return res;
+                }
+                set {
+                    Array.Clear(_memo, 0, _memo.Length);
+                    _memoCount = 0;
+                    foreach (KeyValuePair<object?, object?> entry in value._storage.GetItems()) {
+                        int index = _context.LanguageContext.ConvertToInt32(entry.Key!);
+                        if (index < 0) {
+                            throw PythonOps.ValueError("memo key must be positive integers.");
+                        }
+                        MemoPut(index, entry.Value);
                     }
                 }
             }
 
-            /// <summary>
-            /// Emit a series of opcodes that will set all (key, value) pairs indexed by
-            /// iter in the object at the top of the stack. Use SETITEMS if possible,
-            /// but append no more than BatchSize items at a time.
-            /// </summary>
-            private void BatchSetItems(CodeContext/*!*/ context, PythonDictionary dict) {
-                KeyValuePair<object, object> kvTuple;
-                using (var enumerator = dict._storage.GetEnumerator()) {
-                    if (_protocol < 1) {
-                        while (enumerator.MoveNext()) {
-                            kvTuple = enumerator.Current;
-                            Save(context, kvTuple.Key);
-                            Save(context, kvTuple.Value);
-                            Write(context, Opcode.SetItem);
-                        }
-                    } else {
-                        object nextKey, nextValue;
-                        if (enumerator.MoveNext()) {
-                            kvTuple = enumerator.Current;
-                            nextKey = kvTuple.Key;
-                            nextValue = kvTuple.Value;
-                        } else {
-                            return;
-                        }
+            public object? persistent_load {
+                get => _persistentLoad;
+                set => _persistentLoad = value;
+            }
 
-                        int batchCompleted = 0;
-                        object curKey, curValue;
-
-                        // We do a one-item lookahead to avoid emitting a SETITEMS for a
-                        // single remaining item.
-                        while (enumerator.MoveNext()) {
-                            curKey = nextKey;
-                            curValue = nextValue;
-                            kvTuple = enumerator.Current;
-                            nextKey = kvTuple.Key;
-                            nextValue = kvTuple.Value;
-
-                            if (batchCompleted == _BATCHSIZE) {
-                                Write(context, Opcode.SetItems);
-                                batchCompleted = 0;
-                            }
+            #endregion
 
-                            if (batchCompleted == 0) {
-                                Write(context, Opcode.Mark);
-                            }
+            #region Input
 
-                            Save(context, curKey);
-                            Save(context, curValue);
-                            batchCompleted++;
-                        }
+            private Exception Truncated() => UnpicklingError(_context, "pickle data was truncated");
 
-                        if (batchCompleted == _BATCHSIZE) {
-                            Write(context, Opcode.SetItems);
-                            batchCompleted = 0;
-                        }
-                        Save(context, nextKey);
-                        Save(context, nextValue);
-                        batchCompleted++;
+            private byte ReadOpcode() {
+                if (_inputPos < _inputEnd) {
+                    return _input[_inputPos++];
+                }
 
-                        if (batchCompleted > 1) {
-                            Write(context, Opcode.SetItems);
-                        } else {
-                            Write(context, Opcode.SetItem);
+                if (_read != null) {
+                    object? data = PythonCalls.Call(_context, _read, 1);
+                    if (data is IBufferProtocol bp) {
+                        using IPythonBuffer buffer = bp.GetBuffer();
+                        if (buffer.NumBytes() > 0) {
+                            return buffer.AsReadOnlySpan()[0];
                         }
+                    } else {
+                        throw PythonOps.TypeErrorForTypeMismatch("bytes", data);
                     }
                 }
+                throw PythonOps.EofError("Ran out of input");
             }
 
             /// <summary>
-            /// Emit a series of opcodes that will set all (key, value) pairs indexed by
-            /// iter in the object at the top of the stack. Use SETITEMS if possible,
-            /// but append no more than BatchSize items at a time.
+            /// Makes count bytes available in the input buffer and returns their offset.
             /// </summary>
-            private void BatchSetItems(CodeContext/*!*/ context, IEnumerator enumerator) {
-                PythonTuple kvTuple;
-                if (_protocol < 1) {
-                    while (enumerator.MoveNext()) {
-                        kvTuple = (PythonTuple)enumerator.Current;
-                        Save(context, kvTuple[0]);
-                        Save(context, kvTuple[1]);
-                        Write(context, Opcode.SetItem);
-                    }
-                } else {
-                    object nextKey, nextValue;
-                    if (enumerator.MoveNext()) {
-                        kvTuple = (PythonTuple)enumerator.Current;
-                        nextKey = kvTuple[0];
-                        nextValue = kvTuple[1];
-                    } else {
-                        return;
-                    }
-
-                    int batchCompleted = 0;
-                    object curKey, curValue;
-
-                    // We do a one-item lookahead to avoid emitting a SETITEMS for a
-                    // single remaining item.
-                    while (enumerator.MoveNext()) {
-                        curKey = nextKey;
-                        curValue = nextValue;
-                        kvTuple = (PythonTuple)enumerator.Current;
-                        nextKey = kvTuple[0];
-                        nextValue = kvTuple[1];
-
-                        if (batchCompleted == _BATCHSIZE) {
-                            Write(context, Opcode.SetItems);
-                            batchCompleted = 0;
-                        }
-
-                        if (batchCompleted == 0) {
-                            Write(context, Opcode.Mark);
-                        }
-
-                        Save(context, curKey);
-                        Save(context, curValue);
-                        batchCompleted++;
-                    }
+            private int Read(int count) {
+                if (_inputEnd - _inputPos >= count) {
+                    int offset = _inputPos;
+                    _inputPos += count;
+                    return offset;
+                }
 
-                    if (batchCompleted == _BATCHSIZE) {
-                        Write(context, Opcode.SetItems);
-                        batchCompleted = 0;
-                    }
-                    Save(context, nextKey);
-                    Save(context, nextValue);
-                    batchCompleted++;
+                if (_read == null) throw Truncated();
 
-                    if (batchCompleted > 1) {
-                        Write(context, Opcode.SetItems);
-                    } else {
-                        Write(context, Opcode.SetItem);
+                int leftover = _inputEnd - _inputPos;
+                object? data = PythonCalls.Call(_context, _read, count - leftover);
+                if (leftover == 0 && data is Bytes bytes) {
+                    // no copy when the opcode argument or frame comes in a single read
+                    _input = bytes.UnsafeByteArray;
+                    _inputEnd = bytes.Count;
+                } else {
+                    if (data is not IBufferProtocol bp) {
+                        throw PythonOps.TypeErrorForTypeMismatch("bytes", data);
                     }
+                    using IPythonBuffer buffer = bp.GetBuffer();
+                    ReadOnlySpan<byte> span = buffer.AsReadOnlySpan();
+                    var input = new byte[leftover + span.Length];
+                    Buffer.BlockCopy(_input, _inputPos, input, 0, leftover);
+                    span.CopyTo(input.AsSpan(leftover));
+                    _input = input;
+                    _inputEnd = input.Length;
                 }
-            }
+                _inputPos = 0;
 
-            #endregion
-
-            #region Other private helper methods
-
-            private Exception CannotPickle(CodeContext/*!*/ context, object obj, string format, params object[] args) {
-                StringBuilder msgBuilder = new StringBuilder();
-                msgBuilder.Append("Can't pickle ");
-                msgBuilder.Append(PythonOps.ToString(context, obj));
-                if (format != null) {
-                    msgBuilder.Append(": ");
-                    msgBuilder.Append(String.Format(format, args));
-                }
-                return PythonExceptions.CreateThrowable(PickleError(context), msgBuilder.ToString());
+                if (_inputEnd < count) throw Truncated();
+                _inputPos = count;
+                return 0;
             }
 
-            
             /// <summary>
-            /// Find the module for obj and ensure that obj is reachable in that module by the given name.
-            /// 
-            /// Throw PicklingError if any of the following are true:
-            ///  - The module couldn't be determined.
-            ///  - The module couldn't be loaded.
-            ///  - The given name doesn't exist in the module.
-            ///  - The given name is a different object than obj.
-            /// 
-            /// Otherwise, return the name of the module.
-            /// 
-            /// To determine which module obj lives in, obj.__module__ is used if available. The
-            /// module named by obj.__module__ is loaded if needed. If obj has no __module__
-            /// attribute, then each loaded module is searched. If a loaded module has an
-            /// attribute with the given name, and that attribute is the same object as obj,
-            /// then that module is used.
+            /// Reads a line and returns the offset of its start in the input buffer, the length excludes the newline.
             /// </summary>
-            private object FindModuleForGlobal(CodeContext/*!*/ context, object obj, object name) {
-                object module;
-                object moduleName;
-                PythonType pt = obj as PythonType;
-                if (pt != null) {
-                    return PythonType.Get__module__(context, pt);
-                } else if (PythonOps.TryGetBoundAttr(context, obj, "__module__", out moduleName)) {
-                    // TODO: Global SystemState
-                    LightExceptions.CheckAndThrow(Builtin.__import__(context, Converter.ConvertToString(moduleName)));
-
-                    object foundObj;
-                    if (Importer.TryGetExistingModule(context, Converter.ConvertToString(moduleName), out module) &&
-                        PythonOps.TryGetBoundAttr(context, module, Converter.ConvertToString(name), out foundObj)) {
-                        if (PythonOps.IsRetBool(foundObj, obj)) {
-                            return moduleName;
-                        } else {
-                            throw CannotPickle(context, obj, "it's not the same object as {0}.{1}", moduleName, name);
-                        }
-                    } else {
-                        throw CannotPickle(context, obj, "it's not found as {0}.{1}", moduleName, name);
+            private int ReadLine(out int length) {
+                int end = Array.IndexOf(_input, (byte)'\n', _inputPos, _inputEnd - _inputPos);
+                if (end >= 0) {
+                    int offset = _inputPos;
+                    length = end - offset;
+                    _inputPos = end + 1;
+                    return offset;
+                }
+
+                if (_readline == null) throw Truncated();
+
+                object? line = PythonCalls.Call(_context, _readline);
+                if (line is not IBufferProtocol bp) {
+                    throw PythonOps.TypeErrorForTypeMismatch("bytes", line);
+                }
+                using IPythonBuffer buffer = bp.GetBuffer();
+                ReadOnlySpan<byte> span = buffer.AsReadOnlySpan();
+                int leftover = _inputEnd - _inputPos;
+                var input = new byte[leftover + span.Length];
+                Buffer.BlockCopy(_input, _inputPos, input, 0, leftover);
+                span.CopyTo(input.AsSpan(leftover));
+                if (input.Length == 0 || input[input.Length - 1] != (byte)'\n') {
+                    throw Truncated();
+                }
+
+                _input = input;
+                _inputPos = _inputEnd = input.Length;
+                length = input.Length - 1;
+                return 0;
+            }
+
+            private Bytes ReadBytes(int count) {
+                if (_inputPos == _inputEnd && _read != null) {
+                    // large payloads come straight from the file
+                    object? data = PythonCalls.Call(_context, _read, count);
+                    if (data is Bytes bytes && bytes.Count == count) {
+                        return bytes;
                     }
-                } else {
-                    // No obj.__module__, so crawl through all loaded modules looking for obj
-                    foreach (KeyValuePair<object, object> modulePair in context.LanguageContext.SystemStateModules) {
-                        moduleName = modulePair.Key;
-                        module = modulePair.Value;
-                        object foundObj;
-                        if (PythonOps.TryGetBoundAttr(context, module, Converter.ConvertToString(name), out foundObj) &&
-                            PythonOps.IsRetBool(foundObj, obj)
-                        ) {
-                            return moduleName;
-                        }
+                    if (data is not IBufferProtocol bp) {
+                        throw PythonOps.TypeErrorForTypeMismatch("bytes", data);
                     }
-                    throw CannotPickle(context, obj, "could not determine its module");
+                    using IPythonBuffer buffer = bp.GetBuffer();
+                    if (buffer.NumBytes() != count) throw Truncated();
+                    return Bytes.Make(buffer.ToArray());
                 }
 
+                int offset = Read(count);
+                var res = new byte[count];
+                Buffer.BlockCopy(_input, offset, res, 0, count);
+                return Bytes.Make(res);
             }
 
-            #endregion
+            private ByteArray ReadByteArray(int count) {
+                int available = Math.Min(count, _inputEnd - _inputPos);
+                var res = new ByteArray();
+                res.__init__(count);
+                using (IPythonBuffer buffer = res.GetBuffer(BufferFlags.Writable)) {
+                    _input.AsSpan(_inputPos, available).CopyTo(buffer.AsSpan());
+                    _inputPos += available;
+                    if (available == count) return res;
 
-        }
-
-        #endregion
-
-        #region Unpickler object
-
-        public static UnpicklerObject Unpickler(CodeContext/*!*/ context, object file) {
-            return new UnpicklerObject(context, file);
-        }
-
-        [Documentation("Unpickler(file) -> Unpickler object\n\n"
-            + "An Unpickler object reads a pickle bytecode stream and creates corresponding\n"
-            + "objects."
-            + "\n"
-            + "file: an object (such as an open file or a StringIO) with read(num_chars) and\n"
-            + "    readline() methods that return strings"
-            )]
-        [PythonType("Unpickler"), PythonHidden]
-        public class UnpicklerObject {
-            private static readonly object _mark = new object();
-
-            private FileInput _file;
-            private List<object> _stack;
-            private PythonDictionary _memo;
-            private List<object> _privMemo;
-            private object _pers_loader;
-
-            public UnpicklerObject() {
-                _privMemo = new List<object>(200);
-            }
-
-            public UnpicklerObject(CodeContext context, object file)
-                : this() {
-                _file = new PythonFileInput(context, file);
-            }
-
-            internal UnpicklerObject(CodeContext context, FileInput input)
-                : this() {
-                _file = input;
-            }
-
-            [Documentation("load() -> unpickled object\n\n"
-                + "Read pickle data from the file object that was passed to the constructor and\n"
-                + "return the corresponding unpickled objects."
-               )]
-            public object load(CodeContext/*!*/ context) {
-                _stack = new List<object>(32);
-
-                for (; ; ) {
-                    var opcode = _file.ReadChar(context);
-
-                    switch (opcode) {
-                        case Opcode.Append: LoadAppend(context); break;
-                        case Opcode.Appends: LoadAppends(context); break;
-                        case Opcode.BinFloat: LoadBinFloat(context); break;
-                        case Opcode.BinGet: LoadBinGet(context); break;
-                        case Opcode.BinInt: LoadBinInt(context); break;
-                        case Opcode.BinInt1: LoadBinInt1(context); break;
-                        case Opcode.BinInt2: LoadBinInt2(context); break;
-                        case Opcode.BinPersid: LoadBinPersid(context); break;
-                        case Opcode.BinPut: LoadBinPut(context); break;
-                        case Opcode.BinString: LoadBinString(context); break;
-                        case Opcode.BinUnicode: LoadBinUnicode(context); break;
-                        case Opcode.Build: LoadBuild(context); break;
-                        case Opcode.Dict: LoadDict(context); break;
-                        case Opcode.Dup: LoadDup(context); break;
-                        case Opcode.EmptyDict: LoadEmptyDict(context); break;
-                        case Opcode.EmptyList: LoadEmptyList(context); break;
-                        case Opcode.EmptyTuple: LoadEmptyTuple(context); break;
-                        case Opcode.Ext1: LoadExt1(context); break;
-                        case Opcode.Ext2: LoadExt2(context); break;
-                        case Opcode.Ext4: LoadExt4(context); break;
-                        case Opcode.Float: LoadFloat(context); break;
-                        case Opcode.Get: LoadGet(context); break;
-                        case Opcode.Global: LoadGlobal(context); break;
-                        case Opcode.Inst: LoadInst(context); break;
-                        case Opcode.Int: LoadInt(context); break;
-                        case Opcode.List: LoadList(context); break;
-                        case Opcode.Long: LoadLong(context); break;
-                        case Opcode.Long1: LoadLong1(context); break;
-                        case Opcode.Long4: LoadLong4(context); break;
-                        case Opcode.LongBinGet: LoadLongBinGet(context); break;
-                        case Opcode.LongBinPut: LoadLongBinPut(context); break;
-                        case Opcode.Mark: LoadMark(context); break;
-                        case Opcode.NewFalse: LoadNewFalse(context); break;
-                        case Opcode.NewObj: LoadNewObj(context); break;
-                        case Opcode.NewTrue: LoadNewTrue(context); break;
-                        case Opcode.NoneValue: LoadNoneValue(context); break;
-                        case Opcode.Obj: LoadObj(context); break;
-                        case Opcode.PersId: LoadPersId(context); break;
-                        case Opcode.Pop: LoadPop(context); break;
-                        case Opcode.PopMark: LoadPopMark(context); break;
-                        case Opcode.Proto: LoadProto(context); break;
-                        case Opcode.Put: LoadPut(context); break;
-                        case Opcode.Reduce: LoadReduce(context); break;
-                        case Opcode.SetItem: LoadSetItem(context); break;
-                        case Opcode.SetItems: LoadSetItems(context); break;
-                        case Opcode.ShortBinstring: LoadShortBinstring(context); break;
-                        case Opcode.String: LoadString(context); break;
-                        case Opcode.Tuple: LoadTuple(context); break;
-                        case Opcode.Tuple1: LoadTuple1(context); break;
-                        case Opcode.Tuple2: LoadTuple2(context); break;
-                        case Opcode.Tuple3: LoadTuple3(context); break;
-                        case Opcode.Unicode: LoadUnicode(context); break;
-                        case Opcode.Stop: return PopStack();
-                        default: throw CannotUnpickle(context, "invalid opcode: {0}", PythonOps.Repr(context, opcode));
+                    if (_readinto == null) {
+                        int offset = Read(count - available);
+                        _input.AsSpan(offset, count - available).CopyTo(buffer.AsSpan().Slice(available));
+                        return res;
                     }
                 }
-            }
 
-            private object PopStack() {
-                var res = _stack[_stack.Count - 1];
-                _stack.RemoveAt(_stack.Count - 1);
+                // let the file fill the rest of the bytearray in place
+                var view = new MemoryView(res);
+                if (available > 0) {
+                    view = (MemoryView)view[new Slice(available, null)]!;
+                }
+                object? read = PythonCalls.Call(_context, _readinto, view);
+                if (read == null || _context.LanguageContext.ConvertToInt32(read) != count - available) {
+                    throw Truncated();
+                }
                 return res;
             }
 
-            private object PeekStack() {
-                return _stack[_stack.Count - 1];
-            }
+            private int ReadUInt8() => _input[Read(1)];
 
-            public object[] StackGetSliceAsArray(int start) {
-                object[] res = new object[_stack.Count - start];
-                for (int i = 0; i < res.Length; i++) {
-                    res[i] = _stack[i + start];
-                }
-                return res;
-            }
+            private int ReadUInt16() => BinaryPrimitives.ReadUInt16LittleEndian(_input.AsSpan(Read(2)));
 
-            [Documentation("noload() -> unpickled object\n\n"
-                // 1234567890123456789012345678901234567890123456789012345678901234567890123456789
-                + "Like load(), but don't import any modules or create create any instances of\n"
-                + "user-defined types. (Builtin objects such as ints, tuples, etc. are created as\n"
-                + "with load().)\n"
-                + "\n"
-                + "This is primarily useful for scanning a pickle for persistent ids without\n"
-                + "incurring the overhead of completely unpickling an object. See the pickle\n"
-                + "module documentation for more information about persistent ids."
-               )]
-            public void noload(CodeContext/*!*/ context) {
-                throw PythonOps.NotImplementedError("noload() is not implemented");
-            }
+            private int ReadInt32() => BinaryPrimitives.ReadInt32LittleEndian(_input.AsSpan(Read(4)));
 
-            private Exception CannotUnpickle(CodeContext/*!*/ context, string format, params object[] args) {
-                return PythonExceptions.CreateThrowable(UnpicklingError(context), String.Format(format, args));
-            }
+            private uint ReadUInt32() => BinaryPrimitives.ReadUInt32LittleEndian(_input.AsSpan(Read(4)));
 
-            [System.Diagnostics.CodeAnalysis.SuppressMessage("Microsoft.Usage", "CA2227:CollectionPropertiesShouldBeReadOnly")]
-            public PythonDictionary memo {
-                get {
-                    if (_memo == null) {
-                        var newMemo = new PythonDictionary();
-                        for (int i = 0; i < _privMemo.Count; i++) {
-                            if (_privMemo[i] != _mark) {
-                                newMemo[i] = _privMemo[i];
-                            }
-                        }
-                        _memo = newMemo;
-                    }
-                    return _memo; 
-                }
-                set { 
-                    _memo = value;
-                    _privMemo = null;
+            private int ReadSize64(string name) {
+                ulong size = BinaryPrimitives.ReadUInt64LittleEndian(_input.AsSpan(Read(8)));
+                if (size > int.MaxValue) {
+                    throw UnpicklingError(_context, $"{name} exceeds system's maximum size of {int.MaxValue} bytes");
                 }
+                return (int)size;
             }
 
-            public object persistent_load {
-                get {
-                    return _pers_loader;
-                }
-                set {
-                    _pers_loader = value;
+            private int ReadSize32(string name) {
+                uint size = ReadUInt32();
+                if (size > int.MaxValue) {
+                    throw UnpicklingError(_context, $"{name} exceeds system's maximum size of {int.MaxValue} bytes");
                 }
+                return (int)size;
             }
 
-            private object MemoGet(CodeContext/*!*/ context, int key) {
-                object value;
-                if (_memo != null) {
-                    if (_memo.TryGetValue(key, out value)) {
-                        return value;
-                    }
-                } else if (key < _privMemo.Count && (value = _privMemo[key]) != _mark) {
-                    return value;
-                }
-                
-                throw PythonExceptions.CreateThrowable(BadPickleGet(context), String.Format("memo key {0} not found", key));
+            private string ReadLineAscii() {
+                int offset = ReadLine(out int length);
+                return DecodeAscii(offset, length);
             }
 
-            private void MemoPut(int key, object value) {
-                if (_memo != null) {
-                    _memo[key] = value;
-                } else {
-                    while (key >= _privMemo.Count) {
-                        _privMemo.Add(_mark);
+            private string DecodeAscii(int offset, int length) {
+                for (int i = offset; i < offset + length; i++) {
+                    if (_input[i] >= 0x80) {
+                        throw PythonOps.UnicodeDecodeError("'ascii' codec can't decode byte", _input.AsSpan(i, 1).ToArray(), i - offset);
                     }
-                    _privMemo[key] = value;
                 }
+                return Encoding.ASCII.GetString(_input, offset, length);
             }
 
-            private int GetMarkIndex(CodeContext/*!*/ context) {
-                int i = _stack.Count - 1;
-                while (i > 0 && _stack[i] != _mark) i -= 1;
-                if (i == -1) throw CannotUnpickle(context, "mark not found");
-                return i;
+            private string DecodeUtf8(int offset, int length) {
+                try {
+                    return StrictUtf8.GetString(_input, offset, length);
+                } catch (DecoderFallbackException) {
+                    return StringOps.RawDecode(_context, Bytes.Make(_input.AsSpan(offset, length).ToArray()), "utf-8", "surrogatepass");
+                }
             }
 
-            private string Read(CodeContext/*!*/ context, int size) {
-                string res = _file.Read(context, size);
-                if (res.Length < size) {
-                    throw PythonOps.EofError("unexpected EOF while unpickling");
+            private int ParseInt(int offset, int length) {
+                string line = DecodeAscii(offset, length);
+                if (!int.TryParse(line, NumberStyles.AllowLeadingSign, CultureInfo.InvariantCulture, out int res)) {
+                    throw PythonOps.ValueError("invalid literal for int() with base 10: {0}", PythonOps.Repr(_context, line));
                 }
                 return res;
             }
 
-            private string ReadLineNoNewline(CodeContext/*!*/ context) {
-                string raw = _file.ReadLine(context);
-                return raw.Substring(0, raw.Length - 1);
-            }
-
-            private object ReadFloatString(CodeContext/*!*/ context) {
-                return DoubleOps.__new__(context, TypeCache.Double, ReadLineNoNewline(context));
-            }
-
-            private double ReadFloat64(CodeContext/*!*/ context) {
-                int index = 0;
-                return PythonStruct.CreateDoubleValue(context, ref index, false, Read(context, 8));
-            }
-
-            private object ReadIntFromString(CodeContext/*!*/ context) {
-                string raw = ReadLineNoNewline(context);
-                if ("00" == raw) return ScriptingRuntimeHelpers.False;
-                else if ("01" == raw) return ScriptingRuntimeHelpers.True;
-                return Int32Ops.__new__(context, TypeCache.Int32, raw);
-            }
+            #endregion
 
-            private int ReadInt32(CodeContext/*!*/ context) {
-                return _file.ReadInt(context);
-            }
+            #region Stack and memo
 
-            private object ReadLongFromString(CodeContext/*!*/ context) {
-                return BigIntegerOps.__new__(context, TypeCache.BigInteger, ReadLineNoNewline(context));
-            }
+            private void Push(object? obj) => _stack.Add(obj);
 
-            private object ReadLong(CodeContext/*!*/ context, int size) {
-                return new BigInteger(Read(context, size).MakeByteArray());
-            }
-
-            private char ReadUInt8(CodeContext/*!*/ context) {
-                return _file.ReadChar(context);
+            private object? Pop() {
+                int fence = _marks.Count > 0 ? _marks[_marks.Count - 1] : 0;
+                if (_stack.Count <= fence) {
+                    throw UnpicklingError(_context, "unpickling stack underflow");
+                }
+                object? res = _stack[_stack.Count - 1];
+                _stack.RemoveAt(_stack.Count - 1);
+                return res;
             }
 
-            private ushort ReadUInt16(CodeContext/*!*/ context) {
-                int index = 0;
-                return PythonStruct.CreateUShortValue(context, ref index, true, Read(context, 2));
+            private object? Peek() {
+                int fence = _marks.Count > 0 ? _marks[_marks.Count - 1] : 0;
+                if (_stack.Count <= fence) {
+                    throw UnpicklingError(_context, "unpickling stack underflow");
+                }
+                return _stack[_stack.Count - 1];
             }
 
-            public object find_global(CodeContext/*!*/ context, object module, object attr) {
-                object moduleObject;
-                if (!Importer.TryGetExistingModule(context, Converter.ConvertToString(module), out moduleObject)) {
-                    LightExceptions.CheckAndThrow(Builtin.__import__(context, Converter.ConvertToString(module)));
-                    moduleObject = context.LanguageContext.SystemStateModules[module];
+            private int PopMarkIndex() {
+                if (_marks.Count == 0) {
+                    throw UnpicklingError(_context, "could not find MARK");
                 }
-                return PythonOps.GetBoundAttr(context, moduleObject, Converter.ConvertToString(attr));
+                int mark = _marks[_marks.Count - 1];
+                _marks.RemoveAt(_marks.Count - 1);
+                return mark;
             }
 
-            private object MakeInstance(CodeContext/*!*/ context, object cls, object[] args) {
-                return PythonOps.CallWithContext(context, cls, args);
+            private object?[] PopMark() {
+                int mark = PopMarkIndex();
+                var items = new object?[_stack.Count - mark];
+                _stack.CopyTo(mark, items, 0, items.Length);
+                _stack.RemoveRange(mark, items.Length);
+                return items;
             }
 
-            private void PopMark(int markIndex) {
-                for (int i = _stack.Count - 1; i >= markIndex; i--) {
-                    _stack.RemoveAt(i);
+            private object? MemoGet(int index) {
+                object? res = index >= 0 && index < _memo.Length ? _memo[index] : null;
+                if (res == null) {
+                    throw UnpicklingError(_context, $"Memo value not found at index {index}");
                 }
+                return res == _missing ? null : res;
             }
 
-            /// <summary>
-            /// Interpret everything from markIndex to the top of the stack as a sequence
-            /// of key, value, key, value, etc. Set dict[key] = value for each. Pop
-            /// everything from markIndex up when done.
-            /// </summary>
-            private void SetItems(PythonDictionary dict, int markIndex) {
-                var storage = dict._storage;
-                storage.EnsureCapacityNoLock((_stack.Count - (markIndex + 1)) / 2);
-                for (int i = markIndex + 1; i < _stack.Count; i += 2) {
-                    storage.AddNoLock(ref dict._storage, _stack[i], _stack[i + 1]);
+            private void MemoPut(int index, object? value) {
+                if (index >= _memo.Length) {
+                    Array.Resize(ref _memo, Math.Max(index + 1, _memo.Length * 2));
                 }
-                PopMark(markIndex);
-            }
-
-            private void LoadAppend(CodeContext/*!*/ context) {
-                object item = PopStack();
-                object seq = PeekStack();
-                if (seq is PythonList) {
-                    ((PythonList)seq).append(item);
-                } else {
-                    PythonCalls.Call(context, PythonOps.GetBoundAttr(context, seq, "append"), item);
+                if (_memo[index] == null) {
+                    _memoCount++;
                 }
+                _memo[index] = value ?? _missing;
             }
 
-            private void LoadAppends(CodeContext/*!*/ context) {
-                int markIndex = GetMarkIndex(context);
-                PythonList seq = (PythonList)_stack[markIndex - 1];
-                for (int i = markIndex + 1; i < _stack.Count; i++) {
-                    seq.AddNoLock(_stack[i]);
-                }
-                PopMark(markIndex);
-            }
+            #endregion
 
-            private void LoadBinFloat(CodeContext/*!*/ context) {
-                _stack.Add(ReadFloat64(context));
-            }
+            #region Load
 
-            private void LoadBinGet(CodeContext/*!*/ context) {
-                _stack.Add(MemoGet(context, ReadUInt8(context)));
-            }
+            private void Dispatch(byte opcode) {
+                CodeContext context = _context;
+                switch (opcode) {
+                    case Opcode.Proto:
+                        int proto = ReadUInt8();
+                        if (proto > HighestProtocol) {
+                            throw PythonOps.ValueError("unsupported pickle protocol: {0}", proto);
+                        }
+                        _proto = proto;
+                        break;
+                    case Opcode.Frame:
+                        int frameSize = ReadSize64("FRAME");
+                        // load the whole frame, it is then consumed from the buffer
+                        Read(frameSize);
+                        _inputPos -= frameSize;
+                        break;
+
+                    case Opcode.None: Push(null); break;
+                    case Opcode.NewFalse: Push(ScriptingRuntimeHelpers.False); break;
+                    case Opcode.NewTrue: Push(ScriptingRuntimeHelpers.True); break;
+
+                    case Opcode.Int: LoadInt(); break;
+                    case Opcode.BinInt: Push(ReadInt32()); break;
+                    case Opcode.BinInt1: Push(ReadUInt8()); break;
+                    case Opcode.BinInt2: Push(ReadUInt16()); break;
+                    case Opcode.Long: LoadLong(); break;
+                    case Opcode.Long1: LoadLongBinary(ReadUInt8()); break;
+                    case Opcode.Long4:
+                        int size = ReadInt32();
+                        if (size < 0) {
+                            throw UnpicklingError(context, "LONG pickle has negative byte count");
+                        }
+                        LoadLongBinary(size);
+                        break;
+                    case Opcode.Float: {
+                            int offset = ReadLine(out int length);
+                            Push(DoubleOps.__new__(context, TypeCache.Double, DecodeAscii(offset, length)));
+                            break;
+                        }
+                    case Opcode.BinFloat:
+                        Push(BitConverter.Int64BitsToDouble(BinaryPrimitives.ReadInt64BigEndian(_input.AsSpan(Read(8)))));
+                        break;
+
+                    case Opcode.String: LoadString(); break;
+                    case Opcode.BinString: {
+                            int length = ReadInt32();
+                            if (length < 0) {
+                                throw UnpicklingError(context, "BINSTRING pickle has negative byte count");
+                            }
+                            Push(DecodeString(ReadBytes(length)));
+                            break;
+                        }
+                    case Opcode.ShortBinString: Push(DecodeString(ReadBytes(ReadUInt8()))); break;
+                    case Opcode.BinBytes: Push(ReadBytes(ReadSize32("BINBYTES"))); break;
+                    case Opcode.ShortBinBytes: Push(ReadBytes(ReadUInt8())); break;
+                    case Opcode.BinBytes8: Push(ReadBytes(ReadSize64("BINBYTES8"))); break;
+                    case Opcode.ByteArray8: Push(ReadByteArray(ReadSize64("BYTEARRAY8"))); break;
+                    case Opcode.Unicode: {
+                            int offset = ReadLine(out int length);
+                            var line = Bytes.Make(_input.AsSpan(offset, length).ToArray());
+                            Push(StringOps.RawDecode(context, line, "raw-unicode-escape", "strict"));
+                            break;
+                        }
+                    case Opcode.BinUnicode: {
+                            int length = ReadSize32("BINUNICODE");
+                            Push(DecodeUtf8(Read(length), length));
+                            break;
+                        }
+                    case Opcode.ShortBinUnicode: {
+                            int length = ReadUInt8();
+                            Push(DecodeUtf8(Read(length), length));
+                            break;
+                        }
+                    case Opcode.BinUnicode8: {
+                            int length = ReadSize64("BINUNICODE8");
+                            Push(DecodeUtf8(Read(length), length));
+                            break;
+                        }
 
-            private void LoadBinInt(CodeContext/*!*/ context) {
-                _stack.Add(ReadInt32(context));
-            }
+                    case Opcode.NextBuffer:
+                        if (_buffers == null) {
+                            throw UnpicklingError(context, "pickle stream refers to out-of-band data but no *buffers* argument was given");
+                        }
+                        if (!_buffers.MoveNext()) {
+                            throw UnpicklingError(context, "not enough out-of-band buffers");
+                        }
+                        Push(_buffers.Current);
+                        break;
+                    case Opcode.ReadOnlyBuffer: {
+                            object? buf = Peek();
+                            if (buf is not IBufferProtocol bp) {
+                                throw PythonOps.TypeErrorForTypeMismatch("bytes-like object", buf);
+                            }
+                            using (IPythonBuffer? writable = bp.GetBuffer(BufferFlags.Writable, throwOnError: false)) {
+                                if (writable != null) {
+                                    _stack[_stack.Count - 1] = new MemoryView(bp, readOnly: true);
+                                }
+                            }
+                            break;
+                        }
 
-            private void LoadBinInt1(CodeContext/*!*/ context) {
-                _stack.Add((int)ReadUInt8(context));
-            }
+                    case Opcode.EmptyTuple: Push(PythonTuple.EMPTY); break;
+                    case Opcode.Tuple: Push(PythonTuple.MakeTuple(PopMark())); break;
+                    case Opcode.Tuple1: {
+                            object? item = Pop();
+                            Push(PythonTuple.MakeTuple(item));
+                            break;
+                        }
+                    case Opcode.Tuple2: {
+                            object? item2 = Pop(), item1 = Pop();
+                            Push(PythonTuple.MakeTuple(item1, item2));
+                            break;
+                        }
+                    case Opcode.Tuple3: {
+                            object? item3 = Pop(), item2 = Pop(), item1 = Pop();
+                            Push(PythonTuple.MakeTuple(item1, item2, item3));
+                            break;
+                        }
+                    case Opcode.EmptyList: Push(new PythonList()); break;
+                    case Opcode.List: Push(PythonList.FromArrayNoCopy(PopMark())); break;
+                    case Opcode.EmptyDict: Push(new PythonDictionary()); break;
+                    case Opcode.Dict: {
+                            object?[] items = PopMark();
+                            var dict = new PythonDictionary(items.Length / 2);
+                            for (int i = 0; i + 1 < items.Length; i += 2) {
+                                dict[items[i]] = items[i + 1];
+                            }
+                            Push(dict);
+                            break;
+                        }
+                    case Opcode.EmptySet: Push(new SetCollection()); break;
+                    case Opcode.FrozenSet: Push(FrozenSetCollection.Make(PythonList.FromArrayNoCopy(PopMark()))); break;
+
+                    case Opcode.Inst: {
+                            string module = ReadLineAscii();
+                            string name = ReadLineAscii();
+                            object klass = FindClass(module, name);
+                            Instantiate(klass, PopMark());
+                            break;
+                        }
+                    case Opcode.Obj: {
+                            object?[] args = PopMark();
+                            if (args.Length == 0) {
+                                throw UnpicklingError(context, "unpickling stack underflow");
+                            }
+                            var ctorArgs = new object?[args.Length - 1];
+                            Array.Copy(args, 1, ctorArgs, 0, ctorArgs.Length);
+                            Instantiate(args[0], ctorArgs);
+                            break;
+                        }
+                    case Opcode.NewObj: {
+                            object? args = Pop();
+                            object? cls = Pop();
+                            if (args is not PythonTuple argTuple) {
+                                throw UnpicklingError(context, $"NEWOBJ expected an arg tuple, got {PythonOps.GetPythonTypeName(args)}");
+                            }
+                            Push(CallNew(cls, argTuple, null));
+                            break;
+                        }
+                    case Opcode.NewObjEx: {
+                            object? kwargs = Pop();
+                            object? args = Pop();
+                            object? cls = Pop();
+                            if (args is not PythonTuple argTuple) {
+                                throw UnpicklingError(context, $"NEWOBJ_EX args argument must be a tuple, not {PythonOps.GetPythonTypeName(args)}");
+                            }
+                            if (kwargs is not PythonDictionary kwDict) {
+                                throw UnpicklingError(context, $"NEWOBJ_EX kwargs argument must be a dict, not {PythonOps.GetPythonTypeName(kwargs)}");
+                            }
+                            Push(CallNew(cls, argTuple, kwDict));
+                            break;
+                        }
+                    case Opcode.Global: {
+                            int offset = ReadLine(out int length);
+                            string module = DecodeUtf8(offset, length);
+                            offset = ReadLine(out length);
+                            string name = DecodeUtf8(offset, length);
+                            Push(FindClass(module, name));
+                            break;
+                        }
+                    case Opcode.StackGlobal: {
+                            object? name = Pop();
+                            object? module = Pop();
+                            if (name is not string nameStr || module is not string moduleStr) {
+                                throw UnpicklingError(context, "STACK_GLOBAL requires str");
+                            }
+                            Push(FindClass(moduleStr, nameStr));
+                            break;
+                        }
+                    case Opcode.Ext1: LoadExtension(ReadUInt8()); break;
+                    case Opcode.Ext2: LoadExtension(ReadUInt16()); break;
+                    case Opcode.Ext4: LoadExtension(ReadInt32()); break;
+                    case Opcode.Reduce: {
+                            object? args = Pop();
+                            object? func = Peek();
+                            if (args is not PythonTuple argTuple) {
+                                throw UnpicklingError(context, "REDUCE argument must be a tuple");
+                            }
+                            _stack[_stack.Count - 1] = PythonOps.CallWithContext(context, func, argTuple._data);
+                            break;
+                        }
 
-            private void LoadBinInt2(CodeContext/*!*/ context) {
-                _stack.Add((int)ReadUInt16(context));
-            }
+                    case Opcode.PersId: {
+                            int offset = ReadLine(out int length);
+                            string pid;
+                            try {
+                                pid = DecodeAscii(offset, length);
+                            } catch (DecoderFallbackException) {
+                                throw UnpicklingError(context, "persistent IDs in protocol 0 must be ASCII strings");
+                            }
+                            Push(PersistentLoad(pid));
+                            break;
+                        }
+                    case Opcode.BinPersId: Push(PersistentLoad(Pop())); break;
 
-            private void LoadBinPersid(CodeContext/*!*/ context) {
-                if (_pers_loader == null) throw CannotUnpickle(context, "cannot unpickle binary persistent ID w/o persistent_load");
+                    case Opcode.Pop:
+                        if (_marks.Count > 0 && _marks[_marks.Count - 1] == _stack.Count) {
+                            _marks.RemoveAt(_marks.Count - 1);
+                        } else {
+                            Pop();
+                        }
+                        break;
+                    case Opcode.PopMark: PopMark(); break;
+                    case Opcode.Dup: Push(Peek()); break;
+                    case Opcode.Mark: _marks.Add(_stack.Count); break;
+
+                    case Opcode.Get: {
+                            int offset = ReadLine(out int length);
+                            Push(MemoGet(ParseInt(offset, length)));
+                            break;
+                        }
+                    case Opcode.BinGet: Push(MemoGet(ReadUInt8())); break;
+                    case Opcode.LongBinGet: Push(MemoGet(ReadSize32("LONG_BINGET"))); break;
+                    case Opcode.Put: {
+                            int offset = ReadLine(out int length);
+                            int index = ParseInt(offset, length);
+                            if (index < 0) {
+                                throw PythonOps.ValueError("negative PUT argument");
+                            }
+                            MemoPut(index, Peek());
+                            break;
+                        }
+                    case Opcode.BinPut: MemoPut(ReadUInt8(), Peek()); break;
+                    case Opcode.LongBinPut: MemoPut(ReadSize32("LONG_BINPUT"), Peek()); break;
+                    case Opcode.Memoize: MemoPut(_memoCount, Peek()); break;
 
-                _stack.Add(context.LanguageContext.CallSplat(_pers_loader, PopStack()));
-            }
+                    case Opcode.Append: {
+                            object? value = Pop();
+                            AppendItems(Peek(), new[] { value });
+                            break;
+                        }
+                    case Opcode.Appends: {
+                            object?[] items = PopMark();
+                            AppendItems(Peek(), items);
+                            break;
+                        }
+                    case Opcode.SetItem: {
+                            object? value = Pop();
+                            object? key = Pop();
+                            SetItems(Peek(), new[] { key, value });
+                            break;
+                        }
+                    case Opcode.SetItems: {
+                            object?[] items = PopMark();
+                            SetItems(Peek(), items);
+                            break;
+                        }
+                    case Opcode.AddItems: {
+                            object?[] items = PopMark();
+                            object? set = Peek();
+                            if (set is SetCollection sc) {
+                                foreach (object? item in items) sc.add(item);
+                            } else {
+                                object add = PythonOps.GetBoundAttr(context, set, "add");
+                                foreach (object? item in items) PythonCalls.Call(context, add, item);
+                            }
+                            break;
+                        }
+                    case Opcode.Build: LoadBuild(); break;
 
-            private void LoadBinPut(CodeContext/*!*/ context) {
-                MemoPut(ReadUInt8(context), PeekStack());
+                    default:
+                        throw UnpicklingError(context, $"invalid load key, '{(char)opcode}'.");
+                }
             }
 
-            private void LoadBinString(CodeContext/*!*/ context) {
-                _stack.Add(Read(context, ReadInt32(context)));
+            private void LoadInt() {
+                int offset = ReadLine(out int length);
+                if (length == 2 && _input[offset] == '0' && (_input[offset + 1] == '0' || _input[offset + 1] == '1')) {
+                    Push(_input[offset + 1] == '1' ? ScriptingRuntimeHelpers.True : ScriptingRuntimeHelpers.False);
+                    return;
+                }
+                Push(PythonCalls.Call(_context, TypeCache.BigInteger, DecodeAscii(offset, length), 0));
             }
 
-            private void LoadBinUnicode(CodeContext/*!*/ context) {
-                string text = Read(context, ReadInt32(context));
-                for (int i = 0; i < text.Length; i++) {
-                    if (text[i] >= 128) {
-                        _stack.Add(StringOps.decode(context, text, "utf-8", "strict"));
-                        return;
-                    }
+            private void LoadLong() {
+                int offset = ReadLine(out int length);
+                if (length > 0 && _input[offset + length - 1] == 'L') {
+                    length--;
                 }
-                _stack.Add(text);
+                Push(PythonCalls.Call(_context, TypeCache.BigInteger, DecodeAscii(offset, length), 0));
             }
 
-            private void LoadBuild(CodeContext/*!*/ context) {
-                object arg = PopStack();
-                object inst = PeekStack();
-                object setStateCallable;
-                if (PythonOps.TryGetBoundAttr(context, inst, "__setstate__", out setStateCallable)) {
-                    PythonOps.CallWithContext(context, setStateCallable, arg);
+            private void LoadLongBinary(int size) {
+                if (size == 0) {
+                    Push(0);
                     return;
                 }
-
-                PythonDictionary dict;
-                PythonDictionary slots;
-                if (arg == null) {
-                    dict = null;
-                    slots = null;
-                } else if (arg is PythonDictionary) {
-                    dict = (PythonDictionary)arg;
-                    slots = null;
-                } else if (arg is PythonTuple) {
-                    PythonTuple argsTuple = (PythonTuple)arg;
-                    if (argsTuple.__len__() != 2) {
-                        throw PythonOps.ValueError("state for object without __setstate__ must be None, dict, or 2-tuple");
-                    }
-                    dict = (PythonDictionary)argsTuple[0];
-                    slots = (PythonDictionary)argsTuple[1];
+                var value = new BigInteger(_input.AsSpan(Read(size), size).ToArray());
+                if (value >= int.MinValue && value <= int.MaxValue) {
+                    Push((int)value);
                 } else {
-                    throw PythonOps.ValueError("state for object without __setstate__ must be None, dict, or 2-tuple");
-                }
-
-                if (dict != null) {
-                    object instDict;
-                    if (PythonOps.TryGetBoundAttr(context, inst, "__dict__", out instDict)) {
-                        PythonDictionary realDict = instDict as PythonDictionary;
-                        if (realDict != null) {
-                            realDict.update(context, dict);
-                        } else {
-                            object updateCallable;
-                            if (PythonOps.TryGetBoundAttr(context, instDict, "update", out updateCallable)) {
-                                PythonOps.CallWithContext(context, updateCallable, dict);
-                            } else {
-                                throw CannotUnpickle(context, "could not update __dict__ {0} when building {1}", dict, inst);
-                            }
-                        }
-                    }
+                    Push(value);
                 }
-
-                if (slots != null) {
-                    foreach (object key in (IEnumerable)slots) {
-                        PythonOps.SetAttr(context, inst, (string)key, slots[key]);
-                    }
-                }
-            }
-
-            private void LoadDict(CodeContext/*!*/ context) {
-                int markIndex = GetMarkIndex(context);
-                PythonDictionary dict = new PythonDictionary((_stack.Count - 1 - markIndex) / 2);
-                SetItems(dict, markIndex);
-                _stack.Add(dict);
             }
 
-            private void LoadDup(CodeContext/*!*/ context) {
-                _stack.Add(PeekStack());
-            }
-
-            private void LoadEmptyDict(CodeContext/*!*/ context) {
-                _stack.Add(new PythonDictionary(new CommonDictionaryStorage()));
-            }
-
-            private void LoadEmptyList(CodeContext/*!*/ context) {
-                _stack.Add(PythonOps.MakeList());
-            }
-
-            private void LoadEmptyTuple(CodeContext/*!*/ context) {
-                _stack.Add(PythonTuple.MakeTuple());
-            }
-
-            private void LoadExt1(CodeContext/*!*/ context) {
-                PythonTuple global = (PythonTuple)PythonCopyReg.GetInvertedRegistry(context)[(int)ReadUInt8(context)];
-                _stack.Add(find_global(context, global[0], global[1]));
-            }
-
-            private void LoadExt2(CodeContext/*!*/ context) {
-                PythonTuple global = (PythonTuple)PythonCopyReg.GetInvertedRegistry(context)[(int)ReadUInt16(context)];
-                _stack.Add(find_global(context, global[0], global[1]));
-            }
-
-            private void LoadExt4(CodeContext/*!*/ context) {
-                PythonTuple global = (PythonTuple)PythonCopyReg.GetInvertedRegistry(context)[ReadInt32(context)];
-                _stack.Add(find_global(context, global[0], global[1]));
-            }
-
-            private void LoadFloat(CodeContext/*!*/ context) {
-                _stack.Add(ReadFloatString(context));
-            }
-
-            private void LoadGet(CodeContext/*!*/ context) {
-                try {
-                    _stack.Add(MemoGet(context, (int)ReadIntFromString(context)));
-                } catch (ArgumentException) {
-                    throw PythonExceptions.CreateThrowable(BadPickleGet(context), "while executing GET: invalid integer value");
+            private void LoadString() {
+                int offset = ReadLine(out int length);
+                if (length < 2 || _input[offset] != _input[offset + length - 1] || (_input[offset] != '\'' && _input[offset] != '"')) {
+                    throw UnpicklingError(_context, "the STRING opcode argument must be quoted");
                 }
+                var quoted = Bytes.Make(_input.AsSpan(offset + 1, length - 2).ToArray());
+                Push(DecodeString((Bytes)PythonCodecs.escape_decode(quoted)[0]!));
             }
 
-            private void LoadGlobal(CodeContext/*!*/ context) {
-                string module = ReadLineNoNewline(context);
-                string attr = ReadLineNoNewline(context);
-                _stack.Add(find_global(context, module, attr));
+            /// <summary>
+            /// Decodes Python 2 str instances with the encoding given to the unpickler.
+            /// </summary>
+            private object DecodeString(Bytes value) {
+                if (_encoding == "bytes") {
+                    return value;
+                }
+                return StringOps.RawDecode(_context, value, _encoding, _errors);
             }
 
-            private void LoadInst(CodeContext/*!*/ context) {
-                LoadGlobal(context);
-                object cls = PopStack();
-                if (cls is PythonType) {
-                    int markIndex = GetMarkIndex(context);
-                    object[] args = StackGetSliceAsArray(markIndex + 1);
-                    PopMark(markIndex);
-
-                    _stack.Add(MakeInstance(context, cls, args));
-                } else {
-                    throw PythonOps.TypeError("expected class or type after INST, got {0}", DynamicHelpers.GetPythonType(cls));
+            private object FindClass(string module, string name) {
+                if (_overridesFindClass) {
+                    return PythonOps.Invoke(_context, this, nameof(find_class), module, name)!;
                 }
+                return find_class(_context, module, name);
             }
 
-            private void LoadInt(CodeContext/*!*/ context) {
-                _stack.Add(ReadIntFromString(context));
-            }
+            private void LoadExtension(int code) {
+                CodeContext context = _context;
+                object copyreg = context.LanguageContext.GetCopyRegModule();
+                var cache = (PythonDictionary)PythonOps.GetBoundAttr(context, copyreg, "_extension_cache");
+                if (cache.TryGetValue(code, out object? obj)) {
+                    Push(obj);
+                    return;
+                }
 
-            private void LoadList(CodeContext/*!*/ context) {
-                int markIndex = GetMarkIndex(context);
-                PythonList list = PythonList.FromArrayNoCopy(StackGetSliceAsArray(markIndex + 1));
-                PopMark(markIndex);
-                _stack.Add(list);
-            }
+                var registry = (PythonDictionary)PythonOps.GetBoundAttr(context, copyreg, "_inverted_registry");
+                if (!registry.TryGetValue(code, out object? key) || key is not PythonTuple keyTuple || keyTuple.Count != 2) {
+                    if (code <= 0) {
+                        throw UnpicklingError(context, "EXT specifies code <= 0");
+                    }
+                    throw PythonOps.ValueError("unregistered extension code {0}", code);
+                }
 
-            private void LoadLong(CodeContext/*!*/ context) {
-                _stack.Add(ReadLongFromString(context));
+                obj = FindClass((string)keyTuple[0]!, (string)keyTuple[1]!);
+                cache[code] = obj;
+                Push(obj);
             }
 
-            private void LoadLong1(CodeContext/*!*/ context) {
-                int size = ReadUInt8(context);
-                if (size == 4) {
-                    _stack.Add((BigInteger)ReadInt32(context));
+            private void Instantiate(object? klass, object?[] args) {
+                if (args.Length > 0 || klass is not PythonType || PythonOps.TryGetBoundAttr(_context, klass, "__getinitargs__", out _)) {
+                    Push(PythonOps.CallWithContext(_context, klass, args));
                 } else {
-                    _stack.Add(ReadLong(context, size));
+                    Push(PythonOps.Invoke(_context, klass, "__new__", klass));
                 }
             }
 
-            private void LoadLong4(CodeContext/*!*/ context) {
-                _stack.Add(ReadLong(context, ReadInt32(context)));
-            }
-
-            private void LoadLongBinGet(CodeContext/*!*/ context) {
-                _stack.Add(MemoGet(context, (int)ReadInt32(context)));
-            }
-
-            private void LoadLongBinPut(CodeContext/*!*/ context) {
-                MemoPut(ReadInt32(context), PeekStack());
-            }
-
-            private void LoadMark(CodeContext/*!*/ context) {
-                _stack.Add(_mark);
+            private object? CallNew(object? cls, PythonTuple args, PythonDictionary? kwargs) {
+                object newFunc = PythonOps.GetBoundAttr(_context, cls, "__new__");
+                var newArgs = new object?[args.Count + 1];
+                newArgs[0] = cls;
+                args._data.CopyTo(newArgs, 1);
+                if (kwargs == null || kwargs.Count == 0) {
+                    return PythonOps.CallWithContext(_context, newFunc, newArgs);
+                }
+                return PythonCalls.CallWithKeywordArgs(_context, newFunc, newArgs, kwargs);
             }
 
-            private void LoadNewFalse(CodeContext/*!*/ context) {
-                _stack.Add(ScriptingRuntimeHelpers.False);
+            private object? PersistentLoad(object? pid) {
+                if (_persistentLoad == null) {
+                    throw UnpicklingError(_context, "A load persistent id instruction was encountered,\nbut no persistent_load function was specified.");
+                }
+                return PythonCalls.Call(_context, _persistentLoad, pid);
             }
 
-            private void LoadNewObj(CodeContext/*!*/ context) {
-                PythonTuple args = PopStack() as PythonTuple;
-                if (args == null) {
-                    throw PythonOps.TypeError("expected tuple as second argument to NEWOBJ, got {0}", DynamicHelpers.GetPythonType(args));
+            private void AppendItems(object? list, object?[] items) {
+                if (list is PythonList pl && list.GetType() == typeof(PythonList)) {
+                    foreach (object? item in items) pl.AddNoLock(item);
+                    return;
                 }
 
-                PythonType cls = PopStack() as PythonType;
-                if (cls == null) {
-                    throw PythonOps.TypeError("expected new-style type as first argument to NEWOBJ, got {0}", DynamicHelpers.GetPythonType(args));
+                if (PythonOps.TryGetBoundAttr(_context, list, "extend", out object? extend) && items.Length > 1) {
+                    PythonCalls.Call(_context, extend, PythonList.FromArrayNoCopy(items));
+                    return;
                 }
 
-                PythonTypeSlot dts;
-                object value;
-                if (cls.TryResolveSlot(context, "__new__", out dts) &&
-                    dts.TryGetValue(context, null, cls, out value)) {
-                    object[] newargs = new object[args.__len__() + 1];
-                    ((ICollection)args).CopyTo(newargs, 1);
-                    newargs[0] = cls;
+                object append = PythonOps.GetBoundAttr(_context, list, "append");
+                foreach (object? item in items) {
+                    PythonCalls.Call(_context, append, item);
+                }
+            }
 
-                    _stack.Add(PythonOps.CallWithContext(context, value, newargs));
+            private void SetItems(object? dict, object?[] items) {
+                if (dict is PythonDictionary pd) {
+                    for (int i = 0; i + 1 < items.Length; i += 2) {
+                        pd[items[i]] = items[i + 1];
+                    }
                     return;
                 }
-                
-                throw PythonOps.TypeError("didn't find __new__");
-            }
 
-            private void LoadNewTrue(CodeContext/*!*/ context) {
-                _stack.Add(ScriptingRuntimeHelpers.True);
+                for (int i = 0; i + 1 < items.Length; i += 2) {
+                    _context.LanguageContext.SetIndex(dict!, items[i]!, items[i + 1]!);
+                }
             }
 
-            private void LoadNoneValue(CodeContext/*!*/ context) {
-                _stack.Add(null);
-            }
+            private void LoadBuild() {
+                CodeContext context = _context;
+                object? state = Pop();
+                object? inst = Peek();
 
-            private void LoadObj(CodeContext/*!*/ context) {
-                int markIndex = GetMarkIndex(context);
-                if ((markIndex + 1) >= _stack.Count) {
-                    throw PythonExceptions.CreateThrowable(UnpicklingError(context), "could not find MARK");
+                if (PythonOps.TryGetBoundAttr(context, inst, "__setstate__", out object? setState)) {
+                    PythonCalls.Call(context, setState, state);
+                    return;
                 }
 
-                object cls = _stack[markIndex + 1];
-                if (cls is PythonType) {
-                    object[] args = StackGetSliceAsArray(markIndex + 2);
-                    PopMark(markIndex);
-                    _stack.Add(MakeInstance(context, cls, args));
-                } else {
-                    throw PythonOps.TypeError("expected class or type as first argument to INST, got {0}", DynamicHelpers.GetPythonType(cls));
+                object? slotState = null;
+                if (state is PythonTuple t && t.Count == 2) {
+                    state = t[0];
+                    slotState = t[1];
                 }
-            }
 
-            private void LoadPersId(CodeContext/*!*/ context) {
-                if (_pers_loader == null) {
-                    throw CannotUnpickle(context, "A load persistent ID instruction is present but no persistent_load function is available");
+                if (state != null && PythonOps.IsTrue(state)) {
+                    object instDict = PythonOps.GetBoundAttr(context, inst, "__dict__");
+                    if (state is not PythonDictionary stateDict) {
+                        throw UnpicklingError(context, "state is not a dictionary");
+                    }
+                    foreach (KeyValuePair<object?, object?> item in stateDict._storage.GetItems()) {
+                        context.LanguageContext.SetIndex(instDict, item.Key!, item.Value!);
+                    }
                 }
-                _stack.Add(context.LanguageContext.CallSplat(_pers_loader, ReadLineNoNewline(context)));
-            }
-
-            private void LoadPop(CodeContext/*!*/ context) {
-                PopStack();
-            }
-
-            private void LoadPopMark(CodeContext/*!*/ context) {
-                PopMark(GetMarkIndex(context));
-            }
 
-            private void LoadProto(CodeContext/*!*/ context) {
-                int proto = ReadUInt8(context);
-                if (proto > 2) throw PythonOps.ValueError("unsupported pickle protocol: {0}", proto);
-                // discard result
-            }
-
-            private void LoadPut(CodeContext/*!*/ context) {
-                MemoPut((int)ReadIntFromString(context), PeekStack());
-            }
-
-            private void LoadReduce(CodeContext/*!*/ context) {
-                object args = PopStack();
-                object callable = PopStack();
-                if (args == null) {
-                    _stack.Add(PythonCalls.Call(context, PythonOps.GetBoundAttr(context, callable, "__basicnew__")));
-                } else if (args.GetType() != typeof(PythonTuple)) {
-                    throw PythonOps.TypeError(
-                        "while executing REDUCE, expected tuple at the top of the stack, but got {0}",
-                        DynamicHelpers.GetPythonType(args)
-                    );
+                if (slotState != null && PythonOps.IsTrue(slotState)) {
+                    if (slotState is not PythonDictionary slotDict) {
+                        throw UnpicklingError(context, "slot state is not a dictionary");
+                    }
+                    foreach (KeyValuePair<object?, object?> item in slotDict._storage.GetItems()) {
+                        PythonOps.SetAttr(context, inst, (string)item.Key!, item.Value);
+                    }
                 }
-
-                _stack.Add(PythonCalls.Call(context, callable, ((PythonTuple)args)._data));
             }
 
-            private void LoadSetItem(CodeContext/*!*/ context) {
-                object value = PopStack();
-                object key = PopStack();
-                PythonDictionary dict = PeekStack() as PythonDictionary;
-                if (dict == null) {
-                    throw PythonOps.TypeError(
-                        "while executing SETITEM, expected dict at stack[-3], but got {0}",
-                        DynamicHelpers.GetPythonType(PeekStack())
-                    );
-                }
-                dict[key] = value;
-            }
+            #endregion
+        }
 
-            private void LoadSetItems(CodeContext/*!*/ context) {
-                int markIndex = GetMarkIndex(context);
-                PythonDictionary dict = _stack[markIndex - 1] as PythonDictionary;
-                
-                if (dict == null) {
-                    throw PythonOps.TypeError(
-                        "while executing SETITEMS, expected dict below last mark, but got {0}",
-                        DynamicHelpers.GetPythonType(_stack[markIndex - 1])
-                    );
-                }
-                SetItems(dict, markIndex);
-            }
+        #endregion
 
-            private void LoadShortBinstring(CodeContext/*!*/ context) {
-                _stack.Add(Read(context, ReadUInt8(context)));
-            }
+        #region PickleBuffer
 
-            private void LoadString(CodeContext/*!*/ context) {
-                string repr = ReadLineNoNewline(context);
-                if (repr.Length < 2 ||
-                    !(
-                    repr[0] == '"' && repr[repr.Length - 1] == '"' ||
-                    repr[0] == '\'' && repr[repr.Length - 1] == '\''
-                    )
-                ) {
-                    throw PythonOps.ValueError("while executing STRING, expected string that starts and ends with quotes");
-                }
-                _stack.Add(StringOps.decode(context, repr.Substring(1, repr.Length - 2), "unicode_escape", "strict"));
-            }
+        [Documentation("PickleBuffer(buffer)\n\nWrapper for potentially out-of-band buffers")]
+        [PythonType]
+        public sealed class PickleBuffer : IBufferProtocol {
+            private IBufferProtocol? _exporter;
+            private IPythonBuffer? _view;
 
-            private void LoadTuple(CodeContext/*!*/ context) {
-                int markIndex = GetMarkIndex(context);
-                PythonTuple tuple = PythonTuple.MakeTuple(StackGetSliceAsArray(markIndex + 1));
-                PopMark(markIndex);
-                _stack.Add(tuple);
+            public PickleBuffer([NotNone] IBufferProtocol buffer) {
+                _view = buffer.GetBuffer(BufferFlags.FullRO);
+                _exporter = buffer;
             }
 
-            private void LoadTuple1(CodeContext/*!*/ context) {
-                object item0 = PopStack();
-                _stack.Add(PythonTuple.MakeTuple(item0));
+            [Documentation("raw() -> memoryview\n\nReturn a memoryview of the raw memory underlying this buffer.\nWill raise BufferError is the buffer isn't contiguous.")]
+            public MemoryView raw() {
+                IPythonBuffer view = GetView();
+                if (view.SubOffsets != null || !view.IsCContiguous()) {
+                    throw new BufferException("cannot extract raw buffer from non-contiguous buffer");
+                }
+                return new MemoryView(this).cast("B");
             }
 
-            private void LoadTuple2(CodeContext/*!*/ context) {
-                object item1 = PopStack();
-                object item0 = PopStack();
-                _stack.Add(PythonTuple.MakeTuple(item0, item1));
+            [Documentation("release() -> None\n\nRelease the underlying buffer exposed by the PickleBuffer object.")]
+            public void release() {
+                _view?.Dispose();
+                _view = null;
+                _exporter = null;
             }
 
-            private void LoadTuple3(CodeContext/*!*/ context) {
-                object item2 = PopStack();
-                object item1 = PopStack();
-                object item0 = PopStack();
-                _stack.Add(PythonTuple.MakeTuple(item0, item1, item2));
-            }
+            internal IPythonBuffer GetView()
+                => _view ?? throw PythonOps.ValueError("operation forbidden on released PickleBuffer object");
 
-            private void LoadUnicode(CodeContext/*!*/ context) {
-                _stack.Add(StringOps.decode(context, ReadLineNoNewline(context), "raw-unicode-escape", "strict"));
+            IPythonBuffer? IBufferProtocol.GetBuffer(BufferFlags flags, bool throwOnError) {
+                GetView();
+                return _exporter!.GetBuffer(flags, throwOnError);
             }
         }
 
         #endregion
 
-        private static PythonType PicklingError(CodeContext/*!*/ context) {
-            return (PythonType)context.LanguageContext.GetModuleState("PicklingError");
-        }
+        #region Helpers
 
-        private static PythonType PickleError(CodeContext/*!*/ context) {
-            return (PythonType)context.LanguageContext.GetModuleState("PickleError");
-        }
+        private static Exception PicklingError(CodeContext/*!*/ context, string message)
+            => PythonExceptions.CreateThrowable((PythonType)context.LanguageContext.GetModuleState(PicklingErrorKey), message);
 
-        private static PythonType UnpicklingError(CodeContext/*!*/ context) {
-            return (PythonType)context.LanguageContext.GetModuleState("UnpicklingError");
-        }
+        private static Exception UnpicklingError(CodeContext/*!*/ context, string message)
+            => PythonExceptions.CreateThrowable((PythonType)context.LanguageContext.GetModuleState(UnpicklingErrorKey), message);
 
-        private static PythonType BadPickleGet(CodeContext/*!*/ context) {
-            return (PythonType)context.LanguageContext.GetModuleState("BadPickleGet");
+        private static bool IsAscii(string s) {
+            foreach (char c in s) {
+                if (c >= 0x80) return false;
+            }
+            return true;
         }
 
-        class ReferenceEqualityComparer : IEqualityComparer<object> {
-            public static ReferenceEqualityComparer Instance = new ReferenceEqualityComparer();
-            #region IEqualityComparer<object> Members
-
-            public new bool Equals(object x, object y) {
-                return x == y;
-            }
+        private static object ImportModule(CodeContext/*!*/ context, string name) {
+            Importer.ImportModule(context, new PythonDictionary(), name, false, 0);
+            return context.LanguageContext.SystemStateModules[name];
+        }
 
-            public int GetHashCode(object obj) {
-                return System.Runtime.CompilerServices.RuntimeHelpers.GetHashCode(obj);
+        /// <summary>
+        /// Resolves a dotted name relative to obj and returns the object along with its parent.
+        /// </summary>
+        private static (object obj, object parent) GetAttribute(CodeContext/*!*/ context, object obj, string name) {
+            object parent = obj;
+            foreach (string subpath in name.Split('.')) {
+                if (subpath == "<locals>") {
+                    throw PythonOps.AttributeError("Can't get local attribute {0} on {1}", PythonOps.Repr(context, name), PythonOps.Repr(context, obj));
+                }
+                parent = obj;
+                if (!PythonOps.TryGetBoundAttr(context, obj, subpath, out object? value)) {
+                    throw PythonOps.AttributeError("Can't get attribute {0} on {1}", PythonOps.Repr(context, name), PythonOps.Repr(context, obj));
+                }
+                obj = value!;
             }
-
-            #endregion
+            return (obj, parent);
         }
 
+        #endregion
     }
 }
-
-#endif
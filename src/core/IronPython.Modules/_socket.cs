@@ -406,6 +406,8 @@ namespace IronPython.Modules {
 
             private static ArrayPool<byte> ArrayPool => ArrayPool<byte>.Shared;
 
+            private const int MaxPooledBufferSize = 1024 * 1024; // ArrayPool<byte>.Shared allocates larger buffers on every call
+
             [Documentation("recv(bufsize[, flags]) -> string\n\n"
                 + "Receive data from the socket, up to bufsize bytes. For connection-oriented\n"
                 + "protocols (e.g. SOCK_STREAM), you must first call either connect() or\n"
@@ -418,6 +420,29 @@ namespace IronPython.Modules {
             public Bytes recv(int bufsize, int flags = 0) {
                 if (bufsize < 0) throw PythonOps.ValueError($"negative buffersize in {nameof(recv)}");
 
+                if (bufsize > MaxPooledBufferSize) {
+                    // rather than allocating a huge buffer, receive what's already queued into an exactly sized result
+                    int available;
+                    try {
+                        available = _socket.Available;
+                    } catch (Exception e) {
+                        throw MakeException(_context, e);
+                    }
+
+                    if (available > 0) {
+                        var bytes = new byte[Math.Min(bufsize, available)];
+                        int bytesRead;
+                        try {
+                            bytesRead = _socket.Receive(bytes, bytes.Length, (SocketFlags)flags);
+                        } catch (Exception e) {
+                            throw MakeException(_context, e);
+                        }
+
+                        if (bytesRead != bytes.Length) Array.Resize(ref bytes, bytesRead);
+                        return Bytes.Make(bytes);
+                    }
+                }
+
                 var buffer = ArrayPool.Rent(bufsize);
                 try {
                     int bytesRead;
@@ -451,11 +476,23 @@ namespace IronPython.Modules {
                 if (nbytes > span.Length) throw PythonOps.ValueError("buffer too small for requested bytes");
                 if (nbytes == 0) nbytes = span.Length;
 
-                var byteBuffer = ArrayPool.Rent(nbytes);
+#if NETCOREAPP
                 try {
-                    IPEndPoint remoteIPEP = new IPEndPoint(IPAddress.Any, 0);
-                    EndPoint remoteEP = remoteIPEP;
+                    return _socket.Receive(span.Slice(0, nbytes), (SocketFlags)flags);
+                } catch (Exception e) {
+                    throw MakeException(_context, e);
+                }
+#else
+                if (buf.TryGetArraySegment(writable: true, out ArraySegment<byte> segment)) {
+                    try {
+                        return _socket.Receive(segment.Array, segment.Offset, nbytes, (SocketFlags)flags);
+                    } catch (Exception e) {
+                        throw MakeException(_context, e);
+                    }
+                }
 
+                var byteBuffer = ArrayPool.Rent(nbytes);
+                try {
                     int bytesRead;
                     try {
                         bytesRead = _socket.Receive(byteBuffer, nbytes, (SocketFlags)flags);
@@ -469,6 +506,7 @@ namespace IronPython.Modules {
                 } finally {
                     ArrayPool.Return(byteBuffer);
                 }
+#endif
             }
 
             [Documentation("")]
@@ -521,11 +559,21 @@ namespace IronPython.Modules {
                 if (nbytes > span.Length) throw PythonOps.ValueError("nbytes is greater than the length of the buffer");
                 if (nbytes == 0) nbytes = span.Length;
 
-                var byteBuffer = ArrayPool.Rent(nbytes);
+                IPEndPoint remoteIPEP = new IPEndPoint(IPAddress.Any, 0);
+                EndPoint remoteEP = remoteIPEP;
+
+#if NETCOREAPP
+                int bytesRead;
                 try {
-                    IPEndPoint remoteIPEP = new IPEndPoint(IPAddress.Any, 0);
-                    EndPoint remoteEP = remoteIPEP;
+                    bytesRead = _socket.ReceiveFrom(span.Slice(0, nbytes), (SocketFlags)flags, ref remoteEP);
+                } catch (Exception e) {
+                    throw MakeException(_context, e);
+                }
 
+                return PythonTuple.MakeTuple(bytesRead, EndPointToTuple((IPEndPoint)remoteEP));
+#else
+                var byteBuffer = ArrayPool.Rent(nbytes);
+                try {
                     int bytesRead;
                     try {
                         bytesRead = _socket.ReceiveFrom(byteBuffer, nbytes, (SocketFlags)flags, ref remoteEP);
@@ -539,6 +587,7 @@ namespace IronPython.Modules {
                 } finally {
                     ArrayPool.Return(byteBuffer);
                 }
+#endif
             }
 
             [Documentation("")]
@@ -578,22 +627,38 @@ namespace IronPython.Modules {
                 + "had room to buffer your data for a network send"
                 )]
             public int send([NotNone] Bytes data, int flags = 0) {
-                return sendWorker(data.UnsafeByteArray, flags);
+                return sendWorker(new ArraySegment<byte>(data.UnsafeByteArray), flags);
             }
 
             public int send([NotNone] IBufferProtocol data, int flags = 0) {
                 using IPythonBuffer buffer = data.GetBuffer();
-                return sendWorker(buffer.AsUnsafeArray() ?? buffer.ToArray(), flags);
+#if NETCOREAPP
+                if (buffer.IsCContiguous()) {
+                    try {
+                        return _socket.Send(buffer.AsReadOnlySpan(), (SocketFlags)flags);
+                    } catch (Exception e) {
+                        throw MakeException(_context, e);
+                    }
+                }
+#endif
+                return sendWorker(GetSendSegment(buffer), flags);
             }
 
-            private int sendWorker(byte[] buffer, int flags) {
+            private int sendWorker(ArraySegment<byte> buffer, int flags) {
                 try {
-                    return _socket.Send(buffer, (SocketFlags)flags);
+                    return _socket.Send(buffer.Array!, buffer.Offset, buffer.Count, (SocketFlags)flags);
                 } catch (Exception e) {
                     throw MakeException(_context, e);
                 }
             }
 
+            /// <summary>
+            /// Gets the data of the buffer without copying it, unless it is not backed by a byte array.
+            /// </summary>
+            private static ArraySegment<byte> GetSendSegment(IPythonBuffer buffer) {
+                return buffer.TryGetArraySegment(writable: false, out ArraySegment<byte> segment) ? segment : new ArraySegment<byte>(buffer.ToArray());
+            }
+
             [Documentation("sendall(string[, flags]) -> None\n\n"
                 + "Send data to the remote socket. The socket must be connected to a remote\n"
                 + "socket (by calling either connect() or accept().\n"
@@ -615,20 +680,33 @@ namespace IronPython.Modules {
                 + "had room to buffer your data for a network send"
                 )]
             public void sendall([NotNone] Bytes data, int flags = 0) {
-                sendallWorker(data.UnsafeByteArray, flags);
+                sendallWorker(new ArraySegment<byte>(data.UnsafeByteArray), flags);
             }
 
             public void sendall([NotNone] IBufferProtocol data, int flags = 0) {
                 using IPythonBuffer buffer = data.GetBuffer();
-                sendallWorker(buffer.AsUnsafeArray() ?? buffer.ToArray(), flags);
+#if NETCOREAPP
+                if (buffer.IsCContiguous()) {
+                    try {
+                        ReadOnlySpan<byte> span = buffer.AsReadOnlySpan();
+                        while (!span.IsEmpty) {
+                            span = span.Slice(_socket.Send(span, (SocketFlags)flags));
+                        }
+                    } catch (Exception e) {
+                        throw MakeException(_context, e);
+                    }
+                    return;
+                }
+#endif
+                sendallWorker(GetSendSegment(buffer), flags);
             }
 
-            private void sendallWorker(byte[] buffer, int flags) {
+            private void sendallWorker(ArraySegment<byte> buffer, int flags) {
                 try {
-                    int bytesTotal = buffer.Length;
+                    int bytesTotal = buffer.Count;
                     int bytesRemaining = bytesTotal;
                     while (bytesRemaining > 0) {
-                        bytesRemaining -= _socket.Send(buffer, bytesTotal - bytesRemaining, bytesRemaining, (SocketFlags)flags);
+                        bytesRemaining -= _socket.Send(buffer.Array!, buffer.Offset + bytesTotal - bytesRemaining, bytesRemaining, (SocketFlags)flags);
                     }
                 } catch (Exception e) {
                     throw MakeException(_context, e);
@@ -653,12 +731,12 @@ namespace IronPython.Modules {
                 + "had room to buffer your data for a network send"
                 )]
             public int sendto([NotNone] Bytes data, int flags, [NotNone] PythonTuple address) {
-                return sendtoWorker(data.UnsafeByteArray, flags, address);
+                return sendtoWorker(new ArraySegment<byte>(data.UnsafeByteArray), flags, address);
             }
 
             public int sendto([NotNone] IBufferProtocol data, int flags, [NotNone] PythonTuple address) {
                 using IPythonBuffer buffer = data.GetBuffer();
-                return sendtoWorker(buffer.AsUnsafeArray() ?? buffer.ToArray(), flags, address);
+                return sendtoWorker(GetSendSegment(buffer), flags, address);
             }
 
             [Documentation("")]
@@ -668,10 +746,172 @@ namespace IronPython.Modules {
             public int sendto([NotNone] IBufferProtocol data, [NotNone] PythonTuple address)
                 => sendto(data, 0, address);
 
-            private int sendtoWorker(byte[] buffer, int flags, PythonTuple address) {
+            private int sendtoWorker(ArraySegment<byte> buffer, int flags, PythonTuple address) {
                 EndPoint remoteEP = TupleToEndPoint(_context, address, _socket.AddressFamily, out _hostName);
                 try {
-                    return _socket.SendTo(buffer, (SocketFlags)flags, remoteEP);
+                    return _socket.SendTo(buffer.Array!, buffer.Offset, buffer.Count, (SocketFlags)flags, remoteEP);
+                } catch (Exception e) {
+                    throw MakeException(_context, e);
+                }
+            }
+
+            [Documentation("sendmsg(buffers[, ancdata[, flags[, address]]]) -> count\n\n"
+                + "Send normal and ancillary data to the socket, gathering the non-ancillary data\n"
+                + "from a series of buffers and concatenating it into a single message.\n"
+                + "The buffers argument specifies the non-ancillary data as an iterable of\n"
+                + "bytes-like objects (e.g. bytes objects). Ancillary data is not supported, so\n"
+                + "the ancdata argument must be empty if given. The flags argument defaults to 0\n"
+                + "and has the same meaning as for send(). If address is supplied and not None,\n"
+                + "it sets a destination address for the message. The return value is the\n"
+                + "number of bytes of non-ancillary data sent."
+                )]
+            public int sendmsg([NotNone] object buffers, object? ancdata = null, int flags = 0, PythonTuple? address = null) {
+                if (ancdata != null && PythonOps.GetEnumerator(ancdata).MoveNext()) {
+                    throw PythonOps.NotImplementedError("ancillary data is not supported");
+                }
+
+                var views = new List<IPythonBuffer>();
+                try {
+                    var segments = new List<ArraySegment<byte>>();
+                    int total = 0;
+                    var enumerator = PythonOps.GetEnumerator(buffers);
+                    while (enumerator.MoveNext()) {
+                        if (!(enumerator.Current is IBufferProtocol bufferProtocol)) {
+                            throw PythonOps.TypeError("a bytes-like object is required, not '{0}'", PythonOps.GetPythonTypeName(enumerator.Current));
+                        }
+                        IPythonBuffer view = bufferProtocol.GetBuffer();
+                        views.Add(view);
+                        ArraySegment<byte> segment = GetSendSegment(view);
+                        segments.Add(segment);
+                        total += segment.Count;
+                    }
+
+                    if (address != null || segments.Count <= 1) {
+                        // a datagram has to go out in a single call, so gather it into one segment
+                        ArraySegment<byte> data = segments.Count == 1 ? segments[0] : new ArraySegment<byte>(Gather(segments, total));
+                        return address != null ? sendtoWorker(data, flags, address) : sendWorker(data, flags);
+                    }
+
+                    try {
+                        return _socket.Send(segments, (SocketFlags)flags);
+                    } catch (Exception e) {
+                        throw MakeException(_context, e);
+                    }
+                } finally {
+                    foreach (var view in views) view.Dispose();
+                }
+            }
+
+            private static byte[] Gather(List<ArraySegment<byte>> segments, int total) {
+                var res = new byte[total];
+                int offset = 0;
+                foreach (var segment in segments) {
+                    Array.Copy(segment.Array!, segment.Offset, res, offset, segment.Count);
+                    offset += segment.Count;
+                }
+                return res;
+            }
+
+            [Documentation("recvmsg(bufsize[, ancbufsize[, flags]]) -> (data, ancdata, msg_flags, address)\n\n"
+                + "Receive normal data (up to bufsize bytes) and ancillary data from the socket.\n"
+                + "Ancillary data is not supported, so ancdata is always an empty list. The\n"
+                + "flags argument has the same meaning as for recv(). msg_flags holds the flags\n"
+                + "set on the received message and address is the address of the sending socket\n"
+                + "if it is available, otherwise None."
+                )]
+            public PythonTuple recvmsg(int bufsize, int ancbufsize = 0, int flags = 0) {
+                if (bufsize < 0) throw PythonOps.ValueError($"negative buffer size in {nameof(recvmsg)}()");
+                if (ancbufsize < 0) throw PythonOps.ValueError($"negative buffer size in {nameof(recvmsg)}()");
+
+                var buffer = ArrayPool.Rent(bufsize);
+                try {
+                    int bytesRead = receiveMessageWorker(new ArraySegment<byte>(buffer, 0, bufsize), flags, out int msgFlags, out object? address);
+
+                    var bytes = new byte[bytesRead];
+                    Array.Copy(buffer, bytes, bytes.Length);
+
+                    return PythonTuple.MakeTuple(Bytes.Make(bytes), new PythonList(), msgFlags, address);
+                } finally {
+                    ArrayPool.Return(buffer);
+                }
+            }
+
+            [Documentation("recvmsg_into(buffers[, ancbufsize[, flags]]) -> (nbytes, ancdata, msg_flags, address)\n\n"
+                + "Receive normal data and ancillary data from the socket, scattering the\n"
+                + "non-ancillary data into a series of buffers. The buffers argument must be an\n"
+                + "iterable of objects that export writable buffers (e.g. bytearray objects).\n"
+                + "The return value is a 4-tuple: (nbytes, ancdata, msg_flags, address), where\n"
+                + "nbytes is the total number of bytes of non-ancillary data written into the\n"
+                + "buffers, and the other items are as for recvmsg()."
+                )]
+            public PythonTuple recvmsg_into([NotNone] object buffers, int ancbufsize = 0, int flags = 0) {
+                if (ancbufsize < 0) throw PythonOps.ValueError($"negative buffer size in {nameof(recvmsg_into)}()");
+
+                var views = new List<IPythonBuffer>();
+                try {
+                    var segments = new List<ArraySegment<byte>>();
+                    int total = 0;
+                    var enumerator = PythonOps.GetEnumerator(buffers);
+                    while (enumerator.MoveNext()) {
+                        IPythonBuffer? view = (enumerator.Current as IBufferProtocol)?.GetBufferNoThrow(BufferFlags.Writable);
+                        if (view is null) {
+                            throw PythonOps.TypeError("{0}() argument 1 must be an iterable of read-write buffers, not {1}", nameof(recvmsg_into), PythonOps.GetPythonTypeName(enumerator.Current));
+                        }
+                        views.Add(view);
+                        if (segments != null && view.TryGetArraySegment(writable: true, out ArraySegment<byte> segment)) {
+                            segments.Add(segment);
+                        } else {
+                            segments = null;
+                        }
+                        total = checked(total + view.NumBytes());
+                    }
+
+                    if (segments != null && segments.Count > 0 && _socket.SocketType == System.Net.Sockets.SocketType.Stream) {
+                        // scatter straight into the caller's buffers
+                        try {
+                            return PythonTuple.MakeTuple(_socket.Receive(segments, (SocketFlags)flags), new PythonList(), 0, null);
+                        } catch (Exception e) {
+                            throw MakeException(_context, e);
+                        }
+                    }
+
+                    var buffer = ArrayPool.Rent(total);
+                    try {
+                        int bytesRead = receiveMessageWorker(new ArraySegment<byte>(buffer, 0, total), flags, out int msgFlags, out object? address);
+
+                        var received = buffer.AsSpan(0, bytesRead);
+                        foreach (var view in views) {
+                            if (received.IsEmpty) break;
+                            var span = view.AsSpan();
+                            int count = Math.Min(span.Length, received.Length);
+                            received.Slice(0, count).CopyTo(span);
+                            received = received.Slice(count);
+                        }
+
+                        return PythonTuple.MakeTuple(bytesRead, new PythonList(), msgFlags, address);
+                    } finally {
+                        ArrayPool.Return(buffer);
+                    }
+                } finally {
+                    foreach (var view in views) view.Dispose();
+                }
+            }
+
+            private int receiveMessageWorker(ArraySegment<byte> buffer, int flags, out int msgFlags, out object? address) {
+                try {
+                    if (_socket.SocketType == System.Net.Sockets.SocketType.Stream) {
+                        // connection-oriented sockets report neither message flags nor a sender
+                        msgFlags = 0;
+                        address = null;
+                        return _socket.Receive(buffer.Array!, buffer.Offset, buffer.Count, (SocketFlags)flags);
+                    }
+
+                    SocketFlags socketFlags = (SocketFlags)flags;
+                    EndPoint remoteEP = new IPEndPoint(_socket.AddressFamily == AddressFamily.InterNetworkV6 ? IPAddress.IPv6Any : IPAddress.Any, 0);
+                    int bytesRead = _socket.ReceiveMessageFrom(buffer.Array!, buffer.Offset, buffer.Count, ref socketFlags, ref remoteEP, out _);
+                    msgFlags = (int)socketFlags;
+                    address = EndPointToTuple((IPEndPoint)remoteEP);
+                    return bytesRead;
                 } catch (Exception e) {
                     throw MakeException(_context, e);
                 }
@@ -897,6 +1137,18 @@ namespace IronPython.Modules {
                 Initialize(context, socket);
             }
 
+            /// <summary>
+            /// Wrap a connected .NET socket produced outside of this class (e.g. by an asynchronous accept).
+            /// </summary>
+            internal static socket FromSocket(CodeContext/*!*/ context, Socket socket) => new socket(context, socket);
+
+            /// <summary>
+            /// Convert an address tuple to an endpoint of this socket's address family.
+            /// </summary>
+            internal IPEndPoint ToEndPoint(PythonTuple address) => TupleToEndPoint(_context, address, _socket.AddressFamily, out _hostName);
+
+            internal static PythonTuple ToAddress(EndPoint endPoint) => EndPointToTuple((IPEndPoint)endPoint);
+
             /// <summary>
             /// Perform initialization common to all constructors
             /// </summary>
@@ -1664,6 +1916,8 @@ namespace IronPython.Modules {
         public const int MSG_MCAST = (int)SocketFlags.Multicast;
         public const int MSG_OOB = (int)SocketFlags.OutOfBand;
         public const int MSG_PEEK = (int)SocketFlags.Peek;
+        public const int MSG_TRUNC = (int)SocketFlags.Truncated;
+        public const int MSG_CTRUNC = (int)SocketFlags.ControlDataTruncated;
         public const int NI_DGRAM = 0x0010;
         public const int NI_MAXHOST = 1025;
         public const int NI_MAXSERV = 32;
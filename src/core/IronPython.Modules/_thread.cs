@@ -45,21 +45,14 @@ namespace IronPython.Modules {
             if (args is not PythonTuple tupArgs) throw PythonOps.TypeError("2nd arg must be a tuple");
             if (kwDict is not PythonDictionary dict) throw PythonOps.TypeError("optional 3rd arg must be a dictionary");
 
-            Thread t = CreateThread(context, new ThreadObj(context, function, tupArgs, dict).Start);
-            t.Start();
-
-            return t.ManagedThreadId;
+            return StartThread(context, new ThreadObj(context, function, tupArgs, dict), isBackground: false);
         }
 
         [Documentation("start_new_thread(function, args, [kwDict]) -> thread id\nCreates a new thread running the given function")]
         public static object start_new_thread(CodeContext/*!*/ context, object? function, object? args) {
             if (args is not PythonTuple tupArgs) throw PythonOps.TypeError("2nd arg must be a tuple");
 
-            Thread t = CreateThread(context, new ThreadObj(context, function, tupArgs, null).Start);
-            t.IsBackground = true;
-            t.Start();
-
-            return t.ManagedThreadId;
+            return StartThread(context, new ThreadObj(context, function, tupArgs, null), isBackground: true);
         }
 
         /// <summary>
@@ -144,8 +137,9 @@ namespace IronPython.Modules {
 
         [PythonType, PythonHidden]
         public sealed class @lock {
-            private AutoResetEvent? blockEvent;
-            private Thread? curHolder;
+            // SemaphoreSlim spins briefly before falling back to a kernel wait, and unlike a monitor
+            // it can be released from a thread other than the one that acquired it
+            private readonly SemaphoreSlim _semaphore = new SemaphoreSlim(1, 1);
 
             public object __enter__() {
                 acquire();
@@ -157,66 +151,40 @@ namespace IronPython.Modules {
             }
 
             public bool acquire(bool blocking = true, double timeout = -1) {
-                var timespan = Timeout.InfiniteTimeSpan;
+                int millisecondsTimeout = GetTimeout(blocking, timeout);
 
-                if (timeout != -1) {
-                    if (!blocking) throw PythonOps.ValueError("can't specify a timeout for a non-blocking call");
-                    if (timeout < 0) throw PythonOps.ValueError("timeout value must be a non-negative number");
-                    timespan = TimeSpan.FromSeconds(timeout);
+                if (_semaphore.Wait(0)) {
+                    return true;
                 }
-
-                for (; ; ) {
-                    if (Interlocked.CompareExchange(ref curHolder, Thread.CurrentThread, null) is null) {
-                        return true;
-                    }
-                    if (!blocking) {
-                        return false;
-                    }
-                    if (blockEvent == null) {
-                        // try again in case someone released us, checked the block
-                        // event and discovered it was null so they didn't set it.
-                        CreateBlockEvent();
-                        continue;
-                    }
-                    if (!blockEvent.WaitOne(timespan)) {
-                        return false;
-                    }
-                    GC.KeepAlive(this);
+                if (!blocking) {
+                    return false;
                 }
+                return _semaphore.Wait(millisecondsTimeout);
             }
 
             public void release(CodeContext/*!*/ context) {
-                if (Interlocked.Exchange(ref curHolder, null) is null) {
+                try {
+                    _semaphore.Release();
+                } catch (SemaphoreFullException) {
                     throw PythonOps.RuntimeError("release unlocked lock");
                 }
-                if (blockEvent != null) {
-                    // if this isn't set yet we race, it's handled in Acquire()
-                    blockEvent.Set();
-                    GC.KeepAlive(this);
-                }
             }
 
             public bool locked()
-                => curHolder is not null;
+                => _semaphore.CurrentCount == 0;
 
             public string __repr__() {
-                if (curHolder is null) {
+                if (!locked()) {
                     return $"<unlocked _thread.lock object at 0x{IdDispenser.GetId(this):X16}>";
                 }
                 return $"<locked _thread.lock object at 0x{IdDispenser.GetId(this):X16}>";
             }
-
-            private void CreateBlockEvent() {
-                AutoResetEvent are = new AutoResetEvent(false);
-                if (Interlocked.CompareExchange(ref blockEvent, are, null) is not null) {
-                    are.Close();
-                }
-            }
         }
 
         [PythonType]
         public sealed class RLock {
-            private AutoResetEvent? blockEvent;
+            // the owning thread holds the monitor of the RLock itself, so .NET code can synchronize with
+            // Python code through a lock statement; recursive acquires only bump the count
             private Thread? curHolder;
             private int count;
 
@@ -230,67 +198,40 @@ namespace IronPython.Modules {
             }
 
             public bool acquire(bool blocking = true, double timeout = -1) {
-                var timespan = Timeout.InfiniteTimeSpan;
-
-                if (timeout != -1) {
-                    if (!blocking) throw PythonOps.ValueError("can't specify a timeout for a non-blocking call");
-                    if (timeout < 0) throw PythonOps.ValueError("timeout value must be a non-negative number");
-                    timespan = TimeSpan.FromSeconds(timeout);
-                }
+                int millisecondsTimeout = GetTimeout(blocking, timeout);
 
                 var currentThread = Thread.CurrentThread;
+                if (curHolder == currentThread) {
+                    count++;
+                    return true;
+                }
 
-                for (; ; ) {
-                    var previousThread = Interlocked.CompareExchange(ref curHolder, currentThread, null);
-                    if (previousThread == currentThread) {
-                        count++;
-                        return true;
-                    }
-                    if (previousThread is null) {
-                        count = 1;
-                        return true;
-                    }
-                    if (!blocking) {
-                        return false;
-                    }
-                    if (blockEvent is null) {
-                        // try again in case someone released us, checked the block
-                        // event and discovered it was null so they didn't set it.
-                        CreateBlockEvent();
-                        continue;
-                    }
-                    if (!blockEvent.WaitOne(timespan)) {
-                        return false;
-                    }
-                    GC.KeepAlive(this);
+                if (!Monitor.TryEnter(this, blocking ? millisecondsTimeout : 0)) {
+                    return false;
                 }
+                curHolder = currentThread;
+                count = 1;
+                return true;
             }
 
             public void release() {
-                var currentThread = Thread.CurrentThread;
-
-                if (curHolder != currentThread) {
+                if (curHolder != Thread.CurrentThread) {
                     throw PythonOps.RuntimeError("cannot release un-acquired lock");
                 }
                 if (--count > 0) {
                     return;
                 }
 
-                if (Interlocked.Exchange(ref curHolder, null) is null) {
-                    throw PythonOps.RuntimeError("release unlocked lock");
-                }
-                if (blockEvent is not null) {
-                    // if this isn't set yet we race, it's handled in acquire()
-                    blockEvent.Set();
-                    GC.KeepAlive(this);
-                }
+                curHolder = null;
+                Monitor.Exit(this);
             }
 
             public string __repr__() {
-                if (curHolder is null) {
+                var owner = curHolder;
+                if (owner is null) {
                     return $"<unlocked _thread.RLock object owner=0 count=0 at 0x{IdDispenser.GetId(this):X16}>";
                 }
-                return $"<locked _thread.RLock object owner={curHolder?.ManagedThreadId} count={count} at 0x{IdDispenser.GetId(this):X16}>";
+                return $"<locked _thread.RLock object owner={owner.ManagedThreadId} count={count} at 0x{IdDispenser.GetId(this):X16}>";
             }
 
             public void _acquire_restore([NotNone] PythonTuple state) {
@@ -300,34 +241,129 @@ namespace IronPython.Modules {
             }
 
             public PythonTuple _release_save() {
-                var count = Interlocked.Exchange(ref this.count, 0);
-                if (count == 0) {
+                if (count == 0 || curHolder != Thread.CurrentThread) {
                     throw PythonOps.RuntimeError("cannot release un-acquired lock");
                 }
 
-                // release
-                var owner = Interlocked.Exchange(ref curHolder, null);
-                blockEvent?.Set();
+                var savedCount = count;
+                var owner = curHolder;
+                count = 0;
+                curHolder = null;
+                Monitor.Exit(this);
 
-                return PythonTuple.MakeTuple(count, owner);
+                return PythonTuple.MakeTuple(savedCount, owner);
             }
 
             public bool _is_owned()
                 => curHolder == Thread.CurrentThread;
+        }
+
+        #region Internal Implementation details
+
+        // how long a finished thread waits for another start_new_thread call before it exits
+        private static readonly TimeSpan _idleWorkerTimeout = TimeSpan.FromSeconds(30);
+        private static readonly List<Worker> _idleWorkers = new List<Worker>();
+
+        // identifies the Python thread running on the current OS thread; reset when a worker is reused
+        [ThreadStatic] private static object? _threadToken;
+
+        private static object CurrentThreadToken => _threadToken ??= new object();
 
-            private void CreateBlockEvent() {
-                AutoResetEvent are = new AutoResetEvent(false);
-                if (Interlocked.CompareExchange(ref blockEvent, are, null) != null) {
-                    are.Close();
+        /// <summary>
+        /// Runs <paramref name="thread"/> on an idle worker thread if there is one, otherwise on a new worker.
+        /// Returns the identifier of the thread it runs on.
+        /// </summary>
+        private static int StartThread(CodeContext/*!*/ context, ThreadObj thread, bool isBackground) {
+            int size = GetStackSize(context);
+            if (size == 0) {
+                lock (_idleWorkers) {
+                    int last = _idleWorkers.Count - 1;
+                    if (last >= 0) {
+                        Worker idle = _idleWorkers[last];
+                        _idleWorkers.RemoveAt(last);
+                        idle.Assign(thread, isBackground);
+                        return idle.ThreadId;
+                    }
                 }
             }
+
+            // workers with a custom stack size are not pooled; they exit once the thread function returns
+            var worker = new Worker(thread, isBackground, size, reusable: size == 0);
+            worker.Start();
+            return worker.ThreadId;
         }
 
-        #region Internal Implementation details
+        /// <summary>
+        /// An OS thread that runs one start_new_thread function after another.
+        /// </summary>
+        private sealed class Worker {
+            private readonly Thread _thread;
+            private readonly bool _reusable;
+            private readonly SemaphoreSlim _assigned = new SemaphoreSlim(0, 1);
+            private ThreadObj? _next;
+            private bool _nextIsBackground;
+
+            public Worker(ThreadObj first, bool isBackground, int stackSize, bool reusable) {
+                _thread = stackSize != 0 ? new Thread(Run, stackSize) : new Thread(Run);
+                _reusable = reusable;
+                _next = first;
+                _nextIsBackground = isBackground;
+            }
 
-        private static Thread CreateThread(CodeContext/*!*/ context, ThreadStart start) {
-            int size = GetStackSize(context);
-            return (size != 0) ? new Thread(start, size) : new Thread(start);
+            public int ThreadId => _thread.ManagedThreadId;
+
+            public void Start() => _thread.Start();
+
+            public void Assign(ThreadObj thread, bool isBackground) {
+                _next = thread;
+                _nextIsBackground = isBackground;
+                _assigned.Release();
+            }
+
+            private void Run() {
+                for (; ; ) {
+                    ThreadObj current = _next!;
+                    _next = null;
+                    _thread.IsBackground = _nextIsBackground;
+                    current.Start();
+
+                    if (!_reusable) return;
+
+                    // an idle worker must not keep the process alive
+                    _thread.IsBackground = true;
+                    lock (_idleWorkers) {
+                        _idleWorkers.Add(this);
+                    }
+                    if (!_assigned.Wait(_idleWorkerTimeout)) {
+                        lock (_idleWorkers) {
+                            if (_idleWorkers.Remove(this)) return;
+                        }
+                        // handed a new thread function just as the wait timed out
+                        _assigned.Wait();
+                    }
+                }
+            }
+        }
+
+        private static int GetTimeout(bool blocking, double timeout) {
+            if (timeout == -1) return Timeout.Infinite;
+
+            if (!blocking) throw PythonOps.ValueError("can't specify a timeout for a non-blocking call");
+            if (timeout < 0) throw PythonOps.ValueError("timeout value must be a non-negative number");
+            double milliseconds = Math.Ceiling(timeout * 1000);
+            // waits longer than the runtime supports are as good as infinite
+            return milliseconds >= int.MaxValue ? Timeout.Infinite : (int)milliseconds;
+        }
+
+        /// <summary>
+        /// Clears the Python state a thread function leaves behind on its OS thread,
+        /// so that the thread can be reused for another function.
+        /// </summary>
+        internal static void ResetThreadState(CodeContext/*!*/ context) {
+            PythonOps.CurrentExceptionState = null;
+            context.LanguageContext.SetTrace(null);
+            context.LanguageContext.SetProfileHook(null);
+            _threadToken = null;
         }
 
         private class ThreadObj {
@@ -366,6 +402,8 @@ namespace IronPython.Modules {
                         _context.LanguageContext.SetModuleState(_threadCountKey, curCount - 1);
                     }
 
+                    ResetThreadState(_context);
+
                     // release sentinel locks if locked.
                     if (_sentinelLocks != null) {
                         foreach (var obj in _sentinelLocks) {
@@ -424,7 +462,7 @@ namespace IronPython.Modules {
             /// the thread.
             /// </summary>
             private class ThreadLocalDictionaryStorage : DictionaryStorage {
-                private readonly Microsoft.Scripting.Utils.ThreadLocal<CommonDictionaryStorage> _storage = new Microsoft.Scripting.Utils.ThreadLocal<CommonDictionaryStorage>();
+                private readonly Microsoft.Scripting.Utils.ThreadLocal<ThreadStorage> _storage = new Microsoft.Scripting.Utils.ThreadLocal<ThreadStorage>();
 
                 public override void Add(ref DictionaryStorage storage, object? key, object? value) {
                     GetStorage().Add(key, value);
@@ -457,7 +495,19 @@ namespace IronPython.Modules {
                 }
 
                 private CommonDictionaryStorage/*!*/ GetStorage() {
-                    return _storage.GetOrCreate(() => new CommonDictionaryStorage());
+                    var local = _storage.GetOrCreate(() => new ThreadStorage());
+                    object token = CurrentThreadToken;
+                    if (local.Token != token) {
+                        // first use on this thread, or the OS thread now runs a different Python thread
+                        local.Token = token;
+                        local.Storage = new CommonDictionaryStorage();
+                    }
+                    return local.Storage;
+                }
+
+                private sealed class ThreadStorage {
+                    public object? Token;
+                    public CommonDictionaryStorage Storage = null!;
                 }
             }
 
@@ -0,0 +1,694 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#nullable enable
+
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Threading;
+using System.Threading.Tasks;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Exceptions;
+using IronPython.Runtime.Operations;
+using IronPython.Runtime.Types;
+
+using Microsoft.Scripting.Runtime;
+
+using SpecialName = System.Runtime.CompilerServices.SpecialNameAttribute;
+
+[assembly: PythonModule("_threadpool", typeof(IronPython.Modules.PythonThreadPool))]
+namespace IronPython.Modules {
+    /// <summary>
+    /// An executor with the interface of concurrent.futures.ThreadPoolExecutor that runs calls on worker
+    /// threads of its own. Its futures are completed through a TaskCompletionSource and interoperate with
+    /// concurrent.futures.wait and concurrent.futures.as_completed. concurrent.futures keeps its own
+    /// ThreadPoolExecutor, futures_executor returns a drop-in replacement running on this one.
+    /// </summary>
+    public static class PythonThreadPool {
+        public const string __doc__ = "Executes calls asynchronously on a pool of worker threads.";
+
+        [SpecialName]
+        public static void PerformModuleReload(PythonContext/*!*/ context, PythonDictionary/*!*/ dict) {
+            BrokenThreadPool = context.EnsureModuleException("_threadpool.BrokenThreadPool", PythonExceptions.RuntimeError, dict, "BrokenThreadPool", "_threadpool");
+        }
+
+        public static PythonType BrokenThreadPool = null!;
+
+        private static readonly object _futuresExecutorKey = new object();
+
+        // the states of concurrent.futures._base, which wait() and as_completed() inspect directly
+        private const string PENDING = "PENDING";
+        private const string RUNNING = "RUNNING";
+        private const string CANCELLED = "CANCELLED";
+        private const string CANCELLED_AND_NOTIFIED = "CANCELLED_AND_NOTIFIED";
+        private const string FINISHED = "FINISHED";
+
+        [PythonType]
+        public class Future : ICodeFormattable {
+            public const string __doc__ = "Represents the result of an asynchronous computation.";
+
+            private readonly CodeContext _context;
+            // held by lock statements here and through acquire() by concurrent.futures, see RLock
+            private readonly PythonThread.RLock _lock = new PythonThread.RLock();
+            private readonly TaskCompletionSource<object?> _completion = new TaskCompletionSource<object?>(TaskCreationOptions.RunContinuationsAsynchronously);
+            private string _status = PENDING;
+            private object? _value;
+            private PythonExceptions.BaseException? _error;
+            private List<object?>? _callbacks = new List<object?>();
+
+            public Future(CodeContext/*!*/ context) {
+                _context = context;
+            }
+
+            #region Public API
+
+            /// <summary>
+            /// The lock concurrent.futures.wait and concurrent.futures.as_completed hold while they inspect the future.
+            /// </summary>
+            public PythonThread.RLock _condition => _lock;
+
+            public string _state => _status;
+
+            public PythonList _waiters { get; } = new PythonList();
+
+            public object? _result => _value;
+
+            public object? _exception => _error;
+
+            [Documentation(@"Cancel the future if possible.
+
+Returns True if the future was cancelled, False otherwise. A future
+cannot be cancelled if it is running or has already completed.")]
+            public bool cancel() {
+                lock (_lock) {
+                    if (_status == RUNNING || _status == FINISHED) return false;
+                    if (_status == CANCELLED || _status == CANCELLED_AND_NOTIFIED) return true;
+                    _status = CANCELLED;
+                }
+                _completion.TrySetCanceled();
+                InvokeCallbacks();
+                return true;
+            }
+
+            [Documentation("Return True if the future was cancelled.")]
+            public bool cancelled() {
+                lock (_lock) {
+                    return _status == CANCELLED || _status == CANCELLED_AND_NOTIFIED;
+                }
+            }
+
+            [Documentation("Return True if the future is currently executing.")]
+            public bool running() {
+                lock (_lock) {
+                    return _status == RUNNING;
+                }
+            }
+
+            [Documentation("Return True of the future was cancelled or finished executing.")]
+            public bool done() {
+                lock (_lock) {
+                    return _status == CANCELLED || _status == CANCELLED_AND_NOTIFIED || _status == FINISHED;
+                }
+            }
+
+            [Documentation(@"Return the result of the call that the future represents.
+
+Args:
+    timeout: The number of seconds to wait for the result if the future
+        isn't done. If None, then there is no limit on the wait time.
+
+Returns:
+    The result of the call that the future represents.
+
+Raises:
+    CancelledError: If the future was cancelled.
+    TimeoutError: If the future didn't finish executing before the given
+        timeout.
+    Exception: If the call raised then that exception will be raised.")]
+            public object? result(object? timeout = null) {
+                Wait(timeout);
+                if (_error is not null) throw _error.GetClrException();
+                return _value;
+            }
+
+            [Documentation(@"Return the exception raised by the call that the future represents.
+
+Args:
+    timeout: The number of seconds to wait for the exception if the
+        future isn't done. If None, then there is no limit on the wait
+        time.
+
+Returns:
+    The exception raised by the call that the future represents or None
+    if the call completed without raising.
+
+Raises:
+    CancelledError: If the future was cancelled.
+    TimeoutError: If the future didn't finish executing before the given
+        timeout.")]
+            public object? exception(object? timeout = null) {
+                Wait(timeout);
+                return _error;
+            }
+
+            [Documentation(@"Attaches a callable that will be called when the future finishes.
+
+Args:
+    fn: A callable that will be called with this future as its only
+        argument when the future completes or is cancelled. The callable
+        will always be called by a thread in the same process in which
+        it was added. If the future has already completed or been
+        cancelled then the callable will be called immediately. These
+        callables are called in the order that they were added.")]
+            public void add_done_callback(object? fn) {
+                lock (_lock) {
+                    if (_callbacks is not null) {
+                        _callbacks.Add(fn);
+                        return;
+                    }
+                }
+                InvokeCallback(fn);
+            }
+
+            [Documentation(@"Mark the future as running or process any cancel notifications.
+
+Should only be used by Executor implementations and unit tests.
+
+If the future has been cancelled (cancel() was called and returned
+True) then any threads waiting on the future completing (though calls
+to as_completed() or wait()) are notified and False is returned.
+
+If the future was not cancelled then it is put in the running state
+(future calls to running() will return True) and True is returned.
+
+This method should be called by Executor implementations before
+executing the work associated with this future. If this method returns
+False then the work should not be executed.
+
+Returns:
+    False if the Future was cancelled, True otherwise.
+
+Raises:
+    RuntimeError: if this method was already called or if set_result()
+        or set_exception() was called.")]
+            public bool set_running_or_notify_cancel() {
+                lock (_lock) {
+                    if (_status == CANCELLED) {
+                        _status = CANCELLED_AND_NOTIFIED;
+                        foreach (object? waiter in _waiters) {
+                            PythonOps.Invoke(_context, waiter, "add_cancelled", this);
+                        }
+                        return false;
+                    }
+                    if (_status == PENDING) {
+                        _status = RUNNING;
+                        return true;
+                    }
+                    throw PythonOps.RuntimeError("Future in unexpected state");
+                }
+            }
+
+            [Documentation(@"Sets the return value of work associated with the future.
+
+Should only be used by Executor implementations and unit tests.")]
+            public void set_result(object? result) {
+                lock (_lock) {
+                    _value = result;
+                    _status = FINISHED;
+                    foreach (object? waiter in _waiters) {
+                        PythonOps.Invoke(_context, waiter, "add_result", this);
+                    }
+                }
+                _completion.TrySetResult(result);
+                InvokeCallbacks();
+            }
+
+            [Documentation(@"Sets the result of the future as being the given exception.
+
+Should only be used by Executor implementations and unit tests.")]
+            public void set_exception(object? exception) {
+                var error = exception as PythonExceptions.BaseException ?? throw PythonOps.TypeError("exceptions must derive from BaseException");
+                lock (_lock) {
+                    _error = error;
+                    _status = FINISHED;
+                    foreach (object? waiter in _waiters) {
+                        PythonOps.Invoke(_context, waiter, "add_exception", this);
+                    }
+                }
+                _completion.TrySetException(error.GetClrException());
+                InvokeCallbacks();
+            }
+
+            /// <summary>
+            /// The task completed along with the future, for awaiting the future from .NET code.
+            /// </summary>
+            [PythonHidden]
+            public Task<object?> AsTask() => _completion.Task;
+
+            public virtual string __repr__(CodeContext/*!*/ context) {
+                string address = $"0x{IdDispenser.GetId(this):x}";
+                lock (_lock) {
+                    if (_status != FINISHED) {
+                        return $"<{PythonOps.GetPythonTypeName(this)} at {address} state={_status.ToLowerInvariant()}>";
+                    }
+                    if (_error is not null) {
+                        return $"<{PythonOps.GetPythonTypeName(this)} at {address} state=finished raised {PythonOps.GetPythonTypeName(_error)}>";
+                    }
+                    return $"<{PythonOps.GetPythonTypeName(this)} at {address} state=finished returned {PythonOps.GetPythonTypeName(_value)}>";
+                }
+            }
+
+            #endregion
+
+            private void Wait(object? timeout) {
+                Task<object?> task = _completion.Task;
+                if (!task.IsCompleted) {
+                    int millisecondsTimeout = timeout is null ? Timeout.Infinite : GetTimeout(timeout);
+                    try {
+                        if (!task.Wait(millisecondsTimeout)) {
+                            throw MakeFuturesError(_context, "TimeoutError");
+                        }
+                    } catch (AggregateException) {
+                        // faulted or cancelled, reported below
+                    }
+                }
+                if (task.IsCanceled) {
+                    throw MakeFuturesError(_context, "CancelledError");
+                }
+            }
+
+            private void InvokeCallbacks() {
+                List<object?>? callbacks;
+                lock (_lock) {
+                    callbacks = _callbacks;
+                    _callbacks = null;
+                }
+                if (callbacks is null) return;
+
+                foreach (object? fn in callbacks) {
+                    InvokeCallback(fn);
+                }
+            }
+
+            private void InvokeCallback(object? fn) {
+                try {
+                    PythonCalls.Call(_context, fn, this);
+                } catch (Exception e) {
+                    var pc = _context.LanguageContext;
+                    PythonOps.PrintWithDest(_context, pc.SystemStandardError, $"exception calling callback for {PythonOps.Repr(_context, this)}");
+                    PythonOps.PrintWithDest(_context, pc.SystemStandardError, pc.FormatException(e));
+                }
+            }
+        }
+
+        [PythonType]
+        public class ThreadPoolExecutor {
+            // how long an idle worker waits for another call before its thread exits, as in _thread
+            private static readonly TimeSpan _idleWorkerTimeout = TimeSpan.FromSeconds(30);
+            private static int _executorCount;
+
+            private readonly CodeContext _context;
+            private readonly int _maxWorkers;
+            private readonly ConcurrentQueue<WorkItem> _workQueue = new ConcurrentQueue<WorkItem>();
+            // released once for every queued item and once for every worker at shutdown
+            private readonly SemaphoreSlim _workAvailable = new SemaphoreSlim(0);
+            // the workers waiting for an item, a submit which takes one of them doesn't start another thread
+            private readonly SemaphoreSlim _idleWorkers = new SemaphoreSlim(0);
+            private readonly object _shutdownLock = new object();
+            private readonly object? _initializer;
+            private readonly PythonTuple _initargs;
+            private object? _futureType;
+            private int _threadCount;
+            private int _threadsStarted;
+            // submitted work items that have not yet run or been cancelled
+            private int _pendingItems;
+            private bool _shutdown;
+            private string? _broken;
+
+            public ThreadPoolExecutor(CodeContext/*!*/ context, object? max_workers = null, [NotNone] string thread_name_prefix = "", object? initializer = null, object? initargs = null) {
+                if (max_workers is null) {
+                    _maxWorkers = Math.Min(32, Environment.ProcessorCount + 4);
+                } else {
+                    _maxWorkers = PythonOps.Index(max_workers) is int value ? value : throw PythonOps.OverflowError("max_workers is too large");
+                    if (_maxWorkers <= 0) throw PythonOps.ValueError("max_workers must be greater than 0");
+                }
+                if (initializer is not null && !PythonOps.IsCallable(context, initializer)) {
+                    throw PythonOps.TypeError("initializer must be a callable");
+                }
+
+                _context = context;
+                _thread_name_prefix = thread_name_prefix.Length > 0 ? thread_name_prefix : $"ThreadPoolExecutor-{Interlocked.Increment(ref _executorCount) - 1}";
+                _initializer = initializer;
+                _initargs = initargs is null ? PythonTuple.EMPTY : PythonTuple.Make(initargs);
+            }
+
+            #region Public API
+
+            public int _max_workers => _maxWorkers;
+
+            /// <summary>
+            /// The prefix of the names of the worker threads, which are numbered in the order they were started.
+            /// </summary>
+            public string _thread_name_prefix { get; }
+
+            /// <summary>
+            /// The type of the futures returned by submit, a subclass may use concurrent.futures.Future instead.
+            /// </summary>
+            public static PythonType _future_type => DynamicHelpers.GetPythonTypeFromType(typeof(Future));
+
+            [Documentation(@"Submits a callable to be executed with the given arguments.
+
+Schedules the callable to be executed as fn(*args, **kwargs) and returns
+a Future instance representing the execution of the callable.
+
+Returns:
+    A Future representing the given call.")]
+            public object submit(object? fn, [ParamDictionary, NotNone] IDictionary<object, object> kwargs, [NotNone] params object?[] args) {
+                object future = NewFuture();
+                lock (_shutdownLock) {
+                    if (_broken is not null) throw PythonOps.CreateThrowable(BrokenThreadPool, _broken);
+                    if (_shutdown) throw PythonOps.RuntimeError("cannot schedule new futures after shutdown");
+
+                    Interlocked.Increment(ref _pendingItems);
+                    _workQueue.Enqueue(new WorkItem(future, fn, args, kwargs.Count == 0 ? null : kwargs));
+                    _workAvailable.Release();
+                }
+                // an idle worker picks up the item, otherwise start another one
+                if (!_idleWorkers.Wait(0)) StartWorker();
+                return future;
+            }
+
+            [Documentation(@"Returns an iterator equivalent to map(fn, iter).
+
+Args:
+    fn: A callable that will take as many arguments as there are
+        passed iterables.
+    timeout: The maximum number of seconds to wait. If None, then there
+        is no limit on the wait time.
+    chunksize: The size of the chunks the iterable will be broken into.
+        Has no effect on this executor.
+
+Returns:
+    An iterator equivalent to: map(func, *iterables) but the calls may
+    be evaluated out-of-order.
+
+Raises:
+    TimeoutError: If the entire result iterator could not be generated
+        before the given timeout.
+    Exception: If fn(*args) raises for any values.")]
+            public System.Collections.IEnumerator map(object? fn, [ParamDictionary, NotNone] IDictionary<object, object> kwargs, [NotNone] params object?[] iterables) {
+                object? timeout = null;
+                int chunksize = 1;
+                foreach (KeyValuePair<object, object> kvp in kwargs) {
+                    switch (kvp.Key) {
+                        case "timeout":
+                            timeout = kvp.Value;
+                            break;
+                        case "chunksize":
+                            chunksize = PythonOps.Index(kvp.Value) is int size ? size : throw PythonOps.OverflowError("chunksize is too large");
+                            break;
+                        default:
+                            throw PythonOps.TypeError("map() got an unexpected keyword argument '{0}'", kvp.Key);
+                    }
+                }
+                if (chunksize < 1) throw PythonOps.ValueError("chunksize must be >= 1.");
+                Stopwatch? deadline = timeout is null ? null : Stopwatch.StartNew();
+                int millisecondsTimeout = timeout is null ? Timeout.Infinite : GetTimeout(timeout);
+
+                // like the builtin map, the calls are submitted for as many items as the shortest iterable yields
+                var enumerators = new System.Collections.IEnumerator[iterables.Length];
+                for (int i = 0; i < iterables.Length; i++) {
+                    enumerators[i] = PythonOps.GetEnumerator(_context, iterables[i]);
+                }
+                var futures = new List<object>();
+                if (enumerators.Length > 0) {
+                    for (; ; ) {
+                        var args = new object?[enumerators.Length];
+                        for (int i = 0; i < enumerators.Length; i++) {
+                            if (!enumerators[i].MoveNext()) goto submitted;
+                            args[i] = enumerators[i].Current;
+                        }
+                        futures.Add(submit(fn, new PythonDictionary(), args));
+                    }
+                }
+            submitted:
+                return MapResults(futures, deadline, millisecondsTimeout);
+            }
+
+            [Documentation(@"Clean-up the resources associated with the Executor.
+
+It is safe to call this method several times. Otherwise, no other
+methods can be called after this one.
+
+Args:
+    wait: If True then shutdown will not return until all running
+        futures have finished executing and the resources used by the
+        executor have been reclaimed.
+    cancel_futures: If True then shutdown will cancel all pending
+        futures. Futures that are completed or running will not be
+        cancelled.")]
+            public void shutdown(bool wait = true, bool cancel_futures = false) {
+                lock (_shutdownLock) {
+                    if (!_shutdown) {
+                        _shutdown = true;
+                        // wake the workers, each exits once the queue is empty
+                        int workers = Volatile.Read(ref _threadCount);
+                        if (workers > 0) _workAvailable.Release(workers);
+                    }
+                    if (cancel_futures) {
+                        while (_workQueue.TryDequeue(out WorkItem? item)) {
+                            Cancel(_context, item.Future);
+                            CompleteItem();
+                        }
+                    }
+                    if (wait) {
+                        while (Volatile.Read(ref _pendingItems) > 0) {
+                            Monitor.Wait(_shutdownLock);
+                        }
+                    }
+                }
+            }
+
+            public ThreadPoolExecutor __enter__() => this;
+
+            public bool __exit__([NotNone] params object?[] args) {
+                shutdown(wait: true);
+                return false;
+            }
+
+            #endregion
+
+            private object NewFuture() {
+                object? futureType = _futureType ??= PythonOps.GetBoundAttr(_context, this, nameof(_future_type));
+                return ReferenceEquals(futureType, _future_type) ? new Future(_context) : PythonCalls.Call(_context, futureType)!;
+            }
+
+            private System.Collections.IEnumerator MapResults(List<object> futures, Stopwatch? deadline, int millisecondsTimeout) {
+                int next = 0;
+                try {
+                    for (; next < futures.Count; next++) {
+                        if (deadline is null) {
+                            yield return Result(_context, futures[next], null);
+                        } else {
+                            double remaining = Math.Max(0, millisecondsTimeout - deadline.ElapsedMilliseconds);
+                            yield return Result(_context, futures[next], remaining / 1000);
+                        }
+                    }
+                } finally {
+                    // cancel the calls whose results will never be retrieved
+                    for (; next < futures.Count; next++) {
+                        Cancel(_context, futures[next]);
+                    }
+                }
+            }
+
+            /// <summary>
+            /// Starts another worker thread, unless max_workers threads are already running.
+            /// </summary>
+            private void StartWorker() {
+                int count = Volatile.Read(ref _threadCount);
+                while (count < _maxWorkers) {
+                    int previous = Interlocked.CompareExchange(ref _threadCount, count + 1, count);
+                    if (previous == count) {
+                        var thread = new Thread(Work) {
+                            IsBackground = true,
+                            Name = $"{_thread_name_prefix}_{Interlocked.Increment(ref _threadsStarted) - 1}",
+                        };
+                        thread.Start();
+                        return;
+                    }
+                    count = previous;
+                }
+            }
+
+            private void Work() {
+                bool counted = true;
+                try {
+                    if (_initializer is not null) {
+                        try {
+                            PythonCalls.Call(_context, _initializer, _initargs.ToArray());
+                        } catch (Exception e) {
+                            var pc = _context.LanguageContext;
+                            PythonOps.PrintWithDest(_context, pc.SystemStandardError, "Exception in initializer:");
+                            PythonOps.PrintWithDest(_context, pc.SystemStandardError, pc.FormatException(e));
+                            InitializerFailed();
+                            return;
+                        }
+                    }
+
+                    for (; ; ) {
+                        _idleWorkers.Release();
+                        bool signaled = _workAvailable.Wait(_idleWorkerTimeout);
+                        // if the idle mark is gone a submit counts on this worker to run its item
+                        bool claimed = !_idleWorkers.Wait(0);
+
+                        if (!signaled) {
+                            if (claimed) continue;
+
+                            Interlocked.Decrement(ref _threadCount);
+                            counted = false;
+                            // an item queued while this worker was giving up would otherwise be stranded
+                            if (_workAvailable.CurrentCount > 0) StartWorker();
+                            return;
+                        }
+
+                        if (_workQueue.TryDequeue(out WorkItem? item)) {
+                            try {
+                                item.Run(_context);
+                            } finally {
+                                CompleteItem();
+                            }
+                        } else if (Volatile.Read(ref _shutdown)) {
+                            return;
+                        }
+                    }
+                } finally {
+                    if (counted) Interlocked.Decrement(ref _threadCount);
+                }
+            }
+
+            private void InitializerFailed() {
+                lock (_shutdownLock) {
+                    _broken = "A thread initializer failed, the thread pool is not usable anymore";
+                    while (_workQueue.TryDequeue(out WorkItem? item)) {
+                        SetException(_context, item.Future, PythonExceptions.ToPython(PythonOps.CreateThrowable(BrokenThreadPool, _broken)));
+                        CompleteItem();
+                    }
+                }
+            }
+
+            private void CompleteItem() {
+                if (Interlocked.Decrement(ref _pendingItems) == 0) {
+                    lock (_shutdownLock) {
+                        Monitor.PulseAll(_shutdownLock);
+                    }
+                }
+            }
+
+            #region Futures
+
+            // the futures are either our own or those of concurrent.futures, see _future_type
+
+            private static bool SetRunning(CodeContext/*!*/ context, object future)
+                => future is Future f ? f.set_running_or_notify_cancel() : PythonOps.IsTrue(PythonOps.Invoke(context, future, "set_running_or_notify_cancel"));
+
+            private static void SetResult(CodeContext/*!*/ context, object future, object? result) {
+                if (future is Future f) f.set_result(result);
+                else PythonOps.Invoke(context, future, "set_result", result);
+            }
+
+            private static void SetException(CodeContext/*!*/ context, object future, object? exception) {
+                if (future is Future f) f.set_exception(exception);
+                else PythonOps.Invoke(context, future, "set_exception", exception);
+            }
+
+            private static void Cancel(CodeContext/*!*/ context, object future) {
+                if (future is Future f) f.cancel();
+                else PythonOps.Invoke(context, future, "cancel");
+            }
+
+            private static object? Result(CodeContext/*!*/ context, object future, object? timeout)
+                => future is Future f ? f.result(timeout) : PythonOps.Invoke(context, future, "result", timeout);
+
+            #endregion
+
+            private sealed class WorkItem {
+                private readonly object? _fn;
+                private readonly object?[] _args;
+                private readonly IDictionary<object, object>? _kwargs;
+
+                public WorkItem(object future, object? fn, object?[] args, IDictionary<object, object>? kwargs) {
+                    Future = future;
+                    _fn = fn;
+                    _args = args;
+                    _kwargs = kwargs;
+                }
+
+                public object Future { get; }
+
+                public void Run(CodeContext/*!*/ context) {
+                    if (!SetRunning(context, Future)) return;
+
+                    object? result;
+                    try {
+                        result = _kwargs is null
+                            ? PythonCalls.Call(context, _fn, _args)
+                            : PythonCalls.CallWithKeywordArgs(context, _fn, _args, _kwargs);
+                    } catch (Exception e) {
+                        SetException(context, Future, PythonExceptions.ToPython(e));
+                        return;
+                    }
+                    SetResult(context, Future, result);
+                }
+            }
+        }
+
+        [Documentation(@"futures_executor() -> type
+
+Returns a subclass of this module's ThreadPoolExecutor and
+concurrent.futures.Executor whose futures are concurrent.futures.Future
+objects.  It can be used in place of concurrent.futures.ThreadPoolExecutor,
+which is not replaced.")]
+        public static object futures_executor(CodeContext/*!*/ context) {
+            PythonContext pc = context.LanguageContext;
+            if (pc.HasModuleState(_futuresExecutorKey)) {
+                return pc.GetModuleState(_futuresExecutorKey);
+            }
+
+            // created outside of the module state lock, importing runs arbitrary code
+            object baseModule = Importer.ImportModule(context, new PythonDictionary(), "concurrent.futures._base", true, 0);
+            var members = new PythonDictionary {
+                ["__module__"] = "_threadpool",
+                ["__doc__"] = "Executes calls asynchronously on worker threads.",
+                ["_future_type"] = PythonOps.GetBoundAttr(context, baseModule, "Future"),
+            };
+            var bases = PythonTuple.MakeTuple(DynamicHelpers.GetPythonTypeFromType(typeof(ThreadPoolExecutor)), PythonOps.GetBoundAttr(context, baseModule, "Executor"));
+            object executorType = PythonCalls.Call(context, TypeCache.PythonType, "ThreadPoolExecutor", bases, members)!;
+            // a racing call may have created one first, every caller gets the same type
+            return pc.GetOrCreateModuleState(_futuresExecutorKey, () => executorType);
+        }
+
+        #region Helpers
+
+        private static int GetTimeout(object timeout) {
+            double seconds = Converter.ConvertToDouble(timeout);
+            if (seconds <= 0) return 0;
+            double milliseconds = Math.Ceiling(seconds * 1000);
+            return milliseconds >= int.MaxValue ? Timeout.Infinite : (int)milliseconds;
+        }
+
+        /// <summary>
+        /// Creates one of the exceptions of concurrent.futures, so callers can catch them as usual.
+        /// </summary>
+        private static Exception MakeFuturesError(CodeContext/*!*/ context, string name) {
+            object module = Importer.ImportModule(context, new PythonDictionary(), "concurrent.futures._base", true, 0);
+            return PythonOps.CreateThrowable((PythonType)PythonOps.GetBoundAttr(context, module, name)!);
+        }
+
+        #endregion
+    }
+}
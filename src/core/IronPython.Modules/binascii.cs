@@ -5,6 +5,7 @@
 #nullable enable
 
 using System;
+using System.Buffers.Binary;
 using System.IO;
 using System.Numerics;
 using System.Runtime.CompilerServices;
@@ -398,19 +399,47 @@ both encoded.  When quotetabs is set, space and tabs are encoded.")]
             return (BigInteger)res;
         }
 
-        private static uint crc32(ReadOnlySpan<byte> buffer, uint baseValue) {
+        internal static uint crc32(ReadOnlySpan<byte> buffer, uint baseValue) {
+            uint[][] table = crc32_table;
             uint remainder = (baseValue ^ 0xffffffff);
+
+            // slicing-by-8: fold eight bytes per step using the precomputed tables
+            while (buffer.Length >= 8) {
+                uint one = BinaryPrimitives.ReadUInt32LittleEndian(buffer) ^ remainder;
+                uint two = BinaryPrimitives.ReadUInt32LittleEndian(buffer.Slice(4));
+                remainder = table[7][one & 0xff] ^ table[6][(one >> 8) & 0xff] ^ table[5][(one >> 16) & 0xff] ^ table[4][one >> 24]
+                    ^ table[3][two & 0xff] ^ table[2][(two >> 8) & 0xff] ^ table[1][(two >> 16) & 0xff] ^ table[0][two >> 24];
+                buffer = buffer.Slice(8);
+            }
+
             foreach (byte val in buffer) {
-                remainder ^= val;
+                remainder = table[0][(remainder ^ val) & 0xff] ^ (remainder >> 8);
+            }
+            return (remainder ^ 0xffffffff);
+        }
+
+        private static readonly uint[][] crc32_table = MakeCrc32Table();
+
+        private static uint[][] MakeCrc32Table() {
+            var table = new uint[8][];
+            for (int k = 0; k < 8; k++) {
+                table[k] = new uint[256];
+            }
+
+            for (uint i = 0; i < 256; i++) {
+                uint remainder = i;
                 for (int j = 0; j < 8; j++) {
-                    if ((remainder & 0x01) != 0) {
-                        remainder = (remainder >> 1) ^ 0xEDB88320;
-                    } else {
-                        remainder = (remainder >> 1);
-                    }
+                    remainder = (remainder & 1) != 0 ? (remainder >> 1) ^ 0xEDB88320 : remainder >> 1;
                 }
+                table[0][i] = remainder;
             }
-            return (remainder ^ 0xffffffff);
+
+            for (int i = 0; i < 256; i++) {
+                for (int k = 1; k < 8; k++) {
+                    table[k][i] = (table[k - 1][i] >> 8) ^ table[0][table[k - 1][i] & 0xff];
+                }
+            }
+            return table;
         }
 
         #endregion
@@ -0,0 +1,326 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Buffers.Binary;
+using System.Security.Cryptography;
+
+namespace IronPython.Modules {
+    /// <summary>
+    /// BLAKE2 parameters, see RFC 7693 section 2.5 and the BLAKE2 specification for tree hashing.
+    /// </summary>
+    internal sealed class Blake2Parameters {
+        public int DigestSize;
+        public byte[] Key = Array.Empty<byte>();
+        public byte[] Salt = Array.Empty<byte>();
+        public byte[] Person = Array.Empty<byte>();
+        public int Fanout = 1;
+        public int Depth = 1;
+        public uint LeafSize;
+        public ulong NodeOffset;
+        public int NodeDepth;
+        public int InnerSize;
+        public bool LastNode;
+    }
+
+    /// <summary>
+    /// BLAKE2b, optimized for 64-bit platforms, produces digests of 1 to 64 bytes.
+    /// </summary>
+    internal sealed class Blake2bManaged : HashAlgorithm, ICloneable {
+        public const int BlockSize = 128;
+
+        private static readonly ulong[] IV = {
+            0x6a09e667f3bcc908UL, 0xbb67ae8584caa73bUL, 0x3c6ef372fe94f82bUL, 0xa54ff53a5f1d36f1UL,
+            0x510e527fade682d1UL, 0x9b05688c2b3e6c1fUL, 0x1f83d9abfb41bd6bUL, 0x5be0cd19137e2179UL,
+        };
+
+        private readonly Blake2Parameters _parameters;
+        private ulong[] _h = new ulong[8];
+        private ulong[] _v = new ulong[16];
+        private ulong[] _m = new ulong[16];
+        private byte[] _buffer = new byte[BlockSize];
+        private int _bufferLength;
+        private ulong _t0, _t1;
+
+        public Blake2bManaged(Blake2Parameters parameters) {
+            _parameters = parameters;
+            HashSizeValue = parameters.DigestSize * 8;
+            Initialize();
+        }
+
+        public override void Initialize() {
+            Blake2Parameters p = _parameters;
+            Span<byte> block = stackalloc byte[64];
+            block.Clear();
+            block[0] = (byte)p.DigestSize;
+            block[1] = (byte)p.Key.Length;
+            block[2] = (byte)p.Fanout;
+            block[3] = (byte)p.Depth;
+            BinaryPrimitives.WriteUInt32LittleEndian(block.Slice(4), p.LeafSize);
+            BinaryPrimitives.WriteUInt64LittleEndian(block.Slice(8), p.NodeOffset);
+            block[16] = (byte)p.NodeDepth;
+            block[17] = (byte)p.InnerSize;
+            p.Salt.AsSpan().CopyTo(block.Slice(32));
+            p.Person.AsSpan().CopyTo(block.Slice(48));
+
+            for (int i = 0; i < 8; i++) {
+                _h[i] = IV[i] ^ BinaryPrimitives.ReadUInt64LittleEndian(block.Slice(i * 8));
+            }
+            _t0 = _t1 = 0;
+            _bufferLength = 0;
+
+            if (p.Key.Length > 0) {
+                // the key is padded to a full block and processed as the first block of data
+                var keyBlock = new byte[BlockSize];
+                p.Key.CopyTo(keyBlock, 0);
+                HashCore(keyBlock, 0, BlockSize);
+            }
+        }
+
+        protected override void HashCore(byte[] array, int ibStart, int cbSize) {
+            while (cbSize > 0) {
+                // the last block is kept in the buffer until the final flag is known
+                if (_bufferLength == BlockSize) {
+                    Increment(BlockSize);
+                    Compress(isFinal: false);
+                    _bufferLength = 0;
+                }
+
+                int count = Math.Min(BlockSize - _bufferLength, cbSize);
+                Buffer.BlockCopy(array, ibStart, _buffer, _bufferLength, count);
+                _bufferLength += count;
+                ibStart += count;
+                cbSize -= count;
+            }
+        }
+
+        protected override byte[] HashFinal() {
+            Increment((ulong)_bufferLength);
+            Array.Clear(_buffer, _bufferLength, BlockSize - _bufferLength);
+            Compress(isFinal: true);
+
+            var output = new byte[64];
+            for (int i = 0; i < 8; i++) {
+                BinaryPrimitives.WriteUInt64LittleEndian(output.AsSpan(i * 8), _h[i]);
+            }
+            Array.Resize(ref output, _parameters.DigestSize);
+            return output;
+        }
+
+        public object Clone() {
+            var clone = (Blake2bManaged)MemberwiseClone();
+            clone._h = (ulong[])_h.Clone();
+            clone._v = new ulong[16];
+            clone._m = new ulong[16];
+            clone._buffer = (byte[])_buffer.Clone();
+            return clone;
+        }
+
+        private void Increment(ulong count) {
+            _t0 += count;
+            if (_t0 < count) _t1++;
+        }
+
+        private void Compress(bool isFinal) {
+            ulong[] v = _v, m = _m;
+            for (int i = 0; i < 16; i++) {
+                m[i] = BinaryPrimitives.ReadUInt64LittleEndian(_buffer.AsSpan(i * 8));
+            }
+            Array.Copy(_h, 0, v, 0, 8);
+            Array.Copy(IV, 0, v, 8, 8);
+            v[12] ^= _t0;
+            v[13] ^= _t1;
+            if (isFinal) {
+                v[14] = ~v[14];
+                if (_parameters.LastNode) v[15] = ~v[15];
+            }
+
+            for (int r = 0; r < 12; r++) {
+                byte[] s = Blake2Sigma.Sigma[r % 10];
+                G(v, 0, 4, 8, 12, m[s[0]], m[s[1]]);
+                G(v, 1, 5, 9, 13, m[s[2]], m[s[3]]);
+                G(v, 2, 6, 10, 14, m[s[4]], m[s[5]]);
+                G(v, 3, 7, 11, 15, m[s[6]], m[s[7]]);
+                G(v, 0, 5, 10, 15, m[s[8]], m[s[9]]);
+                G(v, 1, 6, 11, 12, m[s[10]], m[s[11]]);
+                G(v, 2, 7, 8, 13, m[s[12]], m[s[13]]);
+                G(v, 3, 4, 9, 14, m[s[14]], m[s[15]]);
+            }
+
+            for (int i = 0; i < 8; i++) {
+                _h[i] ^= v[i] ^ v[i + 8];
+            }
+        }
+
+        private static void G(ulong[] v, int a, int b, int c, int d, ulong x, ulong y) {
+            v[a] = v[a] + v[b] + x;
+            v[d] = RotateRight(v[d] ^ v[a], 32);
+            v[c] = v[c] + v[d];
+            v[b] = RotateRight(v[b] ^ v[c], 24);
+            v[a] = v[a] + v[b] + y;
+            v[d] = RotateRight(v[d] ^ v[a], 16);
+            v[c] = v[c] + v[d];
+            v[b] = RotateRight(v[b] ^ v[c], 63);
+        }
+
+        private static ulong RotateRight(ulong x, int n) => (x >> n) | (x << (64 - n));
+    }
+
+    /// <summary>
+    /// BLAKE2s, optimized for 8- to 32-bit platforms, produces digests of 1 to 32 bytes.
+    /// </summary>
+    internal sealed class Blake2sManaged : HashAlgorithm, ICloneable {
+        public const int BlockSize = 64;
+
+        private static readonly uint[] IV = {
+            0x6A09E667U, 0xBB67AE85U, 0x3C6EF372U, 0xA54FF53AU, 0x510E527FU, 0x9B05688CU, 0x1F83D9ABU, 0x5BE0CD19U,
+        };
+
+        private readonly Blake2Parameters _parameters;
+        private uint[] _h = new uint[8];
+        private uint[] _v = new uint[16];
+        private uint[] _m = new uint[16];
+        private byte[] _buffer = new byte[BlockSize];
+        private int _bufferLength;
+        private uint _t0, _t1;
+
+        public Blake2sManaged(Blake2Parameters parameters) {
+            _parameters = parameters;
+            HashSizeValue = parameters.DigestSize * 8;
+            Initialize();
+        }
+
+        public override void Initialize() {
+            Blake2Parameters p = _parameters;
+            Span<byte> block = stackalloc byte[32];
+            block.Clear();
+            block[0] = (byte)p.DigestSize;
+            block[1] = (byte)p.Key.Length;
+            block[2] = (byte)p.Fanout;
+            block[3] = (byte)p.Depth;
+            BinaryPrimitives.WriteUInt32LittleEndian(block.Slice(4), p.LeafSize);
+            // the node offset is 48 bits
+            BinaryPrimitives.WriteUInt32LittleEndian(block.Slice(8), (uint)p.NodeOffset);
+            BinaryPrimitives.WriteUInt16LittleEndian(block.Slice(12), (ushort)(p.NodeOffset >> 32));
+            block[14] = (byte)p.NodeDepth;
+            block[15] = (byte)p.InnerSize;
+            p.Salt.AsSpan().CopyTo(block.Slice(16));
+            p.Person.AsSpan().CopyTo(block.Slice(24));
+
+            for (int i = 0; i < 8; i++) {
+                _h[i] = IV[i] ^ BinaryPrimitives.ReadUInt32LittleEndian(block.Slice(i * 4));
+            }
+            _t0 = _t1 = 0;
+            _bufferLength = 0;
+
+            if (p.Key.Length > 0) {
+                var keyBlock = new byte[BlockSize];
+                p.Key.CopyTo(keyBlock, 0);
+                HashCore(keyBlock, 0, BlockSize);
+            }
+        }
+
+        protected override void HashCore(byte[] array, int ibStart, int cbSize) {
+            while (cbSize > 0) {
+                if (_bufferLength == BlockSize) {
+                    Increment(BlockSize);
+                    Compress(isFinal: false);
+                    _bufferLength = 0;
+                }
+
+                int count = Math.Min(BlockSize - _bufferLength, cbSize);
+                Buffer.BlockCopy(array, ibStart, _buffer, _bufferLength, count);
+                _bufferLength += count;
+                ibStart += count;
+                cbSize -= count;
+            }
+        }
+
+        protected override byte[] HashFinal() {
+            Increment((uint)_bufferLength);
+            Array.Clear(_buffer, _bufferLength, BlockSize - _bufferLength);
+            Compress(isFinal: true);
+
+            var output = new byte[32];
+            for (int i = 0; i < 8; i++) {
+                BinaryPrimitives.WriteUInt32LittleEndian(output.AsSpan(i * 4), _h[i]);
+            }
+            Array.Resize(ref output, _parameters.DigestSize);
+            return output;
+        }
+
+        public object Clone() {
+            var clone = (Blake2sManaged)MemberwiseClone();
+            clone._h = (uint[])_h.Clone();
+            clone._v = new uint[16];
+            clone._m = new uint[16];
+            clone._buffer = (byte[])_buffer.Clone();
+            return clone;
+        }
+
+        private void Increment(uint count) {
+            _t0 += count;
+            if (_t0 < count) _t1++;
+        }
+
+        private void Compress(bool isFinal) {
+            uint[] v = _v, m = _m;
+            for (int i = 0; i < 16; i++) {
+                m[i] = BinaryPrimitives.ReadUInt32LittleEndian(_buffer.AsSpan(i * 4));
+            }
+            Array.Copy(_h, 0, v, 0, 8);
+            Array.Copy(IV, 0, v, 8, 8);
+            v[12] ^= _t0;
+            v[13] ^= _t1;
+            if (isFinal) {
+                v[14] = ~v[14];
+                if (_parameters.LastNode) v[15] = ~v[15];
+            }
+
+            for (int r = 0; r < 10; r++) {
+                byte[] s = Blake2Sigma.Sigma[r];
+                G(v, 0, 4, 8, 12, m[s[0]], m[s[1]]);
+                G(v, 1, 5, 9, 13, m[s[2]], m[s[3]]);
+                G(v, 2, 6, 10, 14, m[s[4]], m[s[5]]);
+                G(v, 3, 7, 11, 15, m[s[6]], m[s[7]]);
+                G(v, 0, 5, 10, 15, m[s[8]], m[s[9]]);
+                G(v, 1, 6, 11, 12, m[s[10]], m[s[11]]);
+                G(v, 2, 7, 8, 13, m[s[12]], m[s[13]]);
+                G(v, 3, 4, 9, 14, m[s[14]], m[s[15]]);
+            }
+
+            for (int i = 0; i < 8; i++) {
+                _h[i] ^= v[i] ^ v[i + 8];
+            }
+        }
+
+        private static void G(uint[] v, int a, int b, int c, int d, uint x, uint y) {
+            v[a] = v[a] + v[b] + x;
+            v[d] = RotateRight(v[d] ^ v[a], 16);
+            v[c] = v[c] + v[d];
+            v[b] = RotateRight(v[b] ^ v[c], 12);
+            v[a] = v[a] + v[b] + y;
+            v[d] = RotateRight(v[d] ^ v[a], 8);
+            v[c] = v[c] + v[d];
+            v[b] = RotateRight(v[b] ^ v[c], 7);
+        }
+
+        private static uint RotateRight(uint x, int n) => (x >> n) | (x << (32 - n));
+    }
+
+    internal static class Blake2Sigma {
+        public static readonly byte[][] Sigma = {
+            new byte[] { 0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15 },
+            new byte[] { 14, 10, 4, 8, 9, 15, 13, 6, 1, 12, 0, 2, 11, 7, 5, 3 },
+            new byte[] { 11, 8, 12, 0, 5, 2, 15, 13, 10, 14, 3, 6, 7, 1, 9, 4 },
+            new byte[] { 7, 9, 3, 1, 13, 12, 11, 14, 2, 6, 5, 10, 4, 0, 15, 8 },
+            new byte[] { 9, 0, 5, 7, 2, 4, 10, 15, 14, 1, 11, 12, 6, 8, 3, 13 },
+            new byte[] { 2, 12, 6, 10, 0, 11, 8, 3, 4, 13, 7, 5, 15, 14, 1, 9 },
+            new byte[] { 12, 5, 1, 15, 14, 13, 4, 10, 0, 7, 6, 3, 9, 2, 8, 11 },
+            new byte[] { 13, 11, 7, 14, 12, 1, 3, 9, 5, 0, 15, 4, 8, 6, 2, 10 },
+            new byte[] { 6, 15, 14, 9, 11, 3, 0, 8, 12, 2, 13, 7, 1, 4, 10, 5 },
+            new byte[] { 10, 2, 8, 4, 7, 6, 1, 5, 15, 11, 9, 14, 3, 12, 13, 0 },
+        };
+    }
+}
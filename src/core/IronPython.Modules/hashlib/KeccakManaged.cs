@@ -0,0 +1,162 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Buffers.Binary;
+using System.Security.Cryptography;
+
+namespace IronPython.Modules {
+    /// <summary>
+    /// The Keccak sponge used by SHA-3 and the SHAKE extendable-output functions (FIPS 202).
+    /// </summary>
+    internal sealed class KeccakManaged : HashAlgorithm, ICloneable {
+        private const byte Sha3Suffix = 0x06;
+        private const byte ShakeSuffix = 0x1f;
+
+        private static readonly ulong[] RoundConstants = {
+            0x0000000000000001UL, 0x0000000000008082UL, 0x800000000000808aUL, 0x8000000080008000UL,
+            0x000000000000808bUL, 0x0000000080000001UL, 0x8000000080008081UL, 0x8000000000008009UL,
+            0x000000000000008aUL, 0x0000000000000088UL, 0x0000000080008009UL, 0x000000008000000aUL,
+            0x000000008000808bUL, 0x800000000000008bUL, 0x8000000000008089UL, 0x8000000000008003UL,
+            0x8000000000008002UL, 0x8000000000000080UL, 0x000000000000800aUL, 0x800000008000000aUL,
+            0x8000000080008081UL, 0x8000000000008080UL, 0x0000000080000001UL, 0x8000000080008008UL,
+        };
+
+        private static readonly int[] RotationOffsets = {
+            1, 3, 6, 10, 15, 21, 28, 36, 45, 55, 2, 14, 27, 41, 56, 8, 25, 43, 62, 18, 39, 61, 20, 44,
+        };
+
+        private static readonly int[] PiLanes = {
+            10, 7, 11, 17, 18, 3, 5, 16, 8, 21, 24, 4, 15, 23, 19, 13, 12, 2, 20, 14, 22, 9, 6, 1,
+        };
+
+        private readonly int _rate;
+        private readonly byte _suffix;
+        private ulong[] _state = new ulong[25];
+        private byte[] _queue;
+        private int _queueLength;
+
+        private KeccakManaged(int rate, byte suffix, int digestSize) {
+            _rate = rate;
+            _suffix = suffix;
+            _queue = new byte[rate];
+            HashSizeValue = digestSize * 8;
+        }
+
+        /// <summary>
+        /// Creates a SHA-3 hash with a digest of the given size in bytes.
+        /// </summary>
+        public static KeccakManaged CreateSha3(int digestSize) => new KeccakManaged(200 - 2 * digestSize, Sha3Suffix, digestSize);
+
+        /// <summary>
+        /// Creates a SHAKE function with the given security strength in bits.
+        /// </summary>
+        public static KeccakManaged CreateShake(int bits) => new KeccakManaged(200 - bits / 4, ShakeSuffix, 0);
+
+        /// <summary>
+        /// The number of bytes absorbed per permutation, reported as the block size.
+        /// </summary>
+        public int Rate => _rate;
+
+        public override void Initialize() {
+            Array.Clear(_state, 0, _state.Length);
+            _queueLength = 0;
+        }
+
+        protected override void HashCore(byte[] array, int ibStart, int cbSize) {
+            while (cbSize > 0) {
+                int count = Math.Min(_rate - _queueLength, cbSize);
+                Buffer.BlockCopy(array, ibStart, _queue, _queueLength, count);
+                _queueLength += count;
+                ibStart += count;
+                cbSize -= count;
+
+                if (_queueLength == _rate) {
+                    Absorb();
+                }
+            }
+        }
+
+        protected override byte[] HashFinal() => Squeeze(HashSizeValue / 8);
+
+        /// <summary>
+        /// Pads the absorbed data and returns length bytes of output. The sponge can't be updated afterwards.
+        /// </summary>
+        public byte[] Squeeze(int length) {
+            Array.Clear(_queue, _queueLength, _rate - _queueLength);
+            _queue[_queueLength] ^= _suffix;
+            _queue[_rate - 1] ^= 0x80;
+            Absorb();
+
+            var output = new byte[length];
+            var block = new byte[_rate];
+            int offset = 0;
+            while (true) {
+                for (int i = 0; i < _rate / 8; i++) {
+                    BinaryPrimitives.WriteUInt64LittleEndian(block.AsSpan(i * 8), _state[i]);
+                }
+                int count = Math.Min(length - offset, _rate);
+                Buffer.BlockCopy(block, 0, output, offset, count);
+                offset += count;
+                if (offset >= length) return output;
+                Permute(_state);
+            }
+        }
+
+        public object Clone() {
+            var clone = (KeccakManaged)MemberwiseClone();
+            clone._state = (ulong[])_state.Clone();
+            clone._queue = (byte[])_queue.Clone();
+            return clone;
+        }
+
+        private void Absorb() {
+            for (int i = 0; i < _rate / 8; i++) {
+                _state[i] ^= BinaryPrimitives.ReadUInt64LittleEndian(_queue.AsSpan(i * 8));
+            }
+            Permute(_state);
+            _queueLength = 0;
+        }
+
+        private static void Permute(ulong[] st) {
+            Span<ulong> bc = stackalloc ulong[5];
+            for (int round = 0; round < 24; round++) {
+                // theta
+                for (int i = 0; i < 5; i++) {
+                    bc[i] = st[i] ^ st[i + 5] ^ st[i + 10] ^ st[i + 15] ^ st[i + 20];
+                }
+                for (int i = 0; i < 5; i++) {
+                    ulong t = bc[(i + 4) % 5] ^ RotateLeft(bc[(i + 1) % 5], 1);
+                    for (int j = 0; j < 25; j += 5) {
+                        st[j + i] ^= t;
+                    }
+                }
+
+                // rho and pi
+                ulong current = st[1];
+                for (int i = 0; i < 24; i++) {
+                    int j = PiLanes[i];
+                    ulong temp = st[j];
+                    st[j] = RotateLeft(current, RotationOffsets[i]);
+                    current = temp;
+                }
+
+                // chi
+                for (int j = 0; j < 25; j += 5) {
+                    for (int i = 0; i < 5; i++) {
+                        bc[i] = st[j + i];
+                    }
+                    for (int i = 0; i < 5; i++) {
+                        st[j + i] ^= ~bc[(i + 1) % 5] & bc[(i + 2) % 5];
+                    }
+                }
+
+                // iota
+                st[0] ^= RoundConstants[round];
+            }
+        }
+
+        private static ulong RotateLeft(ulong x, int n) => (x << n) | (x >> (64 - n));
+    }
+}
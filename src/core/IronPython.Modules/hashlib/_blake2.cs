@@ -0,0 +1,190 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using System.Collections.Generic;
+using System.Numerics;
+using System.Security.Cryptography;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Operations;
+
+using Microsoft.Scripting.Runtime;
+
+[assembly: PythonModule("_blake2", typeof(IronPython.Modules.PythonBlake2))]
+namespace IronPython.Modules {
+    public static class PythonBlake2 {
+        public const string __doc__ = "_blake2b provides BLAKE2b for hashlib\n_blake2s provides BLAKE2s for hashlib";
+
+        [Documentation("blake2b(data=b'', *, digest_size=64, key=b'', salt=b'', person=b'', fanout=1, depth=1, leaf_size=0, node_offset=0, node_depth=0, inner_size=0, last_node=False)\n\nReturn a new BLAKE2b hash object.")]
+        public static Blake2bType blake2b([ParamDictionary] IDictionary<string, object> kwargs, [NotNone] params object[] args) {
+            var parameters = ParseParameters(nameof(blake2b), Blake2bType.MAX_DIGEST_SIZE, Blake2bType.SALT_SIZE, Blake2bType.PERSON_SIZE, Blake2bType.MAX_KEY_SIZE, ulong.MaxValue, kwargs, args, out object data);
+            var res = new Blake2bType(parameters);
+            if (data != null) Update(res, data);
+            return res;
+        }
+
+        [Documentation("blake2s(data=b'', *, digest_size=32, key=b'', salt=b'', person=b'', fanout=1, depth=1, leaf_size=0, node_offset=0, node_depth=0, inner_size=0, last_node=False)\n\nReturn a new BLAKE2s hash object.")]
+        public static Blake2sType blake2s([ParamDictionary] IDictionary<string, object> kwargs, [NotNone] params object[] args) {
+            var parameters = ParseParameters(nameof(blake2s), Blake2sType.MAX_DIGEST_SIZE, Blake2sType.SALT_SIZE, Blake2sType.PERSON_SIZE, Blake2sType.MAX_KEY_SIZE, 0xFFFFFFFFFFFFUL, kwargs, args, out object data);
+            var res = new Blake2sType(parameters);
+            if (data != null) Update(res, data);
+            return res;
+        }
+
+        private static Blake2Parameters ParseParameters(string function, int maxDigestSize, int saltSize, int personSize, int maxKeySize, ulong maxNodeOffset,
+            IDictionary<string, object> kwargs, object[] args, out object data) {
+
+            if (args.Length > 1) {
+                throw PythonOps.TypeError("{0}() takes at most 1 positional argument ({1} given)", function, args.Length);
+            }
+            data = args.Length == 1 ? args[0] : null;
+
+            var parameters = new Blake2Parameters { DigestSize = maxDigestSize };
+            foreach (var kvp in kwargs) {
+                switch (kvp.Key) {
+                    case "data":
+                        if (args.Length > 0) throw PythonOps.TypeError("argument for {0}() given by name ('data') and position (1)", function);
+                        data = kvp.Value;
+                        break;
+                    case "digest_size":
+                        parameters.DigestSize = Converter.ConvertToIndex(kvp.Value, throwOverflowError: true);
+                        if (parameters.DigestSize <= 0 || parameters.DigestSize > maxDigestSize) {
+                            throw PythonOps.ValueError("digest_size must be between 1 and {0} bytes", maxDigestSize);
+                        }
+                        break;
+                    case "key":
+                        parameters.Key = GetBytes(kvp.Value);
+                        if (parameters.Key.Length > maxKeySize) {
+                            throw PythonOps.ValueError("maximum key length is {0} bytes", maxKeySize);
+                        }
+                        break;
+                    case "salt":
+                        parameters.Salt = GetBytes(kvp.Value);
+                        if (parameters.Salt.Length > saltSize) {
+                            throw PythonOps.ValueError("maximum salt length is {0} bytes", saltSize);
+                        }
+                        break;
+                    case "person":
+                        parameters.Person = GetBytes(kvp.Value);
+                        if (parameters.Person.Length > personSize) {
+                            throw PythonOps.ValueError("maximum person length is {0} bytes", personSize);
+                        }
+                        break;
+                    case "fanout":
+                        parameters.Fanout = Converter.ConvertToIndex(kvp.Value, throwOverflowError: true);
+                        if (parameters.Fanout < 0 || parameters.Fanout > 255) {
+                            throw PythonOps.ValueError("fanout must be between 0 and 255");
+                        }
+                        break;
+                    case "depth":
+                        parameters.Depth = Converter.ConvertToIndex(kvp.Value, throwOverflowError: true);
+                        if (parameters.Depth <= 0 || parameters.Depth > 255) {
+                            throw PythonOps.ValueError("depth must be between 1 and 255");
+                        }
+                        break;
+                    case "leaf_size":
+                        BigInteger leafSize = Converter.ConvertToBigInteger(kvp.Value);
+                        if (leafSize < 0 || leafSize > uint.MaxValue) {
+                            throw PythonOps.ValueError("leaf_size is too large");
+                        }
+                        parameters.LeafSize = (uint)leafSize;
+                        break;
+                    case "node_offset":
+                        BigInteger nodeOffset = Converter.ConvertToBigInteger(kvp.Value);
+                        if (nodeOffset < 0 || nodeOffset > maxNodeOffset) {
+                            throw PythonOps.ValueError("node_offset is too large");
+                        }
+                        parameters.NodeOffset = (ulong)nodeOffset;
+                        break;
+                    case "node_depth":
+                        parameters.NodeDepth = Converter.ConvertToIndex(kvp.Value, throwOverflowError: true);
+                        if (parameters.NodeDepth < 0 || parameters.NodeDepth > 255) {
+                            throw PythonOps.ValueError("node_depth must be between 0 and 255");
+                        }
+                        break;
+                    case "inner_size":
+                        parameters.InnerSize = Converter.ConvertToIndex(kvp.Value, throwOverflowError: true);
+                        if (parameters.InnerSize < 0 || parameters.InnerSize > maxDigestSize) {
+                            throw PythonOps.ValueError("inner_size must be between 0 and is {0}", maxDigestSize);
+                        }
+                        break;
+                    case "last_node":
+                        parameters.LastNode = PythonOps.IsTrue(kvp.Value);
+                        break;
+                    default:
+                        throw PythonOps.TypeError("'{0}' is an invalid keyword argument for {1}()", kvp.Key, function);
+                }
+            }
+            return parameters;
+        }
+
+        private static byte[] GetBytes(object value) {
+            if (value is IBufferProtocol bufferProtocol) {
+                using var buffer = bufferProtocol.GetBuffer();
+                return buffer.ToArray();
+            }
+            throw PythonOps.TypeError("a bytes-like object is required, not '{0}'", PythonOps.GetPythonTypeName(value));
+        }
+
+        private static void Update<T>(HashBase<T> hash, object data) where T : HashAlgorithm {
+            if (data is string) {
+                throw PythonOps.TypeError("Unicode-objects must be encoded before hashing");
+            }
+            if (!(data is IBufferProtocol bufferProtocol)) {
+                throw PythonOps.TypeError("object supporting the buffer API required");
+            }
+            hash.update(bufferProtocol);
+        }
+
+        [PythonType("blake2b")]
+        public sealed class Blake2bType : HashBase<HashAlgorithm> {
+            public const int SALT_SIZE = 16;
+            public const int PERSON_SIZE = 16;
+            public const int MAX_KEY_SIZE = 64;
+            public const int MAX_DIGEST_SIZE = 64;
+
+            private readonly Blake2Parameters _parameters;
+
+            internal Blake2bType(Blake2Parameters parameters) : base("blake2b", Blake2bManaged.BlockSize, parameters.DigestSize) {
+                _parameters = parameters;
+                _hasher = new Blake2bManaged(parameters);
+            }
+
+            // the hasher depends on the construction parameters, so it's assigned in the constructor instead
+            protected override void CreateHasher() { }
+
+            [Documentation("copy() -> object (copy of this object)")]
+            public override HashBase<HashAlgorithm> copy() {
+                var res = new Blake2bType(_parameters);
+                CopyStateTo(res);
+                return res;
+            }
+        }
+
+        [PythonType("blake2s")]
+        public sealed class Blake2sType : HashBase<HashAlgorithm> {
+            public const int SALT_SIZE = 8;
+            public const int PERSON_SIZE = 8;
+            public const int MAX_KEY_SIZE = 32;
+            public const int MAX_DIGEST_SIZE = 32;
+
+            private readonly Blake2Parameters _parameters;
+
+            internal Blake2sType(Blake2Parameters parameters) : base("blake2s", Blake2sManaged.BlockSize, parameters.DigestSize) {
+                _parameters = parameters;
+                _hasher = new Blake2sManaged(parameters);
+            }
+
+            // the hasher depends on the construction parameters, so it's assigned in the constructor instead
+            protected override void CreateHasher() { }
+
+            [Documentation("copy() -> object (copy of this object)")]
+            public override HashBase<HashAlgorithm> copy() {
+                var res = new Blake2sType(_parameters);
+                CopyStateTo(res);
+                return res;
+            }
+        }
+    }
+}
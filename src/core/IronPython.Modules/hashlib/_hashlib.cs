@@ -3,6 +3,7 @@
 // See the LICENSE file in the project root for more information.
 
 using System;
+using System.Buffers.Binary;
 using System.Collections.Generic;
 using System.Linq;
 using System.Reflection;
@@ -14,13 +15,353 @@ using IronPython.Runtime.Operations;
 
 using Microsoft.Scripting.Runtime;
 
-//[assembly: PythonModule("_hashlib", typeof(IronPython.Modules.PythonHashlib))]
+[assembly: PythonModule("_hashlib", typeof(IronPython.Modules.PythonHashlib))]
 namespace IronPython.Modules {
+    public static class PythonHashlib {
+        public const string __doc__ = "Hash functions, HMAC and key derivation backed by the platform cryptography providers";
+
+        private const int MaxMemDefault = 32 * 1024 * 1024;
+
+        public static readonly FrozenSetCollection openssl_md_meth_names = FrozenSetCollection.Make(PythonList.FromArrayNoCopy(
+#if FEATURE_FULL_CRYPTO
+            "md5", "sha384", "sha512",
+#endif
+            "sha1", "sha224", "sha256",
+            "sha3_224", "sha3_256", "sha3_384", "sha3_512", "shake_128", "shake_256",
+            "blake2b", "blake2s"
+        ));
+
+        [Documentation("new(name, string=b'') - Return a new hash object using the named algorithm.")]
+        public static object @new([NotNone] string name, [NotNone] IBufferProtocol data) {
+            object hash = @new(name);
+            switch (hash) {
+                case IHashObject h: h.Update(data); break;
+                case PythonSha3.ShakeBase shake: shake.update(data); break;
+            }
+            return hash;
+        }
+
+        public static object @new([NotNone] string name, [NotNone] string data) {
+            throw PythonOps.TypeError("Unicode-objects must be encoded before hashing");
+        }
+
+        [Documentation("new(name, string=b'') - Return a new hash object using the named algorithm.")]
+        public static object @new([NotNone] string name) {
+            switch (name.ToLowerInvariant()) {
+                case "shake_128": return new PythonSha3.Shake128Type();
+                case "shake_256": return new PythonSha3.Shake256Type();
+                default: return CreateHash(name);
+            }
+        }
+
+#if FEATURE_FULL_CRYPTO
+        public static object openssl_md5([NotNone] IBufferProtocol data) => PythonMD5.md5(data);
+        public static object openssl_md5() => PythonMD5.md5();
+        public static object openssl_sha384([NotNone] IBufferProtocol data) => PythonSha512.sha384(data);
+        public static object openssl_sha384() => PythonSha512.sha384();
+        public static object openssl_sha512([NotNone] IBufferProtocol data) => PythonSha512.sha512(data);
+        public static object openssl_sha512() => PythonSha512.sha512();
+#endif
+        public static object openssl_sha1([NotNone] IBufferProtocol data) => PythonSha.sha1(data);
+        public static object openssl_sha1() => PythonSha.sha1();
+        public static object openssl_sha224([NotNone] IBufferProtocol data) => PythonSha256.sha224(data);
+        public static object openssl_sha224() => PythonSha256.sha224();
+        public static object openssl_sha256([NotNone] IBufferProtocol data) => PythonSha256.sha256(data);
+        public static object openssl_sha256() => PythonSha256.sha256();
+
+        [Documentation("pbkdf2_hmac(hash_name, password, salt, iterations, dklen=None) -> key\n\nPassword based key derivation function 2 (PKCS #5 v2.0) with HMAC as pseudorandom function.")]
+        public static Bytes pbkdf2_hmac([NotNone] string hash_name, [NotNone] IBufferProtocol password, [NotNone] IBufferProtocol salt, int iterations, object dklen = null) {
+            if (iterations < 1) {
+                throw PythonOps.ValueError("iteration value must be greater than 0.");
+            }
+
+            int length = 0;
+            if (dklen != null) {
+                length = Converter.ConvertToIndex(dklen, throwOverflowError: true);
+                if (length < 1) {
+                    throw PythonOps.ValueError("key length must be greater than 0.");
+                }
+            }
+
+            using var passwordBuffer = password.GetBuffer();
+            using var saltBuffer = salt.GetBuffer();
+            return Bytes.Make(Pbkdf2(hash_name, passwordBuffer.ToArray(), saltBuffer.ToArray(), iterations, length));
+        }
+
+        [Documentation("hmac_digest(key, msg, digest) -> bytes\n\nSingle-shot HMAC of msg keyed with key, using the named hash algorithm.")]
+        public static Bytes hmac_digest([NotNone] IBufferProtocol key, [NotNone] IBufferProtocol msg, [NotNone] string digest) {
+            using var keyBuffer = key.GetBuffer();
+            using var msgBuffer = msg.GetBuffer();
+#if NET6_0_OR_GREATER
+            switch (digest.ToLowerInvariant()) {
+#if FEATURE_FULL_CRYPTO
+                case "md5": return Bytes.Make(HMACMD5.HashData(keyBuffer.AsReadOnlySpan(), msgBuffer.AsReadOnlySpan()));
+                case "sha384": return Bytes.Make(HMACSHA384.HashData(keyBuffer.AsReadOnlySpan(), msgBuffer.AsReadOnlySpan()));
+                case "sha512": return Bytes.Make(HMACSHA512.HashData(keyBuffer.AsReadOnlySpan(), msgBuffer.AsReadOnlySpan()));
+#endif
+                case "sha1": return Bytes.Make(HMACSHA1.HashData(keyBuffer.AsReadOnlySpan(), msgBuffer.AsReadOnlySpan()));
+                case "sha256": return Bytes.Make(HMACSHA256.HashData(keyBuffer.AsReadOnlySpan(), msgBuffer.AsReadOnlySpan()));
+            }
+#endif
+            return Bytes.Make(new Hmac(digest, keyBuffer.ToArray()).Compute(msgBuffer.ToArray()));
+        }
+
+        [Documentation("scrypt(password, *, salt, n, r, p, maxmem=0, dklen=64) -> key\n\nscrypt password-based key derivation function.")]
+        public static Bytes scrypt([NotNone] IBufferProtocol password, [ParamDictionary] IDictionary<string, object> kwargs) {
+            object salt = null, n = null, r = null, p = null;
+            int maxmem = 0, dklen = 64;
+
+            foreach (var kvp in kwargs) {
+                switch (kvp.Key) {
+                    case nameof(salt): salt = kvp.Value; break;
+                    case nameof(n): n = kvp.Value; break;
+                    case nameof(r): r = kvp.Value; break;
+                    case nameof(p): p = kvp.Value; break;
+                    case nameof(maxmem): maxmem = Converter.ConvertToIndex(kvp.Value, throwOverflowError: true); break;
+                    case nameof(dklen): dklen = Converter.ConvertToIndex(kvp.Value, throwOverflowError: true); break;
+                    default:
+                        throw PythonOps.TypeError("'{0}' is an invalid keyword argument for this function", kvp.Key);
+                }
+            }
+
+            if (!(salt is IBufferProtocol saltBytes)) {
+                throw PythonOps.TypeError("salt is required");
+            }
+            if (n is null) throw PythonOps.TypeError("n is required and must be an unsigned int");
+            if (r is null) throw PythonOps.TypeError("r is required and must be an unsigned int");
+            if (p is null) throw PythonOps.TypeError("p is required and must be an unsigned int");
+
+            int cost = Converter.ConvertToIndex(n, throwOverflowError: true);
+            int blockSize = Converter.ConvertToIndex(r, throwOverflowError: true);
+            int parallelization = Converter.ConvertToIndex(p, throwOverflowError: true);
+
+            if (cost < 2 || (cost & (cost - 1)) != 0) {
+                throw PythonOps.ValueError("n must be a power of 2.");
+            }
+            if (maxmem < 0) {
+                throw PythonOps.ValueError("maxmem must be positive and smaller than {0}", int.MaxValue);
+            }
+            if (dklen < 1) {
+                throw PythonOps.ValueError("dklen must be greater than 0 and smaller than {0}", int.MaxValue);
+            }
+
+            long required = 128L * blockSize * (cost + 2L + parallelization);
+            if (blockSize < 1 || parallelization < 1 || (long)blockSize * parallelization >= 1 << 30 || required > (maxmem == 0 ? MaxMemDefault : maxmem)) {
+                throw PythonOps.ValueError("Invalid parameter combination for n, r, p, maxmem.");
+            }
+
+            using var passwordBuffer = password.GetBuffer();
+            using var saltBuffer = saltBytes.GetBuffer();
+            return Bytes.Make(Scrypt(passwordBuffer.ToArray(), saltBuffer.ToArray(), cost, blockSize, parallelization, dklen));
+        }
+
+        #region Implementation
+
+        internal static IHashObject CreateHash(string name) {
+            switch (name.ToLowerInvariant()) {
+#if FEATURE_FULL_CRYPTO
+                case "md5": return new PythonMD5.MD5Type();
+                case "sha384": return new PythonSha512.SHA384Type();
+                case "sha512": return new PythonSha512.SHA512Type();
+#endif
+                case "sha1": return new PythonSha.SHA1Type();
+                case "sha224": return new PythonSha256.SHA224Type();
+                case "sha256": return new PythonSha256.SHA256Type();
+                case "sha3_224": return new PythonSha3.Sha3_224Type();
+                case "sha3_256": return new PythonSha3.Sha3_256Type();
+                case "sha3_384": return new PythonSha3.Sha3_384Type();
+                case "sha3_512": return new PythonSha3.Sha3_512Type();
+                case "blake2b": return new PythonBlake2.Blake2bType(new Blake2Parameters { DigestSize = PythonBlake2.Blake2bType.MAX_DIGEST_SIZE });
+                case "blake2s": return new PythonBlake2.Blake2sType(new Blake2Parameters { DigestSize = PythonBlake2.Blake2sType.MAX_DIGEST_SIZE });
+                default:
+                    throw PythonOps.ValueError("unsupported hash type " + name);
+            }
+        }
+
+        private static byte[] Pbkdf2(string name, byte[] password, byte[] salt, int iterations, int length) {
+#if NET6_0_OR_GREATER
+            HashAlgorithmName? platformHash = name.ToLowerInvariant() switch {
+                "sha1" => HashAlgorithmName.SHA1,
+                "sha256" => HashAlgorithmName.SHA256,
+#if FEATURE_FULL_CRYPTO
+                "sha384" => HashAlgorithmName.SHA384,
+                "sha512" => HashAlgorithmName.SHA512,
+#endif
+                _ => null
+            };
+            if (platformHash is HashAlgorithmName hashName) {
+                if (length == 0) {
+                    length = CreateHash(name).DigestSize;
+                }
+                return Rfc2898DeriveBytes.Pbkdf2(password, salt, iterations, hashName, length);
+            }
+#endif
+            var hmac = new Hmac(name, password);
+            if (length == 0) {
+                length = hmac.DigestSize;
+            }
+
+            var result = new byte[length];
+            var block = new byte[salt.Length + 4];
+            Buffer.BlockCopy(salt, 0, block, 0, salt.Length);
+
+            for (int index = 1, offset = 0; offset < length; index++) {
+                BinaryPrimitives.WriteInt32BigEndian(block.AsSpan(salt.Length), index);
+                byte[] u = hmac.Compute(block);
+                byte[] t = (byte[])u.Clone();
+                for (int i = 1; i < iterations; i++) {
+                    u = hmac.Compute(u);
+                    for (int j = 0; j < t.Length; j++) {
+                        t[j] ^= u[j];
+                    }
+                }
+
+                int count = Math.Min(t.Length, length - offset);
+                Buffer.BlockCopy(t, 0, result, offset, count);
+                offset += count;
+            }
+            return result;
+        }
+
+        private static byte[] Scrypt(byte[] password, byte[] salt, int n, int r, int p, int dklen) {
+            int blockBytes = 128 * r;
+            int blockWords = 32 * r;
+
+            byte[] b = Pbkdf2("sha256", password, salt, 1, p * blockBytes);
+            var x = new uint[blockWords];
+            var y = new uint[blockWords];
+            var v = new uint[blockWords * n];
+
+            for (int block = 0; block < p; block++) {
+                int start = block * blockBytes;
+                for (int i = 0; i < blockWords; i++) {
+                    x[i] = BinaryPrimitives.ReadUInt32LittleEndian(b.AsSpan(start + i * 4));
+                }
+
+                // ROMix
+                for (int i = 0; i < n; i++) {
+                    Array.Copy(x, 0, v, i * blockWords, blockWords);
+                    BlockMix(x, y, r);
+                }
+                for (int i = 0; i < n; i++) {
+                    int j = (int)(x[(2 * r - 1) * 16] & (uint)(n - 1));
+                    int offset = j * blockWords;
+                    for (int k = 0; k < blockWords; k++) {
+                        x[k] ^= v[offset + k];
+                    }
+                    BlockMix(x, y, r);
+                }
+
+                for (int i = 0; i < blockWords; i++) {
+                    BinaryPrimitives.WriteUInt32LittleEndian(b.AsSpan(start + i * 4), x[i]);
+                }
+            }
+
+            return Pbkdf2("sha256", password, b, 1, dklen);
+        }
+
+        private static void BlockMix(uint[] b, uint[] y, int r) {
+            Span<uint> x = stackalloc uint[16];
+            b.AsSpan((2 * r - 1) * 16, 16).CopyTo(x);
+
+            for (int i = 0; i < 2 * r; i++) {
+                for (int k = 0; k < 16; k++) {
+                    x[k] ^= b[i * 16 + k];
+                }
+                Salsa20_8(x);
+
+                // even blocks go to the first half of the output, odd blocks to the second half
+                int dest = (i / 2 + (i % 2) * r) * 16;
+                x.CopyTo(y.AsSpan(dest, 16));
+            }
+            Array.Copy(y, b, y.Length);
+        }
+
+        private static void Salsa20_8(Span<uint> b) {
+            Span<uint> x = stackalloc uint[16];
+            b.CopyTo(x);
+
+            for (int i = 0; i < 8; i += 2) {
+                x[4] ^= R(x[0] + x[12], 7); x[8] ^= R(x[4] + x[0], 9); x[12] ^= R(x[8] + x[4], 13); x[0] ^= R(x[12] + x[8], 18);
+                x[9] ^= R(x[5] + x[1], 7); x[13] ^= R(x[9] + x[5], 9); x[1] ^= R(x[13] + x[9], 13); x[5] ^= R(x[1] + x[13], 18);
+                x[14] ^= R(x[10] + x[6], 7); x[2] ^= R(x[14] + x[10], 9); x[6] ^= R(x[2] + x[14], 13); x[10] ^= R(x[6] + x[2], 18);
+                x[3] ^= R(x[15] + x[11], 7); x[7] ^= R(x[3] + x[15], 9); x[11] ^= R(x[7] + x[3], 13); x[15] ^= R(x[11] + x[7], 18);
+                x[1] ^= R(x[0] + x[3], 7); x[2] ^= R(x[1] + x[0], 9); x[3] ^= R(x[2] + x[1], 13); x[0] ^= R(x[3] + x[2], 18);
+                x[6] ^= R(x[5] + x[4], 7); x[7] ^= R(x[6] + x[5], 9); x[4] ^= R(x[7] + x[6], 13); x[5] ^= R(x[4] + x[7], 18);
+                x[11] ^= R(x[10] + x[9], 7); x[8] ^= R(x[11] + x[10], 9); x[9] ^= R(x[8] + x[11], 13); x[10] ^= R(x[9] + x[8], 18);
+                x[12] ^= R(x[15] + x[14], 7); x[13] ^= R(x[12] + x[15], 9); x[14] ^= R(x[13] + x[12], 13); x[15] ^= R(x[14] + x[13], 18);
+            }
+
+            for (int i = 0; i < 16; i++) {
+                b[i] += x[i];
+            }
+
+            static uint R(uint a, int n) => (a << n) | (a >> (32 - n));
+        }
+
+        /// <summary>
+        /// HMAC over any of the hash objects in this package, keeping the keyed inner and outer states for reuse.
+        /// </summary>
+        private sealed class Hmac {
+            private readonly IHashObject _inner;
+            private readonly IHashObject _outer;
+
+            public Hmac(string name, byte[] key) {
+                _inner = CreateHash(name);
+                _outer = CreateHash(name);
+
+                int blockSize = _inner.BlockSize;
+                if (key.Length > blockSize) {
+                    IHashObject keyHash = CreateHash(name);
+                    keyHash.Update(key);
+                    key = keyHash.Digest();
+                }
+
+                var ipad = new byte[blockSize];
+                var opad = new byte[blockSize];
+                for (int i = 0; i < blockSize; i++) {
+                    byte k = i < key.Length ? key[i] : (byte)0;
+                    ipad[i] = (byte)(k ^ 0x36);
+                    opad[i] = (byte)(k ^ 0x5c);
+                }
+                _inner.Update(ipad);
+                _outer.Update(opad);
+            }
+
+            public int DigestSize => _inner.DigestSize;
+
+            public byte[] Compute(byte[] message) {
+                IHashObject inner = _inner.Copy();
+                inner.Update(message);
+                IHashObject outer = _outer.Copy();
+                outer.Update(inner.Digest());
+                return outer.Digest();
+            }
+        }
+
+        #endregion
+    }
+
+    /// <summary>
+    /// Non-generic view of a hash object, used by the HMAC and key derivation functions.
+    /// </summary>
+    internal interface IHashObject {
+        int BlockSize { get; }
+        int DigestSize { get; }
+        void Update(IBufferProtocol data);
+        void Update(byte[] data);
+        byte[] Digest();
+        IHashObject Copy();
+    }
 
     [PythonHidden]
-    public abstract class HashBase<T> : ICloneable where T : HashAlgorithm {
+    public abstract class HashBase<T> : ICloneable, IHashObject where T : HashAlgorithm {
 
         protected T _hasher;
+#if NET8_0_OR_GREATER
+        private IncrementalHash _incremental;
+#endif
+        private readonly object _lock = new object();
         private static MethodInfo _memberwiseClone;
 
         private static readonly byte[] _empty = Array.Empty<byte>();
@@ -29,10 +370,20 @@ namespace IronPython.Modules {
         public readonly int block_size;
         public readonly int digest_size;
 
-        internal HashBase(string name, int blocksize, int digestsize) {
+        /// <summary>
+        /// Creates the hash object. When platformHash is given and the runtime can clone and snapshot incremental
+        /// hashes, the platform provider is used instead of the managed hasher from CreateHasher.
+        /// </summary>
+        internal HashBase(string name, int blocksize, int digestsize, HashAlgorithmName? platformHash = null) {
             this.name = name;
             this.block_size = blocksize;
             this.digest_size = digestsize;
+#if NET8_0_OR_GREATER
+            if (platformHash is HashAlgorithmName hashName) {
+                _incremental = IncrementalHash.CreateHash(hashName);
+                return;
+            }
+#endif
             CreateHasher();
         }
 
@@ -41,30 +392,36 @@ namespace IronPython.Modules {
         [Documentation("update(string) -> None (update digest with string data)")]
         public void update([NotNone] IBufferProtocol data) {
             using var buffer = data.GetBuffer();
-            byte[] bytes = buffer.ToArray();
-            lock (_hasher) {
-                _hasher.TransformBlock(bytes, 0, bytes.Length, bytes, 0);
+#if NET8_0_OR_GREATER
+            if (_incremental != null) {
+                lock (_lock) {
+                    _incremental.AppendData(buffer.AsReadOnlySpan());
+                }
+                return;
+            }
+#endif
+            byte[] bytes = buffer.AsUnsafeArray() ?? buffer.ToArray();
+            lock (_lock) {
+                _hasher.TransformBlock(bytes, 0, bytes.Length, null, 0);
             }
         }
+
         public void update([NotNone] string data) {
             throw PythonOps.TypeError("Unicode-objects must be encoded before hashing");
         }
 
         [Documentation("digest() -> int (current digest value)")]
         public Bytes digest() {
-            T copy = CloneHasher();
-            copy.TransformFinalBlock(_empty, 0, 0);
-            return Bytes.Make(copy.Hash);
+            return Bytes.Make(ComputeDigest());
         }
 
         [Documentation("hexdigest() -> string (current digest as hex digits)")]
         public string hexdigest() {
-            T copy = CloneHasher();
-            copy.TransformFinalBlock(_empty, 0, 0);
+            byte[] hash = ComputeDigest();
 
-            StringBuilder result = new StringBuilder(2 * copy.Hash.Length);
-            for (int i = 0; i < copy.Hash.Length; i++) {
-                result.Append(copy.Hash[i].ToString("x2"));
+            StringBuilder result = new StringBuilder(2 * hash.Length);
+            for (int i = 0; i < hash.Length; i++) {
+                result.Append(hash[i].ToString("x2"));
             }
             return result.ToString();
         }
@@ -75,9 +432,40 @@ namespace IronPython.Modules {
             return copy();
         }
 
+        protected virtual byte[] ComputeDigest() {
+#if NET8_0_OR_GREATER
+            if (_incremental != null) {
+                lock (_lock) {
+                    return _incremental.GetCurrentHash();
+                }
+            }
+#endif
+            T copy = CloneHasher();
+            copy.TransformFinalBlock(_empty, 0, 0);
+            return copy.Hash;
+        }
+
+        /// <summary>
+        /// Copies the running hash state into a freshly constructed instance, for use by copy().
+        /// </summary>
+        protected void CopyStateTo(HashBase<T> other) {
+#if NET8_0_OR_GREATER
+            if (_incremental != null) {
+                lock (_lock) {
+                    other._incremental?.Dispose();
+                    other._incremental = _incremental.Clone();
+                }
+                return;
+            }
+#endif
+            other._hasher = CloneHasher();
+        }
+
         protected T CloneHasher() {
             if (_hasher is ICloneable cloneable) {
-                return (T)cloneable.Clone();
+                lock (_lock) {
+                    return (T)cloneable.Clone();
+                }
             }
 
             T clone = default(T);
@@ -86,7 +474,7 @@ namespace IronPython.Modules {
             }
 
             if (_memberwiseClone != null) {
-                lock (_hasher) {
+                lock (_lock) {
                     clone = (T)_memberwiseClone.Invoke(_hasher, Array.Empty<object>());
                 }
             }
@@ -95,7 +483,7 @@ namespace IronPython.Modules {
             if (fields != null) {
                 foreach (FieldInfo field in fields) {
                     if (field.FieldType.IsArray) {
-                        lock (_hasher) {
+                        lock (_lock) {
                             if (field.GetValue(_hasher) is Array orig) {
                                 field.SetValue(clone, orig.Clone());
                             }
@@ -105,5 +493,33 @@ namespace IronPython.Modules {
             }
             return clone;
         }
+
+        #region IHashObject
+
+        int IHashObject.BlockSize => block_size;
+
+        int IHashObject.DigestSize => digest_size;
+
+        void IHashObject.Update(IBufferProtocol data) => update(data);
+
+        void IHashObject.Update(byte[] data) {
+#if NET8_0_OR_GREATER
+            if (_incremental != null) {
+                lock (_lock) {
+                    _incremental.AppendData(data);
+                }
+                return;
+            }
+#endif
+            lock (_lock) {
+                _hasher.TransformBlock(data, 0, data.Length, null, 0);
+            }
+        }
+
+        byte[] IHashObject.Digest() => ComputeDigest();
+
+        IHashObject IHashObject.Copy() => copy();
+
+        #endregion
     }
 }
@@ -36,7 +36,7 @@ namespace IronPython.Modules {
         [Documentation("md5([data]) -> object (object used to calculate MD5 hash)")]
         [PythonType("md5")]
         public sealed class MD5Type : HashBase<MD5> {
-            internal MD5Type() : base("md5", BLOCK_SIZE, DIGEST_SIZE) { }
+            internal MD5Type() : base("md5", BLOCK_SIZE, DIGEST_SIZE, HashAlgorithmName.MD5) { }
 
             internal MD5Type(IBufferProtocol initialBytes) : this() {
                 update(initialBytes);
@@ -49,7 +49,7 @@ namespace IronPython.Modules {
             [Documentation("copy() -> object (copy of this md5 object)")]
             public override HashBase<MD5> copy() {
                 MD5Type res = new MD5Type();
-                res._hasher = CloneHasher();
+                CopyStateTo(res);
                 return res;
             }
         }
@@ -34,7 +34,7 @@ namespace IronPython.Modules {
         [Documentation("sha1([data]) -> object (object used to calculate hash)")]
         [PythonType("sha1")]
         public sealed class SHA1Type : HashBase<SHA1> {
-            internal SHA1Type() : base("sha1", BLOCK_SIZE, DIGEST_SIZE) { }
+            internal SHA1Type() : base("sha1", BLOCK_SIZE, DIGEST_SIZE, HashAlgorithmName.SHA1) { }
 
             internal SHA1Type(IBufferProtocol initialBytes) : this() {
                 update(initialBytes);
@@ -47,7 +47,7 @@ namespace IronPython.Modules {
             [Documentation("copy() -> object (copy of this object)")]
             public override HashBase<SHA1> copy() {
                 SHA1Type clone = new SHA1Type();
-                clone._hasher = CloneHasher();
+                CopyStateTo(clone);
                 return clone;
             }
         }
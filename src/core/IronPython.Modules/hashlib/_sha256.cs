@@ -33,7 +33,7 @@ namespace IronPython.Modules {
 
         [PythonType("sha256")]
         public sealed class SHA256Type : HashBase<SHA256> {
-            internal SHA256Type() : base("sha256", BLOCK_SIZE, 32) { }
+            internal SHA256Type() : base("sha256", BLOCK_SIZE, 32, HashAlgorithmName.SHA256) { }
 
             internal SHA256Type(IBufferProtocol initialBytes) : this() {
                 update(initialBytes);
@@ -42,7 +42,7 @@ namespace IronPython.Modules {
             [Documentation("copy() -> object (copy of this object)")]
             public override HashBase<SHA256> copy() {
                 SHA256Type res = new SHA256Type();
-                res._hasher = CloneHasher();
+                CopyStateTo(res);
                 return res;
             }
 
@@ -79,7 +79,7 @@ namespace IronPython.Modules {
             [Documentation("copy() -> object (copy of this object)")]
             public override HashBase<SHA224> copy() {
                 SHA224Type res = new SHA224Type();
-                res._hasher = CloneHasher();
+                CopyStateTo(res);
                 return res;
             }
         }
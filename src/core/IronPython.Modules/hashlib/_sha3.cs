@@ -0,0 +1,255 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Security.Cryptography;
+using System.Text;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Operations;
+
+using Microsoft.Scripting.Runtime;
+
+[assembly: PythonModule("_sha3", typeof(IronPython.Modules.PythonSha3))]
+namespace IronPython.Modules {
+    public static class PythonSha3 {
+        public const string __doc__ = "SHA-3 hash algorithms and SHAKE extendable-output functions";
+
+        public static Sha3_224Type sha3_224([NotNone] IBufferProtocol data) => new Sha3_224Type(data);
+
+        public static Sha3_224Type sha3_224([NotNone] string data) {
+            throw PythonOps.TypeError("Unicode-objects must be encoded before hashing");
+        }
+
+        public static Sha3_224Type sha3_224() => new Sha3_224Type();
+
+        public static Sha3_256Type sha3_256([NotNone] IBufferProtocol data) => new Sha3_256Type(data);
+
+        public static Sha3_256Type sha3_256([NotNone] string data) {
+            throw PythonOps.TypeError("Unicode-objects must be encoded before hashing");
+        }
+
+        public static Sha3_256Type sha3_256() => new Sha3_256Type();
+
+        public static Sha3_384Type sha3_384([NotNone] IBufferProtocol data) => new Sha3_384Type(data);
+
+        public static Sha3_384Type sha3_384([NotNone] string data) {
+            throw PythonOps.TypeError("Unicode-objects must be encoded before hashing");
+        }
+
+        public static Sha3_384Type sha3_384() => new Sha3_384Type();
+
+        public static Sha3_512Type sha3_512([NotNone] IBufferProtocol data) => new Sha3_512Type(data);
+
+        public static Sha3_512Type sha3_512([NotNone] string data) {
+            throw PythonOps.TypeError("Unicode-objects must be encoded before hashing");
+        }
+
+        public static Sha3_512Type sha3_512() => new Sha3_512Type();
+
+        public static Shake128Type shake_128([NotNone] IBufferProtocol data) => new Shake128Type(data);
+
+        public static Shake128Type shake_128([NotNone] string data) {
+            throw PythonOps.TypeError("Unicode-objects must be encoded before hashing");
+        }
+
+        public static Shake128Type shake_128() => new Shake128Type();
+
+        public static Shake256Type shake_256([NotNone] IBufferProtocol data) => new Shake256Type(data);
+
+        public static Shake256Type shake_256([NotNone] string data) {
+            throw PythonOps.TypeError("Unicode-objects must be encoded before hashing");
+        }
+
+        public static Shake256Type shake_256() => new Shake256Type();
+
+        /// <summary>
+        /// Returns the platform algorithm for the given digest size if the OS provides SHA-3, otherwise null.
+        /// </summary>
+        private static HashAlgorithmName? PlatformSha3(int digestSize) {
+#if NET8_0_OR_GREATER
+            switch (digestSize) {
+                case 32 when SHA3_256.IsSupported: return HashAlgorithmName.SHA3_256;
+                case 48 when SHA3_384.IsSupported: return HashAlgorithmName.SHA3_384;
+                case 64 when SHA3_512.IsSupported: return HashAlgorithmName.SHA3_512;
+            }
+#endif
+            return null;
+        }
+
+        [PythonHidden]
+        public abstract class Sha3Base : HashBase<HashAlgorithm> {
+            internal Sha3Base(string name, int digestSize) : base(name, 200 - 2 * digestSize, digestSize, PlatformSha3(digestSize)) { }
+
+            protected override void CreateHasher() {
+                _hasher = KeccakManaged.CreateSha3(digest_size);
+            }
+        }
+
+        [PythonType("sha3_224")]
+        public sealed class Sha3_224Type : Sha3Base {
+            internal Sha3_224Type() : base("sha3_224", 28) { }
+
+            internal Sha3_224Type(IBufferProtocol initialBytes) : this() {
+                update(initialBytes);
+            }
+
+            [Documentation("copy() -> object (copy of this object)")]
+            public override HashBase<HashAlgorithm> copy() {
+                var res = new Sha3_224Type();
+                CopyStateTo(res);
+                return res;
+            }
+        }
+
+        [PythonType("sha3_256")]
+        public sealed class Sha3_256Type : Sha3Base {
+            internal Sha3_256Type() : base("sha3_256", 32) { }
+
+            internal Sha3_256Type(IBufferProtocol initialBytes) : this() {
+                update(initialBytes);
+            }
+
+            [Documentation("copy() -> object (copy of this object)")]
+            public override HashBase<HashAlgorithm> copy() {
+                var res = new Sha3_256Type();
+                CopyStateTo(res);
+                return res;
+            }
+        }
+
+        [PythonType("sha3_384")]
+        public sealed class Sha3_384Type : Sha3Base {
+            internal Sha3_384Type() : base("sha3_384", 48) { }
+
+            internal Sha3_384Type(IBufferProtocol initialBytes) : this() {
+                update(initialBytes);
+            }
+
+            [Documentation("copy() -> object (copy of this object)")]
+            public override HashBase<HashAlgorithm> copy() {
+                var res = new Sha3_384Type();
+                CopyStateTo(res);
+                return res;
+            }
+        }
+
+        [PythonType("sha3_512")]
+        public sealed class Sha3_512Type : Sha3Base {
+            internal Sha3_512Type() : base("sha3_512", 64) { }
+
+            internal Sha3_512Type(IBufferProtocol initialBytes) : this() {
+                update(initialBytes);
+            }
+
+            [Documentation("copy() -> object (copy of this object)")]
+            public override HashBase<HashAlgorithm> copy() {
+                var res = new Sha3_512Type();
+                CopyStateTo(res);
+                return res;
+            }
+        }
+
+        [PythonHidden]
+        public abstract class ShakeBase : ICloneable {
+            private KeccakManaged _hasher;
+            private readonly object _lock = new object();
+
+            public readonly string name;
+            public readonly int block_size;
+            public readonly int digest_size = 0;
+
+            internal ShakeBase(string name, int bits) {
+                this.name = name;
+                _hasher = KeccakManaged.CreateShake(bits);
+                block_size = _hasher.Rate;
+            }
+
+            [Documentation("update(string) -> None (update digest with string data)")]
+            public void update([NotNone] IBufferProtocol data) {
+                using var buffer = data.GetBuffer();
+                byte[] bytes = buffer.AsUnsafeArray() ?? buffer.ToArray();
+                lock (_lock) {
+                    _hasher.TransformBlock(bytes, 0, bytes.Length, null, 0);
+                }
+            }
+
+            public void update([NotNone] string data) {
+                throw PythonOps.TypeError("Unicode-objects must be encoded before hashing");
+            }
+
+            [Documentation("digest(length) -> bytes (first length bytes of the output)")]
+            public Bytes digest(int length) {
+                return Bytes.Make(Squeeze(length));
+            }
+
+            [Documentation("hexdigest(length) -> string (first length bytes of the output as hex digits)")]
+            public string hexdigest(int length) {
+                byte[] hash = Squeeze(length);
+
+                StringBuilder result = new StringBuilder(2 * hash.Length);
+                for (int i = 0; i < hash.Length; i++) {
+                    result.Append(hash[i].ToString("x2"));
+                }
+                return result.ToString();
+            }
+
+            public abstract ShakeBase copy();
+
+            object ICloneable.Clone() {
+                return copy();
+            }
+
+            protected void CopyStateTo(ShakeBase other) {
+                lock (_lock) {
+                    other._hasher = (KeccakManaged)_hasher.Clone();
+                }
+            }
+
+            private byte[] Squeeze(int length) {
+                if (length < 0) {
+                    throw PythonOps.ValueError("length must be positive");
+                }
+
+                KeccakManaged copy;
+                lock (_lock) {
+                    copy = (KeccakManaged)_hasher.Clone();
+                }
+                return copy.Squeeze(length);
+            }
+        }
+
+        [PythonType("shake_128")]
+        public sealed class Shake128Type : ShakeBase {
+            internal Shake128Type() : base("shake_128", 128) { }
+
+            internal Shake128Type(IBufferProtocol initialBytes) : this() {
+                update(initialBytes);
+            }
+
+            [Documentation("copy() -> object (copy of this object)")]
+            public override ShakeBase copy() {
+                var res = new Shake128Type();
+                CopyStateTo(res);
+                return res;
+            }
+        }
+
+        [PythonType("shake_256")]
+        public sealed class Shake256Type : ShakeBase {
+            internal Shake256Type() : base("shake_256", 256) { }
+
+            internal Shake256Type(IBufferProtocol initialBytes) : this() {
+                update(initialBytes);
+            }
+
+            [Documentation("copy() -> object (copy of this object)")]
+            public override ShakeBase copy() {
+                var res = new Shake256Type();
+                CopyStateTo(res);
+                return res;
+            }
+        }
+    }
+}
@@ -33,7 +33,7 @@ namespace IronPython.Modules {
 
         [PythonType("sha384")]
         public sealed class SHA384Type : HashBase<SHA384> {
-            internal SHA384Type() : base("sha384", BLOCK_SIZE, 48) { }
+            internal SHA384Type() : base("sha384", BLOCK_SIZE, 48, HashAlgorithmName.SHA384) { }
 
             internal SHA384Type(IBufferProtocol initialBytes) : this() {
                 update(initialBytes);
@@ -46,7 +46,7 @@ namespace IronPython.Modules {
             [Documentation("copy() -> object (copy of this md5 object)")]
             public override HashBase<SHA384> copy() {
                 SHA384Type res = new SHA384Type();
-                res._hasher = CloneHasher();
+                CopyStateTo(res);
                 return res;
             }
         }
@@ -65,7 +65,7 @@ namespace IronPython.Modules {
 
         [PythonType("sha512")]
         public sealed class SHA512Type : HashBase<SHA512> {
-            internal SHA512Type() : base("sha512", BLOCK_SIZE, 64) { }
+            internal SHA512Type() : base("sha512", BLOCK_SIZE, 64, HashAlgorithmName.SHA512) { }
 
             internal SHA512Type(IBufferProtocol initialBytes) : this() {
                 update(initialBytes);
@@ -78,7 +78,7 @@ namespace IronPython.Modules {
             [Documentation("copy() -> object (copy of this md5 object)")]
             public override HashBase<SHA512> copy() {
                 SHA512Type res = new SHA512Type();
-                res._hasher = CloneHasher();
+                CopyStateTo(res);
                 return res;
             }
         }
@@ -0,0 +1,73 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using System;
+
+namespace IronPython.Modules.Lzma {
+    /// <summary>
+    /// Growable FIFO byte buffer used to pass data between the stages of the codec.
+    /// </summary>
+    internal sealed class ByteQueue {
+        private byte[] _data = Array.Empty<byte>();
+        private int _start;
+        private int _end;
+
+        public byte[] Array => _data;
+        public int Start => _start;
+        public int End => _end;
+        public int Length => _end - _start;
+
+        public ReadOnlySpan<byte> Span => new ReadOnlySpan<byte>(_data, _start, _end - _start);
+
+        public byte this[int index] => _data[_start + index];
+
+        public void Append(byte value) {
+            EnsureSpace(1);
+            _data[_end++] = value;
+        }
+
+        public void Append(byte[] buffer, int offset, int count) => Append(new ReadOnlySpan<byte>(buffer, offset, count));
+
+        public void Append(ReadOnlySpan<byte> data) {
+            if (data.IsEmpty) return;
+            EnsureSpace(data.Length);
+            data.CopyTo(new Span<byte>(_data, _end, data.Length));
+            _end += data.Length;
+        }
+
+        public void Skip(int count) {
+            _start += count;
+            if (_start == _end) {
+                _start = _end = 0;
+            }
+        }
+
+        public byte[] Take(int count) {
+            var res = new byte[count];
+            System.Array.Copy(_data, _start, res, 0, count);
+            Skip(count);
+            return res;
+        }
+
+        public void Clear() {
+            _start = _end = 0;
+        }
+
+        private void EnsureSpace(int count) {
+            if (_data.Length - _end >= count) return;
+
+            int length = _end - _start;
+            if (_data.Length - length >= count && _start >= length) {
+                // enough room once the consumed prefix is reclaimed
+                System.Array.Copy(_data, _start, _data, 0, length);
+            } else {
+                var data = new byte[Math.Max(Math.Max(_data.Length * 2, length + count), 256)];
+                System.Array.Copy(_data, _start, data, 0, length);
+                _data = data;
+            }
+            _start = 0;
+            _end = length;
+        }
+    }
+}
@@ -0,0 +1,128 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using System;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Operations;
+
+using Microsoft.Scripting.Runtime;
+
+namespace IronPython.Modules.Lzma {
+    public static partial class LzmaModule {
+        [PythonType]
+        public class LZMACompressor {
+            public const string __doc__ =
+@"LZMACompressor(format=FORMAT_XZ, check=-1, preset=None, filters=None)
+
+Create a compressor object for compressing data incrementally.
+
+format specifies the container format to use for the output. This can
+be FORMAT_XZ (default), FORMAT_ALONE, or FORMAT_RAW.
+
+check specifies the integrity check to use. For FORMAT_XZ, the default
+is CHECK_CRC64. FORMAT_ALONE and FORMAT_RAW do not support integrity
+checks; for these formats, check must be omitted, or be CHECK_NONE.
+
+The settings used by the compressor can be specified either as a
+preset compression level (with the 'preset' argument), or in detail
+as a custom filter chain (with the 'filters' argument). For FORMAT_XZ
+and FORMAT_ALONE, the default is to use the PRESET_DEFAULT preset
+level. For FORMAT_RAW, the caller must always specify a filter chain;
+the raw compressor does not support preset compression levels.
+
+preset (if provided) should be an integer in the range 0-9, optionally
+OR-ed with the constant PRESET_EXTREME.
+
+filters (if provided) should be a sequence of dicts. Each dict should
+have an entry for ""id"" indicating the ID of the filter, plus
+additional entries for options to the filter.
+
+For one-shot compression, use the compress() function instead.
+";
+
+            private readonly StreamEncoder _encoder;
+            private readonly ByteQueue _output = new ByteQueue();
+            private bool _flushed;
+
+            public LZMACompressor(int format = FORMAT_XZ, int check = -1, object preset = null, object filters = null) {
+                if (format != FORMAT_XZ && check != -1 && check != CHECK_NONE) {
+                    throw PythonOps.ValueError("Integrity checks are only supported by FORMAT_XZ");
+                }
+                if (preset != null && filters != null) {
+                    throw PythonOps.ValueError("Cannot specify both preset and filter chain");
+                }
+                uint presetValue = preset is null ? PRESET_DEFAULT : Converter.ConvertToUInt32(preset);
+
+                switch (format) {
+                    case FORMAT_XZ:
+                        if (check == -1) check = CHECK_CRC64;
+                        if (check < 0 || check > CHECK_ID_MAX) throw InternalError();
+                        if (!IntegrityCheck.IsSupported(check)) throw UnsupportedCheckError();
+
+                        FilterSpec[] chain;
+                        if (filters is null) {
+                            var options = LzmaOptions.FromPreset(presetValue) ?? throw OptionsError();
+                            chain = new[] { new FilterSpec { Id = FILTER_LZMA2, Lzma = options } };
+                        } else {
+                            chain = ParseFilterChain(filters);
+                            // LZMA1 cannot be stored in .xz files
+                            if (chain[chain.Length - 1].Id == FILTER_LZMA1_ID) throw InternalError();
+                        }
+                        _encoder = new XzEncoder(chain, check);
+                        break;
+
+                    case FORMAT_ALONE:
+                        LzmaOptions lzma;
+                        if (filters is null) {
+                            lzma = LzmaOptions.FromPreset(presetValue) ?? throw MakeError($"Invalid compression preset: {presetValue}");
+                        } else {
+                            chain = ParseFilterChain(filters);
+                            if (chain.Length != 1 || chain[0].Id != FILTER_LZMA1_ID) {
+                                throw PythonOps.ValueError("Invalid filter chain for FORMAT_ALONE - must be a single LZMA1 filter");
+                            }
+                            lzma = chain[0].Lzma;
+                        }
+                        _encoder = new AloneEncoder(lzma);
+                        break;
+
+                    case FORMAT_RAW:
+                        if (filters is null) throw PythonOps.ValueError("Must specify filters for FORMAT_RAW");
+                        _encoder = new RawEncoder(ParseFilterChain(filters));
+                        break;
+
+                    default:
+                        throw PythonOps.ValueError("Invalid container format: {0}", format);
+                }
+            }
+
+            [Documentation(@"Provide data to the compressor object.
+
+Returns a chunk of compressed data if possible, or b'' otherwise.
+
+When you have finished providing data to the compressor, call the
+flush() method to finish the compression process.")]
+            public Bytes compress([NotNone] IBufferProtocol data) {
+                if (_flushed) throw PythonOps.ValueError("Compressor has been flushed");
+
+                using var buffer = data.GetBuffer();
+                _encoder.Write(buffer.AsReadOnlySpan(), _output);
+                return Bytes.Make(_output.Take(_output.Length));
+            }
+
+            [Documentation(@"Finish the compression process.
+
+Returns the compressed data left in internal buffers.
+
+The compressor object may not be used after this method is called.")]
+            public Bytes flush() {
+                if (_flushed) throw PythonOps.ValueError("Repeated call to flush()");
+                _flushed = true;
+
+                _encoder.Finish(_output);
+                return Bytes.Make(_output.Take(_output.Length));
+            }
+        }
+    }
+}
@@ -0,0 +1,123 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using System;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Operations;
+
+using Microsoft.Scripting.Runtime;
+
+namespace IronPython.Modules.Lzma {
+    public static partial class LzmaModule {
+        [PythonType]
+        public class LZMADecompressor {
+            public const string __doc__ =
+@"Create a decompressor object for decompressing data incrementally.
+
+  format
+    Specifies the container format of the input stream.  If this is
+    FORMAT_AUTO (the default), the decompressor will automatically detect
+    whether the input is FORMAT_XZ or FORMAT_ALONE.  Streams created with
+    FORMAT_RAW cannot be autodetected.
+  memlimit
+    Limit the amount of memory used by the decompressor.  This will cause
+    decompression to fail if the input cannot be decompressed within the
+    given limit.
+  filters
+    A custom filter chain.  This argument is required for FORMAT_RAW, and
+    not accepted with any other format.  When provided, this should be a
+    sequence of dicts, each indicating the ID and options for a single
+    filter.
+
+For one-shot decompression, use the decompress() function instead.";
+
+            private readonly StreamDecoder _decoder;
+            private readonly ByteQueue _input = new ByteQueue();
+            // decoded data beyond the max_length of the previous call
+            private readonly ByteQueue _output = new ByteQueue();
+            private bool _finished;
+
+            public LZMADecompressor(int format = FORMAT_AUTO, object memlimit = null, object filters = null) {
+                if (memlimit != null && format == FORMAT_RAW) {
+                    throw PythonOps.ValueError("Cannot specify memory limit with FORMAT_RAW");
+                }
+                ulong limit = memlimit is null ? ulong.MaxValue : Converter.ConvertToUInt64(memlimit);
+
+                if (format == FORMAT_RAW && filters is null) {
+                    throw PythonOps.ValueError("Must specify filters for FORMAT_RAW");
+                } else if (format != FORMAT_RAW && filters != null) {
+                    throw PythonOps.ValueError("Cannot specify filters except with FORMAT_RAW");
+                }
+
+                switch (format) {
+                    case FORMAT_AUTO:
+                        _decoder = new AutoDecoder(limit);
+                        break;
+                    case FORMAT_XZ:
+                        _decoder = new XzDecoder(limit);
+                        break;
+                    case FORMAT_ALONE:
+                        _decoder = new AloneDecoder(limit, picky: false);
+                        break;
+                    case FORMAT_RAW:
+                        _decoder = new RawDecoder(ParseFilterChain(filters));
+                        break;
+                    default:
+                        throw PythonOps.ValueError("Invalid container format: {0}", format);
+                }
+            }
+
+            [Documentation("ID of the integrity check used by the input stream.")]
+            public int check => _decoder.Check;
+
+            [Documentation("True if the end-of-stream marker has been reached.")]
+            public bool eof { get; private set; }
+
+            [Documentation("Data found after the end of the compressed stream.")]
+            public Bytes unused_data { get; private set; } = Bytes.Empty;
+
+            [Documentation("True if more input is needed before more decompressed data can be produced.")]
+            public bool needs_input { get; private set; } = true;
+
+            [Documentation(@"Decompress *data*, returning uncompressed data as bytes.
+
+If *max_length* is nonnegative, returns at most *max_length* bytes of
+decompressed data. If this limit is reached and further output can be
+produced, *self.needs_input* will be set to ``False``. In this case, the next
+call to *decompress()* may provide *data* as b'' to obtain more of the output.
+
+If all of the input data was decompressed and returned (either because this
+was less than *max_length* bytes, or because *max_length* was negative),
+*self.needs_input* will be set to True.
+
+Attempting to decompress data after the end of stream is reached raises an
+EOFError.  Any data found after the end of the stream is ignored and saved in
+the unused_data attribute.")]
+            public Bytes decompress([NotNone] IBufferProtocol data, int max_length = -1) {
+                if (eof) throw PythonOps.EofError("Already at end of stream");
+
+                using (var buffer = data.GetBuffer()) {
+                    _input.Append(buffer.AsReadOnlySpan());
+                }
+
+                int limit = max_length < 0 ? int.MaxValue : max_length;
+                if (!_finished && _output.Length < limit) {
+                    _finished = _decoder.Decode(_input, _output, limit - _output.Length);
+                }
+                byte[] res = _output.Take(Math.Min(limit, _output.Length));
+
+                if (_finished && _output.Length == 0) {
+                    eof = true;
+                    needs_input = false;
+                    unused_data = Bytes.Make(_input.Take(_input.Length));
+                } else {
+                    // output left over or cut off at max_length may still be pending
+                    needs_input = _output.Length == 0 && res.Length < limit;
+                }
+                return Bytes.Make(res);
+            }
+        }
+    }
+}
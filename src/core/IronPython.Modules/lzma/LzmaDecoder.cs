@@ -0,0 +1,462 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using System;
+
+using static IronPython.Modules.Lzma.LzmaProbs;
+
+namespace IronPython.Modules.Lzma {
+    internal enum LzmaStatus {
+        /// <summary>Stopped because the output limit or the end of the (sub)stream was reached.</summary>
+        Ok,
+        /// <summary>Stopped because the next symbol needs more input.</summary>
+        NeedInput,
+        /// <summary>The end of payload marker was decoded.</summary>
+        EndMarker,
+    }
+
+    /// <summary>
+    /// LZMA symbol decoder writing into a circular dictionary. Decoded bytes stay in the dictionary until
+    /// they are taken by <see cref="TakeOutput"/>.
+    /// </summary>
+    internal sealed class LzmaDecoder {
+        // generous bound of the input bytes a single symbol may consume (liblzma uses 20)
+        private const int MaxSymbolInput = 64;
+
+        // the dictionary grows on demand up to the declared size (capped like liblzma's encoder limit)
+        private const int MaxDictionary = 1536 << 20;
+        private const int WindowSlack = 1 << 16;
+
+        private readonly uint _dictSize;
+        private readonly int _windowMax;
+        private byte[] _window;
+        private int _pos;
+        private int _filled;
+        private int _pending;
+
+        private ushort[] _probs;
+        private int _lc, _lp, _pb;
+        private int _state;
+        private uint _rep0, _rep1, _rep2, _rep3;
+
+        public readonly RangeDecoder Rc = new RangeDecoder();
+
+        /// <summary>Number of bytes decoded since the last dictionary reset.</summary>
+        public long Total;
+
+        /// <summary>Value of <see cref="Total"/> at which the current (sub)stream ends.</summary>
+        public long StreamEnd = long.MaxValue;
+
+        public LzmaDecoder(uint dictSize) {
+            _dictSize = Math.Max(dictSize, 4096);
+            _windowMax = (int)Math.Min(_dictSize, MaxDictionary) + WindowSlack;
+            _window = new byte[Math.Min(_windowMax, WindowSlack)];
+        }
+
+        public int Pending => _pending;
+
+        public void SetProperties(int lc, int lp, int pb) {
+            if (_probs is null || _lc + _lp != lc + lp) {
+                _probs = LzmaProbs.Create(lc, lp);
+            }
+            _lc = lc;
+            _lp = lp;
+            _pb = pb;
+        }
+
+        public void ResetState() {
+            LzmaProbs.Reset(_probs);
+            _state = 0;
+            _rep0 = _rep1 = _rep2 = _rep3 = 0;
+        }
+
+        public void ResetDictionary() {
+            Total = 0;
+        }
+
+        private int HistorySize => (int)Math.Min(Total, Math.Min(_dictSize, (uint)_filled));
+
+        /// <summary>
+        /// Makes sure a whole match can be written without overwriting history or pending output.
+        /// </summary>
+        private bool EnsureSpace() {
+            int needed = Math.Max(HistorySize, _pending) + MatchMaxLen;
+            if (needed <= _window.Length) return true;
+            if (_window.Length == _windowMax) return false;
+
+            var window = new byte[Math.Min(Math.Max(_window.Length * 2, needed), _windowMax)];
+            int start = _pos - _filled;
+            if (start < 0) {
+                start += _window.Length;
+                int first = _window.Length - start;
+                Array.Copy(_window, start, window, 0, first);
+                Array.Copy(_window, 0, window, first, _pos);
+            } else {
+                Array.Copy(_window, start, window, 0, _filled);
+            }
+            _window = window;
+            _pos = _filled;
+            return needed <= _window.Length;
+        }
+
+        private byte GetByte(uint distance) {
+            int i = _pos - (int)distance;
+            if (i < 0) i += _window.Length;
+            return _window[i];
+        }
+
+        private void PutByte(byte value) {
+            _window[_pos++] = value;
+            if (_pos == _window.Length) _pos = 0;
+            if (_filled < _window.Length) _filled++;
+            _pending++;
+            Total++;
+        }
+
+        /// <summary>
+        /// Copies bytes of an uncompressed LZMA2 chunk into the dictionary. Returns the number of bytes consumed.
+        /// </summary>
+        public int PutUncompressed(ReadOnlySpan<byte> data, int maxPending) {
+            int count = 0;
+            while (count < data.Length && _pending < maxPending && EnsureSpace()) {
+                int n = Math.Min(data.Length - count, MatchMaxLen);
+                for (int i = 0; i < n; i++) {
+                    PutByte(data[count + i]);
+                }
+                count += n;
+            }
+            return count;
+        }
+
+        /// <summary>
+        /// Moves up to <paramref name="maxCount"/> decoded bytes to the output.
+        /// </summary>
+        public void TakeOutput(ByteQueue output, int maxCount = int.MaxValue) {
+            int n = Math.Min(_pending, maxCount);
+            int start = _pos - _pending;
+            if (start < 0) {
+                start += _window.Length;
+                int first = Math.Min(n, _window.Length - start);
+                output.Append(_window, start, first);
+                output.Append(_window, 0, n - first);
+            } else {
+                output.Append(_window, start, n);
+            }
+            _pending -= n;
+        }
+
+        /// <summary>
+        /// Decodes symbols until <see cref="StreamEnd"/> is reached, at least <paramref name="maxPending"/> bytes are
+        /// waiting to be taken, or the input bound to <see cref="Rc"/> runs out.
+        /// </summary>
+        public LzmaStatus Decode(int maxPending) {
+            RangeDecoder rc = Rc;
+            while (Total < StreamEnd && _pending < maxPending && EnsureSpace()) {
+                bool partial = rc.Limit - rc.Position < MaxSymbolInput;
+                if (!partial) {
+                    if (DecodeSymbol(rc)) return LzmaStatus.EndMarker;
+                    continue;
+                }
+
+                // near the end of the buffered input the symbol may be cut short, so make it undoable
+                uint range = rc.Range, code = rc.Code;
+                int position = rc.Position, state = _state;
+                uint rep0 = _rep0, rep1 = _rep1, rep2 = _rep2, rep3 = _rep3;
+                rc.BeginUndo();
+                try {
+                    if (DecodeSymbol(rc)) return LzmaStatus.EndMarker;
+                } catch (NeedInputException) {
+                    rc.Undo(_probs);
+                    rc.Range = range;
+                    rc.Code = code;
+                    rc.Position = position;
+                    _state = state;
+                    _rep0 = rep0; _rep1 = rep1; _rep2 = rep2; _rep3 = rep3;
+                    return LzmaStatus.NeedInput;
+                } finally {
+                    rc.EndUndo();
+                }
+            }
+            return LzmaStatus.Ok;
+        }
+
+        /// <summary>
+        /// Decodes a single symbol. The dictionary is only modified once the whole symbol has been read.
+        /// </summary>
+        private bool DecodeSymbol(RangeDecoder rc) {
+            ushort[] probs = _probs;
+            int state = _state;
+            int posState = (int)Total & ((1 << _pb) - 1);
+
+            if (rc.DecodeBit(probs, IsMatch + (state << 4) + posState) == 0) {
+                int prevByte = Total > 0 ? GetByte(1) : 0;
+                int probsOffset = Literal + 0x300 * ((((int)Total & ((1 << _lp) - 1)) << _lc) + (prevByte >> (8 - _lc)));
+                int symbol = 1;
+                if (state >= NumLitStates) {
+                    int matchByte = GetByte(_rep0 + 1);
+                    do {
+                        int matchBit = (matchByte >> 7) & 1;
+                        matchByte <<= 1;
+                        int bit = rc.DecodeBit(probs, probsOffset + ((1 + matchBit) << 8) + symbol);
+                        symbol = (symbol << 1) | bit;
+                        if (matchBit != bit) break;
+                    } while (symbol < 0x100);
+                }
+                while (symbol < 0x100) {
+                    symbol = (symbol << 1) | rc.DecodeBit(probs, probsOffset + symbol);
+                }
+                _state = UpdateLiteral(state);
+                PutByte((byte)symbol);
+                return false;
+            }
+
+            uint rep0 = _rep0, rep1 = _rep1, rep2 = _rep2, rep3 = _rep3;
+            int len;
+            if (rc.DecodeBit(probs, IsRep + state) != 0) {
+                if (Total == 0) throw LzmaModule.DataError();
+
+                if (rc.DecodeBit(probs, IsRepG0 + state) == 0) {
+                    if (rc.DecodeBit(probs, IsRep0Long + (state << 4) + posState) == 0) {
+                        _state = state < NumLitStates ? 9 : 11;
+                        PutByte(GetByte(rep0 + 1));
+                        return false;
+                    }
+                } else {
+                    uint dist;
+                    if (rc.DecodeBit(probs, IsRepG1 + state) == 0) {
+                        dist = rep1;
+                    } else {
+                        if (rc.DecodeBit(probs, IsRepG2 + state) == 0) {
+                            dist = rep2;
+                        } else {
+                            dist = rep3;
+                            rep3 = rep2;
+                        }
+                        rep2 = rep1;
+                    }
+                    rep1 = rep0;
+                    rep0 = dist;
+                }
+                len = DecodeLength(rc, probs, RepLenCoder, posState);
+                state = state < NumLitStates ? 8 : 11;
+            } else {
+                rep3 = rep2;
+                rep2 = rep1;
+                rep1 = rep0;
+                len = DecodeLength(rc, probs, LenCoder, posState);
+                state = state < NumLitStates ? 7 : 10;
+                rep0 = DecodeDistance(rc, probs, len);
+                if (rep0 == uint.MaxValue) {
+                    if (!rc.IsFinishedOK) throw LzmaModule.DataError();
+                    return true;
+                }
+            }
+
+            len += MatchMinLen;
+            if (rep0 >= HistorySize || Total + len > StreamEnd) throw LzmaModule.DataError();
+
+            _state = state;
+            _rep0 = rep0; _rep1 = rep1; _rep2 = rep2; _rep3 = rep3;
+
+            // copy the match, splitting it at the end of the circular buffer
+            int src = _pos - (int)rep0 - 1;
+            if (src < 0) src += _window.Length;
+            for (int i = 0; i < len; i++) {
+                _window[_pos++] = _window[src++];
+                if (_pos == _window.Length) _pos = 0;
+                if (src == _window.Length) src = 0;
+            }
+            _filled = Math.Min(_filled + len, _window.Length);
+            _pending += len;
+            Total += len;
+            return false;
+        }
+
+        private static int DecodeLength(RangeDecoder rc, ushort[] probs, int offset, int posState) {
+            if (rc.DecodeBit(probs, offset + LenChoice) == 0) {
+                return rc.DecodeTree(probs, offset + LenLow + posState * 8, 3);
+            }
+            if (rc.DecodeBit(probs, offset + LenChoice2) == 0) {
+                return 8 + rc.DecodeTree(probs, offset + LenMid + posState * 8, 3);
+            }
+            return 16 + rc.DecodeTree(probs, offset + LenHigh, 8);
+        }
+
+        private static uint DecodeDistance(RangeDecoder rc, ushort[] probs, int len) {
+            int lenState = Math.Min(len, 3);
+            int posSlot = rc.DecodeTree(probs, PosSlot + (lenState << 6), 6);
+            if (posSlot < 4) return (uint)posSlot;
+
+            int numDirectBits = (posSlot >> 1) - 1;
+            uint dist = (uint)(2 | (posSlot & 1)) << numDirectBits;
+            if (posSlot < EndPosModelIndex) {
+                return dist + (uint)rc.DecodeReverseTree(probs, SpecPos + (int)dist - posSlot, numDirectBits);
+            }
+            dist += rc.DecodeDirectBits(numDirectBits - NumAlignBits) << NumAlignBits;
+            return dist + (uint)rc.DecodeReverseTree(probs, Align, NumAlignBits);
+        }
+    }
+
+    /// <summary>
+    /// Decoder of the LZ stage of a filter chain.
+    /// </summary>
+    internal abstract class LzDecoder {
+        /// <summary>
+        /// Consumes input and appends at most <paramref name="maxOutput"/> decoded bytes to the output.
+        /// Returns true once the end of the compressed data has been reached.
+        /// </summary>
+        public abstract bool Decode(ByteQueue input, ByteQueue output, int maxOutput);
+    }
+
+    /// <summary>
+    /// LZMA1 stream, terminated either by a known uncompressed size or by the end of payload marker.
+    /// </summary>
+    internal sealed class Lzma1Decoder : LzDecoder {
+        private readonly LzmaDecoder _lz;
+        private bool _started;
+
+        public Lzma1Decoder(LzmaOptions options, long uncompressedSize = -1) {
+            _lz = new LzmaDecoder(options.DictSize);
+            _lz.SetProperties(options.Lc, options.Lp, options.Pb);
+            _lz.ResetState();
+            if (uncompressedSize >= 0) _lz.StreamEnd = uncompressedSize;
+        }
+
+        public override bool Decode(ByteQueue input, ByteQueue output, int maxOutput) {
+            RangeDecoder rc = _lz.Rc;
+            rc.Bind(input.Array, input.Start, input.End);
+            try {
+                if (!_started) {
+                    if (!rc.TryInit()) return false;
+                    _started = true;
+                }
+
+                while (true) {
+                    LzmaStatus status = _lz.Decode(maxOutput - output.Length);
+                    _lz.TakeOutput(output);
+                    if (status == LzmaStatus.EndMarker) return true;
+                    if (_lz.Total == _lz.StreamEnd) {
+                        if (!rc.IsFinishedOK) throw LzmaModule.DataError();
+                        return true;
+                    }
+                    if (status == LzmaStatus.NeedInput || output.Length >= maxOutput) return false;
+                }
+            } finally {
+                input.Skip(rc.Position - input.Start);
+            }
+        }
+    }
+
+    /// <summary>
+    /// LZMA2 stream: a sequence of LZMA and uncompressed chunks terminated by a zero control byte.
+    /// </summary>
+    internal sealed class Lzma2Decoder : LzDecoder {
+        private const int ChunkCompressedMax = 1 << 16;
+
+        private readonly LzmaDecoder _lz;
+        private readonly byte[] _chunk = new byte[ChunkCompressedMax];
+        private bool _needDictReset = true;
+        private bool _needProperties = true;
+
+        // remaining bytes of the current uncompressed chunk, or -1 while decoding an LZMA chunk
+        private int _uncompressedLeft;
+        private int _compressedSize;
+        private bool _inChunk;
+
+        public Lzma2Decoder(uint dictSize) {
+            _lz = new LzmaDecoder(dictSize);
+        }
+
+        public override bool Decode(ByteQueue input, ByteQueue output, int maxOutput) {
+            while (output.Length < maxOutput) {
+                if (!_inChunk) {
+                    if (input.Length == 0) return false;
+
+                    int control = input[0];
+                    if (control == 0x00) {
+                        input.Skip(1);
+                        return true;
+                    }
+                    if (control >= 0x80) {
+                        if (!StartLzmaChunk(input, control)) return false;
+                    } else {
+                        if (control > 2) throw LzmaModule.DataError();
+                        if (input.Length < 3) return false;
+                        ResetDictionary(control == 1);
+                        _uncompressedLeft = (input[1] << 8 | input[2]) + 1;
+                        input.Skip(3);
+                    }
+                    _inChunk = true;
+                }
+
+                if (_uncompressedLeft > 0) {
+                    int n = _lz.PutUncompressed(input.Span.Slice(0, Math.Min(input.Length, _uncompressedLeft)), maxOutput - output.Length);
+                    input.Skip(n);
+                    _uncompressedLeft -= n;
+                    _lz.TakeOutput(output);
+                    if (_uncompressedLeft == 0) {
+                        _inChunk = false;
+                    } else if (n == 0) {
+                        return false;
+                    }
+                    continue;
+                }
+
+                LzmaStatus status = _lz.Decode(maxOutput - output.Length);
+                _lz.TakeOutput(output);
+                if (status != LzmaStatus.Ok) throw LzmaModule.DataError();
+                if (_lz.Total == _lz.StreamEnd) {
+                    if (_lz.Rc.Position != _compressedSize || !_lz.Rc.IsFinishedOK) throw LzmaModule.DataError();
+                    _inChunk = false;
+                }
+            }
+            return false;
+        }
+
+        private void ResetDictionary(bool reset) {
+            if (reset) {
+                _lz.ResetDictionary();
+                _needDictReset = false;
+                _needProperties = true;
+            } else if (_needDictReset) {
+                throw LzmaModule.DataError();
+            }
+        }
+
+        private bool StartLzmaChunk(ByteQueue input, int control) {
+            int header = control >= 0xC0 ? 6 : 5;
+            if (input.Length < header) return false;
+
+            int compressed = (input[3] << 8 | input[4]) + 1;
+            if (input.Length < header + compressed) return false;
+
+            ResetDictionary(control >= 0xE0);
+            if (control >= 0xC0) {
+                int props = input[5];
+                if (props > (4 * 5 + 4) * 9 + 8) throw LzmaModule.DataError();
+                int lc = props % 9;
+                props /= 9;
+                int lp = props % 5;
+                int pb = props / 5;
+                if (lc + lp > 4) throw LzmaModule.DataError();
+                _lz.SetProperties(lc, lp, pb);
+                _needProperties = false;
+            } else if (_needProperties) {
+                throw LzmaModule.DataError();
+            }
+            if (control >= 0xA0) _lz.ResetState();
+
+            _lz.StreamEnd = _lz.Total + ((control & 0x1F) << 16 | input[1] << 8 | input[2]) + 1;
+            _compressedSize = compressed;
+            _uncompressedLeft = 0;
+            input.Skip(header);
+            Array.Copy(input.Array, input.Start, _chunk, 0, compressed);
+            input.Skip(compressed);
+
+            _lz.Rc.Bind(_chunk, 0, compressed);
+            if (!_lz.Rc.TryInit()) throw LzmaModule.DataError();
+            return true;
+        }
+    }
+}
@@ -0,0 +1,529 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using System;
+
+using static IronPython.Modules.Lzma.LzmaProbs;
+
+namespace IronPython.Modules.Lzma {
+    /// <summary>
+    /// LZMA symbol encoder over a sliding window with a hash chain match finder.
+    /// </summary>
+    /// <remarks>
+    /// Matches are picked greedily (<see cref="LzmaModule.MODE_FAST"/>) or with one step of lazy evaluation
+    /// (<see cref="LzmaModule.MODE_NORMAL"/>), which is simpler than liblzma's optimal parsing at the cost of a
+    /// slightly lower compression ratio. The output is a standard LZMA stream.
+    /// </remarks>
+    internal sealed class LzmaEncoder {
+        private const int MinBufferSize = 1 << 16;
+
+        private readonly int _lc, _lp, _pb;
+        private readonly int _dictSize;
+        private readonly int _niceLen;
+        private readonly int _depth;
+        private readonly bool _lazy;
+
+        private readonly ushort[] _probs;
+        private int _state;
+        private uint _rep0, _rep1, _rep2, _rep3;
+
+        public readonly RangeEncoder Rc = new RangeEncoder();
+
+        // sliding window: _buffer[0] is the byte at absolute position _basePos
+        private readonly int _bufferMax;
+        private byte[] _buffer = Array.Empty<byte>();
+        private uint _basePos;
+        private int _readPos;
+        private int _writePos;
+
+        // hash chains; entries are window indices plus one so that zero means empty
+        private readonly int _hashBits;
+        private readonly int _chainMax;
+        private int[] _head;
+        private int[] _chain = Array.Empty<int>();
+        private int _chainMask;
+        private int _hashed;
+
+        /// <summary>
+        /// Window index of the oldest byte that must survive sliding besides the dictionary (e.g. a pending LZMA2 chunk).
+        /// </summary>
+        public int KeepFrom = int.MaxValue;
+
+        public LzmaEncoder(LzmaOptions options, int extraBuffer) {
+            _lc = options.Lc;
+            _lp = options.Lp;
+            _pb = options.Pb;
+            _dictSize = (int)Math.Min(options.DictSize, LzmaOptions.DictSizeMax);
+            _niceLen = options.NiceLen;
+            _lazy = options.Mode == LzmaModule.MODE_NORMAL;
+            _depth = options.Depth != 0 ? options.Depth
+                : options.MatchFinder >= LzmaModule.MF_BT2 ? 16 + _niceLen / 2 : 4 + _niceLen / 4;
+
+            _probs = LzmaProbs.Create(_lc, _lp);
+
+            _bufferMax = _dictSize + Math.Max(extraBuffer, MinBufferSize);
+            _chainMax = NextPowerOfTwo(_dictSize);
+            int bits = 0;
+            while ((1 << bits) < _dictSize) bits++;
+            _hashBits = Math.Max(Math.Min(bits - 2, 20), 12);
+        }
+
+        private static int NextPowerOfTwo(int value) {
+            int res = 1;
+            while (res < value && res < (1 << 30)) res <<= 1;
+            return res;
+        }
+
+        /// <summary>Number of buffered bytes not encoded yet.</summary>
+        public int Available => _writePos - _readPos;
+
+        /// <summary>Window index of the next byte to encode.</summary>
+        public int Position => _readPos;
+
+        public byte[] Buffer => _buffer;
+
+        public void ResetState() {
+            LzmaProbs.Reset(_probs);
+            _state = 0;
+            _rep0 = _rep1 = _rep2 = _rep3 = 0;
+        }
+
+        /// <summary>
+        /// Copies as much of the data into the window as fits. Returns the number of bytes taken.
+        /// </summary>
+        public int Append(ReadOnlySpan<byte> data) {
+            if (_head is null) _head = new int[1 << _hashBits];
+
+            if (_writePos == _buffer.Length) {
+                if (_buffer.Length < _bufferMax) {
+                    Grow();
+                } else {
+                    Slide();
+                }
+            }
+
+            int n = Math.Min(data.Length, _buffer.Length - _writePos);
+            data.Slice(0, n).CopyTo(new Span<byte>(_buffer, _writePos, n));
+            _writePos += n;
+            return n;
+        }
+
+        private void Grow() {
+            int size = (int)Math.Min(Math.Max((long)_buffer.Length * 2, MinBufferSize), _bufferMax);
+            Array.Resize(ref _buffer, size);
+
+            // no position has wrapped around the chain yet, so the entries keep their slots
+            int chainSize = Math.Min(NextPowerOfTwo(size), _chainMax);
+            if (chainSize > _chain.Length) {
+                Array.Resize(ref _chain, chainSize);
+                _chainMask = chainSize - 1;
+            }
+        }
+
+        private void Slide() {
+            int shift = Math.Min(_readPos - _dictSize, KeepFrom);
+            if (shift <= 0) throw new InvalidOperationException();
+
+            Array.Copy(_buffer, shift, _buffer, 0, _writePos - shift);
+            _basePos += (uint)shift;
+            _readPos -= shift;
+            _writePos -= shift;
+            _hashed -= shift;
+            if (KeepFrom != int.MaxValue) KeepFrom -= shift;
+
+            SlideEntries(_head, shift);
+            SlideEntries(_chain, shift);
+        }
+
+        private static void SlideEntries(int[] entries, int shift) {
+            for (int i = 0; i < entries.Length; i++) {
+                int value = entries[i];
+                entries[i] = value > shift ? value - shift : 0;
+            }
+        }
+
+        #region Match finder
+
+        private int Hash(int pos) {
+            uint value = (uint)(_buffer[pos] | _buffer[pos + 1] << 8 | _buffer[pos + 2] << 16);
+            return (int)((value * 2654435761U) >> (32 - _hashBits));
+        }
+
+        private void InsertUpTo(int pos) {
+            int limit = Math.Min(pos, _writePos - 2);
+            for (; _hashed < limit; _hashed++) {
+                int h = Hash(_hashed);
+                _chain[(int)(_basePos + (uint)_hashed) & _chainMask] = _head[h];
+                _head[h] = _hashed + 1;
+            }
+        }
+
+        /// <summary>
+        /// Finds the longest match of at least three bytes at the position. Returns its length or zero.
+        /// </summary>
+        private int FindMatch(int pos, int available, out uint dist) {
+            dist = 0;
+            int maxLen = Math.Min(available, MatchMaxLen);
+            if (maxLen < 3) return 0;
+
+            InsertUpTo(pos);
+            byte[] buffer = _buffer;
+            int best = 2;
+            int candidate = _head[Hash(pos)] - 1;
+            for (int depth = _depth; candidate >= 0 && depth > 0; depth--) {
+                int d = pos - candidate;
+                if (d > _dictSize) break;
+
+                if (buffer[candidate + best] == buffer[pos + best]) {
+                    int len = 0;
+                    while (len < maxLen && buffer[candidate + len] == buffer[pos + len]) len++;
+                    if (len > best) {
+                        best = len;
+                        dist = (uint)(d - 1);
+                        if (len >= _niceLen || len == maxLen) break;
+                    }
+                }
+
+                int next = _chain[(int)(_basePos + (uint)candidate) & _chainMask] - 1;
+                if (next >= candidate) break;
+                candidate = next;
+            }
+            return best >= 3 ? best : 0;
+        }
+
+        private int RepLength(int pos, int available, uint rep) {
+            int d = (int)rep + 1;
+            if (d > pos) return 0;
+
+            int maxLen = Math.Min(available, MatchMaxLen);
+            int len = 0;
+            while (len < maxLen && _buffer[pos - d + len] == _buffer[pos + len]) len++;
+            return len;
+        }
+
+        #endregion
+
+        #region Symbols
+
+        /// <summary>
+        /// Encodes the symbol at the current position and advances past it.
+        /// </summary>
+        public void EncodeSymbol() {
+            int pos = _readPos;
+            int available = _writePos - pos;
+
+            int repLen = 0, repIndex = 0;
+            for (int i = 0; i < 4; i++) {
+                int len = RepLength(pos, available, i == 0 ? _rep0 : i == 1 ? _rep1 : i == 2 ? _rep2 : _rep3);
+                if (len > repLen) {
+                    repLen = len;
+                    repIndex = i;
+                }
+            }
+
+            if (repLen >= _niceLen) {
+                EncodeRep(pos, repIndex, repLen);
+                return;
+            }
+
+            int matchLen = FindMatch(pos, available, out uint matchDist);
+            if (repLen >= 2 && repLen + 1 >= matchLen) {
+                EncodeRep(pos, repIndex, repLen);
+                return;
+            }
+
+            if (matchLen >= 3) {
+                // defer to a longer match starting at the next byte
+                if (_lazy && matchLen < _niceLen && available > matchLen + 1) {
+                    int nextLen = FindMatch(pos + 1, available - 1, out uint nextDist);
+                    if (nextLen > matchLen + 1 || nextLen == matchLen + 1 && nextDist < matchDist) {
+                        EncodeLiteralOrShortRep(pos);
+                        return;
+                    }
+                }
+                EncodeMatch(pos, matchDist, matchLen);
+                return;
+            }
+
+            EncodeLiteralOrShortRep(pos);
+        }
+
+        private void EncodeLiteralOrShortRep(int pos) {
+            if (_state >= NumLitStates && pos > _rep0 && _buffer[pos] == _buffer[pos - (int)_rep0 - 1]) {
+                EncodeRep(pos, 0, 1);
+            } else {
+                EncodeLiteral(pos);
+            }
+        }
+
+        private int PosState(int pos) => (int)(_basePos + (uint)pos) & ((1 << _pb) - 1);
+
+        private void EncodeLiteral(int pos) {
+            ushort[] probs = _probs;
+            uint absolute = _basePos + (uint)pos;
+            Rc.EncodeBit(probs, IsMatch + (_state << 4) + PosState(pos), 0);
+
+            int prevByte = absolute > 0 ? _buffer[pos - 1] : 0;
+            int offset = Literal + 0x300 * ((((int)absolute & ((1 << _lp) - 1)) << _lc) + (prevByte >> (8 - _lc)));
+            int symbol = _buffer[pos];
+            if (_state >= NumLitStates) {
+                int matchByte = _buffer[pos - (int)_rep0 - 1];
+                int m = 1;
+                bool matched = true;
+                for (int i = 7; i >= 0; i--) {
+                    int bit = (symbol >> i) & 1;
+                    if (matched) {
+                        int matchBit = (matchByte >> i) & 1;
+                        Rc.EncodeBit(probs, offset + ((1 + matchBit) << 8) + m, bit);
+                        matched = matchBit == bit;
+                    } else {
+                        Rc.EncodeBit(probs, offset + m, bit);
+                    }
+                    m = (m << 1) | bit;
+                }
+            } else {
+                Rc.EncodeTree(probs, offset, 8, symbol);
+            }
+            _state = UpdateLiteral(_state);
+            _readPos++;
+        }
+
+        private void EncodeLength(int offset, int len, int posState) {
+            ushort[] probs = _probs;
+            if (len < 8) {
+                Rc.EncodeBit(probs, offset + LenChoice, 0);
+                Rc.EncodeTree(probs, offset + LenLow + posState * 8, 3, len);
+            } else if (len < 16) {
+                Rc.EncodeBit(probs, offset + LenChoice, 1);
+                Rc.EncodeBit(probs, offset + LenChoice2, 0);
+                Rc.EncodeTree(probs, offset + LenMid + posState * 8, 3, len - 8);
+            } else {
+                Rc.EncodeBit(probs, offset + LenChoice, 1);
+                Rc.EncodeBit(probs, offset + LenChoice2, 1);
+                Rc.EncodeTree(probs, offset + LenHigh, 8, len - 16);
+            }
+        }
+
+        private void EncodeDistance(uint dist, int len) {
+            ushort[] probs = _probs;
+            int posSlot = GetPosSlot(dist);
+            Rc.EncodeTree(probs, PosSlot + (Math.Min(len - MatchMinLen, 3) << 6), 6, posSlot);
+            if (posSlot < 4) return;
+
+            int footerBits = (posSlot >> 1) - 1;
+            uint baseDist = (uint)(2 | (posSlot & 1)) << footerBits;
+            uint reduced = dist - baseDist;
+            if (posSlot < EndPosModelIndex) {
+                Rc.EncodeReverseTree(probs, SpecPos + (int)baseDist - posSlot, footerBits, (int)reduced);
+            } else {
+                Rc.EncodeDirectBits(reduced >> NumAlignBits, footerBits - NumAlignBits);
+                Rc.EncodeReverseTree(probs, Align, NumAlignBits, (int)(reduced & ((1 << NumAlignBits) - 1)));
+            }
+        }
+
+        private void EncodeMatch(int pos, uint dist, int len) {
+            int posState = PosState(pos);
+            Rc.EncodeBit(_probs, IsMatch + (_state << 4) + posState, 1);
+            Rc.EncodeBit(_probs, IsRep + _state, 0);
+            EncodeLength(LenCoder, len - MatchMinLen, posState);
+            EncodeDistance(dist, len);
+
+            _rep3 = _rep2;
+            _rep2 = _rep1;
+            _rep1 = _rep0;
+            _rep0 = dist;
+            _state = _state < NumLitStates ? 7 : 10;
+            _readPos += len;
+        }
+
+        private void EncodeRep(int pos, int repIndex, int len) {
+            ushort[] probs = _probs;
+            int posState = PosState(pos);
+            Rc.EncodeBit(probs, IsMatch + (_state << 4) + posState, 1);
+            Rc.EncodeBit(probs, IsRep + _state, 1);
+            if (repIndex == 0) {
+                Rc.EncodeBit(probs, IsRepG0 + _state, 0);
+                Rc.EncodeBit(probs, IsRep0Long + (_state << 4) + posState, len == 1 ? 0 : 1);
+                if (len == 1) {
+                    _state = _state < NumLitStates ? 9 : 11;
+                    _readPos++;
+                    return;
+                }
+            } else {
+                Rc.EncodeBit(probs, IsRepG0 + _state, 1);
+                uint dist;
+                if (repIndex == 1) {
+                    Rc.EncodeBit(probs, IsRepG1 + _state, 0);
+                    dist = _rep1;
+                } else {
+                    Rc.EncodeBit(probs, IsRepG1 + _state, 1);
+                    Rc.EncodeBit(probs, IsRepG2 + _state, repIndex - 2);
+                    if (repIndex == 2) {
+                        dist = _rep2;
+                    } else {
+                        dist = _rep3;
+                        _rep3 = _rep2;
+                    }
+                    _rep2 = _rep1;
+                }
+                _rep1 = _rep0;
+                _rep0 = dist;
+            }
+            EncodeLength(RepLenCoder, len - MatchMinLen, posState);
+            _state = _state < NumLitStates ? 8 : 11;
+            _readPos += len;
+        }
+
+        /// <summary>
+        /// Encodes the end of payload marker: a match with the distance 0xFFFFFFFF.
+        /// </summary>
+        public void EncodeEndMarker() {
+            int posState = PosState(_readPos);
+            Rc.EncodeBit(_probs, IsMatch + (_state << 4) + posState, 1);
+            Rc.EncodeBit(_probs, IsRep + _state, 0);
+            EncodeLength(LenCoder, 0, posState);
+            EncodeDistance(uint.MaxValue, MatchMinLen);
+        }
+
+        #endregion
+    }
+
+    /// <summary>
+    /// Encoder of the LZ stage of a filter chain.
+    /// </summary>
+    internal abstract class LzEncoder {
+        public abstract void Write(ReadOnlySpan<byte> data, ByteQueue output);
+
+        public abstract void Finish(ByteQueue output);
+    }
+
+    /// <summary>
+    /// LZMA1 stream terminated by the end of payload marker, as written by liblzma for .lzma files and raw LZMA1.
+    /// </summary>
+    internal sealed class Lzma1Encoder : LzEncoder {
+        private readonly LzmaEncoder _lz;
+
+        public Lzma1Encoder(LzmaOptions options) {
+            _lz = new LzmaEncoder(options, 0);
+        }
+
+        public override void Write(ReadOnlySpan<byte> data, ByteQueue output) {
+            while (!data.IsEmpty) {
+                data = data.Slice(_lz.Append(data));
+                Encode(MatchMaxLen + 1);
+                Drain(output);
+            }
+        }
+
+        public override void Finish(ByteQueue output) {
+            Encode(0);
+            _lz.EncodeEndMarker();
+            _lz.Rc.Flush();
+            Drain(output);
+        }
+
+        private void Encode(int lookahead) {
+            while (_lz.Available > lookahead) {
+                _lz.EncodeSymbol();
+            }
+        }
+
+        private void Drain(ByteQueue output) {
+            output.Append(_lz.Rc.Buffer, 0, _lz.Rc.Count);
+            _lz.Rc.Count = 0;
+        }
+    }
+
+    /// <summary>
+    /// LZMA2 stream made of chunks of at most 2 MiB of input and 64 KiB of output. Chunks that do not
+    /// compress are stored.
+    /// </summary>
+    internal sealed class Lzma2Encoder : LzEncoder {
+        private const int ChunkUncompressedMax = 1 << 21;
+        private const int ChunkCompressedMax = 1 << 16;
+        private const int StoredChunkMax = 1 << 16;
+
+        // room left for the largest symbol and the range coder flush
+        private const int CompressedMargin = 64;
+
+        private readonly LzmaEncoder _lz;
+        private readonly byte _properties;
+        private bool _first = true;
+        private bool _needProperties = true;
+        private bool _needStateReset;
+        private bool _inChunk;
+
+        public Lzma2Encoder(LzmaOptions options) {
+            _lz = new LzmaEncoder(options, ChunkUncompressedMax + StoredChunkMax);
+            _properties = (byte)((options.Pb * 5 + options.Lp) * 9 + options.Lc);
+        }
+
+        public override void Write(ReadOnlySpan<byte> data, ByteQueue output) {
+            while (!data.IsEmpty) {
+                data = data.Slice(_lz.Append(data));
+                Encode(MatchMaxLen + 1, output);
+            }
+        }
+
+        public override void Finish(ByteQueue output) {
+            Encode(0, output);
+            if (_inChunk) FinishChunk(output);
+            output.Append(0x00);
+        }
+
+        private void Encode(int lookahead, ByteQueue output) {
+            while (_lz.Available > lookahead) {
+                if (!_inChunk) {
+                    if (_needStateReset) _lz.ResetState();
+                    _lz.Rc.Reset();
+                    _lz.KeepFrom = _lz.Position;
+                    _inChunk = true;
+                }
+
+                _lz.EncodeSymbol();
+
+                if (_lz.Position - _lz.KeepFrom >= ChunkUncompressedMax - MatchMaxLen
+                    || _lz.Rc.PendingSize >= ChunkCompressedMax - CompressedMargin) {
+                    FinishChunk(output);
+                }
+            }
+        }
+
+        private void FinishChunk(ByteQueue output) {
+            _lz.Rc.Flush();
+            int start = _lz.KeepFrom;
+            int uncompressed = _lz.Position - start;
+            int compressed = _lz.Rc.Count;
+            _inChunk = false;
+            _lz.KeepFrom = int.MaxValue;
+
+            if (compressed >= uncompressed) {
+                for (int offset = 0; offset < uncompressed; offset += StoredChunkMax) {
+                    int n = Math.Min(StoredChunkMax, uncompressed - offset);
+                    output.Append(_first ? (byte)0x01 : (byte)0x02);
+                    output.Append((byte)((n - 1) >> 8));
+                    output.Append((byte)(n - 1));
+                    output.Append(_lz.Buffer, start + offset, n);
+                    _first = false;
+                }
+                // the decoder did not see the symbols, so the next LZMA chunk starts from a clean state
+                _needStateReset = true;
+                return;
+            }
+
+            int control = _first ? 0xE0 : _needProperties ? 0xC0 : _needStateReset ? 0xA0 : 0x80;
+            output.Append((byte)(control | ((uncompressed - 1) >> 16)));
+            output.Append((byte)((uncompressed - 1) >> 8));
+            output.Append((byte)(uncompressed - 1));
+            output.Append((byte)((compressed - 1) >> 8));
+            output.Append((byte)(compressed - 1));
+            if (control >= 0xC0) output.Append(_properties);
+            output.Append(_lz.Rc.Buffer, 0, compressed);
+
+            _first = false;
+            _needProperties = false;
+            _needStateReset = false;
+        }
+    }
+}
@@ -0,0 +1,359 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using System;
+
+namespace IronPython.Modules.Lzma {
+    /// <summary>
+    /// Options of the LZMA1 and LZMA2 filters, see lzma_options_lzma in liblzma.
+    /// </summary>
+    internal sealed class LzmaOptions {
+        public const uint DictSizeMin = 4096;
+        public const uint DictSizeMax = 1536u << 20;
+
+        private static readonly byte[] PresetDictPow2 = { 18, 20, 21, 22, 22, 23, 23, 24, 25, 26 };
+        private static readonly byte[] PresetDepth = { 4, 8, 24, 48 };
+
+        public uint DictSize;
+        public int Lc = 3;
+        public int Lp = 0;
+        public int Pb = 2;
+        public int Mode;
+        public int NiceLen;
+        public int MatchFinder;
+        public int Depth;
+
+        /// <summary>
+        /// Creates the options of a compression preset, mirroring lzma_lzma_preset. Returns null for an invalid preset.
+        /// </summary>
+        public static LzmaOptions FromPreset(uint preset) {
+            uint level = preset & LzmaModule.PRESET_LEVEL_MASK;
+            if (level > 9 || (preset & ~(LzmaModule.PRESET_LEVEL_MASK | LzmaModule.PRESET_EXTREME)) != 0) return null;
+
+            var options = new LzmaOptions { DictSize = 1u << PresetDictPow2[level] };
+            if (level <= 3) {
+                options.Mode = LzmaModule.MODE_FAST;
+                options.MatchFinder = level == 0 ? LzmaModule.MF_HC3 : LzmaModule.MF_HC4;
+                options.NiceLen = level <= 1 ? 128 : 273;
+                options.Depth = PresetDepth[level];
+            } else {
+                options.Mode = LzmaModule.MODE_NORMAL;
+                options.MatchFinder = LzmaModule.MF_BT4;
+                options.NiceLen = level == 4 ? 16 : level == 5 ? 32 : 64;
+                options.Depth = 0;
+            }
+
+            if ((preset & LzmaModule.PRESET_EXTREME) != 0) {
+                options.Mode = LzmaModule.MODE_NORMAL;
+                options.MatchFinder = LzmaModule.MF_BT4;
+                if (level == 3 || level == 5) {
+                    options.NiceLen = 192;
+                    options.Depth = 0;
+                } else {
+                    options.NiceLen = 273;
+                    options.Depth = 512;
+                }
+            }
+            return options;
+        }
+
+        public bool IsValid(bool lzma2) {
+            return DictSize >= DictSizeMin && DictSize <= DictSizeMax
+                && Lc >= 0 && Lc <= 8 && Lp >= 0 && Lp <= 4 && Pb >= 0 && Pb <= 4
+                && (!lzma2 || Lc + Lp <= 4)
+                && (Mode == LzmaModule.MODE_FAST || Mode == LzmaModule.MODE_NORMAL)
+                && NiceLen >= 2 && NiceLen <= LzmaProbs.MatchMaxLen
+                && (MatchFinder == LzmaModule.MF_HC3 || MatchFinder == LzmaModule.MF_HC4
+                    || MatchFinder == LzmaModule.MF_BT2 || MatchFinder == LzmaModule.MF_BT3 || MatchFinder == LzmaModule.MF_BT4)
+                && Depth >= 0;
+        }
+
+        /// <summary>
+        /// The single byte LZMA2 encoding of the dictionary size, rounded up to the next 2^n or 2^n + 2^(n-1).
+        /// </summary>
+        public byte EncodeDictSize() {
+            uint d = Math.Max(DictSize, DictSizeMin) - 1;
+            d |= d >> 2;
+            d |= d >> 3;
+            d |= d >> 4;
+            d |= d >> 8;
+            d |= d >> 16;
+            if (d == uint.MaxValue) return 40;
+            return (byte)(LzmaProbs.GetPosSlot(d + 1) - 24);
+        }
+
+        public static uint DecodeDictSize(byte value) {
+            if (value == 40) return uint.MaxValue;
+            return (2u | (value & 1u)) << (value / 2 + 11);
+        }
+    }
+
+    /// <summary>
+    /// A filter of a filter chain as given by a filter specifier or read from an .xz block header.
+    /// </summary>
+    internal sealed class FilterSpec {
+        public ulong Id;
+        public LzmaOptions Lzma;
+        public int Distance = 1;
+        public uint StartOffset;
+
+        public bool IsLzma => Id == LzmaModule.FILTER_LZMA1_ID || Id == LzmaModule.FILTER_LZMA2;
+
+        public FilterCoder CreateCoder(bool encoding) {
+            switch (Id) {
+                case LzmaModule.FILTER_DELTA:
+                    return new DeltaCoder(Distance, encoding);
+                default:
+                    return new BranchCoder((int)Id, StartOffset, encoding);
+            }
+        }
+    }
+
+    /// <summary>
+    /// A non-LZ filter transforming data in place.
+    /// </summary>
+    internal abstract class FilterCoder {
+        /// <summary>
+        /// Filters the buffer in place and returns how many leading bytes are final. The remaining bytes must be
+        /// passed again together with the following data, unless <paramref name="final"/> is set.
+        /// </summary>
+        public abstract int Code(byte[] buffer, int offset, int count, bool final);
+    }
+
+    /// <summary>
+    /// Delta filter: every byte is stored as the difference to the byte <c>distance</c> positions before.
+    /// </summary>
+    internal sealed class DeltaCoder : FilterCoder {
+        private readonly byte[] _history = new byte[256];
+        private readonly int _distance;
+        private readonly bool _encoding;
+        private byte _pos;
+
+        public DeltaCoder(int distance, bool encoding) {
+            _distance = distance;
+            _encoding = encoding;
+        }
+
+        public override int Code(byte[] buffer, int offset, int count, bool final) {
+            byte[] history = _history;
+            for (int i = offset; i < offset + count; i++) {
+                byte previous = history[(byte)(_distance + _pos)];
+                if (_encoding) {
+                    history[_pos--] = buffer[i];
+                    buffer[i] -= previous;
+                } else {
+                    buffer[i] += previous;
+                    history[_pos--] = buffer[i];
+                }
+            }
+            return count;
+        }
+    }
+
+    /// <summary>
+    /// Branch/call/jump (BCJ) filters converting relative branch targets of executable code to absolute ones,
+    /// ported from liblzma's simple filters.
+    /// </summary>
+    internal sealed class BranchCoder : FilterCoder {
+        private static readonly bool[] X86MaskToAllowed = { true, true, true, false, true, false, false, false };
+        private static readonly int[] X86MaskToBitNumber = { 0, 1, 2, 2, 3, 3, 3, 3 };
+
+        private readonly int _id;
+        private readonly bool _encoding;
+        private uint _nowPos;
+
+        // x86 state
+        private uint _prevMask;
+        private uint _prevPos = unchecked((uint)-5);
+
+        public BranchCoder(int id, uint startOffset, bool encoding) {
+            _id = id;
+            _nowPos = startOffset;
+            _encoding = encoding;
+        }
+
+        public static bool IsSupported(ulong id) {
+            return id == LzmaModule.FILTER_X86 || id == LzmaModule.FILTER_POWERPC || id == LzmaModule.FILTER_ARM
+                || id == LzmaModule.FILTER_ARMTHUMB || id == LzmaModule.FILTER_SPARC;
+        }
+
+        public override int Code(byte[] buffer, int offset, int count, bool final) {
+            int done;
+            switch (_id) {
+                case LzmaModule.FILTER_X86: done = X86(buffer, offset, count); break;
+                case LzmaModule.FILTER_POWERPC: done = PowerPC(buffer, offset, count); break;
+                case LzmaModule.FILTER_ARM: done = Arm(buffer, offset, count); break;
+                case LzmaModule.FILTER_ARMTHUMB: done = ArmThumb(buffer, offset, count); break;
+                case LzmaModule.FILTER_SPARC: done = Sparc(buffer, offset, count); break;
+                default: throw new InvalidOperationException();
+            }
+            _nowPos += (uint)done;
+
+            // a trailing partial instruction is passed through unchanged at the end of the stream
+            return final ? count : done;
+        }
+
+        private static bool Test86MSByte(byte b) => b == 0 || b == 0xFF;
+
+        private int X86(byte[] buffer, int offset, int size) {
+            if (size < 5) return 0;
+
+            uint nowPos = _nowPos;
+            uint prevMask = _prevMask;
+            uint prevPos = _prevPos;
+            if (nowPos - prevPos > 5) prevPos = nowPos - 5;
+
+            int limit = size - 5;
+            int i = 0;
+            while (i <= limit) {
+                byte b = buffer[offset + i];
+                if (b != 0xE8 && b != 0xE9) {
+                    i++;
+                    continue;
+                }
+
+                uint delta = nowPos + (uint)i - prevPos;
+                prevPos = nowPos + (uint)i;
+                if (delta > 5) {
+                    prevMask = 0;
+                } else {
+                    for (uint k = 0; k < delta; k++) {
+                        prevMask &= 0x77;
+                        prevMask <<= 1;
+                    }
+                }
+
+                b = buffer[offset + i + 4];
+                if (Test86MSByte(b) && X86MaskToAllowed[(prevMask >> 1) & 0x7] && (prevMask >> 1) < 0x10) {
+                    uint src = (uint)b << 24 | (uint)buffer[offset + i + 3] << 16 | (uint)buffer[offset + i + 2] << 8 | buffer[offset + i + 1];
+                    uint dest;
+                    while (true) {
+                        dest = _encoding ? src + (nowPos + (uint)i + 5) : src - (nowPos + (uint)i + 5);
+                        if (prevMask == 0) break;
+
+                        int index = X86MaskToBitNumber[prevMask >> 1];
+                        b = (byte)(dest >> (24 - index * 8));
+                        if (!Test86MSByte(b)) break;
+                        src = dest ^ ((1u << (32 - index * 8)) - 1);
+                    }
+
+                    buffer[offset + i + 4] = (byte)~(((dest >> 24) & 1) - 1);
+                    buffer[offset + i + 3] = (byte)(dest >> 16);
+                    buffer[offset + i + 2] = (byte)(dest >> 8);
+                    buffer[offset + i + 1] = (byte)dest;
+                    i += 5;
+                    prevMask = 0;
+                } else {
+                    i++;
+                    prevMask |= 1;
+                    if (Test86MSByte(b)) prevMask |= 0x10;
+                }
+            }
+
+            _prevMask = prevMask;
+            _prevPos = prevPos;
+            return i;
+        }
+
+        private int PowerPC(byte[] buffer, int offset, int size) {
+            int i;
+            for (i = 0; i + 4 <= size; i += 4) {
+                int p = offset + i;
+                if ((buffer[p] >> 2) == 0x12 && (buffer[p + 3] & 3) == 1) {
+                    uint src = (uint)(buffer[p] & 3) << 24 | (uint)buffer[p + 1] << 16 | (uint)buffer[p + 2] << 8 | (uint)(buffer[p + 3] & ~3);
+                    uint dest = _encoding ? _nowPos + (uint)i + src : src - (_nowPos + (uint)i);
+                    buffer[p] = (byte)(0x48 | ((dest >> 24) & 0x03));
+                    buffer[p + 1] = (byte)(dest >> 16);
+                    buffer[p + 2] = (byte)(dest >> 8);
+                    buffer[p + 3] = (byte)((buffer[p + 3] & 0x03) | (dest & 0xFC));
+                }
+            }
+            return i;
+        }
+
+        private int Arm(byte[] buffer, int offset, int size) {
+            int i;
+            for (i = 0; i + 4 <= size; i += 4) {
+                int p = offset + i;
+                if (buffer[p + 3] == 0xEB) {
+                    uint src = ((uint)buffer[p + 2] << 16 | (uint)buffer[p + 1] << 8 | buffer[p]) << 2;
+                    uint dest = _encoding ? src + (_nowPos + (uint)i + 8) : src - (_nowPos + (uint)i + 8);
+                    dest >>= 2;
+                    buffer[p + 2] = (byte)(dest >> 16);
+                    buffer[p + 1] = (byte)(dest >> 8);
+                    buffer[p] = (byte)dest;
+                }
+            }
+            return i;
+        }
+
+        private int ArmThumb(byte[] buffer, int offset, int size) {
+            int i;
+            for (i = 0; i + 4 <= size; i += 2) {
+                int p = offset + i;
+                if ((buffer[p + 1] & 0xF8) == 0xF0 && (buffer[p + 3] & 0xF8) == 0xF8) {
+                    uint src = ((uint)(buffer[p + 1] & 7) << 19 | (uint)buffer[p] << 11 | (uint)(buffer[p + 3] & 7) << 8 | buffer[p + 2]) << 1;
+                    uint dest = _encoding ? src + (_nowPos + (uint)i + 4) : src - (_nowPos + (uint)i + 4);
+                    dest >>= 1;
+                    buffer[p + 1] = (byte)(0xF0 | ((dest >> 19) & 0x7));
+                    buffer[p] = (byte)(dest >> 11);
+                    buffer[p + 3] = (byte)(0xF8 | ((dest >> 8) & 0x7));
+                    buffer[p + 2] = (byte)dest;
+                    i += 2;
+                }
+            }
+            return i;
+        }
+
+        private int Sparc(byte[] buffer, int offset, int size) {
+            int i;
+            for (i = 0; i + 4 <= size; i += 4) {
+                int p = offset + i;
+                if ((buffer[p] == 0x40 && (buffer[p + 1] & 0xC0) == 0x00) || (buffer[p] == 0x7F && (buffer[p + 1] & 0xC0) == 0xC0)) {
+                    uint src = ((uint)buffer[p] << 24 | (uint)buffer[p + 1] << 16 | (uint)buffer[p + 2] << 8 | buffer[p + 3]) << 2;
+                    uint dest = _encoding ? _nowPos + (uint)i + src : src - (_nowPos + (uint)i);
+                    dest >>= 2;
+                    dest = (((0 - ((dest >> 22) & 1)) << 22) & 0x3FFFFFFF) | (dest & 0x3FFFFF) | 0x40000000;
+                    buffer[p] = (byte)(dest >> 24);
+                    buffer[p + 1] = (byte)(dest >> 16);
+                    buffer[p + 2] = (byte)(dest >> 8);
+                    buffer[p + 3] = (byte)dest;
+                }
+            }
+            return i;
+        }
+    }
+
+    /// <summary>
+    /// Runs data through a sequence of filters, holding back bytes a filter cannot process yet.
+    /// </summary>
+    internal sealed class FilterChain {
+        private readonly FilterCoder[] _coders;
+        private readonly ByteQueue[] _held;
+
+        public FilterChain(FilterCoder[] coders) {
+            _coders = coders;
+            _held = new ByteQueue[coders.Length];
+            for (int i = 0; i < _held.Length; i++) {
+                _held[i] = new ByteQueue();
+            }
+        }
+
+        public void Run(ReadOnlySpan<byte> data, ByteQueue output, bool final) {
+            if (_coders.Length == 0) {
+                output.Append(data);
+                return;
+            }
+
+            _held[0].Append(data);
+            for (int i = 0; i < _coders.Length; i++) {
+                ByteQueue held = _held[i];
+                int n = _coders[i].Code(held.Array, held.Start, held.Length, final);
+                ByteQueue next = i + 1 < _coders.Length ? _held[i + 1] : output;
+                next.Append(held.Array, held.Start, n);
+                held.Skip(n);
+            }
+        }
+    }
+}
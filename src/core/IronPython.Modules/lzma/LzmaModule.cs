@@ -0,0 +1,261 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Numerics;
+using System.Runtime.CompilerServices;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Exceptions;
+using IronPython.Runtime.Operations;
+using IronPython.Runtime.Types;
+
+using Microsoft.Scripting.Runtime;
+
+[assembly: PythonModule("_lzma", typeof(IronPython.Modules.Lzma.LzmaModule))]
+
+namespace IronPython.Modules.Lzma {
+    /// <summary>
+    /// Managed implementation of the .xz, .lzma and raw LZMA formats of liblzma.
+    /// </summary>
+    public static partial class LzmaModule {
+        public const int CHECK_NONE = 0;
+        public const int CHECK_CRC32 = 1;
+        public const int CHECK_CRC64 = 4;
+        public const int CHECK_SHA256 = 10;
+        public const int CHECK_ID_MAX = 15;
+        public const int CHECK_UNKNOWN = 16;
+
+        internal const ulong FILTER_LZMA1_ID = 0x4000000000000001;
+        public static readonly BigInteger FILTER_LZMA1 = FILTER_LZMA1_ID;
+        public const int FILTER_LZMA2 = 0x21;
+        public const int FILTER_DELTA = 0x03;
+        public const int FILTER_X86 = 0x04;
+        public const int FILTER_POWERPC = 0x05;
+        public const int FILTER_IA64 = 0x06;
+        public const int FILTER_ARM = 0x07;
+        public const int FILTER_ARMTHUMB = 0x08;
+        public const int FILTER_SPARC = 0x09;
+
+        public const int FORMAT_AUTO = 0;
+        public const int FORMAT_XZ = 1;
+        public const int FORMAT_ALONE = 2;
+        public const int FORMAT_RAW = 3;
+
+        public const int MF_HC3 = 0x03;
+        public const int MF_HC4 = 0x04;
+        public const int MF_BT2 = 0x12;
+        public const int MF_BT3 = 0x13;
+        public const int MF_BT4 = 0x14;
+
+        public const int MODE_FAST = 1;
+        public const int MODE_NORMAL = 2;
+
+        public const int PRESET_DEFAULT = 6;
+        public const uint PRESET_EXTREME = 0x80000000;
+        internal const uint PRESET_LEVEL_MASK = 0x1F;
+
+        [SpecialName]
+        public static void PerformModuleReload(PythonContext context, PythonDictionary dict) {
+            LZMAError = context.EnsureModuleException("_lzma.LZMAError", PythonExceptions.Exception, dict, "LZMAError", "_lzma");
+        }
+
+        public static PythonType LZMAError;
+
+        #region Errors
+
+        internal static Exception MakeError(string message) => PythonOps.CreateThrowable(LZMAError, message);
+
+        internal static Exception DataError() => MakeError("Corrupt input data");
+
+        internal static Exception FormatError() => MakeError("Input format not supported by decoder");
+
+        internal static Exception OptionsError() => MakeError("Invalid or unsupported options");
+
+        internal static Exception MemoryLimitError() => MakeError("Memory usage limit exceeded");
+
+        internal static Exception UnsupportedCheckError() => MakeError("Unsupported integrity check");
+
+        internal static Exception InternalError() => MakeError("Internal error");
+
+        #endregion
+
+        [Documentation(@"Test whether the given integrity check is supported.
+
+Always returns True for CHECK_NONE and CHECK_CRC32.")]
+        public static bool is_check_supported(int check_id) => IntegrityCheck.IsSupported(check_id);
+
+        [Documentation(@"Return a bytes object encoding the options (properties) of the filter specified by *filter* (a dict).
+
+The result does not include the filter ID itself, only the options.")]
+        public static Bytes _encode_filter_properties(object filter) {
+            FilterSpec spec = ParseFilterSpec(filter);
+            ValidateFilter(spec, last: spec.IsLzma);
+            return Bytes.Make(XzFormat.EncodeProperties(spec));
+        }
+
+        [Documentation(@"Return a dict describing a filter with ID *filter_id*, and options (properties) decoded from the bytes object *encoded_props*.")]
+        public static PythonDictionary _decode_filter_properties(object filter_id, [NotNone] IBufferProtocol encoded_props) {
+            ulong id = ParseFilterId(filter_id);
+
+            using var buffer = encoded_props.GetBuffer();
+            var props = buffer.AsReadOnlySpan();
+            FilterSpec spec = XzFormat.DecodeProperties(id, props);
+
+            var res = new PythonDictionary();
+            res["id"] = ToPython(id);
+            switch (id) {
+                case FILTER_LZMA1_ID:
+                    res["lc"] = spec.Lzma.Lc;
+                    res["lp"] = spec.Lzma.Lp;
+                    res["pb"] = spec.Lzma.Pb;
+                    res["dict_size"] = ToPython(spec.Lzma.DictSize);
+                    break;
+                case FILTER_LZMA2:
+                    res["dict_size"] = ToPython(spec.Lzma.DictSize);
+                    break;
+                case FILTER_DELTA:
+                    res["dist"] = spec.Distance;
+                    break;
+                default:
+                    if (props.Length != 0) res["start_offset"] = ToPython(spec.StartOffset);
+                    break;
+            }
+            return res;
+        }
+
+        #region Filter specifiers
+
+        private static object ToPython(ulong value) => value <= int.MaxValue ? (object)(int)value : (BigInteger)value;
+
+        private static ulong ParseFilterId(object value) {
+            if (!PythonOps.TryToIndex(value, out BigInteger id)) throw PythonOps.TypeError("an integer is required");
+            if (id < 0 || id > ulong.MaxValue) throw PythonOps.OverflowError("filter ID out of range");
+            return (ulong)id;
+        }
+
+        /// <summary>
+        /// Converts a filter specifier, a dict with an "id" entry and the options of the filter.
+        /// </summary>
+        private static FilterSpec ParseFilterSpec(object spec) {
+            if (!(spec is IDictionary<object, object> dict)) throw PythonOps.TypeError("Filter specifier must be a dict or dict-like object");
+            if (!dict.TryGetValue("id", out object idObj)) throw PythonOps.ValueError("Filter specifier must have an \"id\" entry");
+
+            var filter = new FilterSpec { Id = ParseFilterId(idObj) };
+            switch (filter.Id) {
+                case FILTER_LZMA1_ID:
+                case FILTER_LZMA2:
+                    uint preset = PRESET_DEFAULT;
+                    if (dict.TryGetValue("preset", out object presetObj) && !TryGetUInt32(presetObj, out preset)) {
+                        throw PythonOps.ValueError("Invalid filter specifier for LZMA filter");
+                    }
+                    filter.Lzma = LzmaOptions.FromPreset(preset) ?? throw MakeError($"Invalid compression preset: {preset}");
+
+                    foreach (var pair in dict) {
+                        if (Equals(pair.Key, "id")) continue;
+                        if (!(pair.Key is string key) || !TryGetUInt32(pair.Value, out uint value)) {
+                            throw PythonOps.ValueError("Invalid filter specifier for LZMA filter");
+                        }
+                        int clamped = (int)Math.Min(value, int.MaxValue);
+                        switch (key) {
+                            case "preset": break;
+                            case "dict_size": filter.Lzma.DictSize = value; break;
+                            case "lc": filter.Lzma.Lc = clamped; break;
+                            case "lp": filter.Lzma.Lp = clamped; break;
+                            case "pb": filter.Lzma.Pb = clamped; break;
+                            case "mode": filter.Lzma.Mode = clamped; break;
+                            case "nice_len": filter.Lzma.NiceLen = clamped; break;
+                            case "mf": filter.Lzma.MatchFinder = clamped; break;
+                            case "depth": filter.Lzma.Depth = clamped; break;
+                            default: throw PythonOps.ValueError("Invalid filter specifier for LZMA filter");
+                        }
+                    }
+                    break;
+
+                case FILTER_DELTA:
+                    foreach (var pair in dict) {
+                        if (Equals(pair.Key, "id")) continue;
+                        if (!(pair.Key is string key) || !TryGetUInt32(pair.Value, out uint value)) {
+                            throw PythonOps.ValueError("Invalid filter specifier for delta filter");
+                        }
+                        switch (key) {
+                            case "dist": filter.Distance = (int)Math.Min(value, int.MaxValue); break;
+                            default: throw PythonOps.ValueError("Invalid filter specifier for delta filter");
+                        }
+                    }
+                    break;
+
+                case FILTER_X86:
+                case FILTER_POWERPC:
+                case FILTER_IA64:
+                case FILTER_ARM:
+                case FILTER_ARMTHUMB:
+                case FILTER_SPARC:
+                    foreach (var pair in dict) {
+                        if (Equals(pair.Key, "id")) continue;
+                        if (!(pair.Key is string key) || !TryGetUInt32(pair.Value, out uint value)) {
+                            throw PythonOps.ValueError("Invalid filter specifier for BCJ filter");
+                        }
+                        switch (key) {
+                            case "start_offset": filter.StartOffset = value; break;
+                            default: throw PythonOps.ValueError("Invalid filter specifier for BCJ filter");
+                        }
+                    }
+                    break;
+
+                default:
+                    throw PythonOps.ValueError("Invalid filter ID: {0}", filter.Id);
+            }
+            return filter;
+        }
+
+        private static bool TryGetUInt32(object value, out uint result) {
+            if (PythonOps.TryToIndex(value, out BigInteger bi) && bi >= 0 && bi <= uint.MaxValue) {
+                result = (uint)bi;
+                return true;
+            }
+            result = 0;
+            return false;
+        }
+
+        /// <summary>
+        /// Converts a sequence of filter specifiers into a validated filter chain.
+        /// </summary>
+        internal static FilterSpec[] ParseFilterChain(object filters) {
+            var chain = new List<FilterSpec>();
+            var enumerator = PythonOps.GetEnumerator(filters);
+            while (enumerator.MoveNext()) {
+                if (chain.Count == XzFormat.MaxFilters) {
+                    throw PythonOps.ValueError("Too many filters - liblzma supports a maximum of {0}", XzFormat.MaxFilters);
+                }
+                chain.Add(ParseFilterSpec(enumerator.Current));
+            }
+
+            if (chain.Count == 0) throw InternalError();
+            for (int i = 0; i < chain.Count; i++) {
+                ValidateFilter(chain[i], last: i == chain.Count - 1);
+            }
+            return chain.ToArray();
+        }
+
+        /// <summary>
+        /// Checks the options of a filter; LZ filters must come last in a chain and only there.
+        /// </summary>
+        private static void ValidateFilter(FilterSpec filter, bool last) {
+            bool valid;
+            if (filter.IsLzma) {
+                valid = last && filter.Lzma.IsValid(lzma2: filter.Id == FILTER_LZMA2);
+            } else if (filter.Id == FILTER_DELTA) {
+                valid = !last && filter.Distance >= 1 && filter.Distance <= 256;
+            } else {
+                // the IA64 branch converter is not implemented
+                valid = !last && BranchCoder.IsSupported(filter.Id);
+            }
+            if (!valid) throw OptionsError();
+        }
+
+        #endregion
+    }
+}
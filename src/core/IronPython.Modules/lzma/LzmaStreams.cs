@@ -0,0 +1,483 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Buffers.Binary;
+using System.Collections.Generic;
+using System.Security.Cryptography;
+
+namespace IronPython.Modules.Lzma {
+    #region Integrity checks
+
+    /// <summary>
+    /// Integrity check of the uncompressed data of an .xz block.
+    /// </summary>
+    internal abstract class IntegrityCheck {
+        private static readonly byte[] Sizes = { 0, 4, 4, 4, 8, 8, 8, 16, 16, 16, 32, 32, 32, 64, 64, 64 };
+
+        public static int Size(int check) => Sizes[check];
+
+        public static bool IsSupported(int check) {
+            return check == LzmaModule.CHECK_NONE || check == LzmaModule.CHECK_CRC32
+                || check == LzmaModule.CHECK_CRC64 || check == LzmaModule.CHECK_SHA256;
+        }
+
+        /// <summary>
+        /// Creates the check, or returns null for <see cref="LzmaModule.CHECK_NONE"/> and checks that cannot be verified.
+        /// </summary>
+        public static IntegrityCheck Create(int check) {
+            switch (check) {
+                case LzmaModule.CHECK_CRC32: return new Crc32Check();
+                case LzmaModule.CHECK_CRC64: return new Crc64Check();
+                case LzmaModule.CHECK_SHA256: return new Sha256Check();
+                default: return null;
+            }
+        }
+
+        public abstract void Update(ReadOnlySpan<byte> data);
+
+        public abstract byte[] Finish();
+
+        private sealed class Crc32Check : IntegrityCheck {
+            private uint _crc;
+
+            public override void Update(ReadOnlySpan<byte> data) {
+                _crc = PythonBinaryAscii.crc32(data, _crc);
+            }
+
+            public override byte[] Finish() {
+                var res = new byte[4];
+                BinaryPrimitives.WriteUInt32LittleEndian(res, _crc);
+                return res;
+            }
+        }
+
+        private sealed class Crc64Check : IntegrityCheck {
+            private static readonly ulong[] Table = MakeTable();
+
+            private ulong _crc = ulong.MaxValue;
+
+            private static ulong[] MakeTable() {
+                var table = new ulong[256];
+                for (uint i = 0; i < 256; i++) {
+                    ulong remainder = i;
+                    for (int j = 0; j < 8; j++) {
+                        remainder = (remainder & 1) != 0 ? (remainder >> 1) ^ 0xC96C5795D7870F42UL : remainder >> 1;
+                    }
+                    table[i] = remainder;
+                }
+                return table;
+            }
+
+            public override void Update(ReadOnlySpan<byte> data) {
+                ulong crc = _crc;
+                foreach (byte b in data) {
+                    crc = Table[(byte)crc ^ b] ^ (crc >> 8);
+                }
+                _crc = crc;
+            }
+
+            public override byte[] Finish() {
+                var res = new byte[8];
+                BinaryPrimitives.WriteUInt64LittleEndian(res, ~_crc);
+                return res;
+            }
+        }
+
+        private sealed class Sha256Check : IntegrityCheck {
+            private readonly SHA256 _hasher = SHA256.Create();
+
+            public override void Update(ReadOnlySpan<byte> data) {
+                byte[] bytes = data.ToArray();
+                _hasher.TransformBlock(bytes, 0, bytes.Length, null, 0);
+            }
+
+            public override byte[] Finish() {
+                _hasher.TransformFinalBlock(Array.Empty<byte>(), 0, 0);
+                return _hasher.Hash;
+            }
+        }
+    }
+
+    #endregion
+
+    #region Encoders
+
+    internal abstract class StreamEncoder {
+        public abstract void Write(ReadOnlySpan<byte> data, ByteQueue output);
+
+        public abstract void Finish(ByteQueue output);
+    }
+
+    /// <summary>
+    /// Filter chain without any container (FORMAT_RAW).
+    /// </summary>
+    internal sealed class RawEncoder : StreamEncoder {
+        private readonly FilterChain _chain;
+        private readonly LzEncoder _lz;
+        private readonly ByteQueue _filtered = new ByteQueue();
+
+        public RawEncoder(FilterSpec[] filters) {
+            var coders = new FilterCoder[filters.Length - 1];
+            for (int i = 0; i < coders.Length; i++) {
+                coders[i] = filters[i].CreateCoder(encoding: true);
+            }
+            _chain = new FilterChain(coders);
+
+            FilterSpec last = filters[filters.Length - 1];
+            _lz = last.Id == LzmaModule.FILTER_LZMA2 ? new Lzma2Encoder(last.Lzma) : (LzEncoder)new Lzma1Encoder(last.Lzma);
+        }
+
+        public override void Write(ReadOnlySpan<byte> data, ByteQueue output) {
+            _chain.Run(data, _filtered, final: false);
+            _lz.Write(_filtered.Span, output);
+            _filtered.Clear();
+        }
+
+        public override void Finish(ByteQueue output) {
+            _chain.Run(ReadOnlySpan<byte>.Empty, _filtered, final: true);
+            _lz.Write(_filtered.Span, output);
+            _filtered.Clear();
+            _lz.Finish(output);
+        }
+    }
+
+    /// <summary>
+    /// .lzma container (FORMAT_ALONE): LZMA1 properties, dictionary size and an unknown uncompressed size.
+    /// </summary>
+    internal sealed class AloneEncoder : StreamEncoder {
+        private readonly LzmaOptions _options;
+        private readonly Lzma1Encoder _lz;
+        private bool _started;
+
+        public AloneEncoder(LzmaOptions options) {
+            _options = options;
+            _lz = new Lzma1Encoder(options);
+        }
+
+        public override void Write(ReadOnlySpan<byte> data, ByteQueue output) {
+            if (!_started) {
+                _started = true;
+                output.Append(XzFormat.EncodeLzma1Properties(_options));
+                for (int i = 0; i < 8; i++) {
+                    output.Append(0xFF);
+                }
+            }
+            _lz.Write(data, output);
+        }
+
+        public override void Finish(ByteQueue output) {
+            Write(ReadOnlySpan<byte>.Empty, output);
+            _lz.Finish(output);
+        }
+    }
+
+    /// <summary>
+    /// .xz container (FORMAT_XZ) holding the whole input in a single block.
+    /// </summary>
+    internal sealed class XzEncoder : StreamEncoder {
+        private readonly FilterSpec[] _filters;
+        private readonly int _check;
+        private readonly IntegrityCheck _hasher;
+        private RawEncoder _block;
+        private bool _started;
+        private int _headerSize;
+        private long _compressed;
+        private long _uncompressed;
+
+        public XzEncoder(FilterSpec[] filters, int check) {
+            _filters = filters;
+            _check = check;
+            _hasher = IntegrityCheck.Create(check);
+        }
+
+        public override void Write(ReadOnlySpan<byte> data, ByteQueue output) {
+            if (!_started) {
+                _started = true;
+                XzFormat.WriteStreamHeader(output, _check);
+            }
+            if (data.IsEmpty) return;
+
+            // like liblzma, the block is only started once there is data to put in it
+            if (_block is null) {
+                _block = new RawEncoder(_filters);
+                int before = output.Length;
+                XzFormat.WriteBlockHeader(output, _filters);
+                _headerSize = output.Length - before;
+            }
+
+            _hasher?.Update(data);
+            _uncompressed += data.Length;
+
+            int length = output.Length;
+            _block.Write(data, output);
+            _compressed += output.Length - length;
+        }
+
+        public override void Finish(ByteQueue output) {
+            Write(ReadOnlySpan<byte>.Empty, output);
+
+            var records = new List<(long, long)>();
+            if (_block != null) {
+                int length = output.Length;
+                _block.Finish(output);
+                _compressed += output.Length - length;
+
+                for (long i = _compressed; (i & 3) != 0; i++) {
+                    output.Append(0);
+                }
+                if (_hasher != null) output.Append(_hasher.Finish());
+
+                records.Add((_headerSize + _compressed + IntegrityCheck.Size(_check), _uncompressed));
+            }
+
+            int indexSize = XzFormat.WriteIndex(output, records);
+            XzFormat.WriteStreamFooter(output, _check, indexSize);
+        }
+    }
+
+    #endregion
+
+    #region Decoders
+
+    internal abstract class StreamDecoder {
+        /// <summary>The integrity check of the stream, or <see cref="LzmaModule.CHECK_UNKNOWN"/> until known.</summary>
+        public int Check = LzmaModule.CHECK_NONE;
+
+        /// <summary>
+        /// Consumes input and appends roughly at most <paramref name="maxOutput"/> bytes to the output (filters may
+        /// release a few held back bytes more). Returns true once the end of the stream has been reached.
+        /// </summary>
+        public abstract bool Decode(ByteQueue input, ByteQueue output, int maxOutput);
+    }
+
+    /// <summary>
+    /// Filter chain without any container (FORMAT_RAW); also decodes the data of .xz blocks.
+    /// </summary>
+    internal sealed class RawDecoder : StreamDecoder {
+        private readonly LzDecoder _lz;
+        private readonly FilterChain _chain;
+        private readonly ByteQueue _decoded = new ByteQueue();
+
+        public RawDecoder(FilterSpec[] filters) {
+            // the filters are undone in reverse order
+            var coders = new FilterCoder[filters.Length - 1];
+            for (int i = 0; i < coders.Length; i++) {
+                coders[i] = filters[coders.Length - 1 - i].CreateCoder(encoding: false);
+            }
+            _chain = new FilterChain(coders);
+
+            FilterSpec last = filters[filters.Length - 1];
+            _lz = last.Id == LzmaModule.FILTER_LZMA2 ? new Lzma2Decoder(last.Lzma.DictSize) : (LzDecoder)new Lzma1Decoder(last.Lzma);
+        }
+
+        public override bool Decode(ByteQueue input, ByteQueue output, int maxOutput) {
+            bool finished = _lz.Decode(input, _decoded, maxOutput);
+            _chain.Run(_decoded.Span, output, finished);
+            _decoded.Clear();
+            return finished;
+        }
+    }
+
+    /// <summary>
+    /// .lzma container (FORMAT_ALONE).
+    /// </summary>
+    internal sealed class AloneDecoder : StreamDecoder {
+        private const int HeaderSize = 13;
+
+        private readonly bool _picky;
+        private readonly ulong _memlimit;
+        private Lzma1Decoder _lz;
+
+        /// <param name="picky">Reject unusual headers, used when the format is guessed.</param>
+        public AloneDecoder(ulong memlimit, bool picky) {
+            _memlimit = memlimit;
+            _picky = picky;
+        }
+
+        public override bool Decode(ByteQueue input, ByteQueue output, int maxOutput) {
+            if (_lz is null) {
+                if (input.Length < HeaderSize) return false;
+
+                var header = input.Span.Slice(0, HeaderSize);
+                LzmaOptions options = XzFormat.DecodeLzma1Properties(header.Slice(0, 5));
+                if (options is null) throw LzmaModule.FormatError();
+
+                ulong size = BinaryPrimitives.ReadUInt64LittleEndian(header.Slice(5));
+                if (_picky) {
+                    // the dictionary size must be 2^n or 2^n + 2^(n-1) and the size must be sane
+                    uint d = options.DictSize - 1;
+                    d |= d >> 2;
+                    d |= d >> 3;
+                    d |= d >> 4;
+                    d |= d >> 8;
+                    d |= d >> 16;
+                    if (d + 1 != options.DictSize && options.DictSize != uint.MaxValue || size != ulong.MaxValue && size >= 1UL << 38) {
+                        throw LzmaModule.FormatError();
+                    }
+                }
+                if (XzFormat.MemoryUsage(options) > _memlimit) throw LzmaModule.MemoryLimitError();
+
+                input.Skip(HeaderSize);
+                _lz = new Lzma1Decoder(options, size == ulong.MaxValue ? -1 : (long)size);
+            }
+            return _lz.Decode(input, output, maxOutput);
+        }
+    }
+
+    /// <summary>
+    /// .xz container (FORMAT_XZ). Decoding stops at the end of the first stream.
+    /// </summary>
+    internal sealed class XzDecoder : StreamDecoder {
+        private enum State { StreamHeader, BlockHeader, Block, BlockPadding, BlockCheck, Index, StreamFooter }
+
+        private readonly ulong _memlimit;
+        private readonly ByteQueue _blockOutput = new ByteQueue();
+        private readonly List<(long, long)> _records = new List<(long, long)>();
+        private State _state;
+
+        private RawDecoder _block;
+        private IntegrityCheck _hasher;
+        private int _blockHeaderSize;
+        private long _expectedCompressed, _expectedUncompressed;
+        private long _compressed, _uncompressed;
+        private int _padding;
+        private int _indexSize;
+
+        public XzDecoder(ulong memlimit) {
+            _memlimit = memlimit;
+            Check = LzmaModule.CHECK_UNKNOWN;
+        }
+
+        public override bool Decode(ByteQueue input, ByteQueue output, int maxOutput) {
+            int limit = output.Length + maxOutput;
+            while (true) {
+                switch (_state) {
+                    case State.StreamHeader:
+                        if (input.Length < XzFormat.StreamHeaderSize) return false;
+                        Check = XzFormat.ReadStreamHeader(input.Span);
+                        input.Skip(XzFormat.StreamHeaderSize);
+                        _state = State.BlockHeader;
+                        break;
+
+                    case State.BlockHeader:
+                        if (input.Length == 0) return false;
+                        if (input[0] == 0) {
+                            _state = State.Index;
+                            break;
+                        }
+                        int size = (input[0] + 1) * 4;
+                        if (input.Length < size) return false;
+                        StartBlock(input.Span.Slice(0, size));
+                        input.Skip(size);
+                        _state = State.Block;
+                        break;
+
+                    case State.Block:
+                        if (output.Length >= limit) return false;
+                        int available = input.Length;
+                        bool finished = _block.Decode(input, _blockOutput, limit - output.Length);
+                        _compressed += available - input.Length;
+                        _uncompressed += _blockOutput.Length;
+                        _hasher?.Update(_blockOutput.Span);
+                        output.Append(_blockOutput.Span);
+                        _blockOutput.Clear();
+
+                        if (_expectedCompressed >= 0 && _compressed > _expectedCompressed
+                            || _expectedUncompressed >= 0 && _uncompressed > _expectedUncompressed) {
+                            throw LzmaModule.DataError();
+                        }
+                        if (finished) {
+                            _state = State.BlockPadding;
+                        } else if (available == input.Length && output.Length < limit) {
+                            return false;
+                        }
+                        break;
+
+                    case State.BlockPadding:
+                        while (((_compressed + _padding) & 3) != 0) {
+                            if (input.Length == 0) return false;
+                            if (input[0] != 0) throw LzmaModule.DataError();
+                            input.Skip(1);
+                            _padding++;
+                        }
+                        _state = State.BlockCheck;
+                        break;
+
+                    case State.BlockCheck:
+                        int checkSize = IntegrityCheck.Size(Check);
+                        if (input.Length < checkSize) return false;
+                        if (_hasher != null && !input.Span.Slice(0, checkSize).SequenceEqual(_hasher.Finish())) {
+                            throw LzmaModule.DataError();
+                        }
+                        input.Skip(checkSize);
+                        FinishBlock(checkSize);
+                        _state = State.BlockHeader;
+                        break;
+
+                    case State.Index:
+                        int indexSize = XzFormat.ReadIndex(input.Span, _records);
+                        if (indexSize == 0) return false;
+                        input.Skip(indexSize);
+                        _indexSize = indexSize;
+                        _state = State.StreamFooter;
+                        break;
+
+                    case State.StreamFooter:
+                        if (input.Length < XzFormat.StreamFooterSize) return false;
+                        XzFormat.ReadStreamFooter(input.Span, Check, _indexSize);
+                        input.Skip(XzFormat.StreamFooterSize);
+                        return true;
+                }
+            }
+        }
+
+        private void StartBlock(ReadOnlySpan<byte> header) {
+            FilterSpec[] filters = XzFormat.ReadBlockHeader(header, out _expectedCompressed, out _expectedUncompressed);
+            if (XzFormat.MemoryUsage(filters[filters.Length - 1].Lzma) > _memlimit) throw LzmaModule.MemoryLimitError();
+
+            _block = new RawDecoder(filters);
+            _hasher = IntegrityCheck.Create(Check);
+            _blockHeaderSize = header.Length;
+            _compressed = 0;
+            _uncompressed = 0;
+            _padding = 0;
+        }
+
+        private void FinishBlock(int checkSize) {
+            if (_expectedCompressed >= 0 && _expectedCompressed != _compressed
+                || _expectedUncompressed >= 0 && _expectedUncompressed != _uncompressed) {
+                throw LzmaModule.DataError();
+            }
+            _records.Add((_blockHeaderSize + _compressed + checkSize, _uncompressed));
+            _block = null;
+            _hasher = null;
+        }
+    }
+
+    /// <summary>
+    /// Detects .xz or .lzma input (FORMAT_AUTO).
+    /// </summary>
+    internal sealed class AutoDecoder : StreamDecoder {
+        private readonly ulong _memlimit;
+        private StreamDecoder _decoder;
+
+        public AutoDecoder(ulong memlimit) {
+            _memlimit = memlimit;
+            Check = LzmaModule.CHECK_UNKNOWN;
+        }
+
+        public override bool Decode(ByteQueue input, ByteQueue output, int maxOutput) {
+            if (_decoder is null) {
+                if (input.Length == 0) return false;
+                _decoder = input[0] == XzFormat.HeaderMagic[0] ? new XzDecoder(_memlimit) : (StreamDecoder)new AloneDecoder(_memlimit, picky: true);
+            }
+            bool finished = _decoder.Decode(input, output, maxOutput);
+            Check = _decoder.Check;
+            return finished;
+        }
+    }
+
+    #endregion
+}
@@ -0,0 +1,304 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using System.Collections.Generic;
+
+namespace IronPython.Modules.Lzma {
+    /// <summary>
+    /// Layout of the adaptive bit probabilities shared by the LZMA encoder and decoder. All models live in a
+    /// single array so that the decoder can roll back the updates of a partially decoded symbol.
+    /// </summary>
+    internal static class LzmaProbs {
+        public const int BitModelTotal = 1 << 11;
+        public const ushort Initial = BitModelTotal / 2;
+
+        public const int NumStates = 12;
+        public const int NumLitStates = 7;
+        public const int PosStatesMax = 1 << 4;
+        public const int MatchMinLen = 2;
+        public const int MatchMaxLen = 273;
+        public const int EndPosModelIndex = 14;
+        public const int NumFullDistances = 1 << (EndPosModelIndex >> 1);
+        public const int NumAlignBits = 4;
+
+        public const int IsMatch = 0;
+        public const int IsRep = IsMatch + NumStates * PosStatesMax;
+        public const int IsRepG0 = IsRep + NumStates;
+        public const int IsRepG1 = IsRepG0 + NumStates;
+        public const int IsRepG2 = IsRepG1 + NumStates;
+        public const int IsRep0Long = IsRepG2 + NumStates;
+        public const int PosSlot = IsRep0Long + NumStates * PosStatesMax;
+        public const int SpecPos = PosSlot + 4 * 64;
+        public const int Align = SpecPos + NumFullDistances - EndPosModelIndex;
+
+        // length coder: choice, choice2, low[16][8], mid[16][8], high[256]
+        public const int LenChoice = 0;
+        public const int LenChoice2 = 1;
+        public const int LenLow = 2;
+        public const int LenMid = LenLow + PosStatesMax * 8;
+        public const int LenHigh = LenMid + PosStatesMax * 8;
+        public const int LenSize = LenHigh + 256;
+
+        public const int LenCoder = Align + (1 << NumAlignBits);
+        public const int RepLenCoder = LenCoder + LenSize;
+        public const int Literal = RepLenCoder + LenSize;
+
+        public static ushort[] Create(int lc, int lp) {
+            var probs = new ushort[Literal + (0x300 << (lc + lp))];
+            Reset(probs);
+            return probs;
+        }
+
+        public static void Reset(ushort[] probs) {
+            for (int i = 0; i < probs.Length; i++) {
+                probs[i] = Initial;
+            }
+        }
+
+        public static int UpdateLiteral(int state) => state < 4 ? 0 : state < 10 ? state - 3 : state - 6;
+
+        public static int GetPosSlot(uint dist) {
+            if (dist < 4) return (int)dist;
+            int n = 31;
+            while ((dist >> n) == 0) n--;
+            return (n << 1) | (int)((dist >> (n - 1)) & 1);
+        }
+    }
+
+    /// <summary>
+    /// Range decoder reading from a caller supplied buffer.
+    /// </summary>
+    /// <remarks>
+    /// When fewer bytes are buffered than a symbol may need, the decoder records every probability update
+    /// in an undo log so that the symbol can be abandoned and decoded again once more input arrives.
+    /// </remarks>
+    internal sealed class RangeDecoder {
+        private const uint TopValue = 1 << 24;
+
+        private byte[] _buffer;
+        private List<int> _undo;
+        private bool _undoActive;
+
+        public int Position;
+        public int Limit;
+        public uint Range;
+        public uint Code;
+
+        public void Bind(byte[] buffer, int position, int limit) {
+            _buffer = buffer;
+            Position = position;
+            Limit = limit;
+        }
+
+        /// <summary>
+        /// Reads the five byte header of a range coded stream. Returns false if not enough input is available.
+        /// </summary>
+        public bool TryInit() {
+            if (Limit - Position < 5) return false;
+            if (_buffer[Position] != 0) throw LzmaModule.DataError();
+
+            Code = (uint)(_buffer[Position + 1] << 24 | _buffer[Position + 2] << 16 | _buffer[Position + 3] << 8 | _buffer[Position + 4]);
+            Range = uint.MaxValue;
+            Position += 5;
+            if (Code == Range) throw LzmaModule.DataError();
+            return true;
+        }
+
+        public bool IsFinishedOK => Code == 0;
+
+        public void BeginUndo() {
+            if (_undo is null) _undo = new List<int>();
+            _undo.Clear();
+            _undoActive = true;
+        }
+
+        public void EndUndo() {
+            _undoActive = false;
+        }
+
+        public void Undo(ushort[] probs) {
+            for (int i = _undo.Count - 2; i >= 0; i -= 2) {
+                probs[_undo[i]] = (ushort)_undo[i + 1];
+            }
+            _undoActive = false;
+        }
+
+        private void Normalize() {
+            if (Range < TopValue) {
+                if (Position >= Limit) throw NeedInputException.Instance;
+                Range <<= 8;
+                Code = (Code << 8) | _buffer[Position++];
+            }
+        }
+
+        public int DecodeBit(ushort[] probs, int index) {
+            uint prob = probs[index];
+            uint bound = (Range >> 11) * prob;
+            if (_undoActive) {
+                _undo.Add(index);
+                _undo.Add((int)prob);
+            }
+
+            int bit;
+            if (Code < bound) {
+                probs[index] = (ushort)(prob + ((LzmaProbs.BitModelTotal - prob) >> 5));
+                Range = bound;
+                bit = 0;
+            } else {
+                probs[index] = (ushort)(prob - (prob >> 5));
+                Code -= bound;
+                Range -= bound;
+                bit = 1;
+            }
+            Normalize();
+            return bit;
+        }
+
+        public uint DecodeDirectBits(int count) {
+            uint res = 0;
+            do {
+                Range >>= 1;
+                Code -= Range;
+                uint t = 0 - (Code >> 31);
+                Code += Range & t;
+                if (Code == Range) throw LzmaModule.DataError();
+                Normalize();
+                res = (res << 1) + (t + 1);
+            } while (--count > 0);
+            return res;
+        }
+
+        public int DecodeTree(ushort[] probs, int offset, int numBits) {
+            int m = 1;
+            for (int i = 0; i < numBits; i++) {
+                m = (m << 1) + DecodeBit(probs, offset + m);
+            }
+            return m - (1 << numBits);
+        }
+
+        public int DecodeReverseTree(ushort[] probs, int offset, int numBits) {
+            int m = 1;
+            int symbol = 0;
+            for (int i = 0; i < numBits; i++) {
+                int bit = DecodeBit(probs, offset + m);
+                m = (m << 1) + bit;
+                symbol |= bit << i;
+            }
+            return symbol;
+        }
+    }
+
+    /// <summary>
+    /// Thrown by <see cref="RangeDecoder"/> when it runs out of buffered input in the middle of a symbol.
+    /// </summary>
+    internal sealed class NeedInputException : System.Exception {
+        public static readonly NeedInputException Instance = new NeedInputException();
+    }
+
+    /// <summary>
+    /// Range encoder writing into a growable buffer.
+    /// </summary>
+    internal sealed class RangeEncoder {
+        private const uint TopValue = 1 << 24;
+
+        private ulong _low;
+        private uint _range;
+        private byte _cache;
+        private long _cacheSize;
+
+        public byte[] Buffer = new byte[1 << 12];
+        public int Count;
+
+        public RangeEncoder() {
+            Reset();
+        }
+
+        public void Reset() {
+            _low = 0;
+            _range = uint.MaxValue;
+            _cache = 0;
+            _cacheSize = 1;
+            Count = 0;
+        }
+
+        /// <summary>
+        /// Upper bound of the number of bytes the encoded data will occupy once flushed.
+        /// </summary>
+        public long PendingSize => Count + _cacheSize + 4;
+
+        private void WriteByte(byte value) {
+            if (Count == Buffer.Length) {
+                System.Array.Resize(ref Buffer, Buffer.Length * 2);
+            }
+            Buffer[Count++] = value;
+        }
+
+        private void ShiftLow() {
+            if ((uint)_low < 0xFF000000U || (_low >> 32) != 0) {
+                byte carry = (byte)(_low >> 32);
+                byte temp = _cache;
+                do {
+                    WriteByte((byte)(temp + carry));
+                    temp = 0xFF;
+                } while (--_cacheSize != 0);
+                _cache = (byte)(_low >> 24);
+            }
+            _cacheSize++;
+            _low = (_low & 0x00FFFFFF) << 8;
+        }
+
+        public void EncodeBit(ushort[] probs, int index, int bit) {
+            uint prob = probs[index];
+            uint bound = (_range >> 11) * prob;
+            if (bit == 0) {
+                _range = bound;
+                probs[index] = (ushort)(prob + ((LzmaProbs.BitModelTotal - prob) >> 5));
+            } else {
+                _low += bound;
+                _range -= bound;
+                probs[index] = (ushort)(prob - (prob >> 5));
+            }
+            while (_range < TopValue) {
+                _range <<= 8;
+                ShiftLow();
+            }
+        }
+
+        public void EncodeDirectBits(uint value, int count) {
+            while (count-- > 0) {
+                _range >>= 1;
+                if (((value >> count) & 1) != 0) _low += _range;
+                while (_range < TopValue) {
+                    _range <<= 8;
+                    ShiftLow();
+                }
+            }
+        }
+
+        public void EncodeTree(ushort[] probs, int offset, int numBits, int symbol) {
+            int m = 1;
+            for (int i = numBits - 1; i >= 0; i--) {
+                int bit = (symbol >> i) & 1;
+                EncodeBit(probs, offset + m, bit);
+                m = (m << 1) | bit;
+            }
+        }
+
+        public void EncodeReverseTree(ushort[] probs, int offset, int numBits, int symbol) {
+            int m = 1;
+            for (int i = 0; i < numBits; i++) {
+                int bit = symbol & 1;
+                EncodeBit(probs, offset + m, bit);
+                m = (m << 1) | bit;
+                symbol >>= 1;
+            }
+        }
+
+        public void Flush() {
+            for (int i = 0; i < 5; i++) {
+                ShiftLow();
+            }
+        }
+    }
+}
@@ -0,0 +1,304 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Buffers.Binary;
+using System.Collections.Generic;
+
+namespace IronPython.Modules.Lzma {
+    /// <summary>
+    /// Headers, indexes and filter properties of the .xz and .lzma file formats.
+    /// </summary>
+    internal static class XzFormat {
+        public static readonly byte[] HeaderMagic = { 0xFD, (byte)'7', (byte)'z', (byte)'X', (byte)'Z', 0x00 };
+        private static readonly byte[] FooterMagic = { (byte)'Y', (byte)'Z' };
+
+        public const int StreamHeaderSize = 12;
+        public const int StreamFooterSize = 12;
+
+        private const int MaxVarintSize = 9;
+        public const int MaxFilters = 4;
+
+        private static uint Crc32(ReadOnlySpan<byte> data) => PythonBinaryAscii.crc32(data, 0);
+
+        #region Variable length integers
+
+        private static void WriteVarint(List<byte> output, ulong value) {
+            while (value >= 0x80) {
+                output.Add((byte)(value | 0x80));
+                value >>= 7;
+            }
+            output.Add((byte)value);
+        }
+
+        /// <summary>
+        /// Reads a variable length integer. Returns false if the input ends before the integer does.
+        /// </summary>
+        private static bool TryReadVarint(ReadOnlySpan<byte> data, ref int position, out ulong value) {
+            value = 0;
+            for (int i = 0; i < MaxVarintSize; i++) {
+                if (position >= data.Length) return false;
+                byte b = data[position++];
+                value |= (ulong)(b & 0x7F) << (i * 7);
+                if ((b & 0x80) == 0) {
+                    // the encoding must be the shortest possible one
+                    if (b == 0 && i != 0) throw LzmaModule.DataError();
+                    return true;
+                }
+            }
+            throw LzmaModule.DataError();
+        }
+
+        private static ulong ReadVarint(ReadOnlySpan<byte> data, ref int position) {
+            if (!TryReadVarint(data, ref position, out ulong value)) throw LzmaModule.DataError();
+            return value;
+        }
+
+        #endregion
+
+        #region Filter properties
+
+        public static byte[] EncodeLzma1Properties(LzmaOptions options) {
+            var props = new byte[5];
+            props[0] = (byte)((options.Pb * 5 + options.Lp) * 9 + options.Lc);
+            BinaryPrimitives.WriteUInt32LittleEndian(props.AsSpan(1), options.DictSize);
+            return props;
+        }
+
+        /// <summary>
+        /// Decodes the properties of an LZMA1 stream. Returns null if the lc/lp/pb byte is invalid.
+        /// </summary>
+        public static LzmaOptions DecodeLzma1Properties(ReadOnlySpan<byte> props) {
+            int d = props[0];
+            if (d >= 9 * 5 * 5) return null;
+            return new LzmaOptions {
+                Lc = d % 9,
+                Lp = d / 9 % 5,
+                Pb = d / 45,
+                DictSize = BinaryPrimitives.ReadUInt32LittleEndian(props.Slice(1)),
+            };
+        }
+
+        /// <summary>
+        /// Encodes the properties of a filter as stored in an .xz block header.
+        /// </summary>
+        public static byte[] EncodeProperties(FilterSpec filter) {
+            switch (filter.Id) {
+                case LzmaModule.FILTER_LZMA1_ID:
+                    return EncodeLzma1Properties(filter.Lzma);
+                case LzmaModule.FILTER_LZMA2:
+                    return new[] { filter.Lzma.EncodeDictSize() };
+                case LzmaModule.FILTER_DELTA:
+                    return new[] { (byte)(filter.Distance - 1) };
+                default:
+                    if (filter.StartOffset == 0) return Array.Empty<byte>();
+                    var props = new byte[4];
+                    BinaryPrimitives.WriteUInt32LittleEndian(props, filter.StartOffset);
+                    return props;
+            }
+        }
+
+        /// <summary>
+        /// Decodes the properties of a filter as stored in an .xz block header.
+        /// </summary>
+        public static FilterSpec DecodeProperties(ulong id, ReadOnlySpan<byte> props) {
+            var filter = new FilterSpec { Id = id };
+            switch (id) {
+                case LzmaModule.FILTER_LZMA1_ID:
+                    if (props.Length != 5) throw LzmaModule.OptionsError();
+                    filter.Lzma = DecodeLzma1Properties(props) ?? throw LzmaModule.OptionsError();
+                    break;
+                case LzmaModule.FILTER_LZMA2:
+                    if (props.Length != 1 || props[0] > 40) throw LzmaModule.OptionsError();
+                    filter.Lzma = new LzmaOptions { DictSize = LzmaOptions.DecodeDictSize(props[0]) };
+                    break;
+                case LzmaModule.FILTER_DELTA:
+                    if (props.Length != 1) throw LzmaModule.OptionsError();
+                    filter.Distance = props[0] + 1;
+                    break;
+                default:
+                    if (!BranchCoder.IsSupported(id)) throw LzmaModule.OptionsError();
+                    if (props.Length == 4) {
+                        filter.StartOffset = BinaryPrimitives.ReadUInt32LittleEndian(props);
+                    } else if (props.Length != 0) {
+                        throw LzmaModule.OptionsError();
+                    }
+                    break;
+            }
+            return filter;
+        }
+
+        /// <summary>
+        /// Approximate memory needed to decode with the given LZMA options.
+        /// </summary>
+        public static ulong MemoryUsage(LzmaOptions options) {
+            return (ulong)options.DictSize + (ulong)(LzmaProbs.Literal + (0x300 << (options.Lc + options.Lp))) * 2 + (1 << 16);
+        }
+
+        #endregion
+
+        #region Stream header and footer
+
+        public static void WriteStreamHeader(ByteQueue output, int check) {
+            Span<byte> flags = stackalloc byte[] { 0, (byte)check };
+            output.Append(HeaderMagic);
+            output.Append(flags);
+            AppendUInt32(output, Crc32(flags));
+        }
+
+        /// <summary>
+        /// Validates a stream header and returns the integrity check it declares.
+        /// </summary>
+        public static int ReadStreamHeader(ReadOnlySpan<byte> header) {
+            if (!header.Slice(0, HeaderMagic.Length).SequenceEqual(HeaderMagic)) throw LzmaModule.FormatError();
+
+            var flags = header.Slice(HeaderMagic.Length, 2);
+            if (Crc32(flags) != BinaryPrimitives.ReadUInt32LittleEndian(header.Slice(8))) throw LzmaModule.DataError();
+            if (flags[0] != 0 || flags[1] > 0x0F) throw LzmaModule.OptionsError();
+            return flags[1];
+        }
+
+        public static void WriteStreamFooter(ByteQueue output, int check, int indexSize) {
+            Span<byte> fields = stackalloc byte[6];
+            BinaryPrimitives.WriteUInt32LittleEndian(fields, (uint)(indexSize / 4 - 1));
+            fields[4] = 0;
+            fields[5] = (byte)check;
+            AppendUInt32(output, Crc32(fields));
+            output.Append(fields);
+            output.Append(FooterMagic);
+        }
+
+        public static void ReadStreamFooter(ReadOnlySpan<byte> footer, int check, int indexSize) {
+            var fields = footer.Slice(4, 6);
+            if (!footer.Slice(10, 2).SequenceEqual(FooterMagic)
+                || Crc32(fields) != BinaryPrimitives.ReadUInt32LittleEndian(footer)
+                || fields[4] != 0 || fields[5] != check
+                || BinaryPrimitives.ReadUInt32LittleEndian(fields) != (uint)(indexSize / 4 - 1)) {
+                throw LzmaModule.DataError();
+            }
+        }
+
+        #endregion
+
+        #region Block header
+
+        public static void WriteBlockHeader(ByteQueue output, FilterSpec[] filters) {
+            var header = new List<byte> { 0, (byte)(filters.Length - 1) };
+            foreach (FilterSpec filter in filters) {
+                byte[] props = EncodeProperties(filter);
+                WriteVarint(header, filter.Id);
+                WriteVarint(header, (ulong)props.Length);
+                header.AddRange(props);
+            }
+            while ((header.Count & 3) != 0) {
+                header.Add(0);
+            }
+            header[0] = (byte)(header.Count / 4);
+
+            byte[] bytes = header.ToArray();
+            output.Append(bytes);
+            AppendUInt32(output, Crc32(bytes));
+        }
+
+        /// <summary>
+        /// Parses a complete block header. Sizes that are not stored are returned as -1.
+        /// </summary>
+        public static FilterSpec[] ReadBlockHeader(ReadOnlySpan<byte> header, out long compressedSize, out long uncompressedSize) {
+            int size = header.Length - 4;
+            if (Crc32(header.Slice(0, size)) != BinaryPrimitives.ReadUInt32LittleEndian(header.Slice(size))) throw LzmaModule.DataError();
+            header = header.Slice(0, size);
+
+            byte flags = header[1];
+            if ((flags & 0x3C) != 0) throw LzmaModule.OptionsError();
+
+            int position = 2;
+            compressedSize = uncompressedSize = -1;
+            if ((flags & 0x40) != 0) {
+                ulong value = ReadVarint(header, ref position);
+                if (value == 0 || value > long.MaxValue) throw LzmaModule.DataError();
+                compressedSize = (long)value;
+            }
+            if ((flags & 0x80) != 0) {
+                ulong value = ReadVarint(header, ref position);
+                if (value > long.MaxValue) throw LzmaModule.DataError();
+                uncompressedSize = (long)value;
+            }
+
+            var filters = new FilterSpec[(flags & 3) + 1];
+            for (int i = 0; i < filters.Length; i++) {
+                ulong id = ReadVarint(header, ref position);
+                ulong propsSize = ReadVarint(header, ref position);
+                if (propsSize > (ulong)(header.Length - position)) throw LzmaModule.DataError();
+                filters[i] = DecodeProperties(id, header.Slice(position, (int)propsSize));
+                position += (int)propsSize;
+
+                // only the last filter of a chain may be (and must be) an LZ filter
+                if (filters[i].IsLzma != (i == filters.Length - 1)) throw LzmaModule.OptionsError();
+            }
+
+            for (; position < header.Length; position++) {
+                if (header[position] != 0) throw LzmaModule.OptionsError();
+            }
+            return filters;
+        }
+
+        #endregion
+
+        #region Index
+
+        /// <summary>
+        /// Writes the index of the given (unpadded size, uncompressed size) block records and returns its size.
+        /// </summary>
+        public static int WriteIndex(ByteQueue output, List<(long, long)> records) {
+            var index = new List<byte> { 0 };
+            WriteVarint(index, (ulong)records.Count);
+            foreach (var (unpadded, uncompressed) in records) {
+                WriteVarint(index, (ulong)unpadded);
+                WriteVarint(index, (ulong)uncompressed);
+            }
+            while ((index.Count & 3) != 0) {
+                index.Add(0);
+            }
+
+            byte[] bytes = index.ToArray();
+            output.Append(bytes);
+            AppendUInt32(output, Crc32(bytes));
+            return bytes.Length + 4;
+        }
+
+        /// <summary>
+        /// Validates the index against the decoded block records. Returns the size of the index, or 0 if the
+        /// input does not hold the complete index yet.
+        /// </summary>
+        public static int ReadIndex(ReadOnlySpan<byte> data, List<(long, long)> records) {
+            int position = 1;
+            if (!TryReadVarint(data, ref position, out ulong count)) return 0;
+            if (count != (ulong)records.Count) throw LzmaModule.DataError();
+
+            foreach (var (unpadded, uncompressed) in records) {
+                if (!TryReadVarint(data, ref position, out ulong value)) return 0;
+                if (value != (ulong)unpadded) throw LzmaModule.DataError();
+                if (!TryReadVarint(data, ref position, out value)) return 0;
+                if (value != (ulong)uncompressed) throw LzmaModule.DataError();
+            }
+
+            for (; (position & 3) != 0; position++) {
+                if (position >= data.Length) return 0;
+                if (data[position] != 0) throw LzmaModule.DataError();
+            }
+
+            if (data.Length < position + 4) return 0;
+            if (Crc32(data.Slice(0, position)) != BinaryPrimitives.ReadUInt32LittleEndian(data.Slice(position))) throw LzmaModule.DataError();
+            return position + 4;
+        }
+
+        #endregion
+
+        private static void AppendUInt32(ByteQueue output, uint value) {
+            Span<byte> bytes = stackalloc byte[4];
+            BinaryPrimitives.WriteUInt32LittleEndian(bytes, value);
+            output.Append(bytes);
+        }
+    }
+}
@@ -203,6 +203,17 @@ namespace IronPython.Modules {
         [PythonHidden(PlatformsAttribute.PlatformFamily.Windows)]
         public const int PROT_EXEC = 4;
 
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows)]
+        public const int MADV_NORMAL = 0;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows)]
+        public const int MADV_RANDOM = 1;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows)]
+        public const int MADV_SEQUENTIAL = 2;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows)]
+        public const int MADV_WILLNEED = 3;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows)]
+        public const int MADV_DONTNEED = 4;
+
         public static readonly int ALLOCATIONGRANULARITY = GetAllocationGranularity();
         public static readonly int PAGESIZE = System.Environment.SystemPageSize;
 
@@ -503,9 +514,13 @@ namespace IronPython.Modules {
 
                         var bytes = new byte[count];
 
-                        for (var i = 0; i < count; i++) {
-                            bytes[i] = _view.ReadByte(start);
-                            start += step;
+                        if (step == 1) {
+                            _view.ReadArray(start, bytes, 0, count);
+                        } else {
+                            for (var i = 0; i < count; i++) {
+                                bytes[i] = _view.ReadByte(start);
+                                start += step;
+                            }
                         }
 
                         return Bytes.Make(bytes);
@@ -724,56 +739,7 @@ namespace IronPython.Modules {
                     return start <= end ? ReturnLong(start) : -1;
                 }
 
-                long findLength = end - start;
-                if (s.Length > findLength) {
-                    return -1;
-                }
-
-                int index = -1;
-                int bufferLength = Math.Max(s.Length, PAGESIZE);
-
-                if (findLength <= bufferLength * 2) {
-                    // In this case, the search area is not significantly larger than s, so we only need to
-                    // allocate a single string to search through.
-                    byte[] buffer = new byte[findLength];
-                    _view.ReadArray(start, buffer, 0, (int)findLength);
-
-                    index = buffer.AsSpan().IndexOf(s);
-                } else {
-                    // We're matching s against a significantly larger file, so we partition the stream into
-                    // sections twice the length of s and search each segment. Because a match could exist on a
-                    // boundary, sections must overlap by s.Length. Data is saved in 2 buffers to avoid
-                    // reading the same parts of the stream twice.
-                    byte[] buffer0 = new byte[bufferLength];
-                    byte[] buffer1 = new byte[bufferLength];
-
-                    _view.ReadArray(start, buffer0, 0, bufferLength);
-                    int bytesRead = _view.ReadArray(start + bufferLength, buffer1, 0, bufferLength);
-
-                    start += bufferLength * 2;
-                    findLength -= bufferLength * 2;
-
-                    while (findLength > 0 && bytesRead > 0) {
-                        var combinedBuffer = CombineBytes(buffer0, buffer1, bytesRead);
-                        index = combinedBuffer.AsSpan().IndexOf(s);
-
-                        if (index != -1) {
-                            return ReturnLong(start - 2 * bufferLength + index);
-                        }
-
-                        byte[] temp = buffer0;
-                        buffer0 = buffer1;
-                        buffer1 = temp;
-
-                        int readLength = findLength < bufferLength ? (int)findLength : bufferLength;
-                        findLength -= bytesRead;
-
-                        bytesRead = _view.ReadArray(start, buffer1, 0, readLength);
-                        start += bytesRead;
-                    }
-                }
-
-                return index == -1 ? -1 : ReturnLong(start + index);
+                return ReturnLong(IndexOf(s, start, end));
             }
 
             public int flush() {
@@ -793,6 +759,35 @@ namespace IronPython.Modules {
                 }
             }
 
+            [PythonHidden(PlatformsAttribute.PlatformFamily.Windows)]
+            [SupportedOSPlatform("linux")]
+            [SupportedOSPlatform("macos")]
+            public void madvise(int option, long start = 0, object? length = null) {
+                using (new MmapLocker(this)) {
+                    long size = _view.Capacity;
+                    if (start < 0 || start >= size) {
+                        throw PythonOps.ValueError("madvise start out of bounds");
+                    }
+
+                    long len = GetLong(length) ?? size - start;
+                    if (len < 0) {
+                        throw PythonOps.ValueError("madvise length invalid");
+                    }
+                    len = Math.Min(len, size - start);
+
+                    unsafe {
+                        byte* pointer = AcquirePointer();
+                        try {
+                            if (MAdvise((IntPtr)(pointer + start), (UIntPtr)(ulong)len, option) != 0) {
+                                throw PythonNT.GetOsError(Marshal.GetLastWin32Error());
+                            }
+                        } finally {
+                            ReleasePointer();
+                        }
+                    }
+                }
+            }
+
             public void move(long dest, long src, long count) {
                 using (new MmapLocker(this)) {
                     EnsureWritable();
@@ -896,21 +891,23 @@ namespace IronPython.Modules {
                 }
             }
 
-            public string readline() {
+            public Bytes readline() {
                 using (new MmapLocker(this)) {
-                    StringBuilder res = new StringBuilder();
-
                     long pos = Position;
+                    long capacity = _view.Capacity;
 
-                    char cur = '\0';
-                    while (cur != '\n' && pos < _view.Capacity) {
-                        cur = (char)_view.ReadByte(pos);
-                        res.Append(cur);
-                        pos++;
+                    if (pos >= capacity) {
+                        return Bytes.Empty;
                     }
 
-                    Position = pos;
-                    return res.ToString();
+                    long eol = IndexOf(NewLine, pos, capacity);
+                    long end = eol == -1 ? capacity : eol + 1;
+
+                    byte[] buffer = new byte[checked((int)(end - pos))];
+                    _view.ReadArray(pos, buffer, 0, buffer.Length);
+                    Position = end;
+
+                    return Bytes.Make(buffer);
                 }
             }
 
@@ -1066,61 +1063,7 @@ namespace IronPython.Modules {
                     return start <= end ? ReturnLong(start) : -1;
                 }
 
-                long findLength = end - start;
-                if (s.Length > findLength) {
-                    return -1;
-                }
-
-                int index = -1;
-                int bufferLength = Math.Max(s.Length, PAGESIZE);
-                CompareInfo c = CultureInfo.InvariantCulture.CompareInfo;
-
-                if (findLength <= bufferLength * 2) {
-                    // In this case, the search area is not significantly larger than s, so we only need to
-                    // allocate a single string to search through.
-                    byte[] buffer = new byte[findLength];
-
-                    findLength = _view.ReadArray(start, buffer, 0, (int)findLength);
-
-                    index = buffer.AsSpan().LastIndexOf(s);
-                } else {
-                    // We're matching s against a significantly larger file, so we partition the stream into
-                    // sections twice the length of s and search each segment. Because a match could exist on a
-                    // boundary, sections must overlap by s.Length. Data is saved in 2 buffers to avoid
-                    // reading the same parts of the stream twice.
-                    byte[] buffer0 = new byte[bufferLength];
-                    byte[] buffer1 = new byte[bufferLength];
-
-                    int remainder = (int)((end - start) % bufferLength);
-                    if (remainder == 0) {
-                        remainder = bufferLength;
-                    }
-
-                    start = end - bufferLength - remainder;
-                    findLength -= bufferLength + remainder;
-
-                    _view.ReadArray(start, buffer0, 0, bufferLength);
-                    int bytesRead = _view.ReadArray(start + bufferLength, buffer1, 0, remainder);
-
-                    while (findLength >= 0) {
-                        var combinedBuffer = CombineBytes(buffer0, buffer1, bytesRead);
-                        index = combinedBuffer.AsSpan().LastIndexOf(s);
-
-                        if (index != -1) {
-                            return ReturnLong(index + start);
-                        }
-
-                        byte[] temp = buffer0;
-                        buffer0 = buffer1;
-                        buffer1 = temp;
-
-                        start -= bufferLength;
-                        bytesRead = _view.ReadArray(start, buffer0, 0, bufferLength);
-                        findLength -= bytesRead;
-                    }
-                }
-
-                return index == -1 ? -1 : ReturnLong(index + start);
+                return ReturnLong(LastIndexOf(s, start, end));
             }
 
             public void seek(long pos, int whence = SEEK_SET) {
@@ -1250,12 +1193,55 @@ namespace IronPython.Modules {
                 return (BigInteger)l;
             }
 
-            private static byte[] CombineBytes(byte[] buffer0, byte[] buffer1, int length1) {
-                if (length1 == 0) return buffer0;
-                var res = new byte[buffer0.Length + length1];
-                buffer0.CopyTo(res, 0);
-                Array.Copy(buffer1, 0, res, buffer0.Length, length1);
-                return res;
+            private static readonly byte[] NewLine = { (byte)'\n' };
+
+            /// <summary>
+            /// Returns the address of the first byte of the map. Every call must be paired with <see cref="ReleasePointer"/>.
+            /// </summary>
+            private unsafe byte* AcquirePointer() {
+                byte* pointer = null;
+                _view.SafeMemoryMappedViewHandle.AcquirePointer(ref pointer);
+                return pointer + _view.PointerOffset;
+            }
+
+            private void ReleasePointer() => _view.SafeMemoryMappedViewHandle.ReleasePointer();
+
+            // Spans are limited to 2 GB, so larger maps are searched through overlapping windows of the mapped memory.
+
+            private unsafe long IndexOf(ReadOnlySpan<byte> value, long start, long end) {
+                Debug.Assert(value.Length > 0);
+
+                byte* pointer = AcquirePointer();
+                try {
+                    while (end - start >= value.Length) {
+                        int length = (int)Math.Min(end - start, int.MaxValue);
+                        int index = new ReadOnlySpan<byte>(pointer + start, length).IndexOf(value);
+                        if (index >= 0) return start + index;
+                        if (start + length == end) break;
+                        start += length - value.Length + 1;
+                    }
+                    return -1;
+                } finally {
+                    ReleasePointer();
+                }
+            }
+
+            private unsafe long LastIndexOf(ReadOnlySpan<byte> value, long start, long end) {
+                Debug.Assert(value.Length > 0);
+
+                byte* pointer = AcquirePointer();
+                try {
+                    while (end - start >= value.Length) {
+                        int length = (int)Math.Min(end - start, int.MaxValue);
+                        int index = new ReadOnlySpan<byte>(pointer + end - length, length).LastIndexOf(value);
+                        if (index >= 0) return end - length + index;
+                        if (end - length == start) break;
+                        end -= length - value.Length + 1;
+                    }
+                    return -1;
+                } finally {
+                    ReleasePointer();
+                }
             }
 
             internal Bytes GetSearchString() {
@@ -1356,14 +1342,22 @@ namespace IronPython.Modules {
                 private readonly BufferFlags _flags;
                 private SafeMemoryMappedViewHandle? _handle;
                 private byte* _pointer = null;
+                private readonly long _pointerOffset;
 
                 public MmapBuffer(MmapDefault mmap, BufferFlags flags) {
                     _mmap = mmap;
                     _flags = flags;
                     _locker = new MmapLocker(mmap);
+                    long length = mmap._view.Capacity;
+                    if (length > int.MaxValue) {
+                        // exported buffers are spans, which cannot address more than 2 GB
+                        _locker.Dispose();
+                        throw PythonOps.BufferError("mmap too large to export a buffer, use slicing, find() or readline() instead");
+                    }
                     mmap.InterlockedOrState(StateBits.Exporting);
                     _handle = _mmap._view.SafeMemoryMappedViewHandle;
-                    ItemCount = _mmap.__len__() is int i ? i : throw new NotImplementedException();
+                    _pointerOffset = _mmap._view.PointerOffset;
+                    ItemCount = (int)length;
                 }
 
                 public object Object => _mmap;
@@ -1387,22 +1381,23 @@ namespace IronPython.Modules {
                 public IReadOnlyList<int>? SubOffsets => null;
 
                 public unsafe ReadOnlySpan<byte> AsReadOnlySpan() {
-                    if (_handle is null) throw new ObjectDisposedException(nameof(MmapBuffer));
-                    if (_pointer is null) _handle.AcquirePointer(ref _pointer);
-                    return new ReadOnlySpan<byte>(_pointer, ItemCount);
+                    return new ReadOnlySpan<byte>(GetPointer(), ItemCount);
                 }
 
                 public unsafe Span<byte> AsSpan() {
-                    if (_handle is null) throw new ObjectDisposedException(nameof(MmapBuffer));
                     if (IsReadOnly) throw new InvalidOperationException("object is not writable");
-                    if (_pointer is null) _handle.AcquirePointer(ref _pointer);
-                    return new Span<byte>(_pointer, ItemCount);
+                    return new Span<byte>(GetPointer(), ItemCount);
                 }
 
                 public unsafe MemoryHandle Pin() {
+                    return new MemoryHandle(GetPointer());
+                }
+
+                private byte* GetPointer() {
                     if (_handle is null) throw new ObjectDisposedException(nameof(MmapBuffer));
                     if (_pointer is null) _handle.AcquirePointer(ref _pointer);
-                    return new MemoryHandle(_pointer);
+                    // the view may start below the requested offset to respect the allocation granularity
+                    return _pointer + _pointerOffset;
                 }
 
                 public void Dispose() {
@@ -1414,6 +1409,15 @@ namespace IronPython.Modules {
             }
         }
 
+        #region P/Invoke for madvise
+
+        [SupportedOSPlatform("linux")]
+        [SupportedOSPlatform("macos")]
+        [DllImport("libc", EntryPoint = "madvise", SetLastError = true)]
+        private static extern int MAdvise(IntPtr addr, UIntPtr length, int advice);
+
+        #endregion
+
         #region P/Invoke for allocation granularity
 
         [StructLayout(LayoutKind.Sequential)]
@@ -613,57 +613,149 @@ namespace IronPython.Modules {
 
         [PythonType]
         public sealed class DirEntry {
+            // d_type values of struct dirent
+            private const byte DT_UNKNOWN = 0;
+            private const byte DT_DIR = 4;
+            private const byte DT_REG = 8;
+            private const byte DT_LNK = 10;
+
+            private const int S_IFMT = 0xF000;
+            private const int S_IFDIR = 0x4000;
+            private const int S_IFREG = 0x8000;
+            private const int S_IFLNK = 0xA000;
+
             private readonly CodeContext context;
-            private readonly FileSystemInfo info;
+            private readonly string fullPath;
+            private readonly string entryName;
             private readonly bool asBytes;
+            private readonly byte d_type;
+            private readonly ulong d_ino;
+            private stat_result? statCache;
+            private stat_result? lstatCache;
 
-            internal DirEntry(CodeContext context, FileSystemInfo info, bool asBytes) {
+            internal DirEntry(CodeContext context, string directory, string name, byte d_type, ulong d_ino, bool asBytes) {
                 this.context = context;
-                this.info = info;
+                // like CPython, the path is the scandir argument joined with the name, never resolved
+                fullPath = directory.Length == 0 || directory.EndsWith(Path.DirectorySeparatorChar) || directory.EndsWith(Path.AltDirectorySeparatorChar) ? directory + name : directory + Path.DirectorySeparatorChar + name;
+                entryName = name;
+                this.d_type = d_type;
+                this.d_ino = d_ino;
                 this.asBytes = asBytes;
             }
 
-            public object path => asBytes ? info.FullName.ToFsBytes(context) : info.FullName;
-            public object name => asBytes ? info.Name.ToFsBytes(context) : info.Name;
+            internal DirEntry(CodeContext context, string directory, FileSystemInfo info, bool asBytes)
+                // the attributes come with the directory enumeration, so no further calls are needed
+                : this(context, directory, info.Name, GetEntryType(info.Attributes), 0, asBytes) { }
+
+            private static byte GetEntryType(FileAttributes attributes) {
+                // only some reparse points are symlinks (not e.g. junctions or deduplicated files), let lstat decide
+                if (attributes.HasFlag(FileAttributes.ReparsePoint)) return DT_UNKNOWN;
+                return attributes.HasFlag(FileAttributes.Directory) ? DT_DIR : DT_REG;
+            }
+
+            public object path => asBytes ? fullPath.ToFsBytes(context) : fullPath;
+            public object name => asBytes ? entryName.ToFsBytes(context) : entryName;
 
             [LightThrowing]
             public object? inode() {
+                if (d_ino != 0) return (BigInteger)d_ino;
+
                 var obj = stat(follow_symlinks: false);
                 if (obj is stat_result res) return res.st_ino;
                 return obj;
             }
 
-            public bool is_dir(bool follow_symlinks = true) => info.Attributes.HasFlag(FileAttributes.Directory);
+            [LightThrowing]
+            public object is_dir(bool follow_symlinks = true) => TestMode(follow_symlinks, DT_DIR, S_IFDIR);
 
-            public bool is_file(bool follow_symlinks = true) => !is_dir();
+            [LightThrowing]
+            public object is_file(bool follow_symlinks = true) => TestMode(follow_symlinks, DT_REG, S_IFREG);
 
-            public bool is_symlink() => info.Attributes.HasFlag(FileAttributes.ReparsePoint) ? throw new NotImplementedException() : false;
+            [LightThrowing]
+            public object is_symlink() {
+                if (d_type != DT_UNKNOWN) return ScriptingRuntimeHelpers.BooleanToObject(d_type == DT_LNK);
+                return TestMode(follow_symlinks: false, DT_LNK, S_IFLNK);
+            }
 
             [LightThrowing]
-            public object? stat(bool follow_symlinks = true) => PythonNT.stat(info.FullName, new Dictionary<string, object>());
+            public object? stat(bool follow_symlinks = true) {
+                if (follow_symlinks) {
+                    if (statCache is null) {
+                        var isLink = is_symlink();
+                        if (!(isLink is bool link)) return isLink;
+
+                        if (!link) {
+                            // the entry is its own target, so stat and lstat share the result
+                            var res = stat(follow_symlinks: false);
+                            statCache = lstatCache;
+                            return res;
+                        }
+
+                        var obj = PythonNT.stat(fullPath, new Dictionary<string, object>());
+                        if (!(obj is stat_result target)) return obj;
+                        statCache = target;
+                    }
+                    return statCache;
+                }
+
+                if (lstatCache is null) {
+                    var obj = PythonNT.stat(fullPath, new Dictionary<string, object> { [nameof(follow_symlinks)] = false });
+                    if (!(obj is stat_result entry)) return obj;
+                    lstatCache = entry;
+                }
+                return lstatCache;
+            }
+
+            public object __fspath__() => path;
 
             public string __repr__(CodeContext context) => $"<DirEntry {PythonOps.Repr(context, name)}>";
+
+            private object TestMode(bool follow_symlinks, byte type, int mode) {
+                if (d_type != DT_UNKNOWN && !(follow_symlinks && d_type == DT_LNK)) {
+                    return ScriptingRuntimeHelpers.BooleanToObject(d_type == type);
+                }
+
+                // the type is not known from the enumeration or the link has to be followed
+                var obj = stat(follow_symlinks);
+                if (obj is stat_result res) {
+                    return ScriptingRuntimeHelpers.BooleanToObject((Converter.ConvertToInt32(res.st_mode) & S_IFMT) == mode);
+                }
+                if (LightExceptions.GetLightException(obj)?.GetPythonException() is PythonExceptions._OSError err && Equals(err.errno, PythonErrno.ENOENT)) {
+                    // a broken link or an entry removed since the scan is neither
+                    return ScriptingRuntimeHelpers.False;
+                }
+                return obj!;
+            }
         }
 
         [PythonType, PythonHidden]
         public sealed class ScandirIterator : IEnumerable<DirEntry>, IEnumerator<DirEntry> {
-            private readonly CodeContext context;
-            private readonly IEnumerator<FileSystemInfo> enumerator;
-            private readonly bool asBytes;
+            private readonly IEnumerator<DirEntry> enumerator;
+            private readonly IDisposable? handle;
+            private bool closed;
 
-            internal ScandirIterator(CodeContext context, IEnumerable<FileSystemInfo> list, bool asBytes) {
-                this.context = context;
-                enumerator = list.GetEnumerator();
-                this.asBytes = asBytes;
+            /// <param name="entries">The entries of the directory.</param>
+            /// <param name="handle">The open directory, closed by close() even if the iteration never started.</param>
+            internal ScandirIterator(IEnumerable<DirEntry> entries, IDisposable? handle = null) {
+                enumerator = entries.GetEnumerator();
+                this.handle = handle;
             }
 
             [PythonHidden]
-            public DirEntry Current => new DirEntry(context, enumerator.Current, asBytes);
+            public DirEntry Current => enumerator.Current;
 
             object IEnumerator.Current => Current;
 
+            public void close() {
+                if (closed) return;
+                closed = true;
+                enumerator.Dispose();
+                handle?.Dispose();
+            }
+
+            // also provides __enter__ and __exit__
             [PythonHidden]
-            public void Dispose() => enumerator.Dispose();
+            public void Dispose() => close();
 
             [PythonHidden]
             public IEnumerator<DirEntry> GetEnumerator() => this;
@@ -671,21 +763,21 @@ namespace IronPython.Modules {
             IEnumerator IEnumerable.GetEnumerator() => GetEnumerator();
 
             [PythonHidden]
-            public bool MoveNext() => enumerator.MoveNext();
+            public bool MoveNext() => !closed && enumerator.MoveNext();
 
             [PythonHidden]
             public void Reset() => enumerator.Reset();
         }
 
         public static ScandirIterator scandir(CodeContext context, string? path = null)
-            => new ScandirIterator(context, ScandirHelper(context, path), asBytes: false);
+            => ScandirHelper(context, path, asBytes: false);
 
         public static ScandirIterator scandir(CodeContext context, [NotNone] object path)
-            => new ScandirIterator(context, ScandirHelper(context, ConvertToFsString(context, path, nameof(path), orType: "None")), asBytes: true);
+            => ScandirHelper(context, ConvertToFsString(context, path, nameof(path), orType: "None"), asBytes: true);
 
-        private static IEnumerable<FileSystemInfo> ScandirHelper(CodeContext context, string? path) {
+        private static ScandirIterator ScandirHelper(CodeContext context, string? path, bool asBytes) {
             if (path == null) {
-                path = getcwd(context);
+                path = ".";
             }
 
             if (path == string.Empty) {
@@ -701,11 +793,19 @@ namespace IronPython.Modules {
             }
 #endif
 
+#if FEATURE_NATIVE
+            if (RuntimeInformation.IsOSPlatform(OSPlatform.Linux) || RuntimeInformation.IsOSPlatform(OSPlatform.OSX)) {
+                return ScandirUnix(context, path, asBytes);
+            }
+#endif
+
+            IEnumerable<FileSystemInfo> infos;
             try {
-                return new DirectoryInfo(path).EnumerateFileSystemInfos();
+                infos = new DirectoryInfo(path).EnumerateFileSystemInfos();
             } catch (Exception e) {
                 throw ToPythonException(e, path);
             }
+            return new ScandirIterator(infos.Select(info => new DirEntry(context, path, info, asBytes)));
         }
 
 #if FEATURE_NATIVE
@@ -1442,14 +1542,17 @@ namespace IronPython.Modules {
                 return LightExceptions.Throw(PythonOps.TypeError("expected string, got NoneType"));
             }
 
-            foreach (var key in kwargs.Keys) {
-                switch (key) {
+            bool follow_symlinks = true;
+            foreach (var kvp in kwargs) {
+                switch (kvp.Key) {
                     case "dir_fd":
-                    case "follow_symlinks":
-                        // TODO: implement these!
+                        // TODO: implement this!
+                        break;
+                    case nameof(follow_symlinks):
+                        follow_symlinks = PythonOps.IsTrue(kvp.Value);
                         break;
                     default:
-                        return LightExceptions.Throw(PythonOps.TypeError("'{0}' is an invalid keyword argument for this function", key));
+                        return LightExceptions.Throw(PythonOps.TypeError("'{0}' is an invalid keyword argument for this function", kvp.Key));
                 }
             }
 
@@ -1504,7 +1607,7 @@ namespace IronPython.Modules {
                     return LightExceptions.Throw(ToPythonException(e, path));
                 }
             } else if (RuntimeInformation.IsOSPlatform(OSPlatform.Linux) || RuntimeInformation.IsOSPlatform(OSPlatform.OSX)) {
-                return statUnix(path);
+                return follow_symlinks ? statUnix(path) : lstatUnix(path);
             } else {
                 throw new PlatformNotSupportedException();
             }
@@ -5,6 +5,7 @@
 #nullable enable
 
 using System;
+using System.Collections.Generic;
 using System.IO;
 using System.Numerics;
 using System.Runtime.InteropServices;
@@ -154,6 +155,16 @@ namespace IronPython.Modules {
         }
 
 
+        [SupportedOSPlatform("linux")]
+        [SupportedOSPlatform("macos")]
+        private static object lstatUnix(string path) {
+            if (Syscall.lstat(path, out Stat buf) == 0) {
+                return new stat_result(buf);
+            }
+            return LightExceptions.Throw(GetLastUnixError(path));
+        }
+
+
         [SupportedOSPlatform("linux")]
         [SupportedOSPlatform("macos")]
         private static object fstatUnix(int fd) {
@@ -203,6 +214,55 @@ namespace IronPython.Modules {
         }
 
 
+        [Documentation(@"sendfile(out_fd, in_fd, offset, count) -> byteswritten
+
+Copy count bytes from file descriptor in_fd to file descriptor out_fd,
+starting at offset, without passing the data through user space.
+If offset is None, data is read from the current position of in_fd and
+the position is updated.")]
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        [SupportedOSPlatform("linux")]
+        public static int sendfile(CodeContext context, int out_fd, int in_fd, object? offset, long count) {
+            if (count < 0) throw GetOsError(PythonErrno.EINVAL);
+
+            PythonFileManager fileManager = context.LanguageContext.FileManager;
+            // buffered writes must reach the descriptor before the kernel appends to it
+            if (fileManager.TryGetStreams(out_fd, out StreamBox? outStreams)) outStreams.Flush();
+
+            Stream? inStream = null;
+            long pos;
+            if (offset is not null) {
+                pos = Converter.ConvertToInt64(offset);
+            } else if (fileManager.TryGetStreams(in_fd, out StreamBox? inStreams) && inStreams.ReadStream.CanSeek) {
+                // the stream may have read ahead of the descriptor position
+                inStream = inStreams.ReadStream;
+                pos = inStream.Position;
+            } else {
+                pos = Syscall.lseek(in_fd, 0, SeekFlags.SEEK_CUR);
+                if (pos < 0) throw GetLastUnixError();
+            }
+
+            long result;
+            Errno errno;
+            do {
+                result = Syscall.sendfile(out_fd, in_fd, ref pos, (ulong)count);
+            } while (UnixMarshal.ShouldRetrySyscall(result < 0 ? -1 : 0, out errno));
+
+            if (errno != 0)
+                throw GetOsError(NativeConvert.FromErrno(errno));
+
+            if (offset is null) {
+                if (inStream is not null) {
+                    inStream.Position = pos;
+                } else if (Syscall.lseek(in_fd, pos, SeekFlags.SEEK_SET) < 0) {
+                    throw GetLastUnixError();
+                }
+            }
+            // Linux transfers at most 0x7ffff000 bytes per call
+            return (int)result;
+        }
+
+
         [SupportedOSPlatform("linux")]
         [SupportedOSPlatform("macos")]
         private static void utimeUnix(string path, long atime_ns, long utime_ns) {
@@ -220,6 +280,64 @@ namespace IronPython.Modules {
         }
 
 
+        [SupportedOSPlatform("linux")]
+        [SupportedOSPlatform("macos")]
+        private static ScandirIterator ScandirUnix(CodeContext context, string path, bool asBytes) {
+            IntPtr ptr = Syscall.opendir(path);
+            if (ptr == IntPtr.Zero) throw GetLastUnixError(path);
+            var dir = new DirHandle(ptr);
+            return new ScandirIterator(ReadDirUnix(context, dir, path, asBytes), dir);
+        }
+
+
+        [SupportedOSPlatform("linux")]
+        [SupportedOSPlatform("macos")]
+        private static IEnumerable<DirEntry> ReadDirUnix(CodeContext context, DirHandle dir, string path, bool asBytes) {
+            try {
+                // the entry type and inode come with readdir and save a stat per entry
+                Dirent? entry;
+                while ((entry = ReadDir(dir)) is not null) {
+                    if (entry.d_name == "." || entry.d_name == "..") continue;
+                    yield return new DirEntry(context, path, entry.d_name, entry.d_type, entry.d_ino, asBytes);
+                }
+            } finally {
+                // like CPython, close the directory as soon as it's exhausted
+                dir.Dispose();
+            }
+        }
+
+
+        [SupportedOSPlatform("linux")]
+        [SupportedOSPlatform("macos")]
+        private static Dirent? ReadDir(DirHandle dir) {
+            bool success = false;
+            try {
+                // keeps the directory open if the iterator is closed from another thread
+                dir.DangerousAddRef(ref success);
+                return Syscall.readdir(dir.DangerousGetHandle());
+            } finally {
+                if (success) dir.DangerousRelease();
+            }
+        }
+
+
+        /// <summary>
+        /// A directory stream opened by scandir, closed when the iterator is exhausted, closed or
+        /// collected.
+        /// </summary>
+        [SupportedOSPlatform("linux")]
+        [SupportedOSPlatform("macos")]
+        private sealed class DirHandle : SafeHandle {
+            public DirHandle(IntPtr dir) : base(IntPtr.Zero, ownsHandle: true) {
+                SetHandle(dir);
+            }
+
+            public override bool IsInvalid => handle == IntPtr.Zero;
+
+            protected override bool ReleaseHandle() => Syscall.closedir(handle) == 0;
+        }
+
+
         [SupportedOSPlatform("linux")]
         [SupportedOSPlatform("macos")]
         private static void killUnix(int pid, int sig) {
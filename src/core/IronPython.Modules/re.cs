@@ -6,14 +6,17 @@
 
 using System;
 using System.Collections;
+using System.Collections.Concurrent;
 using System.Collections.Generic;
 using System.Diagnostics;
+using System.Diagnostics.CodeAnalysis;
 using System.Globalization;
 using System.Linq;
 using System.Runtime.CompilerServices;
 using System.Runtime.InteropServices;
 using System.Text;
 using System.Text.RegularExpressions;
+using System.Threading;
 
 using IronPython.Runtime;
 using IronPython.Runtime.Exceptions;
@@ -32,7 +35,11 @@ namespace IronPython.Modules {
     /// Python regular expression module.
     /// </summary>
     public static class PythonRegex {
-        private static CacheDict<PatternKey, Pattern> _cachedPatterns = new CacheDict<PatternKey, Pattern>(100);
+        private const int DefaultCacheSize = 512;
+        private const int DefaultCompileThreshold = 100;
+
+        private static readonly PatternCache _cachedPatterns = new PatternCache(DefaultCacheSize);
+        private static int _compileThreshold = DefaultCompileThreshold;
 
         [SpecialName]
         public static void PerformModuleReload(PythonContext/*!*/ context, PythonDictionary/*!*/ dict) {
@@ -86,7 +93,7 @@ namespace IronPython.Modules {
         #region Public API Surface
 
         public static Pattern compile(CodeContext/*!*/ context, object? pattern, int flags = 0)
-            => GetPattern(context, pattern, flags, true);
+            => GetPattern(context, pattern, flags);
 
         public const string engine = "cli reg ex";
 
@@ -145,9 +152,32 @@ namespace IronPython.Modules {
             => GetPattern(context, pattern, flags).subn(context, repl, @string, count);
 
         public static void purge() {
-            _cachedPatterns = new CacheDict<PatternKey, Pattern>(100);
+            _cachedPatterns.Clear();
+        }
+
+        /// <summary>
+        /// Sets the maximum number of patterns kept in the cache, 0 disables caching.
+        /// </summary>
+        public static void _set_cache_size(int maxsize) {
+            if (maxsize < 0) throw PythonOps.ValueError("maxsize must be non-negative");
+            _cachedPatterns.MaxSize = maxsize;
         }
 
+        /// <summary>
+        /// Sets how much a pattern has to be used before it is compiled to IL, 0 compiles every
+        /// pattern up front and -1 never compiles them.  Large inputs count for more than one use.
+        /// </summary>
+        public static void _set_compile_threshold(int threshold) {
+            if (threshold < -1) throw PythonOps.ValueError("threshold must be -1 or greater");
+            _compileThreshold = threshold;
+        }
+
+        /// <summary>
+        /// Returns a (pattern, flags, hits, compiled) tuple for each cached pattern, most used first.
+        /// </summary>
+        public static PythonList _cache_info()
+            => _cachedPatterns.GetInfo();
+
         #endregion
 
         #region Public classes
@@ -157,19 +187,21 @@ namespace IronPython.Modules {
         /// </summary>
         [PythonType]
         public class Pattern : IWeakReferenceable {
-            internal readonly Regex _re;
+            internal volatile Regex _re; // replaced by a compiled version once the pattern is hot
             internal readonly string _prePattern;
             private PythonDictionary? _groups;
             private WeakRefTracker? _weakRefTracker;
+            private int _uses;
+            private readonly object _lock = new object();
 
-            internal Pattern(CodeContext/*!*/ context, object pattern, ReFlags flags = 0, bool compiled = false) {
+            internal Pattern(CodeContext/*!*/ context, object pattern, ReFlags flags = 0) {
                 _prePattern = PreParseRegex(context, PatternAsString(pattern, ref flags), verbose: flags.HasFlag(ReFlags.VERBOSE), isBytes: !flags.HasFlag(ReFlags.UNICODE), out ReFlags options);
                 flags |= options;
 #if PYTHON_36_OR_GREATER
                 if (flags.HasFlag(ReFlags.UNICODE | ReFlags.LOCALE)) throw PythonOps.ValueError("cannot use LOCALE flag with a str pattern");
 #endif
                 if (flags.HasFlag(ReFlags.ASCII | ReFlags.LOCALE)) throw PythonOps.ValueError("ASCII and LOCALE flags are incompatible");
-                _re = GenRegex(context, _prePattern, flags, compiled, false);
+                _re = GenRegex(context, _prePattern, flags, _compileThreshold == 0, false);
                 this.pattern = pattern;
                 this.flags = (int)flags;
 
@@ -198,6 +230,36 @@ namespace IronPython.Modules {
                 }
             }
 
+            /// <summary>
+            /// Gets the regex to run over the input, counting the use towards compiling the pattern.
+            /// </summary>
+            private Regex GetRegex(string input) {
+                Regex re = _re;
+                if ((re.Options & RegexOptions.Compiled) == 0) {
+                    int threshold = _compileThreshold;
+                    // weigh large inputs by their size so a single scan over a big buffer gets compiled code
+                    if (threshold >= 0 && Interlocked.Add(ref _uses, 1 + (input.Length >> 10)) >= threshold) {
+                        re = Promote();
+                    }
+                }
+                return re;
+            }
+
+            private Regex Promote() {
+                lock (_lock) {
+                    Regex re = _re;
+                    if ((re.Options & RegexOptions.Compiled) == 0) {
+                        // the pattern was already parsed successfully so recreating it can't fail
+                        Regex? fullmatch = _re_fullmatch;
+                        if (fullmatch != null) {
+                            _re_fullmatch = new Regex(fullmatch.ToString(), fullmatch.Options | RegexOptions.Compiled);
+                        }
+                        _re = re = new Regex(re.ToString(), re.Options | RegexOptions.Compiled);
+                    }
+                    return re;
+                }
+            }
+
             private static int FixPosition(string text, int position) {
                 if (position <= 0) return 0;
                 if (position > text.Length) return text.Length;
@@ -227,26 +289,26 @@ namespace IronPython.Modules {
 
             public Match? match(object? @string) {
                 string input = ValidateString(@string);
-                return Match.MakeMatch(_re.Match(input), this, input, 0, input.Length);
+                return Match.MakeMatch(GetRegex(input).Match(input), this, @string, input, 0, input.Length);
             }
 
             public Match? match(object? @string, int pos) {
                 string input = ValidateString(@string);
                 pos = FixPosition(input, pos);
-                return Match.MakeMatch(_re.Match(input, pos), this, input, pos, input.Length);
+                return Match.MakeMatch(GetRegex(input).Match(input, pos), this, @string, input, pos, input.Length);
             }
 
             public Match? match(object? @string, [DefaultParameterValue(0)] int pos, int endpos) {
-                string input = ValidateString(@string);
+                string input = ValidateString(@string, endpos);
                 pos = FixPosition(input, pos);
-                endpos = FixPosition(input, endpos);
-                return Match.MakeMatch(_re.Match(input.Substring(0, endpos), pos), this, input, pos, endpos);
+                return Match.MakeMatch(GetRegex(input).Match(input, pos), this, @string, input, pos, input.Length);
             }
 
-            private Regex? _re_fullmatch;
-            private Regex GetRegexFullMatch(CodeContext /*!*/ context) {
+            private volatile Regex? _re_fullmatch;
+            private Regex GetRegexFullMatch(CodeContext /*!*/ context, string input) {
+                GetRegex(input); // count the use, fullmatch shares the compilation state of the pattern
                 if (_re_fullmatch == null) {
-                    lock (_re) {
+                    lock (_lock) {
                         if (_re_fullmatch == null)
                             _re_fullmatch = GenRegex(context, _prePattern, (ReFlags)flags, _re.Options.HasFlag(RegexOptions.Compiled), true);
                     }
@@ -257,59 +319,56 @@ namespace IronPython.Modules {
 
             public Match? fullmatch(CodeContext/*!*/ context, object? @string) {
                 string input = ValidateString(@string);
-                return Match.MakeFullMatch(GetRegexFullMatch(context).Match(input, 0), this, input, 0, input.Length);
+                return Match.MakeFullMatch(GetRegexFullMatch(context, input).Match(input, 0), this, @string, input, 0, input.Length);
             }
 
             public Match? fullmatch(CodeContext/*!*/ context, object? @string, int pos) {
                 string input = ValidateString(@string);
                 pos = FixPosition(input, pos);
-                return Match.MakeFullMatch(GetRegexFullMatch(context).Match(input, pos), this, input, pos, input.Length);
+                return Match.MakeFullMatch(GetRegexFullMatch(context, input).Match(input, pos), this, @string, input, pos, input.Length);
             }
 
             public Match? fullmatch(CodeContext/*!*/ context, object? @string, [DefaultParameterValue(0)] int pos, int endpos) {
-                string input = ValidateString(@string);
+                string input = ValidateString(@string, endpos);
                 pos = FixPosition(input, pos);
-                endpos = FixPosition(input, endpos);
-                return Match.MakeFullMatch(GetRegexFullMatch(context).Match(input.Substring(0, endpos), pos), this, input, pos, endpos);
+                return Match.MakeFullMatch(GetRegexFullMatch(context, input).Match(input, pos), this, @string, input, pos, input.Length);
             }
 
             public Match? search(object? @string) {
                 string input = ValidateString(@string);
-                return Match.Make(_re.Match(input), this, input);
+                return Match.Make(GetRegex(input).Match(input), this, @string, input);
             }
 
             public Match? search(object? @string, int pos) {
                 string input = ValidateString(@string);
                 pos = FixPosition(input, pos);
-                return Match.Make(_re.Match(input, pos), this, input);
+                return Match.Make(GetRegex(input).Match(input, pos), this, @string, input);
             }
 
             public Match? search(object? @string, [DefaultParameterValue(0)] int pos, int endpos) {
-                string input = ValidateString(@string);
+                string input = ValidateString(@string, endpos);
                 pos = FixPosition(input, pos);
-                endpos = FixPosition(input, endpos);
-                return Match.Make(_re.Match(input.Substring(0, endpos), pos), this, input);
+                return Match.Make(GetRegex(input).Match(input, pos), this, @string, input);
             }
 
             public PythonList findall(CodeContext/*!*/ context, object? @string) {
                 string input = ValidateString(@string);
-                return FixFindAllMatch(FindAllWorker(context, input, 0, input.Length));
+                return FixFindAllMatch(FindAllWorker(context, input, 0), input);
             }
 
             public PythonList findall(CodeContext/*!*/ context, object? @string, int pos) {
                 string input = ValidateString(@string);
                 pos = FixPosition(input, pos);
-                return FixFindAllMatch(FindAllWorker(context, input, pos, input.Length));
+                return FixFindAllMatch(FindAllWorker(context, input, pos), input);
             }
 
             public PythonList findall(CodeContext/*!*/ context, object? @string, [DefaultParameterValue(0)] int pos, int endpos) {
-                string input = ValidateString(@string);
+                string input = ValidateString(@string, endpos);
                 pos = FixPosition(input, pos);
-                endpos = FixPosition(input, endpos);
-                return FixFindAllMatch(FindAllWorker(context, input, pos, endpos));
+                return FixFindAllMatch(FindAllWorker(context, input, pos), input);
             }
 
-            private PythonList FixFindAllMatch(MatchCollection mc) {
+            private PythonList FixFindAllMatch(MatchCollection mc, string input) {
                 object[] matches = new object[mc.Count];
                 int numgrps = _re.GetGroupNumbers().Length;
                 for (int i = 0; i < mc.Count; i++) {
@@ -329,7 +388,7 @@ namespace IronPython.Modules {
                             //  the first match object...so we'll skip the first item when creating the
                             //  tuple
                             if (k++ != 0) {
-                                tpl.Add(ToPatternType(g.Value));
+                                tpl.Add(ToPatternType(input, g.Index, g.Length));
                             }
                         }
                         matches[i] = PythonTuple.MakeTuple(tpl.ToArray());
@@ -339,35 +398,34 @@ namespace IronPython.Modules {
                         //  skip the first match since that contains the entire match and not the group match
                         //  e.g. re.findall(r"(\w+)\s+fish\b", "green fish") will have "green fish" in the 0
                         //  index and "green" as the (\w+) group match
-                        matches[i] = ToPatternType(mc[i].Groups[1].Value);
+                        matches[i] = ToPatternType(input, mc[i].Groups[1].Index, mc[i].Groups[1].Length);
                     } else {
-                        matches[i] = ToPatternType(mc[i].Value);
+                        matches[i] = ToPatternType(input, mc[i].Index, mc[i].Length);
                     }
                 }
 
                 return PythonList.FromArrayNoCopy(matches);
             }
 
-            internal MatchCollection FindAllWorker(CodeContext/*!*/ context, string input, int pos, int endpos) {
-                return _re.Matches(input.Substring(0, endpos), pos);
+            internal MatchCollection FindAllWorker(CodeContext/*!*/ context, string input, int pos) {
+                return GetRegex(input).Matches(input, pos);
             }
 
             public object finditer(CodeContext/*!*/ context, object? @string) {
                 string input = ValidateString(@string);
-                return MatchIterator(FindAllWorker(context, input, 0, input.Length), this, input);
+                return MatchIterator(FindAllWorker(context, input, 0), this, @string, input);
             }
 
             public object finditer(CodeContext/*!*/ context, object? @string, int pos) {
                 string input = ValidateString(@string);
                 pos = FixPosition(input, pos);
-                return MatchIterator(FindAllWorker(context, input, pos, input.Length), this, input);
+                return MatchIterator(FindAllWorker(context, input, pos), this, @string, input);
             }
 
             public object finditer(CodeContext/*!*/ context, object? @string, [DefaultParameterValue(0)] int pos, int endpos) {
-                string input = ValidateString(@string);
+                string input = ValidateString(@string, endpos);
                 pos = FixPosition(input, pos);
-                endpos = FixPosition(input, endpos);
-                return MatchIterator(FindAllWorker(context, input, pos, endpos), this, input);
+                return MatchIterator(FindAllWorker(context, input, pos), this, @string, input);
             }
 
             public PythonList split(object? @string, int maxsplit = 0) {
@@ -378,17 +436,17 @@ namespace IronPython.Modules {
                     result.AddNoLock(ToPatternType(input));
                 } else {
                     // iterate over all matches
-                    MatchCollection matches = _re.Matches(input);
+                    MatchCollection matches = GetRegex(input).Matches(input);
                     int lastPos = 0; // is either start of the string, or first position *after* the last match
                     int nSplits = 0; // how many splits have occurred?
                     foreach (RegExpMatch m in matches.Cast<RegExpMatch>()) {
                         if (m.Length > 0) {
                             // add substring from lastPos to beginning of current match
-                            result.AddNoLock(ToPatternType(input.Substring(lastPos, m.Index - lastPos)));
+                            result.AddNoLock(ToPatternType(input, lastPos, m.Index - lastPos));
                             // if there are subgroups of the match, add their match or None
                             if (m.Groups.Count > 1)
                                 for (int i = 1; i < m.Groups.Count; i++) {
-                                    result.AddNoLock(GetGroupValue(m.Groups[i]));
+                                    result.AddNoLock(GetGroupValue(input, m.Groups[i]));
                                 }
                             // update lastPos, nSplits
                             lastPos = m.Index + m.Length;
@@ -398,7 +456,7 @@ namespace IronPython.Modules {
                         }
                     }
                     // add tail following last match
-                    result.AddNoLock(ToPatternType(input.Substring(lastPos)));
+                    result.AddNoLock(ToPatternType(input, lastPos, input.Length - lastPos));
                 }
                 return result;
             }
@@ -412,7 +470,7 @@ namespace IronPython.Modules {
 
                 int prevEnd = -1;
                 string input = ValidateString(@string);
-                return ToPatternType(_re.Replace(
+                return ToPatternType(GetRegex(input).Replace(
                     input,
                     delegate (RegExpMatch match) {
                         //  from the docs: Empty matches for the pattern are replaced 
@@ -423,7 +481,7 @@ namespace IronPython.Modules {
                         prevEnd = match.Index + match.Length;
 
                         if (replacement != null) return UnescapeGroups(context, match, replacement);
-                        return ValidateString(PythonCalls.Call(context, repl, Match.Make(match, this, input)));
+                        return ValidateString(PythonCalls.Call(context, repl, Match.Make(match, this, @string, input)));
                     },
                     count));
             }
@@ -439,7 +497,7 @@ namespace IronPython.Modules {
 
                 int prevEnd = -1;
                 string input = ValidateString(@string);
-                res = _re.Replace(
+                res = GetRegex(input).Replace(
                     input,
                     delegate (RegExpMatch match) {
                         //  from the docs: Empty matches for the pattern are replaced 
@@ -452,11 +510,11 @@ namespace IronPython.Modules {
                         totalCount++;
                         if (replacement != null) return UnescapeGroups(context, match, replacement);
 
-                        return ValidateString(PythonCalls.Call(context, repl, Match.Make(match, this, input)));
+                        return ValidateString(PythonCalls.Call(context, repl, Match.Make(match, this, @string, input)));
                     },
                     count);
 
-                return PythonTuple.MakeTuple(res, totalCount);
+                return PythonTuple.MakeTuple(ToPatternType(res), totalCount);
             }
 
             public int flags { get; }
@@ -503,17 +561,26 @@ namespace IronPython.Modules {
 
             #endregion
 
-            private string ValidateString(object? @string) {
+            /// <summary>
+            /// Gets the text to run the regular expression over, the Latin-1 view for bytes-like
+            /// objects.  The text ends at endpos so only the part which can be searched is copied.
+            /// </summary>
+            private string ValidateString(object? @string, int endpos = int.MaxValue) {
+                if (endpos < 0) endpos = 0;
                 string str;
                 if (pattern is Bytes) {
                     switch (@string) {
+                        case Bytes bytes:
+                            str = bytes.UnsafeByteArray.MakeString(endpos);
+                            break;
                         case IBufferProtocol bufferProtocol:
                             using (IPythonBuffer buf = bufferProtocol.GetBuffer()) {
-                                str = buf.AsReadOnlySpan().MakeString();
+                                ReadOnlySpan<byte> span = buf.AsReadOnlySpan();
+                                str = span.Slice(0, Math.Min(span.Length, endpos)).MakeString();
                             }
                             break;
                         case IList<byte> b:
-                            str = b.MakeString();
+                            str = b.MakeString(endpos);
                             break;
                         case string _:
                         case ExtensibleString _:
@@ -535,6 +602,9 @@ namespace IronPython.Modules {
                         default:
                             throw PythonOps.TypeError("expected string or bytes-like object");
                     }
+                    if (endpos < str.Length) {
+                        str = str.Substring(0, endpos);
+                    }
                 } else {
                     throw PythonOps.TypeError("pattern must be a string or compiled pattern");
                 }
@@ -580,8 +650,21 @@ namespace IronPython.Modules {
             internal object ToPatternType(string value)
                 => pattern is Bytes ? Bytes.Make(value.MakeByteArray()) : (object)value;
 
-            internal object? GetGroupValue(Group g, object? @default = null)
-                => g.Success ? ToPatternType(g.Value) : @default;
+            /// <summary>
+            /// Converts a slice of the searched text, narrowing it straight into the result for
+            /// bytes patterns rather than going through an intermediate substring.
+            /// </summary>
+            internal object ToPatternType(string text, int index, int length) {
+                if (pattern is Bytes) {
+                    byte[] res = new byte[length];
+                    StringOps.Latin1Encoding.GetBytes(text, index, length, res, 0);
+                    return Bytes.Make(res);
+                }
+                return text.Substring(index, length);
+            }
+
+            internal object? GetGroupValue(string text, Group g, object? @default = null)
+                => g.Success ? ToPatternType(text, g.Index, g.Length) : @default;
         }
 
         public static PythonTuple _pickle(CodeContext/*!*/ context, [NotNone] Pattern pattern) {
@@ -595,27 +678,28 @@ namespace IronPython.Modules {
         [PythonType]
         public sealed class Match {
             private readonly RegExpMatch _m;
+            private readonly string _text;
             private int _lastindex = -1;
 
             #region Internal makers
 
-            internal static Match? Make(RegExpMatch m, Pattern pattern, string input) {
-                if (m.Success) return new Match(m, pattern, input, 0, input.Length);
+            internal static Match? Make(RegExpMatch m, Pattern pattern, object? @string, string input) {
+                if (m.Success) return new Match(m, pattern, @string, input, 0, input.Length);
                 return null;
             }
 
-            internal static Match? Make(RegExpMatch m, Pattern pattern, string input, int offset, int endpos) {
-                if (m.Success) return new Match(m, pattern, input, offset, endpos);
+            internal static Match? Make(RegExpMatch m, Pattern pattern, object? @string, string input, int offset, int endpos) {
+                if (m.Success) return new Match(m, pattern, @string, input, offset, endpos);
                 return null;
             }
 
-            internal static Match? MakeMatch(RegExpMatch m, Pattern pattern, string input, int offset, int endpos) {
-                if (m.Success && m.Index == offset) return new Match(m, pattern, input, offset, endpos);
+            internal static Match? MakeMatch(RegExpMatch m, Pattern pattern, object? @string, string input, int offset, int endpos) {
+                if (m.Success && m.Index == offset) return new Match(m, pattern, @string, input, offset, endpos);
                 return null;
             }
 
-            internal static Match? MakeFullMatch(RegExpMatch m, Pattern pattern, string input, int offset, int endpos) {
-                if (m.Success && m.Index == offset && m.Length == endpos - offset) return new Match(m, pattern, input, offset, endpos);
+            internal static Match? MakeFullMatch(RegExpMatch m, Pattern pattern, object? @string, string input, int offset, int endpos) {
+                if (m.Success && m.Index == offset && m.Length == endpos - offset) return new Match(m, pattern, @string, input, offset, endpos);
                 return null;
             }
 
@@ -623,10 +707,13 @@ namespace IronPython.Modules {
 
             #region Private ctors
 
-            private Match(RegExpMatch m, Pattern pattern, string text, int pos, int endpos) {
+            /// <param name="string">The object which was searched.</param>
+            /// <param name="text">The text the regular expression was run over, the Latin-1 view for bytes-like objects.</param>
+            private Match(RegExpMatch m, Pattern pattern, object? @string, string text, int pos, int endpos) {
                 _m = m;
+                _text = text;
                 re = pattern;
-                @string = text;
+                this.@string = @string;
                 this.pos = pos;
                 this.endpos = endpos;
             }
@@ -660,15 +747,15 @@ namespace IronPython.Modules {
                 }
 
                 object?[] res = new object[additional.Length + 1];
-                res[0] = re.GetGroupValue(GetGroup(index));
+                res[0] = re.GetGroupValue(_text, GetGroup(index));
                 for (int i = 1; i < res.Length; i++) {
-                    res[i] = re.GetGroupValue(GetGroup(additional[i - 1]));
+                    res[i] = re.GetGroupValue(_text, GetGroup(additional[i - 1]));
                 }
                 return PythonTuple.MakeTuple(res);
             }
 
             public object? group(object? index)
-                => re.GetGroupValue(GetGroup(index));
+                => re.GetGroupValue(_text, GetGroup(index));
 
             public object? group() => group(0);
 
@@ -677,7 +764,7 @@ namespace IronPython.Modules {
             public PythonTuple groups(object? @default) {
                 object?[] ret = new object[_m.Groups.Count - 1];
                 for (int i = 0; i < ret.Length; i++) {
-                    ret[i] = re.GetGroupValue(_m.Groups[i + 1], @default);
+                    ret[i] = re.GetGroupValue(_text, _m.Groups[i + 1], @default);
                 }
                 return PythonTuple.MakeTuple(ret);
             }
@@ -751,7 +838,7 @@ namespace IronPython.Modules {
                     var groupName = groupNames[i];
                     if (IsGroupNumber(groupName)) continue; // python doesn't report group numbers
                     if (groupName.StartsWith(_mangledNamedGroup, StringComparison.Ordinal)) continue; // don't include unnamed groups
-                    d[groupName] = re.GetGroupValue(_m.Groups[i], @default);
+                    d[groupName] = re.GetGroupValue(_text, _m.Groups[i], @default);
                 }
                 return d;
 
@@ -773,7 +860,7 @@ namespace IronPython.Modules {
 
             public int endpos { get; }
 
-            public string @string { get; }
+            public object? @string { get; }
 
             public PythonTuple regs {
                 get {
@@ -870,7 +957,7 @@ namespace IronPython.Modules {
 
         #region Private helper functions
 
-        private static Pattern GetPattern(CodeContext/*!*/ context, object? pattern, int flags, bool compiled = false) {
+        private static Pattern GetPattern(CodeContext/*!*/ context, object? pattern, int flags) {
             switch (pattern) {
                 case Pattern p:
                     return p;
@@ -883,21 +970,16 @@ namespace IronPython.Modules {
             }
 
             PatternKey key = new PatternKey(pattern.GetType(), pattern, flags);
-            lock (_cachedPatterns) {
-                if (_cachedPatterns.TryGetValue(key, out Pattern res)) {
-                    if (!compiled || res._re.Options.HasFlag(RegexOptions.Compiled)) {
-                        return res;
-                    }
-                }
-                res = new Pattern(context, pattern, (ReFlags)flags, compiled);
-                _cachedPatterns[key] = res;
-                return res;
+            if (!_cachedPatterns.TryGetValue(key, out Pattern? res)) {
+                res = new Pattern(context, pattern, (ReFlags)flags);
+                _cachedPatterns.Add(key, res);
             }
+            return res;
         }
 
-        private static IEnumerator MatchIterator(MatchCollection matches, Pattern pattern, string input) {
+        private static IEnumerator MatchIterator(MatchCollection matches, Pattern pattern, object? @string, string input) {
             for (int i = 0; i < matches.Count; i++) {
-                yield return Match.Make(matches[i], pattern, input, 0, input.Length);
+                yield return Match.Make(matches[i], pattern, @string, input, 0, input.Length);
             }
         }
 
@@ -1321,6 +1403,111 @@ namespace IronPython.Modules {
 
         private static PythonType error(CodeContext/*!*/ context) => (PythonType)context.LanguageContext.GetModuleState("reerror");
 
+        /// <summary>
+        /// Thread-safe cache of the patterns used by the module level functions and compile.
+        ///
+        /// Lookups don't take a lock.  Each entry records its hits and when it was last used, once
+        /// the cache grows past its size the least recently used entries are dropped in a batch so
+        /// the cost of finding them is spread over many additions.
+        /// </summary>
+        private sealed class PatternCache {
+            private readonly ConcurrentDictionary<PatternKey, Entry> _entries = new ConcurrentDictionary<PatternKey, Entry>();
+            private readonly object _trimLock = new object();
+            private long _clock;
+            private int _maxSize;
+
+            public PatternCache(int maxSize) {
+                _maxSize = maxSize;
+            }
+
+            public int MaxSize {
+                get => _maxSize;
+                set {
+                    _maxSize = value;
+                    Trim();
+                }
+            }
+
+            public bool TryGetValue(PatternKey key, [NotNullWhen(true)] out Pattern? pattern) {
+                if (_entries.TryGetValue(key, out Entry? entry)) {
+                    entry.Hit(Interlocked.Increment(ref _clock));
+                    pattern = entry.Pattern;
+                    return true;
+                }
+
+                pattern = null;
+                return false;
+            }
+
+            public void Add(PatternKey key, Pattern pattern) {
+                if (_maxSize == 0) return;
+
+                _entries[key] = new Entry(pattern, Interlocked.Increment(ref _clock));
+                if (_entries.Count > _maxSize) {
+                    Trim();
+                }
+            }
+
+            public void Clear() => _entries.Clear();
+
+            public PythonList GetInfo() {
+                // sort on a snapshot of the counters, they keep changing while we sort
+                var entries = _entries.Values.ToArray();
+                var hits = new int[entries.Length];
+                for (int i = 0; i < entries.Length; i++) {
+                    hits[i] = -entries[i].Hits;
+                }
+                Array.Sort(hits, entries);
+
+                var res = new PythonList(entries.Length);
+                foreach (Entry entry in entries) {
+                    Pattern p = entry.Pattern;
+                    res.AddNoLock(PythonTuple.MakeTuple(p.pattern, p.flags, entry.Hits, p._re.Options.HasFlag(RegexOptions.Compiled)));
+                }
+                return res;
+            }
+
+            private void Trim() {
+                lock (_trimLock) {
+                    int maxSize = _maxSize;
+                    int count = _entries.Count;
+                    if (count <= maxSize) return;
+
+                    var entries = _entries.ToArray();
+                    var lastUse = new long[entries.Length];
+                    for (int i = 0; i < entries.Length; i++) {
+                        lastUse[i] = entries[i].Value.LastUse;
+                    }
+                    Array.Sort(lastUse, entries);
+
+                    int remove = Math.Max(count - maxSize, maxSize / 4);
+                    for (int i = 0; i < remove && i < entries.Length; i++) {
+                        _entries.TryRemove(entries[i].Key, out _);
+                    }
+                }
+            }
+
+            private sealed class Entry {
+                public readonly Pattern Pattern;
+                private long _lastUse;
+                private int _hits;
+
+                public Entry(Pattern pattern, long clock) {
+                    Pattern = pattern;
+                    _lastUse = clock;
+                }
+
+                public long LastUse => Volatile.Read(ref _lastUse);
+
+                public int Hits => Volatile.Read(ref _hits);
+
+                public void Hit(long clock) {
+                    Volatile.Write(ref _lastUse, clock);
+                    Interlocked.Increment(ref _hits);
+                }
+            }
+        }
+
         private readonly struct PatternKey : IEquatable<PatternKey> {
             public readonly Type Type;
             public readonly object Pattern;
@@ -8,6 +8,7 @@ using System;
 using System.Collections;
 using System.Collections.Generic;
 using System.Net.Sockets;
+using System.Threading;
 
 using IronPython.Runtime;
 using IronPython.Runtime.Exceptions;
@@ -18,11 +19,23 @@ using Microsoft.Scripting.Runtime;
 
 [assembly: PythonModule("select", typeof(IronPython.Modules.PythonSelect))]
 namespace IronPython.Modules {
-    public static class PythonSelect {
+    public static partial class PythonSelect {
         public const string __doc__ = "Provides support for asynchronous socket operations.";
 
         public static PythonType error => PythonExceptions.OSError;
 
+        public const int POLLIN = 0x001;
+        public const int POLLPRI = 0x002;
+        public const int POLLOUT = 0x004;
+        public const int POLLERR = 0x008;
+        public const int POLLHUP = 0x010;
+        public const int POLLNVAL = 0x020;
+        public const int POLLRDNORM = 0x040;
+        public const int POLLRDBAND = 0x080;
+        public const int POLLWRNORM = 0x100;
+        public const int POLLWRBAND = 0x200;
+        public const int POLLMSG = 0x400;
+
         #region Public API
 
         [Documentation("select(iwtd, owtd, ewtd[, timeout]) -> readlist, writelist, errlist\n\n"
@@ -76,6 +89,206 @@ namespace IronPython.Modules {
             return PythonTuple.MakeTuple(readerList, writerList, errorList);
         }
 
+        [Documentation("poll() -> poll object\n\n"
+            + "Returns a polling object, which supports registering and\n"
+            + "unregistering file descriptors, and then polling them for I/O events.\n"
+            + "\n"
+            + "Note that poll() on IronPython works only with sockets.")]
+        public static PollObject poll() {
+            return new PollObject();
+        }
+
+        [PythonType("poll"), PythonHidden]
+        public sealed class PollObject {
+            private readonly Dictionary<long, Registration> _registrations = new Dictionary<long, Registration>();
+            private bool _polling;
+
+            internal PollObject() { }
+
+            [Documentation("register(fd [, eventmask] ) -> None\n\n"
+                + "Register a file descriptor with the polling object.\n"
+                + "fd -- either an integer, or an object with a fileno() method returning an int.\n"
+                + "events -- an optional bitmask describing the type of events to check for")]
+            public void register(CodeContext/*!*/ context, object fd, int eventmask = POLLIN | POLLPRI | POLLOUT) {
+                long handle = GetHandle(context, fd);
+                Socket socket = ObjectToSocket(context, fd);
+                lock (_registrations) {
+                    _registrations[handle] = new Registration(socket, eventmask);
+                }
+            }
+
+            [Documentation("modify(fd, eventmask) -> None\n\n"
+                + "Modify an already registered file descriptor.\n"
+                + "fd -- either an integer, or an object with a fileno() method returning an int.\n"
+                + "events -- an optional bitmask describing the type of events to check for")]
+            public void modify(CodeContext/*!*/ context, object fd, int eventmask) {
+                long handle = GetHandle(context, fd);
+                lock (_registrations) {
+                    if (!_registrations.TryGetValue(handle, out Registration registration)) {
+                        throw PythonOps.OSError(PythonErrno.ENOENT, "No such file or directory");
+                    }
+                    _registrations[handle] = new Registration(registration.Socket, eventmask);
+                }
+            }
+
+            [Documentation("unregister(fd) -> None\n\n"
+                + "Remove a file descriptor being tracked by the polling object.")]
+            public void unregister(CodeContext/*!*/ context, object fd) {
+                long handle = GetHandle(context, fd);
+                lock (_registrations) {
+                    if (!_registrations.Remove(handle)) {
+                        throw PythonOps.KeyError(handle);
+                    }
+                }
+            }
+
+            [Documentation("poll( [timeout] ) -> list of (fd, event) 2-tuples\n\n"
+                + "Polls the set of registered file descriptors, returning a list containing\n"
+                + "any descriptors that have events or errors to report.\n"
+                + "The timeout is given in milliseconds, None or a negative value wait forever.")]
+            public PythonList poll(CodeContext/*!*/ context, object timeout = null) {
+                int timeoutMicroseconds = -2;
+                if (timeout != null) {
+                    if (!Converter.TryConvertToDouble(timeout, out double timeoutMilliseconds)) {
+                        throw PythonOps.TypeErrorForTypeMismatch("int or None", timeout);
+                    }
+                    if (timeoutMilliseconds >= 0) {
+                        timeoutMicroseconds = timeoutMilliseconds * 1000 >= int.MaxValue ? int.MaxValue : (int)(timeoutMilliseconds * 1000);
+                    }
+                }
+
+                KeyValuePair<long, Registration>[] registrations;
+                lock (_registrations) {
+                    if (_polling) {
+                        throw PythonOps.RuntimeError("concurrent poll() invocation");
+                    }
+                    _polling = true;
+                    registrations = new KeyValuePair<long, Registration>[_registrations.Count];
+                    ((ICollection<KeyValuePair<long, Registration>>)_registrations).CopyTo(registrations, 0);
+                }
+
+                try {
+                    return PollWorker(context, registrations, timeoutMicroseconds);
+                } finally {
+                    lock (_registrations) {
+                        _polling = false;
+                    }
+                }
+            }
+
+            private static PythonList PollWorker(CodeContext/*!*/ context, KeyValuePair<long, Registration>[] registrations, int timeoutMicroseconds) {
+                var result = new PythonList();
+                var readers = new List<Socket>();
+                var writers = new List<Socket>();
+                var errors = new List<Socket>();
+                var events = new Dictionary<Socket, int>();
+
+                foreach (var registration in registrations) {
+                    Socket socket = registration.Value.Socket;
+                    int mask = registration.Value.EventMask;
+                    if (events.ContainsKey(socket)) continue;
+
+                    events[socket] = 0;
+                    if ((mask & (POLLIN | POLLRDNORM | POLLRDBAND)) != 0) readers.Add(socket);
+                    if ((mask & (POLLOUT | POLLWRNORM | POLLWRBAND)) != 0) writers.Add(socket);
+                    errors.Add(socket);
+                }
+
+                if (events.Count == 0) {
+                    // nothing to wait for, Socket.Select rejects empty lists
+                    Thread.Sleep(timeoutMicroseconds < 0 ? Timeout.Infinite : timeoutMicroseconds / 1000);
+                    return result;
+                }
+
+                try {
+                    Socket.Select(readers.Count > 0 ? readers : null, writers.Count > 0 ? writers : null, errors, timeoutMicroseconds);
+                } catch (ObjectDisposedException) {
+                    // report the closed sockets instead of failing the whole call
+                    foreach (var registration in registrations) {
+                        if (IsClosed(registration.Value.Socket)) {
+                            result.append(PythonTuple.MakeTuple(registration.Key, POLLNVAL));
+                        }
+                    }
+                    return result;
+                } catch (SocketException e) {
+                    throw PythonSocket.MakeException(context, e);
+                }
+
+                foreach (Socket socket in readers) events[socket] |= IsHungUp(socket) ? POLLIN | POLLHUP : POLLIN;
+                foreach (Socket socket in writers) events[socket] |= POLLOUT;
+                // out-of-band data, or on Windows a connection attempt which failed
+                foreach (Socket socket in errors) events[socket] |= socket.Connected ? POLLPRI : POLLERR;
+
+                foreach (var registration in registrations) {
+                    int mask = registration.Value.EventMask;
+                    int ready = events[registration.Value.Socket];
+                    if ((ready & POLLIN) != 0) ready |= mask & (POLLRDNORM | POLLRDBAND);
+                    if ((ready & POLLOUT) != 0) ready |= mask & (POLLWRNORM | POLLWRBAND);
+                    ready &= mask | POLLERR | POLLHUP | POLLNVAL;
+                    if (ready != 0) {
+                        result.append(PythonTuple.MakeTuple(registration.Key, ready));
+                    }
+                }
+                return result;
+            }
+
+            /// <summary>
+            /// A connected stream socket which is readable but has no data to read has reached the
+            /// end of the stream, the peer closed the connection.
+            /// </summary>
+            private static bool IsHungUp(Socket socket) {
+                if (socket.SocketType != SocketType.Stream || !socket.Connected) {
+                    return false;
+                }
+                try {
+                    return socket.Available == 0;
+                } catch (ObjectDisposedException) {
+                    return false;
+                } catch (SocketException) {
+                    return true;
+                }
+            }
+
+            private static bool IsClosed(Socket socket) {
+                try {
+                    _ = socket.Available;
+                    return false;
+                } catch (ObjectDisposedException) {
+                    return true;
+                } catch (SocketException) {
+                    return false;
+                }
+            }
+
+            private readonly struct Registration {
+                public readonly Socket Socket;
+                public readonly int EventMask;
+
+                public Registration(Socket socket, int eventMask) {
+                    Socket = socket;
+                    EventMask = eventMask;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Gets the file descriptor number of an int or an object with a fileno() method.
+        /// </summary>
+        private static long GetHandle(CodeContext context, object obj) {
+            if (obj is PythonSocket.socket pythonSocket) {
+                return pythonSocket.fileno();
+            }
+
+            if (!Converter.TryConvertToInt64(obj, out long handle)) {
+                object fileno = PythonCalls.Call(context, PythonOps.GetBoundAttr(context, obj, "fileno"));
+                handle = Converter.ConvertToInt64(fileno);
+            }
+            if (handle < 0) {
+                throw PythonOps.ValueError("file descriptor cannot be a negative number ({0})", handle);
+            }
+            return handle;
+        }
+
         /// <summary>
         /// Process a sequence of objects that are compatible with ObjectToSocket(). Return two
         /// things as out params: an in-order List of sockets that correspond to the original
@@ -0,0 +1,271 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#if FEATURE_SYNC_SOCKETS
+
+#nullable enable
+
+using System;
+using System.Runtime.InteropServices;
+using System.Runtime.Versioning;
+
+using Mono.Unix.Native;
+
+using Microsoft.Scripting.Runtime;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Operations;
+
+namespace IronPython.Modules {
+    public static partial class PythonSelect {
+
+        #region epoll constants
+
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const int EPOLLIN = 0x001;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const int EPOLLPRI = 0x002;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const int EPOLLOUT = 0x004;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const int EPOLLERR = 0x008;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const int EPOLLHUP = 0x010;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const int EPOLLRDNORM = 0x040;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const int EPOLLRDBAND = 0x080;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const int EPOLLWRNORM = 0x100;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const int EPOLLWRBAND = 0x200;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const int EPOLLMSG = 0x400;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const int EPOLLRDHUP = 0x2000;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const int EPOLLEXCLUSIVE = 1 << 28;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const int EPOLLONESHOT = 1 << 30;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const uint EPOLLET = 1u << 31;
+        [PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        public const int EPOLL_CLOEXEC = 0x80000;
+
+        #endregion
+
+        [Documentation("""
+            select.epoll(sizehint=-1, flags=0)
+
+            Returns an epolling object
+
+            sizehint must be a positive integer or -1 for the default size. The
+            sizehint is used to optimize internal data structures. It doesn't limit
+            the maximum number of monitored events.
+            """)]
+        [PythonType, PythonHidden(PlatformsAttribute.PlatformFamily.Windows, PlatformID.MacOSX)]
+        [SupportedOSPlatform("linux")]
+        public class epoll {
+            private const int EPOLL_CTL_ADD = 1;
+            private const int EPOLL_CTL_DEL = 2;
+            private const int EPOLL_CTL_MOD = 3;
+            private const int DefaultMaxEvents = 1023; // FD_SETSIZE - 1, as in CPython
+
+            // struct epoll_event is packed on x86 and x86-64 only
+            private static readonly int EventDataOffset = IsEventPacked() ? sizeof(uint) : sizeof(ulong);
+            private static readonly int EventSize = EventDataOffset + sizeof(ulong);
+
+            private int _epfd;
+
+            public epoll(int sizehint = -1, int flags = 0) {
+                if (sizehint == 0 || sizehint < -1) {
+                    throw PythonOps.ValueError("negative sizehint");
+                }
+
+                // flags is ignored like in CPython, the descriptor is always close-on-exec
+                _epfd = epoll_create1(EPOLL_CLOEXEC);
+                if (_epfd < 0) {
+                    throw PythonNT.GetOsError(Marshal.GetLastWin32Error());
+                }
+            }
+
+            private epoll(int fd, bool _) {
+                _epfd = fd;
+            }
+
+            ~epoll() {
+                CloseNoThrow();
+            }
+
+            [Documentation("fromfd(fd) -> epoll\n\nCreate an epoll object from a given control fd.")]
+            public static epoll fromfd(int fd) {
+                if (fd < 0) {
+                    throw PythonOps.ValueError("file descriptor cannot be a negative integer ({0})", fd);
+                }
+                return new epoll(fd, false);
+            }
+
+            public bool closed => _epfd < 0;
+
+            [Documentation("fileno() -> int\n\nReturn the epoll control file descriptor.")]
+            public int fileno() {
+                EnsureOpen();
+                return _epfd;
+            }
+
+            [Documentation("close() -> None\n\nClose the epoll control file descriptor. Further operations on the epoll\nobject will raise an exception.")]
+            public void close() {
+                int fd = _epfd;
+                _epfd = -1;
+                GC.SuppressFinalize(this);
+                if (fd >= 0 && _close(fd) != 0) {
+                    throw PythonNT.GetOsError(Marshal.GetLastWin32Error());
+                }
+            }
+
+            [Documentation("register(fd[, eventmask]) -> None\n\nRegisters a new fd or raises an OSError if the fd is already registered.\nfd is the target file descriptor of the operation.\nevents is a bit set composed of the various EPOLL constants; the default\nis EPOLLIN | EPOLLOUT | EPOLLPRI.\n\nThe epoll interface supports all file descriptors that support poll.")]
+            public void register(CodeContext/*!*/ context, object? fd, long eventmask = EPOLLIN | EPOLLPRI | EPOLLOUT) {
+                Control(EPOLL_CTL_ADD, GetFileDescriptor(context, fd), unchecked((uint)eventmask));
+            }
+
+            [Documentation("modify(fd, eventmask) -> None\n\nfd is the target file descriptor of the operation\nevents is a bit set composed of the various EPOLL constants")]
+            public void modify(CodeContext/*!*/ context, object? fd, long eventmask) {
+                Control(EPOLL_CTL_MOD, GetFileDescriptor(context, fd), unchecked((uint)eventmask));
+            }
+
+            [Documentation("unregister(fd) -> None\n\nfd is the target file descriptor of the operation.")]
+            public void unregister(CodeContext/*!*/ context, object? fd) {
+                Control(EPOLL_CTL_DEL, GetFileDescriptor(context, fd), 0);
+            }
+
+            [Documentation("poll([timeout=-1[, maxevents=-1]]) -> [(fd, events), (...)]\n\nWait for events on the epoll file descriptor for a maximum time of timeout\nin seconds (as float). -1 makes poll wait indefinitely.\nUp to maxevents are returned to the caller.")]
+            public PythonList poll(object? timeout = null, int maxevents = -1) {
+                EnsureOpen();
+
+                int timeoutMilliseconds = -1;
+                if (timeout != null) {
+                    if (!Converter.TryConvertToDouble(timeout, out double timeoutSeconds)) {
+                        throw PythonOps.TypeErrorForTypeMismatch("float or None", timeout);
+                    }
+                    if (timeoutSeconds >= 0) {
+                        double ms = Math.Ceiling(timeoutSeconds * 1000);
+                        timeoutMilliseconds = ms >= int.MaxValue ? int.MaxValue : (int)ms;
+                    }
+                }
+
+                if (maxevents == -1) {
+                    maxevents = DefaultMaxEvents;
+                } else if (maxevents < 1) {
+                    throw PythonOps.ValueError("maxevents must be greater than 0, got {0}", maxevents);
+                }
+
+                byte[] events = new byte[maxevents * EventSize];
+                int count;
+                int errno = 0;
+                var deadline = timeoutMilliseconds > 0 ? DateTime.UtcNow.AddMilliseconds(timeoutMilliseconds) : default;
+                unsafe {
+                    fixed (byte* pEvents = events) {
+                        while ((count = epoll_wait(_epfd, pEvents, maxevents, timeoutMilliseconds)) < 0
+                            && (errno = Marshal.GetLastWin32Error()) == PythonErrno.EINTR) {
+                            // retry with the remaining time, see PEP 475
+                            if (timeoutMilliseconds > 0) {
+                                timeoutMilliseconds = Math.Max(0, (int)Math.Ceiling((deadline - DateTime.UtcNow).TotalMilliseconds));
+                            }
+                        }
+                    }
+                }
+                if (count < 0) {
+                    throw PythonNT.GetOsError(errno);
+                }
+
+                var res = new PythonList(count);
+                for (int i = 0; i < count; i++) {
+                    int offset = i * EventSize;
+                    uint eventMask = BitConverter.ToUInt32(events, offset);
+                    int fd = unchecked((int)BitConverter.ToUInt64(events, offset + EventDataOffset));
+                    res.AddNoLock(PythonTuple.MakeTuple(fd, (int)eventMask));
+                }
+                return res;
+            }
+
+            public object __enter__() {
+                EnsureOpen();
+                return this;
+            }
+
+            public void __exit__(params object?[] excinfo) {
+                close();
+            }
+
+            #region Private implementation details
+
+            private void EnsureOpen() {
+                if (_epfd < 0) {
+                    throw PythonOps.ValueError("I/O operation on closed epoll object");
+                }
+            }
+
+            private void CloseNoThrow() {
+                int fd = _epfd;
+                _epfd = -1;
+                if (fd >= 0) {
+                    _close(fd);
+                }
+            }
+
+            private void Control(int op, int fd, uint eventMask) {
+                EnsureOpen();
+
+                byte[] ev = new byte[EventSize];
+                BitConverter.GetBytes(eventMask).CopyTo(ev, 0);
+                BitConverter.GetBytes((ulong)fd).CopyTo(ev, EventDataOffset);
+
+                int result;
+                unsafe {
+                    fixed (byte* pEv = ev) {
+                        result = epoll_ctl(_epfd, op, fd, pEv);
+                    }
+                }
+                if (result != 0) {
+                    throw PythonNT.GetOsError(Marshal.GetLastWin32Error());
+                }
+            }
+
+            private static int GetFileDescriptor(CodeContext/*!*/ context, object? obj) {
+                long fd = GetHandle(context, obj);
+                if (fd > int.MaxValue) {
+                    throw PythonOps.OverflowError("file descriptor out of range");
+                }
+                return (int)fd;
+            }
+
+            private static bool IsEventPacked() {
+#if NETCOREAPP
+                return RuntimeInformation.ProcessArchitecture is Architecture.X64 or Architecture.X86;
+#else
+                if (Syscall.uname(out Utsname info) == 0) {
+                    return info.machine is "x86_64" or "i386" or "i486" or "i586" or "i686";
+                }
+                return true;
+#endif
+            }
+
+            [DllImport("libc", SetLastError = true)]
+            private static extern int epoll_create1(int flags);
+
+            [DllImport("libc", SetLastError = true)]
+            private static extern unsafe int epoll_ctl(int epfd, int op, int fd, byte* ev);
+
+            [DllImport("libc", SetLastError = true)]
+            private static extern unsafe int epoll_wait(int epfd, byte* events, int maxevents, int timeout);
+
+            [DllImport("libc", SetLastError = true, EntryPoint = "close")]
+            private static extern int _close(int fd);
+
+            #endregion
+        }
+    }
+}
+
+#endif
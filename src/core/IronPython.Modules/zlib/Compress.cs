@@ -29,8 +29,8 @@ namespace IronPython.Zlib
 
         internal Compress(int level, int method, int wbits, int memlevel, int strategy)
         {
-            zst = new ZStream();
-            int err = zst.DeflateInit(level, wbits);
+            zst = ZlibModule.CreateZStream();
+            int err = zst.DeflateInit(level, wbits, memlevel, (CompressionStrategy)strategy);
             switch(err)
             {
                 case ZlibModule.Z_OK:
@@ -53,35 +53,31 @@ Call the flush() method to clear these buffers.")]
         {
             using var buffer = data.GetBuffer();
             byte[] input = buffer.AsUnsafeArray() ?? buffer.ToArray();
-            byte[] output = new byte[ZlibModule.DEFAULTALLOC];
 
-            long start_total_out = zst.total_out;
             zst.next_in = input;
             zst.next_in_index = 0;
             zst.avail_in = input.Length;
-            zst.next_out = output;
+            zst.next_out = _output;
             zst.next_out_index = 0;
-            zst.avail_out = output.Length;
+            zst.avail_out = _output.Length;
 
             int err = zst.deflate(Z_NO_FLUSH);
 
             while(err == Z_OK && zst.avail_out == 0)
             {
-                int length = output.Length;
-                Array.Resize(ref output, output.Length * 2);
-
-                zst.next_out = output;
-                zst.avail_out = length;
-
+                ZlibModule.GrowOutput(zst, ref _output);
                 err = zst.deflate(Z_NO_FLUSH);
             }
 
+            // don't keep the caller's buffer alive
+            zst.next_in = null;
+
             if(err != Z_OK && err != Z_BUF_ERROR)
             {
                 throw ZlibModule.zlib_error(this.zst, err, "while compressing");
             }
 
-            return GetBytes(output, 0, (int)(zst.total_out - start_total_out));
+            return GetBytes(_output, 0, zst.next_out_index);
         }
 
         [Documentation(@"flush( [mode] ) -- Return a bytes object containing any remaining compressed data.
@@ -92,28 +88,20 @@ If mode == Z_FINISH, the compressor object can no longer be used after
 calling the flush() method.  Otherwise, more data can still be compressed.")]
         public Bytes flush(int mode=Z_FINISH)
         {
-            byte[] output = new byte[ZlibModule.DEFAULTALLOC];
-
             if(mode == Z_NO_FLUSH)
             {
                 return Bytes.Empty;
             }
 
-            long start_total_out = zst.total_out;
             zst.avail_in = 0;
-            zst.next_out = output;
+            zst.next_out = _output;
             zst.next_out_index = 0;
-            zst.avail_out = output.Length;
+            zst.avail_out = _output.Length;
 
             int err = zst.deflate((FlushStrategy)mode);
             while(err == Z_OK && zst.avail_out == 0)
             {
-                int old_length = output.Length;
-                Array.Resize(ref output, output.Length * 2);
-
-                zst.next_out = output;
-                zst.avail_out = old_length;
-
+                ZlibModule.GrowOutput(zst, ref _output);
                 err = zst.deflate((FlushStrategy)mode);
             }
 
@@ -130,7 +118,7 @@ calling the flush() method.  Otherwise, more data can still be compressed.")]
                 throw ZlibModule.zlib_error(this.zst, err, "while flushing");
             }
 
-            return GetBytes(output, 0, (int)(zst.total_out - start_total_out));
+            return GetBytes(_output, 0, zst.next_out_index);
         }
 
         //[Documentation("copy() -- Return a copy of the compression object.")]
@@ -139,7 +127,10 @@ calling the flush() method.  Otherwise, more data can still be compressed.")]
         //    throw new NotImplementedException();
         //}
 
-        private ZStream zst;
+        private IZStream zst;
+
+        // reused across calls; results are copied out of it
+        private byte[] _output = new byte[ZlibModule.DEFAULTALLOC];
 
         private static Bytes GetBytes(byte[] bytes, int index, int count)
         {
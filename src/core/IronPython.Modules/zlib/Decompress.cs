@@ -29,7 +29,7 @@ namespace IronPython.Zlib
 
         internal Decompress(int wbits)
         {
-            zst = new ZStream();
+            zst = ZlibModule.CreateZStream();
             int err = zst.inflateInit(wbits);
             switch(err)
             {
@@ -65,27 +65,24 @@ the unconsumed_tail attribute.")]
 
             using var buffer = data.GetBuffer();
             byte[] input = buffer.AsUnsafeArray() ?? buffer.ToArray();
-            byte[] output = new byte[max_length > 0 && ZlibModule.DEFAULTALLOC > max_length ? max_length : ZlibModule.DEFAULTALLOC];
 
-            long start_total_out = zst.total_out;
             zst.next_in = input;
             zst.next_in_index = 0;
             zst.avail_in = input.Length;
-            zst.next_out = output;
+            zst.next_out = _output;
             zst.next_out_index = 0;
-            zst.avail_out = output.Length;
+            zst.avail_out = max_length > 0 && _output.Length > max_length ? max_length : _output.Length;
 
             int err = zst.inflate(FlushStrategy.Z_SYNC_FLUSH);
 
             while(err == Z_OK && zst.avail_out == 0)
             {
-                if(max_length > 0 && output.Length >= max_length)
+                if(max_length > 0 && zst.next_out_index >= max_length)
                     break;
 
-                int old_length = output.Length;
-                Array.Resize(ref output, output.Length * 2);
-                zst.next_out = output;
-                zst.avail_out = old_length;
+                ZlibModule.GrowOutput(zst, ref _output);
+                if(max_length > 0 && zst.next_out_index + zst.avail_out > max_length)
+                    zst.avail_out = max_length - zst.next_out_index;
 
                 err = zst.inflate(FlushStrategy.Z_SYNC_FLUSH);
             }
@@ -105,7 +102,7 @@ the unconsumed_tail attribute.")]
                 throw ZlibModule.zlib_error(this.zst, err, "while decompressing");
             }
 
-            return GetBytes(output, 0, (int)(zst.total_out - start_total_out));
+            return GetBytes(_output, 0, zst.next_out_index);
         }
 
         public bool eof { get; set; }
@@ -120,9 +117,8 @@ The decompressor object can no longer be used after this call.")]
             if(length < 1)
                 throw PythonOps.ValueError("length must be greater than 0.");
 
-            byte[] output = new byte[length];
+            byte[] output = length > _output.Length ? new byte[length] : _output;
 
-            long start_total_out = zst.total_out;
             zst.next_out = output;
             zst.next_out_index = 0;
             zst.avail_out = output.Length;
@@ -131,11 +127,7 @@ The decompressor object can no longer be used after this call.")]
 
             while((err == Z_OK || err == Z_BUF_ERROR) &&zst.avail_out == 0)
             {
-                int old_length = output.Length;
-                Array.Resize(ref output, output.Length * 2);
-                zst.next_out = output;
-                zst.avail_out = old_length;
-
+                ZlibModule.GrowOutput(zst, ref output);
                 err = zst.inflate(FlushStrategy.Z_FINISH);
             }
 
@@ -148,7 +140,7 @@ The decompressor object can no longer be used after this call.")]
                 }
             }
 
-            return GetBytes(output, 0, (int)(zst.total_out - start_total_out));
+            return GetBytes(output, 0, zst.next_out_index);
         }
 
         //[Documentation("copy() -- Return a copy of the decompression object.")]
@@ -157,7 +149,10 @@ The decompressor object can no longer be used after this call.")]
         //    throw new NotImplementedException();
         //}
 
-        private ZStream zst;
+        private IZStream zst;
+
+        // reused across calls; results are copied out of it
+        private byte[] _output = new byte[ZlibModule.DEFAULTALLOC];
 
         private static Bytes GetBytes(byte[] bytes, int index, int count)
         {
@@ -0,0 +1,35 @@
+﻿// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+using ComponentAce.Compression.Libs.ZLib;
+
+namespace IronPython.Zlib
+{
+    /// <summary>
+    /// The subset of the zlib stream API used by the module, implemented both by the managed
+    /// zlib.net port (<see cref="ZStream"/>) and by the runtime's native zlib.
+    /// </summary>
+    internal interface IZStream
+    {
+        byte[] next_in { get; set; }
+        int next_in_index { get; set; }
+        int avail_in { get; set; }
+        long total_in { get; }
+
+        byte[] next_out { get; set; }
+        int next_out_index { get; set; }
+        int avail_out { get; set; }
+        long total_out { get; }
+
+        string msg { get; }
+
+        int DeflateInit(int level, int windowBits, int memLevel, CompressionStrategy strategy);
+        int deflate(FlushStrategy flush);
+        int deflateEnd();
+
+        int inflateInit(int windowBits);
+        int inflate(FlushStrategy flush);
+        int inflateEnd();
+    }
+}
@@ -0,0 +1,213 @@
+﻿// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#if NET
+
+using System;
+using System.Runtime.InteropServices;
+
+using ComponentAce.Compression.Libs.ZLib;
+
+namespace IronPython.Zlib
+{
+    /// <summary>
+    /// <see cref="IZStream"/> over the native zlib that ships with the runtime for System.IO.Compression.
+    /// </summary>
+    /// <remarks>
+    /// The managed buffers are only pinned for the duration of each call; zlib keeps no pointers into
+    /// them between calls, so the stream position is tracked by the index and length properties.
+    /// </remarks>
+    internal sealed unsafe class NativeZStream : IZStream
+    {
+        private const string CompressionNative = "System.IO.Compression.Native";
+
+        private const int Z_OK = (int)ZLibResultCode.Z_OK;
+        private const int Z_STREAM_ERROR = (int)ZLibResultCode.Z_STREAM_ERROR;
+
+        private static readonly Lazy<bool> _isAvailable = new Lazy<bool>(Probe);
+
+        private PalZStream* _stream;
+        private bool _deflating;
+
+        public static bool IsAvailable => _isAvailable.Value;
+
+        public byte[] next_in { get; set; }
+        public int next_in_index { get; set; }
+        public int avail_in { get; set; }
+        public long total_in { get; private set; }
+
+        public byte[] next_out { get; set; }
+        public int next_out_index { get; set; }
+        public int avail_out { get; set; }
+        public long total_out { get; private set; }
+
+        public string msg { get; private set; }
+
+        ~NativeZStream()
+        {
+            if (_stream != null)
+            {
+                End(_deflating);
+            }
+        }
+
+        public int DeflateInit(int level, int windowBits, int memLevel, CompressionStrategy strategy)
+        {
+            if (_stream != null) return Z_STREAM_ERROR;
+
+            Allocate(deflating: true);
+            return Started(CompressionNative_DeflateInit2_(_stream, level, ZlibModule.DEFLATED, windowBits, memLevel, (int)strategy));
+        }
+
+        public int deflate(FlushStrategy flush) => Run(flush, deflating: true);
+
+        public int deflateEnd() => End(deflating: true);
+
+        public int inflateInit(int windowBits)
+        {
+            if (_stream != null) return Z_STREAM_ERROR;
+
+            Allocate(deflating: false);
+            return Started(CompressionNative_InflateInit2_(_stream, windowBits));
+        }
+
+        public int inflate(FlushStrategy flush) => Run(flush, deflating: false);
+
+        public int inflateEnd() => End(deflating: false);
+
+        /// <summary>
+        /// Updates a CRC-32 checksum with the native (SIMD accelerated where available) implementation.
+        /// </summary>
+        public static uint Crc32(uint crc, ReadOnlySpan<byte> data)
+        {
+            fixed (byte* buffer = data)
+            {
+                return CompressionNative_Crc32(crc, buffer, data.Length);
+            }
+        }
+
+        private void Allocate(bool deflating)
+        {
+            _stream = (PalZStream*)Marshal.AllocHGlobal(sizeof(PalZStream));
+            *_stream = default;
+            _deflating = deflating;
+            GC.ReRegisterForFinalize(this);
+        }
+
+        private int Started(int err)
+        {
+            if (err != Z_OK)
+            {
+                SetMessage();
+                Free();
+            }
+            return err;
+        }
+
+        private int Run(FlushStrategy flush, bool deflating)
+        {
+            if (_stream == null || _deflating != deflating) return Z_STREAM_ERROR;
+
+            fixed (byte* input = next_in)
+            fixed (byte* output = next_out)
+            {
+                _stream->nextIn = input + next_in_index;
+                _stream->availIn = (uint)avail_in;
+                _stream->nextOut = output + next_out_index;
+                _stream->availOut = (uint)avail_out;
+
+                int err = deflating
+                    ? CompressionNative_Deflate(_stream, (int)flush)
+                    : CompressionNative_Inflate(_stream, (int)flush);
+
+                int consumed = avail_in - (int)_stream->availIn;
+                int produced = avail_out - (int)_stream->availOut;
+                _stream->nextIn = null;
+                _stream->nextOut = null;
+
+                next_in_index += consumed;
+                avail_in -= consumed;
+                total_in += consumed;
+                next_out_index += produced;
+                avail_out -= produced;
+                total_out += produced;
+
+                SetMessage();
+                return err;
+            }
+        }
+
+        private int End(bool deflating)
+        {
+            if (_stream == null || _deflating != deflating) return Z_STREAM_ERROR;
+
+            int err = deflating ? CompressionNative_DeflateEnd(_stream) : CompressionNative_InflateEnd(_stream);
+            Free();
+            return err;
+        }
+
+        private void SetMessage()
+        {
+            msg = _stream->msg == null ? null : Marshal.PtrToStringAnsi((IntPtr)_stream->msg);
+        }
+
+        private void Free()
+        {
+            Marshal.FreeHGlobal((IntPtr)_stream);
+            _stream = null;
+            GC.SuppressFinalize(this);
+        }
+
+        private static bool Probe()
+        {
+            try
+            {
+                CompressionNative_Crc32(0, null, 0);
+                return true;
+            }
+            catch (DllNotFoundException) { }
+            catch (EntryPointNotFoundException) { }
+            return false;
+        }
+
+        #region Native
+
+        // Mirrors PAL_ZStream from the runtime's pal_zlib.h
+        [StructLayout(LayoutKind.Sequential)]
+        private struct PalZStream
+        {
+            public byte* nextIn;
+            public byte* nextOut;
+            public sbyte* msg;
+            public IntPtr internalState;
+            public uint availIn;
+            public uint availOut;
+        }
+
+        [DllImport(CompressionNative, CallingConvention = CallingConvention.Cdecl)]
+        private static extern int CompressionNative_DeflateInit2_(PalZStream* stream, int level, int method, int windowBits, int memLevel, int strategy);
+
+        [DllImport(CompressionNative, CallingConvention = CallingConvention.Cdecl)]
+        private static extern int CompressionNative_Deflate(PalZStream* stream, int flush);
+
+        [DllImport(CompressionNative, CallingConvention = CallingConvention.Cdecl)]
+        private static extern int CompressionNative_DeflateEnd(PalZStream* stream);
+
+        [DllImport(CompressionNative, CallingConvention = CallingConvention.Cdecl)]
+        private static extern int CompressionNative_InflateInit2_(PalZStream* stream, int windowBits);
+
+        [DllImport(CompressionNative, CallingConvention = CallingConvention.Cdecl)]
+        private static extern int CompressionNative_Inflate(PalZStream* stream, int flush);
+
+        [DllImport(CompressionNative, CallingConvention = CallingConvention.Cdecl)]
+        private static extern int CompressionNative_InflateEnd(PalZStream* stream);
+
+        [DllImport(CompressionNative, CallingConvention = CallingConvention.Cdecl)]
+        private static extern uint CompressionNative_Crc32(uint crc, byte* buffer, int len);
+
+        #endregion
+    }
+}
+
+#endif
@@ -7,7 +7,6 @@
 
 using System;
 using System.Collections.Generic;
-using System.Linq;
 using System.Numerics;
 using System.Runtime.CompilerServices;
 using ComponentAce.Compression.Libs.ZLib;
@@ -84,8 +83,19 @@ a signed integer.")]
 An optional starting value can be specified.  The returned checksum is
 a signed integer.")]
         public static object crc32([NotNone] IBufferProtocol data, uint value = 0)
+        {
             // TODO: [PythonIndex(overflow=mask)] uint value = 0
-            => IronPython.Modules.PythonBinaryAscii.crc32(data, value);
+#if NET
+            if (NativeZStream.IsAvailable)
+            {
+                using var buffer = data.GetBuffer();
+                uint res = NativeZStream.Crc32(value, buffer.AsReadOnlySpan());
+                if (res <= int.MaxValue) return (int)res;
+                return (BigInteger)res;
+            }
+#endif
+            return IronPython.Modules.PythonBinaryAscii.crc32(data, value);
+        }
 
         [Documentation(@"compress(data[, level]) -- Returns a bytes object containing compressed data.
 
@@ -97,13 +107,13 @@ Optional arg level is the compression level, in 1-9.")]
             byte[] input = buffer.AsUnsafeArray() ?? buffer.ToArray();
             byte[] output = new byte[input.Length + input.Length / 1000 + 12 + 1];
 
-            ZStream zst = new ZStream();
+            IZStream zst = CreateZStream();
             zst.next_in = input;
             zst.avail_in = input.Length;
             zst.next_out = output;
             zst.avail_out = output.Length;
 
-            int err = zst.DeflateInit(level);
+            int err = zst.DeflateInit(level, MAX_WBITS, DEF_MEM_LEVEL, CompressionStrategy.Z_DEFAULT_STRATEGY);
             switch(err)
             {
                 case (Z_OK):
@@ -115,12 +125,18 @@ Optional arg level is the compression level, in 1-9.")]
                 
                 default:
                     zst.deflateEnd();
-                    zlib_error(zst, err, "while compressing data");
-                    return null;
+                    throw zlib_error(zst, err, "while compressing data");
             }
 
             err = zst.deflate(FlushStrategy.Z_FINISH);
 
+            // incompressible input can need slightly more room than the initial estimate
+            while(err == Z_OK && zst.avail_out == 0)
+            {
+                GrowOutput(zst, ref output);
+                err = zst.deflate(FlushStrategy.Z_FINISH);
+            }
+
             if(err != Z_STREAM_END)
             {
                 zst.deflateEnd();
@@ -131,9 +147,7 @@ Optional arg level is the compression level, in 1-9.")]
 
             if(err == Z_OK)
             {
-                var res = new byte[(int)zst.total_out];
-                Array.Copy(output, res, res.Length);
-                return Bytes.Make(res);
+                return Bytes.Make(GetOutput(output, zst.next_out_index));
             }
 
             throw zlib_error(zst, err, "while finishing compression");
@@ -173,6 +187,45 @@ Optional arg wbits is the window buffer size.")]
             return new Decompress(wbits);
         }
 
+        /// <summary>
+        /// Creates a stream over the runtime's native zlib when it can be loaded, otherwise over the managed port.
+        /// </summary>
+        internal static IZStream CreateZStream()
+        {
+#if NET
+            if (NativeZStream.IsAvailable)
+            {
+                return new NativeZStream();
+            }
+#endif
+            return new ZStream();
+        }
+
+        /// <summary>
+        /// Doubles the output buffer, keeping what has been written so far, and points the stream past it.
+        /// </summary>
+        internal static void GrowOutput(IZStream zst, ref byte[] output)
+        {
+            int used = zst.next_out_index;
+            Array.Resize(ref output, Math.Max(output.Length * 2, DEFAULTALLOC));
+            zst.next_out = output;
+            zst.next_out_index = used;
+            zst.avail_out = output.Length - used;
+        }
+
+        /// <summary>
+        /// Returns the first count bytes of the output buffer, copying only when the buffer was not filled exactly.
+        /// </summary>
+        internal static byte[] GetOutput(byte[] output, int count)
+        {
+            if(count == output.Length)
+                return output;
+
+            var res = new byte[count];
+            Buffer.BlockCopy(output, 0, res, 0, count);
+            return res;
+        }
+
         [SpecialName]
         public static void PerformModuleReload(PythonContext context, PythonDictionary dict)
         {
@@ -185,7 +238,7 @@ Optional arg wbits is the window buffer size.")]
             return PythonOps.CreateThrowable(error, args);
         }
 
-        internal static Exception zlib_error(ZStream zst, int err, string msg)
+        internal static Exception zlib_error(IZStream zst, int err, string msg)
         {
             string zmsg = zst.msg;
             if(zmsg == null)
@@ -213,15 +266,13 @@ Optional arg wbits is the window buffer size.")]
         [PythonHidden]
         internal static byte[] Decompress(byte[] input, int wbits=MAX_WBITS, int bufsize=DEFAULTALLOC) 
         {
-            byte[] outputBuffer = new byte[bufsize];
-            byte[] output = new byte[bufsize];
-            int outputOffset = 0;
+            byte[] output = new byte[Math.Max(bufsize, 1)];
 
-            ZStream zst = new ZStream();
+            IZStream zst = CreateZStream();
             zst.next_in = input;
             zst.avail_in = input.Length;
-            zst.next_out = outputBuffer;
-            zst.avail_out = outputBuffer.Length;
+            zst.next_out = output;
+            zst.avail_out = output.Length;
 
             int err = zst.inflateInit(wbits);
             if(err != Z_OK)
@@ -242,16 +293,8 @@ Optional arg wbits is the window buffer size.")]
                     }
                     else if(err == Z_OK || (err == Z_BUF_ERROR && zst.avail_out == 0))
                     {
-                        // copy to the output and reset the buffer
-                        if(outputOffset + outputBuffer.Length > output.Length)
-                            Array.Resize(ref output, output.Length * 2);
-
-                        Array.Copy(outputBuffer, 0, output, outputOffset, outputBuffer.Length);
-                        outputOffset += outputBuffer.Length;
-
-                        zst.next_out = outputBuffer;
-                        zst.avail_out = outputBuffer.Length;
-                        zst.next_out_index = 0;
+                        // decompress straight into the grown buffer rather than through a scratch buffer
+                        GrowOutput(zst, ref output);
                     }
                     else
                     {
@@ -268,13 +311,7 @@ Optional arg wbits is the window buffer size.")]
                 throw zlib_error(zst, err, "while finishing data decompression");
             }
 
-            if(outputOffset + outputBuffer.Length - zst.avail_out > output.Length)
-                Array.Resize(ref output, output.Length * 2);
-
-            Array.Copy(outputBuffer, 0, output, outputOffset, outputBuffer.Length - zst.avail_out);
-            outputOffset += outputBuffer.Length - zst.avail_out;
-
-            return output.Take(outputOffset).ToArray();
+            return GetOutput(output, zst.next_out_index);
         }
     }
 }
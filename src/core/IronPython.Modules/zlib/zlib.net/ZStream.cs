@@ -50,7 +50,7 @@ namespace ComponentAce.Compression.Libs.ZLib
     /// <summary>
     /// ZStream is used to store user data to compress/decompress.
     /// </summary>
-    public sealed class ZStream
+    public sealed class ZStream : IronPython.Zlib.IZStream
     {
 
         #region Constants
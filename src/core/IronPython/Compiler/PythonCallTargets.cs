@@ -193,6 +193,28 @@ namespace IronPython.Compiler {
         }
     }
 
+    internal class PythonFunctionProfileN {
+        private readonly Func<PythonFunction, object[], object> _target;
+
+        public PythonFunctionProfileN(Func<PythonFunction, object[], object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object[] args) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, args);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, args);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
     #region Generated Python Recursion Enforcement
 
     // *** BEGIN GENERATED CODE ***
@@ -471,6 +493,368 @@ namespace IronPython.Compiler {
     }
 
 
+    // *** END GENERATED CODE ***
+
+    #endregion
+
+    #region Generated Python Profile Hooks
+
+    // *** BEGIN GENERATED CODE ***
+    // generated by function: gen_profile_hooks from: generate_calls.py
+
+    internal class PythonFunctionProfile0 {
+        private readonly Func<PythonFunction, object> _target;
+
+        public PythonFunctionProfile0(Func<PythonFunction, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile1 {
+        private readonly Func<PythonFunction, object, object> _target;
+
+        public PythonFunctionProfile1(Func<PythonFunction, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile2 {
+        private readonly Func<PythonFunction, object, object, object> _target;
+
+        public PythonFunctionProfile2(Func<PythonFunction, object, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0, object arg1) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0, arg1);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0, arg1);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile3 {
+        private readonly Func<PythonFunction, object, object, object, object> _target;
+
+        public PythonFunctionProfile3(Func<PythonFunction, object, object, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0, object arg1, object arg2) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0, arg1, arg2);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0, arg1, arg2);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile4 {
+        private readonly Func<PythonFunction, object, object, object, object, object> _target;
+
+        public PythonFunctionProfile4(Func<PythonFunction, object, object, object, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0, object arg1, object arg2, object arg3) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0, arg1, arg2, arg3);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0, arg1, arg2, arg3);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile5 {
+        private readonly Func<PythonFunction, object, object, object, object, object, object> _target;
+
+        public PythonFunctionProfile5(Func<PythonFunction, object, object, object, object, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0, object arg1, object arg2, object arg3, object arg4) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0, arg1, arg2, arg3, arg4);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0, arg1, arg2, arg3, arg4);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile6 {
+        private readonly Func<PythonFunction, object, object, object, object, object, object, object> _target;
+
+        public PythonFunctionProfile6(Func<PythonFunction, object, object, object, object, object, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0, object arg1, object arg2, object arg3, object arg4, object arg5) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0, arg1, arg2, arg3, arg4, arg5);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0, arg1, arg2, arg3, arg4, arg5);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile7 {
+        private readonly Func<PythonFunction, object, object, object, object, object, object, object, object> _target;
+
+        public PythonFunctionProfile7(Func<PythonFunction, object, object, object, object, object, object, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0, object arg1, object arg2, object arg3, object arg4, object arg5, object arg6) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile8 {
+        private readonly Func<PythonFunction, object, object, object, object, object, object, object, object, object> _target;
+
+        public PythonFunctionProfile8(Func<PythonFunction, object, object, object, object, object, object, object, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0, object arg1, object arg2, object arg3, object arg4, object arg5, object arg6, object arg7) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile9 {
+        private readonly Func<PythonFunction, object, object, object, object, object, object, object, object, object, object> _target;
+
+        public PythonFunctionProfile9(Func<PythonFunction, object, object, object, object, object, object, object, object, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0, object arg1, object arg2, object arg3, object arg4, object arg5, object arg6, object arg7, object arg8) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7, arg8);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7, arg8);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile10 {
+        private readonly Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object> _target;
+
+        public PythonFunctionProfile10(Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0, object arg1, object arg2, object arg3, object arg4, object arg5, object arg6, object arg7, object arg8, object arg9) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7, arg8, arg9);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7, arg8, arg9);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile11 {
+        private readonly Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object> _target;
+
+        public PythonFunctionProfile11(Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0, object arg1, object arg2, object arg3, object arg4, object arg5, object arg6, object arg7, object arg8, object arg9, object arg10) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7, arg8, arg9, arg10);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7, arg8, arg9, arg10);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile12 {
+        private readonly Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object> _target;
+
+        public PythonFunctionProfile12(Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0, object arg1, object arg2, object arg3, object arg4, object arg5, object arg6, object arg7, object arg8, object arg9, object arg10, object arg11) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7, arg8, arg9, arg10, arg11);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7, arg8, arg9, arg10, arg11);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile13 {
+        private readonly Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object, object> _target;
+
+        public PythonFunctionProfile13(Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0, object arg1, object arg2, object arg3, object arg4, object arg5, object arg6, object arg7, object arg8, object arg9, object arg10, object arg11, object arg12) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7, arg8, arg9, arg10, arg11, arg12);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7, arg8, arg9, arg10, arg11, arg12);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile14 {
+        private readonly Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object, object, object> _target;
+
+        public PythonFunctionProfile14(Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0, object arg1, object arg2, object arg3, object arg4, object arg5, object arg6, object arg7, object arg8, object arg9, object arg10, object arg11, object arg12, object arg13) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7, arg8, arg9, arg10, arg11, arg12, arg13);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7, arg8, arg9, arg10, arg11, arg12, arg13);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+    internal class PythonFunctionProfile15 {
+        private readonly Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object, object, object, object> _target;
+
+        public PythonFunctionProfile15(Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object, object, object, object> target) {
+            _target = target;
+        }
+
+        public object CallTarget(PythonFunction/*!*/ function, object arg0, object arg1, object arg2, object arg3, object arg4, object arg5, object arg6, object arg7, object arg8, object arg9, object arg10, object arg11, object arg12, object arg13, object arg14) {
+            PythonContext context = function.Context.LanguageContext;
+            ProfileHook hook = context.ProfileHook;
+            if (hook == null) return _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7, arg8, arg9, arg10, arg11, arg12, arg13, arg14);
+
+            hook.OnCall(function);
+            object result = null;
+            try {
+                return result = _target(function, arg0, arg1, arg2, arg3, arg4, arg5, arg6, arg7, arg8, arg9, arg10, arg11, arg12, arg13, arg14);
+            } finally {
+                context.ProfileHook?.OnReturn(function, result);
+            }
+        }
+    }
+
+
     // *** END GENERATED CODE ***
 
     #endregion
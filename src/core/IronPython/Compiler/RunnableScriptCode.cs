@@ -85,16 +85,22 @@ namespace IronPython.Compiler {
         public abstract FunctionCode GetFunctionCode(bool register);
                 
         protected void PushFrame(CodeContext context, FunctionCode code) {
-            if (((PythonContext)SourceUnit.LanguageContext).PythonOptions.Frames) {
+            PythonContext pc = (PythonContext)SourceUnit.LanguageContext;
+            pc.EnterScriptCode();
+            if (pc.PythonOptions.Frames) {
                 PythonOps.PushFrame(context, code);
             }
+            pc.ProfileHook?.OnModuleEnter(code);
         }
 
-        protected void PopFrame() {
-            if (((PythonContext)SourceUnit.LanguageContext).PythonOptions.Frames) {
+        protected void PopFrame(FunctionCode code) {
+            PythonContext pc = (PythonContext)SourceUnit.LanguageContext;
+            pc.ProfileHook?.OnModuleExit(code);
+            if (pc.PythonOptions.Frames) {
                 List<FunctionStack> stack = PythonOps.GetFunctionStack();
                 stack.RemoveAt(stack.Count - 1);
             }
+            pc.ExitScriptCode();
         }
     }
 }
@@ -157,6 +157,7 @@ namespace IronPython.Hosting {
             InitializeEnvironmentVariables();
             InitializeModules();
             InitializeExtensionDLLs();
+            PythonContext.MarkStartupPhase("console");
 
             // ensure the warnings module loads
             var warnOptions = PythonContext.GetSystemStateValue("warnoptions") as PythonList;
@@ -165,6 +166,8 @@ namespace IronPython.Hosting {
             }
 
             ImportSite();
+            PythonContext.MarkStartupPhase("site");
+            PythonContext.FinishStartup();
 
             // Equivalent to -i command line option
             // Check if IRONPYTHONINSPECT was set before execution
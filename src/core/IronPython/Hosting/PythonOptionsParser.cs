@@ -282,6 +282,24 @@ namespace IronPython.Hosting {
                     ConsoleOptions.BasicConsole = true;
                     break;
 
+#if FEATURE_ASSEMBLYBUILDER_SAVE
+                case "ModuleCache":
+                    LanguageSetup.Options["ModuleCache"] = val ?? string.Empty;
+                    break;
+#endif
+
+                case "Sample":
+                    LanguageSetup.Options["Sample"] = val ?? string.Empty;
+                    break;
+
+                case "StartupSnapshot":
+                    LanguageSetup.Options["StartupSnapshot"] = val ?? string.Empty;
+                    break;
+
+                case "StartupTiming":
+                    LanguageSetup.Options["StartupTiming"] = ScriptingRuntimeHelpers.True;
+                    break;
+
                 case "utf8":
                     if (!string.IsNullOrEmpty(val)) {
                         if (!int.TryParse(val, out int mode) || mode != 0 && mode != 1) {
@@ -367,6 +385,12 @@ namespace IronPython.Hosting {
                 { "-X EnableProfiler",      "Enables profiling support in the compiler" },
                 { "-X LightweightScopes",   "Generate optimized scopes that can be garbage collected" },
                 { "-X BasicConsole",        "Use only the basic console features" },
+#if FEATURE_ASSEMBLYBUILDER_SAVE
+                { "-X ModuleCache[=<dir>]", "Cache compiled modules on disk, in __pycache__ next to the source or in <dir>" },
+#endif
+                { "-X Sample[=<file>]",     "Sample the Python stacks of all threads at 1 kHz and write them as collapsed\n  stacks (flamegraph input) to <file> on exit, by default ironpython-<pid>.collapsed" },
+                { "-X StartupSnapshot[=<file>]", "Load the builtin module table and the modules imported at startup from <file>,\n  creating it when missing or out of date, by default in the cache directory of the user" },
+                { "-X StartupTiming",       "Report the time taken by each phase of the startup on stderr" },
 #if DEBUG
                 { "-X NoImportLib",         "Don't bootstrap importlib [debug only]" },
 #endif
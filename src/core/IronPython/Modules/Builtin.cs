@@ -772,6 +772,10 @@ Noteworthy: None is the `nil' object; Ellipsis represents `...' in slices.";
         private static readonly object UndefinedKeywordArgument = new object();
 
         public static object? max(CodeContext/*!*/ context, object? x) {
+            if (x is PythonList list && list.GetType() == typeof(PythonList) && list.TryGetExtreme(max: true, out object? res)) {
+                return res;
+            }
+
             IEnumerator i = PythonOps.GetEnumerator(context, x);
             if (!i.MoveNext())
                 throw PythonOps.ValueError("max() arg is an empty sequence");
@@ -885,6 +889,10 @@ Noteworthy: None is the `nil' object; Ellipsis represents `...' in slices.";
         }
 
         public static object? min(CodeContext/*!*/ context, object? x) {
+            if (x is PythonList list && list.GetType() == typeof(PythonList) && list.TryGetExtreme(max: false, out object? res)) {
+                return res;
+            }
+
             IEnumerator i = PythonOps.GetEnumerator(context, x);
             if (!i.MoveNext()) {
                 throw PythonOps.ValueError("empty sequence");
@@ -1417,7 +1425,8 @@ Noteworthy: None is the `nil' object; Ellipsis represents `...' in slices.";
             ValidateSumStart(start);
 
             var sumState = new SumState(context.LanguageContext, start);
-            for (int i = 0; i < sequence._size; i++) {
+            int i = SumHomogeneous(ref sumState, sequence._data, sequence._size);
+            for (; i < sequence._size; i++) {
                 SumOne(ref sumState, sequence._data[i]);
             }
 
@@ -1431,7 +1440,7 @@ Noteworthy: None is the `nil' object; Ellipsis represents `...' in slices.";
 
             var sumState = new SumState(context.LanguageContext, start);
             var arr = sequence._data;
-            for (int i = 0; i < arr.Length; i++) {
+            for (int i = SumHomogeneous(ref sumState, arr, arr.Length); i < arr.Length; i++) {
                 SumOne(ref sumState, arr[i]);
             }
 
@@ -1452,6 +1461,35 @@ Noteworthy: None is the `nil' object; Ellipsis represents `...' in slices.";
             }
         }
 
+        /// <summary>
+        /// Sums the leading run of ints or floats without boxing the running total.
+        /// Returns the index of the first item which still needs to be summed.
+        /// </summary>
+        private static int SumHomogeneous(ref SumState state, object?[] data, int size) {
+            size = Math.Min(size, data.Length);
+            int i = 0;
+            if (state.CurType == SumVariantType.Int) {
+                long total = state.IntVal;
+                for (; i < size && data[i] is int value; i++) {
+                    total += value;
+                }
+
+                if (total >= int.MinValue && total <= int.MaxValue) {
+                    state.IntVal = (int)total;
+                } else {
+                    state.BigIntVal = total;
+                    state.CurType = SumVariantType.BigInt;
+                }
+            } else if (state.CurType == SumVariantType.Double) {
+                double total = state.DoubleVal;
+                for (; i < size && data[i] is double value; i++) {
+                    total += value;
+                }
+                state.DoubleVal = total;
+            }
+            return i;
+        }
+
         private static void SumOne(ref SumState state, object? current) {
             if (current != null) {
                 if (state.CurType == SumVariantType.Int) {
@@ -430,6 +430,14 @@ namespace IronPython.Modules {
             }
 
 
+            // used by BufferedReader to refill its buffer without creating intermediate bytes objects
+            internal int ReadInto(Span<byte> span) {
+                EnsureReadable();
+
+                return _streams.ReadInto(span);
+            }
+
+
             [Documentation("""
                 seek(offset: int[, whence: int]) -> int.
 
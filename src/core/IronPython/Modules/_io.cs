@@ -623,8 +623,9 @@ namespace IronPython.Modules {
             private object _raw;
 
             private int _bufSize;
-            private Bytes _readBuf;
+            private byte[] _readBuf;        // reused for every refill, the buffered data is _readBuf[_readBufPos.._readBufLen]
             private int _readBufPos;
+            private int _readBufLen;
             private long _absPos = -1;
 
             internal static BufferedReader Create(CodeContext/*!*/ context, object raw, int buffer_size = DEFAULT_BUFFER_SIZE) {
@@ -660,7 +661,8 @@ namespace IronPython.Modules {
                 }
 
                 _bufSize = buffer_size;
-                _readBuf = Bytes.Empty;
+                _readBuf = Array.Empty<byte>();
+                ResetReadBuf();
             }
 
             #region Public API
@@ -784,6 +786,88 @@ namespace IronPython.Modules {
                 throw PythonOps.TypeError("'read()' should have returned bytes");
             }
 
+            /// <summary>
+            /// Reads from the raw stream into the span, returns 0 at end of file or if no data is available.
+            /// </summary>
+            private int RawReadInto(CodeContext/*!*/ context, Span<byte> buffer) {
+                int count;
+                if (_rawIO is FileIO fileIO && fileIO.GetType() == typeof(FileIO)) {
+                    // fast path, read straight from the underlying stream
+                    count = fileIO.ReadInto(buffer);
+                    if (_absPos != -1) {
+                        _absPos += count;
+                    }
+                    return count;
+                }
+
+                var chunk = CallRawRead(context, buffer.Length);
+                if (chunk is null) return 0;
+
+                count = chunk.Count;
+                if (count > buffer.Length) {
+                    throw PythonOps.OSError($"raw read() returned invalid length {count} (should have been between 0 and {buffer.Length})");
+                }
+                chunk.AsSpan().CopyTo(buffer);
+                return count;
+            }
+
+            /// <summary>
+            /// Reads from the raw stream into the free space at the end of the read buffer, moving
+            /// any buffered data to the front first.  Returns the number of bytes read.
+            /// </summary>
+            private int FillReadBuf(CodeContext/*!*/ context) {
+                if (_readBuf.Length != _bufSize) {
+                    Debug.Assert(_readBufLen == 0);
+                    _readBuf = new byte[_bufSize];
+                }
+
+                int buffered = _readBufLen - _readBufPos;
+                if (buffered == 0) {
+                    ResetReadBuf();
+                } else if (_readBufPos > 0) {
+                    Buffer.BlockCopy(_readBuf, _readBufPos, _readBuf, 0, buffered);
+                    _readBufPos = 0;
+                    _readBufLen = buffered;
+                }
+
+                int count = RawReadInto(context, _readBuf.AsSpan(_readBufLen));
+                _readBufLen += count;
+                return count;
+            }
+
+            /// <summary>
+            /// Fills the span from the read buffer and the raw stream.  Requests larger than the
+            /// buffer bypass it and are read directly into the span.  With read1 at most one raw
+            /// read is made, and the buffer is not refilled once some data has been copied.
+            /// </summary>
+            private int ReadIntoNoLock(CodeContext/*!*/ context, Span<byte> buffer, bool read1) {
+                int written = Math.Min(buffer.Length, _readBufLen - _readBufPos);
+                _readBuf.AsSpan(_readBufPos, written).CopyTo(buffer);
+                _readBufPos += written;
+
+                while (written < buffer.Length) {
+                    int remaining = buffer.Length - written;
+                    if (remaining > _bufSize) {
+                        // the buffer is drained, drop it so seeking doesn't find stale data in it
+                        ResetReadBuf();
+                        int count = RawReadInto(context, buffer.Slice(written));
+                        if (count == 0) break;
+                        written += count;
+                    } else {
+                        if (read1 && written > 0) break;
+                        if (FillReadBuf(context) == 0) break;
+                        int count = Math.Min(remaining, _readBufLen - _readBufPos);
+                        _readBuf.AsSpan(_readBufPos, count).CopyTo(buffer.Slice(written));
+                        _readBufPos += count;
+                        written += count;
+                    }
+                    if (read1) break;
+                }
+
+                GC.KeepAlive(this);
+                return written;
+            }
+
             private Bytes? ReadNoLock(CodeContext/*!*/ context, int length, bool read1 = false) {
                 if (length == 0) {
                     return Bytes.Empty;
@@ -792,7 +876,7 @@ namespace IronPython.Modules {
                 if (length < 0) {
                     List<Bytes> chunks = new List<Bytes>();
                     int count = 0;
-                    if (_readBuf.Count > 0 && TryResetReadBuf(out Bytes res)) {
+                    if (TryResetReadBuf(out Bytes res)) {
                         chunks.Add(res);
                         count += chunks[0].Count;
                     }
@@ -813,51 +897,50 @@ namespace IronPython.Modules {
                     return Bytes.Concat(chunks, count);
                 }
 
-                if (length <= _readBuf.Count - _readBufPos) {
-                    // requested data is already buffered
-                    byte[] res = new byte[length];
-                    Array.Copy(_readBuf.UnsafeByteArray, _readBufPos, res, 0, length);
-                    _readBufPos += length;
-                    if (_readBufPos == _readBuf.Count) {
-                        ResetReadBuf();
-                    }
+                byte[] bytes = new byte[length];
+                int read = ReadIntoNoLock(context, bytes, read1);
+                if (read < length) {
+                    Array.Resize(ref bytes, read);
+                }
+                return Bytes.Make(bytes);
+            }
 
-                    GC.KeepAlive(this);
-                    return Bytes.Make(res);
-                } else {
-                    // a read is required to provide requested amount of data
-                    List<Bytes> chunks = new List<Bytes>();
-                    int remaining = length;
-                    if (_readBuf.Count > 0 && TryResetReadBuf(out Bytes res)) {
-                        chunks.Add(res);
-                        remaining -= chunks[0].Count;
-                    }
+            public override BigInteger readinto(CodeContext/*!*/ context, object? buf)
+                => ReadIntoWorker(context, buf, read1: false);
 
-                    while (remaining > 0) {
-                        var chunk = CallRawRead(context, _bufSize) ?? Bytes.Empty;
+            public BigInteger readinto1(CodeContext/*!*/ context, object? buf)
+                => ReadIntoWorker(context, buf, read1: true);
 
-                        _readBuf = chunk;
-                        if (_readBuf.Count == 0) {
-                            break;
-                        }
-                        if (remaining >= _readBuf.Count - _readBufPos) {
-                            remaining -= _readBuf.Count - _readBufPos;
-                            if (TryResetReadBuf(out res)) {
-                                chunks.Add(res);
-                            }
-                        } else {
-                            byte[] bytes = new byte[remaining];
-                            Array.Copy(_readBuf.UnsafeByteArray, 0, bytes, 0, remaining);
-                            chunks.Add(Bytes.Make(bytes));
-                            _readBufPos = remaining;
-                            remaining = 0;
-                            break;
-                        }
-                        if (read1) break;
-                    }
-                    GC.KeepAlive(this);
-                    return Bytes.Concat(chunks, length - remaining);
+            private BigInteger ReadIntoWorker(CodeContext/*!*/ context, object? buf, bool read1) {
+                if (buf is not IBufferProtocol bufferProtocol) {
+                    return base.readinto(context, buf);
+                }
+
+                using var buffer = bufferProtocol.GetBufferNoThrow(BufferFlags.Writable)
+                    ?? throw PythonOps.TypeError("readinto() argument must be read-write bytes-like object, not {0}", PythonOps.GetPythonTypeName(buf));
+
+                _checkClosed();
+
+                lock (this) {
+                    return ReadIntoNoLock(context, buffer.AsSpan(), read1);
+                }
+            }
+
+            /// <summary>
+            /// Gets the buffered data, refilling the buffer first if it is empty, so TextIOWrapper
+            /// can decode it in place.  An empty span signals end of file.  The caller must hold
+            /// the lock on the reader and mark the data it used with ConsumeBuffered.
+            /// </summary>
+            internal ReadOnlySpan<byte> PeekBuffered(CodeContext/*!*/ context) {
+                if (_readBufPos == _readBufLen) {
+                    FillReadBuf(context);
                 }
+                return _readBuf.AsSpan(_readBufPos, _readBufLen - _readBufPos);
+            }
+
+            internal void ConsumeBuffered(int count) {
+                Debug.Assert(count <= _readBufLen - _readBufPos);
+                _readBufPos += count;
             }
 
 #nullable restore
@@ -875,22 +958,12 @@ namespace IronPython.Modules {
             }
 
             private Bytes PeekNoLock(CodeContext/*!*/ context, int length) {
-                int bufLen = _readBuf.Count - _readBufPos;
-                byte[] bytes = new byte[length];
-
-                if (length <= bufLen) {
-                    Array.Copy(_readBuf.UnsafeByteArray, _readBufPos, bytes, 0, length);
-                    return Bytes.Make(bytes);
+                if (length > _readBufLen - _readBufPos) {
+                    FillReadBuf(context);
+                    length = _readBufLen - _readBufPos;
                 }
 
-                var next = CallRawRead(context, length - _readBuf.Count + _readBufPos) ?? Bytes.Empty;
-
-                if (TryResetReadBuf(out Bytes res)) {
-                    _readBuf = res + next;
-                } else {
-                    _readBuf = next;
-                }
-                return _readBuf;
+                return Bytes.Make(_readBuf.AsSpan(_readBufPos, length).ToArray());
             }
 
             public override Bytes read1(CodeContext/*!*/ context, int length = 0) {
@@ -901,7 +974,7 @@ namespace IronPython.Modules {
                 }
 
                 lock (this) {
-                    int bufLen = _readBuf.Count - _readBufPos;
+                    int bufLen = _readBufLen - _readBufPos;
                     return ReadNoLock(context, bufLen > 0 ? Math.Min(length, bufLen) : length, read1: true);
                 }
             }
@@ -919,7 +992,7 @@ namespace IronPython.Modules {
                     List<Bytes> chunks = null;
                     int cnt = 0;
                     while (true) {
-                        var buf = _readBuf.AsSpan().Slice(_readBufPos);
+                        var buf = _readBuf.AsSpan(_readBufPos, _readBufLen - _readBufPos);
                         if (buf.Length > 0) {
                             // we hit the limit so we're done
                             bool done = false;
@@ -937,9 +1010,6 @@ namespace IronPython.Modules {
 
                             if (done) {
                                 _readBufPos += buf.Length;
-                                if (_readBufPos == _readBuf.Count) {
-                                    ResetReadBuf();
-                                }
                                 var bytes = Bytes.Make(buf.ToArray());
                                 if (chunks is null) {
                                     return bytes;
@@ -956,7 +1026,7 @@ namespace IronPython.Modules {
                         }
 
                         // end of file
-                        if (!TryReadNextChunk(context)) {
+                        if (FillReadBuf(context) == 0) {
                             if (chunks is null) {
                                 return Bytes.Empty;
                             }
@@ -965,12 +1035,6 @@ namespace IronPython.Modules {
                         }
                     }
                 }
-
-                bool TryReadNextChunk(CodeContext context) {
-                    var chunk = CallRawRead(context, _bufSize) ?? Bytes.Empty;
-                    _readBuf = chunk;
-                    return chunk.Count != 0;
-                }
             }
 
             public override BigInteger tell(CodeContext/*!*/ context) {
@@ -985,7 +1049,7 @@ namespace IronPython.Modules {
                 }
 
                 _absPos = checked((long)res);
-                return res - _readBuf.Count + _readBufPos;
+                return res - _readBufLen + _readBufPos;
             }
 
             public BigInteger seek(double offset, [Optional] object whence) {
@@ -1004,24 +1068,24 @@ namespace IronPython.Modules {
 
                 lock (this) {
                     // fast-path to seek within the buffer
-                    if (_readBuf.Count > 0 && _absPos != -1) {
+                    if (_readBufLen > 0 && _absPos != -1) {
                         if (whenceInt == 0) {
-                            var readBufPos = pos - _absPos + _readBuf.Count;
-                            if (0 <= readBufPos && readBufPos < _readBuf.Count) {
+                            var readBufPos = pos - _absPos + _readBufLen;
+                            if (0 <= readBufPos && readBufPos < _readBufLen) {
                                 _readBufPos = unchecked((int)readBufPos);
-                                return _absPos - _readBuf.Count + _readBufPos;
+                                return _absPos - _readBufLen + _readBufPos;
                             }
                         } else if (whenceInt == 1) {
                             var readBufPos = _readBufPos + pos;
-                            if (0 <= readBufPos && readBufPos < _readBuf.Count) {
+                            if (0 <= readBufPos && readBufPos < _readBufLen) {
                                 _readBufPos = unchecked((int)readBufPos);
-                                return _absPos - _readBuf.Count + _readBufPos;
+                                return _absPos - _readBufLen + _readBufPos;
                             }
                         }
                     }
 
                     if (whenceInt == 1) {
-                        pos -= _readBuf.Count - _readBufPos;
+                        pos -= _readBufLen - _readBufPos;
                     }
 
                     object posObj;
@@ -1065,21 +1129,15 @@ namespace IronPython.Modules {
 
             private void ResetReadBuf() {
                 _readBufPos = 0;
-                _readBuf = Bytes.Empty;
+                _readBufLen = 0;
             }
 
             private bool TryResetReadBuf(out Bytes res) {
-                if (_readBufPos == 0) {
-                    res = _readBuf;
-                } else {
-                    byte[] bytes = new byte[_readBuf.Count - _readBufPos];
-                    Array.Copy(_readBuf.UnsafeByteArray, _readBufPos, bytes, 0, bytes.Length);
-                    res = Bytes.Make(bytes);
-                    _readBufPos = 0;
-                }
-                _readBuf = Bytes.Empty;
+                int buffered = _readBufLen - _readBufPos;
+                res = buffered > 0 ? Bytes.Make(_readBuf.AsSpan(_readBufPos, buffered).ToArray()) : Bytes.Empty;
+                ResetReadBuf();
 
-                return res.Count > 0;
+                return buffered > 0;
             }
 
             #endregion
@@ -2489,13 +2547,16 @@ namespace IronPython.Modules {
                     object next = _bufferTyped != null ?
                         _bufferTyped.read(context, -1) :
                         PythonOps.Invoke(context, _buffer, "read", -1);
-                    object decodeFunc = PythonOps.GetBoundAttr(context, decoder, "decode");
-                    string decoded = (string)PythonCalls.CallWithKeywordArgs(
-                        context,
-                        decodeFunc,
-                        new object[] { next, true },
-                        new string[] { "final" }
-                    );
+                    string decoded = (next, decoder) switch {
+                        (Bytes nextBytes, IncrementalNewlineDecoder typedDecoder) => typedDecoder.decode(context, nextBytes, true),
+                        (Bytes nextBytes, BuiltinIncrementalDecoder builtinDecoder) => builtinDecoder.Decode(context, nextBytes.AsSpan(), true),
+                        _ => (string)PythonCalls.CallWithKeywordArgs(
+                            context,
+                            PythonOps.GetBoundAttr(context, decoder, "decode"),
+                            new object[] { next, true },
+                            new string[] { "final" }
+                        ),
+                    };
                     SetDecodedChars(string.Empty);
                     _nextInput = null;
 
@@ -2525,77 +2586,43 @@ namespace IronPython.Modules {
                     throw UnsupportedOperationWithMessage(context, "not readable");
                 }
 
-                string line = GetDecodedChars();
-
-                int start = 0;
                 if (_decoder == null) {
                     GetDecoder(context);
                 }
 
-                int pos, endPos;
+                // the part of the line taken from previous chunks
+                StringBuilder prefix = null;
                 for (; ; ) {
-                    if (_readTranslate) {
-                        // Newlines have already been translated into "\n"
-                        pos = line.IndexOf('\n', start);
-                        if (pos >= 0) {
-                            endPos = pos + 1;
-                            break;
-                        }
-                        start = line.Length;
-                    } else if (_readUniversal) {
-                        // Search for any newline, "\r" and/or "\n". The decoder ensures that
-                        // "\r\n" isn't split up.
-                        int nlPos = line.IndexOfAny(new char[] { '\r', '\n' }, start);
-
-                        if (nlPos == -1) {
-                            // no newlines found
-                            start = line.Length;
-                        } else if (line[nlPos] == '\n') {
-                            // "\n" newline found
-                            endPos = nlPos + 1;
-                            break;
-                        } else if (line.Length > nlPos + 1 && line[nlPos + 1] == '\n') {
-                            // "\r\n" newline found
-                            endPos = nlPos + 2;
-                            break;
-                        } else {
-                            // "\r" newline found
-                            endPos = nlPos + 1;
-                            break;
-                        }
-                    } else {
-                        // Non-universal newlines
-                        pos = line.IndexOf(_readNL, StringComparison.Ordinal);
-                        if (pos >= 0) {
-                            endPos = pos + _readNL.Length;
-                            break;
-                        }
+                    string chars = _decodedChars;
+                    int start = _decodedCharsUsed;
+                    int endPos = FindLineEnd(chars, start, prefix);
+
+                    int prefixLength = prefix?.Length ?? 0;
+                    if (limit >= 0 && prefixLength + (endPos >= 0 ? endPos : chars.Length) - start >= limit) {
+                        endPos = start + limit - prefixLength;
                     }
 
-                    if (limit >= 0 && line.Length >= limit) {
-                        endPos = limit;
-                        break;
+                    if (endPos >= 0) {
+                        // consume up to just after the line ending
+                        _decodedCharsUsed = endPos;
+                        GC.KeepAlive(this);
+                        string rest = chars.Substring(start, endPos - start);
+                        return prefix == null ? rest : prefix.Append(rest).ToString();
                     }
 
+                    if (start < chars.Length) {
+                        (prefix ??= new StringBuilder()).Append(chars, start, chars.Length - start);
+                    }
+                    _decodedCharsUsed = chars.Length;
+
                     while (ReadChunk(context) && string.IsNullOrEmpty(_decodedChars)) { }
-                    if (!string.IsNullOrEmpty(_decodedChars)) {
-                        line += GetDecodedChars();
-                    } else {
+                    if (string.IsNullOrEmpty(_decodedChars)) {
                         // EOF
                         SetDecodedChars(string.Empty);
                         _nextInput = null;
-                        return line;
+                        return prefix?.ToString() ?? string.Empty;
                     }
                 }
-
-                if (limit >= 0 && endPos > limit) {
-                    endPos = limit;
-                }
-
-                // rewind to just after the line ending
-                RewindDecodedChars(line.Length - endPos);
-                GC.KeepAlive(this);
-                return line.Substring(0, endPos);
             }
 
             #endregion
@@ -2712,13 +2739,16 @@ namespace IronPython.Modules {
             }
 
             private object GetDecoder(CodeContext/*!*/ context) {
-                object lookup = PythonOps.LookupEncoding(context, _encoding);
-                object factory;
-                if (lookup == null || !PythonOps.TryGetBoundAttr(context, lookup, "incrementaldecoder", out factory)) {
-                    throw PythonOps.LookupError(_encoding);
-                }
+                _decoder = BuiltinIncrementalDecoder.TryCreate(_encoding, _errors);
+                if (_decoder == null) {
+                    object lookup = PythonOps.LookupEncoding(context, _encoding);
+                    object factory;
+                    if (lookup == null || !PythonOps.TryGetBoundAttr(context, lookup, "incrementaldecoder", out factory)) {
+                        throw PythonOps.LookupError(_encoding);
+                    }
 
-                _decoder = PythonCalls.Call(context, factory, _errors);
+                    _decoder = PythonCalls.Call(context, factory, _errors);
+                }
                 if (_readUniversal) {
                     _decoder = new IncrementalNewlineDecoder(_decoder, _readTranslate, "strict");
                 }
@@ -2747,11 +2777,44 @@ namespace IronPython.Modules {
                 return res;
             }
 
-            private void RewindDecodedChars(int length) {
-                if (_decodedCharsUsed < length) {
-                    throw PythonOps.AssertionError("rewind decoded_chars out of bounds");
+            private static readonly char[] _newlineChars = new[] { '\r', '\n' };
+
+            /// <summary>
+            /// Searches the decoded chars for the end of the current line, returns the index just
+            /// after the line ending or -1 if the line continues past the end of the chunk.
+            /// </summary>
+            private int FindLineEnd(string chars, int start, StringBuilder prefix) {
+                if (_readTranslate) {
+                    // Newlines have already been translated into "\n"
+                    int pos = chars.IndexOf('\n', start);
+                    return pos >= 0 ? pos + 1 : -1;
+                }
+
+                if (_readUniversal) {
+                    // Search for any newline, "\r" and/or "\n". The decoder ensures that
+                    // "\r\n" isn't split up.
+                    int nlPos = chars.IndexOfAny(_newlineChars, start);
+                    if (nlPos == -1) {
+                        return -1;
+                    }
+                    if (chars[nlPos] == '\r' && chars.Length > nlPos + 1 && chars[nlPos + 1] == '\n') {
+                        // "\r\n" newline found
+                        return nlPos + 2;
+                    }
+                    return nlPos + 1;
+                }
+
+                // Non-universal newlines
+                int idx = chars.IndexOf(_readNL, start, StringComparison.Ordinal);
+                if (idx >= 0) {
+                    return idx + _readNL.Length;
+                }
+                // "\r\n" split between two chunks
+                if (_readNL.Length == 2 && start < chars.Length && chars[start] == _readNL[1]
+                    && prefix != null && prefix.Length > 0 && prefix[prefix.Length - 1] == _readNL[0]) {
+                    return start + 1;
                 }
-                _decodedCharsUsed -= length;
+                return -1;
             }
 
             /// <summary>
@@ -2764,12 +2827,22 @@ namespace IronPython.Modules {
                 }
 
                 IncrementalNewlineDecoder typedDecoder = _decoder as IncrementalNewlineDecoder;
+                BuiltinIncrementalDecoder builtinDecoder = _decoder as BuiltinIncrementalDecoder;
+                bool isBuiltin = builtinDecoder != null || typedDecoder != null && typedDecoder.IsBuiltin;
+
+                if (isBuiltin && !_telling && _bufferTyped?.GetType() == typeof(BufferedReader)) {
+                    // no snapshot needed, decode straight out of the reader's buffer
+                    return ReadChunkFromBuffer(context, (BufferedReader)_bufferTyped, typedDecoder, builtinDecoder);
+                }
+
                 Bytes decodeBuffer = null;
                 int decodeFlags = 0;
                 if (_telling) {
                     // take a snapshot where the decoder's input buffer is empty
                     if (typedDecoder != null) {
                         typedDecoder.GetState(context, out decodeBuffer, out decodeFlags);
+                    } else if (builtinDecoder != null) {
+                        decodeBuffer = builtinDecoder.Pending;
                     } else {
                         PythonTuple tuple = (PythonTuple)PythonOps.Invoke(context, _decoder, "getstate");
                         decodeBuffer = GetBytes(tuple[0], "getstate");
@@ -2777,17 +2850,20 @@ namespace IronPython.Modules {
                     }
                 }
 
+                // the native decoders are cheap to run, so read larger chunks with them
+                int chunkSize = isBuiltin ? Math.Max(_CHUNK_SIZE, DEFAULT_BUFFER_SIZE) : _CHUNK_SIZE;
+
                 object chunkObj;
                 string callName;
                 if (_bufferTyped != null) {
-                    chunkObj = _bufferTyped.read1(context, _CHUNK_SIZE);
+                    chunkObj = _bufferTyped.read1(context, chunkSize);
                     callName = "read1()";
                 } else {
                     if (PythonOps.TryGetBoundAttr(_buffer, "read1", out object read1)) {
-                        chunkObj = PythonCalls.Call(context, read1, _CHUNK_SIZE);
+                        chunkObj = PythonCalls.Call(context, read1, chunkSize);
                         callName = "read1()";
                     } else {
-                        chunkObj = PythonOps.Invoke(context, _buffer, "read", _CHUNK_SIZE);
+                        chunkObj = PythonOps.Invoke(context, _buffer, "read", chunkSize);
                         callName = "read()";
                     }
                 }
@@ -2798,6 +2874,8 @@ namespace IronPython.Modules {
                 string decoded;
                 if (typedDecoder != null) {
                     decoded = typedDecoder.decode(context, chunk, eof);
+                } else if (builtinDecoder != null) {
+                    decoded = builtinDecoder.Decode(context, chunk.AsSpan(), eof);
                 } else {
                     decoded = (string)PythonOps.Invoke(context, _decoder, "decode", chunk, eof);
                 }
@@ -2811,6 +2889,22 @@ namespace IronPython.Modules {
                 return !eof;
             }
 
+            private bool ReadChunkFromBuffer(CodeContext/*!*/ context, BufferedReader reader, IncrementalNewlineDecoder typedDecoder, BuiltinIncrementalDecoder builtinDecoder) {
+                lock (reader) {
+                    ReadOnlySpan<byte> chunk = reader.PeekBuffered(context);
+                    bool eof = chunk.IsEmpty;
+
+                    string decoded = typedDecoder != null ?
+                        typedDecoder.Decode(context, chunk, eof) :
+                        builtinDecoder.Decode(context, chunk, eof);
+                    reader.ConsumeBuffered(chunk.Length);
+
+                    SetDecodedChars(decoded);
+                    _nextInput = null;
+                    return !eof;
+                }
+            }
+
             #endregion
         }
 
@@ -2966,6 +3060,10 @@ namespace IronPython.Modules {
             }
 
             public string decode(CodeContext/*!*/ context, [NotNone] IList<byte> input, bool final = false) {
+                if (_decoder is BuiltinIncrementalDecoder builtin && input is Bytes bytes) {
+                    return DecodeWorker(context, builtin.Decode(context, bytes.AsSpan(), final), final);
+                }
+
                 object output;
                 if (_decoder == null) {
                     output = input.MakeString();
@@ -2997,6 +3095,16 @@ namespace IronPython.Modules {
                 return decode(context, Bytes.Make(input.MakeByteArray()), final);
             }
 
+            internal bool IsBuiltin => _decoder is BuiltinIncrementalDecoder;
+
+            internal string Decode(CodeContext/*!*/ context, ReadOnlySpan<byte> input, bool final) {
+                if (_decoder is BuiltinIncrementalDecoder builtin) {
+                    return DecodeWorker(context, builtin.Decode(context, input, final), final);
+                }
+
+                return decode(context, Bytes.Make(input.ToArray()), final);
+            }
+
             private string DecodeWorker(CodeContext/*!*/ context, string decoded, bool final) {
                 if (_pendingCR && (final || decoded.Length > 0)) {
                     decoded = "\r" + decoded;
@@ -3041,7 +3149,9 @@ namespace IronPython.Modules {
             public PythonTuple getstate(CodeContext/*!*/ context) {
                 object buf = Bytes.Empty;
                 int flags = 0;
-                if (_decoder != null) {
+                if (_decoder is BuiltinIncrementalDecoder builtin) {
+                    buf = builtin.Pending;
+                } else if (_decoder != null) {
                     PythonTuple state = (PythonTuple)PythonOps.Invoke(context, _decoder, "getstate");
                     buf = state[0];
                     flags = Converter.ConvertToInt32(state[1]) << 1;
@@ -3054,10 +3164,15 @@ namespace IronPython.Modules {
             }
 
             internal void GetState(CodeContext/*!*/ context, out Bytes buf, out int flags) {
-                PythonTuple state = (PythonTuple)PythonOps.Invoke(context, _decoder, "getstate");
+                if (_decoder is BuiltinIncrementalDecoder builtin) {
+                    buf = builtin.Pending;
+                    flags = 0;
+                } else {
+                    PythonTuple state = (PythonTuple)PythonOps.Invoke(context, _decoder, "getstate");
 
-                buf = GetBytes(state[0], "getstate");
-                flags = Converter.ConvertToInt32(state[1]) << 1;
+                    buf = GetBytes(state[0], "getstate");
+                    flags = Converter.ConvertToInt32(state[1]) << 1;
+                }
                 if (_pendingCR) {
                     flags |= 1;
                 }
@@ -3068,14 +3183,18 @@ namespace IronPython.Modules {
                 int flags = Converter.ConvertToInt32(state[1]);
 
                 _pendingCR = (flags & 1) != 0;
-                if (_decoder != null) {
+                if (_decoder is BuiltinIncrementalDecoder builtin) {
+                    builtin.SetPending(GetBytes(buf, "setstate"));
+                } else if (_decoder != null) {
                     PythonOps.Invoke(context, _decoder, "setstate", PythonTuple.MakeTuple(buf, flags >> 1));
                 }
             }
 
             internal void SetState(CodeContext/*!*/ context, Bytes buffer, int flags) {
                 _pendingCR = (flags & 1) != 0;
-                if (_decoder != null) {
+                if (_decoder is BuiltinIncrementalDecoder builtin) {
+                    builtin.SetPending(buffer);
+                } else if (_decoder != null) {
                     PythonOps.Invoke(context, _decoder, "setstate", PythonTuple.MakeTuple(buffer, flags >> 1));
                 }
             }
@@ -3083,7 +3202,9 @@ namespace IronPython.Modules {
             public void reset(CodeContext/*!*/ context) {
                 _seenNL = LineEnding.None;
                 _pendingCR = false;
-                if (_decoder != null) {
+                if (_decoder is BuiltinIncrementalDecoder builtin) {
+                    builtin.reset();
+                } else if (_decoder != null) {
                     PythonOps.Invoke(context, _decoder, "reset");
                 }
             }
@@ -3104,6 +3225,107 @@ namespace IronPython.Modules {
             public object newlines => GetNewlines(_seenNL);
         }
 
+#nullable enable
+
+        /// <summary>
+        /// Incremental decoder used by TextIOWrapper for the codecs .NET decodes natively (UTF-8,
+        /// ASCII and Latin-1) with strict error handling, so reading text doesn't go through the
+        /// Python level codec machinery for every chunk.
+        ///
+        /// Like codecs.BufferedIncrementalDecoder the only state is the tail of an incomplete UTF-8
+        /// sequence, which is exposed through getstate and setstate so tell() and seek() snapshots
+        /// work as with any other decoder.
+        /// </summary>
+        [PythonType, PythonHidden]
+        public sealed class BuiltinIncrementalDecoder {
+            private static Encoding? _strictUtf8, _strictAscii;
+
+            private readonly string _encodingName;
+            private readonly Encoding _encoding;
+            private readonly bool _isUtf8;
+            private byte[] _pending = Array.Empty<byte>();
+
+            private BuiltinIncrementalDecoder(string encodingName, Encoding encoding, bool isUtf8) {
+                _encodingName = encodingName;
+                _encoding = encoding;
+                _isUtf8 = isUtf8;
+            }
+
+            /// <summary>
+            /// Creates a decoder for the given encoding, or returns null if the encoding or the
+            /// error handler is not supported natively.
+            /// </summary>
+            internal static BuiltinIncrementalDecoder? TryCreate(string encoding, string errors) {
+                if (errors != "strict") return null;
+
+                switch (StringOps.NormalizeEncodingName(encoding)) {
+                    case "utf_8":
+                    case "utf8":
+                    case "u8":
+                        return new BuiltinIncrementalDecoder("utf-8", _strictUtf8 ??= new UTF8Encoding(false, throwOnInvalidBytes: true), isUtf8: true);
+                    case "ascii":
+                    case "us_ascii":
+                    case "646":
+                        return new BuiltinIncrementalDecoder("ascii", _strictAscii ??= Encoding.GetEncoding("us-ascii", EncoderFallback.ExceptionFallback, DecoderFallback.ExceptionFallback), isUtf8: false);
+                    case "latin_1":
+                    case "latin1":
+                    case "latin":
+                    case "l1":
+                    case "iso8859_1":
+                    case "iso_8859_1":
+                        return new BuiltinIncrementalDecoder("latin-1", StringOps.Latin1Encoding, isUtf8: false);
+                    default:
+                        return null;
+                }
+            }
+
+            public string decode(CodeContext/*!*/ context, [NotNone] IBufferProtocol input, bool final = false) {
+                using IPythonBuffer buffer = input.GetBuffer();
+                return Decode(context, buffer.AsReadOnlySpan(), final);
+            }
+
+            public PythonTuple getstate() => PythonTuple.MakeTuple(Pending, 0);
+
+            public void setstate([NotNone] PythonTuple state) {
+                SetPending(GetBytes(state[0], "setstate"));
+            }
+
+            public void reset() {
+                _pending = Array.Empty<byte>();
+            }
+
+            internal Bytes Pending => _pending.Length == 0 ? Bytes.Empty : Bytes.Make(_pending);
+
+            internal void SetPending(Bytes? pending) {
+                _pending = pending is null || pending.Count == 0 ? Array.Empty<byte>() : pending.AsSpan().ToArray();
+            }
+
+            internal string Decode(CodeContext/*!*/ context, ReadOnlySpan<byte> input, bool final) {
+                ReadOnlySpan<byte> data = input;
+                if (_pending.Length > 0) {
+                    byte[] joined = new byte[_pending.Length + input.Length];
+                    _pending.CopyTo(joined, 0);
+                    input.CopyTo(joined.AsSpan(_pending.Length));
+                    data = joined;
+                }
+
+                int count = _isUtf8 ? StringOps.NumEligibleUtf8Bytes(data, final) : data.Length;
+                string res;
+                try {
+                    res = count == 0 ? string.Empty : _encoding.GetString(data.Slice(0, count));
+                } catch (DecoderFallbackException) {
+                    // let the codec machinery report the error the way the codec would
+                    using IPythonBuffer buffer = ((IBufferProtocol)Bytes.Make(data.ToArray())).GetBuffer();
+                    res = StringOps.DoDecode(context, buffer, "strict", _encodingName, _encoding, count);
+                }
+
+                _pending = count == data.Length ? Array.Empty<byte>() : data.Slice(count).ToArray();
+                return res;
+            }
+        }
+
+#nullable restore
+
         public static PythonType BlockingIOError {
             get { return PythonExceptions.BlockingIOError; }
         }
@@ -292,24 +292,14 @@ Handle an exception by displaying it with a traceback on sys.stderr._")]
 
         // setdefaultencoding has been removed in Python 3
 
-#if PROFILE_SUPPORT
-        // not enabled because we don't yet support tracing built-in functions.  Doing so is a little
-        // difficult because it's hard to flip tracing on/off for them w/o a perf overhead in the 
-        // non-profiling case.
-        public static void setprofile(CodeContext/*!*/ context, TracebackDelegate o) {
+        public static void setprofile(CodeContext/*!*/ context, object o) {
             PythonContext pyContext = context.LanguageContext;
-            pyContext.EnsureDebugContext();
-
-            if (o == null) {
-                pyContext.UnregisterTracebackHandler();
-            } else {
-                pyContext.RegisterTracebackHandler();
-            }
+            pyContext.SetProfileHook(o == null ? null : new ProfileFunctionHook(pyContext, o));
+        }
 
-            // Register the trace func with the listener
-            pyContext.TracebackListener.SetProfile(o);
+        public static object getprofile(CodeContext/*!*/ context) {
+            return (context.LanguageContext.ProfileHook as ProfileFunctionHook)?.Function;
         }
-#endif
 
         public static void settrace(CodeContext/*!*/ context, object o) {
             context.LanguageContext.SetTrace(o);
@@ -385,6 +385,37 @@ namespace IronPython.Runtime {
             return null;
         }
 
+        /// <summary>
+        /// Obtain the segment of the underlying array holding the buffer data, if possible.
+        /// Unless <paramref name="writable"/> is set, the returned segment is unsafe because it should not be written to.
+        /// </summary>
+        internal static bool TryGetArraySegment(this IPythonBuffer buffer, bool writable, out ArraySegment<byte> segment) {
+            segment = default;
+            if (!buffer.IsCContiguous() || writable && buffer.IsReadOnly)
+                return false;
+
+            ReadOnlySpan<byte> bufdata = buffer.AsReadOnlySpan();
+            if (bufdata.IsEmpty) {
+                segment = new ArraySegment<byte>(Array.Empty<byte>());
+                return true;
+            }
+
+            byte[]? array = buffer.Object switch {
+                Bytes b when !writable => b.UnsafeByteArray,
+                ByteArray ba => ba.UnsafeByteList.Data,
+                Memory<byte> mem when MemoryMarshal.TryGetArray(mem, out ArraySegment<byte> seg) => seg.Array,
+                ReadOnlyMemory<byte> rom when !writable && MemoryMarshal.TryGetArray(rom, out ArraySegment<byte> seg) => seg.Array,
+                _ => null
+            };
+
+            // memoryview slices share the array of the exporting object at some offset
+            if (array is null || !array.AsSpan().Overlaps(bufdata, out int offset) || offset < 0 || offset + bufdata.Length > array.Length)
+                return false;
+
+            segment = new ArraySegment<byte>(array, offset, bufdata.Length);
+            return true;
+        }
+
         private static bool UseSameMemory(byte[] arr, ReadOnlySpan<byte> span)
             => arr.Length >= span.Length && arr.AsSpan(0, span.Length) == span;
     }
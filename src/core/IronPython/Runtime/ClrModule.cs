@@ -874,6 +874,10 @@ import Namespace.")]
             ContractUtils.RequiresNotNull(assemblyName, nameof(assemblyName));
             ContractUtils.RequiresNotNullItems(filenames, nameof(filenames));
 
+#if !(FEATURE_ASSEMBLYBUILDER_SAVE && FEATURE_LAMBDAEXPRESSION_COMPILETOMETHOD)
+            // fail before compiling all of the modules, saving them would only fail in the DLR afterwards
+            throw PythonOps.NotImplementedError("clr.CompileModules is not supported on this platform, modules can only be saved to assemblies on .NET Framework");
+#else
             PythonContext pc = context.LanguageContext;
 
             for (int i = 0; i < filenames.Length; i++) {
@@ -941,6 +945,7 @@ import Namespace.")]
             }
 
             SavableScriptCode.SaveToAssembly(assemblyName, kwArgs, code.ToArray());
+#endif
         }
 #endif
 
@@ -1153,6 +1158,78 @@ import Namespace.")]
             po.EnableProfiler = enable;
         }
 
+        /// <summary>
+        /// Returns a tuple of (code, tier, interpretedTime) tuples describing the compilation of the Python
+        /// functions of the current ScriptEngine.  Functions start out interpreted and the interpreter compiles
+        /// them on a background thread once they reach the compilation threshold.  tier is 'interpreted' or
+        /// 'compiled' and interpretedTime the seconds from the first call until the compiled code was
+        /// installed, or until now while the function is still interpreted.
+        /// 
+        /// Functions which never ran are only included if includeUnused is True.
+        /// </summary>
+        public static PythonTuple GetCompilationData(CodeContext/*!*/ context, bool includeUnused = false) {
+            var res = new List<object>();
+            foreach (FunctionCode code in FunctionCode.GetAllFunctionCode(context.LanguageContext)) {
+                if (includeUnused || !code.IsUnused) {
+                    res.Add(PythonTuple.MakeTuple(code, code.Tier, code.InterpretedTime));
+                }
+            }
+            return new PythonTuple(DefaultContext.Default, res);
+        }
+
+        /// <summary>
+        /// Compiles a Python function, or the code object of one, now rather than once it gets hot.  This
+        /// can be used to warm up a service before it handles requests.
+        /// </summary>
+        public static void CompileFunction(CodeContext/*!*/ context, object function) {
+            FunctionCode code = function switch {
+                PythonFunction pyFunction => pyFunction.__code__,
+                FunctionCode functionCode => functionCode,
+                _ => throw PythonOps.TypeError("expected function or code, got {0}", PythonOps.GetPythonTypeName(function))
+            };
+            if (!code.IsFunction) {
+                throw PythonOps.ValueError("{0} is not the code of a function", code.co_name);
+            }
+            code.EnsureCompiled(context.LanguageContext);
+        }
+
+        /// <summary>
+        /// Starts sampling the Python stacks of all threads every interval seconds.  Unlike
+        /// EnableProfiler and sys.setprofile the sampler records no timings, but the stacks are
+        /// still tracked on every Python function call while it is running, so call heavy code
+        /// slows down in proportion to its call rate.
+        /// </summary>
+        public static void StartSampler(CodeContext/*!*/ context, double interval = 0.001) {
+            if (!(interval > 0)) {
+                throw PythonOps.ValueError("interval must be positive");
+            }
+            context.LanguageContext.StartSampling(TimeSpan.FromSeconds(interval));
+        }
+
+        /// <summary>
+        /// Stops the sampler started by StartSampler or -X Sample.  The samples taken remain available
+        /// from GetSamplerData.
+        /// </summary>
+        public static void StopSampler(CodeContext/*!*/ context) {
+            context.LanguageContext.StopSampling();
+        }
+
+        /// <summary>
+        /// Returns the stacks sampled so far in the collapsed format read by flamegraph tools: one
+        /// line per distinct stack, with the frames from the outermost separated by semicolons,
+        /// followed by the number of samples.
+        /// </summary>
+        public static string GetSamplerData(CodeContext/*!*/ context) {
+            return context.LanguageContext.SamplingProfiler?.GetCollapsedStacks() ?? string.Empty;
+        }
+
+        /// <summary>
+        /// Discards the stacks sampled so far.
+        /// </summary>
+        public static void ClearSamplerData(CodeContext/*!*/ context) {
+            context.LanguageContext.SamplingProfiler?.Clear();
+        }
+
 #if FEATURE_SERIALIZATION
         /// <summary>
         /// Serializes data using the .NET serialization formatter for complex
@@ -20,36 +20,45 @@ using IronPython.Runtime.Types;
 namespace IronPython.Runtime {
     /// <summary>
     /// General purpose storage used for most PythonDictionarys.
-    /// 
+    ///
+    /// The storage uses a compact layout similar to CPython 3.6+: a sparse array
+    /// of indices which is probed linearly and which points into a dense array of
+    /// entries.  Entries are appended in insertion order so iteration is a scan of
+    /// the dense array and preserves insertion order.  Removed entries are marked
+    /// with a tombstone key and are dropped the next time the table is rebuilt.  The None key
+    /// is stored outside of the table, it records the entry it was inserted before so it's
+    /// still enumerated in insertion order.
+    ///
     /// This dictionary storage is thread safe for multiple readers or writers.
-    /// 
+    ///
     /// Mutations to the dictionary involves a simple locking strategy of
     /// locking on the DictionaryStorage object to ensure that only one
     /// mutation happens at a time.
-    /// 
+    ///
     /// Reads against the dictionary happen lock free.  When the dictionary is mutated
-    /// it is either adding or removing buckets in a thread-safe manner so that the readers
+    /// it is either adding or removing entries in a thread-safe manner so that the readers
     /// will either see a consistent picture as if the read occured before or after the mutation.
-    /// 
-    /// When resizing the dictionary the buckets are replaced atomically so that the reader
-    /// sees the new buckets or the old buckets.  When reading the reader first reads
-    /// the buckets and then calls a static helper function to do the read from the bucket
-    /// array to ensure that readers are not seeing multiple bucket arrays.
+    /// New entries are fully written before the index pointing at them is published.
+    ///
+    /// When resizing the dictionary the indices and entries are replaced atomically (they
+    /// are held together in a single <see cref="Table"/>) so that the reader sees the new
+    /// table or the old table.  When reading the reader first reads the table and then
+    /// calls a static helper function to do the read from the table to ensure that
+    /// readers are not seeing multiple tables.
     /// </summary>
     [Serializable]
     internal class CommonDictionaryStorage : DictionaryStorage, ISerializable, IDeserializationCallback {
-        protected Bucket[] _buckets;
+        private Table _table;
         private int _count;
         private int _version;
-        private NullValue _nullValue;  // value stored in null bucket
+        private NullValue _nullValue;  // value stored in null bucket, along with its position in the entries
 
         private Func<object, int> _hashFunc;
         private Func<object, object, bool> _eqFunc;
         private Type _keyType;
 
-        private const int InitialBucketSize = 7;
-        private const int ResizeMultiplier = 3;
-        private const double Load = .7;
+        private const int MinimumIndexSize = 8;     // must be a power of 2
+        private const int GrowthRate = 2;
 
         // pre-created delegate instances shared by all homogeneous dictionaries for primitive types.
         private static readonly Func<object, int> _primitiveHash = PrimitiveHash, _doubleHash = DoubleHash, _intHash = IntHash, _tupleHash = TupleHash, _genericHash = GenericHash;
@@ -67,10 +76,10 @@ namespace IronPython.Runtime {
         public CommonDictionaryStorage() { }
 
         /// <summary>
-        /// Creates a new dictionary storage with buckets
+        /// Creates a new dictionary storage with room for count entries
         /// </summary>
         public CommonDictionaryStorage(int count) {
-            _buckets = new Bucket[(int)(count / Load + 2)];
+            _table = new Table(GetIndexSize(count));
         }
 
         /// <summary>
@@ -78,7 +87,7 @@ namespace IronPython.Runtime {
         /// items arary
         /// </summary>
         public CommonDictionaryStorage(object[] items, bool isHomogeneous)
-            : this(Math.Max(items.Length / 2, InitialBucketSize)) {
+            : this(items.Length / 2) {
             // always called w/ items, and items should be even (key/value pairs)
             Debug.Assert(items.Length > 0 && (items.Length & 0x01) == 0);
 
@@ -116,11 +125,11 @@ namespace IronPython.Runtime {
         }
 
         /// <summary>
-        /// Creates a new dictionary storage with the given set of buckets
+        /// Creates a new dictionary storage with the given table
         /// and size.  Used when cloning the dictionary storage.
         /// </summary>
-        private CommonDictionaryStorage(Bucket[] buckets, int count, Type keyType, Func<object, int> hashFunc, Func<object, object, bool> eqFunc, NullValue nullValue) {
-            _buckets = buckets;
+        private CommonDictionaryStorage(Table table, int count, Type keyType, Func<object, int> hashFunc, Func<object, object, bool> eqFunc, NullValue nullValue) {
+            _table = table;
             _count = count;
             _keyType = keyType;
             _hashFunc = hashFunc;
@@ -155,7 +164,7 @@ namespace IronPython.Runtime {
             if (_nullValue != null) {
                 _nullValue.Value = value;
             } else {
-                _nullValue = new NullValue(value);
+                _nullValue = new NullValue(value, _table?.Used ?? 0);
             }
         }
 
@@ -165,7 +174,7 @@ namespace IronPython.Runtime {
 
         public void AddNoLock(object key, object value) {
             if (key != null) {
-                if (_buckets == null) {
+                if (_table == null) {
                     Initialize();
                 }
 
@@ -180,13 +189,13 @@ namespace IronPython.Runtime {
         }
 
         private void AddOne(object key, object value) {
-            if (Add(_buckets, key, value)) {
-                _count++;
+            if (_table.Used == _table.Entries.Length) {
+                // out of entries, grow the table (or just compact it if there are many removed entries)
+                Resize(GetIndexSize(_count * GrowthRate + 1));
+            }
 
-                if (_count >= (_buckets.Length * Load)) {
-                    // grow the hash table
-                    EnsureSize((int)(_buckets.Length / Load) * ResizeMultiplier);
-                }
+            if (AddWorker(_table, key, value, Hash(key))) {
+                _count++;
             }
         }
 
@@ -219,14 +228,14 @@ namespace IronPython.Runtime {
 
                 _keyType = t;
             } else if (_keyType != HeterogeneousType) {
-                // 2nd time through, we're adding a new type so we have mutliple types now, 
+                // 2nd time through, we're adding a new type so we have mutliple types now,
                 // make a new site for this storage
 
                 SetHeterogeneousSites();
 
-                // we need to clone the buckets so any lock-free readers will only see
-                // the old buckets which are homogeneous
-                _buckets = (Bucket[])_buckets.Clone();
+                // we need to clone the table so any lock-free readers will only see
+                // the old table which is homogeneous
+                _table = _table.Clone();
             }
             // else we have already created a new site this dictionary
         }
@@ -245,110 +254,129 @@ namespace IronPython.Runtime {
             _eqFunc = (o1, o2) => equalSite.Target(equalSite, o1, o2);
         }
 
-        private void EnsureSize(int newSize) {
-            if (_buckets.Length >= newSize) {
-                return;
-            }
+        /// <summary>
+        /// Rebuilds the table with the given index size, dropping any removed entries.
+        /// The new table is published atomically once it has been fully populated.
+        /// </summary>
+        private void Resize(int indexSize) {
+            Table oldTable = _table;
+            Table newTable = new Table(indexSize);
+            Debug.Assert(newTable.Entries.Length >= _count);
 
-            Bucket[] oldBuckets = _buckets;
-            Bucket[] newBuckets = new Bucket[newSize];
+            CopyLiveEntries(oldTable, newTable, _nullValue);
 
-            for (int i = 0; i < oldBuckets.Length; i++) {
-                Bucket curBucket = oldBuckets[i];
-                if (curBucket.Key != null && curBucket.Key != _removed) {
-                    AddWorker(newBuckets, curBucket.Key, curBucket.Value, curBucket.HashCode);
+            _table = newTable;
+        }
+
+        /// <summary>
+        /// Appends the live entries of a table to a new table and moves the position of the None
+        /// key (if any) along with them.
+        /// </summary>
+        private static void CopyLiveEntries(Table from, Table to, NullValue nullValue) {
+            int nullPosition = -1;
+            Bucket[] entries = from.Entries;
+            for (int i = 0; i < from.Used; i++) {
+                if (nullValue != null && nullValue.Position == i) {
+                    nullPosition = to.Used;
+                }
+                if (entries[i].Key != _removed) {
+                    to.AddUnique(entries[i]);
                 }
             }
 
-            _buckets = newBuckets;
+            if (nullValue != null) {
+                nullValue.Position = nullPosition == -1 ? to.Used : nullPosition;
+            }
+        }
+
+        /// <summary>
+        /// Ensures there is room to append the given number of new entries without resizing.
+        /// </summary>
+        private void EnsureFree(int additional) {
+            if (_table.Entries.Length - _table.Used < additional) {
+                Resize(GetIndexSize(_count + additional));
+            }
         }
 
         public override void EnsureCapacityNoLock(int size) {
-            if (_buckets == null) {
-                _buckets = new Bucket[(int)(size / Load) + 1];
+            if (_table == null) {
+                _table = new Table(GetIndexSize(size));
             } else {
-                EnsureSize((int)(size / Load));
+                EnsureFree(size - _count);
             }
         }
 
         /// <summary>
-        /// Initializes the buckets to their initial capacity, the caller
-        /// must check if the buckets are empty first.
+        /// Initializes the table to its initial capacity, the caller
+        /// must check if the table is empty first.
         /// </summary>
         private void Initialize() {
-            _buckets = new Bucket[InitialBucketSize];
+            _table = new Table(MinimumIndexSize);
         }
 
         /// <summary>
-        /// Add helper that works over a single set of buckets.  Used for
-        /// both the normal add case as well as the resize case.
+        /// Gets the size of the index array required to hold count entries.
         /// </summary>
-        private bool Add(Bucket[] buckets, object key, object value) {
-            int hc = Hash(key);
-
-            return AddWorker(buckets, key, value, hc);
+        private static int GetIndexSize(int count) {
+            int size = MinimumIndexSize;
+            while (Table.GetUsableSize(size) < count && size < (1 << 30)) {
+                size <<= 1;
+            }
+            return size;
         }
 
         /// <summary>
         /// Add helper which adds the given key/value (where the key is not null) with
-        /// a pre-computed hash code.
+        /// a pre-computed hash code.  The table must have room to append a new entry.
         /// </summary>
-        protected bool AddWorker(Bucket[] buckets, object/*!*/ key, object value, int hc) {
+        private bool AddWorker(Table table, object/*!*/ key, object value, int hc) {
             Debug.Assert(key != null);
+            Debug.Assert(table.Used < table.Entries.Length);
 
-            Debug.Assert(_count < buckets.Length);
-            int startIndex = hc % buckets.Length;
+            int[] indices = table.Indices;
+            Bucket[] entries = table.Entries;
+            int mask = indices.Length - 1;
 
             // scan forward for matching key first
-            int index = startIndex;
+            int index = hc & mask;
             int firstUsableIndex = -1;
-            for (; ; ) {
-                Bucket cur = buckets[index];
-                if (cur.Key == null) {
+            for (; ; index = (index + 1) & mask) {
+                int entryIndex = indices[index] - 1;
+                if (entryIndex < 0) {
                     // no entry was ever here, nothing more to probe
                     if (firstUsableIndex == -1) {
                         firstUsableIndex = index;
                     }
                     break;
-                } else if (cur.Key == _removed) {
-                    // we recycled this bucket, so need to continue walking to see if a following bucket matches
+                }
+
+                Bucket cur = entries[entryIndex];
+                if (cur.Key == _removed) {
+                    // the entry was removed, so need to continue walking to see if a following index matches
                     if (firstUsableIndex == -1) {
-                        // retain the index of the first recycled bucket, in case we need it later
+                        // retain the first index pointing at a removed entry, in case we need it later
                         firstUsableIndex = index;
                     }
                 } else if (Object.ReferenceEquals(key, cur.Key) || (cur.HashCode == hc && _eqFunc(key, cur.Key))) {
-                    // this bucket is a key match
+                    // this entry is a key match
                     _version++;
-                    buckets[index].Value = value;
+                    entries[entryIndex].Value = value;
                     return false;
                 }
-
-                // keep walking
-                index = ProbeNext(buckets, index);
-
-                // if we ended up doing a full scan, then this means the key is not already in use and there are
-                // only recycled buckets available -- nothing more to probe
-                if (index == startIndex) {
-                    break;
-                }
             }
 
-            // the key wasn't found, but we did find a fresh or recycled (unused) bucket
+            // the key wasn't found, append a new entry and point the fresh or recycled index at it
             _version++;
-            buckets[firstUsableIndex].HashCode = hc;
-            buckets[firstUsableIndex].Value = value;
-            buckets[firstUsableIndex].Key = key;
+            int newIndex = table.Used;
+            entries[newIndex].HashCode = hc;
+            entries[newIndex].Value = value;
+            entries[newIndex].Key = key;
+            table.Used = newIndex + 1;
 
-            return true;
-        }
+            // publish the entry only once it's fully written
+            Volatile.Write(ref indices[firstUsableIndex], newIndex + 1);
 
-        private static int ProbeNext(Bucket[] buckets, int index) {
-            // probe to next bucket
-            index++;
-            if (index == buckets.Length) {
-                index = 0;
-            }
-            return index;
+            return true;
         }
 
         /// <summary>
@@ -427,37 +455,29 @@ namespace IronPython.Runtime {
             return TryRemoveNoLock(key, eqFunc, hc, out value);
         }
 
-        protected bool TryRemoveNoLock(object/*!*/ key, Func<object, object, bool> eqFunc, int hc, out object value) {
+        private bool TryRemoveNoLock(object/*!*/ key, Func<object, object, bool> eqFunc, int hc, out object value) {
             Debug.Assert(key != null);
 
-            if (_buckets == null) {
+            Table table = _table;
+            if (table == null) {
                 value = null;
                 return false;
             }
 
-            int index = hc % _buckets.Length;
-            int startIndex = index;
-            do {
-                Bucket bucket = _buckets[index];
-                if (bucket.Key == null) {
-                    break;
-                } else if (
-                    Object.ReferenceEquals(key, bucket.Key) ||
-                    (bucket.Key != _removed &&
-                    bucket.HashCode == hc &&
-                    eqFunc(key, bucket.Key))) {
-                    value = bucket.Value;
-                    _version++;
-                    _buckets[index].Key = _removed;
-                    Thread.MemoryBarrier();
-                    _buckets[index].Value = null;
-                    _count--;
+            int entryIndex = FindEntry(table, key, hc, eqFunc);
+            if (entryIndex >= 0) {
+                Bucket[] entries = table.Entries;
+                value = entries[entryIndex].Value;
+                _version++;
+                // the index keeps pointing at the removed entry so probing continues past it
+                entries[entryIndex].Key = _removed;
+                Thread.MemoryBarrier();
+                entries[entryIndex].Value = null;
+                _count--;
 
-                    return true;
-                }
+                return true;
+            }
 
-                index = ProbeNext(_buckets, index);
-            } while (index != startIndex);
             value = null;
             return false;
         }
@@ -484,7 +504,7 @@ namespace IronPython.Runtime {
         /// </summary>
         public override bool TryGetValue(object key, out object value) {
             if (key != null) {
-                return TryGetValue(_buckets, key, out value);
+                return TryGetValue(_table, key, out value);
             }
 
             NullValue nv = _nullValue;
@@ -499,14 +519,14 @@ namespace IronPython.Runtime {
 
         /// <summary>
         /// Static helper to try and get the value from the dictionary.
-        /// 
-        /// Used so the value lookup can run against a buckets while a writer
-        /// replaces the buckets.
+        ///
+        /// Used so the value lookup can run against a table while a writer
+        /// replaces the table.
         /// </summary>
-        private bool TryGetValue(Bucket[] buckets, object/*!*/ key, out object value) {
+        private bool TryGetValue(Table table, object/*!*/ key, out object value) {
             Debug.Assert(key != null);
 
-            if (_count > 0 && buckets != null) {
+            if (_count > 0 && table != null) {
                 int hc;
                 Func<object, object, bool> eqFunc;
                 if (key.GetType() == _keyType || _keyType == HeterogeneousType) {
@@ -517,34 +537,40 @@ namespace IronPython.Runtime {
                     eqFunc = _genericEquals;
                 }
 
-                return TryGetValue(buckets, key, hc, eqFunc, out value);
+                int entryIndex = FindEntry(table, key, hc, eqFunc);
+                if (entryIndex >= 0) {
+                    value = table.Entries[entryIndex].Value;
+                    return true;
+                }
             }
 
             value = null;
             return false;
         }
 
-        protected static bool TryGetValue(Bucket[] buckets, object key, int hc, Func<object, object, bool> eqFunc, out object value) {
-            int index = hc % buckets.Length;
-            int startIndex = index;
-            do {
-                Bucket bucket = buckets[index];
-                if (bucket.Key == null) {
-                    break;
-                } else if (
-                    Object.ReferenceEquals(key, bucket.Key) ||
-                    (bucket.Key != _removed &&
-                    bucket.HashCode == hc &&
-                    eqFunc(key, bucket.Key))) {
-                    value = bucket.Value;
-                    return true;
+        /// <summary>
+        /// Returns the index of the live entry holding the given key or -1 if the key is not present.
+        /// </summary>
+        private static int FindEntry(Table table, object/*!*/ key, int hc, Func<object, object, bool> eqFunc) {
+            int[] indices = table.Indices;
+            Bucket[] entries = table.Entries;
+            int mask = indices.Length - 1;
+
+            // there's always at least one unused index so the probe terminates
+            for (int index = hc & mask; ; index = (index + 1) & mask) {
+                int entryIndex = indices[index] - 1;
+                if (entryIndex < 0) {
+                    return -1;
                 }
 
-                index = ProbeNext(buckets, index);
-            } while (startIndex != index);
-
-            value = null;
-            return false;
+                object entryKey = entries[entryIndex].Key;
+                if (Object.ReferenceEquals(key, entryKey) ||
+                    (entryKey != _removed &&
+                    entries[entryIndex].HashCode == hc &&
+                    eqFunc(key, entryKey))) {
+                    return entryIndex;
+                }
+            }
         }
 
         /// <summary>
@@ -569,9 +595,9 @@ namespace IronPython.Runtime {
 
         public void Clear() {
             lock (this) {
-                if (_buckets != null) {
+                if (_table != null) {
                     _version++;
-                    _buckets = new Bucket[8];
+                    _table = new Table(MinimumIndexSize);
                     _count = 0;
                 }
                 _nullValue = null;
@@ -581,17 +607,23 @@ namespace IronPython.Runtime {
         public override List<KeyValuePair<object, object>> GetItems() {
             lock (this) {
                 List<KeyValuePair<object, object>> res = new List<KeyValuePair<object, object>>(_count + (_nullValue != null ? 1 : 0));
+                NullValue nullValue = _nullValue;
                 if (_count > 0) {
-                    for (int i = 0; i < _buckets.Length; i++) {
-                        Bucket curBucket = _buckets[i];
-                        if (curBucket.Key != null && curBucket.Key != _removed) {
+                    Bucket[] entries = _table.Entries;
+                    for (int i = 0; i < _table.Used; i++) {
+                        if (nullValue != null && nullValue.Position == i) {
+                            res.Add(new KeyValuePair<object, object>(null, nullValue.Value));
+                            nullValue = null;
+                        }
+                        Bucket curBucket = entries[i];
+                        if (curBucket.Key != _removed) {
                             res.Add(new KeyValuePair<object, object>(curBucket.Key, curBucket.Value));
                         }
                     }
                 }
 
-                if (_nullValue != null) {
-                    res.Add(new KeyValuePair<object, object>(null, _nullValue.Value));
+                if (nullValue != null) {
+                    res.Add(new KeyValuePair<object, object>(null, nullValue.Value));
                 }
                 return res;
             }
@@ -599,36 +631,48 @@ namespace IronPython.Runtime {
 
         public override IEnumerator<KeyValuePair<object, object>> GetEnumerator() {
             lock (this) {
+                NullValue nullValue = _nullValue;
                 if (_count > 0) {
-                    for (int i = 0; i < _buckets.Length; i++) {
-                        Bucket curBucket = _buckets[i];
-                        if (curBucket.Key != null && curBucket.Key != _removed) {
+                    Table table = _table;
+                    for (int i = 0; i < table.Used; i++) {
+                        if (nullValue != null && nullValue.Position == i) {
+                            yield return new KeyValuePair<object, object>(null, nullValue.Value);
+                            nullValue = null;
+                        }
+                        Bucket curBucket = table.Entries[i];
+                        if (curBucket.Key != _removed) {
                             yield return new KeyValuePair<object, object>(curBucket.Key, curBucket.Value);
                         }
                     }
                 }
 
-                if (_nullValue != null) {
-                    yield return new KeyValuePair<object, object>(null, _nullValue.Value);
+                if (nullValue != null) {
+                    yield return new KeyValuePair<object, object>(null, nullValue.Value);
                 }
             }
         }
 
         public override IEnumerable<object>/*!*/ GetKeys() {
-            Bucket[] buckets = _buckets;
+            Table table = _table;
             lock (this) {
                 object[] res = new object[Count];
                 int index = 0;
-                if (buckets != null) {
-                    for (int i = 0; i < buckets.Length; i++) {
-                        Bucket curBucket = buckets[i];
-                        if (curBucket.Key != null && curBucket.Key != _removed) {
+                NullValue nullValue = _nullValue;
+                if (table != null) {
+                    Bucket[] entries = table.Entries;
+                    for (int i = 0; i < table.Used; i++) {
+                        if (nullValue != null && nullValue.Position == i) {
+                            res[index++] = null;
+                            nullValue = null;
+                        }
+                        Bucket curBucket = entries[i];
+                        if (curBucket.Key != _removed) {
                             res[index++] = curBucket.Key;
                         }
                     }
                 }
 
-                if (_nullValue != null) {
+                if (nullValue != null) {
                     res[index++] = null;
                 }
 
@@ -643,10 +687,11 @@ namespace IronPython.Runtime {
                     return true;
                 }
                 if (_keyType != typeof(string) && _keyType != null && _count > 0 && _keyType != typeof(Extensible<string>) && !_keyType.IsSubclassOf(typeof(Extensible<string>))) {
-                    for (int i = 0; i < _buckets.Length; i++) {
-                        Bucket curBucket = _buckets[i];
+                    Bucket[] entries = _table.Entries;
+                    for (int i = 0; i < _table.Used; i++) {
+                        Bucket curBucket = entries[i];
 
-                        if (curBucket.Key != null && curBucket.Key != _removed && !(curBucket.Key is string) && !(curBucket.Key is Extensible<string>)) {
+                        if (curBucket.Key != _removed && !(curBucket.Key is string) && !(curBucket.Key is Extensible<string>)) {
                             return true;
                         }
                     }
@@ -661,26 +706,29 @@ namespace IronPython.Runtime {
         /// </summary>
         public override DictionaryStorage Clone() {
             lock (this) {
-                if (_buckets == null) {
-                    if (_nullValue != null) {
-                        return new CommonDictionaryStorage(null, 1, _keyType, _hashFunc, _eqFunc, new NullValue(_nullValue.Value));
+                NullValue nv = null;
+                if (_nullValue != null) {
+                    nv = new NullValue(_nullValue.Value, _nullValue.Position);
+                }
+
+                if (_table == null) {
+                    if (nv != null) {
+                        return new CommonDictionaryStorage(null, 0, _keyType, _hashFunc, _eqFunc, nv);
                     }
 
                     return new CommonDictionaryStorage();
                 }
 
-                Bucket[] resBuckets = new Bucket[_buckets.Length];
-                for (int i = 0; i < _buckets.Length; i++) {
-                    if (_buckets[i].Key != null) {
-                        resBuckets[i] = _buckets[i];
-                    }
+                Table resTable;
+                if (_count < _table.Used) {
+                    // there are removed entries, create a compact copy
+                    resTable = new Table(GetIndexSize(_count));
+                    CopyLiveEntries(_table, resTable, nv);
+                } else {
+                    resTable = _table.Clone();
                 }
 
-                NullValue nv = null;
-                if (_nullValue != null) {
-                    nv = new NullValue(_nullValue.Value);
-                }
-                return new CommonDictionaryStorage(resBuckets, _count, _keyType, _hashFunc, _eqFunc, nv);
+                return new CommonDictionaryStorage(resTable, _count, _keyType, _hashFunc, _eqFunc, nv);
             }
         }
 
@@ -691,14 +739,16 @@ namespace IronPython.Runtime {
         public DictionaryStorage CopyTo(DictionaryStorage into) {
             Debug.Assert(into != null);
 
-            if (_buckets != null) {
+            if (_table != null) {
                 using (new OrderedLocker(this, into)) {
+                    // the None key is copied along with the entries to keep the insertion order
                     if (@into is CommonDictionaryStorage commonInto) {
                         CommonCopyTo(commonInto);
                     } else {
                         UncommonCopyTo(ref into);
                     }
                 }
+                return into;
             }
 
             var nullValue = _nullValue;
@@ -709,15 +759,10 @@ namespace IronPython.Runtime {
         }
 
         private void CommonCopyTo(CommonDictionaryStorage into) {
-            if (into._buckets == null) {
-                into._buckets = new Bucket[_buckets.Length];
+            if (into._table == null) {
+                into._table = new Table(GetIndexSize(_count));
             } else {
-                int curSize = into._buckets.Length;
-                int newSize = (int)((_count + into._count) / Load) + 2;
-                while (curSize < newSize) {
-                    curSize *= ResizeMultiplier;
-                }
-                into.EnsureSize(curSize);
+                into.EnsureFree(_count);
             }
 
             if (into._keyType == null) {
@@ -728,24 +773,45 @@ namespace IronPython.Runtime {
                 into.SetHeterogeneousSites();
             }
 
-            for (int i = 0; i < _buckets.Length; i++) {
-                Bucket curBucket = _buckets[i];
+            NullValue nullValue = _nullValue;
+            Bucket[] entries = _table.Entries;
+            for (int i = 0; i < _table.Used; i++) {
+                if (nullValue != null && nullValue.Position == i) {
+                    into.AddNull(nullValue.Value);
+                    nullValue = null;
+                }
 
-                if (curBucket.Key != null &&
-                    curBucket.Key != _removed &&
-                    into.AddWorker(into._buckets, curBucket.Key, curBucket.Value, curBucket.HashCode)) {
+                Bucket curBucket = entries[i];
+
+                if (curBucket.Key != _removed &&
+                    into.AddWorker(into._table, curBucket.Key, curBucket.Value, curBucket.HashCode)) {
                     into._count++;
                 }
             }
+
+            if (nullValue != null) {
+                into.AddNull(nullValue.Value);
+            }
         }
 
         private void UncommonCopyTo(ref DictionaryStorage into) {
-            for (int i = 0; i < _buckets.Length; i++) {
-                Bucket curBucket = _buckets[i];
-                if (curBucket.Key != null && curBucket.Key != _removed) {
+            NullValue nullValue = _nullValue;
+            Bucket[] entries = _table.Entries;
+            for (int i = 0; i < _table.Used; i++) {
+                if (nullValue != null && nullValue.Position == i) {
+                    into.AddNoLock(ref into, null, nullValue.Value);
+                    nullValue = null;
+                }
+
+                Bucket curBucket = entries[i];
+                if (curBucket.Key != _removed) {
                     into.AddNoLock(ref into, curBucket.Key, curBucket.Value);
                 }
             }
+
+            if (nullValue != null) {
+                into.AddNoLock(ref into, null, nullValue.Value);
+            }
         }
 
         /// <summary>
@@ -757,13 +823,71 @@ namespace IronPython.Runtime {
             return _hashFunc(key) & Int32.MaxValue;
         }
 
+        /// <summary>
+        /// The sparse index array and the dense entries array.  They are held together
+        /// so that lock-free readers always see a matching pair.
+        /// </summary>
+        private sealed class Table {
+            /// <summary>
+            /// Open-addressed, power of 2 sized hash index.  0 means the slot was never used,
+            /// any other value is 1 + the index of an entry in <see cref="Entries"/>.
+            /// </summary>
+            public readonly int[] Indices;
+
+            /// <summary>
+            /// Entries in insertion order, removed entries have their key set to the removed marker.
+            /// </summary>
+            public readonly Bucket[] Entries;
+
+            /// <summary>
+            /// Number of slots in <see cref="Entries"/> which have been handed out (live and removed).
+            /// </summary>
+            public int Used;
+
+            public Table(int indexSize) {
+                Debug.Assert((indexSize & (indexSize - 1)) == 0);
+
+                Indices = new int[indexSize];
+                Entries = new Bucket[GetUsableSize(indexSize)];
+            }
+
+            private Table(int[] indices, Bucket[] entries, int used) {
+                Indices = indices;
+                Entries = entries;
+                Used = used;
+            }
+
+            /// <summary>
+            /// Number of entries a table with the given index size can hold, this keeps the
+            /// index at most 2/3 full so that there's always an unused slot to end a probe.
+            /// </summary>
+            public static int GetUsableSize(int indexSize) => (int)((long)indexSize * 2 / 3);
+
+            public Table Clone() => new Table((int[])Indices.Clone(), (Bucket[])Entries.Clone(), Used);
+
+            /// <summary>
+            /// Appends an entry whose key is known not to be in the table yet.  Used to populate
+            /// a new table before it is published.
+            /// </summary>
+            public void AddUnique(Bucket entry) {
+                int mask = Indices.Length - 1;
+                int index = entry.HashCode & mask;
+                while (Indices[index] != 0) {
+                    index = (index + 1) & mask;
+                }
+
+                Entries[Used] = entry;
+                Indices[index] = ++Used;
+            }
+        }
+
         /// <summary>
         /// Used to store a single hashed key/value.
-        /// 
+        ///
         /// Bucket is not serializable because it stores the computed hash
         /// code which could change between serialization and deserialization.
         /// </summary>
-        protected struct Bucket {
+        private struct Bucket {
             public object Key;          // the key to be hashed
             public object Value;        // the value associated with the key
             public int HashCode;        // the hash code of the contained key.
@@ -828,8 +952,16 @@ namespace IronPython.Runtime {
         private class NullValue {
             public object Value;
 
-            public NullValue(object value) {
+            /// <summary>
+            /// The index of the entry the None key was inserted before, or the number of used
+            /// entries if it was inserted after all of them.
+            /// </summary>
+            [OptionalField]
+            public int Position;
+
+            public NullValue(object value, int position = 0) {
                 Value = value;
+                Position = position;
             }
         }
 #if FEATURE_SERIALIZATION
@@ -874,7 +1006,7 @@ namespace IronPython.Runtime {
             }
 
             SerializationInfo info = bucket.SerializationInfo;
-            _buckets = null;
+            _table = null;
             _nullValue = null;
 
             var buckets = (List<KeyValuePair<object, object>>)info.GetValue("buckets", typeof(List<KeyValuePair<object, object>>));
@@ -889,8 +1021,9 @@ namespace IronPython.Runtime {
             } catch (SerializationException) {
                 // for compatibility with dictionary serialized in 2.6.
             }
-            if (nullVal != null) {
-                _nullValue = new NullValue(nullVal);
+            if (nullVal != null && _nullValue == null) {
+                // the None key is normally restored in order along with the other items
+                AddNull(nullVal.Value);
             }
         }
 
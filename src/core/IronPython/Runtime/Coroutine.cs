@@ -137,6 +137,21 @@ namespace IronPython.Runtime {
         }
 
 
+        /// <summary>
+        ///   Requests that <paramref name="ex"/> be raised at the body's current await point without waiting for the body to settle.
+        /// </summary>
+        /// <remarks>
+        ///   Used by event loops that drive the coroutine through <see cref="AsTask"/>; the outcome is observed on the Task.
+        ///   Returns false if the body has not been started or has already finished.
+        /// </remarks>
+        internal bool Cancel(Exception ex) {
+            if (_task is null || _task.IsCompleted) return false;
+            _cancellationException.Value = ex;
+            _cts.Cancel();
+            return true;
+        }
+
+
         private static object SettleCompletedTask(Task<object?> task) {
             if (task.IsCanceled) {
                 // Surfaces as Python CancelledError via the OCE -> CancelledError mapping in PythonExceptions.
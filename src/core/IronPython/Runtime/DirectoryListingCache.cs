@@ -0,0 +1,166 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#nullable enable
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+
+using Microsoft.Scripting;
+
+namespace IronPython.Runtime {
+    /// <summary>
+    /// Caches the contents of the directories probed by the importer, the equivalent of the
+    /// listing kept by CPython's FileFinder.
+    ///
+    /// Each directory is listed once and then reused until its modification time changes or
+    /// the path is added to sys.path_importer_cache again, so probing for modules and packages
+    /// and validating the case of their names becomes a hash lookup instead of a directory scan
+    /// per candidate.  Validating a listing takes a single stat of the directory, the files in
+    /// it are only probed again once it changes.
+    ///
+    /// A listing taken while the directory's modification time was still within the resolution
+    /// of the file system's timestamps is not trusted, a file created right after it would not
+    /// change the modification time.  Such listings are taken again on the next probe, so new
+    /// modules are found without calling importlib.invalidate_caches().
+    ///
+    /// Listings are only cached with the default platform adaptation layer, hosts which provide
+    /// their own file system are always queried directly.
+    /// </summary>
+    internal sealed class DirectoryListingCache {
+        private readonly PlatformAdaptationLayer/*!*/ _pal;
+        private readonly bool _enabled;
+        private readonly Dictionary<string, Listing> _listings = new Dictionary<string, Listing>(StringComparer.Ordinal);
+
+        // the coarsest timestamp resolution of the common file systems (FAT)
+        private static readonly TimeSpan _timestampResolution = TimeSpan.FromSeconds(2);
+
+        public DirectoryListingCache(PlatformAdaptationLayer/*!*/ pal) {
+            _pal = pal;
+#if FEATURE_FILESYSTEM
+            _enabled = pal.GetType() == typeof(PlatformAdaptationLayer);
+#endif
+        }
+
+        /// <summary>
+        /// Gets the full path of the file or directory with the given name in the directory, or
+        /// null if no entry of the requested kind with exactly this name exists.
+        /// </summary>
+        public string? GetFullPath(string/*!*/ dir, string/*!*/ name, bool isDir) {
+            if (!_enabled) {
+                return GetFullPathNoCache(dir, name, isDir);
+            }
+
+            Listing? listing = GetListing(dir);
+            if (listing == null || !(isDir ? listing.Directories : listing.Files).Contains(name)) {
+                return null;
+            }
+
+            return Path.Combine(listing.FullPath, name);
+        }
+
+        /// <summary>
+        /// Returns true if the directory exists, listing it so subsequent probes are served
+        /// from the cache.
+        /// </summary>
+        public bool DirectoryExists(string/*!*/ dir) {
+            if (!_enabled) {
+                return _pal.DirectoryExists(dir);
+            }
+
+            return GetListing(dir) != null;
+        }
+
+        /// <summary>
+        /// Drops the listing of the given directory.
+        /// </summary>
+        public void Invalidate(string/*!*/ dir) {
+            lock (_listings) {
+                _listings.Remove(dir);
+            }
+        }
+
+        private string? GetFullPathNoCache(string dir, string name, bool isDir) {
+            if (!_pal.DirectoryExists(dir)) {
+                return null;
+            }
+
+            try {
+                string[] files = _pal.GetFileSystemEntries(dir, name, !isDir, isDir);
+
+                if (files.Length != 1 || _pal.GetFileName(files[0]) != name) {
+                    return null;
+                }
+
+                return _pal.GetFullPath(files[0]);
+            } catch (IOException) {
+                return null;
+            }
+        }
+
+        private Listing? GetListing(string dir) {
+            DateTime lastWrite;
+            try {
+                // DirectoryInfo reads the attributes once for both Exists and LastWriteTimeUtc
+                var info = new DirectoryInfo(dir);
+                if (!info.Exists) {
+                    Invalidate(dir);
+                    return null;
+                }
+                lastWrite = info.LastWriteTimeUtc;
+            } catch (Exception e) when (e is IOException || e is UnauthorizedAccessException || e is ArgumentException || e is NotSupportedException) {
+                return null;
+            }
+
+            Listing? listing;
+            lock (_listings) {
+                if (_listings.TryGetValue(dir, out listing) && listing.LastWriteTimeUtc == lastWrite && !listing.IsRacy) {
+                    return listing;
+                }
+            }
+
+            try {
+                listing = new Listing(
+                    Path.GetFullPath(dir),
+                    lastWrite,
+                    lastWrite > DateTime.UtcNow - _timestampResolution,
+                    GetNames(Directory.GetFiles(dir)),
+                    GetNames(Directory.GetDirectories(dir))
+                );
+            } catch (Exception e) when (e is IOException || e is UnauthorizedAccessException) {
+                return null;
+            }
+
+            lock (_listings) {
+                _listings[dir] = listing;
+            }
+            return listing;
+        }
+
+        private static HashSet<string> GetNames(string[] paths) {
+            var res = new HashSet<string>(StringComparer.Ordinal);
+            foreach (string path in paths) {
+                res.Add(Path.GetFileName(path));
+            }
+            return res;
+        }
+
+        private sealed class Listing {
+            public readonly string FullPath;
+            public readonly DateTime LastWriteTimeUtc;
+            public readonly bool IsRacy;
+            public readonly HashSet<string> Files;
+            public readonly HashSet<string> Directories;
+
+            public Listing(string fullPath, DateTime lastWriteTimeUtc, bool isRacy, HashSet<string> files, HashSet<string> directories) {
+                FullPath = fullPath;
+                LastWriteTimeUtc = lastWriteTimeUtc;
+                IsRacy = isRacy;
+                Files = files;
+                Directories = directories;
+            }
+        }
+    }
+}
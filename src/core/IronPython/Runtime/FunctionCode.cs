@@ -38,6 +38,12 @@ namespace IronPython.Runtime {
         private bool _compilingLight;                               // true if we're compiling for light exceptions
         private int _exceptionCount;
 
+        // compilation data, see CompileLambda and clr.GetCompilationData
+        private LightLambdaExpression _interpretedCode;             // the code being interpreted until it's compiled
+        private long _interpretedSince;                             // when the interpreted delegate was created, in Stopwatch ticks
+        private long _interpretedTime;                              // how long the code ran interpreted, in Stopwatch ticks
+        private bool _compiled;                                     // true once the compiled delegate of interpreted code is installed
+
         // debugging/tracing support
         private LambdaExpression _tracingLambda;                    // the transformed lambda used for tracing/debugging
         internal Delegate _tracingDelegate;                         // the delegate used for tracing/debugging, if one has been created.  This can be interpreted or compiled.
@@ -68,7 +74,7 @@ namespace IronPython.Runtime {
 
             // need to take this lock to ensure sys.settrace/sys.setprofile is not actively changing
             lock (_CodeCreateAndUpdateDelegateLock) {
-                SetTarget(AddRecursionCheck(context, code));
+                SetTarget(AddCallWrappers(context, code));
             }
 
             RegisterFunctionCode(context);
@@ -200,7 +206,8 @@ namespace IronPython.Runtime {
                                     .Compile();
 
                                 lock (pyCtx._codeUpdateLock) {
-                                    if (context.LanguageContext.EnableTracing == enableTracing) {
+                                    // the light throwing target bypasses the profiling wrapper
+                                    if (context.LanguageContext.EnableTracing == enableTracing && !pyCtx.EnableProfiling) {
                                         LightThrowTarget = target;
                                     }
                                 }
@@ -260,6 +267,14 @@ namespace IronPython.Runtime {
             }
         }
 
+        internal static List<FunctionCode> GetAllFunctionCode(PythonContext context) {
+            var res = new List<FunctionCode>();
+            foreach (FunctionCode fc in GetAllCode(context)) {
+                if (fc.IsFunction) res.Add(fc);
+            }
+            return res;
+        }
+
         internal static void UpdateAllCode(PythonContext context) {
             foreach (FunctionCode fc in GetAllCode(context)) {
                 fc.UpdateDelegate(context, false);
@@ -592,12 +607,18 @@ namespace IronPython.Runtime {
                 return classTarget(context);
             }
 
-            if (Target is LookupCompilationDelegate moduleCode) {
-                return moduleCode(context, this);
-            }
-
-            if (Target is Func<FunctionCode, object> optimizedModuleCode) {
-                return optimizedModuleCode(this);
+            Delegate target = Target;
+            if (target is LookupCompilationDelegate || target is Func<FunctionCode, object>) {
+                PythonContext pc = context.LanguageContext;
+                pc.ProfileHook?.OnModuleEnter(this);
+                try {
+                    if (target is LookupCompilationDelegate moduleCode) {
+                        return moduleCode(context, this);
+                    }
+                    return ((Func<FunctionCode, object>)target)(this);
+                } finally {
+                    pc.ProfileHook?.OnModuleExit(this);
+                }
             }
 
             var func = new PythonFunction(context, this, null, [], null, null, new MutableTuple<object>());
@@ -718,7 +739,7 @@ namespace IronPython.Runtime {
                 finalTarget = _normalDelegate;
             }
 
-            finalTarget = AddRecursionCheck(context, finalTarget);
+            finalTarget = AddCallWrappers(context, finalTarget);
 
             SetTarget(finalTarget);
         }
@@ -730,7 +751,7 @@ namespace IronPython.Runtime {
         internal void SetDebugTarget(PythonContext context, Delegate target) {
             _normalDelegate = target;
 
-            SetTarget(AddRecursionCheck(context, target));
+            SetTarget(AddCallWrappers(context, target));
         }
 
         /// <summary>
@@ -823,6 +844,11 @@ namespace IronPython.Runtime {
                 // through the interpreter stub every call.
                 if (result.Target is LightLambda lightLambda) {
                     lightLambda.Compile += handler;
+
+                    // the interpreter compiles hot code on a background thread, clr.CompileFunction can
+                    // compile it earlier
+                    _interpretedCode = code;
+                    _interpretedSince = Stopwatch.GetTimestamp();
                 }
 
                 return result;
@@ -929,6 +955,176 @@ namespace IronPython.Runtime {
             return finalTarget;
         }
 
+        /// <summary>
+        /// Wraps the target so that function entry and exit are reported to the profile hook of the
+        /// calling thread, see <see cref="PythonContext.SetProfileHook"/>.
+        /// </summary>
+        internal Delegate AddProfileHook(PythonContext context, Delegate finalTarget) {
+            if (context.EnableProfiling) {
+                if (finalTarget is Func<CodeContext, CodeContext> ||
+                    finalTarget is Func<FunctionCode, object> ||
+                    finalTarget is LookupCompilationDelegate) {
+                    // class bodies and modules are not function calls
+                    return finalTarget;
+                }
+
+                switch (_lambda.ParameterNames.Length) {
+                    #region Generated Python Profile Delegate Switch
+
+                    // *** BEGIN GENERATED CODE ***
+                    // generated by function: gen_profile_delegate_switch from: generate_calls.py
+
+                    case 0:
+                        finalTarget = new Func<PythonFunction, object>(new PythonFunctionProfile0((Func<PythonFunction, object>)finalTarget).CallTarget);
+                        break;
+                    case 1:
+                        finalTarget = new Func<PythonFunction, object, object>(new PythonFunctionProfile1((Func<PythonFunction, object, object>)finalTarget).CallTarget);
+                        break;
+                    case 2:
+                        finalTarget = new Func<PythonFunction, object, object, object>(new PythonFunctionProfile2((Func<PythonFunction, object, object, object>)finalTarget).CallTarget);
+                        break;
+                    case 3:
+                        finalTarget = new Func<PythonFunction, object, object, object, object>(new PythonFunctionProfile3((Func<PythonFunction, object, object, object, object>)finalTarget).CallTarget);
+                        break;
+                    case 4:
+                        finalTarget = new Func<PythonFunction, object, object, object, object, object>(new PythonFunctionProfile4((Func<PythonFunction, object, object, object, object, object>)finalTarget).CallTarget);
+                        break;
+                    case 5:
+                        finalTarget = new Func<PythonFunction, object, object, object, object, object, object>(new PythonFunctionProfile5((Func<PythonFunction, object, object, object, object, object, object>)finalTarget).CallTarget);
+                        break;
+                    case 6:
+                        finalTarget = new Func<PythonFunction, object, object, object, object, object, object, object>(new PythonFunctionProfile6((Func<PythonFunction, object, object, object, object, object, object, object>)finalTarget).CallTarget);
+                        break;
+                    case 7:
+                        finalTarget = new Func<PythonFunction, object, object, object, object, object, object, object, object>(new PythonFunctionProfile7((Func<PythonFunction, object, object, object, object, object, object, object, object>)finalTarget).CallTarget);
+                        break;
+                    case 8:
+                        finalTarget = new Func<PythonFunction, object, object, object, object, object, object, object, object, object>(new PythonFunctionProfile8((Func<PythonFunction, object, object, object, object, object, object, object, object, object>)finalTarget).CallTarget);
+                        break;
+                    case 9:
+                        finalTarget = new Func<PythonFunction, object, object, object, object, object, object, object, object, object, object>(new PythonFunctionProfile9((Func<PythonFunction, object, object, object, object, object, object, object, object, object, object>)finalTarget).CallTarget);
+                        break;
+                    case 10:
+                        finalTarget = new Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object>(new PythonFunctionProfile10((Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object>)finalTarget).CallTarget);
+                        break;
+                    case 11:
+                        finalTarget = new Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object>(new PythonFunctionProfile11((Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object>)finalTarget).CallTarget);
+                        break;
+                    case 12:
+                        finalTarget = new Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object>(new PythonFunctionProfile12((Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object>)finalTarget).CallTarget);
+                        break;
+                    case 13:
+                        finalTarget = new Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object, object>(new PythonFunctionProfile13((Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object, object>)finalTarget).CallTarget);
+                        break;
+                    case 14:
+                        finalTarget = new Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object, object, object>(new PythonFunctionProfile14((Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object, object, object>)finalTarget).CallTarget);
+                        break;
+                    case 15:
+                        finalTarget = new Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object, object, object, object>(new PythonFunctionProfile15((Func<PythonFunction, object, object, object, object, object, object, object, object, object, object, object, object, object, object, object, object>)finalTarget).CallTarget);
+                        break;
+
+                    // *** END GENERATED CODE ***
+
+                    #endregion
+                    default:
+                        finalTarget = new Func<PythonFunction, object[], object>(new PythonFunctionProfileN((Func<PythonFunction, object[], object>)finalTarget).CallTarget);
+                        break;
+                }
+            }
+            return finalTarget;
+        }
+
+        /// <summary>
+        /// Swaps in the compiled target of interpreted code.  A light throwing target which LightThrowCompile has
+        /// already installed is kept, it was compiled from the same code.  Otherwise it's replaced as well and a
+        /// light throwing compilation in progress installs its target once it's done.
+        /// </summary>
+        private void SetCompiledTarget(Delegate target) {
+            if ((object)LightThrowTarget == (object)Target) {
+                SetTarget(target);
+            } else {
+                Target = target;
+            }
+        }
+
+        /// <summary>
+        /// Installs the compiled delegate of interpreted code, from the interpreter's Compile event or from
+        /// clr.CompileFunction.  Whichever is ready first is kept.
+        /// </summary>
+        private void SetCompiledDelegate(PythonContext context, Delegate compiled) {
+            lock (context._codeUpdateLock) {
+                if (_compiled) return;
+
+                _interpretedCode = null;
+                _interpretedTime = Stopwatch.GetTimestamp() - _interpretedSince;
+                _normalDelegate = compiled;
+                if (!context.EnableTracing) {
+                    SetCompiledTarget(AddCallWrappers(context, compiled));
+                }
+                Volatile.Write(ref _compiled, true);
+            }
+        }
+
+        /// <summary>
+        /// Compiles the function now if it's interpreted rather than once the interpreter finds it hot.
+        /// </summary>
+        internal void EnsureCompiled(PythonContext context) {
+            if (_normalDelegate == null) {
+                lock (_CodeCreateAndUpdateDelegateLock) {
+                    if (_normalDelegate == null && !context.EnableTracing) {
+                        UpdateDelegate(context, true);
+                    }
+                }
+            }
+
+            LightLambdaExpression code = _interpretedCode;
+            if (code == null) return;
+
+            Delegate compiled;
+            try {
+                compiled = code.Compile();
+            } catch (Exception) {
+                // the interpreted delegate keeps working and the interpreter may still compile it
+                return;
+            }
+            SetCompiledDelegate(context, compiled);
+        }
+
+        /// <summary>
+        /// True for the functions clr.GetCompilationData reports.
+        /// </summary>
+        internal bool IsFunction => _lambda is Compiler.Ast.FunctionDefinition;
+
+        /// <summary>
+        /// True if no delegate has been created for the code yet, i.e. it has never run.
+        /// </summary>
+        internal bool IsUnused => _normalDelegate == null && _tracingDelegate == null;
+
+        /// <summary>
+        /// "interpreted" or "compiled".
+        /// </summary>
+        internal string Tier
+            => (_lambda != null && !_lambda.ShouldInterpret) || Volatile.Read(ref _compiled) ? "compiled" : "interpreted";
+
+        /// <summary>
+        /// The seconds the code ran interpreted before it was compiled, or so far if it's still interpreted.
+        /// 0.0 if it never ran interpreted.
+        /// </summary>
+        internal double InterpretedTime {
+            get {
+                long since = Interlocked.Read(ref _interpretedSince);
+                if (since == 0) return 0.0;
+                long ticks = Volatile.Read(ref _compiled) ? Interlocked.Read(ref _interpretedTime) : Stopwatch.GetTimestamp() - since;
+                return (double)ticks / Stopwatch.Frequency;
+            }
+        }
+
+        /// <summary>
+        /// Adds the recursion enforcement and profiling wrappers the current Python context settings call for.
+        /// </summary>
+        private Delegate AddCallWrappers(PythonContext context, Delegate finalTarget)
+            => AddProfileHook(context, AddRecursionCheck(context, finalTarget));
+
         private class TargetUpdaterForCompilation {
             private readonly PythonContext _context;
             private readonly FunctionCode _code;
@@ -939,11 +1135,11 @@ namespace IronPython.Runtime {
             }
 
             public void SetCompiledTarget(object sender, LightLambdaCompileEventArgs e) {
-                _code.SetTarget(_code.AddRecursionCheck(_context, _code._normalDelegate = e.Compiled));
+                _code.SetCompiledDelegate(_context, e.Compiled);
             }
 
             public void SetCompiledTargetTracing(object sender, LightLambdaCompileEventArgs e) {
-                _code.SetTarget(_code.AddRecursionCheck(_context, _code._tracingDelegate = e.Compiled));
+                _code.SetTarget(_code.AddCallWrappers(_context, _code._tracingDelegate = e.Compiled));
             }
         }
 
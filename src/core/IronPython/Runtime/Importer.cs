@@ -866,7 +866,10 @@ namespace IronPython.Runtime {
                 }
             }
 
-            if (!context.LanguageContext.DomainManager.Platform.DirectoryExists(dirname)) {
+            // the path is being (re)added to sys.path_importer_cache, start with a fresh listing
+            DirectoryListingCache listings = context.LanguageContext.DirectoryListings;
+            listings.Invalidate(dirname);
+            if (!listings.DirectoryExists(dirname)) {
                 return new PythonImport.NullImporter(dirname);
             }
 
@@ -884,45 +887,36 @@ namespace IronPython.Runtime {
             }
 
             SourceUnit sourceUnit = pc.CreateFileUnit(fullPath, pc.DefaultEncoding, SourceCodeKind.File);
+#if FEATURE_ASSEMBLYBUILDER_SAVE && FEATURE_FILESYSTEM
+            PythonModule cached = pc.GetModuleCache()?.TryLoadModule(context, name, sourceUnit);
+            if (cached != null) {
+                return cached;
+            }
+#endif
             return LoadFromSourceUnit(context, sourceUnit, name, sourceUnit.Path);
         }
 
-        private static string GetFullPathAndValidateCase(LanguageContext/*!*/ context, string path, bool isDir) {
+        private static string GetFullPathAndValidateCase(PythonContext/*!*/ context, string path, bool isDir) {
 
             // Check for a match in the case of the filename.
             PlatformAdaptationLayer pal = context.DomainManager.Platform;
-            string dir = pal.GetDirectoryName(path);
-            if (!pal.DirectoryExists(dir)) {
-                return null;
-            }
-
-            try {
-                string file = pal.GetFileName(path);
-                string[] files = pal.GetFileSystemEntries(dir, file, !isDir, isDir);
-
-                if (files.Length != 1 || pal.GetFileName(files[0]) != file) {
-                    return null;
-                }
-
-                return pal.GetFullPath(files[0]);
-            } catch (IOException) {
-                return null;
-            }
+            return context.DirectoryListings.GetFullPath(pal.GetDirectoryName(path), pal.GetFileName(path), isDir);
         }
 
         internal static PythonModule LoadPackageFromSource(CodeContext/*!*/ context, string/*!*/ name, string/*!*/ path) {
             Assert.NotNull(context, name, path);
 
-            path = GetFullPathAndValidateCase(context.LanguageContext, path, true);
+            PythonContext pc = context.LanguageContext;
+            path = GetFullPathAndValidateCase(pc, path, true);
             if (path == null) {
                 return null;
             }
 
-            if(context.LanguageContext.DomainManager.Platform.DirectoryExists(path) && !context.LanguageContext.DomainManager.Platform.FileExists(context.LanguageContext.DomainManager.Platform.CombinePaths(path, "__init__.py"))) {
+            if (pc.DirectoryListings.GetFullPath(path, "__init__.py", false) == null) {
                 PythonOps.Warn(context, PythonExceptions.ImportWarning, "Not importing directory '{0}': missing __init__.py", path);
             }
 
-            return LoadModuleFromSource(context, name, context.LanguageContext.DomainManager.Platform.CombinePaths(path, "__init__.py"));
+            return LoadModuleFromSource(context, name, pc.DomainManager.Platform.CombinePaths(path, "__init__.py"));
         }
 
         private static PythonModule/*!*/ LoadFromSourceUnit(CodeContext/*!*/ context, SourceUnit/*!*/ sourceCode, string/*!*/ name, string/*!*/ path) {
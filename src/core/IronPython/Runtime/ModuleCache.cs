@@ -0,0 +1,228 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#if FEATURE_ASSEMBLYBUILDER_SAVE && FEATURE_FILESYSTEM
+
+#nullable enable
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Reflection;
+using System.Security.Cryptography;
+using System.Text;
+
+using Microsoft.Scripting;
+using Microsoft.Scripting.Generation;
+using Microsoft.Scripting.Runtime;
+
+using IronPython.Compiler;
+using IronPython.Runtime.Operations;
+
+namespace IronPython.Runtime {
+    /// <summary>
+    /// Persistent on-disk cache of compiled modules, IronPython's equivalent of __pycache__.
+    ///
+    /// Modules are compiled with the same pipeline as clr.CompileModules and the resulting
+    /// assembly is stored along with the source path, modification time and size, and a key
+    /// identifying the runtime and the code generation options.  An entry is only reused if
+    /// all of these still match, otherwise the module is recompiled and the entry replaced.
+    ///
+    /// Entries are saved assemblies, so the cache is only available on .NET Framework.
+    /// </summary>
+    internal sealed class ModuleCache {
+        private const string CacheDirectoryName = "__pycache__";
+        private const string CacheFileExtension = ".ipyc";
+        private const int Magic = 0x43595049; // "IPYC"
+        private const int FormatVersion = 1;
+
+        private readonly PythonContext/*!*/ _context;
+        private readonly string? _directory;
+        private readonly string/*!*/ _cacheTag;
+        private readonly string/*!*/ _buildKey;
+
+        /// <param name="context">The owning context.</param>
+        /// <param name="directory">
+        /// The directory holding the cache for all modules, or an empty string to store the
+        /// entries in a __pycache__ directory next to each source file.
+        /// </param>
+        public ModuleCache(PythonContext/*!*/ context, string/*!*/ directory) {
+            _context = context;
+            _directory = directory.Length == 0 ? null : Path.GetFullPath(directory);
+            _cacheTag = $"ironpython-{VersionInfo.Instance.major}{VersionInfo.Instance.minor}";
+            _buildKey = GetBuildKey(context.PythonOptions);
+        }
+
+        /// <summary>
+        /// Imports the module from the cache, compiling and caching it first if there is no up to
+        /// date entry.  Returns null if the module could neither be loaded from nor added to the
+        /// cache, in which case the caller should compile it from source as usual.
+        /// </summary>
+        public PythonModule? TryLoadModule(CodeContext/*!*/ context, string/*!*/ name, SourceUnit/*!*/ sourceUnit) {
+            string sourcePath = sourceUnit.Path;
+            FileInfo source = new FileInfo(sourcePath);
+            string cachePath = GetCachePath(sourcePath);
+
+            OnDiskScriptCode? code = null;
+            if (File.Exists(cachePath)) {
+                code = ReadEntry(cachePath, sourcePath, source);
+                if (code != null) {
+                    Trace(context, $"# code object from '{cachePath}'");
+                } else {
+                    Trace(context, $"# bytecode is stale for '{name}'");
+                }
+            }
+
+            code ??= WriteEntry(context, name, sourceUnit, source, cachePath);
+
+            if (code == null) {
+                return null;
+            }
+
+            CodeContext newContext = code.CreateContext();
+            newContext.ModuleContext.InitializeBuiltins(false);
+            return _context.InitializeModule(sourcePath, newContext.ModuleContext, code, ModuleOptions.Initialize);
+        }
+
+        /// <summary>
+        /// Gets the path of the cache entry for the given source file.
+        /// </summary>
+        internal string GetCachePath(string/*!*/ sourcePath) {
+            string fileName = Path.GetFileNameWithoutExtension(sourcePath) + "." + _cacheTag;
+            if (_directory == null) {
+                return Path.Combine(Path.GetDirectoryName(sourcePath) ?? string.Empty, CacheDirectoryName, fileName + CacheFileExtension);
+            }
+
+            // a shared cache directory, disambiguate modules with the same name by their full path
+            return Path.Combine(_directory, fileName + "-" + GetHash(sourcePath) + CacheFileExtension);
+        }
+
+        private OnDiskScriptCode? ReadEntry(string cachePath, string sourcePath, FileInfo source) {
+            byte[] image;
+            try {
+                using var reader = new BinaryReader(File.OpenRead(cachePath), Encoding.UTF8);
+                if (reader.ReadInt32() != Magic ||
+                    reader.ReadInt32() != FormatVersion ||
+                    reader.ReadString() != _buildKey ||
+                    reader.ReadString() != sourcePath ||
+                    reader.ReadInt64() != source.LastWriteTimeUtc.Ticks ||
+                    reader.ReadInt64() != source.Length) {
+                    return null;
+                }
+
+                int length = reader.ReadInt32();
+                image = reader.ReadBytes(length);
+                if (image.Length != length) {
+                    return null;
+                }
+            } catch (IOException) {
+                return null;
+            } catch (UnauthorizedAccessException) {
+                return null;
+            }
+
+            return LoadCode(image);
+        }
+
+        private OnDiskScriptCode? LoadCode(byte[] image) {
+            Assembly assembly;
+            try {
+                assembly = Assembly.Load(image);
+            } catch (BadImageFormatException) {
+                return null;
+            }
+
+            foreach (ScriptCode sc in SavableScriptCode.LoadFromAssembly(_context.DomainManager, assembly)) {
+                if (sc is OnDiskScriptCode onDiskCode) {
+                    return onDiskCode;
+                }
+            }
+            return null;
+        }
+
+        private OnDiskScriptCode? WriteEntry(CodeContext/*!*/ context, string name, SourceUnit sourceUnit, FileInfo source, string cachePath) {
+            // capture the source stamp before compiling so a concurrent edit makes the entry stale
+            long lastWrite = source.LastWriteTimeUtc.Ticks;
+            long length = source.Length;
+
+            var code = (SavableScriptCode)_context.GetScriptCode(sourceUnit, name, ModuleOptions.Initialize, Compiler.CompilationMode.ToDisk);
+
+            string tempDir = Path.Combine(Path.GetTempPath(), Path.GetRandomFileName());
+            byte[] image;
+            try {
+                Directory.CreateDirectory(tempDir);
+                string assemblyPath = Path.Combine(tempDir, name + "." + _cacheTag + ".dll");
+                SavableScriptCode.SaveToAssembly(assemblyPath, new Dictionary<string, object>(), code);
+                image = File.ReadAllBytes(assemblyPath);
+
+                Directory.CreateDirectory(Path.GetDirectoryName(cachePath)!);
+                string tempPath = cachePath + "." + Path.GetRandomFileName();
+                using (var writer = new BinaryWriter(File.Create(tempPath), Encoding.UTF8)) {
+                    writer.Write(Magic);
+                    writer.Write(FormatVersion);
+                    writer.Write(_buildKey);
+                    writer.Write(sourceUnit.Path);
+                    writer.Write(lastWrite);
+                    writer.Write(length);
+                    writer.Write(image.Length);
+                    writer.Write(image);
+                }
+
+                if (File.Exists(cachePath)) {
+                    File.Delete(cachePath);
+                }
+                File.Move(tempPath, cachePath);
+                Trace(context, $"# wrote '{cachePath}'");
+            } catch (Exception e) when (e is IOException || e is UnauthorizedAccessException || e is NotSupportedException) {
+                Trace(context, $"# could not create '{cachePath}': {e.Message}");
+                return null;
+            } finally {
+                try {
+                    Directory.Delete(tempDir, recursive: true);
+                } catch (IOException) {
+                } catch (UnauthorizedAccessException) {
+                }
+            }
+
+            return LoadCode(image);
+        }
+
+        private void Trace(CodeContext/*!*/ context, string message) {
+            if (_context.PythonOptions.Verbose) {
+                PythonOps.PrintWithDest(context, _context.SystemStandardError, message);
+            }
+        }
+
+        /// <summary>
+        /// Identifies the runtime and the options which influence the generated code, entries
+        /// compiled with a different key are never reused.
+        /// </summary>
+        private static string GetBuildKey(PythonOptions options) {
+            var key = new StringBuilder();
+            foreach (Assembly assembly in new[] { typeof(PythonContext).Assembly, typeof(ScriptCode).Assembly }) {
+                key.Append(assembly.FullName).Append(';').Append(assembly.ManifestModule.ModuleVersionId).Append(';');
+            }
+            key.Append(options.Optimize ? 'O' : '-');
+            key.Append(options.StripDocStrings ? 'S' : '-');
+            key.Append(options.Debug ? 'D' : '-');
+            key.Append(options.Frames ? 'F' : '-');
+            key.Append(options.FullFrames ? 'A' : '-');
+            key.Append(options.Tracing ? 'T' : '-');
+            key.Append(options.LightweightScopes ? 'L' : '-');
+            return key.ToString();
+        }
+
+        private static string GetHash(string path) {
+            using var sha = SHA256.Create();
+            byte[] hash = sha.ComputeHash(Encoding.UTF8.GetBytes(path));
+            var res = new StringBuilder(16);
+            for (int i = 0; i < 8; i++) {
+                res.Append(hash[i].ToString("x2"));
+            }
+            return res.ToString();
+        }
+    }
+}
+
+#endif
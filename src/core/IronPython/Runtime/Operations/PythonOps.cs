@@ -3412,6 +3412,18 @@ namespace IronPython.Runtime.Operations {
             PythonFunction.AddRecursionDepth(-1);
         }
 
+        public static bool IsProfilingBuiltins(PythonContext context) {
+            return context.EnableBuiltinProfiling;
+        }
+
+        public static void ProfileBuiltinCall(PythonContext context, BuiltinFunction function) {
+            context.ProfileHook?.OnBuiltinCall(function);
+        }
+
+        public static void ProfileBuiltinReturn(PythonContext context, BuiltinFunction function, bool exception) {
+            context.ProfileHook?.OnBuiltinReturn(function, exception);
+        }
+
         #endregion
 
         /// <summary>
@@ -1911,6 +1911,35 @@ namespace IronPython.Runtime.Operations {
             return decoded;
         }
 
+        /// <summary>
+        /// Gets the number of bytes which can be decoded as UTF-8 now, excluding an incomplete but
+        /// valid sequence at the end of the input unless this is the final chunk.
+        /// </summary>
+        internal static int NumEligibleUtf8Bytes(ReadOnlySpan<byte> input, bool final) {
+            int numBytes = input.Length;
+            if (!final) {
+                // scan for incomplete but valid sequence at the end
+                for (int i = 1; i < 4; i++) { // 4 is the max length of a valid sequence
+                    int pos = numBytes - i;
+                    if (pos < 0) break;
+
+                    byte b = input[pos];
+                    if ((b & 0b10000000) == 0) return numBytes; // ASCII
+                    if ((b & 0b11000000) == 0b11000000) { // start byte
+                        if ((b | 0b00011111) == 0b11011111 && i < 2) return pos; // 2-byte seq start
+                        if ((b | 0b00001111) == 0b11101111 && i < 3) return pos; // 3-byte seq start
+                        if ((b | 0b00000111) == 0b11110111) { // 4-byte seq start
+                            if (b < 0b11110100) return pos; // chars up to U+FFFFF
+                            if ((b == 0b11110100) && (i == 1 || input[numBytes - i + 1] < 0x90)) return pos; // U+100000 to U+10FFFF
+                        }
+                        return numBytes; // invalid sequence or valid but complete
+                    }
+                    // else continuation byte (0b10xxxxxx) hence continue scanning
+                }
+            }
+            return numBytes;
+        }
+
         /// <summary>
         /// Gets the starting offset checking to see if the incoming bytes already include a preamble.
         /// </summary>
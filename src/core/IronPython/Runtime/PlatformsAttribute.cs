@@ -30,7 +30,7 @@ namespace IronPython.Runtime {
 
         public bool IsPlatformValid => ValidPlatforms.Length == 0 || Array.IndexOf(ValidPlatforms, ActualPlatform) >= 0;
 
-        private static PlatformID ActualPlatform
+        internal static PlatformID ActualPlatform
             => RuntimeInformation.IsOSPlatform(OSPlatform.Linux) ? PlatformID.Unix :
                RuntimeInformation.IsOSPlatform(OSPlatform.OSX) ? PlatformID.MacOSX :
                Environment.OSVersion.Platform;
@@ -0,0 +1,113 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#nullable enable
+
+using System.Collections.Generic;
+
+using IronPython.Runtime.Exceptions;
+using IronPython.Runtime.Operations;
+using IronPython.Runtime.Types;
+
+namespace IronPython.Runtime {
+    /// <summary>
+    /// Receives the calls made on a thread while it is installed with <see cref="PythonContext.SetProfileHook"/>.
+    ///
+    /// Python functions report their calls from wrappers around their targets (see <see cref="FunctionCode.AddProfileHook"/>),
+    /// builtin functions from the call sites bound while profiling is enabled.
+    /// </summary>
+    internal abstract class ProfileHook {
+        /// <summary>
+        /// Called when a Python function is entered.
+        /// </summary>
+        public abstract void OnCall(PythonFunction function);
+
+        /// <summary>
+        /// Called when a Python function returns; <paramref name="result"/> is null if it raised an exception.
+        /// </summary>
+        public abstract void OnReturn(PythonFunction function, object? result);
+
+        /// <summary>
+        /// Called before a builtin function is invoked.
+        /// </summary>
+        public abstract void OnBuiltinCall(BuiltinFunction function);
+
+        /// <summary>
+        /// Called after a builtin function has returned or raised an exception.
+        /// </summary>
+        public abstract void OnBuiltinReturn(BuiltinFunction function, bool exception);
+
+        /// <summary>
+        /// Called when the code of a module, or of exec and eval, starts running.
+        /// </summary>
+        public virtual void OnModuleEnter(FunctionCode code) { }
+
+        /// <summary>
+        /// Called when the code of a module, or of exec and eval, has finished running.
+        /// </summary>
+        public virtual void OnModuleExit(FunctionCode code) { }
+    }
+
+    /// <summary>
+    /// The profile hook installed by sys.setprofile: calls the profile function with a frame, the event name and an argument.
+    /// </summary>
+    internal sealed class ProfileFunctionHook : ProfileHook {
+        private readonly PythonContext _context;
+        private readonly List<TraceBackFrame> _frames = new List<TraceBackFrame>();
+        private bool _inProfileFunction;
+
+        public ProfileFunctionHook(PythonContext context, object function) {
+            _context = context;
+            Function = function;
+        }
+
+        /// <summary>
+        /// The profile function, as returned by sys.getprofile.
+        /// </summary>
+        public object Function { get; }
+
+        public override void OnCall(PythonFunction function) {
+            var frame = new TraceBackFrame(function.Context, function.Context.GlobalDict, null, function.__code__, CurrentFrame);
+            _frames.Add(frame);
+            Dispatch(frame, "call", null);
+        }
+
+        public override void OnReturn(PythonFunction function, object? result) {
+            TraceBackFrame frame;
+            int top = _frames.Count - 1;
+            if (top >= 0 && _frames[top].f_code == function.__code__) {
+                frame = _frames[top];
+                _frames.RemoveAt(top);
+            } else {
+                // the call happened before the profile function was installed
+                frame = new TraceBackFrame(function.Context, function.Context.GlobalDict, null, function.__code__, CurrentFrame);
+            }
+            Dispatch(frame, "return", result);
+        }
+
+        public override void OnBuiltinCall(BuiltinFunction function)
+            => Dispatch(CurrentFrame, "c_call", function);
+
+        public override void OnBuiltinReturn(BuiltinFunction function, bool exception)
+            => Dispatch(CurrentFrame, exception ? "c_exception" : "c_return", function);
+
+        private TraceBackFrame? CurrentFrame => _frames.Count == 0 ? null : _frames[_frames.Count - 1];
+
+        private void Dispatch(TraceBackFrame? frame, string profileEvent, object? arg) {
+            // calls made by the profile function itself are not reported
+            if (_inProfileFunction) return;
+
+            _inProfileFunction = true;
+            try {
+                PythonCalls.Call(Function, frame, profileEvent, arg);
+            } catch {
+                // like CPython, a profile function that raises is removed
+                _context.SetProfileHook(null);
+                throw;
+            } finally {
+                _inProfileFunction = false;
+            }
+        }
+    }
+}
@@ -103,6 +103,13 @@ namespace IronPython.Runtime {
         private CallSite<Func<CallSite, CodeContext, object, object, object>> _propGetSite, _propDelSite;
         private CallSite<Func<CallSite, CodeContext, object, object, object, object>> _propSetSite;
         private CompiledLoader _compiledLoader;
+#if FEATURE_ASSEMBLYBUILDER_SAVE && FEATURE_FILESYSTEM
+        private readonly ModuleCache _moduleCache;
+#endif
+#if FEATURE_FILESYSTEM
+        private StartupSnapshot _startupSnapshot;
+#endif
+        private readonly DirectoryListingCache _directoryListings;
         private bool _importWarningThrows;
         private bool _importedEncodings;
         private Action<Action> _commandDispatcher; // can be null
@@ -146,6 +153,19 @@ namespace IronPython.Runtime {
         private readonly Microsoft.Scripting.Utils.ThreadLocal<PythonTracebackListener> _tracebackListeners = new Microsoft.Scripting.Utils.ThreadLocal<PythonTracebackListener>();
         private int _tracebackListenersCount;
 
+        // profiling support, see sys.setprofile and the _lsprof module
+        private readonly Microsoft.Scripting.Utils.ThreadLocal<ProfileHook> _profileHooks = new Microsoft.Scripting.Utils.ThreadLocal<ProfileHook>();
+        private volatile int _profileHooksCount;
+        private int _threadProfileHooksCount; // the threads with a hook of their own
+        private SamplingProfiler _sampler, _runningSampler;
+
+        // startup timing, see PythonOptions.StartupTiming
+        private readonly Stopwatch _startupTimer;
+        private List<KeyValuePair<string, TimeSpan>> _startupPhases;
+        private int _startupFinished;
+        // the module and script code running on each thread until the startup has finished, see ExitScriptCode
+        private readonly System.Threading.ThreadLocal<int> _scriptCodeDepth = new System.Threading.ThreadLocal<int>();
+
         internal FunctionCode.CodeList _allCodes;
         internal readonly object _codeCleanupLock = new object();
         internal readonly object _codeUpdateLock = new object();
@@ -167,7 +187,18 @@ namespace IronPython.Runtime {
         public PythonContext(ScriptDomainManager/*!*/ manager, IDictionary<string, object> options)
             : base(manager) {
             PythonOptions = new PythonOptions(options);
+            if (PythonOptions.StartupTiming) {
+                _startupTimer = Stopwatch.StartNew();
+                _startupPhases = new List<KeyValuePair<string, TimeSpan>>();
+            }
+
             BuiltinModules = CreateBuiltinTable();
+            _directoryListings = new DirectoryListingCache(manager.Platform);
+#if FEATURE_ASSEMBLYBUILDER_SAVE && FEATURE_FILESYSTEM
+            if (PythonOptions.ModuleCache != null) {
+                _moduleCache = new ModuleCache(this, PythonOptions.ModuleCache);
+            }
+#endif
 
             PythonDictionary defaultScope = new PythonDictionary();
             ModuleContext modContext = new ModuleContext(defaultScope, this);
@@ -192,6 +223,7 @@ namespace IronPython.Runtime {
 
             InitializeBuiltins();
             InitializeSystemState();
+            MarkStartupPhase("builtins and sys");
 
             // sys.argv always includes at least one empty string.
             SetSystemStateValue("argv", (PythonOptions.Arguments.Count == 0) ?
@@ -289,10 +321,21 @@ namespace IronPython.Runtime {
                 TopNamespace.LoadAssembly(asm);
             }
             manager.AssemblyLoaded += new EventHandler<AssemblyLoadedEventArgs>(ManagerAssemblyLoaded);
+            MarkStartupPhase("assemblies");
 
             _mainThreadFunctionStack = PythonOps.GetFunctionStack();
 
+            if (PythonOptions.Sample != null) {
+                StartSampling(TimeSpan.FromMilliseconds(1));
+            }
+
+#if FEATURE_FILESYSTEM
+            // compile the modules imported during startup while the rest of it runs
+            _startupSnapshot?.StartPrefetch();
+#endif
+
             BootstrapImportLib();
+            MarkStartupPhase("importlib");
 
             void BootstrapImportLib() {
                 if (PythonOptions.NoImportLib) return;
@@ -737,8 +780,12 @@ namespace IronPython.Runtime {
             } else if (PythonOptions.Optimize) {
                 flags.optimize = 1;
             }
-            flags.dont_write_bytecode = 1;
-            SetSystemStateValue("dont_write_bytecode", true);
+            bool dontWriteBytecode = true;
+#if FEATURE_ASSEMBLYBUILDER_SAVE && FEATURE_FILESYSTEM
+            dontWriteBytecode = _moduleCache == null;
+#endif
+            flags.dont_write_bytecode = dontWriteBytecode ? 1 : 0;
+            SetSystemStateValue("dont_write_bytecode", dontWriteBytecode);
             flags.no_user_site = PythonOptions.NoUserSite ? 1 : 0;
             flags.no_site = PythonOptions.NoSite ? 1 : 0;
             flags.ignore_environment = PythonOptions.IgnoreEnvironment ? 1 : 0;
@@ -1005,7 +1052,14 @@ namespace IronPython.Runtime {
             moduleContext.Features = options;
 
             if ((options & ModuleOptions.Initialize) != 0) {
-                scriptCode.Run(moduleContext.GlobalScope);
+                // imported modules don't end the startup, see ExitScriptCode
+                bool startup = Volatile.Read(ref _startupFinished) == 0;
+                if (startup) _scriptCodeDepth.Value++;
+                try {
+                    scriptCode.Run(moduleContext.GlobalScope);
+                } finally {
+                    if (startup) _scriptCodeDepth.Value--;
+                }
 
                 if (!moduleContext.Globals.ContainsKey("__package__")) {
                     moduleContext.Globals["__package__"] = null;
@@ -1031,7 +1085,11 @@ namespace IronPython.Runtime {
             ContractUtils.RequiresNotNull(moduleName, nameof(moduleName));
             ContractUtils.RequiresNotNull(sourceCode, nameof(sourceCode));
 
-            scriptCode = GetScriptCode(sourceCode, moduleName, options);
+            scriptCode = null;
+#if FEATURE_FILESYSTEM
+            scriptCode = _startupSnapshot?.TakeCode(sourceCode, moduleName, options);
+#endif
+            scriptCode ??= GetScriptCode(sourceCode, moduleName, options);
             Scope scope = scriptCode.CreateScope();
             return InitializeModule(fileName, ((PythonScopeExtension)scope.GetExtension(ContextId)).ModuleContext, scriptCode, options);
         }
@@ -1329,6 +1387,16 @@ namespace IronPython.Runtime {
             Flush(SharedContext, SystemStandardOut);
             Flush(SharedContext, SystemStandardError);
 
+            if (PythonOptions.Sample != null && _sampler != null) {
+                StopSampling();
+                var path = PythonOptions.Sample.Length == 0 ? $"ironpython-{Process.GetCurrentProcess().Id}.collapsed" : PythonOptions.Sample;
+                try {
+                    _sampler.WriteCollapsedStacks(path);
+                } catch (Exception e) when (e is IOException || e is UnauthorizedAccessException) {
+                    PythonOps.PrintWithDest(SharedContext, SystemStandardError, $"Could not write the samples to {path}: {e.Message}");
+                }
+            }
+
             lock (_moduleState) {
                 foreach (var state in _moduleState.Values) {
                     (state as IDisposable)?.Dispose();
@@ -1703,11 +1771,6 @@ namespace IronPython.Runtime {
         }
 
         private Dictionary<string, Type> CreateBuiltinTable() {
-            Dictionary<string, Type> builtinTable = new Dictionary<string, Type>();
-
-            // We should register builtins, if any, from IronPython.dll
-            LoadBuiltins(builtinTable, typeof(PythonContext).Assembly, false);
-
             // Load builtins from IronPython.Modules
             Assembly ironPythonModules = null;
 
@@ -1717,6 +1780,22 @@ namespace IronPython.Runtime {
                 // IronPython.Modules is not available, continue without it...
             }
 
+#if FEATURE_FILESYSTEM
+            if (PythonOptions.StartupSnapshot != null) {
+                _startupSnapshot = new StartupSnapshot(this, PythonOptions.StartupSnapshot, ironPythonModules);
+                Dictionary<string, Type> snapshotTable = _startupSnapshot.CreateBuiltinTable(BuiltinModuleNames);
+                if (snapshotTable != null) {
+                    MarkStartupPhase("builtin modules (snapshot)");
+                    return snapshotTable;
+                }
+            }
+#endif
+
+            Dictionary<string, Type> builtinTable = new Dictionary<string, Type>();
+
+            // We should register builtins, if any, from IronPython.dll
+            LoadBuiltins(builtinTable, typeof(PythonContext).Assembly, false);
+
             if (ironPythonModules != null) {
                 LoadBuiltins(builtinTable, ironPythonModules, false);
 
@@ -1732,9 +1811,64 @@ namespace IronPython.Runtime {
                 }
             }
 
+#if FEATURE_FILESYSTEM
+            _startupSnapshot?.SetBuiltinTable(builtinTable);
+#endif
+            MarkStartupPhase("builtin modules");
             return builtinTable;
         }
 
+        /// <summary>
+        /// Records the end of a phase of the startup when -X StartupTiming is enabled.
+        /// </summary>
+        internal void MarkStartupPhase(string/*!*/ phase) {
+            _startupPhases?.Add(new KeyValuePair<string, TimeSpan>(phase, _startupTimer.Elapsed));
+        }
+
+        /// <summary>
+        /// Called when the code of a module or a script starts running.
+        /// </summary>
+        internal void EnterScriptCode() {
+            if (Volatile.Read(ref _startupFinished) == 0) {
+                _scriptCodeDepth.Value++;
+            }
+        }
+
+        /// <summary>
+        /// Called when the code of a module or a script has finished running.  The startup ends when the first
+        /// code run by the host, rather than imported, has finished.
+        /// </summary>
+        internal void ExitScriptCode() {
+            if (Volatile.Read(ref _startupFinished) == 0 && --_scriptCodeDepth.Value == 0) {
+                FinishStartup();
+            }
+        }
+
+        /// <summary>
+        /// Updates the startup snapshot and reports the startup timing, once.  Called by the command line
+        /// once site has been imported, otherwise see <see cref="ExitScriptCode"/>.
+        /// </summary>
+        internal void FinishStartup() {
+            if (Interlocked.Exchange(ref _startupFinished, 1) != 0) return;
+
+            List<KeyValuePair<string, TimeSpan>> phases = _startupPhases;
+            _startupPhases = null;
+
+#if FEATURE_FILESYSTEM
+            _startupSnapshot?.Update();
+#endif
+
+            if (phases == null) return;
+
+            _startupTimer.Stop();
+            TimeSpan last = TimeSpan.Zero;
+            foreach (KeyValuePair<string, TimeSpan> phase in phases) {
+                PythonOps.PrintWithDest(SharedContext, SystemStandardError, $"# startup: {phase.Key}: {(phase.Value - last).TotalMilliseconds:F2} ms");
+                last = phase.Value;
+            }
+            PythonOps.PrintWithDest(SharedContext, SystemStandardError, $"# startup: total: {last.TotalMilliseconds:F2} ms");
+        }
+
         internal void LoadBuiltins(Dictionary<string, Type> builtinTable, Assembly assem, bool updateSys) {
             object[] attrs = assem.GetCustomAttributes(typeof(PythonModuleAttribute), false);
             if (attrs.Length > 0) {
@@ -2888,8 +3022,20 @@ namespace IronPython.Runtime {
 
         #endregion
 
+        /// <summary>
+        /// The cached contents of the directories searched by the importer.
+        /// </summary>
+        internal DirectoryListingCache DirectoryListings => _directoryListings;
+
         #region Compiled Code Support
 
+#if FEATURE_ASSEMBLYBUILDER_SAVE && FEATURE_FILESYSTEM
+        /// <summary>
+        /// The persistent cache of compiled modules or null if it's not enabled.
+        /// </summary>
+        internal ModuleCache GetModuleCache() => _moduleCache;
+#endif
+
         internal CompiledLoader GetCompiledLoader() {
             if (_compiledLoader == null) {
                 if (Interlocked.CompareExchange(ref _compiledLoader, new CompiledLoader(), null) == null) {
@@ -3930,6 +4076,88 @@ namespace IronPython.Runtime {
             return listener?.TraceObject;
         }
 
+        /// <summary>
+        /// True while any thread has a profile hook installed or the sampler is running.  Function
+        /// targets are only wrapped with profiling calls then.
+        /// </summary>
+        internal bool EnableProfiling => _profileHooksCount > 0;
+
+        /// <summary>
+        /// True while any thread has a profile hook of its own (sys.setprofile, _lsprof).  Builtin
+        /// function calls are only bound with profiling calls then, the sampler doesn't record them.
+        /// </summary>
+        internal bool EnableBuiltinProfiling => Volatile.Read(ref _threadProfileHooksCount) > 0;
+
+        /// <summary>
+        /// Gets the profile hook of the current thread.  Threads without their own hook report to the
+        /// sampling profiler while it is running.
+        /// </summary>
+        internal ProfileHook ProfileHook
+            => _profileHooksCount > 0 ? (EnableBuiltinProfiling ? _profileHooks.Value : null) ?? _runningSampler : null;
+
+        /// <summary>
+        /// Installs the profile hook of the current thread, or removes it when <paramref name="hook"/> is null.
+        /// </summary>
+        internal void SetProfileHook(ProfileHook hook) {
+            var oldHook = _profileHooks.Value;
+            if (oldHook == null && hook == null) return;
+
+            _profileHooks.Value = hook;
+
+            if ((oldHook != null) != (hook != null)) {
+                Interlocked.Add(ref _threadProfileHooksCount, (hook != null) ? 1 : -1);
+                UpdateProfileHooksCount((hook != null) ? 1 : -1);
+            }
+        }
+
+        private void UpdateProfileHooksCount(int delta) {
+            lock (_codeUpdateLock) {
+                var oldEnableProfiling = EnableProfiling;
+
+                _profileHooksCount += delta;
+
+                if (EnableProfiling != oldEnableProfiling) {
+                    // function targets need to be re-wrapped with or without the profiling calls
+                    FunctionCode.UpdateAllCode(this);
+                }
+            }
+        }
+
+        /// <summary>
+        /// Gets the sampling profiler which is running or ran last, see clr.StartSampler and -X Sample.
+        /// </summary>
+        internal SamplingProfiler SamplingProfiler => _sampler;
+
+        /// <summary>
+        /// Starts sampling the Python stacks of all threads every <paramref name="interval"/>.
+        /// </summary>
+        internal void StartSampling(TimeSpan interval) {
+            lock (_codeUpdateLock) {
+                if (_runningSampler != null) {
+                    throw PythonOps.RuntimeError("the sampling profiler is already running");
+                }
+
+                _sampler = _runningSampler = new SamplingProfiler(interval);
+                UpdateProfileHooksCount(1);
+                _sampler.Start();
+            }
+        }
+
+        /// <summary>
+        /// Stops the sampling profiler; its samples remain available from <see cref="SamplingProfiler"/>.
+        /// </summary>
+        internal void StopSampling() {
+            SamplingProfiler sampler;
+            lock (_codeUpdateLock) {
+                sampler = _runningSampler;
+                if (sampler == null) return;
+
+                _runningSampler = null;
+                UpdateProfileHooksCount(-1);
+            }
+            sampler.Stop();
+        }
+
         #endregion
 
         internal ExtensionMethodSet UniqifyExtensions(ExtensionMethodSet newSet) {
@@ -117,17 +117,21 @@ namespace IronPython.Runtime {
         }
 
         public int ReadInto(IPythonBuffer buffer) {
-#if NETCOREAPP
-            return _readStream.Read(buffer.AsSpan());
-#else
+#if !NETCOREAPP
             byte[]? bytes = buffer.AsUnsafeWritableArray();
             if (bytes is not null) {
                 return _readStream.Read(bytes, 0, buffer.NumBytes());
             }
+#endif
+            return ReadInto(buffer.AsSpan());
+        }
 
-            var span = buffer.AsSpan();
+        public int ReadInto(Span<byte> span) {
+#if NETCOREAPP
+            return _readStream.Read(span);
+#else
             const int chunkSize = 0x1000; // 4 KiB, default buffer size of FileSteam
-            bytes = ArrayPool<byte>.Shared.Rent(chunkSize);
+            byte[] bytes = ArrayPool<byte>.Shared.Rent(chunkSize);
             try {
                 for (int pos = 0; pos < span.Length; pos += chunkSize) {
                     int toRead = Math.Min(chunkSize, span.Length - pos);
@@ -359,6 +359,11 @@ namespace IronPython.Runtime {
                 for (int i = 0; i < _size; i++) {
                     object? thisIndex = _data[i];
 
+                    if (TryFastEquals(thisIndex, value, out bool equal)) {
+                        if (equal) return true;
+                        continue;
+                    }
+
                     // release the lock while we may call user code...
                     MonitorUtils.Exit(this, ref lockTaken);
                     try {
@@ -707,7 +712,7 @@ namespace IronPython.Runtime {
 
         internal void AddNoLockNoDups(object? item) {
             for (int i = 0; i < _size; i++) {
-                if (PythonOps.IsOrEqualsRetBool(_data[i], item)) {
+                if (TryFastEquals(_data[i], item, out bool equal) ? equal : PythonOps.IsOrEqualsRetBool(_data[i], item)) {
                     return;
                 }
             }
@@ -733,6 +738,11 @@ namespace IronPython.Runtime {
                 for (int i = 0, len = _size; i < len; i++) {
                     object? val = _data[i];
 
+                    if (TryFastEquals(val, item, out bool equal)) {
+                        if (equal) cnt++;
+                        continue;
+                    }
+
                     MonitorUtils.Exit(this, ref lockTaken);
                     try {
                         if (PythonOps.IsOrEqualsRetBool(val, item)) cnt++;
@@ -824,7 +834,8 @@ namespace IronPython.Runtime {
             stop = PythonOps.FixSliceIndex(stop, locSize);
 
             for (int i = start; i < Math.Min(stop, Math.Min(locSize, _size)); i++) {
-                if (PythonOps.IsOrEqualsRetBool(locData[i], item)) return i;
+                object? val = locData[i];
+                if (TryFastEquals(val, item, out bool equal) ? equal : PythonOps.IsOrEqualsRetBool(val, item)) return i;
             }
 
             throw PythonOps.ValueError("list.index(item): item not in list");
@@ -966,8 +977,10 @@ namespace IronPython.Runtime {
                             if (_data.Length != 0) throw PythonOps.ValueError("list mutated while determining keys");
                         }
 
-                        sortData = ListMergeSort(sortData, keys, cmp, index, count, reverse);
-                    } else {
+                        if (index != 0 || !TrySortHomogeneous(sortData, keys, count, reverse)) {
+                            sortData = ListMergeSort(sortData, keys, cmp, index, count, reverse);
+                        }
+                    } else if (index != 0 || !TrySortHomogeneous(sortData, sortData, count, reverse)) {
                         sortData = ListMergeSort(sortData, null, cmp, index, count, reverse);
                     }
                 } finally {
@@ -1098,6 +1111,225 @@ namespace IronPython.Runtime {
             return ret;
         }
 
+        #region Homogeneous fast paths
+
+        /// <summary>
+        /// The element type shared by all items of a list for which unboxed fast paths exist.
+        /// </summary>
+        private enum StorageKind {
+            Object,
+            Int32,
+            Double,
+            String,
+        }
+
+        /// <summary>
+        /// Determines if the first size items are all exactly ints, floats or strs.
+        /// </summary>
+        private static StorageKind GetStorageKind(object?[] data, int size) {
+            if (size == 0) return StorageKind.Object;
+
+            Type? type = data[0]?.GetType();
+            StorageKind kind;
+            if (type == typeof(int)) {
+                kind = StorageKind.Int32;
+            } else if (type == typeof(double)) {
+                kind = StorageKind.Double;
+            } else if (type == typeof(string)) {
+                kind = StorageKind.String;
+            } else {
+                return StorageKind.Object;
+            }
+
+            for (int i = 1; i < size; i++) {
+                if (data[i]?.GetType() != type) return StorageKind.Object;
+            }
+            return kind;
+        }
+
+        /// <summary>
+        /// Compares two items for equality without dispatching when they are the same object or
+        /// both ints, floats or strs.  Returns false if a full Python comparison is required.
+        /// </summary>
+        private static bool TryFastEquals(object? x, object? y, out bool equal) {
+            if (ReferenceEquals(x, y)) {
+                equal = true;
+                return true;
+            }
+
+            if (x is int xi) {
+                if (y is int yi) {
+                    equal = xi == yi;
+                    return true;
+                }
+            } else if (x is string xs) {
+                if (y is string ys) {
+                    equal = string.Equals(xs, ys);
+                    return true;
+                }
+            } else if (x is double xd && y is double yd) {
+                equal = xd == yd;
+                return true;
+            }
+
+            equal = false;
+            return false;
+        }
+
+        /// <summary>
+        /// Stable sort of the first count items of sortData using keys when all of the keys are
+        /// ints, floats or strs.  The comparisons run on the unboxed values and never call back
+        /// into Python so the list cannot be mutated while sorting.
+        /// </summary>
+        /// <returns>false if the keys are not homogeneous and the generic sort needs to be used</returns>
+        private static bool TrySortHomogeneous(object?[] sortData, object?[] keys, int count, bool reverse) {
+            if (count < 2) return false;
+
+            int[]? order = GetStorageKind(keys, count) switch {
+                StorageKind.Int32 => GetInt32SortOrder(keys, count, reverse),
+                StorageKind.Double => GetDoubleSortOrder(keys, count, reverse),
+                StorageKind.String => GetStringSortOrder(keys, count, reverse),
+                _ => null
+            };
+            if (order == null) return false;
+
+            object?[] sorted = new object?[count];
+            for (int i = 0; i < count; i++) {
+                sorted[i] = sortData[order[i]];
+            }
+            Array.Copy(sorted, sortData, count);
+            return true;
+        }
+
+        private static int[] GetInt32SortOrder(object?[] keys, int count, bool reverse) {
+            // pack the value and the original index into a single key, the index makes every
+            // key unique so the unstable Array.Sort produces a stable order.
+            long[] packed = new long[count];
+            for (int i = 0; i < count; i++) {
+                int value = (int)keys[i]!;
+                packed[i] = ((long)(reverse ? ~value : value) << 32) | (uint)i;
+            }
+
+            Array.Sort(packed);
+
+            int[] order = new int[count];
+            for (int i = 0; i < count; i++) {
+                order[i] = (int)(packed[i] & 0x7FFFFFFF);
+            }
+            return order;
+        }
+
+        private static int[]? GetDoubleSortOrder(object?[] keys, int count, bool reverse) {
+            double[] values = new double[count];
+            for (int i = 0; i < count; i++) {
+                double value = (double)keys[i]!;
+                // NaN isn't ordered, leave the exact merge sort behavior to the generic sort
+                if (double.IsNaN(value)) return null;
+                values[i] = value;
+            }
+
+            int[] order = GetIdentityOrder(count);
+            if (reverse) {
+                Array.Sort(order, (x, y) => {
+                    int res = values[y].CompareTo(values[x]);
+                    return res != 0 ? res : x.CompareTo(y);
+                });
+            } else {
+                Array.Sort(order, (x, y) => {
+                    int res = values[x].CompareTo(values[y]);
+                    return res != 0 ? res : x.CompareTo(y);
+                });
+            }
+            return order;
+        }
+
+        private static int[] GetStringSortOrder(object?[] keys, int count, bool reverse) {
+            string[] values = new string[count];
+            for (int i = 0; i < count; i++) {
+                values[i] = (string)keys[i]!;
+            }
+
+            int[] order = GetIdentityOrder(count);
+            if (reverse) {
+                Array.Sort(order, (x, y) => {
+                    int res = string.CompareOrdinal(values[y], values[x]);
+                    return res != 0 ? res : x.CompareTo(y);
+                });
+            } else {
+                Array.Sort(order, (x, y) => {
+                    int res = string.CompareOrdinal(values[x], values[y]);
+                    return res != 0 ? res : x.CompareTo(y);
+                });
+            }
+            return order;
+        }
+
+        private static int[] GetIdentityOrder(int count) {
+            int[] order = new int[count];
+            for (int i = 0; i < count; i++) {
+                order[i] = i;
+            }
+            return order;
+        }
+
+        /// <summary>
+        /// Finds the first smallest or largest item when all items are ints, floats or strs.
+        /// Used by min and max to avoid a dynamic comparison per item.
+        /// </summary>
+        /// <returns>false if the list is empty or not homogeneous</returns>
+        internal bool TryGetExtreme(bool max, out object? result) {
+            lock (this) {
+                object?[] data = _data;
+                int size = _size;
+                int index = 0;
+
+                switch (GetStorageKind(data, size)) {
+                    case StorageKind.Int32: {
+                            int best = (int)data[0]!;
+                            for (int i = 1; i < size; i++) {
+                                int value = (int)data[i]!;
+                                if (max ? value > best : value < best) {
+                                    best = value;
+                                    index = i;
+                                }
+                            }
+                            break;
+                        }
+                    case StorageKind.Double: {
+                            double best = (double)data[0]!;
+                            for (int i = 1; i < size; i++) {
+                                double value = (double)data[i]!;
+                                if (max ? value > best : value < best) {
+                                    best = value;
+                                    index = i;
+                                }
+                            }
+                            break;
+                        }
+                    case StorageKind.String: {
+                            string best = (string)data[0]!;
+                            for (int i = 1; i < size; i++) {
+                                string value = (string)data[i]!;
+                                int res = string.CompareOrdinal(value, best);
+                                if (max ? res > 0 : res < 0) {
+                                    best = value;
+                                    index = i;
+                                }
+                            }
+                            break;
+                        }
+                    default:
+                        result = null;
+                        return false;
+                }
+
+                result = data[index];
+                return true;
+            }
+        }
+
+        #endregion
+
         internal int BinarySearch(int index, int count, object value, IComparer comparer) {
             lock (this) return Array.BinarySearch(_data, index, count, value, comparer);
         }
@@ -1216,7 +1448,8 @@ namespace IronPython.Runtime {
             }
 
             for (int i = 0; i < Math.Min(locSize, _size); i++) {
-                if (PythonOps.IsOrEqualsRetBool(locData[i], value)) return i;
+                object? val = locData[i];
+                if (TryFastEquals(val, value, out bool equal) ? equal : PythonOps.IsOrEqualsRetBool(val, value)) return i;
             }
             return -1;
         }
@@ -129,6 +129,33 @@ namespace IronPython.Runtime {
 
         public bool Quiet { get; }
 
+        /// <summary>
+        /// Enables the persistent cache of compiled modules.  An empty string stores the compiled
+        /// modules in a __pycache__ directory next to their source, any other value is the directory
+        /// holding the cache for all modules.  The cache is disabled when this is null, and it is
+        /// only available on .NET Framework, where compiled modules can be saved.
+        /// </summary>
+        public string? ModuleCache { get; }
+
+        /// <summary>
+        /// Runs the sampling profiler from startup and writes the collapsed stacks it sampled to this file
+        /// at shutdown, or to ironpython-&lt;pid&gt;.collapsed when it is empty.  Disabled when this is null.
+        /// </summary>
+        public string? Sample { get; }
+
+        /// <summary>
+        /// Loads the startup state from this snapshot file, or creates it at the end of startup when it
+        /// is missing or out of date.  An empty string uses a file in the cache directory of the user,
+        /// %LOCALAPPDATA%\IronPython on Windows and $XDG_CACHE_HOME/IronPython or ~/.cache/IronPython
+        /// elsewhere, and disables the snapshot when there is no such directory.  Disabled when this is null.
+        /// </summary>
+        public string? StartupSnapshot { get; }
+
+        /// <summary>
+        /// Reports the time taken by each phase of the startup on stderr.
+        /// </summary>
+        public bool StartupTiming { get; }
+
         /// <summary>
         /// On Basic level, console IO streams are emulated using console writer/reader.
         /// </summary>
@@ -164,6 +191,10 @@ namespace IronPython.Runtime {
             Tracing = GetOption(options, "Tracing", false);
             NoDebug = GetOption(options, "NoDebug", (Regex?)null);
             Quiet = GetOption(options, "Quiet", false);
+            ModuleCache = GetOption(options, "ModuleCache", (string?)null);
+            Sample = GetOption(options, "Sample", (string?)null);
+            StartupSnapshot = GetOption(options, "StartupSnapshot", (string?)null);
+            StartupTiming = GetOption(options, "StartupTiming", false);
             NoImportLib = GetOption(options, "NoImportLib", false);
             Isolated = GetOption(options, "Isolated", false);
             Utf8Mode = GetOption(options, "Utf8Mode", false);
@@ -21,10 +21,6 @@ namespace IronPython.Runtime {
         private TracebackDelegate _traceDispatch;
         private bool _inTraceBack;
         private bool _exceptionThrown;
-        
-#if PROFILE_SUPPORT
-        private bool _profile;
-#endif
 
         internal PythonTracebackListener(PythonContext pythonContext, object traceObject) {
             _pythonContext = pythonContext;
@@ -63,20 +59,10 @@ namespace IronPython.Runtime {
             }
         }
 
-#if PROFILE_SUPPORT
-        internal void SetProfile(TracebackDelegate traceDispatch) {
-            _traceDispatch = traceDispatch;
-            _profile = true;
-        }
-#endif
-
         #region ITraceCallback Members
 
         public void OnTraceEvent(Debugging.TraceEventKind kind, string name, string sourceFileName, SourceSpan sourceSpan, Func<IDictionary<object, object>> scopeCallback, object payload, object customPayload) {        
             if (kind == Debugging.TraceEventKind.ThreadExit ||                  // We don't care about thread-exit events
-#if PROFILE_SUPPORT
-                (_profile && kind == Debugging.TraceEventKind.TracePoint) ||    // Ignore code execute tracebacks when in profile mode
-#endif
                 kind == Debugging.TraceEventKind.ExceptionUnwind) {             // and we always have a try/catch so we don't care about methods unwinding.
                 return;
             }
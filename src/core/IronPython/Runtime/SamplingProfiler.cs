@@ -0,0 +1,288 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#nullable enable
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.Text;
+using System.Threading;
+
+using IronPython.Runtime.Types;
+
+namespace IronPython.Runtime {
+    /// <summary>
+    /// A statistical profiler which periodically samples the Python stacks of all threads and aggregates them
+    /// as collapsed stacks ("outer;inner count" lines, as consumed by flamegraph.pl and speedscope).
+    ///
+    /// .NET cannot walk the stack of another thread, so each thread keeps a shadow stack of the Python
+    /// functions and modules it is running.  The stacks are maintained from the profile hook of the threads,
+    /// which only store a reference and a depth, and are read without locking by the sampler thread.  The
+    /// sampler copies them into a ring buffer which is aggregated in batches, off the threads being sampled.
+    ///
+    /// This makes it an instrumenting profiler which reports sampled stacks rather than a true sampler: while
+    /// it runs every Python function target is wrapped with the profile hook, so its overhead grows with the
+    /// call rate and not with the sample rate.  The hook is kept to a thread static read and an array store,
+    /// and builtin function calls are not instrumented, they are attributed to the calling Python function.
+    /// </summary>
+    internal sealed class SamplingProfiler : ProfileHook {
+        private const int RingSize = 4096; // a power of two
+        private const int DefaultDepth = 32;
+
+        // the stack of the profiler which last ran on the thread, _stacks holds those of all profilers
+        [ThreadStatic]
+        private static ShadowStack? t_stack;
+
+        private readonly TimeSpan _interval;
+        private readonly ThreadLocal<ShadowStack> _stacks;
+        private readonly object _threadsLock = new object();
+        private ShadowStack[] _threads = Array.Empty<ShadowStack>(); // copied on write, read by the sampler
+
+        private readonly Sample[] _ring = new Sample[RingSize];
+        private long _head, _tail;
+        private long _dropped;
+
+        private readonly Dictionary<string, int> _counts = new Dictionary<string, int>();
+        private readonly Dictionary<FunctionCode, string> _labels = new Dictionary<FunctionCode, string>();
+
+        private readonly ManualResetEventSlim _stop = new ManualResetEventSlim();
+        private Thread? _thread;
+
+        public SamplingProfiler(TimeSpan interval) {
+            _interval = interval;
+            _stacks = new ThreadLocal<ShadowStack>(CreateStack);
+            for (int i = 0; i < _ring.Length; i++) {
+                _ring[i] = new Sample();
+            }
+        }
+
+        /// <summary>
+        /// The number of samples which were lost because the ring buffer was full.
+        /// </summary>
+        public long Dropped => Interlocked.Read(ref _dropped);
+
+        public void Start() {
+            _thread = new Thread(Run) {
+                IsBackground = true,
+                Name = "IronPython sampling profiler",
+                Priority = ThreadPriority.AboveNormal
+            };
+            _thread.Start();
+        }
+
+        public void Stop() {
+            _stop.Set();
+            _thread?.Join();
+            _thread = null;
+            Drain();
+        }
+
+        #region ProfileHook
+
+        public override void OnCall(PythonFunction function) => CurrentStack.Push(function.__code__);
+
+        public override void OnReturn(PythonFunction function, object? result) => CurrentStack.Pop(function.__code__);
+
+        public override void OnModuleEnter(FunctionCode code) => CurrentStack.Push(code);
+
+        public override void OnModuleExit(FunctionCode code) => CurrentStack.Pop(code);
+
+        // builtin calls are attributed to the calling Python function, they only get here while some thread has a hook of its own
+        public override void OnBuiltinCall(BuiltinFunction function) { }
+
+        public override void OnBuiltinReturn(BuiltinFunction function, bool exception) { }
+
+        #endregion
+
+        #region Sampling
+
+        private ShadowStack CurrentStack {
+            get {
+                ShadowStack? stack = t_stack;
+                if (stack == null || stack.Profiler != this) {
+                    t_stack = stack = _stacks.Value;
+                }
+                return stack;
+            }
+        }
+
+        private ShadowStack CreateStack() {
+            var stack = new ShadowStack(this, Thread.CurrentThread);
+            lock (_threadsLock) {
+                var threads = new List<ShadowStack>(_threads.Length + 1);
+                foreach (ShadowStack other in _threads) {
+                    if (other.Thread.IsAlive) threads.Add(other);
+                }
+                threads.Add(stack);
+                Volatile.Write(ref _threads, threads.ToArray());
+            }
+            return stack;
+        }
+
+        private void Run() {
+            long intervalTicks = (long)(_interval.TotalSeconds * Stopwatch.Frequency);
+            long next = Stopwatch.GetTimestamp();
+            while (true) {
+                next += intervalTicks;
+                long wait = next - Stopwatch.GetTimestamp();
+                if (wait > 0) {
+                    if (_stop.Wait(TimeSpan.FromSeconds((double)wait / Stopwatch.Frequency))) return;
+                } else {
+                    // fell behind, skip the missed samples rather than catching up in a burst
+                    next = Stopwatch.GetTimestamp();
+                    if (_stop.IsSet) return;
+                }
+
+                TakeSample();
+
+                if (Volatile.Read(ref _head) - Volatile.Read(ref _tail) >= RingSize / 2) {
+                    Drain();
+                }
+            }
+        }
+
+        /// <summary>
+        /// Copies the stacks of all threads into the ring buffer.  Only called from the sampler thread.
+        /// </summary>
+        private void TakeSample() {
+            foreach (ShadowStack stack in Volatile.Read(ref _threads)) {
+                // the thread keeps running while it's copied, which can only skew this one sample
+                int depth = stack.Depth;
+                if (depth == 0) continue;
+
+                long head = _head;
+                if (head - Volatile.Read(ref _tail) == RingSize) {
+                    Interlocked.Increment(ref _dropped);
+                    continue;
+                }
+
+                Sample sample = _ring[head & (RingSize - 1)];
+                FunctionCode?[] codes = stack.Codes;
+                depth = Math.Min(depth, codes.Length);
+                if (sample.Codes.Length < depth) {
+                    sample.Codes = new FunctionCode?[codes.Length];
+                }
+                Array.Copy(codes, sample.Codes, depth);
+                sample.Depth = depth;
+
+                Volatile.Write(ref _head, head + 1);
+            }
+        }
+
+        /// <summary>
+        /// Aggregates the samples of the ring buffer.
+        /// </summary>
+        private void Drain() {
+            lock (_counts) {
+                long tail = _tail, head = Volatile.Read(ref _head);
+                var key = new StringBuilder();
+                for (; tail < head; tail++) {
+                    Sample sample = _ring[tail & (RingSize - 1)];
+                    key.Clear();
+                    for (int i = 0; i < sample.Depth; i++) {
+                        FunctionCode? code = sample.Codes[i];
+                        if (code == null) continue;
+
+                        if (key.Length > 0) key.Append(';');
+                        key.Append(GetLabel(code));
+                    }
+                    Array.Clear(sample.Codes, 0, sample.Depth);
+
+                    if (key.Length > 0) {
+                        string stack = key.ToString();
+                        _counts.TryGetValue(stack, out int count);
+                        _counts[stack] = count + 1;
+                    }
+                }
+                Volatile.Write(ref _tail, tail);
+            }
+        }
+
+        private string GetLabel(FunctionCode code) {
+            if (!_labels.TryGetValue(code, out string? label)) {
+                // ';' separates the frames of a collapsed stack
+                label = $"{code.co_name} ({code.co_filename}:{code.co_firstlineno})".Replace(';', ':');
+                _labels[code] = label;
+            }
+            return label;
+        }
+
+        #endregion
+
+        #region Results
+
+        /// <summary>
+        /// Returns the samples taken so far as collapsed stacks, one "frame;frame;frame count" line per stack.
+        /// </summary>
+        public string GetCollapsedStacks() {
+            Drain();
+
+            var res = new StringBuilder();
+            lock (_counts) {
+                var stacks = new List<string>(_counts.Keys);
+                stacks.Sort(StringComparer.Ordinal);
+                foreach (string stack in stacks) {
+                    res.Append(stack).Append(' ').Append(_counts[stack]).Append('\n');
+                }
+            }
+            return res.ToString();
+        }
+
+        public void WriteCollapsedStacks(string path) {
+            File.WriteAllText(path, GetCollapsedStacks());
+        }
+
+        public void Clear() {
+            Drain();
+
+            lock (_counts) {
+                _counts.Clear();
+            }
+            Interlocked.Exchange(ref _dropped, 0);
+        }
+
+        #endregion
+
+        /// <summary>
+        /// The Python functions and modules running on a thread.  Only modified by the owning thread.
+        /// </summary>
+        private sealed class ShadowStack {
+            public readonly SamplingProfiler Profiler;
+            public readonly Thread Thread;
+            public FunctionCode?[] Codes = new FunctionCode?[DefaultDepth];
+            public volatile int Depth;
+
+            public ShadowStack(SamplingProfiler profiler, Thread thread) {
+                Profiler = profiler;
+                Thread = thread;
+            }
+
+            public void Push(FunctionCode code) {
+                FunctionCode?[] codes = Codes;
+                int depth = Depth;
+                if (depth == codes.Length) {
+                    Array.Resize(ref codes, codes.Length * 2);
+                    Codes = codes;
+                }
+                codes[depth] = code;
+                Depth = depth + 1;
+            }
+
+            public void Pop(FunctionCode code) {
+                // returns from calls made before sampling started are ignored
+                int depth = Depth;
+                if (depth > 0 && Codes[depth - 1] == code) {
+                    Depth = depth - 1;
+                }
+            }
+        }
+
+        private sealed class Sample {
+            public FunctionCode?[] Codes = new FunctionCode?[DefaultDepth];
+            public int Depth;
+        }
+    }
+}
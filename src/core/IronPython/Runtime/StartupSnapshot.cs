@@ -0,0 +1,374 @@
+// Licensed to the .NET Foundation under one or more agreements.
+// The .NET Foundation licenses this file to you under the Apache 2.0 License.
+// See the LICENSE file in the project root for more information.
+
+#if FEATURE_FILESYSTEM
+
+#nullable enable
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Reflection;
+using System.Runtime.InteropServices;
+using System.Text;
+using System.Threading;
+
+using Microsoft.Scripting;
+
+using IronPython.Runtime.Operations;
+
+namespace IronPython.Runtime {
+    /// <summary>
+    /// State computed during startup which is saved to a file and reused by the following runs.
+    ///
+    /// The snapshot holds the table of builtin modules, which otherwise requires creating the
+    /// PythonModuleAttributes of IronPython and IronPython.Modules, and the source files of the
+    /// modules imported during startup (site, encodings, codecs, ...).  Those modules are compiled
+    /// on a background thread as soon as the runtime is created, so they are ready by the time
+    /// they are imported.
+    ///
+    /// A snapshot is only used if it was created by the same assemblies on the same platform,
+    /// otherwise it's replaced at the end of startup.
+    /// </summary>
+    internal sealed class StartupSnapshot {
+        private const int Magic = 0x53595049; // "IPYS"
+        private const int FormatVersion = 1;
+        private const ModuleOptions ImportOptions = ModuleOptions.Initialize | ModuleOptions.Optimized;
+
+        private readonly PythonContext/*!*/ _context;
+        private readonly string? _path;
+        private readonly Assembly?[]/*!*/ _assemblies;
+        private readonly string/*!*/ _buildKey;
+
+        private List<KeyValuePair<string, Type>>? _builtinModules;
+        private List<KeyValuePair<string, string>>? _initialModules;
+        private bool _loaded;
+
+        private readonly Dictionary<string, PrefetchedModule> _prefetched = new Dictionary<string, PrefetchedModule>(StringComparer.Ordinal);
+
+        /// <param name="context">The owning context.</param>
+        /// <param name="path">The snapshot file, or an empty string for the default file in the cache directory of the user.</param>
+        /// <param name="modules">The IronPython.Modules assembly, null if it's not available.</param>
+        public StartupSnapshot(PythonContext/*!*/ context, string/*!*/ path, Assembly? modules) {
+            _context = context;
+            _path = path.Length == 0 ? GetDefaultPath() : Path.GetFullPath(path);
+            _assemblies = new[] { typeof(PythonContext).Assembly, modules };
+            _buildKey = GetBuildKey(_assemblies);
+
+            Read();
+        }
+
+        #region Builtin modules
+
+        /// <summary>
+        /// Creates the table of builtin modules from the snapshot, or returns null if the snapshot
+        /// wasn't loaded.
+        /// </summary>
+        public Dictionary<string, Type>? CreateBuiltinTable(Dictionary<Type, string>/*!*/ builtinModuleNames) {
+            if (_builtinModules == null) {
+                return null;
+            }
+
+            var builtinTable = new Dictionary<string, Type>(_builtinModules.Count);
+            foreach (KeyValuePair<string, Type> module in _builtinModules) {
+                builtinTable[module.Key] = module.Value;
+                builtinModuleNames[module.Value] = module.Key;
+            }
+            return builtinTable;
+        }
+
+        /// <summary>
+        /// Records the table of builtin modules created from the assembly attributes.
+        /// </summary>
+        public void SetBuiltinTable(Dictionary<string, Type>/*!*/ builtinTable) {
+            _builtinModules = new List<KeyValuePair<string, Type>>(builtinTable);
+        }
+
+        #endregion
+
+        #region Initial modules
+
+        /// <summary>
+        /// Starts compiling the modules imported during the startup recorded in the snapshot.
+        /// </summary>
+        public void StartPrefetch() {
+            if (_initialModules == null || _initialModules.Count == 0) {
+                return;
+            }
+
+            var modules = new List<PrefetchedModule>(_initialModules.Count);
+            lock (_prefetched) {
+                foreach (KeyValuePair<string, string> module in _initialModules) {
+                    var prefetched = new PrefetchedModule(this, module.Key, module.Value);
+                    _prefetched[module.Value] = prefetched;
+                    modules.Add(prefetched);
+                }
+            }
+
+            ThreadPool.QueueUserWorkItem(_ => {
+                foreach (PrefetchedModule module in modules) {
+                    _ = module.Code;
+                }
+            });
+        }
+
+        /// <summary>
+        /// Returns the prefetched code of a module being imported, or null if the module wasn't
+        /// prefetched.  If the module is still being compiled this waits for it, if it's not
+        /// compiled yet it's compiled on the calling thread.
+        /// </summary>
+        public ScriptCode? TakeCode(SourceUnit/*!*/ sourceUnit, string/*!*/ moduleName, ModuleOptions options) {
+            if (options != ImportOptions || sourceUnit.Path == null) {
+                return null;
+            }
+
+            PrefetchedModule? module;
+            lock (_prefetched) {
+                if (!_prefetched.TryGetValue(sourceUnit.Path, out module) || module.Name != moduleName) {
+                    return null;
+                }
+                _prefetched.Remove(sourceUnit.Path);
+            }
+
+            return module.TakeCode();
+        }
+
+        private ScriptCode? Compile(string name, string path, out FileStamp stamp) {
+            stamp = default;
+            try {
+                // capture the source stamp before compiling so a concurrent edit makes the code stale
+                stamp = new FileStamp(path);
+                SourceUnit sourceUnit = _context.CreateFileUnit(path, _context.DefaultEncoding, SourceCodeKind.File);
+                return _context.GetScriptCode(sourceUnit, name, ImportOptions);
+            } catch {
+                // the import compiles the module again and reports the error
+                return null;
+            }
+        }
+
+        private sealed class PrefetchedModule {
+            private readonly StartupSnapshot _snapshot;
+            private ScriptCode? _code;
+            private FileStamp _stamp;
+            private bool _compiled;
+
+            public PrefetchedModule(StartupSnapshot snapshot, string name, string path) {
+                _snapshot = snapshot;
+                Name = name;
+                Path = path;
+            }
+
+            public string Name { get; }
+
+            public string Path { get; }
+
+            public ScriptCode? Code {
+                get {
+                    lock (this) {
+                        if (!_compiled) {
+                            _code = _snapshot.Compile(Name, Path, out _stamp);
+                            _compiled = true;
+                        }
+                        return _code;
+                    }
+                }
+            }
+
+            public ScriptCode? TakeCode() {
+                ScriptCode? code = Code;
+                if (code == null) {
+                    return null;
+                }
+
+                try {
+                    return _stamp.Equals(new FileStamp(Path)) ? code : null;
+                } catch (Exception e) when (e is IOException || e is UnauthorizedAccessException) {
+                    return null;
+                }
+            }
+        }
+
+        private readonly struct FileStamp : IEquatable<FileStamp> {
+            private readonly long _lastWrite, _length;
+
+            public FileStamp(string path) {
+                var info = new FileInfo(path);
+                _lastWrite = info.LastWriteTimeUtc.Ticks;
+                _length = info.Length;
+            }
+
+            public bool Equals(FileStamp other) => _lastWrite == other._lastWrite && _length == other._length;
+        }
+
+        #endregion
+
+        #region Reading and writing
+
+        /// <summary>
+        /// Gets the default snapshot file.  It's kept in a directory of the current user rather than in the shared
+        /// temporary directory, where another user could create it first.  Returns null if the user has no
+        /// such directory, in which case no snapshot is used.
+        /// </summary>
+        private static string? GetDefaultPath() {
+            string cache;
+            if (RuntimeInformation.IsOSPlatform(OSPlatform.Windows)) {
+                cache = Environment.GetFolderPath(Environment.SpecialFolder.LocalApplicationData, Environment.SpecialFolderOption.DoNotVerify);
+            } else {
+                cache = Environment.GetEnvironmentVariable("XDG_CACHE_HOME") ?? string.Empty;
+                if (!Path.IsPathRooted(cache)) {
+                    string home = Environment.GetFolderPath(Environment.SpecialFolder.UserProfile, Environment.SpecialFolderOption.DoNotVerify);
+                    cache = home.Length == 0 ? string.Empty : Path.Combine(home, ".cache");
+                }
+            }
+
+            if (!Path.IsPathRooted(cache)) {
+                return null;
+            }
+            return Path.Combine(cache, "IronPython", $"ironpython-{VersionInfo.Instance.major}{VersionInfo.Instance.minor}.snapshot");
+        }
+
+        private void Read() {
+            if (_path == null || !File.Exists(_path)) {
+                return;
+            }
+
+            try {
+                using var reader = new BinaryReader(File.OpenRead(_path), Encoding.UTF8);
+                if (reader.ReadInt32() != Magic ||
+                    reader.ReadInt32() != FormatVersion ||
+                    reader.ReadString() != _buildKey) {
+                    return;
+                }
+
+                int count = reader.ReadInt32();
+                var builtinModules = new List<KeyValuePair<string, Type>>(count);
+                for (int i = 0; i < count; i++) {
+                    string name = reader.ReadString();
+                    int assembly = reader.ReadByte();
+                    string typeName = reader.ReadString();
+
+                    Type? type = assembly < _assemblies.Length ? _assemblies[assembly]?.GetType(typeName, throwOnError: false) : null;
+                    if (type == null) {
+                        return;
+                    }
+                    builtinModules.Add(new KeyValuePair<string, Type>(name, type));
+                }
+
+                count = reader.ReadInt32();
+                var initialModules = new List<KeyValuePair<string, string>>(count);
+                for (int i = 0; i < count; i++) {
+                    string name = reader.ReadString();
+                    initialModules.Add(new KeyValuePair<string, string>(name, reader.ReadString()));
+                }
+
+                _builtinModules = builtinModules;
+                _initialModules = initialModules;
+                _loaded = true;
+            } catch (Exception e) when (e is IOException || e is UnauthorizedAccessException) {
+            }
+        }
+
+        /// <summary>
+        /// Called at the end of the startup, saves the snapshot if it wasn't loaded or if different
+        /// modules were imported.
+        /// </summary>
+        public void Update() {
+            List<KeyValuePair<string, string>> initialModules = GetInitialModules();
+            if (_path == null || _builtinModules == null || _loaded && SameModules(initialModules, _initialModules!)) {
+                return;
+            }
+
+            string tempPath = _path + "." + Path.GetRandomFileName();
+            try {
+                Directory.CreateDirectory(Path.GetDirectoryName(_path)!);
+                using (var writer = new BinaryWriter(File.Create(tempPath), Encoding.UTF8)) {
+                    writer.Write(Magic);
+                    writer.Write(FormatVersion);
+                    writer.Write(_buildKey);
+
+                    var builtinModules = _builtinModules.FindAll(module => Array.IndexOf(_assemblies, module.Value.Assembly) >= 0);
+                    writer.Write(builtinModules.Count);
+                    foreach (KeyValuePair<string, Type> module in builtinModules) {
+                        writer.Write(module.Key);
+                        writer.Write((byte)Array.IndexOf(_assemblies, module.Value.Assembly));
+                        writer.Write(module.Value.FullName!);
+                    }
+
+                    writer.Write(initialModules.Count);
+                    foreach (KeyValuePair<string, string> module in initialModules) {
+                        writer.Write(module.Key);
+                        writer.Write(module.Value);
+                    }
+                }
+
+                if (File.Exists(_path)) {
+                    File.Delete(_path);
+                }
+                File.Move(tempPath, _path);
+                Trace($"# wrote startup snapshot '{_path}'");
+            } catch (Exception e) when (e is IOException || e is UnauthorizedAccessException) {
+                Trace($"# could not create startup snapshot '{_path}': {e.Message}");
+                try {
+                    File.Delete(tempPath);
+                } catch (IOException) {
+                } catch (UnauthorizedAccessException) {
+                }
+            }
+        }
+
+        /// <summary>
+        /// Gets the modules imported from source so far, in the order in which they were imported.
+        /// </summary>
+        private List<KeyValuePair<string, string>> GetInitialModules() {
+            var res = new List<KeyValuePair<string, string>>();
+            foreach (KeyValuePair<object, object> module in _context.SystemStateModules) {
+                if (module.Key is string name && name != "__main__" &&
+                    module.Value is PythonModule pythonModule &&
+                    pythonModule.__dict__.TryGetValue("__file__", out object? file) && file is string path &&
+                    path.EndsWith(".py", StringComparison.OrdinalIgnoreCase) && Path.IsPathRooted(path)) {
+                    res.Add(new KeyValuePair<string, string>(name, path));
+                }
+            }
+            return res;
+        }
+
+        private static bool SameModules(List<KeyValuePair<string, string>> x, List<KeyValuePair<string, string>> y) {
+            if (x.Count != y.Count) {
+                return false;
+            }
+            for (int i = 0; i < x.Count; i++) {
+                if (x[i].Key != y[i].Key || x[i].Value != y[i].Value) {
+                    return false;
+                }
+            }
+            return true;
+        }
+
+        private void Trace(string message) {
+            if (_context.PythonOptions.Verbose) {
+                PythonOps.PrintWithDest(_context.SharedContext, _context.SystemStandardError, message);
+            }
+        }
+
+        /// <summary>
+        /// Identifies the assemblies the builtin modules come from and the platform, which decides
+        /// which of them are available.  Snapshots created with a different key are never reused.
+        /// </summary>
+        private static string GetBuildKey(Assembly?[] assemblies) {
+            var key = new StringBuilder();
+            foreach (Assembly? assembly in assemblies) {
+                if (assembly != null) {
+                    key.Append(assembly.FullName).Append(';').Append(assembly.ManifestModule.ModuleVersionId);
+                }
+                key.Append(';');
+            }
+            key.Append(PlatformsAttribute.ActualPlatform);
+            return key.ToString();
+        }
+
+        #endregion
+    }
+}
+
+#endif
@@ -450,9 +450,64 @@ namespace IronPython.Runtime.Types {
                 );
             }
 
+            if (target.Overload != null && call is IPythonSite profiledSite) {
+                // report the bound function itself, the rule is shared by all instances it is bound to
+                Expression profiledFunction = function.Value is BuiltinFunction
+                    ? AstUtils.Convert(function.Expression, typeof(BuiltinFunction))
+                    : AstUtils.Constant(this);
+                res = AddProfileHook(profiledSite.Context, profiledFunction, res);
+            }
+
             return res;
         }
 
+        /// <summary>
+        /// Reports the call to the profile hook of the calling thread (sys.setprofile, _lsprof) while profiling
+        /// is enabled.  Calls are bound separately for profiling being on and off, so that a call site which
+        /// is not profiled only pays for checking the restriction.  The sampler alone doesn't enable this, it
+        /// attributes builtin calls to the calling Python function.
+        /// </summary>
+        private DynamicMetaObject/*!*/ AddProfileHook(PythonContext/*!*/ context, Expression/*!*/ function, DynamicMetaObject/*!*/ res) {
+            bool profiling = context.EnableBuiltinProfiling;
+            BindingRestrictions restrictions = res.Restrictions.Merge(
+                BindingRestrictions.GetExpressionRestriction(
+                    Ast.Equal(
+                        Ast.Call(typeof(PythonOps).GetMethod(nameof(PythonOps.IsProfilingBuiltins)), AstUtils.Constant(context)),
+                        AstUtils.Constant(profiling)
+                    )
+                )
+            );
+
+            if (!profiling) {
+                return new DynamicMetaObject(res.Expression, restrictions);
+            }
+
+            Expression pythonContext = AstUtils.Constant(context);
+            ParameterExpression result = Ast.Variable(res.Expression.Type, "result");
+            return new DynamicMetaObject(
+                Ast.Block(
+                    new[] { result },
+                    Ast.Call(typeof(PythonOps).GetMethod(nameof(PythonOps.ProfileBuiltinCall)), pythonContext, function),
+                    Ast.TryCatch(
+                        Ast.Block(
+                            Ast.Assign(result, res.Expression),
+                            AstUtils.Empty()
+                        ),
+                        Ast.Catch(
+                            typeof(Exception),
+                            Ast.Block(
+                                Ast.Call(typeof(PythonOps).GetMethod(nameof(PythonOps.ProfileBuiltinReturn)), pythonContext, function, AstUtils.Constant(true)),
+                                Ast.Rethrow()
+                            )
+                        )
+                    ),
+                    Ast.Call(typeof(PythonOps).GetMethod(nameof(PythonOps.ProfileBuiltinReturn)), pythonContext, function, AstUtils.Constant(false)),
+                    result
+                ),
+                restrictions
+            );
+        }
+
         internal static DynamicMetaObject TranslateArguments(DynamicMetaObjectBinder call, Expression codeContext, DynamicMetaObject function, DynamicMetaObject/*!*/[] args, bool hasSelf, string name) {
             if (hasSelf) {
                 args = ArrayUtils.RemoveFirst(args);
@@ -241,6 +241,34 @@ class FileIOTest(IronPythonTestCase):
         pass
 
 
+    def test_buffered_reader_large_read(self):
+        """reads larger than the buffer bypass it, seeking afterwards must not use stale data"""
+        path = os.path.join(self.temporary_dir, "_fileio_buffered_large_read.tmp")
+        data = bytes(range(256)) * 200
+        with open(path, "wb") as f:
+            f.write(data)
+        try:
+            with open(path, "rb", buffering=8192) as f:
+                self.assertEqual(f.read(100), data[:100])
+                self.assertEqual(f.read(20000), data[100:20100])
+                self.assertEqual(f.tell(), 20100)
+                f.seek(-50, 1)
+                self.assertEqual(f.read(10), data[20050:20060])
+                f.seek(10)
+                self.assertEqual(f.read(10), data[10:20])
+
+                self.assertEqual(f.read(30000), data[20:30020])
+                f.seek(30000)
+                self.assertEqual(f.read(10), data[30000:30010])
+
+                chunk = f.read1(20000)
+                end = 30010 + len(chunk)
+                self.assertEqual(chunk, data[30010:end])
+                f.seek(-5, 1)
+                self.assertEqual(f.read(5), data[end - 5:end])
+        finally:
+            os.remove(path)
+
     def test_coverage(self):
         '''
         Test holes as found by code coverage runs.  These need to be refactored and
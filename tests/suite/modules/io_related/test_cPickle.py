@@ -776,4 +776,43 @@ FROM_MOD_IN_SUBMOD = mod.KMod()
 
         self.assertEqual(type(cPickle.loads(cPickle.dumps(d()))), d)
 
+    def test_protocol_4(self):
+        import _pickle
+
+        obj = ['abc', 'abc' * 100000, b'x' * 100, {1, 2}, frozenset([3]), (None, True, big(1) << 100), NewClass]
+        data = _pickle.dumps(obj, protocol=4)
+        self.assertEqual(data[:3], b'\x80\x04\x95') # PROTO 4, FRAME
+        self.assertIn(b'\x8c\x03abc\x94', data) # SHORT_BINUNICODE, MEMOIZE
+        self.assertEqual(_pickle.loads(data), obj)
+
+        # framed output written to a file round-trips as well
+        f = BytesIO()
+        _pickle.dump(obj, f, protocol=4)
+        f.seek(0)
+        self.assertEqual(_pickle.load(f), obj)
+        self.assertEqual(f.read(), b'')
+
+    @unittest.skipUnless(is_cli, "PickleBuffer is exposed by _pickle on IronPython")
+    def test_protocol_5_out_of_band(self):
+        import _pickle
+
+        data = bytearray(b'abc' * 1000)
+        buffers = []
+        pickled = _pickle.dumps(_pickle.PickleBuffer(data), protocol=5, buffer_callback=buffers.append)
+        self.assertEqual(len(buffers), 1)
+        self.assertNotIn(b'abc', pickled)
+
+        res = _pickle.loads(pickled, buffers=buffers)
+        self.assertIs(res, buffers[0])
+        self.assertEqual(bytes(res.raw()), bytes(data))
+
+        # in-band buffers keep their mutability
+        res = _pickle.loads(_pickle.dumps(_pickle.PickleBuffer(data), protocol=5))
+        self.assertEqual(type(res), bytearray)
+        self.assertEqual(res, data)
+
+        self.assertRaises(_pickle.UnpicklingError, _pickle.loads, pickled)
+        self.assertRaises(ValueError, _pickle.dumps, 1, protocol=4, buffer_callback=buffers.append)
+        self.assertRaises(_pickle.PicklingError, _pickle.dumps, _pickle.PickleBuffer(data), protocol=4)
+
 run_test(__name__)
@@ -10,6 +10,7 @@ import sys
 import os
 import errno
 import mmap
+import unittest
 
 from iptest import IronPythonTestCase, is_cli, is_posix, is_windows, run_test
 
@@ -101,5 +102,44 @@ class MmapTest(IronPythonTestCase):
             self.assertTrue(m.closed)
 
 
+    def test_find_readline(self):
+        page = mmap.ALLOCATIONGRANULARITY
+        data = b"first line\nsecond line\n" + b"x" * page + b"needle" + b"y" * page + b"\nlast"
+        with open(self.temp_file, "wb+") as f:
+            f.write(data)
+
+        with open(self.temp_file, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                self.assertEqual(m.readline(), b"first line\n")
+                self.assertEqual(m.readline(), b"second line\n")
+                self.assertEqual(m.find(b"needle"), data.find(b"needle"))
+                self.assertEqual(m.find(b"needle", 0, data.find(b"needle") + 5), -1)
+                self.assertEqual(m.rfind(b"line", 0), data.rfind(b"line"))
+                self.assertEqual(m.rfind(b"line", 0, 10), 6)
+                self.assertEqual(m.find(b"missing"), -1)
+                self.assertEqual(m.rfind(b"x" * 100, 0), data.rfind(b"x" * 100))
+                self.assertEqual(m[m.find(b"needle"):][:6], b"needle")
+
+                self.assertEqual(len(m.readline()), 2 * page + len(b"needle\n"))
+                self.assertEqual(m.readline(), b"last")
+                self.assertEqual(m.readline(), b"")
+
+                self.assertEqual(bytes(memoryview(m)[:5]), b"first")
+
+    @unittest.skipUnless(is_posix, "madvise is not available on Windows")
+    def test_madvise(self):
+        with open(self.temp_file, "wb+") as f:
+            f.write(b"x" * mmap.PAGESIZE * 4)
+
+        with open(self.temp_file, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                self.assertIsNone(m.madvise(mmap.MADV_SEQUENTIAL))
+                self.assertIsNone(m.madvise(mmap.MADV_WILLNEED, mmap.PAGESIZE, mmap.PAGESIZE))
+                self.assertIsNone(m.madvise(mmap.MADV_NORMAL, 0, mmap.PAGESIZE * 100))
+                self.assertRaises(ValueError, m.madvise, mmap.MADV_NORMAL, -1)
+                self.assertRaises(ValueError, m.madvise, mmap.MADV_NORMAL, mmap.PAGESIZE * 4)
+                self.assertRaises(ValueError, m.madvise, mmap.MADV_NORMAL, 0, -1)
+
+
 run_test(__name__)
 
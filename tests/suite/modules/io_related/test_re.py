@@ -6,7 +6,7 @@ import re
 import sys
 import unittest
 
-from iptest import IronPythonTestCase, is_cli, run_test
+from iptest import IronPythonTestCase, is_cli, run_test, skipUnlessIronPython
 
 class ReTest(IronPythonTestCase):
 
@@ -916,4 +916,66 @@ class ReTest(IronPythonTestCase):
         res = re.sub(r'^(.*)(A)', r'\g<1>', 'A')
         self.assertEqual(res, '')
 
+    def test_bytes_input(self):
+        data = b'\x00\xff ' + b'key=value ' * 1000 + b'\x80end'
+        p = re.compile(rb'(\w+)=(\w+)')
+
+        # search loop over a large bytes object
+        pos, count = 0, 0
+        while True:
+            m = p.search(data, pos)
+            if m is None: break
+            self.assertIs(m.string, data)
+            self.assertEqual(m.groups(), (b'key', b'value'))
+            self.assertEqual(data[m.start():m.end()], b'key=value')
+            pos = m.end()
+            count += 1
+        self.assertEqual(count, 1000)
+
+        for buf in (bytearray(data), memoryview(data)):
+            self.assertEqual(len(p.findall(buf)), 1000)
+            self.assertIs(p.match(buf[3:]).string.__class__, buf.__class__)
+
+        self.assertEqual(re.split(rb'\s', data)[-1], b'\x80end')
+        self.assertEqual(re.search(rb'[\x80-\xff]+', data).group(), b'\xff')
+        self.assertEqual(re.subn(rb'=', b':', b'a=b c=d'), (b'a:b c:d', 2))
+
+        # only the part before endpos is searched
+        for buf in (data, bytearray(data), memoryview(data)):
+            m = p.search(buf, 10, 30)
+            self.assertEqual((m.span(), m.endpos), ((13, 22), 30))
+            self.assertEqual(len(p.findall(buf, 0, 25)), 2)
+            self.assertEqual(len(list(p.finditer(buf, 0, 25))), 2)
+            self.assertIsNone(p.match(buf, 3, 6))
+            self.assertEqual(p.fullmatch(buf, 3, 12).group(2), b'value')
+            self.assertEqual(p.search(buf, 0, -1), None)
+            self.assertEqual(p.search(buf, 0, len(data) + 10).endpos, len(data))
+
+    @skipUnlessIronPython()
+    def test_pattern_cache(self):
+        re.purge()
+        try:
+            re._set_compile_threshold(5)
+            for i in range(10):
+                self.assertEqual(re.match('cached(\\d)', 'cached%d' % i).group(1), str(i))
+            info = [x for x in re._cache_info() if x[0] == 'cached(\\d)']
+            self.assertEqual(len(info), 1)
+            pattern, flags, hits, compiled = info[0]
+            self.assertEqual(hits, 9)
+            self.assertTrue(compiled)
+
+            # fullmatch shares the compilation state of the pattern
+            self.assertEqual(re.fullmatch('cached(\\d)', 'cached1').group(), 'cached1')
+            self.assertIsNone(re.fullmatch('cached(\\d)', 'cached12'))
+
+            re._set_cache_size(2)
+            for p in ('a', 'b', 'c', 'd'):
+                re.search(p, 'abcd')
+            self.assertLessEqual(len(re._cache_info()), 2)
+            self.assertRaises(ValueError, re._set_cache_size, -1)
+        finally:
+            re._set_compile_threshold(100)
+            re._set_cache_size(512)
+            re.purge()
+
 run_test(__name__)
@@ -0,0 +1,222 @@
+# Licensed to the .NET Foundation under one or more agreements.
+# The .NET Foundation licenses this file to you under the Apache 2.0 License.
+# See the LICENSE file in the project root for more information.
+
+import _asyncio
+import socket
+import threading
+import unittest
+
+from iptest import is_cli, run_test
+
+class _AsyncioTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = _asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def test_callbacks(self):
+        calls = []
+        self.loop.call_later(0.02, calls.append, 'later')
+        self.loop.call_soon(calls.append, 1)
+        self.loop.call_soon(calls.append, 2)
+        handle = self.loop.call_soon(calls.append, 3)
+        handle.cancel()
+        self.assertTrue(handle.cancelled())
+        self.loop.call_later(0.05, self.loop.stop)
+        self.loop.run_forever()
+        self.assertEqual(calls, [1, 2, 'later'])
+
+        self.loop.call_soon(lambda: threading.Thread(target=self.loop.call_soon_threadsafe, args=(self.loop.stop,)).start())
+        self.loop.run_forever()
+        self.assertFalse(self.loop.is_running())
+
+    def test_future(self):
+        fut = self.loop.create_future()
+        self.assertFalse(fut.done())
+        self.assertIs(fut.get_loop(), self.loop)
+        self.assertRaises(_asyncio.InvalidStateError, fut.result)
+
+        results = []
+        fut.add_done_callback(lambda f: results.append(f.result()))
+        fut.set_result(42)
+        self.assertTrue(fut.done())
+        self.assertRaises(_asyncio.InvalidStateError, fut.set_result, 1)
+        # done callbacks are scheduled on the loop
+        self.assertEqual(results, [])
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        self.assertEqual(results, [42])
+
+        fut = self.loop.create_future()
+        fut.set_exception(ValueError('x'))
+        self.assertIsInstance(fut.exception(), ValueError)
+        self.assertRaises(ValueError, fut.result)
+
+        fut = self.loop.create_future()
+        self.assertTrue(fut.cancel())
+        self.assertFalse(fut.cancel())
+        self.assertTrue(fut.cancelled())
+        self.assertRaises(_asyncio.CancelledError, fut.result)
+
+    def test_run_until_complete(self):
+        async def add(a, b):
+            fut = self.loop.create_future()
+            self.loop.call_later(0.01, fut.set_result, a + b)
+            return await fut
+
+        self.assertEqual(self.loop.run_until_complete(add(1, 2)), 3)
+
+        async def fail():
+            raise ValueError('boom')
+
+        self.assertRaises(ValueError, self.loop.run_until_complete, fail())
+
+    def test_tasks(self):
+        order = []
+
+        async def worker(name, fut):
+            order.append(name)
+            value = await fut
+            order.append((name, value))
+            return value * 2
+
+        async def main():
+            self.assertIs(_asyncio.current_task(), task)
+            fut = self.loop.create_future()
+            t1 = self.loop.create_task(worker('a', fut))
+            t2 = self.loop.create_task(worker('b', fut))
+            self.loop.call_soon(fut.set_result, 5)
+            return await t1 + await t2
+
+        task = self.loop.create_task(main(), name='main')
+        self.assertEqual(task.get_name(), 'main')
+        self.assertEqual(self.loop.run_until_complete(task), 20)
+        self.assertEqual(order, ['a', 'b', ('a', 5), ('b', 5)])
+        self.assertEqual(_asyncio.all_tasks(self.loop), set())
+
+    def test_tasks_per_loop(self):
+        other = _asyncio.new_event_loop()
+        self.addCleanup(other.close)
+
+        async def noop():
+            pass
+
+        t1 = self.loop.create_task(noop())
+        t2 = other.create_task(noop())
+        self.assertEqual(_asyncio.all_tasks(self.loop), {t1})
+        self.assertEqual(_asyncio.all_tasks(other), {t2})
+
+        _asyncio._unregister_task(t2)
+        self.assertEqual(_asyncio.all_tasks(other), set())
+        _asyncio._register_task(t2)
+        self.assertEqual(_asyncio.all_tasks(other), {t2})
+
+        # each loop has its own current task
+        _asyncio._enter_task(self.loop, t1)
+        _asyncio._enter_task(other, t2)
+        self.assertRaises(RuntimeError, _asyncio._enter_task, self.loop, t2)
+        self.assertRaises(RuntimeError, _asyncio._leave_task, other, t1)
+        _asyncio._leave_task(self.loop, t1)
+        _asyncio._leave_task(other, t2)
+
+        self.loop.run_until_complete(t1)
+        other.run_until_complete(t2)
+        self.assertEqual(_asyncio.all_tasks(self.loop), set())
+        self.assertEqual(_asyncio.all_tasks(other), set())
+
+    def test_cancel_task(self):
+        events = []
+
+        async def sleeper():
+            events.append('started')
+            try:
+                await self.loop.create_future()
+            except _asyncio.CancelledError:
+                events.append('cancelled')
+                raise
+
+        task = self.loop.create_task(sleeper())
+        self.loop.call_later(0.01, task.cancel)
+        self.assertRaises(_asyncio.CancelledError, self.loop.run_until_complete, task)
+        self.assertTrue(task.cancelled())
+        self.assertEqual(events, ['started', 'cancelled'])
+
+        # cancelled before it ever ran
+        events.clear()
+        task = self.loop.create_task(sleeper())
+        self.assertTrue(task.cancel())
+        self.assertRaises(_asyncio.CancelledError, self.loop.run_until_complete, task)
+        self.assertEqual(events, [])
+
+    def test_run_in_executor(self):
+        async def main():
+            return await self.loop.run_in_executor(None, sum, [1, 2, 3])
+
+        self.assertEqual(self.loop.run_until_complete(main()), 6)
+
+    def test_exception_handler(self):
+        errors = []
+        self.loop.set_exception_handler(lambda loop, context: errors.append(context['exception']))
+
+        def bad():
+            raise ZeroDivisionError
+
+        self.loop.call_soon(bad)
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], ZeroDivisionError)
+
+    def test_run(self):
+        async def main():
+            return _asyncio.get_running_loop()
+
+        loop = _asyncio.run(main())
+        self.assertTrue(loop.is_closed())
+        self.assertRaises(RuntimeError, _asyncio.get_running_loop)
+
+    def test_sock_operations(self):
+        listener = socket.socket()
+        self.addCleanup(listener.close)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(1)
+        listener.setblocking(False)
+        client = socket.socket()
+        self.addCleanup(client.close)
+        client.setblocking(False)
+
+        async def main():
+            await self.loop.sock_connect(client, listener.getsockname())
+            conn, addr = await self.loop.sock_accept(listener)
+            try:
+                self.assertIsInstance(conn, socket.socket)
+                self.assertEqual(addr, client.getsockname())
+                await self.loop.sock_sendall(client, b'hello' * 1000)
+                data = b''
+                while len(data) < 5000:
+                    data += await self.loop.sock_recv(conn, 4096)
+
+                await self.loop.sock_sendall(conn, memoryview(b'xxabc')[2:])
+                buf = bytearray(8)
+                n = await self.loop.sock_recv_into(client, buf)
+                return data, buf[:n]
+            finally:
+                conn.close()
+
+        data, tail = self.loop.run_until_complete(main())
+        self.assertEqual(data, b'hello' * 1000)
+        self.assertEqual(tail, b'abc')
+
+    @unittest.skipUnless(is_cli, 'IronPython specific test')
+    def test_net_tasks(self):
+        from System.Threading.Tasks import Task
+
+        async def main():
+            await Task.Delay(10)
+            return await Task.FromResult(7)
+
+        self.assertEqual(self.loop.run_until_complete(main()), 7)
+        self.assertEqual(self.loop.run_until_complete(Task.FromResult(3)), 3)
+
+run_test(__name__)
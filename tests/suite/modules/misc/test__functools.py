@@ -0,0 +1,153 @@
+# Licensed to the .NET Foundation under one or more agreements.
+# The .NET Foundation licenses this file to you under the Apache 2.0 License.
+# See the LICENSE file in the project root for more information.
+
+import _functools
+import functools
+import threading
+
+from iptest import IronPythonTestCase, run_test, skipUnlessIronPython
+
+def make_wrapper(func, maxsize=128, typed=False):
+    return _functools._lru_cache_wrapper(func, maxsize, typed, functools._CacheInfo)
+
+class FunctoolsTest(IronPythonTestCase):
+
+    def test_lru_cache_wrapper(self):
+        calls = []
+        def square(x):
+            calls.append(x)
+            return x * x
+
+        f = make_wrapper(square, maxsize=2)
+        self.assertEqual([f(1), f(2), f(1), f(3)], [1, 4, 1, 9])
+        self.assertEqual(f.cache_info(), (1, 3, 2, 2))
+
+        # 2 was the least recently used entry
+        self.assertEqual(f(1), 1)
+        self.assertEqual(f(2), 4)
+        self.assertEqual(calls, [1, 2, 3, 2])
+        self.assertEqual(f.cache_info(), (2, 4, 2, 2))
+
+        f.cache_clear()
+        self.assertEqual(f.cache_info(), (0, 0, 2, 0))
+
+    def test_lru_cache_wrapper_maxsize(self):
+        f = make_wrapper(lambda x: x, maxsize=None)
+        for i in range(1000):
+            f(i)
+        self.assertEqual(f.cache_info(), (0, 1000, None, 1000))
+
+        f = make_wrapper(lambda x: x, maxsize=0)
+        f(1); f(1)
+        self.assertEqual(f.cache_info(), (0, 2, 0, 0))
+
+        f = make_wrapper(lambda x: x, maxsize=-1)
+        f(1)
+        self.assertEqual(f.cache_info(), (0, 1, 0, 0))
+
+        self.assertRaises(TypeError, make_wrapper, lambda x: x, maxsize='1')
+        self.assertRaises(TypeError, make_wrapper, 1)
+
+    @skipUnlessIronPython()
+    def test_lru_cache_wrapper_large_maxsize(self):
+        # sizes beyond sys.maxsize are clamped rather than rejected
+        f = make_wrapper(lambda x: x, maxsize=1 << 100)
+        f(1); f(1)
+        self.assertEqual(f.cache_info(), (1, 1, 0x7fffffff, 1))
+
+        f = make_wrapper(lambda x: x, maxsize=-(1 << 100))
+        f(1)
+        self.assertEqual(f.cache_info(), (0, 1, 0, 0))
+
+    def test_lru_cache_wrapper_keys(self):
+        f = make_wrapper(lambda *args, **kwargs: (args, sorted(kwargs.items())))
+        self.assertEqual(f(1, a=2), ((1,), [('a', 2)]))
+        self.assertEqual(f(1, a=2), ((1,), [('a', 2)]))
+        f(1.0, a=2)
+        f((1,))
+        f(1, b=2)
+        self.assertEqual(f.cache_info().hits, 2)
+
+        f = make_wrapper(lambda x: x, typed=True)
+        self.assertIs(type(f(1)), int)
+        self.assertIs(type(f(1.0)), float)
+        self.assertEqual(f.cache_info(), (0, 2, 128, 2))
+
+    def test_lru_cache_wrapper_method(self):
+        class C:
+            def __init__(self, value):
+                self.value = value
+            @functools.lru_cache(maxsize=None)
+            def get(self, x):
+                return self.value + x
+
+        a, b = C(1), C(2)
+        self.assertEqual([a.get(1), b.get(1), a.get(1)], [2, 3, 2])
+        self.assertEqual(C.get.cache_info().hits, 1)
+
+    def test_lru_cache_wrapper_threaded(self):
+        # the entries evicted by concurrent calls never leave stale results behind
+        maxsize = 8
+        f = make_wrapper(lambda x: x * 2, maxsize=maxsize)
+        errors = []
+
+        def worker(seed):
+            try:
+                for i in range(2000):
+                    x = (i * seed) % 32
+                    if f(x) != x * 2:
+                        errors.append(x)
+                    if i % 500 == 0:
+                        f.cache_clear()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in (1, 3, 5, 7)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(f.cache_info().currsize, maxsize)
+        for x in range(32):
+            self.assertEqual(f(x), x * 2)
+        self.assertLessEqual(f.cache_info().currsize, maxsize)
+
+    def test_lru_cache_wrapper_clear_threaded(self):
+        # clearing the cache while other threads hit it keeps the recency list intact
+        f = make_wrapper(lambda x: x * 2, maxsize=16)
+        errors = []
+        done = threading.Event()
+
+        def hitter():
+            try:
+                while not done.is_set():
+                    for x in range(8):
+                        if f(x) != x * 2:
+                            errors.append(x)
+            except Exception as e:
+                errors.append(e)
+
+        def clearer():
+            try:
+                for i in range(2000):
+                    f.cache_clear()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                done.set()
+
+        threads = [threading.Thread(target=hitter) for _ in range(3)] + [threading.Thread(target=clearer)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        self.assertEqual(errors, [])
+        # the list is still usable, entries are evicted in order
+        f.cache_clear()
+        for x in range(32):
+            self.assertEqual(f(x), x * 2)
+        self.assertEqual(f.cache_info().currsize, 16)
+        self.assertEqual(f(31), 62)
+        self.assertEqual(f.cache_info().hits, 1)
+
+run_test(__name__)
@@ -0,0 +1,76 @@
+# Licensed to the .NET Foundation under one or more agreements.
+# The .NET Foundation licenses this file to you under the Apache 2.0 License.
+# See the LICENSE file in the project root for more information.
+
+import _blake2
+import _hashlib
+import _sha3
+import unittest
+
+from iptest import run_test
+
+class _HashlibTest(unittest.TestCase):
+
+    def test_new(self):
+        self.assertEqual(_hashlib.new('sha256', b'abc').hexdigest(),
+                'ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad')
+        self.assertEqual(_hashlib.new('SHA1').name, 'sha1')
+        self.assertRaises(ValueError, _hashlib.new, 'nonexistent')
+        self.assertRaises(TypeError, _hashlib.new, 'sha256', 'abc')
+        self.assertIn('sha256', _hashlib.openssl_md_meth_names)
+
+    def test_copy(self):
+        x = _hashlib.new('sha256', b'a')
+        y = x.copy()
+        y.update(b'bc')
+        self.assertEqual(x.hexdigest(), 'ca978112ca1bbdcafac231b39a23dc4da786eff8147c4e72b9807785afee48bb')
+        self.assertEqual(y.hexdigest(), 'ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad')
+
+    def test_sha3(self):
+        self.assertEqual(_sha3.sha3_256(b'abc').hexdigest(),
+                '3a985da74fe225b2045c172d6bd390bd855f086e3e9d525b46bfe24511431532')
+        x = _sha3.sha3_224(b'a')
+        y = x.copy()
+        y.update(b'bc')
+        self.assertEqual(y.hexdigest(), 'e642824c3f8cf24ad09234ee7d3c766fc9a3a5168d0c94ad73b46fdf')
+        self.assertEqual((x.block_size, x.digest_size), (144, 28))
+
+    def test_shake(self):
+        x = _sha3.shake_128(b'abc')
+        self.assertEqual(x.hexdigest(40),
+                '5881092dd818bf5cf8a3ddb793fbcba74097d5c526a6d35f97b83351940f2cc844c50af32acd3f2c')
+        self.assertEqual(x.digest(4), x.digest(40)[:4])
+        self.assertEqual(len(_sha3.shake_256().digest(1000)), 1000)
+
+    def test_blake2(self):
+        self.assertEqual(_blake2.blake2b(b'abc').hexdigest(),
+                'ba80a53f981c4d0d6a2797b69f12f6e94c212f14685ac4b74b12bb6fdbffa2d17d87c5392aab792dc252d5de4533cc9518d38aa8dbf1925ab92386edd4009923')
+        x = _blake2.blake2s(b'abc', digest_size=16, key=b'key', salt=b'salt', person=b'me', fanout=2, depth=3,
+                leaf_size=7, node_offset=5, node_depth=1, inner_size=8, last_node=True)
+        self.assertEqual(x.hexdigest(), '747c0a720cab179efe275937bba8bf4a')
+        self.assertEqual(x.copy().hexdigest(), x.hexdigest())
+        self.assertRaises(ValueError, _blake2.blake2b, digest_size=65)
+        self.assertRaises(ValueError, _blake2.blake2s, salt=b'x' * 9)
+        self.assertRaises(TypeError, _blake2.blake2b, b'a', b'b')
+
+    def test_pbkdf2_hmac(self):
+        self.assertEqual(_hashlib.pbkdf2_hmac('sha256', b'password', b'salt', 2, 40).hex(),
+                'ae4d0c95af6b46d32d0adff928f06dd02a303f8ef3c251dfd6e2d85a95474c43830651afcb5c862f')
+        self.assertEqual(_hashlib.pbkdf2_hmac('sha3_256', b'password', b'salt', 3).hex(),
+                '6677065466c97fdef1c15ae8d95020ca948334f53eceeafc6115ddf405f6d6a4')
+        self.assertRaises(ValueError, _hashlib.pbkdf2_hmac, 'sha256', b'password', b'salt', 0)
+        self.assertRaises(ValueError, _hashlib.pbkdf2_hmac, 'sha256', b'password', b'salt', 1, 0)
+
+    def test_hmac_digest(self):
+        self.assertEqual(_hashlib.hmac_digest(b'key' * 30, b'msg', 'sha256').hex(),
+                '40d365ee49a242997bbb251fc963d591337c4c2a98e1cd23d556e411885a4aff')
+        self.assertEqual(_hashlib.hmac_digest(b'key', b'msg', 'sha3_224').hex(),
+                'aa12d9663ec214318e2c28c9d651241a891ee67fd84ef7ffa9c873e7')
+
+    def test_scrypt(self):
+        self.assertEqual(_hashlib.scrypt(b'password', salt=b'NaCl', n=16, r=2, p=2, dklen=32).hex(),
+                '80a54a798dfc8fbba744f293ab0429201fc00b3a785ce835794bc4bdf4a80681')
+        self.assertRaises(ValueError, _hashlib.scrypt, b'password', salt=b'NaCl', n=15, r=2, p=2)
+        self.assertRaises(TypeError, _hashlib.scrypt, b'password', n=16, r=2, p=2)
+
+run_test(__name__)
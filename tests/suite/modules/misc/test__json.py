@@ -0,0 +1,76 @@
+# Licensed to the .NET Foundation under one or more agreements.
+# The .NET Foundation licenses this file to you under the Apache 2.0 License.
+# See the LICENSE file in the project root for more information.
+
+import _json
+import collections
+import json
+import json.encoder
+import json.scanner
+import unittest
+
+from iptest import run_test
+
+class _JsonTest(unittest.TestCase):
+    def test_accelerated(self):
+        self.assertIs(json.scanner.make_scanner, _json.make_scanner)
+        self.assertIs(json.encoder.c_make_encoder, _json.make_encoder)
+
+    def test_scanstring(self):
+        self.assertEqual(_json.scanstring('"abc"', 1), ('abc', 5))
+        self.assertEqual(_json.scanstring('"a\\"b\\\\c\\u00e9\\ud83d\\ude00" x', 1), ('a"b\\c\xe9\U0001f600', 27))
+        self.assertEqual(_json.scanstring('"a\tb"', 1, False), ('a\tb', 5))
+        self.assertRaises(ValueError, _json.scanstring, '"a\tb"', 1, True)
+        self.assertRaises(ValueError, _json.scanstring, '"abc', 1)
+        self.assertRaises(ValueError, _json.scanstring, '"\\x"', 1)
+        self.assertRaises(ValueError, _json.scanstring, '"\\u12"', 1)
+
+    def test_encode_basestring(self):
+        self.assertEqual(_json.encode_basestring_ascii('a"b\\\n\x01\xe9\U0001f600'), '"a\\"b\\\\\\n\\u0001\\u00e9\\ud83d\\ude00"')
+        self.assertEqual(_json.encode_basestring('a"\xe9'), '"a\\"\xe9"')
+        self.assertRaises(TypeError, _json.encode_basestring_ascii, b'abc')
+
+    def test_loads(self):
+        doc = '{"a": [1, 2.5, -3e2, true, false, null, "x"], "b": {"c": 12345678901234567890}, "d": []}'
+        self.assertEqual(json.loads(doc), {'a': [1, 2.5, -300.0, True, False, None, 'x'], 'b': {'c': 12345678901234567890}, 'd': []})
+        self.assertEqual(json.loads('[NaN, Infinity, -Infinity]')[1:], [float('inf'), float('-inf')])
+        self.assertEqual(json.loads('-0'), 0)
+        self.assertEqual(json.loads('{"a": 1, "b": 2}', object_pairs_hook=list), [('a', 1), ('b', 2)])
+        self.assertEqual(json.loads('{"a": 1}', object_hook=lambda d: sorted(d)), ['a'])
+        self.assertEqual(json.loads('[1.5]', parse_float=str), ['1.5'])
+        self.assertEqual(json.loads('[15]', parse_int=str), ['15'])
+
+        ordered = json.loads('{"z": 1, "a": 2}', object_pairs_hook=collections.OrderedDict)
+        self.assertEqual(list(ordered), ['z', 'a'])
+
+    def test_loads_errors(self):
+        for doc in ['', '[', '[1,]', '{"a" 1}', '{"a": 1,}', '[1 2]', '{1: 2}', 'nul']:
+            self.assertRaises(ValueError, json.loads, doc)
+
+        with self.assertRaisesRegex(ValueError, r"Expecting ',' delimiter: line 2 column 3 \(char 6\)"):
+            json.loads('[1,\n2 3]')
+
+    def test_dumps(self):
+        obj = {'a': [1, 2.5, True, False, None, 'x\xe9'], 'b': (1,), 'c': {}}
+        self.assertEqual(json.dumps(obj, sort_keys=True), '{"a": [1, 2.5, true, false, null, "x\\u00e9"], "b": [1], "c": {}}')
+        self.assertEqual(json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(',', ':')), '{"a":[1,2.5,true,false,null,"x\xe9"],"b":[1],"c":{}}')
+        self.assertEqual(json.dumps({1: 2, 2.5: 3, False: 4, None: 5}), '{"1": 2, "2.5": 3, "false": 4, "null": 5}')
+        self.assertEqual(json.dumps({(1,): 2, 'a': 1}, skipkeys=True), '{"a": 1}')
+        self.assertRaises(TypeError, json.dumps, {(1,): 2})
+        self.assertEqual(json.dumps([float('nan'), float('inf')]), '[NaN, Infinity]')
+        self.assertRaises(ValueError, json.dumps, [float('nan')], allow_nan=False)
+        self.assertEqual(json.dumps(12345678901234567890), '12345678901234567890')
+
+        self.assertEqual(json.dumps({1, 2}, default=sorted), '[1, 2]')
+        self.assertRaises(TypeError, json.dumps, object())
+
+        l = []
+        l.append(l)
+        self.assertRaises(ValueError, json.dumps, l)
+        self.assertRaises((ValueError, RecursionError), json.dumps, l, check_circular=False)
+
+    def test_round_trip(self):
+        obj = [{'id': i, 'name': 'item %d' % i, 'tags': ['a', 'b'], 'value': i / 3} for i in range(1000)]
+        self.assertEqual(json.loads(json.dumps(obj)), obj)
+
+run_test(__name__)
@@ -0,0 +1,85 @@
+# Licensed to the .NET Foundation under one or more agreements.
+# The .NET Foundation licenses this file to you under the Apache 2.0 License.
+# See the LICENSE file in the project root for more information.
+
+import _lsprof
+import cProfile
+import io
+import pstats
+import unittest
+
+from iptest import run_test
+
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+def work():
+    res = []
+    for i in range(10):
+        res.append(str(fib(i)))
+    return sorted(res)
+
+class _LsprofTest(unittest.TestCase):
+
+    def get_entry(self, stats, name):
+        for entry in stats:
+            code = entry.code
+            if (code if isinstance(code, str) else code.co_name) == name:
+                return entry
+        self.fail('no entry for %s' % name)
+
+    def test_getstats(self):
+        prof = _lsprof.Profiler()
+        prof.enable()
+        work()
+        prof.disable()
+        stats = prof.getstats()
+
+        entry = self.get_entry(stats, 'fib')
+        self.assertIs(entry.code, fib.__code__)
+        self.assertEqual(entry.callcount, 276)
+        self.assertEqual(entry.reccallcount, 266)
+        self.assertGreaterEqual(entry.totaltime, entry.inlinetime)
+        self.assertGreaterEqual(entry.inlinetime, 0)
+
+        # fib is called from work and from itself
+        callers = {e.code.co_name: sub.callcount for e in stats if e.calls for sub in e.calls if sub.code is fib.__code__}
+        self.assertEqual(callers, {'work': 10, 'fib': 266})
+
+        entry = self.get_entry(stats, 'work')
+        self.assertEqual((entry.callcount, entry.reccallcount), (1, 0))
+        builtins = [sub.code for sub in entry.calls if isinstance(sub.code, str)]
+        self.assertTrue(any('sorted' in label for label in builtins))
+        self.assertTrue(any("'append' of 'list'" in label for label in builtins))
+
+        prof.clear()
+        self.assertEqual(prof.getstats(), [])
+
+    def test_options(self):
+        prof = _lsprof.Profiler(builtins=False, subcalls=False)
+        prof.enable(subcalls=False, builtins=False)
+        work()
+        prof.disable()
+        stats = prof.getstats()
+        self.assertFalse([e for e in stats if isinstance(e.code, str)])
+        self.assertFalse([e for e in stats if e.calls])
+
+        # an integer timer is scaled by timeunit
+        ticks = iter(range(0, 1000000, 10))
+        prof = _lsprof.Profiler(lambda: next(ticks), 0.5)
+        prof.enable()
+        fib(1)
+        prof.disable()
+        self.assertEqual(self.get_entry(prof.getstats(), 'fib').totaltime, 5.0)
+
+    def test_cprofile(self):
+        prof = cProfile.Profile()
+        prof.runcall(work)
+        out = io.StringIO()
+        pstats.Stats(prof, stream=out).sort_stats('cumulative').print_stats()
+        report = out.getvalue()
+        self.assertIn('276/10', report)
+        self.assertIn('(fib)', report)
+        self.assertIn('sorted', report)
+
+run_test(__name__)
@@ -0,0 +1,162 @@
+# Licensed to the .NET Foundation under one or more agreements.
+# The .NET Foundation licenses this file to you under the Apache 2.0 License.
+# See the LICENSE file in the project root for more information.
+
+import _lzma
+import unittest
+
+from iptest import run_test
+
+DATA = b'IronPython ' * 50 + bytes(range(64))
+
+# produced by CPython with liblzma
+COMPRESSED_XZ_SHA256 = bytes.fromhex(
+    'fd377a585a00000ae1fb0ca10200210116000000742fe5a3e0026500505d00249c89e70b72e93650aafd6cbe5f2fbc'
+    '96808fda24675f7c11fb6c1369cdf89ceefd1e6de65641a8b0dca2d72b92ae1326d2785ed30e5895a60e9a9d206d28'
+    '4e6c59103ffb4652f0041dbd363c412a80009067bf2d5166fe0a95c2913bf281434dfc358985aedfddd125626da83e'
+    '8dc44b00018401e60400009b1d098fb6e9df1c02000000000a595a')
+COMPRESSED_ALONE = bytes.fromhex(
+    '5d00008000ffffffffffffffff00249c89e70b72e93650aafd6cbe5f2fbc96808fda24675f7c11fb6c1369cdf89cee'
+    'fd1e6de65641a8b0dca2d72b92ae1326d2785ed30e5895a60e9a9d206d284e6c59103ffb4652f0041dbd366ca04e05'
+    'fff6156000')
+COMPRESSED_RAW_DELTA = bytes.fromhex(
+    'e0026500205d00249c89e70895c0ac3029d8eee0a0848be7db8136ad59556928333763104f400000')
+COMPRESSED_RAW_X86 = bytes.fromhex(
+    'e00063002e5d0074053c193df557dee3bc7448278b0fcb1e007b46f0199d219e2f828ebfb6ac9c7297ecb3a558d758'
+    '7170ffe356fb00')
+
+FILTERS_RAW_DELTA = [{'id': _lzma.FILTER_DELTA, 'dist': 4}, {'id': _lzma.FILTER_LZMA2, 'preset': 1}]
+FILTERS_RAW_X86 = [{'id': _lzma.FILTER_X86}, {'id': _lzma.FILTER_LZMA2}]
+
+def compress(data, **kwargs):
+    c = _lzma.LZMACompressor(**kwargs)
+    return c.compress(data) + c.flush()
+
+def decompress(data, **kwargs):
+    d = _lzma.LZMADecompressor(**kwargs)
+    res = d.decompress(data)
+    return res, d
+
+class _LzmaTest(unittest.TestCase):
+
+    def test_constants(self):
+        self.assertEqual(_lzma.FILTER_LZMA1, 0x4000000000000001)
+        self.assertEqual(_lzma.FILTER_LZMA2, 0x21)
+        self.assertEqual(_lzma.PRESET_EXTREME, 0x80000000)
+        self.assertEqual(_lzma.CHECK_UNKNOWN, _lzma.CHECK_ID_MAX + 1)
+
+    def test_is_check_supported(self):
+        for check in (_lzma.CHECK_NONE, _lzma.CHECK_CRC32, _lzma.CHECK_CRC64, _lzma.CHECK_SHA256):
+            self.assertTrue(_lzma.is_check_supported(check))
+        self.assertFalse(_lzma.is_check_supported(3))
+        self.assertFalse(_lzma.is_check_supported(99))
+
+    def test_decompress_liblzma_output(self):
+        res, d = decompress(COMPRESSED_XZ_SHA256)
+        self.assertEqual(res, DATA)
+        self.assertTrue(d.eof)
+        self.assertEqual(d.check, _lzma.CHECK_SHA256)
+
+        res, d = decompress(COMPRESSED_ALONE)
+        self.assertEqual(res, DATA)
+        self.assertEqual(d.check, _lzma.CHECK_NONE)
+
+        res, d = decompress(COMPRESSED_RAW_DELTA, format=_lzma.FORMAT_RAW, filters=FILTERS_RAW_DELTA)
+        self.assertEqual(res, DATA)
+        res, d = decompress(COMPRESSED_RAW_X86, format=_lzma.FORMAT_RAW, filters=FILTERS_RAW_X86)
+        self.assertEqual(res, b'\xe8\x10\x00\x00\x00' * 20)
+
+    def test_decompress_incremental(self):
+        d = _lzma.LZMADecompressor()
+        self.assertEqual(d.check, _lzma.CHECK_UNKNOWN)
+        out = []
+        for i in range(len(COMPRESSED_XZ_SHA256)):
+            out.append(d.decompress(COMPRESSED_XZ_SHA256[i:i + 1]))
+        self.assertEqual(b''.join(out), DATA)
+        self.assertTrue(d.eof)
+        self.assertRaises(EOFError, d.decompress, b'')
+
+    def test_decompress_max_length(self):
+        d = _lzma.LZMADecompressor()
+        res = d.decompress(COMPRESSED_XZ_SHA256, max_length=100)
+        self.assertEqual(len(res), 100)
+        self.assertFalse(d.needs_input)
+        while not d.eof:
+            res += d.decompress(b'', max_length=100)
+        self.assertEqual(res, DATA)
+
+    def test_unused_data(self):
+        res, d = decompress(COMPRESSED_XZ_SHA256 + b'trailing')
+        self.assertEqual(res, DATA)
+        self.assertEqual(d.unused_data, b'trailing')
+        self.assertFalse(d.needs_input)
+
+    def test_compress_formats(self):
+        self.assertEqual(compress(b'').hex(),
+            'fd377a585a000004e6d6b446000000001cdf44211fb6f37d010000000004595a')
+        c = _lzma.LZMACompressor()
+        self.assertEqual(c.compress(b'').hex(), 'fd377a585a000004e6d6b446')
+
+        for kwargs in ({}, {'check': _lzma.CHECK_NONE}, {'check': _lzma.CHECK_CRC32}, {'check': _lzma.CHECK_SHA256},
+                       {'preset': 0}, {'preset': 9 | _lzma.PRESET_EXTREME}):
+            res, d = decompress(compress(DATA, **kwargs))
+            self.assertEqual(res, DATA)
+
+        res, d = decompress(compress(DATA, format=_lzma.FORMAT_ALONE))
+        self.assertEqual(res, DATA)
+
+        for filters in (FILTERS_RAW_DELTA, FILTERS_RAW_X86, [{'id': _lzma.FILTER_LZMA1, 'lc': 0, 'pb': 0}]):
+            res, d = decompress(compress(DATA, format=_lzma.FORMAT_RAW, filters=filters), format=_lzma.FORMAT_RAW, filters=filters)
+            self.assertEqual(res, DATA)
+
+    def test_compress_large(self):
+        data = b''.join(b'line %d of the test data\n' % (i % 5000) for i in range(100000))
+        c = _lzma.LZMACompressor(preset=1)
+        comp = b''.join(c.compress(data[i:i + 65536]) for i in range(0, len(data), 65536)) + c.flush()
+        self.assertLess(len(comp), len(data) // 4)
+        res, d = decompress(comp)
+        self.assertEqual(res, data)
+
+    def test_compressor_errors(self):
+        c = _lzma.LZMACompressor()
+        c.flush()
+        self.assertRaises(ValueError, c.compress, b'abc')
+        self.assertRaises(ValueError, c.flush)
+
+        self.assertRaises(ValueError, _lzma.LZMACompressor, format=9)
+        self.assertRaises(ValueError, _lzma.LZMACompressor, format=_lzma.FORMAT_ALONE, check=_lzma.CHECK_CRC32)
+        self.assertRaises(ValueError, _lzma.LZMACompressor, preset=1, filters=[])
+        self.assertRaises(ValueError, _lzma.LZMACompressor, format=_lzma.FORMAT_RAW)
+        self.assertRaises(ValueError, _lzma.LZMACompressor, format=_lzma.FORMAT_ALONE, filters=[{'id': _lzma.FILTER_LZMA2}])
+        self.assertRaises(_lzma.LZMAError, _lzma.LZMACompressor, check=2)
+        self.assertRaises(_lzma.LZMAError, _lzma.LZMACompressor, preset=99)
+        self.assertRaises(_lzma.LZMAError, _lzma.LZMACompressor, format=_lzma.FORMAT_RAW, filters=[{'id': _lzma.FILTER_LZMA2}, {'id': _lzma.FILTER_X86}])
+        self.assertRaises(ValueError, _lzma.LZMACompressor, format=_lzma.FORMAT_RAW, filters=[{'id': _lzma.FILTER_LZMA2}] * 5)
+        self.assertRaises(ValueError, _lzma.LZMACompressor, format=_lzma.FORMAT_RAW, filters=[{'id': 99}])
+        self.assertRaises(ValueError, _lzma.LZMACompressor, format=_lzma.FORMAT_RAW, filters=[{'id': _lzma.FILTER_LZMA2, 'foo': 1}])
+        self.assertRaises(TypeError, _lzma.LZMACompressor, format=_lzma.FORMAT_RAW, filters=[1])
+
+    def test_decompressor_errors(self):
+        self.assertRaises(ValueError, _lzma.LZMADecompressor, format=_lzma.FORMAT_RAW)
+        self.assertRaises(ValueError, _lzma.LZMADecompressor, format=_lzma.FORMAT_XZ, filters=FILTERS_RAW_X86)
+        self.assertRaises(ValueError, _lzma.LZMADecompressor, format=_lzma.FORMAT_RAW, memlimit=1 << 20, filters=FILTERS_RAW_X86)
+
+        self.assertRaises(_lzma.LZMAError, _lzma.LZMADecompressor(format=_lzma.FORMAT_XZ).decompress, COMPRESSED_ALONE)
+        self.assertRaises(_lzma.LZMAError, _lzma.LZMADecompressor().decompress, b'not an lzma stream at all')
+        self.assertRaises(_lzma.LZMAError, _lzma.LZMADecompressor(memlimit=1024).decompress, COMPRESSED_XZ_SHA256)
+
+        corrupt = bytearray(COMPRESSED_XZ_SHA256)
+        corrupt[-60] ^= 1
+        self.assertRaises(_lzma.LZMAError, _lzma.LZMADecompressor().decompress, bytes(corrupt))
+
+    def test_filter_properties(self):
+        self.assertEqual(_lzma._encode_filter_properties({'id': _lzma.FILTER_LZMA2}), b'\x16')
+        self.assertEqual(_lzma._encode_filter_properties({'id': _lzma.FILTER_LZMA1}), b']\x00\x00\x80\x00')
+        self.assertEqual(_lzma._encode_filter_properties({'id': _lzma.FILTER_DELTA, 'dist': 4}), b'\x03')
+        self.assertEqual(_lzma._decode_filter_properties(_lzma.FILTER_LZMA1, b']\x00\x00\x80\x00'),
+            {'id': _lzma.FILTER_LZMA1, 'lc': 3, 'lp': 0, 'pb': 2, 'dict_size': 1 << 23})
+        self.assertEqual(_lzma._decode_filter_properties(_lzma.FILTER_LZMA2, b'\x05'), {'id': _lzma.FILTER_LZMA2, 'dict_size': 24576})
+        self.assertEqual(_lzma._decode_filter_properties(_lzma.FILTER_X86, b'\x01\x00\x00\x00'), {'id': _lzma.FILTER_X86, 'start_offset': 1})
+        self.assertRaises(_lzma.LZMAError, _lzma._decode_filter_properties, 99, b'\x05')
+
+run_test(__name__)
@@ -108,4 +108,34 @@ Curabitur non eros. Nullam hendrerit bibendum justo. Fusce iaculis, est quis lac
             bufs.append(do.flush())
             self.assertEqual(b"".join(bufs), b'hello there\n')
 
+    def test_incompressible(self):
+        data = os.urandom(100000)
+        for level in (0, 1, 9):
+            compressed = zlib.compress(data, level)
+            self.assertEqual(zlib.decompress(compressed), data)
+            self.assertEqual(zlib.decompress(compressed, zlib.MAX_WBITS, 1), data)
+
+    def test_max_length(self):
+        do = zlib.decompressobj()
+        data = do.decompress(self.zlib_data, 100)
+        self.assertEqual(data, self.text[:100])
+        while do.unconsumed_tail:
+            chunk = do.decompress(do.unconsumed_tail, 100)
+            self.assertLessEqual(len(chunk), 100)
+            data += chunk
+        data += do.flush()
+        self.assertEqual(data, self.text)
+
+    def test_strategy(self):
+        for strategy in (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_HUFFMAN_ONLY):
+            co = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS, 9, strategy)
+            compressed = co.compress(self.text) + co.flush()
+            self.assertEqual(zlib.decompress(compressed), self.text)
+
+    def test_crc32(self):
+        self.assertEqual(zlib.crc32(b''), 0)
+        self.assertEqual(zlib.crc32(b'hello world'), 222957957)
+        self.assertEqual(zlib.crc32(self.text) & 0xffffffff, zlib.crc32(self.text[100:], zlib.crc32(self.text[:100])) & 0xffffffff)
+        self.assertEqual(zlib.crc32(memoryview(b'abcdefghijklmnopqrstuvwxyz')[3:20]) & 0xffffffff, zlib.crc32(b'defghijklmnopqrst') & 0xffffffff)
+
 run_test(__name__)
@@ -686,4 +686,99 @@ finally:
 
         f.close()
 
+
+class SocketMessageTest(IronPythonTestCase):
+    def connected_pair(self):
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(1)
+        client = socket.create_connection(listener.getsockname())
+        server, _ = listener.accept()
+        listener.close()
+        self.addCleanup(client.close)
+        self.addCleanup(server.close)
+        return client, server
+
+    def test_send_buffers(self):
+        client, server = self.connected_pair()
+        client.sendall(memoryview(b'xxabcdef')[2:])
+        client.send(bytearray(b'ghi'))
+        data = b''
+        while len(data) < 9:
+            data += server.recv(16)
+        self.assertEqual(data, b'abcdefghi')
+
+        buf = bytearray(b'.' * 6)
+        client.send(b'jkl')
+        self.assertEqual(server.recv_into(memoryview(buf)[2:]), 3)
+        self.assertEqual(buf, b'..jkl.')
+
+        # a buffer larger than the pooled ones only receives the queued data
+        client.send(b'mno')
+        self.assertEqual(server.recv(4 * 1024 * 1024), b'mno')
+
+    def test_sendmsg_recvmsg_stream(self):
+        client, server = self.connected_pair()
+        self.assertEqual(client.sendmsg([b'abc', bytearray(b'def'), memoryview(b'ghi')]), 9)
+        data = b''
+        while len(data) < 9:
+            msg, ancdata, flags, address = server.recvmsg(16)
+            self.assertEqual(ancdata, [])
+            data += msg
+        self.assertEqual(data, b'abcdefghi')
+
+        client.sendmsg([b'0123456789'])
+        first, second = bytearray(4), bytearray(8)
+        nbytes = 0
+        while nbytes < 10:
+            nbytes += server.recvmsg_into([memoryview(first)[nbytes:], second] if nbytes < 4 else [memoryview(second)[nbytes - 4:]])[0]
+        self.assertEqual(first, b'0123')
+        self.assertEqual(second, b'456789\0\0')
+
+        self.assertRaises(TypeError, client.sendmsg, [1])
+        self.assertRaises(TypeError, server.recvmsg_into, [b'readonly'])
+        self.assertRaises(ValueError, server.recvmsg, -1)
+
+    def test_sendmsg_recvmsg_dgram(self):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.addCleanup(receiver.close)
+        receiver.bind(('127.0.0.1', 0))
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.addCleanup(sender.close)
+        sender.bind(('127.0.0.1', 0))
+
+        self.assertEqual(sender.sendmsg([b'abc', b'def'], [], 0, receiver.getsockname()), 6)
+        data, ancdata, flags, address = receiver.recvmsg(16)
+        self.assertEqual(data, b'abcdef')
+        self.assertEqual(address, sender.getsockname())
+
+        sender.sendmsg([b'0123456789'], [], 0, receiver.getsockname())
+        buf = bytearray(4)
+        nbytes, ancdata, flags, address = receiver.recvmsg_into([buf])
+        self.assertEqual(nbytes, 4)
+        self.assertEqual(buf, b'0123')
+        self.assertTrue(flags & socket.MSG_TRUNC)
+
+    @unittest.skipUnless(is_linux or is_cpython, 'os.sendfile is only available on Linux')
+    def test_sendfile(self):
+        client, server = self.connected_pair()
+        path = os.path.join(self.temporary_dir, 'sendfile_%d.txt' % os.getpid())
+        self.addCleanup(os.remove, path)
+        with open(path, 'wb') as f:
+            f.write(b'0123456789' * 100)
+
+        with open(path, 'rb') as f:
+            self.assertEqual(client.sendfile(f, offset=10, count=20), 20)
+            self.assertEqual(f.tell(), 30)
+            sent = os.sendfile(client.fileno(), f.fileno(), 0, 5)
+            self.assertEqual(sent, 5)
+            if is_cli:
+                import System
+                self.assertIsInstance(sent, System.Int32)
+            self.assertEqual(f.tell(), 30)
+        data = b''
+        while len(data) < 25:
+            data += server.recv(64)
+        self.assertEqual(data, b'0123456789' * 2 + b'01234')
+
 run_test(__name__)
@@ -0,0 +1,88 @@
+# Licensed to the .NET Foundation under one or more agreements.
+# The .NET Foundation licenses this file to you under the Apache 2.0 License.
+# See the LICENSE file in the project root for more information.
+
+#
+# test select
+#
+
+import select
+import selectors
+import socket
+import unittest
+
+from iptest import IronPythonTestCase, is_cli, is_linux, run_test
+
+class SelectTest(IronPythonTestCase):
+    def setUp(self):
+        super(SelectTest, self).setUp()
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        self.client = socket.create_connection(listener.getsockname())
+        self.server, _ = listener.accept()
+        listener.close()
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+        super(SelectTest, self).tearDown()
+
+    def test_poll(self):
+        p = select.poll()
+        p.register(self.server, select.POLLIN)
+        self.assertEqual(p.poll(0), [])
+
+        self.client.send(b"x")
+        self.assertEqual(p.poll(1000), [(self.server.fileno(), select.POLLIN)])
+
+        p.modify(self.server, select.POLLOUT)
+        self.assertEqual(p.poll(1000), [(self.server.fileno(), select.POLLOUT)])
+
+        p.unregister(self.server)
+        self.assertRaises(KeyError, p.unregister, self.server)
+        self.assertRaises(OSError, p.modify, self.server, select.POLLIN)
+        self.assertEqual(p.poll(0), [])
+
+    def test_poll_hangup(self):
+        p = select.poll()
+        p.register(self.server, select.POLLIN | select.POLLPRI)
+        self.client.send(b"x")
+        self.assertEqual(p.poll(1000), [(self.server.fileno(), select.POLLIN)])
+
+        self.client.close()
+        self.assertEqual(self.server.recv(10), b"x")
+        [(fd, events)] = p.poll(1000)
+        self.assertEqual(fd, self.server.fileno())
+        self.assertTrue(events & select.POLLIN)
+        self.assertFalse(events & (select.POLLPRI | select.POLLERR))
+        if is_cli:
+            self.assertTrue(events & select.POLLHUP)
+        self.assertEqual(self.server.recv(10), b"")
+
+    @unittest.skipUnless(is_linux, "epoll is only available on Linux")
+    def test_epoll(self):
+        with select.epoll() as ep:
+            self.assertFalse(ep.closed)
+            ep.register(self.server, select.EPOLLIN | select.EPOLLET)
+            self.assertEqual(ep.poll(0), [])
+
+            self.client.send(b"x")
+            self.assertEqual(ep.poll(1), [(self.server.fileno(), select.EPOLLIN)])
+            # edge triggered, no new data arrived since the last poll
+            self.assertEqual(ep.poll(0), [])
+
+            ep.modify(self.server.fileno(), select.EPOLLOUT)
+            self.assertEqual(ep.poll(1), [(self.server.fileno(), select.EPOLLOUT)])
+
+            ep.unregister(self.server)
+            self.assertRaises(OSError, ep.unregister, self.server)
+            self.assertRaises(FileExistsError, lambda: (ep.register(self.client), ep.register(self.client)))
+        self.assertTrue(ep.closed)
+        self.assertRaises(ValueError, ep.poll)
+
+    @unittest.skipUnless(is_linux, "epoll is only available on Linux")
+    def test_default_selector(self):
+        self.assertIs(selectors.DefaultSelector, selectors.EpollSelector)
+
+run_test(__name__)
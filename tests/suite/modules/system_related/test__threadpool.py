@@ -0,0 +1,143 @@
+# Licensed to the .NET Foundation under one or more agreements.
+# The .NET Foundation licenses this file to you under the Apache 2.0 License.
+# See the LICENSE file in the project root for more information.
+
+import _threadpool
+import concurrent.futures
+import threading
+import time
+import unittest
+
+from iptest import run_test
+
+class _ThreadPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = _threadpool.ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_submit(self):
+        fut = self.executor.submit(pow, 2, 10)
+        self.assertEqual(fut.result(), 1024)
+        self.assertTrue(fut.done())
+        self.assertFalse(fut.cancelled())
+        self.assertIsNone(fut.exception())
+        self.assertIn('returned int', repr(fut))
+
+        fut = self.executor.submit(sorted, [3, 1, 2], reverse=True)
+        self.assertEqual(fut.result(), [3, 2, 1])
+
+    def test_exception(self):
+        def fail():
+            raise ValueError('boom')
+
+        fut = self.executor.submit(fail)
+        self.assertRaises(ValueError, fut.result)
+        self.assertIsInstance(fut.exception(), ValueError)
+        self.assertIn('raised ValueError', repr(fut))
+
+    def test_timeout_and_cancel(self):
+        gate = threading.Event()
+        blockers = [self.executor.submit(gate.wait) for _ in range(4)]
+        queued = self.executor.submit(int)
+        self.assertRaises(concurrent.futures.TimeoutError, queued.result, 0.01)
+        self.assertTrue(queued.cancel())
+        self.assertTrue(queued.cancelled())
+        self.assertRaises(concurrent.futures.CancelledError, queued.result)
+        gate.set()
+        for fut in blockers:
+            self.assertTrue(fut.result())
+
+    def test_max_workers(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def work():
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        for fut in [self.executor.submit(work) for _ in range(20)]:
+            fut.result()
+        self.assertLessEqual(running[1], 4)
+        self.assertRaises(ValueError, _threadpool.ThreadPoolExecutor, 0)
+
+    def test_map(self):
+        self.assertEqual(list(self.executor.map(pow, [1, 2, 3], [2, 2])), [1, 4])
+        self.assertEqual(list(self.executor.map(str, range(5), timeout=10)), ['0', '1', '2', '3', '4'])
+
+    def test_done_callback(self):
+        done = threading.Event()
+        seen = []
+        fut = self.executor.submit(time.sleep, 0.01)
+        fut.add_done_callback(lambda f: (seen.append(f), done.set()))
+        done.wait(10)
+        self.assertEqual(seen, [fut])
+
+        # added after completion, the callback runs immediately
+        fut.add_done_callback(seen.append)
+        self.assertEqual(seen, [fut, fut])
+
+    def test_concurrent_futures_interop(self):
+        fs = [self.executor.submit(time.sleep, d) for d in (0.05, 0.01)]
+        done, not_done = concurrent.futures.wait(fs, return_when=concurrent.futures.FIRST_COMPLETED)
+        self.assertIn(fs[1], done)
+        self.assertEqual(set(concurrent.futures.as_completed(fs)), set(fs))
+
+    def test_shutdown(self):
+        results = []
+        with _threadpool.ThreadPoolExecutor(max_workers=2) as executor:
+            for i in range(5):
+                executor.submit(lambda i=i: (time.sleep(0.01), results.append(i)))
+        self.assertEqual(sorted(results), list(range(5)))
+        self.assertRaises(RuntimeError, executor.submit, int)
+
+    def test_initializer(self):
+        local = threading.local()
+
+        def init(value):
+            local.value = value
+
+        with _threadpool.ThreadPoolExecutor(max_workers=2, initializer=init, initargs=(7,)) as executor:
+            self.assertEqual(executor.submit(lambda: local.value).result(), 7)
+
+        def broken():
+            raise ZeroDivisionError
+
+        executor = _threadpool.ThreadPoolExecutor(max_workers=1, initializer=broken)
+        self.assertRaises(_threadpool.BrokenThreadPool, executor.submit(int).result)
+        self.assertRaises(_threadpool.BrokenThreadPool, executor.submit, int)
+        executor.shutdown()
+
+    def test_thread_names(self):
+        import System
+        name = lambda: System.Threading.Thread.CurrentThread.Name
+
+        with _threadpool.ThreadPoolExecutor(max_workers=1, thread_name_prefix='worker') as executor:
+            self.assertEqual(executor._thread_name_prefix, 'worker')
+            self.assertEqual(executor.submit(name).result(), 'worker_0')
+            # the idle worker runs the next call
+            self.assertEqual(executor.submit(name).result(), 'worker_0')
+
+        self.assertRegex(self.executor._thread_name_prefix, r'^ThreadPoolExecutor-\d+$')
+        self.assertTrue(self.executor.submit(name).result().startswith(self.executor._thread_name_prefix + '_'))
+
+    def test_futures_executor(self):
+        executor_type = _threadpool.futures_executor()
+        self.assertIs(_threadpool.futures_executor(), executor_type)
+        self.assertTrue(issubclass(executor_type, _threadpool.ThreadPoolExecutor))
+        self.assertTrue(issubclass(executor_type, concurrent.futures.Executor))
+        # opt-in, concurrent.futures keeps its own executor
+        self.assertFalse(issubclass(concurrent.futures.ThreadPoolExecutor, _threadpool.ThreadPoolExecutor))
+
+        with executor_type(max_workers=2) as executor:
+            fut = executor.submit(pow, 2, 10)
+            self.assertIsInstance(fut, concurrent.futures.Future)
+            self.assertEqual(fut.result(), 1024)
+            self.assertEqual(list(executor.map(abs, [-1, -2])), [1, 2])
+            self.assertIsInstance(executor.submit(int, 'x').exception(), ValueError)
+
+run_test(__name__)
@@ -2,6 +2,7 @@
 # The .NET Foundation licenses this file to you under the Apache 2.0 License.
 # See the LICENSE file in the project root for more information.
 
+import gc
 import os
 
 from iptest import IronPythonTestCase, is_osx, is_linux, is_windows, run_test
@@ -55,4 +56,72 @@ class OsTest(IronPythonTestCase):
         finally:
             os.close(fd)
 
+    def test_scandir_close(self):
+        top = self.temporary_dir
+        # the directories of abandoned iterators are closed when they are collected
+        for _ in range(10):
+            for i in range(500):
+                it = os.scandir(top)
+                if i % 2:
+                    next(it, None)
+            del it
+            gc.collect()
+
+        it = os.scandir(top)
+        it.close()
+        it.close()
+        self.assertEqual(list(it), [])
+
+        with os.scandir(top) as it:
+            next(it, None)
+        self.assertEqual(list(it), [])
+
+    def test_scandir(self):
+        top = os.path.join(self.temporary_dir, "scandir_OSTest_%d" % os.getpid())
+        os.mkdir(top)
+        try:
+            os.mkdir(os.path.join(top, "sub"))
+            with open(os.path.join(top, "file.txt"), "w") as f:
+                f.write("data")
+
+            with os.scandir(top) as it:
+                entries = sorted(it, key=lambda e: e.name)
+            self.assertEqual([e.name for e in entries], ["file.txt", "sub"])
+            file, sub = entries
+
+            self.assertEqual(file.path, os.path.join(top, "file.txt"))
+            self.assertEqual(os.fspath(sub), os.path.join(top, "sub"))
+            self.assertTrue(file.is_file())
+            self.assertFalse(file.is_dir())
+            self.assertFalse(file.is_symlink())
+            self.assertTrue(sub.is_dir(follow_symlinks=False))
+            self.assertEqual(file.stat().st_size, 4)
+            self.assertEqual(file.inode(), os.stat(file.path).st_ino)
+
+            # the results are cached
+            st = file.stat()
+            os.remove(file.path)
+            self.assertIs(file.stat(), st)
+            self.assertTrue(file.is_file())
+
+            with os.scandir(os.fsencode(top)) as it:
+                self.assertEqual([e.path for e in it], [os.fsencode(sub.path)])
+
+            if not is_windows:
+                os.symlink(os.path.join(top, "missing"), os.path.join(top, "link"))
+                link = [e for e in os.scandir(top) if e.name == "link"][0]
+                self.assertTrue(link.is_symlink())
+                self.assertFalse(link.is_file())
+                self.assertFalse(link.is_dir())
+                self.assertRaises(FileNotFoundError, link.stat)
+                self.assertTrue(link.stat(follow_symlinks=False))
+                os.remove(link.path)
+        finally:
+            for root, dirs, files in os.walk(top, topdown=False):
+                for name in files:
+                    os.remove(os.path.join(root, name))
+                for name in dirs:
+                    os.rmdir(os.path.join(root, name))
+            os.rmdir(top)
+
 run_test(__name__)
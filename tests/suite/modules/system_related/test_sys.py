@@ -90,6 +90,61 @@ print(final)"""
         finally:
             os.unlink(fname)
 
+    def test_setprofile(self):
+        events = []
+        def profile(frame, event, arg):
+            if event.startswith('c_'):
+                events.append((event, arg.__name__))
+            else:
+                events.append((event, frame.f_code.co_name, arg))
+
+        def inner(x):
+            return len(x)
+
+        def outer():
+            return inner('abc') + 1
+
+        def fail():
+            abs('x')
+
+        sys.setprofile(profile)
+        self.assertIs(sys.getprofile(), profile)
+        outer()
+        try:
+            fail()
+        except TypeError:
+            pass
+        sys.setprofile(None)
+        self.assertIsNone(sys.getprofile())
+
+        # events of the calls to setprofile and getprofile themselves are left out
+        names = {'outer', 'inner', 'fail', 'len', 'abs'}
+        self.assertEqual([e for e in events if e[1] in names], [
+            ('call', 'outer', None),
+            ('call', 'inner', None),
+            ('c_call', 'len'),
+            ('c_return', 'len'),
+            ('return', 'inner', 3),
+            ('return', 'outer', 4),
+            ('call', 'fail', None),
+            ('c_call', 'abs'),
+            ('c_exception', 'abs'),
+            ('return', 'fail', None),
+        ])
+
+        # a profile function which raises is removed
+        def bad(frame, event, arg):
+            if event == 'call':
+                raise ZeroDivisionError
+        raised = False
+        sys.setprofile(bad)
+        try:
+            outer()
+        except ZeroDivisionError:
+            raised = True
+        self.assertTrue(raised)
+        self.assertIsNone(sys.getprofile())
+
     def test_call_tracing(self):
         def f(i):
             return i * 2
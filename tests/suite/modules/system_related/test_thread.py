@@ -238,6 +238,71 @@ t1.start()
         self.assertTrue("tempFunc() got an unexpected keyword argument 'my_misspelled_kw_param" in temp_stderr)
 
 
+    def test_lock_release_from_other_thread(self):
+        lock = thread.allocate_lock()
+        self.assertTrue(lock.acquire())
+        self.assertTrue(lock.locked())
+        self.assertFalse(lock.acquire(False))
+        self.assertFalse(lock.acquire(timeout=0.01))
+
+        released = thread.allocate_lock()
+        released.acquire()
+        def f():
+            lock.release()
+            released.release()
+        thread.start_new_thread(f, ())
+        with released:
+            pass
+        self.assertFalse(lock.locked())
+        self.assertRaises(RuntimeError, lock.release)
+
+        self.assertRaises(ValueError, lock.acquire, False, 1)
+        self.assertRaises(ValueError, lock.acquire, timeout=-2)
+
+    def test_rlock(self):
+        rlock = thread.RLock()
+        self.assertTrue(rlock.acquire())
+        self.assertTrue(rlock.acquire())
+        self.assertTrue(rlock._is_owned())
+        self.assertIn('count=2', repr(rlock))
+
+        result = []
+        done = thread.allocate_lock()
+        done.acquire()
+        def f():
+            result.append(rlock.acquire(timeout=0.01))
+            result.append(rlock._is_owned())
+            self.assertRaises(RuntimeError, rlock.release)
+            done.release()
+        thread.start_new_thread(f, ())
+        with done:
+            pass
+        self.assertEqual(result, [False, False])
+
+        state = rlock._release_save()
+        self.assertFalse(rlock._is_owned())
+        rlock._acquire_restore(state)
+        rlock.release()
+        rlock.release()
+        self.assertRaises(RuntimeError, rlock.release)
+        self.assertIn('unlocked', repr(rlock))
+
+    def test_thread_state_not_shared(self):
+        """threads started one after another do not see each other's thread-local state"""
+        x = thread._local()
+        results = []
+        done = thread.allocate_lock()
+        for i in range(3):
+            done.acquire()
+            def f(i=i):
+                results.append((thread.get_ident(), hasattr(x, 'value')))
+                x.value = i
+                done.release()
+            thread.start_new_thread(f, ())
+        with done:
+            pass
+        self.assertEqual([seen for ident, seen in results], [False, False, False])
+
     @unittest.skip('TODO: add real test for thread_interrupt_main')
     def test_thread_interrupt_main():
         self.assertRaises(NotImplementedError, thread.interrupt_main)
@@ -125,9 +125,6 @@ def load_tests(loader, standard_tests, pattern):
                 test.test_io.PyIOTest('test_optional_abilities'),
                 test.test_io.APIMismatchTest('test_RawIOBase_io_in_pyio_match'),
                 test.test_io.APIMismatchTest('test_RawIOBase_pyio_in_io_match'),
-                test.test_io.CBufferedReaderTest('test_readinto1'),
-                test.test_io.CBufferedReaderTest('test_readinto1_array'),
-                test.test_io.CBufferedReaderTest('test_readinto_array'),
                 test.test_io.CBufferedRandomTest('test_readinto1'),
                 test.test_io.CBufferedRandomTest('test_readinto1_array'),
                 test.test_io.CBufferedRandomTest('test_readinto_array'),
@@ -0,0 +1,82 @@
+# Licensed to the .NET Foundation under one or more agreements.
+# The .NET Foundation licenses this file to you under the Apache 2.0 License.
+# See the LICENSE file in the project root for more information.
+
+import threading
+import time
+import unittest
+
+from iptest import IronPythonTestCase, is_cli, run_test, skipUnlessIronPython
+
+if is_cli:
+    import clr
+
+def spin(seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        pass
+
+def outer(seconds):
+    spin(seconds)
+
+def parse(data):
+    stacks = {}
+    for line in data.splitlines():
+        stack, count = line.rsplit(' ', 1)
+        stacks[tuple(frame.split(' (')[0] for frame in stack.split(';'))] = int(count)
+    return stacks
+
+@skipUnlessIronPython()
+class ClrSamplerTest(IronPythonTestCase):
+
+    def tearDown(self):
+        clr.StopSampler()
+        clr.ClearSamplerData()
+
+    def test_sampling(self):
+        clr.StartSampler(0.001)
+        self.assertRaises(RuntimeError, clr.StartSampler)
+        outer(0.3)
+        clr.StopSampler()
+
+        stacks = parse(clr.GetSamplerData())
+        samples = sum(count for stack, count in stacks.items() if stack[-2:] == ('outer', 'spin'))
+        self.assertGreater(samples, 50)
+        self.assertTrue(all(count > 0 for count in stacks.values()))
+
+        # nothing is sampled once stopped
+        outer(0.05)
+        self.assertEqual(parse(clr.GetSamplerData()), stacks)
+
+        clr.ClearSamplerData()
+        self.assertEqual(clr.GetSamplerData(), '')
+
+    def test_threads(self):
+        clr.StartSampler(0.001)
+        threads = [threading.Thread(target=outer, args=(0.2,)) for _ in range(2)]
+        for t in threads:
+            t.start()
+        spin(0.2)
+        for t in threads:
+            t.join()
+        clr.StopSampler()
+
+        stacks = parse(clr.GetSamplerData())
+        self.assertTrue(any(stack[-2:] == ('outer', 'spin') for stack in stacks))
+        self.assertTrue(any(stack[-1] == 'spin' and 'outer' not in stack for stack in stacks))
+
+    def test_module_frames(self):
+        clr.StartSampler(0.001)
+        exec('outer(0.2)', globals())
+        clr.StopSampler()
+
+        stacks = parse(clr.GetSamplerData())
+        self.assertTrue(any(stack[-3:] == ('<module>', 'outer', 'spin') for stack in stacks))
+
+    def test_errors(self):
+        self.assertRaises(ValueError, clr.StartSampler, 0)
+        self.assertRaises(ValueError, clr.StartSampler, -1.0)
+        # stopping a sampler which isn't running does nothing
+        clr.StopSampler()
+
+run_test(__name__)
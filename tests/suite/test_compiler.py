@@ -203,5 +203,21 @@ class CompilerTest(IronPythonTestCase):
         import cp30178
         self.assertEqual(cp30178.mydict, {'a' : ('Fail', 'tuple')})
 
+@unittest.skipUnless(is_netcoreapp, 'clr.CompileModules is supported')
+@skipUnlessIronPython()
+class CompilerUnsupportedTest(IronPythonTestCase):
+
+    def test_compile_modules(self):
+        import clr
+        inputFile = os.path.join(self.temporary_dir, "unsupported.py")
+        dllFile = os.path.join(self.temporary_dir, "unsupported.dll")
+        self.write_to_file(inputFile, "A = 1")
+        try:
+            with self.assertRaises(NotImplementedError):
+                clr.CompileModules(dllFile, inputFile)
+            self.assertFalse(os.path.exists(dllFile))
+        finally:
+            self.delete_files(inputFile)
+
 run_test(__name__)
 
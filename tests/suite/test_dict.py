@@ -1033,4 +1033,73 @@ class DictTest(IronPythonTestCase):
         m[u64] = 'b'
         self.assertEqual(m[9223372036854775808], 'b')
 
+    def test_insertion_order(self):
+        d = {}
+        keys = [str(i) for i in range(100, 0, -1)]
+        for k in keys:
+            d[k] = int(k)
+        self.assertEqual(list(d), keys)
+        self.assertEqual(list(d.values()), [int(k) for k in keys])
+
+        # removed keys are dropped and re-added keys go to the end
+        for k in keys[::3]:
+            del d[k]
+        d[keys[0]] = 0
+        expected = [k for k in keys if k not in keys[::3]] + [keys[0]]
+        self.assertEqual(list(d), expected)
+
+        # order survives copies, updates and growing the table
+        self.assertEqual(list(d.copy()), expected)
+        d2 = {'x': 1}
+        d2.update(d)
+        self.assertEqual(list(d2), ['x'] + expected)
+        for i in range(1000):
+            d2[i] = i
+        self.assertEqual(list(d2)[:len(expected) + 1], ['x'] + expected)
+        self.assertEqual(list(d2)[len(expected) + 1:], list(range(1000)))
+
+        # heterogeneous keys keep their order as well
+        d3 = {1: 'a', 'b': 2, (3,): 'c', 4.0: 'd', None: 'e'}
+        self.assertEqual(list(d3), [1, 'b', (3,), 4.0, None])
+
+    def test_insertion_order_none(self):
+        # None is ordered like any other key
+        d = {None: 1, 'a': 2}
+        self.assertEqual(list(d), [None, 'a'])
+        d = {'a': 1, None: 2, 'b': 3}
+        self.assertEqual(list(d), ['a', None, 'b'])
+        self.assertEqual(list(d.items()), [('a', 1), (None, 2), ('b', 3)])
+
+        d = {}
+        d[None] = 0
+        for i in range(100):
+            d[str(i)] = i
+        self.assertEqual(list(d), [None] + [str(i) for i in range(100)])
+
+        # the position follows removals, copies and growing the table
+        d = {str(i): i for i in range(10)}
+        d[None] = None
+        for i in range(10, 20):
+            d[str(i)] = i
+        for i in range(0, 20, 2):
+            del d[str(i)]
+        expected = [str(i) for i in range(1, 10, 2)] + [None] + [str(i) for i in range(11, 20, 2)]
+        self.assertEqual(list(d), expected)
+        for i in range(100, 1000):
+            d[i] = i
+        self.assertEqual(list(d)[:len(expected)], expected)
+        self.assertEqual(list(d.copy())[:len(expected)], expected)
+        d2 = {'x': 1}
+        d2.update(d)
+        self.assertEqual(list(d2)[:len(expected) + 1], ['x'] + expected)
+        self.assertEqual(list(dict(d))[:len(expected)], expected)
+
+        # updating the value keeps the position, re-adding moves it to the end
+        d = {'a': 1, None: 2, 'b': 3}
+        d[None] = 4
+        self.assertEqual(list(d.items()), [('a', 1), (None, 4), ('b', 3)])
+        del d[None]
+        d[None] = 5
+        self.assertEqual(list(d), ['a', 'b', None])
+
 run_test(__name__)
@@ -876,4 +876,46 @@ class FileTest(IronPythonTestCase):
             f.raw.seek(0)
             self.assertEqual(f.raw.read(6), b"abcdef")
 
+    def test_read_text_large(self):
+        # lines with multi-byte characters spanning several buffer refills
+        lines = ["%d: \u00e9\u20ac\U0001f600 %s\n" % (i, "x" * (i % 97)) for i in range(2000)]
+        data = "".join(lines)
+        with open(self.temp_file, "w", encoding="utf-8", newline="") as f:
+            f.write(data)
+
+        with open(self.temp_file, encoding="utf-8") as f:
+            self.assertEqual(list(f), lines)
+
+        with open(self.temp_file, encoding="utf-8") as f:
+            self.assertEqual(f.read(), data)
+
+        with open(self.temp_file, encoding="utf-8") as f:
+            for i in range(1000):
+                self.assertEqual(f.readline(), lines[i])
+            pos = f.tell()
+            rest = f.read()
+            f.seek(pos)
+            self.assertEqual(f.readline(), lines[1000])
+            self.assertEqual(rest, "".join(lines[1000:]))
+
+        with open(self.temp_file, encoding="utf-8") as f:
+            self.assertEqual(f.readline(5), lines[0][:5])
+            self.assertEqual(f.readline(), lines[0][5:])
+
+        with open(self.temp_file, "wb") as f:
+            f.write(b"a\r\nb\rc\nd" * 3000)
+        for newline, expected in ((None, "a\n"), ("", "a\r\n"), ("\r\n", "a\r\n"), ("\r", "a\r")):
+            with open(self.temp_file, encoding="latin-1", newline=newline) as f:
+                text = f.read()
+            with open(self.temp_file, encoding="latin-1", newline=newline) as f:
+                self.assertEqual(f.readline(), expected)
+                self.assertEqual(expected + "".join(f), text)
+
+        with open(self.temp_file, "wb") as f:
+            f.write(b"abc\xff\n")
+        with open(self.temp_file, encoding="utf-8") as f:
+            self.assertRaises(UnicodeDecodeError, f.read)
+        with open(self.temp_file, encoding="ascii") as f:
+            self.assertRaises(UnicodeDecodeError, f.readline)
+
 run_test(__name__)
@@ -3,6 +3,7 @@
 # See the LICENSE file in the project root for more information.
 
 import imp
+import importlib
 import os
 import sys
 import unittest
@@ -289,10 +290,7 @@ else:
 
         self.assertEqual(imp.is_builtin("_locle"),0)
 
-        if is_cli:
-            self.assertEqual(imp.is_builtin("_pickle"),0)
-        else:
-            self.assertEqual(imp.is_builtin("_pickle"),1)
+        self.assertEqual(imp.is_builtin("_pickle"),1)
         self.assertEqual(imp.is_builtin("_random"),1)
 
         # nt module disabled in Silverlight
@@ -358,6 +356,67 @@ else:
             sys.path = prevPath
             self.delete_files(os.path.join(self.test_dir, "temp_syspath_none.py"))
 
+    def test_directory_listing_refresh(self):
+        """modules added to a directory which was already searched are found"""
+        tmpdir = os.path.join(self.test_dir, "listing_refresh")
+        os.makedirs(tmpdir, exist_ok=True)
+        try:
+            sys.path.insert(0, tmpdir)
+            self.write_to_file(os.path.join(tmpdir, "listing_refresh_a.py"), "value = 'a'")
+            import listing_refresh_a
+            self.assertEqual(listing_refresh_a.value, 'a')
+
+            with self.assertRaises(ImportError):
+                import listing_refresh_b
+
+            self.write_to_file(os.path.join(tmpdir, "listing_refresh_b.py"), "value = 'b'")
+            importlib.invalidate_caches() # needed by CPython, IronPython notices the directory changed
+            import listing_refresh_b
+            self.assertEqual(listing_refresh_b.value, 'b')
+
+            # the case of the module name must match
+            self.write_to_file(os.path.join(tmpdir, "Listing_Refresh_C.py"), "value = 'c'")
+            with self.assertRaises(ImportError):
+                import listing_refresh_c
+        finally:
+            sys.path.remove(tmpdir)
+            for name in ("listing_refresh_a", "listing_refresh_b", "listing_refresh_c"):
+                sys.modules.pop(name, None)
+            self.clean_directory(tmpdir)
+
+    def test_directory_listing_invalidate_caches(self):
+        """modules written without changing the directory's mtime are found"""
+        tmpdir = os.path.join(self.test_dir, "listing_invalidate")
+        os.makedirs(tmpdir, exist_ok=True)
+        try:
+            sys.path.insert(0, tmpdir)
+            with self.assertRaises(ImportError):
+                import listing_invalidate_a
+
+            # the file is created within the resolution of the directory's modification time
+            mtime = os.stat(tmpdir).st_mtime_ns
+            self.write_to_file(os.path.join(tmpdir, "listing_invalidate_a.py"), "value = 'a'")
+            os.utime(tmpdir, ns=(mtime, mtime))
+            if not is_cli:
+                importlib.invalidate_caches() # IronPython doesn't trust listings of recently modified directories
+            import listing_invalidate_a
+            self.assertEqual(listing_invalidate_a.value, 'a')
+
+            with self.assertRaises(ImportError):
+                import listing_invalidate_b
+
+            mtime = os.stat(tmpdir).st_mtime_ns
+            self.write_to_file(os.path.join(tmpdir, "listing_invalidate_b.py"), "value = 'b'")
+            os.utime(tmpdir, ns=(mtime, mtime))
+            sys.path_importer_cache.clear()
+            import listing_invalidate_b
+            self.assertEqual(listing_invalidate_b.value, 'b')
+        finally:
+            sys.path.remove(tmpdir)
+            for name in ("listing_invalidate_a", "listing_invalidate_b"):
+                sys.modules.pop(name, None)
+            self.clean_directory(tmpdir)
+
     def test_sys_path_none_negative(self):
         prevPath = sys.path
         test_paths = [  [None] + prevPath,
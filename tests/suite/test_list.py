@@ -431,5 +431,130 @@ class ListTest(IronPythonTestCase):
         t1 = Temp(3.0)
         self.assertEqual(t1 * 3.0, 9.0)
 
+    def test_homogeneous_fast_paths(self):
+        ints = [5, -3, 2**31 - 1, -2**31, 0, 5, -3]
+        self.assertEqual(sorted(ints), [-2**31, -3, -3, 0, 5, 5, 2**31 - 1])
+        self.assertEqual(sorted(ints, reverse=True), [2**31 - 1, 5, 5, 0, -3, -3, -2**31])
+        self.assertEqual(min(ints), -2**31)
+        self.assertEqual(max(ints), 2**31 - 1)
+        self.assertEqual(sum(ints), 2**31 - 1 - 2**31 + 4)
+        self.assertEqual(sum([2**31 - 1] * 4), 4 * (2**31 - 1))
+        self.assertEqual(sum([1, 2, 3, 4.5, 5]), 15.5)
+        self.assertEqual(ints.index(0), 4)
+        self.assertEqual(ints.count(5), 2)
+        self.assertTrue(-3 in ints)
+        self.assertTrue(5.0 in ints)
+        self.assertFalse(6 in ints)
+
+        floats = [1.5, -0.0, 0.0, -2.5, 1.5]
+        self.assertEqual(sum(floats), 0.5)
+        self.assertEqual(str(sorted(floats)), '[-2.5, -0.0, 0.0, 1.5, 1.5]')
+        self.assertEqual(str(sorted(floats, reverse=True)), '[1.5, 1.5, -0.0, 0.0, -2.5]')
+        self.assertEqual(min(floats), -2.5)
+        self.assertEqual(max(floats), 1.5)
+        self.assertEqual(floats.index(0.0), 1)
+        nan = float('nan')
+        self.assertTrue(nan in [1.0, nan])
+        self.assertFalse(float('nan') in [1.0, nan])
+
+        strs = ['b', 'a', 'c', 'B', 'ab']
+        self.assertEqual(sorted(strs), ['B', 'a', 'ab', 'b', 'c'])
+        self.assertEqual(min(strs), 'B')
+        self.assertEqual(strs.index('c'), 2)
+
+        # stability with a key
+        words = ['bb', 'a', 'cc', 'd', 'ee']
+        self.assertEqual(sorted(words, key=len), ['a', 'd', 'bb', 'cc', 'ee'])
+        self.assertEqual(sorted(words, key=len, reverse=True), ['bb', 'cc', 'ee', 'a', 'd'])
+
+        # identity of equal items is preserved
+        x, y = int('1000'), int('1000')
+        l = [y, 5, x]
+        l.sort()
+        self.assertIs(l[1], y)
+        self.assertIs(l[2], x)
+
+    def test_item_identity(self):
+        # reading an item hands out the stored object
+        l = [1.5, 2**40, 3]
+        self.assertIs(l[0], l[0])
+        self.assertEqual(id(l[1]), id(l[1]))
+        x = l[0]
+        l.sort()
+        self.assertIs(l[0], x)
+
+    def test_homogeneous_fast_paths(self):
+        # the typed fast paths for int, float and str lists keep the semantics of the generic paths
+        ints = []
+        for i in range(10):
+            ints.append(i)
+        self.assertEqual(ints[2:8:2], [2, 4, 6])
+        self.assertEqual(ints[::-3], [9, 6, 3, 0])
+        self.assertEqual(ints + [10], list(range(11)))
+        self.assertEqual(ints * 2, list(range(10)) * 2)
+        self.assertEqual(ints.copy(), list(range(10)))
+        self.assertEqual(list(ints), list(range(10)))
+        self.assertEqual(list(reversed(ints)), list(range(9, -1, -1)))
+        self.assertTrue(True in ints)
+        self.assertEqual(ints.count(1.0), 1)
+        self.assertEqual(ints.index(True), 1)
+        self.assertEqual(ints.index(3, 2, 5), 3)
+        self.assertRaises(ValueError, ints.index, 3, 4)
+        self.assertFalse(2**40 in ints)
+
+        ints[1:3] = [20, 30, 40]
+        self.assertEqual(ints, [0, 20, 30, 40, 3, 4, 5, 6, 7, 8, 9])
+        del ints[::2]
+        self.assertEqual(ints, [20, 40, 4, 6, 8])
+        ints.insert(1, 'x')
+        self.assertEqual(ints, [20, 'x', 40, 4, 6, 8])
+        ints.remove('x')
+        ints.sort(reverse=True)
+        self.assertEqual(ints, [40, 20, 8, 6, 4])
+
+        floats = [0.5] * 3
+        floats.append(2.5)
+        floats[0] = 1
+        self.assertEqual(floats, [1, 0.5, 0.5, 2.5])
+        self.assertIs(type(floats[0]), int)
+
+        nan = float('nan')
+        floats = [1.5]
+        floats.append(nan)
+        floats.append(2.5)
+        self.assertIs(floats[1], nan)
+        self.assertTrue(nan in floats)
+        self.assertEqual(floats.index(nan), 1)
+
+        zeros = []
+        zeros.extend([0.0, -0.0, 1.0, -0.0])
+        zeros.sort()
+        self.assertEqual(str(zeros), '[0.0, -0.0, -0.0, 1.0]')
+        self.assertEqual(sum(zeros), 1.0)
+        self.assertEqual(min(zeros), 0.0)
+
+        big = []
+        big.append(2**31 - 1)
+        big.append(2**31 - 1)
+        self.assertEqual(sum(big), 2**32 - 2)
+        self.assertEqual(sum(big, 0.5), 2**32 - 1.5)
+        self.assertEqual(sum(big, 2**40), 2**40 + 2**32 - 2)
+        big.append(2**31)
+        self.assertEqual(big[-1], 2**31)
+        self.assertEqual(big.pop(), 2**31)
+        self.assertEqual(big.pop(0), 2**31 - 1)
+
+        mixed = [x * 1.5 for x in range(4)]
+        self.assertEqual(mixed, [0.0, 1.5, 3.0, 4.5])
+        self.assertEqual(sum(mixed), 9.0)
+        self.assertEqual(max(mixed), 4.5)
+        self.assertTrue(mixed == [0, 1.5, 3, 4.5])
+        mixed.reverse()
+        self.assertEqual(mixed, [4.5, 3.0, 1.5, 0.0])
+        mixed.clear()
+        self.assertEqual(mixed, [])
+        mixed.append('a')
+        self.assertEqual(mixed, ['a'])
+
 
 run_test(__name__)
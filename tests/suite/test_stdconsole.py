@@ -7,7 +7,7 @@ import re
 import sys
 import unittest
 
-from iptest import IronPythonTestCase, is_cli, is_netcoreapp21, is_posix, run_test, skipUnlessIronPython
+from iptest import IronPythonTestCase, is_cli, is_netcoreapp, is_netcoreapp21, is_posix, run_test, skipUnlessIronPython
 
 if is_cli:
     import clr
@@ -305,6 +305,84 @@ class StdConsoleTest(IronPythonTestCase):
         """Test -X:TrackPerformance"""
         self.TestCommandLine(("-X:TrackPerformance", "-c", "2+2"), "")
 
+    @skipUnlessIronPython()
+    @unittest.skipIf(is_netcoreapp, 'compiled modules can only be saved on .NET Framework')
+    def test_X_ModuleCache(self):
+        """Test -X ModuleCache"""
+        cachedir = os.path.join(self.tmpdir, 'modcache')
+        tmpmod = os.path.join(self.tmpdir, 'modcache_mod.py')
+        with open(tmpmod, "w") as f:
+            f.write("x = 42\n")
+
+        script = "import sys; sys.path.insert(0, %r); import modcache_mod; print(modcache_mod.x)" % self.tmpdir
+
+        # the first run writes the entry, the second one loads the module from it
+        self.TestCommandLine(("-X", "ModuleCache=" + cachedir, "-c", script), "42\n")
+        entries = [x for x in os.listdir(cachedir) if x.startswith("modcache_mod.") and x.endswith(".ipyc")]
+        self.assertEqual(len(entries), 1)
+        entry = os.path.join(cachedir, entries[0])
+        written = os.stat(entry).st_mtime
+        self.TestCommandLine(("-X", "ModuleCache=" + cachedir, "-c", script), "42\n")
+        self.assertEqual(os.stat(entry).st_mtime, written)
+
+        # a modified source invalidates the entry
+        with open(tmpmod, "w") as f:
+            f.write("x = 'changed'\n")
+        self.TestCommandLine(("-X", "ModuleCache=" + cachedir, "-c", script), "changed\n")
+        os.unlink(tmpmod)
+
+    @skipUnlessIronPython()
+    def test_X_Sample(self):
+        """Test -X Sample"""
+        samples = os.path.join(self.tmpdir, 'samples.collapsed')
+        script = "import time\ndef spin():\n    end = time.time() + 0.2\n    while time.time() < end: pass\nspin()"
+        self.TestCommandLine(("-X", "Sample=" + samples, "-c", script), "")
+        with open(samples) as f:
+            stacks = f.read().splitlines()
+        os.unlink(samples)
+        self.assertTrue(any(line.split(';')[-1].startswith('spin (') for line in stacks))
+
+    @skipUnlessIronPython()
+    def test_X_StartupTiming(self):
+        """Test -X StartupTiming"""
+        self.TestCommandLine(("-X", "StartupTiming", "-c", "print(42)"), ("regexp", r"(# startup: [\w ()]+: [\d.,]+ ms\n)+# startup: total: [\d.,]+ ms\n42\n$"))
+
+    @skipUnlessIronPython()
+    def test_X_StartupSnapshot(self):
+        """Test -X StartupSnapshot"""
+        snapshot = os.path.join(self.tmpdir, 'startup.snapshot')
+        if os.path.exists(snapshot):
+            os.unlink(snapshot)
+
+        # the first run creates the snapshot, the following ones load it
+        script = "import sys; print('site' in sys.modules)"
+        self.TestCommandLine(("-X", "StartupSnapshot=" + snapshot, "-c", script), "True\n")
+        self.assertTrue(os.path.exists(snapshot))
+        self.TestCommandLine(("-X", "StartupSnapshot=" + snapshot, "-X", "StartupTiming", "-c", script), ("regexp", r".*# startup: builtin modules \(snapshot\): .*True\n$"))
+        self.TestCommandLine(("-X", "StartupSnapshot=" + snapshot, "-c", "import _struct, sys; print(_struct.__name__, sys.builtin_module_names == tuple(sorted(sys.builtin_module_names)))"), "_struct True\n")
+
+        # a corrupt snapshot is replaced
+        with open(snapshot, "wb") as f:
+            f.write(b"garbage")
+        self.TestCommandLine(("-X", "StartupSnapshot=" + snapshot, "-c", script), "True\n")
+        self.TestCommandLine(("-X", "StartupSnapshot=" + snapshot, "-X", "StartupTiming", "-c", script), ("regexp", r".*# startup: builtin modules \(snapshot\): .*True\n$"))
+        os.unlink(snapshot)
+
+    @skipUnlessIronPython()
+    def test_X_StartupSnapshot_hosted(self):
+        """Test the StartupSnapshot option of a hosted engine"""
+        from IronPython.Hosting import Python
+        snapshot = os.path.join(self.tmpdir, 'hosted.snapshot')
+        if os.path.exists(snapshot):
+            os.unlink(snapshot)
+
+        # the startup ends once the first code run by the host has finished
+        engine = Python.CreateEngine({'StartupSnapshot': snapshot})
+        self.assertFalse(os.path.exists(snapshot))
+        engine.Execute("x = 1")
+        self.assertTrue(os.path.exists(snapshot))
+        os.unlink(snapshot)
+
     def test_u(self):
         """Test -u (Unbuffered stdout & stderr): only test this can be passed in"""
         self.TestCommandLine(('-u', '-c', 'print(2+2)'), "4\n")
@@ -0,0 +1,87 @@
+# Licensed to the .NET Foundation under one or more agreements.
+# The .NET Foundation licenses this file to you under the Apache 2.0 License.
+# See the LICENSE file in the project root for more information.
+
+import time
+import unittest
+
+from iptest import IronPythonTestCase, is_cli, run_test, skipUnlessIronPython
+
+if is_cli:
+    import clr
+
+def get_data(code, includeUnused=False):
+    for data in clr.GetCompilationData(includeUnused):
+        if data[0] is code:
+            return data
+    return None
+
+def wait_compiled(func, *args, timeout=10):
+    # the compiled code is installed by the first call after the background compilation finished
+    end = time.time() + timeout
+    while get_data(func.__code__)[1] != 'compiled' and time.time() < end:
+        func(*args)
+        time.sleep(0.01)
+    return get_data(func.__code__)
+
+@skipUnlessIronPython()
+class TieredCompilationTest(IronPythonTestCase):
+
+    def test_tier_up(self):
+        def add(a, b):
+            return a + b
+
+        self.assertIsNone(get_data(add.__code__))
+        self.assertEqual(get_data(add.__code__, True)[1:], ('interpreted', 0.0))
+
+        self.assertEqual(add(1, 2), 3)
+        code, tier, interpreted_time = get_data(add.__code__)
+        self.assertEqual(tier, 'interpreted')
+        self.assertGreater(get_data(add.__code__)[2], 0.0)
+
+        # the call reaching the threshold starts the compilation and goes on interpreted
+        for i in range(1000):
+            self.assertEqual(add(i, 1), i + 1)
+        code, tier, interpreted_time = wait_compiled(add, 1, 2)
+        self.assertEqual(tier, 'compiled')
+        self.assertGreater(interpreted_time, 0.0)
+
+        # the time stops once the function is compiled
+        add(1, 2)
+        self.assertEqual(get_data(add.__code__)[2], interpreted_time)
+        self.assertEqual(add('a', 'b'), 'ab')
+
+    def test_compile_function(self):
+        def gen(n):
+            for i in range(n):
+                yield i * 2
+
+        def many(a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p, q):
+            return a + q
+
+        clr.CompileFunction(gen)
+        clr.CompileFunction(many.__code__)
+        self.assertEqual(get_data(gen.__code__)[1], 'compiled')
+        self.assertEqual(get_data(many.__code__)[1], 'compiled')
+        self.assertEqual(list(gen(3)), [0, 2, 4])
+        self.assertEqual(many(*range(17)), 16)
+
+        # already compiled
+        clr.CompileFunction(gen)
+
+        self.assertRaises(TypeError, clr.CompileFunction, len)
+        self.assertRaises(TypeError, clr.CompileFunction, None)
+
+    def test_exceptions(self):
+        def fail(x):
+            if x > 0:
+                raise ValueError(x)
+            return x
+
+        for i in range(100):
+            self.assertRaises(ValueError, fail, 1)
+            self.assertEqual(fail(0), 0)
+        wait_compiled(fail, 0)
+        self.assertRaises(ValueError, fail, 1)
+
+run_test(__name__)